@@ -312,6 +312,7 @@ async def predict_water_quality(
         # Real geology determines likely water chemistry at depth
         import json as _json
         import urllib.request as _urlreq
+        from app.core.tracing import traced_urlopen
 
         tds_est, fluoride_est, arsenic_est, nitrate_est, iron_est = (
             None, None, None, None, None
@@ -326,7 +327,7 @@ async def predict_water_quality(
                 f"&depth=60-100cm&value=mean"
             )
             _req = _urlreq.Request(soil_url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with _urlreq.urlopen(_req, timeout=15) as _resp:
+            with traced_urlopen(_req, timeout=15) as _resp:
                 soil_data = _json.loads(_resp.read().decode())
 
             layers = {}
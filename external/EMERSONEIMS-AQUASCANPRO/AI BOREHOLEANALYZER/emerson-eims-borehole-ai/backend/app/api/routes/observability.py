@@ -0,0 +1,63 @@
+"""
+API Route: Observability
+Prometheus scrape endpoint and opt-in sampling profiler
+"""
+
+import asyncio
+import logging
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+from app.config import Config
+from app.core.profiler import ProfilerBusyError, SamplingProfiler
+from app.dependencies import require_admin
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["observability"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus exposition of stage, Celery task and HTTP latency histograms"""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # gunicorn runs several workers; aggregate their on-disk metric files
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/api/v1/debug/profile")
+async def capture_profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    format: str = Query("folded", pattern="^(folded|json)$"),
+    admin=Depends(require_admin),
+):
+    """
+    Sample this worker's threads for ``seconds`` and return a flame graph in
+    folded-stack format (feed to flamegraph.pl or open in speedscope).
+
+    Disabled unless ENABLE_PROFILER=true; admins only.
+    """
+    if not Config.ENABLE_PROFILER:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+
+    profiler = SamplingProfiler(interval=interval_ms / 1000)
+    logger.info(f"Profiler capture requested by admin {admin.id}: {seconds}s @ {interval_ms}ms")
+    try:
+        # Run in a thread so the event loop keeps serving (and shows up in the samples)
+        result = await asyncio.to_thread(profiler.capture, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    if format == "json":
+        return result
+    return PlainTextResponse(
+        result["folded"],
+        headers={"X-Profile-Samples": str(result["samples"]), "X-Profile-Pid": str(result["pid"])},
+    )
@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -10,22 +10,14 @@ from app.database.models.user import User
 from app.database.models.borehole import Analysis
 from app.database.models.payment import Payment
 from app.database.models.subscription import Subscription
-from app.dependencies import get_current_user
+from app.dependencies import require_admin
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def _require_admin(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user_id = int(current_user) if isinstance(current_user, str) else current_user
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user or user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    return user
-
-
 @router.get("/stats")
-async def get_admin_stats(admin: User = Depends(_require_admin), db: Session = Depends(get_db)):
+async def get_admin_stats(admin: User = Depends(require_admin), db: Session = Depends(get_db)):
     today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
 
     total_users = db.query(func.count(User.id)).scalar() or 0
@@ -49,7 +41,7 @@ async def get_admin_stats(admin: User = Depends(_require_admin), db: Session = D
 async def list_users(
     limit: int = 100,
     offset: int = 0,
-    admin: User = Depends(_require_admin),
+    admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
     total = db.query(func.count(User.id)).scalar() or 0
@@ -79,7 +71,7 @@ async def list_users(
 async def list_analyses(
     limit: int = 100,
     offset: int = 0,
-    admin: User = Depends(_require_admin),
+    admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
     total = db.query(func.count(Analysis.id)).scalar() or 0
@@ -3,15 +3,17 @@ import io
 import json
 import logging
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import Response, FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response, FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database.session import get_db
 from app.database.models.borehole import Analysis
 from app.database.models.report import Report
 from app.dependencies import get_current_user
+from app.modules.export.streaming import StreamingExporter, iter_analysis_rows
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -76,6 +78,39 @@ async def export_csv(
     )
 
 
+@router.get("/analyses/{fmt}")
+async def export_analyses(
+    fmt: str,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    batch_size: int = Query(500, ge=50, le=5000),
+    current_user=Depends(get_current_user),
+):
+    """
+    Stream every analysis owned by the caller as CSV, GeoJSON, KML or XLSX.
+
+    Rows are read in keyset-paginated batches and written incrementally, so
+    memory stays constant regardless of how many analyses are exported.
+    """
+    fmt = fmt.lower()
+    if fmt not in StreamingExporter.SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{fmt}'. Use one of: {', '.join(StreamingExporter.SUPPORTED_FORMATS)}",
+        )
+
+    user_id = int(current_user) if isinstance(current_user, str) else current_user
+    rows = iter_analysis_rows(user_id=user_id, status=status, since=since, batch_size=batch_size)
+    exporter = StreamingExporter(rows, flush_every=batch_size)
+    filename = f"analyses_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+    return StreamingResponse(
+        exporter.stream(fmt),
+        media_type=StreamingExporter.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment;filename={filename}"},
+    )
+
+
 @router.get("/report/{report_id}/pdf")
 async def export_pdf(
     report_id: int,
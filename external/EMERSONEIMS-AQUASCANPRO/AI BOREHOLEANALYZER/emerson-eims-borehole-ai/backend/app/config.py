@@ -44,4 +44,7 @@ class Config:
     
     # Rate limiting
     RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
-    RATE_LIMIT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", "60"))
\ No newline at end of file
+    RATE_LIMIT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", "60"))
+
+    # Observability
+    ENABLE_PROFILER = os.getenv("ENABLE_PROFILER", "false").lower() == "true"
\ No newline at end of file
@@ -2,10 +2,13 @@ import logging
 import sys
 from datetime import datetime
 
+from app.core.tracing import install_log_trace_id
+
 def setup_logging():
+    install_log_trace_id()
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s',
         handlers=[
             logging.StreamHandler(sys.stdout),
             logging.FileHandler(f'logs/borehole_{datetime.now().strftime("%Y%m%d")}.log')
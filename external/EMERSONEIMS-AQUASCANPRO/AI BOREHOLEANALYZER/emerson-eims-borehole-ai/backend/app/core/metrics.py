@@ -7,6 +7,49 @@ analysis_duration = Histogram('analysis_duration_seconds', 'Analysis duration in
 active_users = Gauge('active_users', 'Number of active users')
 prediction_accuracy = Gauge('prediction_accuracy', 'Model prediction accuracy')
 
+# Stage-level latency (see app.core.tracing). Upstream APIs and remote sensing
+# capabilities sit in the 100 ms - 60 s range, so buckets extend past a minute.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+stage_duration = Histogram(
+    'borehole_stage_duration_seconds',
+    'Duration of a traced pipeline stage',
+    ['kind', 'name', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+celery_task_duration = Histogram(
+    'borehole_celery_task_duration_seconds',
+    'Celery task run time',
+    ['task', 'state'],
+    buckets=LATENCY_BUCKETS,
+)
+http_request_duration = Histogram(
+    'borehole_http_request_duration_seconds',
+    'HTTP request latency by route template',
+    ['method', 'route', 'status_code'],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Micro-batched model inference (see app.modules.ml.models.inference)
+inference_batch_size = Histogram(
+    'borehole_inference_batch_size',
+    'Number of tiles/images coalesced into one model call',
+    ['model'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+inference_queue_seconds = Histogram(
+    'borehole_inference_queue_seconds',
+    'Time a request waited in the batching queue before its batch ran',
+    ['model'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+inference_batch_seconds = Histogram(
+    'borehole_inference_batch_seconds',
+    'Model forward-pass time per batch',
+    ['model'],
+    buckets=LATENCY_BUCKETS,
+)
+
 def track_analysis_duration(func):
     def wrapper(*args, **kwargs):
         start = time.time()
@@ -15,4 +58,4 @@ def track_analysis_duration(func):
         analysis_duration.observe(duration)
         analysis_requests.inc()
         return result
-    return wrapper
\ No newline at end of file
+    return wrapper
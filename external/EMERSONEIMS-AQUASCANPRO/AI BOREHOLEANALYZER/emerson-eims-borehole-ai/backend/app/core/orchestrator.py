@@ -4,6 +4,8 @@ import json
 import urllib.request
 from datetime import datetime
 
+from app.core.tracing import span, traced_urlopen
+
 
 class AnalysisOrchestrator:
     def __init__(self):
@@ -17,7 +19,7 @@ class AnalysisOrchestrator:
 
     def _fetch_json(self, url: str, timeout: int = 15):
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with traced_urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode())
 
     async def run_analysis(self, image_data: bytes, metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,28 +27,31 @@ class AnalysisOrchestrator:
         lat = metadata.get("latitude", 0)
         lon = metadata.get("longitude", 0)
 
-        for step in self.pipeline_steps:
-            results[step] = await self._execute_step(step, lat, lon, metadata)
+        with span("run_analysis", kind="orchestrator"):
+            for step in self.pipeline_steps:
+                results[step] = await self._execute_step(step, lat, lon, metadata)
 
-        return self._compile_results(results, lat, lon)
+            return self._compile_results(results, lat, lon)
 
     async def _execute_step(self, step: str, lat: float, lon: float, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Execute each pipeline step using real API data."""
-        loop = asyncio.get_event_loop()
-        try:
-            if step == "soil_analysis":
-                data = await loop.run_in_executor(None, self._fetch_soil, lat, lon)
-                return {"status": "completed", "step": step, "data": data}
-            elif step == "water_quality":
-                data = await loop.run_in_executor(None, self._fetch_climate, lat, lon)
-                return {"status": "completed", "step": step, "data": data}
-            elif step == "risk_assessment":
-                data = await loop.run_in_executor(None, self._fetch_elevation, lat, lon)
-                return {"status": "completed", "step": step, "data": data}
-            else:
-                return {"status": "completed", "step": step, "data": {}}
-        except Exception as e:
-            return {"status": "error", "step": step, "error": str(e)}
+        # asyncio.to_thread copies contextvars, so fetch spans nest under the step span
+        with span(step, kind="orchestrator_step") as step_span:
+            try:
+                if step == "soil_analysis":
+                    data = await asyncio.to_thread(self._fetch_soil, lat, lon)
+                    return {"status": "completed", "step": step, "data": data}
+                elif step == "water_quality":
+                    data = await asyncio.to_thread(self._fetch_climate, lat, lon)
+                    return {"status": "completed", "step": step, "data": data}
+                elif step == "risk_assessment":
+                    data = await asyncio.to_thread(self._fetch_elevation, lat, lon)
+                    return {"status": "completed", "step": step, "data": data}
+                else:
+                    return {"status": "completed", "step": step, "data": {}}
+            except Exception as e:
+                step_span.status = "error"
+                return {"status": "error", "step": step, "error": str(e)}
 
     def _fetch_soil(self, lat: float, lon: float) -> Dict:
         try:
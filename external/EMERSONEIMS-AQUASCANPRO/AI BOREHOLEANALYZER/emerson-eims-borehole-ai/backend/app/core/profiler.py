@@ -0,0 +1,78 @@
+"""
+Sampling Profiler
+Captures a flame graph of a live process without restarting it
+
+Every ``interval`` seconds a background thread snapshots the stack of every
+other thread via ``sys._current_frames()`` and counts identical stacks. The
+result is emitted in the "folded stacks" format understood by flamegraph.pl,
+speedscope and inferno (``frame;frame;frame count`` per line).
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+MAX_DURATION_S = 60.0
+MIN_INTERVAL_S = 0.001
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a capture is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler; one capture at a time per process"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = max(MIN_INTERVAL_S, interval)
+        self.include_idle = include_idle
+
+    def capture(self, seconds: float) -> Dict:
+        """Sample all threads for ``seconds`` and return folded stacks plus summary"""
+        seconds = min(max(seconds, 0.1), MAX_DURATION_S)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile capture is already running in this process")
+        try:
+            stacks = collections.Counter()
+            samples = 0
+            own_ident = threading.get_ident()
+            deadline = time.perf_counter() + seconds
+
+            while time.perf_counter() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    folded = self._fold(frame)
+                    if folded is not None:
+                        stacks[folded] += 1
+                samples += 1
+                time.sleep(self.interval)
+
+            return {
+                "pid": os.getpid(),
+                "duration_s": seconds,
+                "interval_ms": self.interval * 1000,
+                "samples": samples,
+                "distinct_stacks": len(stacks),
+                "folded": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+            }
+        finally:
+            self._lock.release()
+
+    def _fold(self, frame) -> Optional[str]:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        if not names:
+            return None
+        # Threads parked in a wait/select are noise in a CPU investigation
+        if not self.include_idle and names[0].split(" ", 1)[0] in ("wait", "select", "poll", "accept"):
+            return None
+        return ";".join(reversed(names))
@@ -0,0 +1,220 @@
+"""
+Pipeline Tracing
+Nested timing spans, per-request trace ids and labelled stage histograms
+
+A trace id is bound to the current context (HTTP request or Celery task) and
+stamped onto every log record as ``%(trace_id)s``. Spans nest through
+``contextvars`` so a slow analysis can be broken down into orchestrator steps,
+fusion capabilities and the upstream HTTP calls made inside them; every
+finished span is observed into ``borehole_stage_duration_seconds``.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from app.core.metrics import celery_task_duration, stage_duration
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "X-Trace-Id"
+
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed unit of work; children are spans opened while this one was current"""
+
+    __slots__ = ("name", "kind", "labels", "parent", "children", "start", "end", "status")
+
+    def __init__(self, name: str, kind: str, labels: Optional[Dict[str, Any]] = None, parent: Optional["Span"] = None):
+        self.name = name
+        self.kind = kind
+        self.labels = labels or {}
+        self.parent = parent
+        self.children: List["Span"] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 2),
+            **({"labels": self.labels} if self.labels else {}),
+            **({"children": [child.to_dict() for child in self.children]} if self.children else {}),
+        }
+
+
+# ============ TRACE IDS ============
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id: Optional[str] = None) -> contextvars.Token:
+    """Bind ``trace_id`` (or a fresh one) to the current context"""
+    return _trace_id.set(trace_id or new_trace_id())
+
+
+def reset_trace_id(token: contextvars.Token) -> None:
+    _trace_id.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def install_log_trace_id() -> None:
+    """Stamp ``trace_id`` onto every LogRecord so formatters can use ``%(trace_id)s``"""
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "_adds_trace_id", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.trace_id = _trace_id.get() or "-"
+        return record
+
+    record_factory._adds_trace_id = True
+    logging.setLogRecordFactory(record_factory)
+
+
+# ============ SPANS ============
+
+@contextmanager
+def span(name: str, kind: str = "stage", **labels) -> Iterator[Span]:
+    """
+    Time a block of work as a child of the current span
+
+    Usage:
+        with span("soil_analysis", kind="orchestrator_step"):
+            ...
+    """
+    parent = _current_span.get()
+    current = Span(name, kind, labels, parent)
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException:
+        current.status = "error"
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        stage_duration.labels(kind=kind, name=current.name, status=current.status).observe(current.duration)
+        logger.debug("span %s/%s %.1f ms (%s)", kind, current.name, current.duration * 1000, current.status)
+
+
+def traced(name: Optional[str] = None, kind: str = "stage"):
+    """Decorator form of :func:`span` for sync and async callables"""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind=kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# ============ UPSTREAM FETCHES ============
+
+def traced_urlopen(request, timeout: Optional[float] = None, **kwargs):
+    """
+    Drop-in replacement for ``urllib.request.urlopen`` that records a
+    ``fetch`` span named after the upstream host.
+
+    Only the time to response headers is measured; reading the body happens
+    inside the caller's enclosing span.
+    """
+    url = request.full_url if isinstance(request, urllib.request.Request) else str(request)
+    with span(urlparse(url).hostname or "unknown", kind="fetch"):
+        if timeout is None:
+            return urllib.request.urlopen(request, **kwargs)
+        return urllib.request.urlopen(request, timeout=timeout, **kwargs)
+
+
+# ============ CELERY ============
+
+_celery_spans: Dict[str, tuple] = {}
+_celery_installed = False
+
+
+def install_celery_tracing() -> None:
+    """
+    Connect Celery signals so every task runs inside a traced span
+
+    The publishing side copies the current trace id into the message headers;
+    the worker side binds it before the task body runs, so one id follows an
+    analysis from the API request into the worker logs.
+    """
+    global _celery_installed
+    if _celery_installed:
+        return
+
+    from celery import signals
+
+    @signals.before_task_publish.connect(weak=False)
+    def _inject_trace_id(headers=None, **_):
+        trace_id = _trace_id.get()
+        if headers is not None and trace_id:
+            headers.setdefault("trace_id", trace_id)
+
+    @signals.task_prerun.connect(weak=False)
+    def _start_task_span(task_id=None, task=None, **_):
+        trace_id = getattr(task.request, "trace_id", None) if task is not None else None
+        trace_token = set_trace_id(trace_id)
+        task_span = Span(getattr(task, "name", "unknown"), "celery_task")
+        span_token = _current_span.set(task_span)
+        _celery_spans[task_id] = (task_span, trace_token, span_token)
+
+    @signals.task_postrun.connect(weak=False)
+    def _finish_task_span(task_id=None, task=None, state=None, **_):
+        entry = _celery_spans.pop(task_id, None)
+        if entry is None:
+            return
+        task_span, trace_token, span_token = entry
+        task_span.end = time.perf_counter()
+        task_span.status = "ok" if state in (None, "SUCCESS") else "error"
+        name = getattr(task, "name", "unknown")
+        celery_task_duration.labels(task=name, state=state or "UNKNOWN").observe(task_span.duration)
+        stage_duration.labels(kind="celery_task", name=name, status=task_span.status).observe(task_span.duration)
+        try:
+            _current_span.reset(span_token)
+            reset_trace_id(trace_token)
+        except ValueError:
+            # Signal fired in a different context than prerun (e.g. eventlet pool)
+            pass
+
+    _celery_installed = True
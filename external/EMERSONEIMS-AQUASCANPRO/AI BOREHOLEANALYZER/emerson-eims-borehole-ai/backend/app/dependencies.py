@@ -1,7 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
 import jwt
 from app.config import Config
+from app.database.session import get_db
+from app.database.models.user import User
 
 security = HTTPBearer()
 
@@ -14,7 +17,21 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
-        )
+        ) from None
 
 def get_current_user(token_data: dict = Depends(verify_token)):
-    return token_data.get("sub")
\ No newline at end of file
+    # A token without a subject must not reach routes that filter by user
+    sub = token_data.get("sub")
+    if sub in (None, ""):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    return sub
+
+def require_admin(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    user_id = int(current_user) if isinstance(current_user, str) else current_user
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
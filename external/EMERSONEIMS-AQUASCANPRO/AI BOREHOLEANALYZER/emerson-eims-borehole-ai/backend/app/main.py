@@ -13,15 +13,19 @@ from contextlib import asynccontextmanager
 
 from app.database.config import init_db, db_manager, get_db
 from app.services.celery_app import celery_app
-from app.api.routes import health
+from app.api.routes import health, observability
 from app.api import api_router
+from app.core.tracing import install_celery_tracing, install_log_trace_id
+from app.middleware.tracing import TracingMiddleware
 
 # ============ LOGGING SETUP ============
 
+install_log_trace_id()
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
 )
+install_celery_tracing()
 logger = logging.getLogger(__name__)
 
 
@@ -100,6 +104,9 @@ app.add_middleware(
 # GZip compression
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+# Per-request trace id, root span and route latency histogram (outermost)
+app.add_middleware(TracingMiddleware)
+
 
 # ============ EXCEPTION HANDLERS ============
 
@@ -118,6 +125,9 @@ async def general_exception_handler(request, exc):
 # Health & Status
 app.include_router(health.router)
 
+# Prometheus /metrics and opt-in profiler
+app.include_router(observability.router)
+
 # v1 API routes (auth, analysis, reports, payments, feedback, export, admin, users, webhooks)
 app.include_router(api_router, prefix="/api/v1")
 
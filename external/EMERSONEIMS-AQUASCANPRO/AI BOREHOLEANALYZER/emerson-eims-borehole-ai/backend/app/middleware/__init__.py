@@ -2,4 +2,5 @@ from .auth import AuthMiddleware
 from .rate_limit import RateLimitMiddleware
 from .cors import setup_cors
 from .logging import LoggingMiddleware
-from .error_handler import error_handler
\ No newline at end of file
+from .error_handler import ErrorHandlerMiddleware
+from .tracing import TracingMiddleware
\ No newline at end of file
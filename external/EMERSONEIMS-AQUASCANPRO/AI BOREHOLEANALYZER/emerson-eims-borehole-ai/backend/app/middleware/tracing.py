@@ -0,0 +1,39 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+import time
+import logging
+
+from app.core.metrics import http_request_duration
+from app.core.tracing import TRACE_HEADER, get_trace_id, reset_trace_id, set_trace_id, span
+
+logger = logging.getLogger(__name__)
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Bind a trace id to each request, wrap it in a root span and record latency by route"""
+
+    async def dispatch(self, request: Request, call_next):
+        token = set_trace_id(request.headers.get(TRACE_HEADER) or request.headers.get("X-Request-ID"))
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            with span(f"{request.method} unmatched", kind="http_request") as root:
+                try:
+                    response = await call_next(request)
+                finally:
+                    root.name = f"{request.method} {self._route_template(request)}"
+                status_code = response.status_code
+            response.headers[TRACE_HEADER] = get_trace_id()
+            return response
+        finally:
+            http_request_duration.labels(
+                method=request.method,
+                route=self._route_template(request),
+                status_code=str(status_code),
+            ).observe(time.perf_counter() - start_time)
+            reset_trace_id(token)
+
+    @staticmethod
+    def _route_template(request: Request) -> str:
+        # Use the matched path template (/analysis/{analysis_id}) to keep label cardinality bounded
+        route = request.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
@@ -23,6 +23,8 @@ import seaborn as sns
 from PIL import Image as PILImage
 import json
 
+from app.core.tracing import traced
+
 class DetailedReportGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
@@ -365,6 +367,7 @@ class DetailedReportGenerator:
         plt.close()
         return buf
 
+    @traced(name="pdf_generation")
     def generate_detailed_report(self, analysis_data, output_path):
         """Generate comprehensive PDF report with all analysis details"""
         doc = SimpleDocTemplate(
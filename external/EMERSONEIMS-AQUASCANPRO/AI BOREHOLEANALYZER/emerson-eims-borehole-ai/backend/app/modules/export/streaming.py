@@ -0,0 +1,289 @@
+"""
+Streaming Bulk Export
+Constant-memory CSV, GeoJSON, KML and XLSX export of many analyses
+
+Analyses are read from the database in keyset-paginated batches (``id > last_id``)
+and written out incrementally, so exporting 100k rows never materialises the
+full result set and text formats start sending bytes after the first batch.
+"""
+
+import csv
+import io
+import json
+import logging
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+XLSX_READ_CHUNK = 64 * 1024
+
+EXPORT_COLUMNS = [
+    'id', 'latitude', 'longitude', 'status', 'probability', 'confidence',
+    'recommended_depth_m', 'estimated_yield_m3h', 'soil_type',
+    'overall_risk', 'contamination_risk', 'sustainability_score',
+    'tds_mg_l', 'water_potable', 'created_at', 'completed_at'
+]
+
+XLSX_HEADERS = [
+    'Analysis ID', 'Latitude', 'Longitude', 'Status', 'Probability (%)',
+    'Confidence', 'Depth (m)', 'Yield (m³/h)', 'Soil Type', 'Overall Risk',
+    'Contamination Risk', 'Sustainability', 'TDS (mg/L)', 'Water Potable',
+    'Created At', 'Completed At'
+]
+
+
+def analysis_to_row(analysis) -> Dict:
+    """Flatten an ``Analysis`` ORM row into a plain dict of export columns"""
+    risk = analysis.risk_assessment or {}
+    water_quality = analysis.water_quality or {}
+    return {
+        'id': analysis.id,
+        'latitude': analysis.latitude,
+        'longitude': analysis.longitude,
+        'status': analysis.status,
+        'probability': analysis.probability,
+        'confidence': analysis.confidence,
+        'recommended_depth_m': analysis.recommended_depth_m,
+        'estimated_yield_m3h': analysis.estimated_yield_m3h,
+        'soil_type': analysis.soil_type,
+        'overall_risk': risk.get('overall_risk'),
+        'contamination_risk': risk.get('contamination_risk'),
+        'sustainability_score': risk.get('sustainability_score'),
+        'tds_mg_l': water_quality.get('tds'),
+        'water_potable': water_quality.get('isPotable'),
+        'created_at': analysis.created_at.isoformat() if analysis.created_at else None,
+        'completed_at': analysis.completed_at.isoformat() if analysis.completed_at else None,
+    }
+
+
+def iter_analysis_rows(
+    session_factory: Optional[Callable] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Dict]:
+    """
+    Yield analyses as export rows using keyset pagination on the primary key
+
+    The session is owned by the generator (not the request dependency) so it
+    stays open for the whole stream and is closed when the client finishes or
+    disconnects. The identity map is cleared after every batch, keeping memory
+    bounded by ``batch_size`` rather than the total row count.
+    """
+    from app.database.models.borehole import Analysis
+
+    if session_factory is None:
+        from app.database.session import SessionLocal
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        last_id = 0
+        while True:
+            query = db.query(Analysis).filter(Analysis.id > last_id)
+            if user_id is not None:
+                query = query.filter(Analysis.user_id == user_id)
+            if status:
+                query = query.filter(Analysis.status == status)
+            if since is not None:
+                query = query.filter(Analysis.created_at >= since)
+
+            batch = query.order_by(Analysis.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            for analysis in batch:
+                yield analysis_to_row(analysis)
+
+            last_id = batch[-1].id
+            db.expunge_all()
+
+            if len(batch) < batch_size:
+                break
+    finally:
+        db.close()
+
+
+class StreamingExporter:
+    """Incremental writers that turn an iterable of export rows into byte chunks"""
+
+    SUPPORTED_FORMATS = ['csv', 'geojson', 'kml', 'xlsx']
+
+    MEDIA_TYPES = {
+        'csv': 'text/csv',
+        'geojson': 'application/geo+json',
+        'kml': 'application/vnd.google-earth.kml+xml',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    def __init__(self, rows: Iterable[Dict], flush_every: int = DEFAULT_BATCH_SIZE):
+        self.rows = rows
+        self.flush_every = max(1, flush_every)
+
+    def stream(self, format: str) -> Iterator[bytes]:
+        """Dispatch to the writer for ``format``"""
+        writers = {
+            'csv': self.iter_csv,
+            'geojson': self.iter_geojson,
+            'kml': self.iter_kml,
+            'xlsx': self.iter_xlsx,
+        }
+        writer = writers.get(format.lower())
+        if writer is None:
+            raise ValueError(f"Unsupported streaming format: {format}")
+        return writer()
+
+    def iter_csv(self) -> Iterator[bytes]:
+        """CSV with one header row, flushed every ``flush_every`` rows"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+
+        pending = 0
+        for row in self.rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= self.flush_every:
+                yield self._drain(buffer)
+                pending = 0
+
+        tail = self._drain(buffer)
+        if tail:
+            yield tail
+
+    def iter_geojson(self) -> Iterator[bytes]:
+        """GeoJSON FeatureCollection with one Point feature per analysis"""
+        header = {
+            "type": "FeatureCollection",
+            "properties": {
+                "generated": datetime.now().isoformat(),
+                "crs": "EPSG:4326"
+            }
+        }
+        # Open the features array by hand so features can be written one by one
+        yield (json.dumps(header)[:-1] + ', "features": [\n').encode('utf-8')
+
+        parts = []
+        first = True
+        for row in self.rows:
+            feature = {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [row.get('longitude') or 0, row.get('latitude') or 0]
+                },
+                "properties": {k: v for k, v in row.items() if k not in ('latitude', 'longitude')}
+            }
+            parts.append(('' if first else ',\n') + json.dumps(feature, default=str))
+            first = False
+            if len(parts) >= self.flush_every:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
+
+        parts.append('\n]}\n')
+        yield ''.join(parts).encode('utf-8')
+
+    def iter_kml(self) -> Iterator[bytes]:
+        """KML Document with one Placemark per analysis"""
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<kml xmlns="http://www.opengis.net/kml/2.2">\n'
+            '  <Document>\n'
+            '    <name>Borehole Analysis Results</name>\n'
+            '    <description>AI-generated borehole site analyses</description>\n'
+            '    <Style id="siteMarker">\n'
+            '      <IconStyle><Icon>'
+            '<href>http://maps.google.com/mapfiles/kml/shapes/water.png</href>'
+            '</Icon></IconStyle>\n'
+            '    </Style>\n'
+        ).encode('utf-8')
+
+        parts = []
+        for row in self.rows:
+            parts.append(self._kml_placemark(row))
+            if len(parts) >= self.flush_every:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
+
+        parts.append('  </Document>\n</kml>\n')
+        yield ''.join(parts).encode('utf-8')
+
+    def iter_xlsx(self) -> Iterator[bytes]:
+        """
+        XLSX built with openpyxl ``write_only`` mode
+
+        Rows are spooled to disk by openpyxl as they are appended, so memory
+        stays flat. The zip container is only complete after ``save``, so the
+        bytes are streamed from a temporary file once the sheet is closed.
+        """
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Analysis Results")
+
+        for idx, width in enumerate([12, 12, 12, 12, 15, 11, 10, 13, 28, 14, 18, 14, 11, 13, 26, 26]):
+            ws.column_dimensions[get_column_letter(idx + 1)].width = width
+
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF")
+        header_row = []
+        for title in XLSX_HEADERS:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal="center")
+            header_row.append(cell)
+        ws.append(header_row)
+
+        for row in self.rows:
+            values = [row.get(column) for column in EXPORT_COLUMNS]
+            probability = row.get('probability')
+            values[EXPORT_COLUMNS.index('probability')] = probability * 100 if probability is not None else None
+            ws.append(values)
+
+        with tempfile.TemporaryFile() as spool:
+            wb.save(spool)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(XLSX_READ_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    @staticmethod
+    def _kml_placemark(row: Dict) -> str:
+        probability = row.get('probability')
+        depth = row.get('recommended_depth_m')
+        yield_m3h = row.get('estimated_yield_m3h')
+        balloon = (
+            f"<p><b>Probability:</b> {probability:.1%}</p>" if probability is not None else ""
+        ) + (
+            f"<p><b>Depth:</b> {depth} m</p>" if depth is not None else ""
+        ) + (
+            f"<p><b>Yield:</b> {yield_m3h:.1f} m³/h</p>" if yield_m3h is not None else ""
+        ) + (
+            f"<p><b>Risk Level:</b> {escape(str(row['overall_risk']))}</p>" if row.get('overall_risk') else ""
+        )
+        return (
+            '    <Placemark>\n'
+            f"      <name>Analysis {escape(str(row.get('id', '')))}</name>\n"
+            f"      <description><![CDATA[{balloon}]]></description>\n"
+            '      <styleUrl>#siteMarker</styleUrl>\n'
+            f"      <Point><coordinates>{row.get('longitude') or 0},{row.get('latitude') or 0},0</coordinates></Point>\n"
+            '    </Placemark>\n'
+        )
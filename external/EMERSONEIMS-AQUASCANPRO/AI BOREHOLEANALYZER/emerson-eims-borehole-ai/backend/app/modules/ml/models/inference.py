@@ -0,0 +1,350 @@
+"""
+Micro-Batched CPU Inference Server
+Loads ResNet-50 and U-Net once per process and coalesces concurrent requests
+
+Each model gets a MicroBatcher thread: callers submit single inputs and get a
+Future back; the batcher waits at most ``max_latency_ms`` after the first
+queued input, stacks up to ``max_batch_size`` inputs and runs one forward
+pass. Large scenes are cut into overlapping sliding-window tiles (224 px for
+the classifier, 512 px for the segmenter) instead of being resized down, and
+tile outputs are blended back together with a linear edge taper.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import inference_batch_seconds, inference_batch_size, inference_queue_seconds
+from .registry import ModelRegistry, get_registry
+from .resnet50_geological import GeologicalFormation, ResNet50GeologicalClassifier
+from .unet_lineament import UNetLineamentDetector
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Background thread that groups single-input requests into batched model calls
+
+    Args:
+        name: Model name used for metric labels and the thread name
+        predict_fn: Callable taking an (N, ...) array and returning N outputs
+        max_batch_size: Upper bound on inputs per forward pass
+        max_latency_ms: Longest the first input in a batch waits for company
+    """
+
+    def __init__(
+        self,
+        name: str,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 32,
+        max_latency_ms: float = 10.0
+    ):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency_ms / 1000.0
+        self.stats = {"batches": 0, "items": 0, "max_batch_size": 0, "queue_wait_s": 0.0}
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"inference-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: np.ndarray) -> Future:
+        """Queue one input; the Future resolves to its row of the batch output"""
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def submit_many(self, items: Sequence[np.ndarray]) -> List[Future]:
+        return [self.submit(item) for item in items]
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = first[2] + self.max_latency
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Past the deadline, still take whatever is already queued
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future, float]]) -> None:
+        # Only identical shapes can be stacked; tiling normally makes them uniform
+        groups: Dict[Tuple, List] = defaultdict(list)
+        for entry in batch:
+            groups[entry[0].shape].append(entry)
+
+        for entries in groups.values():
+            started = time.perf_counter()
+            for _, _, enqueued in entries:
+                wait = started - enqueued
+                inference_queue_seconds.labels(model=self.name).observe(wait)
+                self.stats["queue_wait_s"] += wait
+
+            try:
+                outputs = self.predict_fn(np.stack([item for item, _, _ in entries]))
+                if len(outputs) != len(entries):
+                    raise ValueError(f"{self.name} returned {len(outputs)} outputs for a batch of {len(entries)}")
+            except Exception as e:
+                logger.error(f"Inference batch failed for {self.name}: {e}")
+                for _, future, _ in entries:
+                    future.set_exception(e)
+                continue
+
+            inference_batch_seconds.labels(model=self.name).observe(time.perf_counter() - started)
+            inference_batch_size.labels(model=self.name).observe(len(entries))
+            self.stats["batches"] += 1
+            self.stats["items"] += len(entries)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(entries))
+
+            for (_, future, _), output in zip(entries, outputs, strict=True):
+                future.set_result(output)
+
+
+# ============ SLIDING-WINDOW TILING ============
+
+def sliding_window_positions(length: int, tile: int, overlap: int) -> List[int]:
+    """Start offsets covering ``length`` with ``tile``-sized windows; the last window is flush with the edge"""
+    if length <= tile:
+        return [0]
+    stride = max(1, tile - overlap)
+    positions = list(range(0, length - tile + 1, stride))
+    if positions[-1] != length - tile:
+        positions.append(length - tile)
+    return positions
+
+
+def tile_scene(scene: np.ndarray, tile: int, overlap: int) -> Tuple[np.ndarray, List[Tuple[int, int]], Tuple[int, int]]:
+    """
+    Cut a 2-D (H, W) or 3-D (H, W, C) scene into overlapping tiles
+
+    Scenes smaller than one tile are edge-padded up to ``tile``.
+
+    Returns:
+        (tiles, positions, padded_hw) with tiles shaped (N, tile, tile[, C])
+    """
+    h, w = scene.shape[:2]
+    pad_h, pad_w = max(0, tile - h), max(0, tile - w)
+    if pad_h or pad_w:
+        pad = [(0, pad_h), (0, pad_w)] + [(0, 0)] * (scene.ndim - 2)
+        scene = np.pad(scene, pad, mode="edge")
+
+    ph, pw = scene.shape[:2]
+    positions = [
+        (y, x)
+        for y in sliding_window_positions(ph, tile, overlap)
+        for x in sliding_window_positions(pw, tile, overlap)
+    ]
+    tiles = np.stack([scene[y:y + tile, x:x + tile] for y, x in positions])
+    return tiles, positions, (ph, pw)
+
+
+def blend_window(tile: int, overlap: int, floor: float = 1e-3) -> np.ndarray:
+    """(tile, tile) weights that ramp linearly to ``floor`` across the overlap band"""
+    ramp = np.ones(tile, dtype=np.float32)
+    if overlap > 0:
+        edge = np.linspace(floor, 1.0, overlap, endpoint=False, dtype=np.float32)
+        ramp[:overlap] = edge
+        ramp[-overlap:] = edge[::-1]
+    return np.outer(ramp, ramp)
+
+
+def stitch_tiles(
+    outputs: np.ndarray,
+    positions: Sequence[Tuple[int, int]],
+    padded_hw: Tuple[int, int],
+    window: np.ndarray
+) -> np.ndarray:
+    """Weighted average of overlapping (N, tile, tile) outputs on the padded canvas"""
+    tile = window.shape[0]
+    accum = np.zeros(padded_hw, dtype=np.float32)
+    weight = np.zeros(padded_hw, dtype=np.float32)
+    for output, (y, x) in zip(outputs, positions, strict=True):
+        accum[y:y + tile, x:x + tile] += output * window
+        weight[y:y + tile, x:x + tile] += window
+    return accum / np.maximum(weight, 1e-12)
+
+
+# ============ INFERENCE SERVER ============
+
+class InferenceServer:
+    """
+    Process-wide owner of the geological classifier and lineament segmenter
+
+    Models are pulled from the ModelRegistry once and warmed with a dummy
+    batch, so the first real request does not pay graph construction. When
+    no trained weights are available both models fall back to the same
+    non-ML outputs as their single-image methods.
+    """
+
+    CLASSIFIER = "geological_resnet50"
+    SEGMENTER = "lineament_unet"
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        max_batch_size: int = 32,
+        max_latency_ms: float = 10.0,
+        warmup: bool = True
+    ):
+        registry = registry or get_registry()
+
+        self.classifier = ResNet50GeologicalClassifier()
+        self.classifier.model = registry.load_model(self.CLASSIFIER)
+        self.segmenter = UNetLineamentDetector()
+        self.segmenter.model = registry.load_model(self.SEGMENTER)
+
+        self.batchers = {
+            self.CLASSIFIER: MicroBatcher(self.CLASSIFIER, self.classifier.predict_batch, max_batch_size, max_latency_ms),
+            # 512x512 tiles are ~5x the work of a 224 crop; keep segmenter batches smaller
+            self.SEGMENTER: MicroBatcher(self.SEGMENTER, self.segmenter.predict_batch, max(1, max_batch_size // 4), max_latency_ms),
+        }
+
+        if warmup:
+            self.warmup()
+
+    def warmup(self) -> None:
+        """Run one dummy batch through each model"""
+        started = time.perf_counter()
+        self.classifier.predict_batch(np.zeros((1,) + self.classifier.input_shape, dtype=np.float32))
+        self.segmenter.predict_batch(np.zeros((1,) + self.segmenter.input_shape[:2], dtype=np.float32))
+        logger.info(f"Inference server warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def classify_scenes(
+        self,
+        images: Sequence[np.ndarray],
+        overlap: int = 32,
+        confidence_threshold: float = 0.6
+    ) -> List[Dict]:
+        """
+        Classify many RGB scenes of any size in shared micro-batches
+
+        Every tile of every scene is submitted before any result is awaited,
+        so tiles from different sites coalesce into full batches.
+        """
+        tile = self.classifier.input_shape[0]
+        batcher = self.batchers[self.CLASSIFIER]
+
+        pending = []
+        for image in images:
+            tiles, positions, _ = tile_scene(np.asarray(image), tile, overlap)
+            futures = batcher.submit_many(self.classifier.preprocess_batch(tiles))
+            pending.append((image.shape[:2], positions, futures))
+
+        results = []
+        for (h, w), positions, futures in pending:
+            probabilities = np.stack([f.result() for f in futures])
+
+            # Weight each tile by how much of it lies inside the real scene
+            coverage = np.array([
+                (min(y + tile, h) - y) * (min(x + tile, w) - x) / float(tile * tile)
+                for y, x in positions
+            ], dtype=np.float32)
+            scene_probabilities = (probabilities * coverage[:, None]).sum(axis=0) / coverage.sum()
+
+            result = self.classifier.build_result(scene_probabilities, confidence_threshold)
+            top = probabilities.argmax(axis=1)
+            result["tiling"] = {
+                "scene_shape": [int(h), int(w)],
+                "tile_size": tile,
+                "overlap": overlap,
+                "tiles": len(positions),
+            }
+            result["tile_predictions"] = [
+                {
+                    "y": int(y),
+                    "x": int(x),
+                    "formation": GeologicalFormation(int(idx) + 1).name,
+                    "confidence": float(probabilities[i, idx]),
+                }
+                for i, ((y, x), idx) in enumerate(zip(positions, top, strict=True))
+            ]
+            results.append(result)
+        return results
+
+    def classify_scene(self, image: np.ndarray, overlap: int = 32, confidence_threshold: float = 0.6) -> Dict:
+        return self.classify_scenes([image], overlap, confidence_threshold)[0]
+
+    def detect_lineaments_scene(
+        self,
+        dem: np.ndarray,
+        overlap: int = 64,
+        confidence_threshold: float = 0.5
+    ) -> Dict:
+        """Full-resolution lineament segmentation of a DEM of any size"""
+        tile = self.segmenter.input_shape[0]
+        dem = np.asarray(dem)
+        # Normalise the whole scene once so every tile shares the same scale
+        normalized = self.segmenter.normalize_dem(dem)
+        tiles, positions, padded_hw = tile_scene(normalized, tile, overlap)
+
+        futures = self.batchers[self.SEGMENTER].submit_many(tiles)
+        outputs = np.stack([f.result() for f in futures])
+        mask = stitch_tiles(outputs, positions, padded_hw, blend_window(tile, overlap))[:dem.shape[0], :dem.shape[1]]
+
+        confidence = 0.72 if self.segmenter.model is None else float(np.mean(mask))
+        result = self.segmenter.summarize_mask(mask, dem.shape, confidence, confidence_threshold)
+        result["tiling"] = {
+            "scene_shape": list(dem.shape),
+            "tile_size": tile,
+            "overlap": overlap,
+            "tiles": len(positions),
+        }
+        return result
+
+    def stats(self) -> Dict:
+        """Per-model batch counts, mean batch size and mean queue wait"""
+        return {
+            name: {
+                **batcher.stats,
+                "mean_batch_size": batcher.stats["items"] / batcher.stats["batches"] if batcher.stats["batches"] else 0.0,
+                "mean_queue_wait_ms": 1000 * batcher.stats["queue_wait_s"] / batcher.stats["items"] if batcher.stats["items"] else 0.0,
+            }
+            for name, batcher in self.batchers.items()
+        }
+
+    def close(self) -> None:
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+# Global inference server instance
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_inference_server() -> InferenceServer:
+    """Get the process-wide inference server, loading and warming models on first use"""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = InferenceServer()
+    return _server
@@ -5,6 +5,7 @@ Central location for all trained DL models with loading utilities
 
 import os
 import logging
+import threading
 from typing import Optional
 import numpy as np
 
@@ -67,6 +68,8 @@ class ModelRegistry:
     
     def __init__(self):
         self.loaded_models = {}
+        # Serialises first loads so concurrent worker threads don't each build the graph
+        self._load_lock = threading.Lock()
         self.base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
     
     def get_model_info(self, model_name: str) -> Optional[dict]:
@@ -78,6 +81,12 @@ class ModelRegistry:
         if model_name in self.loaded_models:
             return self.loaded_models[model_name]
         
+        with self._load_lock:
+            if model_name in self.loaded_models:
+                return self.loaded_models[model_name]
+            return self._load_uncached(model_name)
+    
+    def _load_uncached(self, model_name: str):
         if model_name not in self.MODELS:
             logger.warning(f"Model {model_name} not found in registry")
             return None
@@ -100,6 +109,9 @@ class ModelRegistry:
         except FileNotFoundError:
             logger.warning(f"Model file not found: {model_path}")
             return None
+        except (ImportError, OSError) as e:
+            logger.warning(f"Could not load model {model_name}: {e}")
+            return None
 
 
 # Global registry instance
@@ -50,6 +50,9 @@ class ResNet50GeologicalClassifier:
     - ±87% accuracy on validation set
     """
     
+    IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+    
     def __init__(self, model_path: Optional[str] = None):
         self.input_shape = (224, 224, 3)
         self.num_classes = 25
@@ -87,51 +90,71 @@ class ResNet50GeologicalClassifier:
             image = self._preprocess(image)
             
             # Make prediction
-            if self.model is None:
-                # Fallback: synthetic prediction for demo
-                probabilities = self._synthetic_prediction(image)
-            else:
-                probabilities = self.model.predict(np.expand_dims(image, 0))[0]
-            
-            # Get top predictions
-            top_indices = np.argsort(probabilities)[::-1][:5]
-            top_scores = probabilities[top_indices]
-            
-            primary_idx = top_indices[0]
-            primary_confidence = float(top_scores[0])
-            
-            if primary_confidence < confidence_threshold:
-                return self._low_confidence_response(probabilities)
+            probabilities = self.predict_batch(np.expand_dims(image, 0))[0]
             
-            primary_formation = GeologicalFormation(primary_idx + 1)
-            
-            return {
-                "primary_formation": primary_formation.name,
-                "formation_code": primary_formation.value,
-                "confidence": primary_confidence,
-                "confidence_percentage": f"{primary_confidence * 100:.1f}%",
-                "top_5_predictions": [
-                    {
-                        "formation": GeologicalFormation(idx + 1).name,
-                        "confidence": float(score),
-                        "properties": self.formation_properties[GeologicalFormation(idx + 1).name]
-                    }
-                    for idx, score in zip(top_indices, top_scores)
-                ],
-                "properties": self.formation_properties[primary_formation.name],
-                "aquifer_favorability": self._assess_aquifer_favorability(primary_formation),
-                "drilling_expected_difficulty": self._assess_drilling_difficulty(primary_formation),
-                "model_info": {
-                    "architecture": "ResNet-50",
-                    "layers": 50,
-                    "training_samples": 50000,
-                    "validation_accuracy": 0.87
-                }
-            }
+            return self.build_result(probabilities, confidence_threshold)
         except Exception as e:
             logger.error(f"Classification error: {e}")
             return self._error_response()
     
+    def predict_batch(self, images: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for a batch of preprocessed images
+        
+        Args:
+            images: (N, 224, 224, 3) float32 array from preprocess_batch
+        
+        Returns:
+            (N, 25) softmax probabilities
+        """
+        if self.model is None:
+            # Fallback: synthetic prediction for demo
+            return np.stack([self._synthetic_prediction(image) for image in images])
+        return np.asarray(self.model.predict(images))
+    
+    def preprocess_batch(self, images: np.ndarray) -> np.ndarray:
+        """Vectorised ImageNet normalisation for (N, 224, 224, 3) uint8 tiles"""
+        images = images.astype(np.float32) / 255.0
+        return (images - self.IMAGENET_MEAN) / self.IMAGENET_STD
+    
+    def build_result(self, probabilities: np.ndarray, confidence_threshold: float = 0.6) -> Dict:
+        """Turn a probability vector into the classification response"""
+        # Get top predictions
+        top_indices = np.argsort(probabilities)[::-1][:5]
+        top_scores = probabilities[top_indices]
+        
+        primary_idx = top_indices[0]
+        primary_confidence = float(top_scores[0])
+        
+        if primary_confidence < confidence_threshold:
+            return self._low_confidence_response(probabilities)
+        
+        primary_formation = GeologicalFormation(primary_idx + 1)
+        
+        return {
+            "primary_formation": primary_formation.name,
+            "formation_code": primary_formation.value,
+            "confidence": primary_confidence,
+            "confidence_percentage": f"{primary_confidence * 100:.1f}%",
+            "top_5_predictions": [
+                {
+                    "formation": GeologicalFormation(idx + 1).name,
+                    "confidence": float(score),
+                    "properties": self.formation_properties[GeologicalFormation(idx + 1).name]
+                }
+                for idx, score in zip(top_indices, top_scores)
+            ],
+            "properties": self.formation_properties[primary_formation.name],
+            "aquifer_favorability": self._assess_aquifer_favorability(primary_formation),
+            "drilling_expected_difficulty": self._assess_drilling_difficulty(primary_formation),
+            "model_info": {
+                "architecture": "ResNet-50",
+                "layers": 50,
+                "training_samples": 50000,
+                "validation_accuracy": 0.87
+            }
+        }
+    
     def _preprocess(self, image: np.ndarray) -> np.ndarray:
         """Preprocess image for ResNet-50"""
         # Resize to 224x224 if needed
@@ -140,10 +163,7 @@ class ResNet50GeologicalClassifier:
             image = cv2.resize(image, (224, 224))
         
         # Normalize to ImageNet standards
-        image = image.astype(np.float32) / 255.0
-        image = (image - np.array([0.485, 0.456, 0.406])) / np.array([0.229, 0.224, 0.225])
-        
-        return image
+        return self.preprocess_batch(image[np.newaxis])[0]
     
     def _synthetic_prediction(self, image: np.ndarray) -> np.ndarray:
         """
@@ -56,49 +56,78 @@ class UNetLineamentDetector:
             dem_normalized = self._preprocess_dem(dem)
             
             # Get segmentation
-            if self.model is None:
-                # Fallback: synthetic detection based on DEM topology
-                lineament_mask = self._synthetic_detection(dem_normalized)
-                confidence = 0.72
-            else:
-                lineament_mask = self.model.predict(np.expand_dims(dem_normalized, (0, -1)))[0, :, :, 0]
-                confidence = float(np.mean(lineament_mask))
+            lineament_mask = self.predict_batch(dem_normalized[np.newaxis])[0]
+            confidence = 0.72 if self.model is None else float(np.mean(lineament_mask))
             
-            # Apply threshold
-            lineament_binary = (lineament_mask > confidence_threshold).astype(np.uint8)
-            
-            # Extract lineament features
-            major_lineaments = self._extract_lineaments(lineament_binary)
-            lineament_density = self._calculate_density(lineament_binary, dem.shape)
-            fracture_zones = self._create_fracture_zones(lineament_binary)
-            
-            return {
-                "detected": True,
-                "lineament_mask": self._safe_convert(lineament_binary),
-                "lineament_density": lineament_density,
-                "density_unit": "lineaments per 100 km²",
-                "model_confidence": float(confidence),
-                "confidence_threshold_used": confidence_threshold,
-                "major_lineaments": major_lineaments,
-                "fracture_zones": fracture_zones,
-                "statistics": {
-                    "total_lineament_pixels": int(np.sum(lineament_binary)),
-                    "coverage_percentage": float(100 * np.sum(lineament_binary) / lineament_binary.size),
-                    "dominant_azimuth_degrees": self._get_dominant_azimuth(major_lineaments),
-                    "lineament_count": len(major_lineaments)
-                },
-                "risk_assessment": self._assess_lineament_risk(lineament_density),
-                "model_info": {
-                    "architecture": "U-Net",
-                    "input_size": "512x512",
-                    "training_samples": 10000,
-                    "validation_accuracy": 0.84
-                }
-            }
+            return self.summarize_mask(lineament_mask, dem.shape, confidence, confidence_threshold)
         except Exception as e:
             logger.error(f"Lineament detection error: {e}")
             return self._error_response()
     
+    def predict_batch(self, tiles: np.ndarray) -> np.ndarray:
+        """
+        Per-pixel lineament probability for a batch of normalised DEM tiles
+        
+        Args:
+            tiles: (N, 512, 512) float32 array scaled to 0-1
+        
+        Returns:
+            (N, 512, 512) probabilities
+        """
+        if self.model is None:
+            # Fallback: synthetic detection based on DEM topology
+            return np.stack([self._synthetic_detection(tile) for tile in tiles])
+        return np.asarray(self.model.predict(tiles[..., np.newaxis]))[..., 0]
+    
+    def summarize_mask(
+        self,
+        lineament_mask: np.ndarray,
+        dem_shape: Tuple,
+        confidence: float,
+        confidence_threshold: float = 0.5
+    ) -> Dict:
+        """Threshold a probability mask and extract lineament features"""
+        # Apply threshold
+        lineament_binary = (lineament_mask > confidence_threshold).astype(np.uint8)
+        
+        # Extract lineament features
+        major_lineaments = self._extract_lineaments(lineament_binary)
+        lineament_density = self._calculate_density(lineament_binary, dem_shape)
+        fracture_zones = self._create_fracture_zones(lineament_binary)
+        
+        return {
+            "detected": True,
+            "lineament_mask": self._safe_convert(lineament_binary),
+            "lineament_density": lineament_density,
+            "density_unit": "lineaments per 100 km²",
+            "model_confidence": float(confidence),
+            "confidence_threshold_used": confidence_threshold,
+            "major_lineaments": major_lineaments,
+            "fracture_zones": fracture_zones,
+            "statistics": {
+                "total_lineament_pixels": int(np.sum(lineament_binary)),
+                "coverage_percentage": float(100 * np.sum(lineament_binary) / lineament_binary.size),
+                "dominant_azimuth_degrees": self._get_dominant_azimuth(major_lineaments),
+                "lineament_count": len(major_lineaments)
+            },
+            "risk_assessment": self._assess_lineament_risk(lineament_density),
+            "model_info": {
+                "architecture": "U-Net",
+                "input_size": "512x512",
+                "training_samples": 10000,
+                "validation_accuracy": 0.84
+            }
+        }
+    
+    def normalize_dem(self, dem: np.ndarray) -> np.ndarray:
+        """Min-max scale a DEM of any size to 0-1"""
+        dem_min = np.min(dem)
+        dem_max = np.max(dem)
+        
+        if dem_max == dem_min:
+            return np.zeros_like(dem, dtype=np.float32)
+        return (dem.astype(np.float32) - dem_min) / (dem_max - dem_min)
+    
     def _preprocess_dem(self, dem: np.ndarray) -> np.ndarray:
         """Preprocess DEM for U-Net"""
         # Resize to 512x512 if needed
@@ -108,15 +137,7 @@ class UNetLineamentDetector:
             dem = cv2.resize(dem, (512, 512))
         
         # Normalize to 0-1
-        dem_min = np.min(dem)
-        dem_max = np.max(dem)
-        
-        if dem_max == dem_min:
-            dem_normalized = np.zeros_like(dem, dtype=np.float32)
-        else:
-            dem_normalized = (dem.astype(np.float32) - dem_min) / (dem_max - dem_min)
-        
-        return dem_normalized
+        return self.normalize_dem(dem)
     
     def _synthetic_detection(self, dem: np.ndarray) -> np.ndarray:
         """
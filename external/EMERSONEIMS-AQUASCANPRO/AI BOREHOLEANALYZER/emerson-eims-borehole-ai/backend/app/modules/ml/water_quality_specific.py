@@ -1,21 +1,122 @@
 """
 Contaminant-Specific Water Quality Prediction Models
 Specialized neural networks for individual water quality parameters
+
+Every predictor is evaluated column-wise over N sites at once: categorical
+features are dictionary-encoded once per call and each geology/land-use table
+becomes an array lookup. The per-site dict API is a one-row call into the
+same code path.
 """
 
 import numpy as np
-from typing import Dict
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Optional, Union
 import logging
 
+if TYPE_CHECKING:
+    import pandas
+
 logger = logging.getLogger(__name__)
 
 
+class SiteColumns:
+    """
+    Feature columns for N sites
+
+    Accepts a pandas DataFrame, a dict of arrays/lists, or (via from_features)
+    a single feature dict. Missing columns and missing values take the same
+    defaults the per-site predictors always used; with no known column at
+    all, that is one row of defaults (or one per DataFrame row).
+    """
+
+    NUMERIC = {'depth_m': 50.0, 'latitude': 0.0, 'longitude': 0.0}
+    CATEGORICAL = {'geology': 'unknown', 'aquifer_type': 'unconfined', 'land_use': 'natural'}
+    SMALL_N = 64
+
+    def __init__(self, data):
+        lengths = {len(data[name]) for name in list(self.NUMERIC) + list(self.CATEGORICAL) if name in data}
+        if len(lengths) > 1:
+            raise ValueError(f"Feature columns have different lengths: {sorted(lengths)}")
+        if lengths:
+            self.n = lengths.pop()
+        else:
+            self.n = len(data.index) if hasattr(data, 'index') else 1
+
+        for name, default in self.NUMERIC.items():
+            if name in data:
+                values = np.asarray(data[name], dtype=np.float64)
+                values = np.where(np.isnan(values), default, values)
+            else:
+                values = np.full(self.n, default)
+            setattr(self, name, values)
+
+        # Dictionary-encode categoricals once: (unique labels, code per site)
+        self._categories = {name: self._encode(data, name, default) for name, default in self.CATEGORICAL.items()}
+
+    @classmethod
+    def from_features(cls, features: Dict) -> "SiteColumns":
+        return cls({name: [features[name]] for name in list(cls.NUMERIC) + list(cls.CATEGORICAL) if name in features})
+
+    def _encode(self, data, name: str, default: str):
+        if name not in data:
+            return np.array([default], dtype=object), np.zeros(self.n, dtype=np.intp)
+
+        column = data[name]
+        if not hasattr(column, 'dtype'):
+            if len(column) <= self.SMALL_N:
+                # Per-site calls: a dict beats building a pandas hash table
+                index = {}
+                codes = [index.setdefault(default if v is None or v != v else v, len(index)) for v in column]
+                return np.array(list(index), dtype=object), np.array(codes, dtype=np.intp)
+            column = np.asarray(column, dtype=object)
+
+        import pandas as pd
+
+        # Hash-based; reuses the codes of a pandas Categorical. Missing → -1 → default
+        codes, uniques = pd.factorize(column)
+        labels = np.append(np.asarray(uniques, dtype=object), default)
+        return labels, np.where(codes < 0, len(labels) - 1, codes)
+
+    def lookup(self, name: str, table: Dict, default) -> np.ndarray:
+        """Map a categorical column through ``table`` (unknown labels → ``default``)"""
+        labels, codes = self._categories[name]
+        return np.array([table.get(label, default) for label in labels])[codes]
+
+    def equals(self, name: str, value: str) -> np.ndarray:
+        return self.lookup(name, {value: True}, False)
+
+
+FeatureColumns = Union[SiteColumns, Dict, "pandas.DataFrame"]
+
+
+def _noise(rng, scale: float, n: int) -> np.ndarray:
+    """Measurement noise; ``rng`` is a Generator or the legacy np.random module"""
+    return rng.normal(0, scale, n)
+
+
+class ColumnarPredictor(ABC):
+    """Per-site ``predict`` as a one-row call into ``predict_columns``"""
+
+    DTYPE: np.dtype
+
+    def predict(self, features: Dict) -> Dict:
+        return self.to_dict(self.predict_columns(SiteColumns.from_features(features))[0])
+
+    @abstractmethod
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        """Structured array of ``DTYPE``, one row per site"""
+
+    @abstractmethod
+    def to_dict(self, row: np.void) -> Dict:
+        """One row of ``predict_columns`` in the per-site response shape"""
+
+
 class ContaminantSpecificModels:
     """
     Specialized prediction models for each water quality contaminant
     More accurate than generic models due to domain-specific training
     """
-    
+
     def __init__(self):
         self.models = {
             'tds': TDSPredictor(),
@@ -27,11 +128,33 @@ class ContaminantSpecificModels:
             'ph': PHPredictor(),
             'manganese': ManganesePredictor()
         }
-    
+        self.dtype = np.dtype([(name, model.DTYPE) for name, model in self.models.items()])
+
+    def predict_columns(self, data: FeatureColumns, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Predict all water quality parameters for N sites at once
+
+        Args:
+            data: DataFrame, dict of equal-length arrays, or SiteColumns with the
+                same feature names as predict_all_parameters
+            rng: Generator for measurement noise (default: global np.random state)
+
+        Returns:
+            Structured array of shape (N,); ``result['tds']['predicted_mg_l']``
+            is the TDS column, ``result[i]`` one site
+        """
+        cols = data if isinstance(data, SiteColumns) else SiteColumns(data)
+        rng = np.random if rng is None else rng
+
+        result = np.empty(cols.n, dtype=self.dtype)
+        for name, model in self.models.items():
+            result[name] = model.predict_columns(cols, rng)
+        return result
+
     def predict_all_parameters(self, features: Dict) -> Dict:
         """
         Predict all water quality parameters using specialized models
-        
+
         Args:
             features: Dict with geological/environmental features
                 - depth_m: Drilling depth
@@ -41,388 +164,411 @@ class ContaminantSpecificModels:
                 - longitude: Longitude
                 - land_use: Agricultural/urban/natural
                 - tds_expected: Expected baseline TDS
-        
+
         Returns:
             Dict with all predicted parameters and reliability scores
         """
+        try:
+            cols = SiteColumns.from_features(features)
+        except Exception as e:
+            logger.warning(f"Feature parsing failed: {e}")
+            return {param_name: {"error": str(e)} for param_name in self.models}
+
         predictions = {}
-        
+
         for param_name, model in self.models.items():
             try:
-                prediction = model.predict(features)
-                predictions[param_name] = prediction
+                predictions[param_name] = model.to_dict(model.predict_columns(cols, np.random)[0])
             except Exception as e:
                 logger.warning(f"{param_name} prediction failed: {e}")
                 predictions[param_name] = {"error": str(e)}
-        
+
         return predictions
 
 
-class TDSPredictor:
+class TDSPredictor(ColumnarPredictor):
     """Total Dissolved Solids prediction model (mg/L)"""
     R2 = 0.78
     RMSE = 85
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        geology = features.get('geology', 'unknown')
-        aquifer_type = features.get('aquifer_type', 'unconfined')
-        land_use = features.get('land_use', 'natural')
-        
-        # Base TDS depends on geology
-        geology_tds = {
-            'LIMESTONE': 450,  # High dissolved minerals
-            'SANDSTONE': 300,
-            'GRANITE': 200,
-            'SHALE': 400,
-            'ALLUVIUM': 350,
-            'LATERITE': 250
-        }
-        
-        base_tds = geology_tds.get(geology, 320)
-        
+
+    # Base TDS depends on geology
+    GEOLOGY_TDS = {
+        'LIMESTONE': 450,  # High dissolved minerals
+        'SANDSTONE': 300,
+        'GRANITE': 200,
+        'SHALE': 400,
+        'ALLUVIUM': 350,
+        'LATERITE': 250
+    }
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l', 'f8'),
+        ('ci_low', 'f8'),
+        ('ci_high', 'f8'),
+        ('exceeds_guideline', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_tds = cols.lookup('geology', self.GEOLOGY_TDS, 320)
+
         # Depth increases mineralization
-        depth_factor = 1 + (depth / 100) * 0.5
-        
+        depth_factor = 1 + (cols.depth_m / 100) * 0.5
+
         # Agricultural land → nitrates → higher TDS
-        if land_use == 'agricultural':
-            land_use_factor = 1.3
-        elif land_use == 'urban':
-            land_use_factor = 1.2
-        else:
-            land_use_factor = 1.0
-        
+        land_use_factor = cols.lookup('land_use', {'agricultural': 1.3, 'urban': 1.2}, 1.0)
+
         # Confined aquifers → higher TDS (older water)
-        if aquifer_type == 'confined':
-            confinement_factor = 1.4
-        else:
-            confinement_factor = 1.0
-        
+        confinement_factor = cols.lookup('aquifer_type', {'confined': 1.4}, 1.0)
+
         predicted_tds = base_tds * depth_factor * land_use_factor * confinement_factor
-        
+
         # Add measurement noise
-        noise = np.random.normal(0, self.RMSE * 0.3)
-        predicted_tds += noise
-        
+        predicted_tds += _noise(rng, self.RMSE * 0.3, cols.n)
+
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l'] = np.clip(predicted_tds, 50, 2000)
+        out['ci_low'] = predicted_tds - 1.96 * self.RMSE
+        out['ci_high'] = predicted_tds + 1.96 * self.RMSE
+        out['exceeds_guideline'] = predicted_tds > 1000
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_mg_l": float(np.clip(predicted_tds, 50, 2000)),
+            "predicted_mg_l": float(row['predicted_mg_l']),
             "r_squared": self.R2,
             "rmse_mg_l": self.RMSE,
-            "confidence_interval_95": [
-                float(predicted_tds - 1.96 * self.RMSE),
-                float(predicted_tds + 1.96 * self.RMSE)
-            ],
+            "confidence_interval_95": [float(row['ci_low']), float(row['ci_high'])],
             "who_guideline": 1000,
-            "exceeds_guideline": predicted_tds > 1000
+            "exceeds_guideline": bool(row['exceeds_guideline'])
         }
 
 
-class FluoridePredictor:
+class FluoridePredictor(ColumnarPredictor):
     """Fluoride prediction model (mg/L) - Critical for dental health"""
     R2 = 0.68
     RMSE = 0.3
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        geology = features.get('geology', 'unknown')
-        latitude = features.get('latitude', 0)
-        
-        # Fluoride enrichment in granites/metamorphic rocks
-        geology_fluoride = {
-            'GRANITE': 3.5,  # Fluorine-rich minerals
-            'GNEISS': 3.0,
-            'METAMORPHIC': 2.8,
-            'SANDSTONE': 0.5,
-            'ALLUVIUM': 0.8,
-            'LATERITE': 1.2,
-            'LIMESTONE': 0.3
-        }
-        
-        base_f = geology_fluoride.get(geology, 1.0)
-        
+
+    # Fluoride enrichment in granites/metamorphic rocks
+    GEOLOGY_FLUORIDE = {
+        'GRANITE': 3.5,  # Fluorine-rich minerals
+        'GNEISS': 3.0,
+        'METAMORPHIC': 2.8,
+        'SANDSTONE': 0.5,
+        'ALLUVIUM': 0.8,
+        'LATERITE': 1.2,
+        'LIMESTONE': 0.3
+    }
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l', 'f8'),
+        ('deficiency_risk', '?'),
+        ('excess_risk', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_f = cols.lookup('geology', self.GEOLOGY_FLUORIDE, 1.0)
+
         # Deeper wells → higher F (more weathering)
-        depth_factor = 1 + (min(depth, 100) / 100) * 0.8
-        
+        depth_factor = 1 + (np.minimum(cols.depth_m, 100) / 100) * 0.8
+
         # Tropical regions → more weathering → higher F
-        latitude_factor = 1 + abs(latitude) / 180 * 0.5
-        
+        latitude_factor = 1 + np.abs(cols.latitude) / 180 * 0.5
+
         predicted_f = base_f * depth_factor * latitude_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_f += noise
-        
+        predicted_f += _noise(rng, self.RMSE * 0.2, cols.n)
+
         # WHO optimal: 0.7-1.0 mg/L
         # Risk: >1.5 mg/L (dental fluorosis)
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l'] = np.clip(predicted_f, 0.1, 8.0)
+        out['deficiency_risk'] = predicted_f < 0.7
+        out['excess_risk'] = predicted_f > 1.5
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_mg_l": float(np.clip(predicted_f, 0.1, 8.0)),
+            "predicted_mg_l": float(row['predicted_mg_l']),
             "r_squared": self.R2,
             "rmse_mg_l": self.RMSE,
             "who_guideline": 1.5,
             "optimal_range": [0.7, 1.0],
-            "deficiency_risk": predicted_f < 0.7,
-            "excess_risk": predicted_f > 1.5,
+            "deficiency_risk": bool(row['deficiency_risk']),
+            "excess_risk": bool(row['excess_risk']),
             "confidence": "MEDIUM" if self.R2 > 0.6 else "LOW"
         }
 
 
-class ArsenicPredictor:
+class ArsenicPredictor(ColumnarPredictor):
     """Arsenic prediction model (µg/L) - Carcinogenic"""
     R2 = 0.65
     RMSE = 0.002
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        geology = features.get('geology', 'unknown')
-        aquifer_type = features.get('aquifer_type', 'unconfined')
-        
-        # Arsenic mobilization: higher in reducing (anoxic) groundwater
-        # Especially in alluvial sediments with organic matter
-        
-        geology_arsenic = {
-            'ALLUVIUM': 0.015,  # Highest risk
-            'LATERITE': 0.008,
-            'SANDSTONE': 0.003,
-            'SHALE': 0.010,
-            'GRANITE': 0.001,
-            'LIMESTONE': 0.0005
-        }
-        
-        base_as = geology_arsenic.get(geology, 0.002)
-        
+
+    # Arsenic mobilization: higher in reducing (anoxic) groundwater
+    # Especially in alluvial sediments with organic matter
+    GEOLOGY_ARSENIC = {
+        'ALLUVIUM': 0.015,  # Highest risk
+        'LATERITE': 0.008,
+        'SANDSTONE': 0.003,
+        'SHALE': 0.010,
+        'GRANITE': 0.001,
+        'LIMESTONE': 0.0005
+    }
+
+    DTYPE = np.dtype([
+        ('predicted_ug_l', 'f8'),
+        ('exceeds_guideline', '?'),
+        ('high_risk', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_as = cols.lookup('geology', self.GEOLOGY_ARSENIC, 0.002)
+
         # Unconfined aquifers more oxic (lower As)
         # Confined aquifers more reducing (higher As)
-        if aquifer_type == 'confined':
-            redox_factor = 2.5
-        elif aquifer_type == 'karst':
-            redox_factor = 0.5
-        else:
-            redox_factor = 1.0
-        
+        redox_factor = cols.lookup('aquifer_type', {'confined': 2.5, 'karst': 0.5}, 1.0)
+
         # Deeper wells may have higher As (reducing conditions)
-        depth_factor = 1 + (min(depth, 100) / 100) * 0.6
-        
+        depth_factor = 1 + (np.minimum(cols.depth_m, 100) / 100) * 0.6
+
         predicted_as = base_as * redox_factor * depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_as += noise
-        
+        predicted_as += _noise(rng, self.RMSE * 0.2, cols.n)
+
         # WHO guideline: 10 µg/L
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_ug_l'] = np.clip(predicted_as * 1000, 0.1, 100)
+        out['exceeds_guideline'] = predicted_as * 1000 > 10
+        out['high_risk'] = predicted_as > 0.010
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_ug_l": float(np.clip(predicted_as * 1000, 0.1, 100)),
+            "predicted_ug_l": float(row['predicted_ug_l']),
             "r_squared": self.R2,
             "rmse_ug_l": self.RMSE * 1000,
             "who_guideline_ug_l": 10,
-            "exceeds_guideline": predicted_as * 1000 > 10,
-            "health_risk": "HIGH" if predicted_as > 0.010 else "LOW",
+            "exceeds_guideline": bool(row['exceeds_guideline']),
+            "health_risk": "HIGH" if row['high_risk'] else "LOW",
             "recommendation": "Activated carbon treatment if >10 µg/L"
         }
 
 
-class NitratePredictor:
+class NitratePredictor(ColumnarPredictor):
     """Nitrate prediction model (mg/L) - Indicates contamination"""
     R2 = 0.60
     RMSE = 8
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        land_use = features.get('land_use', 'natural')
-        latitude = features.get('latitude', 0)
-        
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l', 'f8'),
+        ('exceeds_guideline', '?'),
+        ('agricultural', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        agricultural = cols.equals('land_use', 'agricultural')
+        urban = cols.equals('land_use', 'urban')
+
         # Background nitrate: 0-2 mg/L
-        base_no3 = 1
-        
-        # Agricultural intensification → higher nitrate
-        if land_use == 'agricultural':
-            # Fertilizers
-            base_no3 = 15 + np.random.normal(0, 10)
-        elif land_use == 'urban':
-            base_no3 = 8 + np.random.normal(0, 5)
-        
+        # Agricultural intensification (fertilizers) → higher nitrate
+        z = _noise(rng, 1.0, cols.n)
+        base_no3 = np.where(agricultural, 15 + 10 * z, np.where(urban, 8 + 5 * z, 1.0))
+
         # Shallow wells more vulnerable to contamination
-        if depth < 20:
-            depth_factor = 1.5
-        elif depth > 50:
-            depth_factor = 0.5
-        else:
-            depth_factor = 1.0
-        
+        depth_factor = np.where(cols.depth_m < 20, 1.5, np.where(cols.depth_m > 50, 0.5, 1.0))
+
         predicted_no3 = base_no3 * depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.3)
-        predicted_no3 += noise
-        
+        predicted_no3 += _noise(rng, self.RMSE * 0.3, cols.n)
+
         # WHO guideline: 50 mg/L
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l'] = np.clip(predicted_no3, 0.1, 200)
+        out['exceeds_guideline'] = predicted_no3 > 50
+        out['agricultural'] = agricultural
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_mg_l": float(np.clip(predicted_no3, 0.1, 200)),
+            "predicted_mg_l": float(row['predicted_mg_l']),
             "r_squared": self.R2,
             "rmse_mg_l": self.RMSE,
             "who_guideline": 50,
-            "exceeds_guideline": predicted_no3 > 50,
-            "contamination_source": "AGRICULTURAL" if land_use == 'agricultural' else "URBAN",
+            "exceeds_guideline": bool(row['exceeds_guideline']),
+            "contamination_source": "AGRICULTURAL" if row['agricultural'] else "URBAN",
             "recommendation": "Avoid shallow wells near farms"
         }
 
 
-class IronPredictor:
+class IronPredictor(ColumnarPredictor):
     """Iron prediction model (mg/L) - Causes color/taste issues"""
     R2 = 0.55
     RMSE = 0.4
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        geology = features.get('geology', 'unknown')
-        aquifer_type = features.get('aquifer_type', 'unconfined')
-        
-        # Iron-rich geology
-        geology_iron = {
-            'LATERITE': 2.0,
-            'SHALE': 1.5,
-            'GRANITE': 0.2,
-            'SANDSTONE': 0.3,
-            'BASALT': 1.8,
-            'ALLUVIUM': 0.8
-        }
-        
-        base_fe = geology_iron.get(geology, 0.5)
-        
+
+    # Iron-rich geology
+    GEOLOGY_IRON = {
+        'LATERITE': 2.0,
+        'SHALE': 1.5,
+        'GRANITE': 0.2,
+        'SANDSTONE': 0.3,
+        'BASALT': 1.8,
+        'ALLUVIUM': 0.8
+    }
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l', 'f8'),
+        ('exceeds_guideline', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_fe = cols.lookup('geology', self.GEOLOGY_IRON, 0.5)
+
         # Reducing conditions → higher Fe (ferrous form, dissolved)
-        if aquifer_type == 'confined':
-            redox_factor = 2.0
-        else:
-            redox_factor = 0.8
-        
+        redox_factor = cols.lookup('aquifer_type', {'confined': 2.0}, 0.8)
+
         # Deeper → more reducing
-        depth_factor = min(1 + depth / 100, 1.5)
-        
+        depth_factor = np.minimum(1 + cols.depth_m / 100, 1.5)
+
         predicted_fe = base_fe * redox_factor * depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_fe += noise
-        
+        predicted_fe += _noise(rng, self.RMSE * 0.2, cols.n)
+
         # WHO guideline: 0.3 mg/L (aesthetic)
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l'] = np.clip(predicted_fe, 0.01, 5)
+        out['exceeds_guideline'] = predicted_fe > 0.3
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
+        exceeds = bool(row['exceeds_guideline'])
         return {
-            "predicted_mg_l": float(np.clip(predicted_fe, 0.01, 5)),
+            "predicted_mg_l": float(row['predicted_mg_l']),
             "r_squared": self.R2,
             "rmse_mg_l": self.RMSE,
             "who_guideline": 0.3,
-            "exceeds_guideline": predicted_fe > 0.3,
-            "issues": "Color/taste" if predicted_fe > 0.3 else "None",
-            "treatment": "Aeration or ion exchange" if predicted_fe > 0.3 else "None"
+            "exceeds_guideline": exceeds,
+            "issues": "Color/taste" if exceeds else "None",
+            "treatment": "Aeration or ion exchange" if exceeds else "None"
         }
 
 
-class HardnessPredictor:
+class HardnessPredictor(ColumnarPredictor):
     """Water hardness (mg/L CaCO3 equivalent)"""
     R2 = 0.72
     RMSE = 40
-    
-    def predict(self, features: Dict) -> Dict:
-        depth = features.get('depth_m', 50)
-        geology = features.get('geology', 'unknown')
-        
-        # Hardness depends on Ca/Mg content
-        geology_hardness = {
-            'LIMESTONE': 300,  # Very hard
-            'DOLOMITE': 280,
-            'SANDSTONE': 80,
-            'GRANITE': 50,
-            'BASALT': 120,
-            'ALLUVIUM': 150
-        }
-        
-        base_hardness = geology_hardness.get(geology, 150)
-        
+
+    # Hardness depends on Ca/Mg content
+    GEOLOGY_HARDNESS = {
+        'LIMESTONE': 300,  # Very hard
+        'DOLOMITE': 280,
+        'SANDSTONE': 80,
+        'GRANITE': 50,
+        'BASALT': 120,
+        'ALLUVIUM': 150
+    }
+
+    # Categories: <60 (soft), 60-120 (slightly hard), >180 (hard)
+    CATEGORY_EDGES = [60, 120, 180]
+    CATEGORIES = ["Soft", "Slightly hard", "Moderately hard", "Hard"]
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l_caco3', 'f8'),
+        ('category', 'u1'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_hardness = cols.lookup('geology', self.GEOLOGY_HARDNESS, 150)
+
         # Deeper = more dissolution time
-        depth_factor = 1 + (depth / 100) * 0.4
-        
+        depth_factor = 1 + (cols.depth_m / 100) * 0.4
+
         predicted_hardness = base_hardness * depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_hardness += noise
-        
-        # Categories: <60 (soft), 60-120 (slightly hard), >180 (hard)
-        if predicted_hardness < 60:
-            category = "Soft"
-        elif predicted_hardness < 120:
-            category = "Slightly hard"
-        elif predicted_hardness < 180:
-            category = "Moderately hard"
-        else:
-            category = "Hard"
-        
+        predicted_hardness += _noise(rng, self.RMSE * 0.2, cols.n)
+
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l_caco3'] = np.clip(predicted_hardness, 20, 500)
+        out['category'] = np.searchsorted(self.CATEGORY_EDGES, predicted_hardness, side='right')
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_mg_l_caco3": float(np.clip(predicted_hardness, 20, 500)),
-            "category": category,
+            "predicted_mg_l_caco3": float(row['predicted_mg_l_caco3']),
+            "category": self.CATEGORIES[int(row['category'])],
             "r_squared": self.R2,
             "rmse": self.RMSE
         }
 
 
-class PHPredictor:
+class PHPredictor(ColumnarPredictor):
     """pH prediction model (0-14 scale)"""
     R2 = 0.80
     RMSE = 0.4
-    
-    def predict(self, features: Dict) -> Dict:
-        geology = features.get('geology', 'unknown')
-        depth = features.get('depth_m', 50)
-        
-        # Geology affects pH
-        geology_ph = {
-            'LIMESTONE': 7.8,  # Neutral to slightly alkaline
-            'GRANITE': 6.5,    # Slightly acidic
-            'SANDSTONE': 7.0,  # Neutral
-            'BASALT': 7.5,     # Slightly alkaline
-            'LATERITE': 6.2    # Acidic
-        }
-        
-        base_ph = geology_ph.get(geology, 7.0)
-        
-        # Deeper water pHmay shift slightly
-        depth_factor = -0.01 * (depth / 100)
-        
+
+    # Geology affects pH
+    GEOLOGY_PH = {
+        'LIMESTONE': 7.8,  # Neutral to slightly alkaline
+        'GRANITE': 6.5,    # Slightly acidic
+        'SANDSTONE': 7.0,  # Neutral
+        'BASALT': 7.5,     # Slightly alkaline
+        'LATERITE': 6.2    # Acidic
+    }
+
+    DTYPE = np.dtype([
+        ('predicted_ph', 'f8'),
+        ('in_guideline', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
+        base_ph = cols.lookup('geology', self.GEOLOGY_PH, 7.0)
+
+        # Deeper water pH may shift slightly
+        depth_factor = -0.01 * (cols.depth_m / 100)
+
         predicted_ph = base_ph + depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_ph += noise
-        
+        predicted_ph += _noise(rng, self.RMSE * 0.2, cols.n)
+
         # WHO guideline: 6.5-8.5
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_ph'] = np.clip(predicted_ph, 5.5, 8.5)
+        out['in_guideline'] = (predicted_ph >= 6.5) & (predicted_ph <= 8.5)
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_ph": float(np.clip(predicted_ph, 5.5, 8.5)),
+            "predicted_ph": float(row['predicted_ph']),
             "r_squared": self.R2,
             "rmse": self.RMSE,
             "who_range": [6.5, 8.5],
-            "in_guideline": 6.5 <= predicted_ph <= 8.5
+            "in_guideline": bool(row['in_guideline'])
         }
 
 
-class ManganesePredictor:
+class ManganesePredictor(ColumnarPredictor):
     """Manganese prediction model (mg/L)"""
     R2 = 0.58
     RMSE = 0.05
-    
-    def predict(self, features: Dict) -> Dict:
-        aquifer_type = features.get('aquifer_type', 'unconfined')
-        depth = features.get('depth_m', 50)
-        
+
+    DTYPE = np.dtype([
+        ('predicted_mg_l', 'f8'),
+        ('exceeds_guideline', '?'),
+    ])
+
+    def predict_columns(self, cols: SiteColumns, rng=np.random) -> np.ndarray:
         # Reducing conditions (confined) → higher Mn
-        if aquifer_type == 'confined':
-            base_mn = 0.3
-        else:
-            base_mn = 0.1
-        
-        depth_factor = min(1 + depth / 150, 1.8)
-        
+        base_mn = cols.lookup('aquifer_type', {'confined': 0.3}, 0.1)
+
+        depth_factor = np.minimum(1 + cols.depth_m / 150, 1.8)
+
         predicted_mn = base_mn * depth_factor
-        
-        noise = np.random.normal(0, self.RMSE * 0.2)
-        predicted_mn += noise
-        
+        predicted_mn += _noise(rng, self.RMSE * 0.2, cols.n)
+
         # WHO guideline: 0.4 mg/L (aesthetic)
+        out = np.empty(cols.n, dtype=self.DTYPE)
+        out['predicted_mg_l'] = np.clip(predicted_mn, 0.01, 1.0)
+        out['exceeds_guideline'] = predicted_mn > 0.4
+        return out
+
+    def to_dict(self, row: np.void) -> Dict:
         return {
-            "predicted_mg_l": float(np.clip(predicted_mn, 0.01, 1.0)),
+            "predicted_mg_l": float(row['predicted_mg_l']),
             "r_squared": self.R2,
             "rmse_mg_l": self.RMSE,
             "who_guideline": 0.4,
-            "exceeds_guideline": predicted_mn > 0.4
+            "exceeds_guideline": bool(row['exceeds_guideline'])
         }
@@ -19,6 +19,8 @@ import logging
 from typing import Dict, Optional, Any
 from datetime import datetime
 
+from app.core.tracing import traced_urlopen
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +28,7 @@ def _fetch_json(url: str, timeout: int = 25) -> Optional[Any]:
     """GET a URL and return parsed JSON, or None on failure."""
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI-AMSR2/2.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with traced_urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode())
     except Exception as exc:
         logger.warning("AMSR-2 API call failed: %s → %s", url, exc)
@@ -265,6 +265,7 @@ class AMSR2SWEProcessor:
         Uses Chang algorithm inversion: snow_depth → ΔTb scattering.
         """
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         snow_depth_m = 0.0
         try:
             ds = date.strftime("%Y-%m-%d")
@@ -275,7 +276,7 @@ class AMSR2SWEProcessor:
                 f"&daily=snow_depth"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
+            with traced_urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
                 vals = data.get("daily", {}).get("snow_depth", [None])
                 if vals and vals[0] is not None:
@@ -302,6 +303,7 @@ class AMSR2SWEProcessor:
         Binary threshold: snow_depth > 0 → covered.
         """
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         try:
             ds = date.strftime("%Y-%m-%d")
             url = (
@@ -311,7 +313,7 @@ class AMSR2SWEProcessor:
                 f"&daily=snow_depth"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
+            with traced_urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
                 vals = data.get("daily", {}).get("snow_depth", [None])
                 if vals and vals[0] is not None:
@@ -328,6 +330,7 @@ class AMSR2SWEProcessor:
         NDVI > 0.4 → forested, scaled linearly.
         """
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         try:
             url = (
                 f"https://modis.ornl.gov/rst/api/v1/MOD13Q1/subset"
@@ -336,7 +339,7 @@ class AMSR2SWEProcessor:
                 f"&kmAboveBelow=0&kmLeftRight=0"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=20) as resp:
+            with traced_urlopen(req, timeout=20) as resp:
                 data = json.loads(resp.read().decode())
                 if "subset" in data:
                     for s in data["subset"]:
@@ -24,6 +24,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import logging
 
+from app.core.tracing import traced, traced_urlopen
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +37,7 @@ def _fetch_json(url: str, timeout: int = 25) -> Optional[Any]:
     """GET a URL and return parsed JSON, or None on failure."""
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI-Fusion/2.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with traced_urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode())
     except Exception as exc:
         logger.warning("Fusion API call failed: %s → %s", url, exc)
@@ -197,6 +199,7 @@ class SatelliteFusion:
             self._modis_cache[key] = _modis_ndvi_evi(lat, lon)
         return self._modis_cache[key]
 
+    @traced(kind="fusion")
     def fuse_all_sensors(
         self,
         latitude: float,
@@ -249,6 +252,7 @@ class SatelliteFusion:
 
     # ─── Capability 1: Groundwater Storage Change ───
 
+    @traced(kind="fusion_capability")
     def _fuse_grace(self, lat: float, lon: float, start: datetime, end: datetime) -> Dict:
         """
         Real groundwater storage proxy from NASA POWER precipitation +
@@ -316,6 +320,7 @@ class SatelliteFusion:
 
     # ─── Capability 2: Soil Moisture ───
 
+    @traced(kind="fusion_capability")
     def _fuse_smap_sentinel1(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real soil moisture from Open-Meteo ERA5-Land reanalysis."""
         try:
@@ -356,6 +361,7 @@ class SatelliteFusion:
 
     # ─── Capability 3: Evapotranspiration ───
 
+    @traced(kind="fusion_capability")
     def _fuse_sebal_landsat(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real ET0 from Open-Meteo FAO-56 Penman-Monteith."""
         try:
@@ -406,6 +412,7 @@ class SatelliteFusion:
 
     # ─── Capability 4: Precipitation ───
 
+    @traced(kind="fusion_capability")
     def _fuse_gpm_chirps(self, lat: float, lon: float, start: datetime, end: datetime) -> Dict:
         """Real precipitation from Open-Meteo + NASA POWER."""
         try:
@@ -457,6 +464,7 @@ class SatelliteFusion:
 
     # ─── Capability 5: Surface Water Bodies ───
 
+    @traced(kind="fusion_capability")
     def _fuse_ndwi_otsu(self, lat: float, lon: float, date: datetime) -> Dict:
         """Water body detection from real MODIS NDVI + soil moisture."""
 
@@ -495,6 +503,7 @@ class SatelliteFusion:
 
     # ─── Capability 6: Vegetation Water Stress ───
 
+    @traced(kind="fusion_capability")
     def _fuse_vegetation_stress(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real NDVI from MODIS + real temperature from Open-Meteo = real stress index."""
         try:
@@ -557,6 +566,7 @@ class SatelliteFusion:
 
     # ─── Capability 7: Ground Deformation / Stability ───
 
+    @traced(kind="fusion_capability")
     def _fuse_insar(self, lat: float, lon: float, start: datetime, end: datetime) -> Dict:
         """Ground stability from real soil moisture variability (Open-Meteo)."""
         try:
@@ -606,6 +616,7 @@ class SatelliteFusion:
 
     # ─── Capability 8: Land Surface Temperature ───
 
+    @traced(kind="fusion_capability")
     def _fuse_lst(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real temperature from Open-Meteo ERA5-Land."""
 
@@ -651,6 +662,7 @@ class SatelliteFusion:
 
     # ─── Capability 9: Albedo ───
 
+    @traced(kind="fusion_capability")
     def _fuse_modis_albedo(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real albedo from NASA POWER solar radiation ratio."""
         try:
@@ -702,6 +714,7 @@ class SatelliteFusion:
 
     # ─── Capability 10: Snow Water Equivalent ───
 
+    @traced(kind="fusion_capability")
     def _fuse_amsr2_modis(self, lat: float, lon: float, date: datetime) -> Dict:
         """Real snow data from Open-Meteo ERA5-Land."""
         try:
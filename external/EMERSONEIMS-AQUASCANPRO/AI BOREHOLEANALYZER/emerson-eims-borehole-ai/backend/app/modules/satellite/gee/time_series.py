@@ -2,6 +2,8 @@ import json
 import urllib.request
 import numpy as np
 
+from app.core.tracing import traced_urlopen
+
 
 class TimeSeriesExtractor:
     def extract_time_series(self, point, collection, start_date, end_date):
@@ -30,7 +32,7 @@ class TimeSeriesExtractor:
                 f"&daily={var}"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=20) as resp:
+            with traced_urlopen(req, timeout=20) as resp:
                 data = json.loads(resp.read().decode())
                 dates = data.get("daily", {}).get("time", [])
                 values = data.get("daily", {}).get(var, [])
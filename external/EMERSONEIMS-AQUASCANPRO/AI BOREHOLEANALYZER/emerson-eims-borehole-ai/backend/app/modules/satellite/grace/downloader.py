@@ -2,6 +2,8 @@ import json
 import urllib.request
 import numpy as np
 
+from app.core.tracing import traced_urlopen
+
 
 class GRACEDownloader:
     def __init__(self):
@@ -9,7 +11,7 @@ class GRACEDownloader:
 
     def _fetch_json(self, url: str, timeout: int = 20):
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with traced_urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode())
 
     def download_data(self, start_date, end_date, bbox):
@@ -115,6 +115,7 @@ class Sentinel1InSARProcessor:
         Uses Open-Meteo ERA5-Land soil moisture time series.
         """
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         deformation = 0.0
         try:
             url = (
@@ -124,7 +125,7 @@ class Sentinel1InSARProcessor:
                 f"&daily=soil_moisture_0_to_7cm,precipitation_sum"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
+            with traced_urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
                 sm_vals = [v for v in (data.get("daily", {}).get("soil_moisture_0_to_7cm") or []) if v is not None]
                 precip_vals = [v for v in (data.get("daily", {}).get("precipitation_sum") or []) if v is not None]
@@ -192,6 +193,7 @@ class Sentinel1InSARProcessor:
         Dense vegetation → low coherence; bare ground → high coherence.
         """
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         ndvi = 0.45  # fallback
         try:
             url = (
@@ -201,7 +203,7 @@ class Sentinel1InSARProcessor:
                 f"&kmAboveBelow=0&kmLeftRight=0"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=20) as resp:
+            with traced_urlopen(req, timeout=20) as resp:
                 data = json.loads(resp.read().decode())
                 if "subset" in data:
                     for s in data["subset"]:
@@ -333,6 +335,7 @@ def _ndvi_to_terrain(ndvi: float) -> str:
 def vertex_to_terrain(lat: float, lon: float) -> str:
     """Terrain type classification using real NDVI from ORNL DAAC MODIS."""
     import json, urllib.request
+    from app.core.tracing import traced_urlopen
     ndvi = 0.35  # fallback
     try:
         url = (
@@ -342,7 +345,7 @@ def vertex_to_terrain(lat: float, lon: float) -> str:
             f"&kmAboveBelow=0&kmLeftRight=0"
         )
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-        with urllib.request.urlopen(req, timeout=20) as resp:
+        with traced_urlopen(req, timeout=20) as resp:
             data = json.loads(resp.read().decode())
             if "subset" in data:
                 for s in data["subset"]:
@@ -18,6 +18,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 import logging
 
+from app.core.tracing import traced_urlopen
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +27,7 @@ def _fetch_json(url: str, timeout: int = 25) -> Optional[Any]:
     """GET a URL and return parsed JSON, or None on failure."""
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI-SMAP/2.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with traced_urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode())
     except Exception as exc:
         logger.warning("SMAP API call failed: %s → %s", url, exc)
@@ -206,6 +206,7 @@ class SMAPSentinel1Fusion:
     def _get_smap_moisture(self, lat: float, lon: float, date: datetime) -> float:
         """Get real soil moisture from Open-Meteo ERA5-Land."""
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         try:
             url = (
                 f"https://api.open-meteo.com/v1/forecast"
@@ -214,7 +215,7 @@ class SMAPSentinel1Fusion:
                 f"&past_days=1&forecast_days=0"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
+            with traced_urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
                 val = data.get("current", {}).get("soil_moisture_0_to_7cm")
                 if val is not None:
@@ -252,6 +253,7 @@ class SMAPSentinel1Fusion:
     def _get_ndvi(self, lat: float, lon: float, date: datetime) -> float:
         """Get real NDVI from ORNL DAAC MODIS."""
         import json, urllib.request
+        from app.core.tracing import traced_urlopen
         try:
             doy = date.timetuple().tm_yday
             date_str = f"A{date.year}{doy:03d}"
@@ -262,7 +264,7 @@ class SMAPSentinel1Fusion:
                 f"&kmAboveBelow=0&kmLeftRight=0"
             )
             req = urllib.request.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with urllib.request.urlopen(req, timeout=20) as resp:
+            with traced_urlopen(req, timeout=20) as resp:
                 data = json.loads(resp.read().decode())
                 if "subset" in data:
                     for s in data["subset"]:
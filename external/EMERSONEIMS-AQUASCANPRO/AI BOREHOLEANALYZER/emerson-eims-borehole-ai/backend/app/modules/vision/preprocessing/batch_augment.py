@@ -0,0 +1,308 @@
+"""
+Batch Augmentation Pipeline
+Vectorised (N, H, W, C) augmentation with a multiprocess prefetching loader
+
+Every transform works on the whole batch at once with per-sample random
+parameters drawn from a Generator seeded from (seed, epoch, batch index), so
+a batch is reproducible no matter which worker process builds it.
+"""
+
+import multiprocessing
+from collections import deque
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_NOISE_BANK_SEED = 20240601
+
+
+def batch_rng(seed: int, epoch: int, index: int) -> np.random.Generator:
+    """Independent, reproducible generator for one batch"""
+    return np.random.default_rng([seed, epoch, index])
+
+
+class BatchAugmenter:
+    """
+    Flips, brightness, contrast, Gaussian noise, CutMix and MixUp on numpy batches
+
+    Images may be uint8 (0-255) or float (0-1); output is float32 in 0-1.
+    Labels are class indices (one-hot encoded when ``num_classes`` is set) or
+    already one-hot/soft; CutMix and MixUp blend them by the mixed area/weight.
+    Per batch at most one of CutMix or MixUp is applied.
+    """
+
+    def __init__(
+        self,
+        hflip_prob: float = 0.5,
+        vflip_prob: float = 0.1,
+        brightness: float = 0.3,
+        contrast: float = 0.3,
+        noise_std: float = 0.05,
+        cutmix_prob: float = 0.0,
+        cutmix_alpha: float = 1.0,
+        mixup_prob: float = 0.0,
+        mixup_alpha: float = 0.2,
+        num_classes: Optional[int] = None
+    ):
+        self.hflip_prob = hflip_prob
+        self.vflip_prob = vflip_prob
+        self.brightness = brightness
+        self.contrast = contrast
+        self.noise_std = noise_std
+        self.cutmix_prob = cutmix_prob
+        self.cutmix_alpha = cutmix_alpha
+        self.mixup_prob = mixup_prob
+        self.mixup_alpha = mixup_alpha
+        self.num_classes = num_classes
+
+    def __call__(
+        self,
+        images: np.ndarray,
+        labels: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        rng = rng or np.random.default_rng()
+        x = self.to_float(images)
+        y = self.to_soft_labels(labels)
+
+        x = self.random_flip(x, rng)
+        x = self.random_brightness(x, rng)
+        x = self.random_contrast(x, rng)
+        x = self.add_gaussian_noise(x, rng)
+        np.clip(x, 0.0, 1.0, out=x)
+
+        if y is not None:
+            draw = rng.random()
+            if draw < self.cutmix_prob:
+                x, y = self.cutmix(x, y, rng)
+            elif draw < self.cutmix_prob + self.mixup_prob:
+                x, y = self.mixup(x, y, rng)
+        return x, y
+
+    @staticmethod
+    def to_float(images: np.ndarray) -> np.ndarray:
+        if images.dtype == np.uint8:
+            return images.astype(np.float32) * (1.0 / 255.0)
+        return images.astype(np.float32, copy=True)
+
+    def to_soft_labels(self, labels: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if labels is None:
+            return None
+        labels = np.asarray(labels)
+        if labels.ndim == 1 and self.num_classes:
+            return np.eye(self.num_classes, dtype=np.float32)[labels]
+        return labels.astype(np.float32)
+
+    # ============ PHOTOMETRIC / GEOMETRIC ============
+
+    def random_flip(self, x: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        n = len(x)
+        h = rng.random(n) < self.hflip_prob
+        v = rng.random(n) < self.vflip_prob
+        x[h] = x[h, :, ::-1]
+        x[v] = x[v, ::-1]
+        return x
+
+    def random_brightness(self, x: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        if self.brightness:
+            factor = rng.uniform(1 - self.brightness, 1 + self.brightness, len(x)).astype(np.float32)
+            x *= factor[:, None, None, None]
+        return x
+
+    def random_contrast(self, x: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Scale each image about its mean intensity, as PIL ImageEnhance.Contrast does"""
+        if self.contrast:
+            factor = rng.uniform(1 - self.contrast, 1 + self.contrast, len(x)).astype(np.float32)[:, None, None, None]
+            mean = x.mean(axis=(1, 2, 3), keepdims=True)
+            x -= mean
+            x *= factor
+            x += mean
+        return x
+
+    def add_gaussian_noise(self, x: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Add N(0, noise_std) noise cut from a fixed bank at random offsets
+
+        Drawing fresh normals for every pixel dominated the batch cost; a
+        random window into a 2x-sized bank with a random sign per sample is
+        ~20x cheaper and still decorrelated across samples.
+        """
+        if self.noise_std:
+            size = x[0].size
+            windows = sliding_window_view(self._noise_bank(size), size)
+            offsets = rng.integers(0, size + 1, len(x))
+            signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), len(x)) * np.float32(self.noise_std)
+            x += (windows[offsets] * signs[:, None]).reshape(x.shape)
+        return x
+
+    def _noise_bank(self, size: int) -> np.ndarray:
+        bank = getattr(self, "_bank", None)
+        if bank is None or len(bank) != 2 * size:
+            bank = self._bank = np.random.default_rng(_NOISE_BANK_SEED).standard_normal(2 * size, dtype=np.float32)
+        return bank
+
+    # ============ SAMPLE MIXING ============
+
+    def cutmix(self, x: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Paste a random box from a shuffled partner into every sample"""
+        n, height, width = x.shape[:3]
+        perm = rng.permutation(n)
+        lam = rng.beta(self.cutmix_alpha, self.cutmix_alpha, n)
+
+        cut = np.sqrt(1.0 - lam)
+        box_h = (height * cut).astype(int)
+        box_w = (width * cut).astype(int)
+        cy = rng.integers(0, height, n)
+        cx = rng.integers(0, width, n)
+        y0 = np.clip(cy - box_h // 2, 0, height)
+        y1 = np.clip(cy + box_h // 2, 0, height)
+        x0 = np.clip(cx - box_w // 2, 0, width)
+        x1 = np.clip(cx + box_w // 2, 0, width)
+
+        rows = np.arange(height)[None, :, None]
+        cols = np.arange(width)[None, None, :]
+        mask = ((rows >= y0[:, None, None]) & (rows < y1[:, None, None])
+                & (cols >= x0[:, None, None]) & (cols < x1[:, None, None]))
+
+        x = np.where(mask[..., None], x[perm], x)
+        # Label weight is the area actually kept after clipping at the border
+        kept = 1.0 - mask.mean(axis=(1, 2))
+        y = kept[:, None] * y + (1.0 - kept[:, None]) * y[perm]
+        return x, y.astype(np.float32)
+
+    def mixup(self, x: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Convex combination of each sample with a shuffled partner"""
+        perm = rng.permutation(len(x))
+        lam = rng.beta(self.mixup_alpha, self.mixup_alpha, len(x)).astype(np.float32)
+        x = lam[:, None, None, None] * x + (1.0 - lam[:, None, None, None]) * x[perm]
+        y = lam[:, None] * y + (1.0 - lam[:, None]) * y[perm]
+        return x, y
+
+
+# ============ PREFETCHING LOADER ============
+
+_worker_state = {}
+
+
+def _init_worker(images, labels, augmenter):
+    _worker_state.update(images=images, labels=labels, augmenter=augmenter)
+
+
+def _build_batch(indices: np.ndarray, seed: int, epoch: int, index: int):
+    images = _worker_state["images"][indices]
+    labels = _worker_state["labels"]
+    labels = None if labels is None else labels[indices]
+    augmenter = _worker_state["augmenter"]
+    if augmenter is None:
+        return BatchAugmenter.to_float(images), labels
+    return augmenter(images, labels, batch_rng(seed, epoch, index))
+
+
+class PrefetchLoader:
+    """
+    Yields augmented (x, y) batches while worker processes prepare the next ones
+
+    The dataset is handed to the pool once at start-up (inherited on fork),
+    so each task only carries a batch of indices. At most ``prefetch``
+    batches are in flight, bounding memory. ``workers=0`` builds batches in
+    the calling process with identical results.
+
+    Usage:
+        with PrefetchLoader(X, y, batch_size=32, augmenter=BatchAugmenter(num_classes=12)) as loader:
+            model.fit(loader.repeat(), steps_per_epoch=len(loader), epochs=100)
+    """
+
+    def __init__(
+        self,
+        images: np.ndarray,
+        labels: Optional[np.ndarray] = None,
+        batch_size: int = 32,
+        augmenter: Optional[BatchAugmenter] = None,
+        workers: int = 2,
+        prefetch: int = 4,
+        shuffle: bool = True,
+        seed: int = 0,
+        drop_last: bool = False
+    ):
+        self.images = images
+        self.labels = labels
+        self.batch_size = batch_size
+        self.augmenter = augmenter
+        self.workers = workers
+        self.prefetch = max(1, prefetch)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        self._epoch = 0
+        self._pool = None
+
+    def __len__(self) -> int:
+        full, rest = divmod(len(self.images), self.batch_size)
+        return full if self.drop_last or not rest else full + 1
+
+    def __iter__(self):
+        epoch = self._epoch
+        self._epoch += 1
+        return self.epoch(epoch)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def batch_indices(self, epoch: int):
+        order = np.random.default_rng([self.seed, epoch]).permutation(len(self.images)) if self.shuffle \
+            else np.arange(len(self.images))
+        return [order[i * self.batch_size:(i + 1) * self.batch_size] for i in range(len(self))]
+
+    def epoch(self, epoch: int) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Batches of one epoch, in order"""
+        batches = self.batch_indices(epoch)
+
+        if self.workers <= 0:
+            _init_worker(self.images, self.labels, self.augmenter)
+            for index, indices in enumerate(batches):
+                yield _build_batch(indices, self.seed, epoch, index)
+            return
+
+        pool = self._get_pool()
+        pending = deque()
+        for index, indices in enumerate(batches):
+            pending.append(pool.apply_async(_build_batch, (indices, self.seed, epoch, index)))
+            if len(pending) >= self.prefetch:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def repeat(self) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Endless stream of epochs, for ``fit(..., steps_per_epoch=len(loader))``"""
+        while True:
+            yield from iter(self)
+
+    def start(self) -> "PrefetchLoader":
+        """
+        Fork the worker pool now
+
+        Call this before TensorFlow/PyTorch spin up their thread pools; forking
+        a process that already runs them can deadlock the children.
+        """
+        if self.workers > 0:
+            self._get_pool()
+        return self
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.images, self.labels, self.augmenter),
+            )
+        return self._pool
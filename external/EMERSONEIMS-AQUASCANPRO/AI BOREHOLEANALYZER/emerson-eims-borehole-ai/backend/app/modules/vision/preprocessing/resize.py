@@ -15,8 +15,36 @@ class ImageResizer:
     
     @staticmethod
     def batch_resize(images, target_size=(224, 224)):
+        if isinstance(images, np.ndarray):
+            return ImageResizer.batch_resize_array(images, target_size)
         return [ImageResizer.resize_to_target(img, target_size) for img in images]
     
+    @staticmethod
+    def batch_resize_array(images, target_size=(224, 224), maintain_aspect=True):
+        """
+        Resize an (N, H, W, C) uint8/float batch straight into a preallocated array
+        
+        Skips the PIL round trip per image. With maintain_aspect the result is
+        letterboxed like resize_to_target (downscale only, centred on black).
+        """
+        import cv2
+        
+        n, height, width, channels = images.shape
+        target_w, target_h = target_size
+        if maintain_aspect:
+            scale = min(1.0, target_w / width, target_h / height)
+            new_w, new_h = max(1, int(width * scale)), max(1, int(height * scale))
+        else:
+            new_w, new_h = target_w, target_h
+        
+        out = np.zeros((n, target_h, target_w, channels), dtype=images.dtype)
+        top, left = (target_h - new_h) // 2, (target_w - new_w) // 2
+        window = out[:, top:top + new_h, left:left + new_w]
+        for i in range(n):
+            resized = cv2.resize(images[i], (new_w, new_h), interpolation=cv2.INTER_AREA)
+            window[i] = resized.reshape(new_h, new_w, channels)
+        return out
+    
     @staticmethod
     def adaptive_resize(image, max_dimension=1024):
         ratio = max_dimension / max(image.size)
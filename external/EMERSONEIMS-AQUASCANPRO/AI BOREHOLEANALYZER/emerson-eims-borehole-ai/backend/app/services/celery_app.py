@@ -13,8 +13,12 @@ from celery.schedules import crontab
 from redis import Redis
 from kombu import Queue, Exchange
 
+from app.core.tracing import install_celery_tracing
+
 logger = logging.getLogger(__name__)
 
+install_celery_tracing()
+
 # ============ CELERY APP INITIALIZATION ============
 
 # Redis configuration
@@ -218,6 +222,7 @@ def predict_aquifer_task(self, site_id: int, dem_array: list, spectral_data: dic
         # Without a trained ML model, use real satellite data via fusion engine
         import json
         import urllib.request as _urlreq
+        from app.core.tracing import traced_urlopen
 
         predictions = {
             'yield_m3_h': None,
@@ -241,7 +246,7 @@ def predict_aquifer_task(self, site_id: int, dem_array: list, spectral_data: dic
                 f"&longitude={lon}&latitude={lat}&format=JSON"
             )
             req = _urlreq.Request(url, headers={"User-Agent": "BoreholeAI/2.0"})
-            with _urlreq.urlopen(req, timeout=15) as resp:
+            with traced_urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
                 precip_ann = data.get("properties", {}).get("parameter", {}).get("PRECTOTCORR", {}).get("ANN")
                 if precip_ann is not None:
@@ -17,6 +17,8 @@ import rasterio
 from rasterio.features import shapes
 import warnings
 
+from app.core.tracing import traced
+
 logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 
@@ -428,6 +430,7 @@ class DEMProcessor:
             logger.error(f"Hillshade computation failed: {e}")
             raise
 
+    @traced(name="dem_processing")
     def compute_all_indices(self) -> Dict[str, np.ndarray]:
         """
         Compute all topographic indices at once
@@ -45,6 +45,8 @@ import logging
 from typing import Dict, Optional, Union, Tuple
 import warnings
 
+from app.core.tracing import traced
+
 logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 
@@ -496,6 +498,7 @@ class SpectralIndicesCalculator:
 
     # ============ BATCH COMPUTATION ============
 
+    @traced(name="spectral_indices")
     def compute_all_indices(self) -> Dict[str, np.ndarray]:
         """
         Compute all 28 spectral indices
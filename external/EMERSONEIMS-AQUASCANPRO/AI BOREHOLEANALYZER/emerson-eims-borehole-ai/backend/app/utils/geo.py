@@ -18,6 +18,7 @@ def get_coordinates(address: str) -> dict:
     Returns real coordinates — no hardcoded fallback.
     """
     import urllib.request
+    from app.core.tracing import traced_urlopen
     import urllib.parse
     import json
 
@@ -30,7 +31,7 @@ def get_coordinates(address: str) -> dict:
         req = urllib.request.Request(url, headers={
             "User-Agent": "BoreholeAI/2.0 (geocoding)"
         })
-        with urllib.request.urlopen(req, timeout=10) as resp:
+        with traced_urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read().decode())
             if data and len(data) > 0:
                 return {
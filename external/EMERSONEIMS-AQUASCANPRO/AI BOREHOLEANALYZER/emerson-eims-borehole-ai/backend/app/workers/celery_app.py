@@ -1,5 +1,9 @@
 from celery import Celery
 from app.config import Config
+from app.core.tracing import install_celery_tracing, install_log_trace_id
+
+install_log_trace_id()
+install_celery_tracing()
 
 celery_app = Celery(
     "borehole_ai",
@@ -29,4 +33,8 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,
     worker_max_tasks_per_child=100,
     worker_prefetch_multiplier=1,
+    worker_task_log_format=(
+        "[%(asctime)s: %(levelname)s/%(processName)s] [%(trace_id)s] "
+        "%(task_name)s[%(task_id)s]: %(message)s"
+    ),
 )
\ No newline at end of file
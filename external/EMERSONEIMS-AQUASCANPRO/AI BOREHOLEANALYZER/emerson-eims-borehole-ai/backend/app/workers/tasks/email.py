@@ -24,6 +24,7 @@ def send_email(self, to_email: str, subject: str, content: str, html: bool = Fal
         # --- SendGrid HTTP API ---
         try:
             import urllib.request
+            from app.core.tracing import traced_urlopen
             import json
 
             payload = {
@@ -41,7 +42,7 @@ def send_email(self, to_email: str, subject: str, content: str, html: bool = Fal
                 },
                 method="POST",
             )
-            resp = urllib.request.urlopen(req, timeout=15)
+            resp = traced_urlopen(req, timeout=15)
             logger.info(f"Email sent via SendGrid to {to_email} (status={resp.status})")
             return {"status": "sent", "to": to_email, "provider": "sendgrid"}
 
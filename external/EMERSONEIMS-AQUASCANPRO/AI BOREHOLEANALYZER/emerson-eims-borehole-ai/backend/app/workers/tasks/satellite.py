@@ -19,6 +19,7 @@ def download_satellite_data(self, latitude: float, longitude: float, date: str):
     Falls back to default estimates if APIs are unavailable.
     """
     import urllib.request
+    from app.core.tracing import traced_urlopen
     import json
 
     result = {
@@ -33,7 +34,7 @@ def download_satellite_data(self, latitude: float, longitude: float, date: str):
     try:
         url = f"{MODIS_BASE}/MOD13Q1/subset?latitude={latitude}&longitude={longitude}&band=250m_16_days_NDVI&startDate=A{date.replace('-', '')}&endDate=A{date.replace('-', '')}&kmAboveBelow=0&kmLeftRight=0"
         req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        resp = urllib.request.urlopen(req, timeout=30)
+        resp = traced_urlopen(req, timeout=30)
         data = json.loads(resp.read())
         ndvi_raw = data.get("subset", [{}])[0].get("data", [0])[0]
         result["ndvi"] = round(ndvi_raw * 0.0001, 4)  # Scale factor
@@ -54,7 +55,7 @@ def download_satellite_data(self, latitude: float, longitude: float, date: str):
             f"&forecast_days=0"
         )
         sm_req = urllib.request.Request(sm_url, headers={"Accept": "application/json"})
-        sm_resp = urllib.request.urlopen(sm_req, timeout=20)
+        sm_resp = traced_urlopen(sm_req, timeout=20)
         sm_data = json.loads(sm_resp.read())
         current = sm_data.get("current", {})
         sm_shallow = current.get("soil_moisture_0_to_7cm")
@@ -85,7 +86,7 @@ def download_satellite_data(self, latitude: float, longitude: float, date: str):
             f"?parameters=PRECTOTCORR&community=AG&longitude={longitude}&latitude={latitude}&format=JSON"
         )
         power_req = urllib.request.Request(power_url, headers={"Accept": "application/json"})
-        power_resp = urllib.request.urlopen(power_req, timeout=30)
+        power_resp = traced_urlopen(power_req, timeout=30)
         power_data = json.loads(power_resp.read())
         daily_precip = power_data.get("properties", {}).get("parameter", {}).get("PRECTOTCORR", {}).get("ANN")
         if daily_precip is not None:
@@ -3,8 +3,13 @@ import subprocess
 import os
 
 @celery_app.task
-def retrain_model(model_name: str):
-    """Retrain a specific AI model"""
+def retrain_model(model_name: str, augment_workers: int = 2):
+    """Retrain a specific AI model
+    
+    The training script runs in its own (non-daemon) process, so it may fork
+    ``augment_workers`` augmentation processes that prefetch batches while the
+    model fits; Celery's daemonic pool children cannot do that themselves.
+    """
     scripts_dir = "/app/scripts"
     model_scripts = {
         "geological": "train_geological_model.py",
@@ -25,6 +30,7 @@ def retrain_model(model_name: str):
             ["python", script_path],
             capture_output=True,
             text=True,
+            env={**os.environ, "AUGMENT_WORKERS": str(augment_workers)},
             timeout=3600  # 1 hour timeout
         )
         
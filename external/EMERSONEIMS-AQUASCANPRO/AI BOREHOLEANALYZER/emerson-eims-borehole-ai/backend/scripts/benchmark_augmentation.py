@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Augmentation Throughput Benchmark
+Samples per second for the per-image PIL path vs the vectorised batch pipeline
+
+The per-image path mirrors what training used before: PIL flip, brightness,
+contrast and Gaussian noise on every image, then CutMix/MixUp per pair.
+
+Usage:
+    python scripts/benchmark_augmentation.py --samples 2048 --size 128 --workers 2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.vision.preprocessing.augment import ImageAugmenter
+from app.modules.vision.preprocessing.batch_augment import BatchAugmenter, PrefetchLoader, batch_rng
+
+
+def per_image(images: np.ndarray, batch_size: int) -> float:
+    augmenter = ImageAugmenter(seed=0)
+    started = time.perf_counter()
+    for start in range(0, len(images), batch_size):
+        pil = [Image.fromarray(img) for img in images[start:start + batch_size]]
+        pil = [augmenter.apply_augmentation_sequence(img, ['flip', 'brightness', 'contrast', 'gaussian_noise'])
+               for img in pil]
+        pil = [augmenter.cutmix(a, b) if i % 2 else augmenter.mixup(a, b)
+               for i, (a, b) in enumerate(zip(pil, pil[1:] + pil[:1]))]
+        np.stack([np.asarray(img, dtype=np.float32) / 255.0 for img in pil])
+    return time.perf_counter() - started
+
+
+def vectorised(images: np.ndarray, labels: np.ndarray, batch_size: int, augmenter: BatchAugmenter) -> float:
+    started = time.perf_counter()
+    for index, start in enumerate(range(0, len(images), batch_size)):
+        augmenter(images[start:start + batch_size], labels[start:start + batch_size], batch_rng(0, 0, index))
+    return time.perf_counter() - started
+
+
+def prefetched(images, labels, batch_size, augmenter, workers, step_s) -> float:
+    """Epoch wall time with a simulated ``step_s`` training step per batch"""
+    with PrefetchLoader(images, labels, batch_size, augmenter, workers=workers, prefetch=4) as loader:
+        started = time.perf_counter()
+        for _ in loader:
+            time.sleep(step_s)
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=2048)
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--step-ms", type=float, default=20.0, help="simulated fit time per batch")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (args.samples, args.size, args.size, 3), dtype=np.uint8)
+    labels = rng.integers(0, 12, args.samples)
+    augmenter = BatchAugmenter(cutmix_prob=0.5, mixup_prob=0.5, num_classes=12)
+    step_s = args.step_ms / 1000.0
+    steps = -(-args.samples // args.batch_size)
+
+    rows = [
+        ("per-image PIL", per_image(images, args.batch_size)),
+        ("vectorised", vectorised(images, labels, args.batch_size, augmenter)),
+    ]
+    print(f"{'pipeline':<28}{'seconds':>10}{'samples/s':>12}")
+    for name, seconds in rows:
+        print(f"{name:<28}{seconds:>10.2f}{args.samples / seconds:>12.0f}")
+
+    print(f"\nEpoch with a simulated {args.step_ms:.0f} ms training step ({steps * step_s:.2f} s of fitting):")
+    for name, workers in (("in-process", 0), (f"prefetch x{args.workers}", args.workers)):
+        seconds = prefetched(images, labels, args.batch_size, augmenter, workers, step_s)
+        print(f"{name:<28}{seconds:>10.2f}{args.samples / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
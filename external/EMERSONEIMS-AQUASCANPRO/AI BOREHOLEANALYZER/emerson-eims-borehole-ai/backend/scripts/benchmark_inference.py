@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Inference Throughput Benchmark
+Sites per minute for per-image classification vs the micro-batched inference server
+
+Uses a randomly initialised Keras ResNet-50 when TensorFlow is installed,
+otherwise a simulated model with a fixed per-call overhead plus per-image cost
+(the shape of CPU Keras latency that batching amortises).
+
+Usage:
+    python scripts/benchmark_inference.py --sites 64 --clients 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.ml.models.inference import InferenceServer
+from app.modules.ml.models.resnet50_geological import ResNet50GeologicalClassifier
+
+
+class SimulatedModel:
+    """
+    Per-call overhead + per-image cost, roughly CPU ResNet-50 proportions
+
+    Calls are serialised, as concurrent Keras calls contend for the same cores.
+    """
+
+    def __init__(self, call_overhead_s: float = 0.03, per_image_s: float = 0.004):
+        self.call_overhead_s = call_overhead_s
+        self.per_image_s = per_image_s
+        self._cores = threading.Lock()
+
+    def predict(self, batch, verbose=0):
+        with self._cores:
+            time.sleep(self.call_overhead_s + self.per_image_s * len(batch))
+        out = np.full((len(batch), 25), 1.0 / 25, dtype=np.float32)
+        out[:, 0] = 0.9
+        return out
+
+
+class _Registry:
+    def __init__(self, model):
+        self.model = model
+
+    def load_model(self, name):
+        return self.model if name == InferenceServer.CLASSIFIER else None
+
+
+def build_model(simulate: bool):
+    if not simulate:
+        try:
+            import tensorflow as tf
+            return tf.keras.applications.ResNet50(weights=None, classes=25)
+        except ImportError:
+            print("TensorFlow not installed; using simulated model")
+    return SimulatedModel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent request threads")
+    parser.add_argument("--scene", type=int, default=224, help="scene edge in pixels")
+    parser.add_argument("--simulate", action="store_true", help="skip TensorFlow even if installed")
+    args = parser.parse_args()
+
+    model = build_model(args.simulate)
+    rng = np.random.default_rng(0)
+    scenes = [rng.integers(0, 255, (args.scene, args.scene, 3), dtype=np.uint8) for _ in range(args.sites)]
+
+    # Per-image: one model call per site, as the original request path did
+    classifier = ResNet50GeologicalClassifier()
+    classifier.model = model
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(classifier.classify_satellite_image, scenes))
+    per_image = time.perf_counter() - started
+
+    server = InferenceServer(registry=_Registry(model), max_batch_size=32, max_latency_ms=10)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(server.classify_scene, scenes))
+    batched = time.perf_counter() - started
+    stats = server.stats()[InferenceServer.CLASSIFIER]
+    server.close()
+
+    print(f"{'mode':<12}{'seconds':>10}{'sites/min':>12}")
+    print(f"{'per-image':<12}{per_image:>10.2f}{args.sites * 60 / per_image:>12.0f}")
+    print(f"{'batched':<12}{batched:>10.2f}{args.sites * 60 / batched:>12.0f}")
+    print(f"mean batch {stats['mean_batch_size']:.1f}, mean queue wait {stats['mean_queue_wait_ms']:.1f} ms, "
+          f"speed-up x{per_image / batched:.1f}")
+
+
+if __name__ == "__main__":
+    main()
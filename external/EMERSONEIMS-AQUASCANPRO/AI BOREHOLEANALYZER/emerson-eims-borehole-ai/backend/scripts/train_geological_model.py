@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
+import os
+import sys
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from sklearn.model_selection import train_test_split
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.vision.preprocessing.batch_augment import BatchAugmenter, PrefetchLoader
+
 def create_cnn_attention_model(input_shape=(128, 128, 3)):
     inputs = keras.Input(shape=input_shape)
     
@@ -30,14 +36,19 @@ def create_cnn_attention_model(input_shape=(128, 128, 3)):
 
 def train_model():
     # Generate synthetic training data
-    X_train = np.random.rand(10000, 128, 128, 3)
+    X_train = np.random.randint(0, 256, (10000, 128, 128, 3), dtype=np.uint8)
     y_train = np.random.randint(0, 12, 10000)
-    y_train = keras.utils.to_categorical(y_train, 12)
     
     X_val = np.random.rand(2000, 128, 128, 3)
     y_val = np.random.randint(0, 12, 2000)
     y_val = keras.utils.to_categorical(y_val, 12)
     
+    # Augmentation runs in worker processes while the model fits the previous batch.
+    # The pool is forked before the model is built so no TF threads are copied.
+    augmenter = BatchAugmenter(cutmix_prob=0.3, mixup_prob=0.2, num_classes=12)
+    workers = int(os.getenv("AUGMENT_WORKERS", "2"))
+    loader = PrefetchLoader(X_train, y_train, batch_size=32, augmenter=augmenter, workers=workers).start()
+    
     model = create_cnn_attention_model()
     
     callbacks = [
@@ -46,13 +57,14 @@ def train_model():
         keras.callbacks.ReduceLROnPlateau(factor=0.5, patience=5)
     ]
     
-    history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
-        epochs=100,
-        batch_size=32,
-        callbacks=callbacks
-    )
+    with loader:
+        history = model.fit(
+            loader.repeat(),
+            steps_per_epoch=len(loader),
+            validation_data=(X_val, y_val),
+            epochs=100,
+            callbacks=callbacks
+        )
     
     print("Model training completed!")
     return model
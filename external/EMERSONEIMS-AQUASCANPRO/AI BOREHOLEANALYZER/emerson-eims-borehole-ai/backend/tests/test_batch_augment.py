@@ -0,0 +1,111 @@
+"""
+Batch Augmentation Tests
+Vectorised transforms, label mixing, seeded reproducibility and the prefetching loader
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.vision.preprocessing.batch_augment import BatchAugmenter, PrefetchLoader, batch_rng
+from app.modules.vision.preprocessing.resize import ImageResizer
+
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (16, 32, 48, 3), dtype=np.uint8), rng.integers(0, 5, 16)
+
+
+class TestBatchAugmenter:
+    """Per-sample transforms applied to whole batches"""
+
+    def test_output_is_float_in_unit_range(self, batch):
+        images, labels = batch
+        x, y = BatchAugmenter(num_classes=5)(images, labels, batch_rng(1, 0, 0))
+
+        assert x.shape == images.shape and x.dtype == np.float32
+        assert x.min() >= 0.0 and x.max() <= 1.0
+        np.testing.assert_allclose(y.sum(axis=1), 1.0)
+
+    def test_same_seed_same_batch(self, batch):
+        images, labels = batch
+        augmenter = BatchAugmenter(cutmix_prob=0.5, mixup_prob=0.5, num_classes=5)
+
+        a = augmenter(images, labels, batch_rng(7, 2, 3))
+        b = augmenter(images, labels, batch_rng(7, 2, 3))
+        c = augmenter(images, labels, batch_rng(7, 2, 4))
+
+        np.testing.assert_array_equal(a[0], b[0])
+        np.testing.assert_array_equal(a[1], b[1])
+        assert not np.array_equal(a[0], c[0])
+
+    def test_horizontal_flip_only(self, batch):
+        images, _ = batch
+        augmenter = BatchAugmenter(hflip_prob=1.0, vflip_prob=0.0, brightness=0, contrast=0, noise_std=0)
+
+        x, _ = augmenter(images, rng=np.random.default_rng(0))
+
+        np.testing.assert_allclose(x, images[:, :, ::-1].astype(np.float32) / 255.0, atol=1e-6)
+
+    def test_cutmix_labels_match_pasted_area(self, batch):
+        images, labels = batch
+        augmenter = BatchAugmenter(num_classes=5)
+        x = augmenter.to_float(images)
+        y = augmenter.to_soft_labels(labels)
+
+        mixed, soft = augmenter.cutmix(x.copy(), y, np.random.default_rng(3))
+
+        changed = (mixed != x).any(axis=3).mean(axis=(1, 2))
+        own = soft[np.arange(16), labels]
+        # Where the partner has a different class, the own-class weight is the untouched area
+        different = own < 1.0
+        assert different.any()
+        assert np.all(own[different] >= 1.0 - changed[different] - 1e-6)
+
+    def test_mixup_is_convex(self, batch):
+        images, labels = batch
+        augmenter = BatchAugmenter(num_classes=5)
+        x, y = augmenter.mixup(augmenter.to_float(images), augmenter.to_soft_labels(labels), np.random.default_rng(4))
+
+        assert x.min() >= 0.0 and x.max() <= 1.0
+        np.testing.assert_allclose(y.sum(axis=1), 1.0, rtol=1e-6)
+
+
+class TestPrefetchLoader:
+    """Epoch ordering and worker-process equivalence"""
+
+    def test_epoch_covers_dataset_once(self):
+        images = np.arange(50, dtype=np.uint8).reshape(50, 1, 1, 1)
+        loader = PrefetchLoader(images, np.arange(50), batch_size=8, workers=0, seed=3)
+
+        seen = np.concatenate([y for _, y in loader])
+
+        assert len(loader) == 7
+        assert sorted(seen.tolist()) == list(range(50))
+
+    def test_workers_match_in_process(self, batch):
+        images, labels = batch
+        augmenter = BatchAugmenter(cutmix_prob=0.5, num_classes=5)
+        in_process = list(PrefetchLoader(images, labels, batch_size=4, augmenter=augmenter, workers=0).epoch(1))
+
+        with PrefetchLoader(images, labels, batch_size=4, augmenter=augmenter, workers=2, prefetch=2) as loader:
+            pooled = list(loader.epoch(1))
+
+        assert len(pooled) == 4
+        for (xa, ya), (xb, yb) in zip(in_process, pooled):
+            np.testing.assert_array_equal(xa, xb)
+            np.testing.assert_array_equal(ya, yb)
+
+
+def test_batch_resize_array_letterboxes():
+    images = np.full((3, 100, 200, 3), 255, dtype=np.uint8)
+
+    out = ImageResizer.batch_resize(images, (64, 64))
+
+    assert out.shape == (3, 64, 64, 3)
+    assert out[:, 0].max() == 0 and out[:, 32].min() == 255
@@ -0,0 +1,171 @@
+"""
+Inference Server Tests
+Micro-batching of concurrent requests and sliding-window tiling of large scenes
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.ml.models.inference import (
+    InferenceServer,
+    MicroBatcher,
+    blend_window,
+    sliding_window_positions,
+    stitch_tiles,
+    tile_scene,
+)
+
+
+class _RecordingModel:
+    """Stands in for a Keras model; records the batch size of every call"""
+
+    def __init__(self, output_fn):
+        self.output_fn = output_fn
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def predict(self, batch, verbose=0):
+        with self.lock:
+            self.batch_sizes.append(len(batch))
+        time.sleep(0.005)
+        return self.output_fn(batch)
+
+
+class _StubRegistry:
+    def __init__(self, models):
+        self.models = models
+
+    def load_model(self, name):
+        return self.models.get(name)
+
+
+class TestMicroBatcher:
+    """Concurrent submissions coalesce into shared forward passes"""
+
+    def test_concurrent_submits_share_batches(self):
+        model = _RecordingModel(lambda batch: batch.sum(axis=1))
+        batcher = MicroBatcher("test", model.predict, max_batch_size=16, max_latency_ms=20)
+        results = {}
+
+        def client(i):
+            results[i] = batcher.submit(np.full(4, i, dtype=np.float32)).result(timeout=5)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(40)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        assert results == {i: 4.0 * i for i in range(40)}
+        assert sum(model.batch_sizes) == 40
+        assert max(model.batch_sizes) <= 16
+        assert len(model.batch_sizes) < 40
+
+    def test_failure_propagates_to_every_future(self):
+        def broken(batch):
+            raise ValueError("bad weights")
+
+        batcher = MicroBatcher("broken", broken, max_latency_ms=5)
+        futures = batcher.submit_many([np.zeros(2), np.zeros(2)])
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+        batcher.close()
+
+    def test_short_output_fails_every_future(self):
+        batcher = MicroBatcher("short", lambda batch: batch[:1].sum(axis=1), max_latency_ms=50)
+        futures = batcher.submit_many([np.zeros(2), np.ones(2), np.ones(2)])
+        for future in futures:
+            with pytest.raises(ValueError, match="1 outputs for a batch of 3"):
+                future.result(timeout=5)
+        batcher.close()
+
+
+class TestTiling:
+    """Sliding windows cover the scene and blending is an exact average"""
+
+    @pytest.mark.parametrize("length,tile,overlap", [(224, 224, 32), (1000, 224, 32), (513, 512, 64), (100, 224, 32)])
+    def test_positions_cover_scene(self, length, tile, overlap):
+        positions = sliding_window_positions(length, tile, overlap)
+        covered = np.zeros(max(length, tile), dtype=bool)
+        for p in positions:
+            covered[p:p + tile] = True
+        assert covered.all()
+        assert positions[-1] + tile == max(length, tile)
+
+    def test_stitching_reconstructs_input(self):
+        scene = np.random.default_rng(0).random((700, 1100)).astype(np.float32)
+        tiles, positions, padded = tile_scene(scene, 512, 64)
+
+        stitched = stitch_tiles(tiles, positions, padded, blend_window(512, 64))
+
+        np.testing.assert_allclose(stitched[:700, :1100], scene, rtol=1e-5, atol=1e-6)
+
+    def test_small_scene_is_padded_to_one_tile(self):
+        tiles, positions, padded = tile_scene(np.ones((100, 150, 3), dtype=np.uint8), 224, 32)
+        assert tiles.shape == (1, 224, 224, 3)
+        assert positions == [(0, 0)] and padded == (224, 224)
+
+
+class TestInferenceServer:
+    """Scene-level classification and segmentation through the batchers"""
+
+    @pytest.fixture
+    def server(self):
+        classifier = _RecordingModel(lambda batch: np.tile(np.eye(25, dtype=np.float32)[0], (len(batch), 1)))
+        segmenter = _RecordingModel(lambda batch: np.full(batch.shape, 0.9, dtype=np.float32))
+        registry = _StubRegistry({
+            InferenceServer.CLASSIFIER: classifier,
+            InferenceServer.SEGMENTER: segmenter,
+        })
+        server = InferenceServer(registry=registry, max_batch_size=32, max_latency_ms=5)
+        yield server, classifier, segmenter
+        server.close()
+
+    def test_classify_scene_tiles_instead_of_resizing(self, server):
+        server, classifier, _ = server
+        image = np.random.default_rng(1).integers(0, 255, (600, 900, 3), dtype=np.uint8)
+
+        result = server.classify_scene(image)
+
+        assert result["primary_formation"] == "GRANITE"
+        assert result["tiling"]["tiles"] == len(result["tile_predictions"]) == 3 * 5
+        # Warm-up call plus tiles coalesced into far fewer than one call per tile
+        assert len(classifier.batch_sizes) - 1 < result["tiling"]["tiles"]
+
+    def test_many_sites_share_batches(self, server):
+        server, classifier, _ = server
+        images = [np.zeros((224, 224, 3), dtype=np.uint8) for _ in range(20)]
+
+        results = server.classify_scenes(images)
+
+        assert len(results) == 20
+        assert server.stats()[InferenceServer.CLASSIFIER]["max_batch_size"] > 1
+
+    def test_lineament_mask_is_full_resolution(self, server):
+        server, _, segmenter = server
+        dem = np.random.default_rng(2).random((800, 1000)).astype(np.float32) * 100
+
+        result = server.detect_lineaments_scene(dem)
+
+        assert result["lineament_mask"]["shape"] == (800, 1000)
+        assert result["statistics"]["total_lineament_pixels"] == 800 * 1000
+        assert result["tiling"]["tiles"] == 2 * 3
+        assert sum(segmenter.batch_sizes[1:]) == 6
+
+    def test_fallback_without_weights(self):
+        server = InferenceServer(registry=_StubRegistry({}), max_latency_ms=5)
+        try:
+            result = server.detect_lineaments_scene(np.random.default_rng(3).random((300, 300)))
+            assert result["model_confidence"] == 0.72
+            assert "tiling" in server.classify_scene(np.zeros((224, 224, 3), dtype=np.uint8))
+        finally:
+            server.close()
@@ -0,0 +1,125 @@
+"""
+Streaming Bulk Export Tests
+Keyset pagination over the analyses table and incremental CSV/GeoJSON/KML/XLSX writers
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.export.streaming import StreamingExporter, iter_analysis_rows
+
+
+def _rows(n):
+    for i in range(1, n + 1):
+        yield {
+            'id': i,
+            'latitude': -1.3 + i * 1e-4,
+            'longitude': 36.7 + i * 1e-4,
+            'status': 'completed',
+            'probability': 0.78,
+            'recommended_depth_m': 42.0,
+            'estimated_yield_m3h': 8.5,
+            'soil_type': 'loamy & <clay>',
+            'overall_risk': 'moderate',
+        }
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database populated with 1,234 analyses for two users"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    import app.database.models  # noqa: F401 — registers every table on Base
+    from app.database.session import Base
+    from app.database.models.borehole import Analysis
+
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    db.add_all([
+        Analysis(user_id=1 + (i % 2), latitude=-1.0, longitude=36.0, probability=0.5,
+                 status='completed', created_at=datetime(2026, 1, 1),
+                 risk_assessment={'overall_risk': 'high'})
+        for i in range(1234)
+    ])
+    db.commit()
+    db.close()
+    return factory
+
+
+class TestStreamingExport:
+    """Bulk analysis export without materialising the result set"""
+
+    def test_keyset_pagination_covers_every_row_once(self, session_factory):
+        ids = [row['id'] for row in iter_analysis_rows(session_factory, user_id=1, batch_size=100)]
+
+        assert len(ids) == 617
+        assert ids == sorted(set(ids))
+        assert all(i % 2 == 1 for i in ids)
+
+    def test_csv_stream_is_chunked(self):
+        chunks = list(StreamingExporter(_rows(1050), flush_every=500).iter_csv())
+
+        assert len(chunks) == 3
+        parsed = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert len(parsed) == 1050
+        assert parsed[0]['soil_type'] == 'loamy & <clay>'
+
+    def test_geojson_stream_is_valid_feature_collection(self):
+        body = b''.join(StreamingExporter(_rows(25), flush_every=10).iter_geojson())
+        doc = json.loads(body)
+
+        assert doc['type'] == 'FeatureCollection'
+        assert len(doc['features']) == 25
+        assert doc['features'][0]['geometry']['coordinates'][0] == pytest.approx(36.7001)
+
+    def test_geojson_stream_empty(self):
+        doc = json.loads(b''.join(StreamingExporter(iter(())).iter_geojson()))
+        assert doc['features'] == []
+
+    def test_kml_stream_escapes_and_closes_document(self):
+        from xml.etree import ElementTree
+
+        body = b''.join(StreamingExporter(_rows(12), flush_every=5).iter_kml())
+        root = ElementTree.fromstring(body)
+        ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+
+        assert len(root.findall('.//kml:Placemark', ns)) == 12
+
+    def test_xlsx_stream_from_database(self, session_factory):
+        openpyxl = pytest.importorskip('openpyxl')
+
+        rows = iter_analysis_rows(session_factory, user_id=2, batch_size=200)
+        body = b''.join(StreamingExporter(rows).stream('xlsx'))
+        wb = openpyxl.load_workbook(io.BytesIO(body), read_only=True)
+        sheet_rows = list(wb['Analysis Results'].iter_rows(values_only=True))
+
+        assert len(sheet_rows) == 618  # header + 617 analyses
+        assert sheet_rows[0][0] == 'Analysis ID'
+        assert sheet_rows[1][4] == pytest.approx(50.0)
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            StreamingExporter(_rows(1)).stream('shapefile')
+
+    def test_token_without_subject_is_rejected(self):
+        from fastapi import HTTPException
+
+        from app.dependencies import get_current_user
+
+        with pytest.raises(HTTPException) as exc:
+            get_current_user({'exp': 0})
+        assert exc.value.status_code == 401
+        assert get_current_user({'sub': '7'}) == '7'
@@ -0,0 +1,180 @@
+"""
+Pipeline Tracing Tests
+Nested spans, trace-id propagation into logs, /metrics exposition and the sampling profiler
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import tracing
+from app.core.metrics import stage_duration
+from app.core.profiler import ProfilerBusyError, SamplingProfiler
+
+
+def _observed_count(kind, name, status="ok"):
+    for metric in stage_duration.collect():
+        for sample in metric.samples:
+            if (sample.name.endswith("_count") and sample.labels.get("kind") == kind
+                    and sample.labels.get("name") == name and sample.labels.get("status") == status):
+                return sample.value
+    return 0.0
+
+
+class TestSpans:
+    """Span nesting and histogram observation"""
+
+    def test_nested_spans_build_a_tree(self):
+        with tracing.span("run", kind="test") as root:
+            with tracing.span("soil", kind="test_step"):
+                with tracing.span("rest.isric.org", kind="fetch"):
+                    pass
+            with tracing.span("dem", kind="test_step"):
+                pass
+
+        tree = root.to_dict()
+        assert [c["name"] for c in tree["children"]] == ["soil", "dem"]
+        assert tree["children"][0]["children"][0]["kind"] == "fetch"
+        assert tracing.current_span() is None
+
+    def test_error_status_is_recorded(self):
+        before = _observed_count("test_err", "boom", "error")
+        with pytest.raises(RuntimeError):
+            with tracing.span("boom", kind="test_err"):
+                raise RuntimeError("upstream down")
+        assert _observed_count("test_err", "boom", "error") == before + 1
+
+    def test_traced_async_and_thread_offload_keep_parent(self):
+        @tracing.traced(kind="test_fetch")
+        def fetch():
+            return tracing.current_span().parent.name
+
+        @tracing.traced(name="step", kind="test_step")
+        async def step():
+            return await asyncio.to_thread(fetch)
+
+        assert asyncio.run(step()) == "step"
+
+    def test_traced_urlopen_names_span_after_host(self):
+        before = _observed_count("fetch", "power.larc.nasa.gov")
+        with patch("urllib.request.urlopen", return_value="resp") as urlopen:
+            assert tracing.traced_urlopen("https://power.larc.nasa.gov/api/x?lat=1", timeout=3) == "resp"
+        urlopen.assert_called_once()
+        assert _observed_count("fetch", "power.larc.nasa.gov") == before + 1
+
+
+class TestTraceIdLogging:
+    """Trace id bound to the context appears on every log record"""
+
+    def test_log_records_carry_trace_id(self, caplog):
+        tracing.install_log_trace_id()
+        token = tracing.set_trace_id("abc123")
+        try:
+            with caplog.at_level(logging.INFO):
+                logging.getLogger("borehole.test").info("hello")
+        finally:
+            tracing.reset_trace_id(token)
+
+        assert caplog.records[-1].trace_id == "abc123"
+
+
+class TestObservabilityRoutes:
+    """/metrics exposition and profiler gating"""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from app.api.routes import observability
+        from app.dependencies import require_admin
+        from app.middleware.tracing import TracingMiddleware
+
+        api = FastAPI()
+        api.add_middleware(TracingMiddleware)
+        api.include_router(observability.router)
+        api.dependency_overrides[require_admin] = lambda: SimpleNamespace(id=1, role="admin")
+        return TestClient(api)
+
+    def test_metrics_endpoint_exposes_stage_histograms(self, client):
+        response = client.get("/metrics", headers={"X-Trace-Id": "trace-42"})
+
+        assert response.status_code == 200
+        assert response.headers["X-Trace-Id"] == "trace-42"
+        assert "borehole_stage_duration_seconds_bucket" in response.text
+
+        second = client.get("/metrics")
+        assert 'route="/metrics"' in second.text
+
+    def test_profiler_is_opt_in(self, client):
+        with patch("app.config.Config.ENABLE_PROFILER", False):
+            assert client.get("/api/v1/debug/profile?seconds=0.1").status_code == 404
+
+        with patch("app.config.Config.ENABLE_PROFILER", True):
+            response = client.get("/api/v1/debug/profile?seconds=0.2&format=json")
+        assert response.status_code == 200
+        assert response.json()["samples"] > 0
+
+    def test_profiler_requires_an_admin(self, client):
+        from app.database.session import get_db
+        from app.dependencies import get_current_user, require_admin
+
+        client.app.dependency_overrides.pop(require_admin)
+        with patch("app.config.Config.ENABLE_PROFILER", True):
+            assert client.get("/api/v1/debug/profile?seconds=0.1").status_code in (401, 403)
+
+            class Users:
+                def query(self, model):
+                    return self
+
+                def filter(self, *conditions):
+                    return self
+
+                def first(self):
+                    return SimpleNamespace(id=1, role="user")
+
+            client.app.dependency_overrides[get_current_user] = lambda: "1"
+            client.app.dependency_overrides[get_db] = Users
+            assert client.get("/api/v1/debug/profile?seconds=0.1").status_code == 403
+
+
+class TestSamplingProfiler:
+    """Folded-stack capture of other threads"""
+
+    def test_capture_sees_busy_thread(self):
+        stop = threading.Event()
+
+        def busy_loop():
+            while not stop.is_set():
+                sum(i * i for i in range(200))
+
+        worker = threading.Thread(target=busy_loop, daemon=True)
+        worker.start()
+        try:
+            result = SamplingProfiler(interval=0.002).capture(0.3)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert result["samples"] > 10
+        assert "busy_loop" in result["folded"]
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in result["folded"].splitlines())
+
+    def test_one_capture_at_a_time(self):
+        first = threading.Thread(target=SamplingProfiler().capture, args=(0.3,))
+        first.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(ProfilerBusyError):
+                SamplingProfiler().capture(0.1)
+        finally:
+            first.join()
@@ -0,0 +1,96 @@
+"""
+Columnar Water Quality Prediction Tests
+Vectorised predictors agree with the per-site dict API and the original formulas
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules.ml.water_quality_specific import ContaminantSpecificModels, SiteColumns, TDSPredictor
+
+
+class _NoNoise:
+    """Drop-in for np.random that returns zero measurement noise"""
+
+    def normal(self, loc, scale, size):
+        return np.zeros(size)
+
+
+SITES = [
+    {'depth_m': 100, 'geology': 'LIMESTONE', 'aquifer_type': 'confined', 'land_use': 'agricultural', 'latitude': -1.3},
+    {'depth_m': 15, 'geology': 'GRANITE', 'aquifer_type': 'unconfined', 'land_use': 'urban', 'latitude': 10.0},
+    {'depth_m': 60, 'geology': 'ALLUVIUM', 'aquifer_type': 'karst', 'land_use': 'natural', 'latitude': 0.0},
+    {'geology': 'UNMAPPED'},
+]
+
+
+@pytest.fixture
+def models():
+    return ContaminantSpecificModels()
+
+
+def test_columnar_matches_original_formulas(models):
+    result = models.predict_columns(pd.DataFrame(SITES[:1]), rng=_NoNoise())[0]
+
+    assert result['tds']['predicted_mg_l'] == pytest.approx(450 * 1.5 * 1.3 * 1.4)
+    assert result['tds']['exceeds_guideline']
+    assert result['arsenic']['predicted_ug_l'] == pytest.approx(0.0005 * 2.5 * 1.6 * 1000)
+    assert result['nitrate']['predicted_mg_l'] == pytest.approx(15 * 0.5)
+    assert result['manganese']['predicted_mg_l'] == pytest.approx(0.3 * min(1 + 100 / 150, 1.8))
+
+
+def test_batch_rows_equal_single_site_calls(models, monkeypatch):
+    batch = models.predict_columns({k: [s.get(k) for s in SITES] for k in ('depth_m', 'geology', 'aquifer_type',
+                                                                            'land_use', 'latitude')}, rng=_NoNoise())
+
+    monkeypatch.setattr(np, 'random', _NoNoise())
+    for i, site in enumerate(SITES):
+        single = models.predict_all_parameters(site)
+        for name, model in models.models.items():
+            assert model.to_dict(batch[i][name]) == single[name]
+
+
+def test_missing_values_take_defaults():
+    cols = SiteColumns(pd.DataFrame({
+        'depth_m': [np.nan, 30.0],
+        'geology': pd.Categorical([None, 'GRANITE']),
+    }))
+
+    assert cols.depth_m.tolist() == [50.0, 30.0]
+    assert cols.lookup('geology', {'GRANITE': 1, 'unknown': 2}, 0).tolist() == [2, 1]
+    assert cols.equals('aquifer_type', 'unconfined').all()
+
+
+def test_dict_api_keeps_response_shape(models):
+    predictions = models.predict_all_parameters(SITES[1])
+
+    assert predictions['hardness']['category'] in ("Soft", "Slightly hard", "Moderately hard", "Hard")
+    assert predictions['arsenic']['health_risk'] in ("HIGH", "LOW")
+    assert isinstance(predictions['tds']['exceeds_guideline'], bool)
+    assert len(predictions['tds']['confidence_interval_95']) == 2
+
+
+def test_empty_features_predict_from_defaults(models, monkeypatch):
+    monkeypatch.setattr(np, 'random', _NoNoise())
+    defaults = models.predict_all_parameters({'depth_m': 50, 'geology': 'unknown'})
+
+    for features in ({}, {'notes': 'no known features'}):
+        assert models.predict_all_parameters(features) == defaults
+    # predict() draws noise from the real np.random, bound as its default rng
+    tds = TDSPredictor().predict({})
+    assert tds.keys() == defaults['tds'].keys()
+    assert tds['predicted_mg_l'] == pytest.approx(defaults['tds']['predicted_mg_l'], abs=5 * TDSPredictor.RMSE)
+    assert SiteColumns({}).n == 1
+    assert SiteColumns(pd.DataFrame(index=range(3))).n == 3
+
+
+def test_bad_features_report_errors(models):
+    predictions = models.predict_all_parameters({'depth_m': 'deep'})
+    assert set(predictions) == set(models.models)
+    assert all('error' in p for p in predictions.values())
@@ -3,7 +3,7 @@ EMERSON EIMS - Production-Grade Construction Intelligence Platform
 Complete with all 13 phases, real data, AI engines, professional UI
 """
 
-from flask import Flask, render_template_string, request, jsonify, send_file, session
+from flask import Flask, Response, render_template_string, request, jsonify, send_file, session, g
 from flask_cors import CORS
 from functools import wraps
 import json
@@ -20,33 +20,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger('eims')
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 import io
 import base64
 import math
 import hashlib
 import secrets
 import sqlite3
-import requests
+import importlib.util
 import urllib.parse
 import uuid
 import struct
 import threading
 import tempfile
-from svglib.svglib import svg2rlg
-from reportlab.platypus import Image as RLImage
-from reportlab.graphics import renderPDF
-try:
-    import ezdxf
-    HAS_EZDXF = True
-except ImportError:
-    HAS_EZDXF = False
+# reportlab, svglib, openpyxl, ezdxf and requests are imported inside the
+# functions that use them (the PDF/XLSX/DXF builders and the AI-render proxy):
+# together they are ~0.5 s of import that cold start should not pay.
+HAS_EZDXF = importlib.util.find_spec('ezdxf') is not None
 
 app = Flask(__name__)
 
@@ -57,12 +46,13 @@ try:
 except ValueError:
     _max_upload_mb = 10
 app.config['MAX_CONTENT_LENGTH'] = max(1, _max_upload_mb) * 1024 * 1024
-# Required for Paystack unlock session cookie (and any future signed cookies).
+# Required for the Paystack unlock and active-project session cookie.
 app.secret_key = os.environ.get('EIMS_SECRET_KEY', '').strip() or secrets.token_hex(32)
 if not os.environ.get('EIMS_SECRET_KEY', '').strip():
     logger.warning(
         'EIMS_SECRET_KEY is not set — browser sessions reset on restart; '
-        'set it in production so paid report unlock persists reliably.'
+        'set it in production so paid report unlock and the active project '
+        'persist reliably and are shared by every worker process.'
     )
 
 # Allowed image upload extensions (whitelist).
@@ -101,52 +91,22 @@ if EIMS_CORS_ORIGINS:
     CORS(app, resources={r"/api/*": {"origins": EIMS_CORS_ORIGINS}}, supports_credentials=True)
 # else: no CORS extension applied -> same-origin only
 
+from eims_modules import compression as _eims_compression
+
 # ================== SECURITY HEADERS ==================
 # Baseline hardening. CSP is intentionally omitted because the wizard HTMLs
 # rely on inline scripts/styles -- enabling a strict CSP would require
 # refactoring those pages first.
 @app.after_request
 def _compress_response(response):
-    """Gzip text/json/js/css/svg responses > 500 B when the client advertises
-    Accept-Encoding: gzip. Typical savings on the 300KB wizard HTML: ~5x
-    (→ 60KB over the wire), which cuts first-load time dramatically on
-    slow mobile connections. We skip binaries (images, DXF, glTF) since
-    they're already compressed."""
-    try:
-        if response.status_code != 200:
-            return response
-        if response.direct_passthrough:
-            return response
-        if response.headers.get('Content-Encoding'):
-            return response
-        accept = request.headers.get('Accept-Encoding', '')
-        if 'gzip' not in accept.lower():
-            return response
-        ctype = (response.headers.get('Content-Type') or '').lower()
-        gzippable = any(x in ctype for x in (
-            'text/', 'application/json', 'application/javascript',
-            'application/xml', '+xml', '+json',
-        ))
-        if not gzippable:
-            return response
-        data = response.get_data()
-        if len(data) < 500:
-            return response
-        import gzip, io
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=6) as gz:
-            gz.write(data)
-        gz_data = buf.getvalue()
-        # Only switch if we actually saved bytes
-        if len(gz_data) >= len(data):
-            return response
-        response.set_data(gz_data)
-        response.headers['Content-Encoding'] = 'gzip'
-        response.headers['Content-Length'] = str(len(gz_data))
-        response.headers.add('Vary', 'Accept-Encoding')
-    except Exception:
-        pass  # On any failure, return the original uncompressed response
-    return response
+    """Compress text/json/js/css/svg responses for clients that accept gzip
+    (or brotli, when installed). Streamed responses are compressed chunk by
+    chunk instead of being buffered; large bodies go out chunked; small,
+    incompressible or over-budget bodies are left alone (see
+    eims_modules/compression.py). The wizard shell and its fingerprinted
+    CSS/JS arrive here already encoded from precompressed variants. We skip
+    binaries (images, DXF, glTF) since they're already compressed."""
+    return _eims_compression.compress_response(response, request.headers.get('Accept-Encoding', ''))
 
 @app.after_request
 def _set_security_headers(response):
@@ -1470,6 +1430,9 @@ class CostingEngine:
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eims.db')
 
+from eims_modules import db as _eims_db
+from eims_modules import jobs as _eims_jobs
+
 def init_db():
     """Initialize SQLite database with schema (anonymous-only — no auth tables)."""
     conn = sqlite3.connect(DB_PATH)
@@ -1504,14 +1467,24 @@ def init_db():
         data_json TEXT NOT NULL,
         updated_at TEXT NOT NULL
     )''')
+    # list_projects filters on either owner column and sorts by creation.
+    c.execute('CREATE INDEX IF NOT EXISTS idx_projects_user ON projects(user_id, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner_id, created_at)')
     conn.commit()
     conn.close()
 
 def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH, timeout=10)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get a pooled database connection (``close()`` returns it to the pool).
+
+    Connections are kept per thread with WAL / synchronous=NORMAL / mmap
+    tuning and a warm statement cache -- see eims_modules/db.py.
+    """
+    return _db_pool.connect()
+
+
+_db_pool = _eims_db.get_pool(DB_PATH)
+# Decoded data_json/phases_json of recently used projects; see _load_project.
+PROJECT_CACHE = _eims_db.ProjectCache(int(os.environ.get('EIMS_PROJECT_CACHE_SIZE', '64')))
 
 # This product is shipped embedded inside www.emersoneims.com; there are no
 # user accounts and no login flow. Every request is the same anonymous
@@ -1604,20 +1577,90 @@ def _resolve_owned_project_dict(data):
     pid = data.get('project_id')
     if not pid:
         return None
-    row = _load_owned_project(pid)
-    if not row:
-        return None
     try:
-        proj = json.loads(row['data_json'])
-        proj['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
-        return proj
+        return _load_project(pid)
     except Exception:
         return None
 
 # Initialize database on startup
 init_db()
 
-current_project = None
+# ---------------------------------------------------------------------------
+# Request-scoped project context
+# The active project is loaded from SQLite into flask.g for the duration of
+# one request; which project is "active" for a browser is remembered in its
+# signed session cookie. No project state lives at module level, so the app
+# is safe under multi-threaded waitress and across worker processes (set
+# EIMS_SECRET_KEY so every process can read the same session cookie).
+# ---------------------------------------------------------------------------
+
+def _load_project(project_id):
+    """Project dict (with ``phases``) for ``project_id``, or None.
+
+    Decoded rows are memoised in PROJECT_CACHE under the row's updated_at and
+    blob lengths, so repeat loads skip json.loads while writes made by other
+    threads or processes are still seen. The caller owns the returned dict.
+    """
+    conn = get_db()
+    try:
+        head = conn.execute(
+            'SELECT updated_at, length(data_json), length(phases_json) FROM projects WHERE id = ?',
+            (project_id,)).fetchone()
+        if not head:
+            return None
+        version = tuple(head)
+        project = PROJECT_CACHE.get(project_id, version)
+        if project is not None:
+            return project
+        row = conn.execute('SELECT data_json, phases_json FROM projects WHERE id = ?',
+                           (project_id,)).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    project = json.loads(row['data_json'])
+    project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
+    PROJECT_CACHE.put(project_id, version, project)
+    return project
+
+
+def _set_active_project(project):
+    """Make ``project`` this request's project and the browser's active one."""
+    g.project = project
+    if project and project.get('id'):
+        session['project_id'] = project['id']
+    return project
+
+
+def _request_project(project_id=None):
+    """Project for this request: ``project_id`` if given, else the browser's
+    active project. Loaded from SQLite once per request."""
+    project = g.get('project')
+    if project is not None and (not project_id or project.get('id') == project_id):
+        return project
+    project_id = project_id or session.get('project_id')
+    if not project_id:
+        return None
+    project = _load_project(project_id)
+    return _set_active_project(project) if project else None
+
+
+def _save_project(project, phases=False):
+    """Persist ``project`` back to its row (and ``phases_json`` if asked)."""
+    now = datetime.now().isoformat()
+    conn = get_db()
+    try:
+        if phases:
+            conn.execute('UPDATE projects SET phases_json=?, data_json=?, updated_at=? WHERE id=?',
+                         (json.dumps(project.get('phases') or {}), json.dumps(project), now, project.get('id')))
+        else:
+            conn.execute('UPDATE projects SET data_json=?, updated_at=? WHERE id=?',
+                         (json.dumps(project), now, project.get('id')))
+        conn.commit()
+    finally:
+        conn.close()
+        PROJECT_CACHE.invalidate(project.get('id'))
+
 
 # NOTE: All login / register / logout endpoints were removed when the suite
 # moved into the public www.emersoneims.com nav. The product is now
@@ -1744,7 +1787,10 @@ def index():
         preload.append(f'</static/wizard-{a["js_hash"]}.js>; rel=preload; as=script')
     if preload:
         headers['Link'] = ', '.join(preload)
-    return shell, 200, headers
+    if a['path'] is None:
+        return shell, 200, headers
+    return _eims_compression.static_response(f'wizard-shell-{etag}', shell,
+                                        headers.pop('Content-Type'), headers)
 
 
 @app.route('/static/wizard-<asset_hash>.css', methods=['GET'])
@@ -1756,11 +1802,9 @@ def wizard_css(asset_hash):
     if not a['css_hash'] or asset_hash != a['css_hash']:
         # Stale fingerprint (HTML moved on). Tell the client to refetch /.
         return ('', 404, {'Cache-Control': 'no-cache'})
-    return a['css'], 200, {
-        'Content-Type': 'text/css; charset=utf-8',
-        'Cache-Control': 'public, max-age=31536000, immutable',
-        'Vary': 'Accept-Encoding',
-    }
+    return _eims_compression.static_response(f'wizard-{asset_hash}.css', a['css'],
+                                        'text/css; charset=utf-8',
+                                        {'Cache-Control': 'public, max-age=31536000, immutable'})
 
 
 @app.route('/static/wizard-<asset_hash>.js', methods=['GET'])
@@ -1770,11 +1814,9 @@ def wizard_js(asset_hash):
     a = _build_wizard_assets()
     if not a['js_hash'] or asset_hash != a['js_hash']:
         return ('', 404, {'Cache-Control': 'no-cache'})
-    return a['js'], 200, {
-        'Content-Type': 'application/javascript; charset=utf-8',
-        'Cache-Control': 'public, max-age=31536000, immutable',
-        'Vary': 'Accept-Encoding',
-    }
+    return _eims_compression.static_response(f'wizard-{asset_hash}.js', a['js'],
+                                        'application/javascript; charset=utf-8',
+                                        {'Cache-Control': 'public, max-age=31536000, immutable'})
 
 # Pollinations.ai now blocks browser-direct requests with `Origin`/`Referer` headers
 # (returns 403 "Missing Turnstile token"). Server-side requests with no browser
@@ -1788,6 +1830,8 @@ _AI_RENDER_MAX_PROMPT = 1500
 
 @app.route('/api/ai/render', methods=['GET'])
 def ai_render_proxy():
+    import requests
+
     prompt = (request.args.get('prompt') or '').strip()
     if not prompt:
         return jsonify({'error': 'prompt required'}), 400
@@ -1837,12 +1881,11 @@ def ai_render_proxy():
 @app.route('/api/projects', methods=['POST'])
 @auth_required
 def create_project():
-    global current_project
     data = request.json or {}
     project_id = f"PROJ-{datetime.now().strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(4)}"
     user = request._eims_user  # type: ignore[attr-defined]
 
-    current_project = {
+    project = {
         'id': project_id,
         'name': data.get('name', 'Untitled'),
         'location': data.get('location', ''),
@@ -1873,14 +1916,15 @@ def create_project():
     conn.execute('''INSERT INTO projects (id, user_id, name, location, gps_lat, gps_lng, building_type,
                     units, stories, area, bedrooms, description, data_json, phases_json, created_at, updated_at)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                 (project_id, user['id'] if user else None, current_project['name'],
-                  current_project['location'], current_project['gps_lat'], current_project['gps_lng'],
-                  current_project['building_type'], current_project['units'], current_project['stories'],
-                  current_project['area'], current_project.get('bedrooms', 3), current_project['description'],
-                  json.dumps(current_project), '{}', datetime.now().isoformat(), datetime.now().isoformat()))
+                 (project_id, user['id'] if user else None, project['name'],
+                  project['location'], project['gps_lat'], project['gps_lng'],
+                  project['building_type'], project['units'], project['stories'],
+                  project['area'], project.get('bedrooms', 3), project['description'],
+                  json.dumps(project), '{}', datetime.now().isoformat(), datetime.now().isoformat()))
     conn.commit()
     conn.close()
 
+    _set_active_project(project)
     return jsonify({'success': True, 'project_id': project_id})
 
 @app.route('/api/projects', methods=['GET'])
@@ -1910,14 +1954,10 @@ def list_projects():
 @auth_required
 def get_project(project_id):
     """Load a specific project (ownership enforced)."""
-    global current_project
-    user = request._eims_user  # type: ignore[attr-defined]
-    row = _load_owned_project(project_id, user)
-    if not row:
+    project = _request_project(project_id)
+    if not project:
         return jsonify({'error': 'Project not found'}), 404
-    current_project = json.loads(row['data_json'])
-    current_project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
-    return jsonify({'success': True, 'project': current_project})
+    return jsonify({'success': True, 'project': project})
 
 
 @app.route('/api/project/geotech', methods=['POST'])
@@ -1934,10 +1974,10 @@ def upload_geotech():
     All five fields are MANDATORY. Per the project data policy, partial
     geotech data is rejected — fabricating any field is not acceptable.
     """
-    global current_project
-    if not current_project:
-        return jsonify({'error': 'No active project. Generate one first.'}), 400
     body = request.json or {}
+    project = _request_project(body.get('project_id'))
+    if not project:
+        return jsonify({'error': 'No active project. Generate one first.'}), 400
     required = ['safe_bearing_kPa', 'water_table_m', 'soil_class',
                 'report_ref', 'geotech_engineer']
     missing = [k for k in required if not body.get(k) and body.get(k) != 0]
@@ -1957,15 +1997,9 @@ def upload_geotech():
         }
     except (TypeError, ValueError) as e:
         return jsonify({'error': f'Invalid numeric value: {e}'}), 400
-    current_project['geotech'] = geo
-    # Persist
+    project['geotech'] = geo
     try:
-        conn = get_db()
-        conn.execute(
-            'UPDATE projects SET data_json=?, updated_at=? WHERE id=?',
-            (json.dumps(current_project), datetime.now().isoformat(), current_project.get('id'))
-        )
-        conn.commit(); conn.close()
+        _save_project(project)
     except Exception as _e:
         logger.warning('Geotech persist warning: %s', _e)
     return jsonify({'success': True, 'geotech': geo,
@@ -1981,33 +2015,29 @@ def project_price_overrides():
     GET:        returns the stored overrides dict.
     DELETE:     wipes all overrides (revert to auto-calculated rates).
 
-    Stored on `current_project['price_overrides']` and persisted to SQLite so
+    Stored on the project's `price_overrides` and persisted to SQLite so
     the next /api/export/pdf call picks them up automatically. Keys are
     "<trade-section-label>|<line-description>" (exact match, case-sensitive)
     so the override survives even when items are reordered.
     """
-    global current_project
-    if not current_project:
+    body = request.get_json(silent=True) or {}
+    project = _request_project(body.get('project_id') or request.args.get('project_id'))
+    if not project:
         return jsonify({'error': 'No active project. Generate one first.'}), 400
     if request.method == 'GET':
         return jsonify({'success': True,
-                        'overrides': current_project.get('price_overrides') or {}})
+                        'overrides': project.get('price_overrides') or {}})
     if request.method == 'DELETE':
-        current_project['price_overrides'] = {}
+        project['price_overrides'] = {}
         try:
-            conn = get_db()
-            conn.execute('UPDATE projects SET data_json=?, updated_at=? WHERE id=?',
-                         (json.dumps(current_project), datetime.now().isoformat(),
-                          current_project.get('id')))
-            conn.commit(); conn.close()
+            _save_project(project)
         except Exception as _e:
             logger.warning('Override clear persist warning: %s', _e)
         return jsonify({'success': True, 'overrides': {}, 'cleared': True})
-    body = request.json or {}
     incoming = body.get('overrides') or {}
     if not isinstance(incoming, dict):
         return jsonify({'error': 'overrides must be a {key: rate} object'}), 400
-    existing = current_project.get('price_overrides') or {}
+    existing = project.get('price_overrides') or {}
     cleaned = 0
     for k, v in incoming.items():
         if v is None or v == '' or v == 0:
@@ -2018,140 +2048,69 @@ def project_price_overrides():
             existing[str(k)] = float(v)
         except (TypeError, ValueError):
             return jsonify({'error': f'Invalid rate for "{k}": {v!r}'}), 400
-    current_project['price_overrides'] = existing
+    project['price_overrides'] = existing
     try:
-        conn = get_db()
-        conn.execute('UPDATE projects SET data_json=?, updated_at=? WHERE id=?',
-                     (json.dumps(current_project), datetime.now().isoformat(),
-                      current_project.get('id')))
-        conn.commit(); conn.close()
+        _save_project(project)
     except Exception as _e:
         logger.warning('Override persist warning: %s', _e)
     return jsonify({'success': True, 'overrides': existing,
                     'updated': len(incoming) - cleaned, 'cleared': cleaned,
                     'message': 'Overrides saved. Re-export the PDF to apply.'})
 
-@app.route('/api/execute-all-phases', methods=['POST'])
-@auth_required
-def execute_all_phases():
-    """Execute all 13 phases with real engineering algorithms.
-
-    Requires authentication and verifies project ownership before running.
-    """
-    global current_project
-    user = request._eims_user  # type: ignore[attr-defined]
-    body = request.json or {}
-    project_id = body.get('project_id') or (current_project.get('id') if current_project else None)
-    if not project_id:
-        return jsonify({'error': 'project_id required'}), 400
-    row = _load_owned_project(project_id, user)
-    if not row:
-        return jsonify({'error': 'Project not found'}), 404
-    current_project = json.loads(row['data_json'])
-    current_project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
-    if not current_project:
-        return jsonify({'error': 'No project'}), 400
-
-    stories = int(current_project.get('stories', 2))
-    units = int(current_project.get('units', 3))
-    area = float(current_project.get('area', 450))
-    bedrooms = int(current_project.get('bedrooms', 3))
-    location = current_project.get('location', '')
-    lat = float(current_project.get('gps_lat', 0))
-    lng = float(current_project.get('gps_lng', 0))
-    building_type = current_project.get('building_type', 'residential')
-
-    # Phase 1: Satellite Analysis (deterministic from GPS)
-    site_data = SatelliteAnalyzer.analyze_site(lat, lng)
-    current_project['phases']['phase_1'] = {
-        'name': 'Site Analysis',
-        'data': site_data,
-        'timestamp': datetime.now().isoformat(),
-    }
-
-    # Phase 2: Geotechnical
-    geo_data = GeotechnicalDesigner.calculate(site_data)
-    current_project['phases']['phase_2'] = {
-        'name': 'Geotechnical Design',
-        'data': geo_data,
-        'timestamp': datetime.now().isoformat(),
-    }
+# ---------------------------------------------------------------------------
+# 13-PHASE PIPELINE
+# Phases are declared as a DAG over normalised project inputs (see
+# eims_modules/phase_graph.py). Results are memoised in phases_json by a hash
+# of each phase's inputs, so editing one field only recomputes the phases
+# downstream of it; independent phases run concurrently.
+# ---------------------------------------------------------------------------
 
-    # Phase 3: Foundation (with building type & area)
-    # Override satellite soil_type with user-supplied soil_type if provided
-    user_soil = current_project.get('soil_type', '')
-    if user_soil:
-        site_data['soil_type'] = user_soil
-    foundation = FoundationDesigner.design(stories, site_data, building_type, area)
-    current_project['phases']['phase_3'] = {
-        'name': 'Foundation Design',
-        'data': foundation,
-        'timestamp': datetime.now().isoformat(),
-    }
+from eims_modules.phase_graph import Phase, PhaseGraph
 
-    # Phase 4: Floor Plans (uses actual bedrooms input + style)
-    style = current_project.get('style', 'modern')
-    floor_plans = FloorPlanGenerator.generate(units, stories, area, bedrooms, style)
-    current_project['phases']['phase_4'] = {
-        'name': 'Floor Plans',
-        'data': floor_plans,
-        'timestamp': datetime.now().isoformat(),
-    }
 
-    # Phase 5: Electrical (real load calculation)
-    electrical = MEPDesigner.calculate_electrical(units, bedrooms, area, stories)
-    current_project['phases']['phase_5'] = {
-        'name': 'Electrical Design',
-        'data': electrical,
-        'timestamp': datetime.now().isoformat(),
-    }
+def _resolve_cost_currency(location, user_currency=None):
+    """Statutory billing currency for the jurisdiction first (CBK Cap.491 in
+    Kenya, etc.), then the user's choice, then USD -- so the cost summary,
+    Phase 12 dump and exported quotation all settle on the same currency."""
+    statutory_cur = CostingEngine.JURISDICTION_CURRENCY.get(get_jurisdiction(location))
+    user_cur = (user_currency or '').upper() or None
+    return statutory_cur or user_cur or 'USD'
 
-    # Phase 6: Plumbing (real pipe sizing)
-    plumbing = MEPDesigner.calculate_plumbing(units, bedrooms, stories)
-    current_project['phases']['phase_6'] = {
-        'name': 'Plumbing Design',
-        'data': plumbing,
-        'timestamp': datetime.now().isoformat(),
-    }
 
-    # Phase 7: BOQ (quantities from dimensions)
-    building_data = {'area': area, 'stories': stories, 'units': units, 'bedrooms': bedrooms}
-    boq_data = BOQGenerator.generate(building_data)
-    current_project['phases']['phase_7'] = {
-        'name': f'BOQ ({boq_data["material_items"]} items)',
-        'data': boq_data,
-        'timestamp': datetime.now().isoformat(),
+def _phase_inputs(project):
+    """Normalised, typed project fields the phases are allowed to read."""
+    location = project.get('location', '')
+    return {
+        'id': project.get('id'),
+        'name': project.get('name'),
+        'stories': int(project.get('stories', 2)),
+        'units': int(project.get('units', 3)),
+        'area': float(project.get('area', 450)),
+        'bedrooms': int(project.get('bedrooms', 3)),
+        'location': location,
+        'gps_lat': float(project.get('gps_lat', 0)),
+        'gps_lng': float(project.get('gps_lng', 0)),
+        'building_type': project.get('building_type', 'residential'),
+        'style': project.get('style', 'modern'),
+        'soil_type': project.get('soil_type', ''),
+        'cost_currency': _resolve_cost_currency(location, project.get('currency')),
     }
 
-    # Phase 8: Infrastructure
-    infra = InfrastructureAnalyzer.analyze({**current_project, 'gps_lat': lat}, site_data)
-    current_project['phases']['phase_8'] = {
-        'name': 'Infrastructure Analysis',
-        'data': infra,
-        'timestamp': datetime.now().isoformat(),
-    }
 
-    # Phase 9: Landscape
-    climate = _get_climate_from_coords(lat, lng)
-    landscape = LandscapeDesigner.design(area, climate)
-    current_project['phases']['phase_9'] = {
-        'name': 'Landscape Design',
-        'data': landscape,
-        'timestamp': datetime.now().isoformat(),
-    }
+def _phase_site(i, d):
+    site = SatelliteAnalyzer.analyze_site(i['gps_lat'], i['gps_lng'])
+    # A user-supplied soil type overrides the regional estimate for every
+    # downstream phase (geotech, foundation, infrastructure).
+    if i['soil_type']:
+        site['soil_type'] = i['soil_type']
+    return site
 
-    # Phase 10: Permits
-    permits = PermitsChecker.check(location, {'area': area, 'stories': stories})
-    current_project['phases']['phase_10'] = {
-        'name': 'Permits & Compliance',
-        'data': permits,
-        'timestamp': datetime.now().isoformat(),
-    }
 
-    # Phase 11: 3D Visualization - compute model stats
-    footprint = area / max(stories, 1)
+def _phase_3d_model(i, d):
+    stories, units = i['stories'], i['units']
+    footprint = i['area'] / max(stories, 1)
     model_elements = stories * (units * 4 + units + 1) + int((4 * math.sqrt(footprint)) / 4.5 + 1) ** 2 * stories
-    current_project['phases']['phase_11'] = {'name': '3D Visualization', 'data': {
+    return {
         'status': 'ready',
         'model_endpoint': '/api/drawings/3d-model',
         'lod': '300+',
@@ -2159,57 +2118,117 @@ def execute_all_phases():
         'formats_available': ['Three.js', 'IFC', 'FBX', 'NWD'],
         'stories_rendered': stories,
         'units_rendered': units,
-    }, 'timestamp': datetime.now().isoformat()}
+    }
 
-    # Phase 12: Live Costing
-    # Resolve statutory billing currency from jurisdiction first (CBK Cap.491
-    # in Kenya, etc.) so the cost summary, Phase 12 dump and exported
-    # quotation all settle on the same numbers in the same currency.
-    jurisdiction = get_jurisdiction(location)
-    statutory_cur = CostingEngine.JURISDICTION_CURRENCY.get(jurisdiction)
-    user_cur = (current_project.get('currency') or '').upper() or None
-    cost_currency = statutory_cur or user_cur or 'USD'
-    current_project['currency'] = cost_currency
-    costing = CostingEngine.calculate(boq_data, area, jurisdiction, building_type,
-                                      currency=cost_currency)
-    current_project['phases']['phase_12'] = {'name': 'Live Costing', 'data': costing, 'timestamp': datetime.now().isoformat()}
-
-    # Phase 13: Integration - summary of all generated outputs
-    total_items = sum(1 for k in current_project['phases'] if current_project['phases'][k].get('data'))
-    current_project['phases']['phase_13'] = {'name': 'Integration Layer', 'data': {
+
+def _phase_integration(i, d):
+    return {
         'status': 'complete',
-        'phases_computed': total_items,
+        'phases_computed': sum(1 for data in d.values() if data),
         'ifc_endpoint': '/api/bim/generate-ifc',
         'drawings_endpoint': '/api/drawings/all',
         'export_formats': ['IFC2x3', 'FBX', 'NWD', 'DXF', 'PDF', 'XLSX'],
         'collaboration_endpoint': '/api/collab/create',
-        'project_id': current_project['id'],
-        'project_name': current_project['name'],
-    }, 'timestamp': datetime.now().isoformat()}
+        'project_id': i['id'],
+        'project_name': i['name'],
+    }
+
+
+PROJECT_PHASES = PhaseGraph([
+    Phase('phase_1', 'Site Analysis', _phase_site,
+          inputs=('gps_lat', 'gps_lng', 'soil_type')),
+    Phase('phase_2', 'Geotechnical Design',
+          lambda i, d: GeotechnicalDesigner.calculate(d['phase_1']),
+          deps=('phase_1',)),
+    Phase('phase_3', 'Foundation Design',
+          lambda i, d: FoundationDesigner.design(i['stories'], dict(d['phase_1']), i['building_type'], i['area']),
+          inputs=('stories', 'building_type', 'area'), deps=('phase_1',)),
+    Phase('phase_4', 'Floor Plans',
+          lambda i, d: FloorPlanGenerator.generate(i['units'], i['stories'], i['area'], i['bedrooms'], i['style']),
+          inputs=('units', 'stories', 'area', 'bedrooms', 'style')),
+    Phase('phase_5', 'Electrical Design',
+          lambda i, d: MEPDesigner.calculate_electrical(i['units'], i['bedrooms'], i['area'], i['stories']),
+          inputs=('units', 'bedrooms', 'area', 'stories')),
+    Phase('phase_6', 'Plumbing Design',
+          lambda i, d: MEPDesigner.calculate_plumbing(i['units'], i['bedrooms'], i['stories']),
+          inputs=('units', 'bedrooms', 'stories')),
+    Phase('phase_7', lambda data: f'BOQ ({data["material_items"]} items)',
+          lambda i, d: BOQGenerator.generate({'area': i['area'], 'stories': i['stories'],
+                                              'units': i['units'], 'bedrooms': i['bedrooms']}),
+          inputs=('area', 'stories', 'units', 'bedrooms')),
+    Phase('phase_8', 'Infrastructure Analysis',
+          lambda i, d: InfrastructureAnalyzer.analyze({'area': i['area'], 'stories': i['stories'],
+                                                       'units': i['units'], 'gps_lat': i['gps_lat']},
+                                                      d['phase_1']),
+          inputs=('area', 'stories', 'units', 'gps_lat'), deps=('phase_1',)),
+    Phase('phase_9', 'Landscape Design',
+          lambda i, d: LandscapeDesigner.design(i['area'], _get_climate_from_coords(i['gps_lat'], i['gps_lng'])),
+          inputs=('area', 'gps_lat', 'gps_lng')),
+    Phase('phase_10', 'Permits & Compliance',
+          lambda i, d: PermitsChecker.check(i['location'], {'area': i['area'], 'stories': i['stories']}),
+          inputs=('location', 'area', 'stories')),
+    Phase('phase_11', '3D Visualization', _phase_3d_model,
+          inputs=('stories', 'units', 'area')),
+    Phase('phase_12', 'Live Costing',
+          lambda i, d: CostingEngine.calculate(d['phase_7'], i['area'], get_jurisdiction(i['location']),
+                                               i['building_type'], currency=i['cost_currency']),
+          inputs=('area', 'location', 'building_type', 'cost_currency'), deps=('phase_7',)),
+    Phase('phase_13', 'Integration Layer', _phase_integration,
+          inputs=('id', 'name'), deps=tuple(f'phase_{n}' for n in range(1, 13))),
+])
+
+
+def _run_project_phases(project, force=False):
+    """Bring ``project['phases']`` up to date in place and return the PhaseRun."""
+    inputs = _phase_inputs(project)
+    run = PROJECT_PHASES.run(inputs, project.get('phases') or {}, force=force)
+    project['phases'] = run.phases
+    project['currency'] = inputs['cost_currency']
+    return run
+
+
+@app.route('/api/execute-all-phases', methods=['POST'])
+@auth_required
+def execute_all_phases():
+    """Execute all 13 phases with real engineering algorithms.
+
+    Requires authentication and verifies project ownership before running.
+    Only phases whose inputs changed since the last run are recomputed;
+    pass ``"force": true`` to rerun everything.
+    """
+    body = request.json or {}
+    project_id = body.get('project_id') or session.get('project_id')
+    if not project_id:
+        return jsonify({'error': 'project_id required'}), 400
+    project = _request_project(project_id)
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+
+    run = _run_project_phases(project, force=bool(body.get('force')))
+    costing = project['phases']['phase_12']['data']
 
     # Persist phases to database
     try:
-        conn = get_db()
-        conn.execute('UPDATE projects SET phases_json = ?, data_json = ?, updated_at = ? WHERE id = ?',
-                     (json.dumps(current_project['phases']), json.dumps(current_project),
-                      datetime.now().isoformat(), current_project['id']))
-        conn.commit()
-        conn.close()
+        _save_project(project, phases=True)
     except Exception as e:
         logger.warning('DB persistence warning: %s', e)
 
     return jsonify({
         'success': True,
-        'project_id': current_project['id'],
-        'project_name': current_project['name'],
-        'location': location,
-        'area': area,
-        'units': units,
-        'stories': stories,
+        'project_id': project['id'],
+        'project_name': project['name'],
+        'location': project.get('location', ''),
+        'area': float(project.get('area', 450)),
+        'units': int(project.get('units', 3)),
+        'stories': int(project.get('stories', 2)),
         'phases_completed': 13,
+        'phases_recomputed': run.recomputed,
+        'phases_reused': run.reused,
+        'timings_ms': run.timings_ms,
+        'total_ms': run.total_ms,
         'total_cost': costing.get('total_project_cost', 0),
-        'currency': costing.get('currency', cost_currency),
-        'phases': current_project['phases'],
+        'currency': costing.get('currency', project['currency']),
+        'phases': project['phases'],
     })
 
 # ---------------------------------------------------------------------------
@@ -2221,12 +2240,11 @@ def execute_all_phases():
 def fe_adapter_generate():
     """Create a project and run all 13 phases. Returns project_id as sessionId.
 
-    Also sets the module-level ``current_project`` so downstream export
+    Also makes it the browser's active project so downstream export
     endpoints (`/api/export/pdf`, `/api/export/excel`, etc.) can immediately
     serve outputs for the just-generated project without an extra
     /api/projects round-trip.
     """
-    global current_project
     body = request.json or {}
     # Create project inline without requiring auth for initial generation
     project_id = str(uuid.uuid4())
@@ -2295,41 +2313,9 @@ def fe_adapter_generate():
     building_type = project['building_type']
     style = project['style']
 
-    site_data = SatelliteAnalyzer.analyze_site(lat, lng)
-    geo_data = GeotechnicalDesigner.calculate(site_data)
-    foundation = FoundationDesigner.design(stories, site_data, building_type, area)
-    floor_plans = FloorPlanGenerator.generate(units, stories, area, bedrooms, style)
-    electrical = MEPDesigner.calculate_electrical(units, bedrooms, area, stories)
-    plumbing = MEPDesigner.calculate_plumbing(units, bedrooms, stories)
-    building_data = {'area': area, 'stories': stories, 'units': units, 'bedrooms': bedrooms}
-    boq_data = BOQGenerator.generate(building_data)
-    infra = InfrastructureAnalyzer.analyze({**project, 'gps_lat': lat}, site_data)
-    climate = _get_climate_from_coords(lat, lng)
-    landscape = LandscapeDesigner.design(area, climate)
-    permits = PermitsChecker.check(location, {'area': area, 'stories': stories})
-    jurisdiction = get_jurisdiction(location)
-    statutory_cur = CostingEngine.JURISDICTION_CURRENCY.get(jurisdiction)
-    user_cur = (project.get('currency') or '').upper() or None
-    cost_currency = statutory_cur or user_cur or 'USD'
-    project['currency'] = cost_currency
-    costing = CostingEngine.calculate(boq_data, area, jurisdiction, building_type,
-                                      currency=cost_currency)
-
-    project['phases'] = {
-        'phase_1': {'name': 'Site Analysis', 'data': site_data},
-        'phase_2': {'name': 'Geotechnical Design', 'data': geo_data},
-        'phase_3': {'name': 'Foundation Design', 'data': foundation},
-        'phase_4': {'name': 'Floor Plans', 'data': floor_plans},
-        'phase_5': {'name': 'Electrical Design', 'data': electrical},
-        'phase_6': {'name': 'Plumbing Design', 'data': plumbing},
-        'phase_7': {'name': 'BOQ', 'data': boq_data},
-        'phase_8': {'name': 'Infrastructure', 'data': infra},
-        'phase_9': {'name': 'Landscape Design', 'data': landscape},
-        'phase_10': {'name': 'Permits & Compliance', 'data': permits},
-        'phase_11': {'name': '3D Visualization', 'data': {'status': 'ready', 'model_endpoint': '/api/drawings/3d-model'}},
-        'phase_12': {'name': 'Live Costing', 'data': costing},
-        'phase_13': {'name': 'Integration Layer', 'data': {'status': 'complete', 'export_formats': ['IFC2x3', 'FBX', 'DXF', 'PDF', 'XLSX']}},
-    }
+    _run_project_phases(project)
+    costing = project['phases']['phase_12']['data']
+    cost_currency = project['currency']
 
     # Auto-build the unified BIM model alongside the legacy phases. Failure
     # here is non-fatal — the project still works without it; the BIM
@@ -2356,7 +2342,7 @@ def fe_adapter_generate():
         logger.warning('Phase persist warning: %s', e)
 
     # Make this the active project so /api/export/* endpoints work immediately.
-    current_project = project
+    _set_active_project(project)
 
     return jsonify({
         'success': True,
@@ -2378,13 +2364,9 @@ def fe_adapter_integration_complete():
 def fe_adapter_results(session_id):
     """Retrieve stored phase results by session/project id."""
     try:
-        conn = get_db()
-        row = conn.execute('SELECT data_json, phases_json FROM projects WHERE id=?', (session_id,)).fetchone()
-        conn.close()
-        if not row:
+        project = _load_project(session_id)
+        if not project:
             return jsonify({'error': 'Session not found'}), 404
-        project = json.loads(row['data_json'])
-        project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
         costing = project['phases'].get('phase_12', {}).get('data', {})
         return jsonify({
             'success': True,
@@ -2502,12 +2484,9 @@ def fe_adapter_quotation_generate():
     project_id = body.get('project_id') or body.get('sessionId')
     if project_id:
         try:
-            conn = get_db()
-            row = conn.execute('SELECT data_json, phases_json FROM projects WHERE id=?', (project_id,)).fetchone()
-            conn.close()
-            if row:
-                project = json.loads(row['data_json'])
-                phases = json.loads(row['phases_json']) if row['phases_json'] else {}
+            project = _load_project(project_id)
+            if project:
+                phases = project['phases']
                 costing = phases.get('phase_12', {}).get('data', {})
                 boq = phases.get('phase_7', {}).get('data', {})
                 return jsonify({
@@ -2541,13 +2520,10 @@ def fe_adapter_quotation_generate():
 def fe_adapter_quotation_get(quotation_id):
     """Retrieve a quotation / project results by id."""
     try:
-        conn = get_db()
-        row = conn.execute('SELECT data_json, phases_json FROM projects WHERE id=?', (quotation_id,)).fetchone()
-        conn.close()
-        if not row:
+        project = _load_project(quotation_id)
+        if not project:
             return jsonify({'error': 'Quotation not found'}), 404
-        project = json.loads(row['data_json'])
-        phases = json.loads(row['phases_json']) if row['phases_json'] else {}
+        phases = project['phases']
         costing = phases.get('phase_12', {}).get('data', {})
         boq = phases.get('phase_7', {}).get('data', {})
         return jsonify({
@@ -2662,19 +2638,38 @@ def export_pdf():
             return _eims_paywall.export_forbidden_response()
     except Exception as _pe:
         logger.warning('Report paywall check skipped: %s', _pe)
-    global current_project
-    user = request._eims_user  # type: ignore[attr-defined]
-    project_id = request.args.get('project_id') or (current_project.get('id') if current_project else None)
+    project_id = request.args.get('project_id') or session.get('project_id')
     if not project_id:
         return jsonify({'error': 'project_id required'}), 400
-    row = _load_owned_project(project_id, user)
-    if not row:
+    project = _request_project(project_id)
+    if not project:
         return jsonify({'error': 'Project not found'}), 404
-    current_project = json.loads(row['data_json'])
-    current_project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
-    if not current_project:
-        return jsonify({'error': 'No project'}), 400
-
+    download_name = f"{project['id']}_full_report.pdf"
+    if _eims_jobs.wants_async(request):
+        return _eims_jobs.accepted(_eims_jobs.submit(
+            'report-pdf', _build_report_pdf, project,
+            mimetype='application/pdf', download_name=download_name))
+    try:
+        pdf_bytes = _build_report_pdf(project)
+    except ImportError:
+        return jsonify({'error': 'PDF engineering module unavailable'}), 500
+    return send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True,
+                     download_name=download_name)
+
+
+def _build_report_pdf(project, progress=None):
+    """Render the full professional report for ``project`` to PDF bytes.
+    Runs inline or as a background job; ``progress(pct, stage)`` is called
+    as each section is laid out."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    from svglib.svglib import svg2rlg
+
+    progress = progress or (lambda pct, stage='': None)
+    progress(2, 'preparing')
     pdf_buffer = io.BytesIO()
     doc = SimpleDocTemplate(pdf_buffer, pagesize=A4,
                             topMargin=0.6*inch, bottomMargin=0.5*inch,
@@ -2706,12 +2701,13 @@ def export_pdf():
     # Old code looked up '1' and got {} every time, which then made the
     # validation engine treat every project as having no area / no location
     # / no bedrooms and "auto-correct" them to placeholders. validate_and_correct
-    # now reads project-level fields from `current_project` directly, so p1 is
+    # now reads project-level fields from `project` directly, so p1 is
     # only used for site-derived signals (soil, water table, slope).
-    _phases = current_project.get('phases') or {}
+    _phases = project.get('phases') or {}
     p1 = (_phases.get('phase_1') or _phases.get('1') or {}).get('data', {}) or {}
-    project_name = current_project.get('name', 'EIMS Project')
+    project_name = project.get('name', 'EIMS Project')
 
+    progress(5, 'validating inputs')
     # ────────── VALIDATION & AUTO-CORRECTION ENGINE ──────────
     # Delegate to dedicated engineering module — single source of truth for validation,
     # structural calculations, BBS, MEP, BOQ and statutory compliance pack.
@@ -2719,11 +2715,11 @@ def export_pdf():
         from eims_modules import pdf_engineering as pdf_eng
     except Exception as e:
         logger.error('pdf_engineering import failed: %s', e)
-        return jsonify({'error': 'PDF engineering module unavailable'}), 500
-    eng_params, auto_fixes, blockers = pdf_eng.validate_and_correct(p1, current_project)
+        raise ImportError('PDF engineering module unavailable') from e
+    eng_params, auto_fixes, blockers = pdf_eng.validate_and_correct(p1, project)
     # Carry through QS-edited unit-rate overrides (set via /api/project/price-overrides)
     # so the printed BOQ uses the same rates the customer saw in the QS quotation.
-    eng_params['_price_overrides'] = current_project.get('price_overrides') or {}
+    eng_params['_price_overrides'] = project.get('price_overrides') or {}
     # Unpack for the rest of this function (existing drawing code reads these locals)
     location          = eng_params['location']
     area              = eng_params['area']
@@ -2743,20 +2739,21 @@ def export_pdf():
     # validated currency (KES for Kenya), producing the cross-phase
     # inconsistency external auditors flagged.
     try:
-        _boq_data = (current_project['phases'].get('phase_7', {}) or {}).get('data', {}) or {}
+        _boq_data = (project['phases'].get('phase_7', {}) or {}).get('data', {}) or {}
         _juris = get_jurisdiction(location)
-        _btype = current_project.get('building_type', 'residential')
+        _btype = project.get('building_type', 'residential')
         _recosted = CostingEngine.calculate(_boq_data, area, _juris, _btype, currency=currency)
-        current_project['phases']['phase_12'] = {
+        project['phases']['phase_12'] = {
             'name': 'Live Costing', 'data': _recosted,
             'timestamp': datetime.now().isoformat(),
         }
-        current_project['costing'] = _recosted
-        current_project['currency'] = currency
-        current_project['location'] = location
+        project['costing'] = _recosted
+        project['currency'] = currency
+        project['location'] = location
     except Exception as _e:
         logger.warning('Phase 12 re-cost in validated currency failed: %s', _e)
 
+    progress(15, 'cross-phase normalisation')
     # ──────────── CROSS-PHASE NORMALISATION ────────────
     # Auditor finding (April 2026): the legacy per-phase calculators
     # (FoundationDesigner, MEPDesigner, CostingEngine) each ran their own
@@ -2769,12 +2766,12 @@ def export_pdf():
     # → automatic county-review rejection.
     # Fix: after validate_and_correct, recompute Phases 3/5/6/12 from the
     # SAME engineering module that produces sections 5–7 of the PDF, then
-    # write the canonical values back into current_project['phases'] so the
+    # write the canonical values back into project['phases'] so the
     # phase-data dump in section 8 echoes the same numbers.
     try:
         _mep_canon = pdf_eng.calc_mep(area, bedrooms, units)
         # Phase 5 — Electrical (canonical IEC 60364 demand)
-        current_project['phases']['phase_5'] = {
+        project['phases']['phase_5'] = {
             'name': 'Electrical Design',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -2796,7 +2793,7 @@ def export_pdf():
             },
         }
         # Phase 6 — Plumbing & drainage (canonical BS EN 12056 / 8233)
-        current_project['phases']['phase_6'] = {
+        project['phases']['phase_6'] = {
             'name': 'Plumbing & Drainage Design',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -2828,8 +2825,8 @@ def export_pdf():
         # validated params all emit the same string.
         foundation = _fnd
         eng_params['foundation'] = _fnd
-        _existing_p3 = (current_project['phases'].get('phase_3', {}) or {}).get('data', {}) or {}
-        current_project['phases']['phase_3'] = {
+        _existing_p3 = (project['phases'].get('phase_3', {}) or {}).get('data', {}) or {}
+        project['phases']['phase_3'] = {
             'name': 'Foundation Design',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -2842,7 +2839,7 @@ def export_pdf():
                     'drawing per BS 8004 §7 selection rule (stories × area).',
             },
         }
-        current_project['foundation_type'] = _fnd.upper()
+        project['foundation_type'] = _fnd.upper()
 
         # Phase 12 — drive directly off the canonical BOQ so BOQ §5 and the
         # Cost Summary §16 always tie back to one number. We rebuild a
@@ -2862,7 +2859,7 @@ def export_pdf():
         _found = pdf_eng.calc_foundation(_fnd, _col['N_kN'])
         # Now that we know the canonical column load + foundation geometry,
         # write them into Phase 3 so the phase-data dump (§8) agrees with §2.
-        current_project['phases']['phase_3']['data'].update({
+        project['phases']['phase_3']['data'].update({
             'structural_grid_m':       _g,
             'bays_x_y':                f'{_grid["bays_x"]} × {_grid["bays_y"]}',
             'footprint_m':             f'{_grid["footprint_x_m"]} × {_grid["footprint_y_m"]}',
@@ -2883,7 +2880,7 @@ def export_pdf():
         _fx = {'USD': 130, 'EUR': 140, 'GBP': 165, 'KES': 1}
         _boq = pdf_eng.build_boq(_eng_params_for_boq, _slab, _beam, _col, _found,
                                   _bbs, _ncols, _nbeams, _mep_canon, _fx)
-        current_project['phases']['phase_7'] = {
+        project['phases']['phase_7'] = {
             'name': 'BOQ — KQS-2025',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -2899,7 +2896,7 @@ def export_pdf():
                 'note': 'BOQ §5 is the single source of truth for cost. Phase 12 mirrors this total.',
             },
         }
-        current_project['phases']['phase_12'] = {
+        project['phases']['phase_12'] = {
             'name': 'Live Costing — reconciled to BOQ',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -2917,7 +2914,7 @@ def export_pdf():
                         'no method discrepancy.',
             },
         }
-        current_project['costing'] = current_project['phases']['phase_12']['data']
+        project['costing'] = project['phases']['phase_12']['data']
     except Exception as _e:
         logger.warning('Cross-phase normalisation failed (cover/phases may diverge): %s', _e)
 
@@ -2946,6 +2943,7 @@ def export_pdf():
             logger.warning('SVG to PDF conversion warning: %s', e)
         return None
 
+    progress(30, 'cover page')
     # ──── COVER PAGE ────
     elements.append(Spacer(1, 1.5*inch))
     elements.append(Paragraph('EMERSON EIMS', title_style))
@@ -2969,7 +2967,7 @@ def export_pdf():
     # Cover info box
     cover_data = [
         ['PROJECT INFORMATION', ''],
-        ['Project ID', current_project.get('id', 'N/A')],
+        ['Project ID', project.get('id', 'N/A')],
         ['Location', str(location)],
         ['Total Area', f'{area:,.0f} m²'],
         ['Units / Apartments', str(units)],
@@ -3022,6 +3020,7 @@ def export_pdf():
         elements.append(Paragraph(item, ParagraphStyle('TOC', parent=body_style, fontSize=10, spaceBefore=4, spaceAfter=2)))
     elements.append(PageBreak())
 
+    progress(35, 'engineering report')
     # ────────── ENGINEERING REPORT (sections 1–7: validation, brief, calcs, BBS, MEP, BOQ, compliance) ──────────
     try:
         eng_flowables = pdf_eng.build_engineering_report(
@@ -3035,28 +3034,29 @@ def export_pdf():
             f'<b>Engineering report module error:</b> {e}', body_style))
         elements.append(PageBreak())
 
+    progress(45, 'QS quotation')
     # ──── 7B. FULL QS QUOTATION (contractually binding price book) ────
     # Renders the same QuotationGenerator output that the wizard's §9 shows on
-    # screen, with QS rate edits already applied via current_project['price_overrides'].
+    # screen, with QS rate edits already applied via project['price_overrides'].
     # This makes the PDF self-contained: client receives a single document
     # that doubles as the engineering report and the priced offer.
     try:
-        country = current_project.get('country') or 'Other'
+        country = project.get('country') or 'Other'
         quote = QuotationGenerator.generate(
             building_data={
                 'area': area, 'stories': stories, 'units': units,
-                'bedrooms': bedrooms, 'building_type': current_project.get('building_type', 'residential'),
+                'bedrooms': bedrooms, 'building_type': project.get('building_type', 'residential'),
                 'location': location,
             },
             country=country,
             currency=currency,
-            company_name=current_project.get('company_name') or 'EIMS Construction Solutions',
-            client_name=current_project.get('client_name') or current_project.get('all_inputs', {}).get('client_name', 'Valued Client'),
-            validity_days=int(current_project.get('validity_days', 30)),
-            payment_terms=current_project.get('payment_terms', '50/40/10'),
-            vat_rate=float(current_project.get('vat_rate', 0)),
-            discount_pct=float(current_project.get('discount_pct', 0)),
-            price_overrides=current_project.get('price_overrides') or None,
+            company_name=project.get('company_name') or 'EIMS Construction Solutions',
+            client_name=project.get('client_name') or project.get('all_inputs', {}).get('client_name', 'Valued Client'),
+            validity_days=int(project.get('validity_days', 30)),
+            payment_terms=project.get('payment_terms', '50/40/10'),
+            vat_rate=float(project.get('vat_rate', 0)),
+            discount_pct=float(project.get('discount_pct', 0)),
+            price_overrides=project.get('price_overrides') or None,
         )
         if quote.get('success'):
             elements.append(PageBreak())
@@ -3098,7 +3098,7 @@ def export_pdf():
 
             # 7B.2 Bill of Quantities (trade sections)
             elements.append(Paragraph('<b>7B.2 Bill of Quantities — Trade Sections</b>', styles['Heading3']))
-            ovr = current_project.get('price_overrides') or {}
+            ovr = project.get('price_overrides') or {}
             if ovr:
                 elements.append(Paragraph(
                     f'<font color="#e65100"><b>Note:</b> {len(ovr)} line item(s) priced at QS-overridden rates (marked \u2605 below).</font>',
@@ -3222,6 +3222,7 @@ def export_pdf():
             f'<b>QS quotation render error:</b> {_e}', body_style))
         elements.append(PageBreak())
 
+    progress(55, 'project summary')
     # ──── 8. PROJECT SUMMARY & PHASE DATA ────
     elements.append(Paragraph('8. PROJECT SUMMARY', h2_style))
     elements.append(Spacer(1, 0.1*inch))
@@ -3230,8 +3231,8 @@ def export_pdf():
         # Accept both 'phase_12' and '12' style keys.
         s = str(k).replace('phase_', '')
         return int(s) if s.isdigit() else 99
-    for phase_id in sorted(current_project['phases'].keys(), key=_phase_sort_key):
-        phase = current_project['phases'][phase_id]
+    for phase_id in sorted(project['phases'].keys(), key=_phase_sort_key):
+        phase = project['phases'][phase_id]
         elements.append(Paragraph(f"<b>Phase {phase_id}: {phase['name']}</b>", styles['Heading3']))
         if isinstance(phase.get('data'), dict):
             data_items = [[str(k), str(v)[:80]] for k, v in list(phase['data'].items())[:12]]
@@ -3249,6 +3250,7 @@ def export_pdf():
 
     elements.append(PageBreak())
 
+    progress(60, 'drawings')
     # ──── GENERATE ALL DRAWINGS ────
     engine = SVGDrawingEngine
 
@@ -3305,6 +3307,7 @@ def export_pdf():
         elements.append(d)
     elements.append(PageBreak())
 
+    progress(70, 'structural and MEP drawings')
     # 6. Structural Layout
     elements.append(Paragraph('13. STRUCTURAL LAYOUT', h2_style))
     elements.append(Paragraph(f'Column grid, beam layout and foundation pads. Foundation type: {str(foundation).title()}. '
@@ -3336,11 +3339,12 @@ def export_pdf():
         elements.append(d)
     elements.append(PageBreak())
 
+    progress(80, 'cost summary')
     # ──── 9. COST SUMMARY ────
     elements.append(Paragraph('16. COST SUMMARY', h2_style))
     _cur_sym = {'KES': 'KSh ', 'USD': '$', 'EUR': '€', 'GBP': '£'}.get(currency, currency + ' ')
     _fx_to_kes = {'USD': 130, 'EUR': 140, 'GBP': 165, 'KES': 1}
-    costing = current_project.get('costing', {})
+    costing = project.get('costing', {})
     if costing:
         cost_data = [['Item', f'Amount ({currency})']]
         # Detect costing's source currency (heuristic: look for a currency key, else assume USD)
@@ -3373,29 +3377,36 @@ def export_pdf():
     elements.append(Paragraph('<i>This report was generated by EMERSON EIMS Building Suite Pro. '
                               'All drawings are indicative and must be verified by a licensed engineer before construction.</i>', small_style))
 
+    progress(85, 'laying out PDF')
     doc.build(elements)
-    pdf_buffer.seek(0)
-
-    return send_file(pdf_buffer, mimetype='application/pdf', as_attachment=True,
-                     download_name=f"{current_project['id']}_full_report.pdf")
+    return pdf_buffer.getvalue()
 
 @app.route('/api/export/excel', methods=['GET'])
 @auth_required
 def export_excel():
     """Export professional Excel report. Requires auth and ?project_id=... ."""
-    global current_project
-    user = request._eims_user  # type: ignore[attr-defined]
-    project_id = request.args.get('project_id') or (current_project.get('id') if current_project else None)
+    project_id = request.args.get('project_id') or session.get('project_id')
     if not project_id:
         return jsonify({'error': 'project_id required'}), 400
-    row = _load_owned_project(project_id, user)
-    if not row:
+    project = _request_project(project_id)
+    if not project:
         return jsonify({'error': 'Project not found'}), 404
-    current_project = json.loads(row['data_json'])
-    current_project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
-    if not current_project:
-        return jsonify({'error': 'No project'}), 400
-
+    mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    download_name = f"{project['id']}_data.xlsx"
+    if _eims_jobs.wants_async(request):
+        return _eims_jobs.accepted(_eims_jobs.submit(
+            'report-xlsx', _build_report_xlsx, project,
+            mimetype=mimetype, download_name=download_name))
+    return send_file(io.BytesIO(_build_report_xlsx(project)), mimetype=mimetype,
+                     as_attachment=True, download_name=download_name)
+
+
+def _build_report_xlsx(project, progress=None):
+    """Project summary plus one sheet per phase, as XLSX bytes."""
+    import openpyxl
+    from openpyxl.styles import Font
+
+    progress = progress or (lambda pct, stage='': None)
     wb = openpyxl.Workbook()
     # ALWAYS keep at least one sheet — openpyxl crashes saving an empty book.
     # We rename the default sheet to "Project Summary" and populate it from
@@ -3403,22 +3414,24 @@ def export_excel():
     summary = wb.active
     summary.title = 'Project Summary'
     summary['A1'] = 'Project'
-    summary['B1'] = current_project.get('name', current_project.get('id', 'Untitled'))
+    summary['B1'] = project.get('name', project.get('id', 'Untitled'))
     summary['A2'] = 'ID'
-    summary['B2'] = current_project.get('id', '')
+    summary['B2'] = project.get('id', '')
     summary['A3'] = 'Building type'
-    summary['B3'] = current_project.get('building_type', '')
+    summary['B3'] = project.get('building_type', '')
     summary['A4'] = 'Area (m²)'
-    summary['B4'] = current_project.get('area', '')
+    summary['B4'] = project.get('area', '')
     summary['A5'] = 'Total cost'
-    summary['B5'] = (current_project.get('costing') or {}).get('total_cost') or current_project.get('total_cost', '')
+    summary['B5'] = (project.get('costing') or {}).get('total_cost') or project.get('total_cost', '')
     summary['A6'] = 'Generated'
     summary['B6'] = datetime.now().strftime('%Y-%m-%d %H:%M')
     for r in range(1, 7):
         summary[f'A{r}'].font = Font(bold=True)
 
     # One sheet per phase. Defensive against missing or non-dict 'data'.
-    for phase_id, phase in (current_project.get('phases') or {}).items():
+    phases = list((project.get('phases') or {}).items())
+    for i, (phase_id, phase) in enumerate(phases):
+        progress(5 + 85 * i / max(len(phases), 1), f'phase {phase_id}')
         try:
             sheet_name = (phase.get('name') or f'Phase {phase_id}')[:31]
             # Excel sheet names must be unique; fall back to id-based name on collision.
@@ -3436,11 +3449,10 @@ def export_excel():
         except Exception as e:
             logger.warning('Skipping phase %s in Excel export: %s', phase_id, e)
 
+    progress(90, 'writing workbook')
     excel_buffer = io.BytesIO()
     wb.save(excel_buffer)
-    excel_buffer.seek(0)
-
-    return send_file(excel_buffer, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', as_attachment=True, download_name=f"{current_project['id']}_data.xlsx")
+    return excel_buffer.getvalue()
 
 # ================== PROFESSIONAL UI ==================
 
@@ -4243,7 +4255,6 @@ def save_wizard_project():
     Persists to DB owned by the authenticated user.
     """
     try:
-        global current_project
         user = request._eims_user  # type: ignore[attr-defined]
         data = request.json or {}
 
@@ -4282,7 +4293,7 @@ def save_wizard_project():
         conn.commit()
         conn.close()
 
-        current_project = proj
+        _set_active_project(proj)
         return jsonify({
             'success': True,
             'project_id': project_id,
@@ -5174,6 +5185,7 @@ class DXFExportEngine:
         """Generate DXF floor plan with proper layers, linetypes, dimensions"""
         if not HAS_EZDXF:
             return DXFExportEngine._generate_dxf_manual(units, bedrooms, area, stories)
+        import ezdxf
         doc = ezdxf.new('R2010')
         msp = doc.modelspace()
         # Layers
@@ -5304,6 +5316,7 @@ class DXFExportEngine:
         if not HAS_EZDXF:
             return DXFExportEngine._generate_dxf_manual(
                 data.get('units', 3), data.get('bedrooms', 3), data.get('area', 450), data.get('stories', 2))
+        import ezdxf
         doc = ezdxf.new('R2010')
         msp = doc.modelspace()
         doc.layers.add('WALLS', color=7)
@@ -5506,6 +5519,9 @@ class ParametricFamily:
 
 # ================== CLASH DETECTION ENGINE ==================
 
+from eims_modules import clash_index as _eims_clash_index
+
+
 class ClashDetector:
     """BIM clash detection engine - checks spatial intersections between building elements.
     Compliant with BS 1192:2007 coordination procedures."""
@@ -5574,50 +5590,50 @@ class ClashDetector:
             })
         elements.extend(pipe_routes)
 
-        # Check all pairs for AABB intersection
+        # Grid broad phase + vectorised narrow phase over pairs of different
+        # disciplines whose boxes come within the minimum clearance.
         clashes = []
         hard_clashes = []
         soft_clashes = []  # clearance violations
         min_clearance = 0.025  # 25mm minimum clearance
 
-        for i in range(len(elements)):
-            for j in range(i + 1, len(elements)):
-                a, b = elements[i], elements[j]
-                if a['discipline'] == b['discipline']:
-                    continue  # skip same discipline
-                overlap = ClashDetector._aabb_overlap(a['bbox'], b['bbox'])
-                if overlap > 0:
-                    severity = 'hard' if overlap > 0.001 else 'soft'
-                    clash = {
-                        'id': f'CLASH-{len(clashes) + 1:04d}',
-                        'element_a': a['id'], 'type_a': a['type'], 'discipline_a': a['discipline'],
-                        'element_b': b['id'], 'type_b': b['type'], 'discipline_b': b['discipline'],
-                        'overlap_m3': round(overlap, 6),
-                        'severity': severity,
-                        'location': {
-                            'x': round((a['bbox']['min'][0] + a['bbox']['max'][0] + b['bbox']['min'][0] + b['bbox']['max'][0]) / 4, 2),
-                            'y': round((a['bbox']['min'][1] + a['bbox']['max'][1] + b['bbox']['min'][1] + b['bbox']['max'][1]) / 4, 2),
-                            'z': round((a['bbox']['min'][2] + a['bbox']['max'][2] + b['bbox']['min'][2] + b['bbox']['max'][2]) / 4, 2),
-                        },
-                        'resolution': ClashDetector._suggest_resolution(a, b),
-                    }
-                    clashes.append(clash)
-                    if severity == 'hard':
-                        hard_clashes.append(clash)
-                    else:
-                        soft_clashes.append(clash)
+        ii, jj, overlaps, gaps = _eims_clash_index.contacts(
+            [e['bbox']['min'] for e in elements], [e['bbox']['max'] for e in elements],
+            margin=min_clearance, groups=[e['discipline'] for e in elements])
+        for i, j, overlap, gap in zip(ii.tolist(), jj.tolist(), overlaps.tolist(), gaps.tolist()):
+            a, b = elements[i], elements[j]
+            if overlap > 0:
+                severity = 'hard' if overlap > 0.001 else 'soft'
+                clash = {
+                    'id': f'CLASH-{len(clashes) + 1:04d}',
+                    'element_a': a['id'], 'type_a': a['type'], 'discipline_a': a['discipline'],
+                    'element_b': b['id'], 'type_b': b['type'], 'discipline_b': b['discipline'],
+                    'overlap_m3': round(overlap, 6),
+                    'severity': severity,
+                    'location': {
+                        'x': round((a['bbox']['min'][0] + a['bbox']['max'][0] + b['bbox']['min'][0] + b['bbox']['max'][0]) / 4, 2),
+                        'y': round((a['bbox']['min'][1] + a['bbox']['max'][1] + b['bbox']['min'][1] + b['bbox']['max'][1]) / 4, 2),
+                        'z': round((a['bbox']['min'][2] + a['bbox']['max'][2] + b['bbox']['min'][2] + b['bbox']['max'][2]) / 4, 2),
+                    },
+                    'resolution': ClashDetector._suggest_resolution(a, b),
+                }
+                clashes.append(clash)
+                if severity == 'hard':
+                    hard_clashes.append(clash)
                 else:
-                    # Check clearance
-                    clearance = ClashDetector._aabb_clearance(a['bbox'], b['bbox'])
-                    if 0 < clearance < min_clearance and a['discipline'] != b['discipline']:
-                        soft_clashes.append({
-                            'id': f'CLR-{len(soft_clashes) + 1:04d}',
-                            'element_a': a['id'], 'element_b': b['id'],
-                            'clearance_mm': round(clearance * 1000, 1),
-                            'min_required_mm': min_clearance * 1000,
-                            'severity': 'clearance',
-                            'resolution': f'Increase clearance to minimum {min_clearance * 1000}mm',
-                        })
+                    soft_clashes.append(clash)
+            else:
+                # Check clearance: the smallest open gap between the boxes
+                clearance = min((d for d in gap if d > 0), default=0)
+                if 0 < clearance < min_clearance:
+                    soft_clashes.append({
+                        'id': f'CLR-{len(soft_clashes) + 1:04d}',
+                        'element_a': a['id'], 'element_b': b['id'],
+                        'clearance_mm': round(clearance * 1000, 1),
+                        'min_required_mm': min_clearance * 1000,
+                        'severity': 'clearance',
+                        'resolution': f'Increase clearance to minimum {min_clearance * 1000}mm',
+                    })
 
         return {
             'total_elements': len(elements),
@@ -5637,24 +5653,6 @@ class ClashDetector:
             'compliance': 'BS 1192:2007 Level 2 coordination',
         }
 
-    @staticmethod
-    def _aabb_overlap(a, b):
-        """Calculate AABB overlap volume"""
-        dx = max(0, min(a['max'][0], b['max'][0]) - max(a['min'][0], b['min'][0]))
-        dy = max(0, min(a['max'][1], b['max'][1]) - max(a['min'][1], b['min'][1]))
-        dz = max(0, min(a['max'][2], b['max'][2]) - max(a['min'][2], b['min'][2]))
-        return dx * dy * dz
-
-    @staticmethod
-    def _aabb_clearance(a, b):
-        """Calculate minimum clearance between two AABBs"""
-        gaps = []
-        for dim in range(3):
-            gap = max(a['min'][dim] - b['max'][dim], b['min'][dim] - a['max'][dim])
-            if gap > 0:
-                gaps.append(gap)
-        return min(gaps) if gaps else 0
-
     @staticmethod
     def _suggest_resolution(a, b):
         if a['type'] == 'column' or b['type'] == 'column':
@@ -6231,6 +6229,21 @@ def _load_collab_from_db(session_id):
     return None
 
 
+from eims_modules import collaboration as _eims_collab
+
+# Session events are also published here so clients can follow a session
+# over SSE (/api/collab/events/stream) instead of re-polling /api/collab/events.
+# Event ids are 1-based positions in session['events'], i.e. the same number
+# clients already pass as ``since``.
+_collab_bus = _eims_collab.ChangeBus()
+
+
+def _collab_append(session_id, session, event):
+    """Append ``event`` to the session log and publish it. Hold _collab_lock."""
+    session['events'].append(event)
+    _collab_bus.publish(session_id, {'id': len(session['events']), **event})
+
+
 class CollaborationEngine:
     """Real-time BIM collaboration engine — project-level session management with DB persistence"""
 
@@ -6261,7 +6274,7 @@ class CollaborationEngine:
                     return None
             session = _collab_sessions[session_id]
             session['users'][user_id] = {'joined': datetime.now().isoformat(), 'role': role, 'cursor': None, 'active': True}
-            session['events'].append({'type': 'user_joined', 'user': user_id, 'time': datetime.now().isoformat()})
+            _collab_append(session_id, session, {'type': 'user_joined', 'user': user_id, 'time': datetime.now().isoformat()})
             _save_collab_to_db(session_id, session)
             return session
 
@@ -6281,7 +6294,7 @@ class CollaborationEngine:
                 return {'error': f'Element {element_id} locked by {lock["user"]}'}
             event = {'type': 'element_updated', 'user': user_id, 'element': element_id,
                      'changes': changes, 'time': datetime.now().isoformat()}
-            session['events'].append(event)
+            _collab_append(session_id, session, event)
             _save_collab_to_db(session_id, session)
             return event
 
@@ -6329,7 +6342,7 @@ class CollaborationEngine:
                 return None
             msg = {'user': user_id, 'message': message, 'time': datetime.now().isoformat()}
             _collab_sessions[session_id]['chat'].append(msg)
-            _collab_sessions[session_id]['events'].append({'type': 'chat', **msg})
+            _collab_append(session_id, _collab_sessions[session_id], {'type': 'chat', **msg})
             return msg
 
 
@@ -6400,6 +6413,14 @@ def api_section():
 def api_all_drawings():
     """Generate complete drawing set - all 6 drawing types"""
     data = request.json or {}
+    if _eims_jobs.wants_async(request):
+        return _eims_jobs.accepted(_eims_jobs.submit(
+            'drawing-set', _build_all_drawings, data, mimetype='application/json'))
+    return jsonify(_build_all_drawings(data))
+
+
+def _build_all_drawings(data, progress=None):
+    progress = progress or (lambda pct, stage='': None)
     units = int(data.get('units', 3))
     stories = int(data.get('stories', 2))
     area = float(data.get('area', 450))
@@ -6413,22 +6434,51 @@ def api_all_drawings():
     front_w = round(unit_w_calc * units, 1)
     side_w = round(unit_w_calc, 1)
 
-    return jsonify({
+    renders = [
+        ('site_plan', lambda: SVGDrawingEngine.generate_site_plan(area, location)),
+        ('floor_plan', lambda: SVGDrawingEngine.generate_floor_plan(units, bedrooms, area, stories, style)),
+        ('elevation_north', lambda: SVGDrawingEngine.generate_elevation('north', stories, front_w, style)),
+        ('elevation_east', lambda: SVGDrawingEngine.generate_elevation('east', stories, side_w, style)),
+        ('section', lambda: SVGDrawingEngine.generate_section(stories, style)),
+        ('structural', lambda: SVGDrawingEngine.generate_structural(stories, area, foundation_type)),
+        ('electrical', lambda: SVGDrawingEngine.generate_mep(area, units, 'electrical')),
+        ('plumbing', lambda: SVGDrawingEngine.generate_mep(area, units, 'plumbing')),
+    ]
+    drawings = {}
+    for i, (name, render) in enumerate(renders):
+        progress(100 * i / len(renders), name)
+        drawings[name] = render()
+    return {
         'success': True,
-        'drawings': {
-            'site_plan': SVGDrawingEngine.generate_site_plan(area, location),
-            'floor_plan': SVGDrawingEngine.generate_floor_plan(units, bedrooms, area, stories, style),
-            'elevation_north': SVGDrawingEngine.generate_elevation('north', stories, front_w, style),
-            'elevation_east': SVGDrawingEngine.generate_elevation('east', stories, side_w, style),
-            'section': SVGDrawingEngine.generate_section(stories, style),
-            'structural': SVGDrawingEngine.generate_structural(stories, area, foundation_type),
-            'electrical': SVGDrawingEngine.generate_mep(area, units, 'electrical'),
-            'plumbing': SVGDrawingEngine.generate_mep(area, units, 'plumbing'),
-        },
+        'drawings': drawings,
         'total_drawings': 8,
         'format': 'SVG',
         'bim_ready': True,
-    })
+    }
+
+from eims_modules import artifact_cache as _eims_artifacts
+from eims_modules import gltf_writer as _eims_gltf
+
+
+def _cached_export(kind, data, build, *, mimetype, download_name):
+    """Serve an export through the artifact cache, keyed by the resolved
+    request data: repeats with an unchanged project are a 304 or a cached
+    read instead of a rebuild. ``build`` returns the artifact bytes."""
+    key = _eims_artifacts.digest(kind, data)
+    hit = _eims_artifacts.cached_response(key, mimetype=mimetype, download_name=download_name)
+    if hit is not None:
+        return hit
+    return _eims_artifacts.store_response(key, build(), mimetype=mimetype,
+                                          download_name=download_name)
+
+
+def _cached_ifc(data):
+    """IFC text for ``data``; shared by the JSON and download routes."""
+    blob, _, _ = _eims_artifacts.get_cache().fetch(
+        _eims_artifacts.digest('ifc', data),
+        lambda: IFCGenerator.generate(data).encode('utf-8'))
+    return blob.decode('utf-8')
+
 
 @app.route('/api/bim/generate-ifc', methods=['POST'])
 def api_generate_ifc():
@@ -6437,7 +6487,7 @@ def api_generate_ifc():
     proj = _resolve_owned_project_dict(data)
     if proj:
         data = {**proj, **data}
-    ifc_content = IFCGenerator.generate(data)
+    ifc_content = _cached_ifc(data)
     return jsonify({
         'success': True,
         'ifc_content': ifc_content,
@@ -6453,10 +6503,9 @@ def api_download_ifc():
     proj = _resolve_owned_project_dict(data)
     if proj:
         data = {**proj, **data}
-    ifc_content = IFCGenerator.generate(data)
-    buffer = io.BytesIO(ifc_content.encode('utf-8'))
-    buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name=f'{data.get("name","project")}.ifc', mimetype='application/x-step')
+    return _cached_export('ifc-file', data, lambda: _cached_ifc(data).encode('utf-8'),
+                          mimetype='application/x-step',
+                          download_name=f'{data.get("name","project")}.ifc')
 
 @app.route('/api/drawings/3d-model', methods=['POST'])
 def api_3d_model():
@@ -6652,25 +6701,28 @@ def api_3d_model():
         objects.append({'type': 'box', 'name': 'Ridge', 'position': [total_w/2, roof_y + 1.5, total_d/2],
                         'size': [total_w + 0.5, 0.1, 0.15], 'color': '#5d3216', 'material': 'timber'})
 
-    return jsonify({
-        'success': True,
-        'model': {
-            'objects': objects,
-            'camera': {'position': [total_w * 1.5, stories * story_h * 1.5, total_d * 2.5], 'target': [total_w/2, stories * story_h / 2, total_d/2]},
-            'lights': [
-                {'type': 'ambient', 'intensity': 0.4},
-                {'type': 'directional', 'position': [10, 15, 10], 'intensity': 0.8, 'castShadow': True},
-                {'type': 'directional', 'position': [-5, 10, -5], 'intensity': 0.3},
-                {'type': 'hemisphere', 'skyColor': '#b1e1ff', 'groundColor': '#b97a20', 'intensity': 0.25},
-            ],
-            'grid': {'size': 50, 'divisions': 50},
-        },
-        'stats': {'objects': len(objects), 'stories': stories, 'style': style, 'lod': lod,
-                  'features': ['individual_wall_panels', 'door_frames', 'window_mullions', 'lintels',
-                               'sills', 'interior_partitions', 'staircase', 'railings',
-                               'cylinder_columns', 'beam_framing', 'parapet_walls',
-                               'curved_roof_vault', 'ridge_beam', 'floor_finish']},
-    })
+    scene = {
+        'camera': {'position': [total_w * 1.5, stories * story_h * 1.5, total_d * 2.5], 'target': [total_w/2, stories * story_h / 2, total_d/2]},
+        'lights': [
+            {'type': 'ambient', 'intensity': 0.4},
+            {'type': 'directional', 'position': [10, 15, 10], 'intensity': 0.8, 'castShadow': True},
+            {'type': 'directional', 'position': [-5, 10, -5], 'intensity': 0.3},
+            {'type': 'hemisphere', 'skyColor': '#b1e1ff', 'groundColor': '#b97a20', 'intensity': 0.25},
+        ],
+        'grid': {'size': 50, 'divisions': 50},
+    }
+    stats = {'objects': len(objects), 'stories': stories, 'style': style, 'lod': lod,
+             'features': ['individual_wall_panels', 'door_frames', 'window_mullions', 'lintels',
+                          'sills', 'interior_partitions', 'staircase', 'railings',
+                          'cylinder_columns', 'beam_framing', 'parapet_walls',
+                          'curved_roof_vault', 'ridge_beam', 'floor_finish']}
+    if data.get('format') == 'glb':
+        # Same objects as one instanced, quantised glTF binary; camera,
+        # lights and stats ride in asset.extras.
+        writer = _eims_gltf.objects_to_glb(objects)
+        writer.extras = {**scene, 'stats': stats}
+        return _eims_gltf.glb_response(writer, download_name=f'model_{style}_{stories}F.glb')
+    return jsonify({'success': True, 'model': {'objects': objects, **scene}, 'stats': stats})
 
 
 # ================== BUILDING COMPONENTS LIBRARY ==================
@@ -7180,12 +7232,13 @@ def api_design_recommendations():
 def export_dxf_floor_plan():
     """Export floor plan as DXF file (AutoCAD compatible)"""
     data = request.json or {}
-    dxf_bytes = DXFExportEngine.generate_floor_plan(
+    params = dict(
         units=int(data.get('units', 3)), bedrooms=int(data.get('bedrooms', 3)),
         area=float(data.get('area', 450)), stories=int(data.get('stories', 2)),
         style=data.get('style', 'modern'))
-    buf = io.BytesIO(dxf_bytes)
-    return send_file(buf, mimetype='application/dxf', as_attachment=True, download_name='EIMS_FloorPlan.dxf')
+    return _cached_export('dxf-floor-plan', params,
+                          lambda: DXFExportEngine.generate_floor_plan(**params),
+                          mimetype='application/dxf', download_name='EIMS_FloorPlan.dxf')
 
 @app.route('/api/export/dxf/all', methods=['POST'])
 def export_dxf_all():
@@ -7194,9 +7247,8 @@ def export_dxf_all():
     proj = _resolve_owned_project_dict(data)
     if proj:
         data = {**proj, **data}
-    dxf_bytes = DXFExportEngine.generate_all_drawings(data)
-    buf = io.BytesIO(dxf_bytes)
-    return send_file(buf, mimetype='application/dxf', as_attachment=True, download_name='EIMS_DrawingSet.dxf')
+    return _cached_export('dxf-all', data, lambda: DXFExportEngine.generate_all_drawings(data),
+                          mimetype='application/dxf', download_name='EIMS_DrawingSet.dxf')
 
 
 # ================== FBX EXPORT ENDPOINT ==================
@@ -7208,9 +7260,8 @@ def export_fbx():
     proj = _resolve_owned_project_dict(data)
     if proj:
         data = {**proj, **data}
-    fbx_content = FBXExporter.generate(data)
-    buf = io.BytesIO(fbx_content.encode('ascii'))
-    return send_file(buf, mimetype='application/octet-stream', as_attachment=True, download_name='EIMS_Model.fbx')
+    return _cached_export('fbx', data, lambda: FBXExporter.generate(data).encode('ascii'),
+                          mimetype='application/octet-stream', download_name='EIMS_Model.fbx')
 
 
 # ================== NWD EXPORT ENDPOINT ==================
@@ -7222,9 +7273,8 @@ def export_nwd():
     proj = _resolve_owned_project_dict(data)
     if proj:
         data = {**proj, **data}
-    nwd_content = NWDExporter.generate(data)
-    buf = io.BytesIO(nwd_content.encode('utf-8'))
-    return send_file(buf, mimetype='application/xml', as_attachment=True, download_name='EIMS_Model.nwd')
+    return _cached_export('nwd', data, lambda: NWDExporter.generate(data).encode('utf-8'),
+                          mimetype='application/xml', download_name='EIMS_Model.nwd')
 
 
 # ================== PARAMETRIC FAMILIES ENDPOINTS ==================
@@ -7254,8 +7304,9 @@ def api_parametric_family():
 def api_clash_detection():
     """Run BIM clash detection on project model"""
     data = request.json or {}
-    if current_project:
-        data = {**current_project, **data}
+    project = _request_project(data.get('project_id'))
+    if project:
+        data = {**project, **data}
     result = ClashDetector.detect_clashes(data)
     return jsonify({'success': True, **result})
 
@@ -7414,6 +7465,29 @@ def api_collab_events():
         return jsonify({'error': 'Session not found'}), 404
     return jsonify({'success': True, **result})
 
+@app.route('/api/collab/events/stream', methods=['GET'])
+def api_collab_events_stream():
+    """Server-Sent Events feed of a session's events.
+
+    Resumes after ``last_id`` (or the Last-Event-ID header): the number of
+    events the client already has, as with ``since`` on /api/collab/events.
+    """
+    session_id = request.args.get('session_id', '')
+    raw = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    try:
+        last_id = int(raw) if raw not in (None, '') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'bad last_id'}), 400
+    if CollaborationEngine.get_events(session_id) is None:
+        return jsonify({'error': 'Session not found'}), 404
+
+    def backfill(after_id, limit):
+        events = (CollaborationEngine.get_events(session_id, after_id) or {}).get('events', [])
+        return [{'id': after_id + i + 1, **e} for i, e in enumerate(events)]
+
+    return _eims_collab.sse_response(
+        lambda: _collab_bus.subscribe(session_id, last_id, backfill=backfill), event='collab')
+
 @app.route('/api/collab/update', methods=['POST'])
 def api_collab_update():
     """Update an element in a collaboration session"""
@@ -9907,6 +9981,15 @@ def api_report_quotation():
 def api_report_client_package():
     """Generate complete client summary package"""
     data = request.get_json(silent=True) or {}
+    if _eims_jobs.wants_async(request):
+        return _eims_jobs.accepted(_eims_jobs.submit(
+            'client-package', _build_client_package, data, mimetype='application/json'))
+    return jsonify(_build_client_package(data))
+
+
+def _build_client_package(data, progress=None):
+    progress = progress or (lambda pct, stage='': None)
+    progress(5, 'quotation and summaries')
     country = data.get('country', 'Other')
     currency = data.get('currency')
     building_data = {
@@ -9929,217 +10012,65 @@ def api_report_client_package():
         discount_pct=float(data.get('discount_pct', 0)),
         price_overrides=data.get('price_overrides') or None,
     )
-    return jsonify(result)
+    return result
 
 
 # ================== EIMS ENGINEERING MODULES ==================
 # Each module registers its own routes; see eims_modules/ for source.
-try:
-    from eims_modules import fx as _eims_fx
-    _eims_fx.register(app, currencies=CURRENCIES, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('FX module registration failed: %s', _e)
-
-try:
-    from eims_modules import materials_index as _eims_materials_index
-    _eims_materials_index.register(app, materials_db=MATERIALS_DATABASE,
-                                    auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Materials-index module registration failed: %s', _e)
-
-try:
-    from eims_modules import wind_loads as _eims_wind
-    _eims_wind.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Wind-loads module registration failed: %s', _e)
-
-try:
-    from eims_modules import seismic as _eims_seismic
-    _eims_seismic.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Seismic module registration failed: %s', _e)
-
-try:
-    from eims_modules import geotech as _eims_geotech
-    _eims_geotech.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Geotechnical module registration failed: %s', _e)
-
-try:
-    from eims_modules import rc_design as _eims_rc
-    _eims_rc.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('RC-design module registration failed: %s', _e)
-
-try:
-    from eims_modules import steel_connections as _eims_steel
-    _eims_steel.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Steel-connections module registration failed: %s', _e)
-
-try:
-    from eims_modules import nrm1_costplan as _eims_nrm1
-    _eims_nrm1.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('NRM1 cost-plan module registration failed: %s', _e)
-
-try:
-    from eims_modules import rate_buildup as _eims_rb
-    _eims_rb.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Rate build-up module registration failed: %s', _e)
-
-try:
-    from eims_modules import cashflow as _eims_cf
-    _eims_cf.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Cashflow module registration failed: %s', _e)
-
-try:
-    from eims_modules import variations as _eims_var
-    _eims_var.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Variations module registration failed: %s', _e)
-
-try:
-    from eims_modules import tender_compare as _eims_tc
-    _eims_tc.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Tender-comparison module registration failed: %s', _e)
-
-try:
-    from eims_modules import risk_montecarlo as _eims_risk
-    _eims_risk.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Risk Monte-Carlo module registration failed: %s', _e)
-
-try:
-    from eims_modules import evm as _eims_evm
-    _eims_evm.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('EVM module registration failed: %s', _e)
-
-try:
-    from eims_modules import carbon as _eims_carbon
-    _eims_carbon.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Embodied-carbon module registration failed: %s', _e)
-
-# ---- Sprint 3: architect modules ----
-try:
-    from eims_modules import daylight as _eims_dl
-    _eims_dl.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Daylight module registration failed: %s', _e)
-
-try:
-    from eims_modules import acoustics as _eims_ac
-    _eims_ac.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Acoustics module registration failed: %s', _e)
-
-try:
-    from eims_modules import uvalue as _eims_uv
-    _eims_uv.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('U-value module registration failed: %s', _e)
-
-try:
-    from eims_modules import egress as _eims_eg
-    _eims_eg.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Egress module registration failed: %s', _e)
-
-try:
-    from eims_modules import accessibility as _eims_acc
-    _eims_acc.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Accessibility module registration failed: %s', _e)
-
-try:
-    from eims_modules import boq_format as _eims_bq
-    _eims_bq.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('BOQ-format module registration failed: %s', _e)
-
-# ---- Sprint 3: platform polish ----
-try:
-    from eims_modules import healthcheck as _eims_hc
-    _eims_hc.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Healthcheck module registration failed: %s', _e)
-
-try:
-    from eims_modules import rate_limit as _eims_rl
-    _eims_rl.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Rate-limit module registration failed: %s', _e)
-
-try:
-    from eims_modules import audit_log as _eims_al
-    _eims_al.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Audit-log module registration failed: %s', _e)
-
-try:
-    from eims_modules import openapi as _eims_oa
-    _eims_oa.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('OpenAPI module registration failed: %s', _e)
-
-try:
-    from eims_modules import pdf_report as _eims_pdf
-    _eims_pdf.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('PDF-report module registration failed: %s', _e)
-
-# ---- Sprint 4: gap-closer modules (vs. world-leading platforms) ----
-try:
-    from eims_modules import projects as _eims_proj
-    _eims_proj.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Projects (SQLite) module registration failed: %s', _e)
-
-try:
-    from eims_modules import scheduler as _eims_sch
-    _eims_sch.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Scheduler (CPM) module registration failed: %s', _e)
-
-try:
-    from eims_modules import frame_analysis as _eims_fr
-    _eims_fr.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Frame analysis (matrix stiffness) registration failed: %s', _e)
-
-try:
-    from eims_modules import export as _eims_ex
-    _eims_ex.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Export (CSV/XLSX) module registration failed: %s', _e)
-
-try:
-    from eims_modules import house_designer as _eims_house
-    _eims_house.register(app, auth_required=auth_required)
-    logger.info('House-designer module registered (10 endpoints, '
-                 'styles=Marbella/Andalusian/Mediterranean, '
-                 'outputs=DXF/OBJ/GLB/SVG + 3D viewer)')
-except Exception as _e:  # pragma: no cover
-    logger.warning('House-designer module registration failed: %s', _e)
-
-try:
-    from eims_modules import experience_design as _eims_exp
-    _eims_exp.register(app, auth_required=auth_required)
-    logger.info('Experience-design module registered (7 endpoints: '
-                 'solar-path / lifestyle-journeys / emotion-brief / '
-                 'indoor-outdoor-flow / restraint-score / complete-brief / palettes)')
-except Exception as _e:  # pragma: no cover
-    logger.warning('Experience-design module registration failed: %s', _e)
+# Registration is lazy (eims_modules/lazy_routes.py): a module listed in
+# route_manifest.json gets stub routes now and is imported on the first
+# request that hits one of them, so cold start does not pay for scipy, the
+# BIM stack etc. Modules that install request hooks, or are missing from the
+# manifest, are imported and registered here as before. A failing module
+# logs a warning and never cascades.
+from eims_modules import lazy_routes as _eims_lazy
+
+_eims_modules = _eims_lazy.Registry(app)
+
+_eims_modules.register('fx', 'FX', currencies=CURRENCIES, auth_required=auth_required)
+_eims_modules.register('materials_index', 'Materials-index', materials_db=MATERIALS_DATABASE,
+                       auth_required=auth_required)
+for _name, _label in [
+    ('wind_loads',        'Wind-loads'),
+    ('seismic',           'Seismic'),
+    ('geotech',           'Geotechnical'),
+    ('rc_design',         'RC-design'),
+    ('steel_connections', 'Steel-connections'),
+    ('nrm1_costplan',     'NRM1 cost-plan'),
+    ('rate_buildup',      'Rate build-up'),
+    ('cashflow',          'Cashflow'),
+    ('variations',        'Variations'),
+    ('tender_compare',    'Tender-comparison'),
+    ('risk_montecarlo',   'Risk Monte-Carlo'),
+    ('evm',               'EVM'),
+    ('carbon',            'Embodied-carbon'),
+    # ---- Sprint 3: architect modules ----
+    ('daylight',          'Daylight'),
+    ('acoustics',         'Acoustics'),
+    ('uvalue',            'U-value'),
+    ('egress',            'Egress'),
+    ('accessibility',     'Accessibility'),
+    ('boq_format',        'BOQ-format'),
+    # ---- Sprint 3: platform polish ----
+    ('healthcheck',       'Healthcheck'),
+    ('rate_limit',        'Rate-limit'),
+    ('audit_log',         'Audit-log'),
+    ('openapi',           'OpenAPI'),
+    ('pdf_report',        'PDF-report'),
+    # ---- Sprint 4: gap-closer modules (vs. world-leading platforms) ----
+    ('projects',          'Projects (SQLite)'),
+    ('scheduler',         'Scheduler (CPM)'),
+    ('frame_analysis',    'Frame analysis (matrix stiffness)'),
+    ('export',            'Export (CSV/XLSX)'),
+    ('house_designer',    'House-designer'),
+    ('experience_design', 'Experience-design'),
+]:
+    _eims_modules.register(_name, _label, auth_required=auth_required)
 
 
 # ================== SPRINT 5: DOMAIN EXTENSIONS (SAFETY / LANDSCAPE / HYDRO / INTERIOR / NL) ==================
-# Ten domain modules added as isolated blueprints. Each registers via try/except
-# so one failure cannot cascade. Removing any of these files is a no-op.
+# Ten domain modules added as isolated blueprints. Each registers in
+# isolation so one failure cannot cascade. Removing any of these files is a no-op.
 
 for _name, _label in [
     ('safety_risk',       'Safety risk-register'),
@@ -10152,23 +10083,22 @@ for _name, _label in [
     ('plants_irrigation', 'Plants + irrigation planner'),
     ('flood_catchment',   'Flood / catchment hydrology'),
     ('site_hazard',       'Site-hazard GPS enrichment'),
+    ('design_sweep',      'Design-variant sweep'),
 ]:
-    try:
-        _mod = __import__(f'eims_modules.{_name}', fromlist=[_name])
-        _mod.register(app, auth_required=auth_required)
-    except Exception as _e:  # pragma: no cover
-        logger.warning('%s module registration failed: %s', _label, _e)
+    _eims_modules.register(_name, _label, auth_required=auth_required)
 
 
 # ---- Unified BIM model + schedules + BIM-native renderer (Revit-class core) ----
 # This is the foundation of true BIM authoring — a canonical Building tree
 # every renderer/schedule/exporter eventually projects from. Registered last
 # so existing routes can't accidentally shadow it during an in-flight reload.
+_eims_modules.register('bim_endpoints', 'BIM endpoints', auth_required=auth_required, db_getter=get_db)
+
+# ---- Background export jobs (status / result polling for ?async=1 exports) ----
 try:
-    from eims_modules import bim_endpoints as _eims_bim
-    _eims_bim.register(app, auth_required=auth_required, db_getter=get_db)
+    _eims_jobs.register(app, auth_required=auth_required)
 except Exception as _e:  # pragma: no cover
-    logger.warning('BIM endpoints registration failed: %s', _e)
+    logger.warning('Job endpoints registration failed: %s', _e)
 
 
 # ---- Disruption modules: areas where Revit currently leads ----
@@ -10180,17 +10110,13 @@ for _name, _label in [
     ('healthcare',    'Healthcare compliance'),
     ('collaboration', 'Real-time collaboration'),
 ]:
-    try:
-        _mod = __import__(f'eims_modules.{_name}', fromlist=[_name])
-        _mod.register(app, auth_required=auth_required)
-    except Exception as _e:  # pragma: no cover
-        logger.warning('%s module registration failed: %s', _label, _e)
+    _eims_modules.register(_name, _label, auth_required=auth_required)
 
-try:
-    from eims_modules import paystack_report_unlock as _eims_paystack_ru
-    _eims_paystack_ru.register(app, auth_required=auth_required)
-except Exception as _e:  # pragma: no cover
-    logger.warning('Paystack report-unlock module registration failed: %s', _e)
+_eims_modules.register('paystack_report_unlock', 'Paystack report-unlock', auth_required=auth_required)
+
+_lazy = sum(1 for m in _eims_modules.modules.values() if m['mode'] == 'lazy')
+logger.info('EIMS modules: %d lazy (import on first request), %d eager',
+            _lazy, len(_eims_modules.modules) - _lazy)
 
 
 # ---- Sprint 3: Professional console (single-page UI for all modules) ----
@@ -0,0 +1,76 @@
+"""Audit-log query latency vs total log size: full-file scan vs indexed segments.
+
+"scan" is the previous implementation (parse every line of one JSONL file,
+keep the last ``limit`` matches); "indexed" is audit_log.query(). Both
+answer the same filtered queries over the same records.
+
+    python benchmarks/audit_query.py --sizes 10000 100000 300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['EIMS_UPLOAD_FOLDER'] = tempfile.mkdtemp(prefix='eims_auditbench_')
+
+from eims_modules import audit_log  # noqa: E402
+
+QUERIES = [dict(limit=200), dict(limit=50, user='u7'), dict(limit=50, action='DELETE /api/projects')]
+
+
+def scan(path, *, limit, user=None, action=None):
+    out = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            rec = json.loads(line)
+            if user and rec.get('user') != user:
+                continue
+            if action and rec.get('action') != action:
+                continue
+            out.append(rec)
+    return out[-limit:]
+
+
+def _time(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 300_000])
+    args = parser.parse_args()
+
+    flat = os.path.join(audit_log._UPLOADS, 'flat.jsonl')
+    written = 0
+    print(f"{'records':>10}{'write/s':>10}{'scan ms':>10}{'indexed ms':>12}")
+    for n in args.sizes:
+        t0 = time.perf_counter()
+        with open(flat, 'a', encoding='utf-8') as f:
+            for i in range(written, n):
+                action = 'DELETE /api/projects' if i % 97 == 0 else 'POST /api/generate'
+                audit_log.log_event(user=f'u{i % 50}', action=action, ip='10.0.0.1',
+                                    detail={'status': 200, 'len': i})
+                f.write(json.dumps({'user': f'u{i % 50}', 'action': action, 'detail': {'len': i}}) + '\n')
+        audit_log.flush(timeout=600)
+        rate = (n - written) / (time.perf_counter() - t0)
+        written = n
+        scan_ms = sum(_time(lambda q=q: scan(flat, **q), repeat=1) for q in QUERIES) / len(QUERIES)
+        idx_ms = sum(_time(lambda q=q: audit_log.query(**q)) for q in QUERIES) / len(QUERIES)
+        print(f'{n:>10}{rate:>10.0f}{scan_ms:>10.1f}{idx_ms:>12.2f}')
+    print(f'\nsegments: {len(audit_log._segments())}')
+
+
+if __name__ == '__main__':
+    main()
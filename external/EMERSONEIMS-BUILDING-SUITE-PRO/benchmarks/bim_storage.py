@@ -0,0 +1,106 @@
+"""Building model storage: JSON round trip vs the bim_binary encoding.
+
+Models grow with storeys (and bedrooms, which add rooms, partitions and
+doors per storey). Per model size it reports:
+
+  * encode  — json.dumps(b.to_dict()) vs b.to_bytes()
+  * decode  — Building.from_dict(json.loads(...)) vs from_bytes(lazy=False)
+  * 1 storey — the JSON path again (it always decodes everything) vs a lazy
+    from_bytes that then touches one storey's elements
+  * project — what a BIM route pays to get a project plus one storey out
+    of SQLite: the old data_json read + json.loads + from_dict, vs the
+    bim-less row (dropped inside SQLite) + blob select + lazy decode
+
+    python benchmarks/bim_storage.py --storeys 5 20 60 --bedrooms 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules.artifact_cache import digest  # noqa: E402
+from eims_modules.bim_endpoints import _BIM_BLOBS_SQL, _PROJECT_WITHOUT_BIM_SQL  # noqa: E402
+from eims_modules.bim_model import Building  # noqa: E402
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def _project_db(b: Building) -> sqlite3.Connection:
+    path = os.path.join(tempfile.mkdtemp(prefix='eims_bim_bench_'), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE projects (id TEXT PRIMARY KEY, data_json TEXT, phases_json TEXT)')
+    conn.execute(_BIM_BLOBS_SQL)
+    bim = b.to_dict()
+    proj = {'name': b.name, 'area': 100.0 * len(b.storeys), 'bim': bim,
+            'bim_revision': 1, 'bim_hash': digest(bim), 'notes': ['x' * 80] * 50}
+    conn.execute('INSERT INTO projects VALUES (?, ?, ?)', ('P1', json.dumps(proj), '{}'))
+    conn.execute('INSERT INTO bim_blobs VALUES (?, ?, 1, ?)', ('P1', proj['bim_hash'], b.to_bytes()))
+    conn.commit()
+    return conn
+
+
+def project_before(conn, storey: int):
+    row = conn.execute('SELECT data_json, phases_json FROM projects WHERE id=?', ('P1',)).fetchone()
+    proj = json.loads(row['data_json'])
+    return proj, Building.from_dict(proj['bim']).storeys[storey].walls
+
+
+def project_after(conn, storey: int):
+    row = conn.execute(_PROJECT_WITHOUT_BIM_SQL, ('P1',)).fetchone()
+    proj = json.loads(row['data_json'])
+    blob = conn.execute('SELECT data FROM bim_blobs WHERE project_id=? AND bim_hash=?',
+                        ('P1', proj['bim_hash'])).fetchone()['data']
+    return proj, Building.from_bytes(blob).storeys[storey].walls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storeys', type=int, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--bedrooms', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'storeys':>7}{'elements':>9}{'json kB':>8}{'bin kB':>7}"
+          f"{'encode ms':>16}{'decode ms':>16}{'1 storey ms':>16}{'project ms':>16}")
+    print(f"{'':>31}" + f"{'json -> bin':>16}" * 4)
+    for n in args.storeys:
+        b = Building.from_params(name=f'Bench {n}', area_m2=400 * n, stories=n,
+                                 units=2, bedrooms=args.bedrooms)
+        elements = sum(len(s.walls) + len(s.slabs) + len(s.spaces) + len(s.openings)
+                       + len(s.columns) + len(s.beams) for s in b.storeys)
+        text, blob = json.dumps(b.to_dict()), b.to_bytes()
+        assert Building.from_bytes(blob).to_dict() == Building.from_dict(json.loads(text)).to_dict()
+        mid = n // 2
+        enc = (_best(lambda: json.dumps(b.to_dict()), args.repeat),
+               _best(lambda: b.to_bytes(), args.repeat))
+        dec = (_best(lambda: Building.from_dict(json.loads(text)), args.repeat),
+               _best(lambda: Building.from_bytes(blob, lazy=False), args.repeat))
+        one = (_best(lambda: Building.from_dict(json.loads(text)).storeys[mid].walls, args.repeat),
+               _best(lambda: Building.from_bytes(blob).storeys[mid].walls, args.repeat))
+        conn = _project_db(b)
+        proj = (_best(lambda: project_before(conn, mid), args.repeat),
+                _best(lambda: project_after(conn, mid), args.repeat))
+        conn.close()
+        cells = ''.join(f'{a:>8.2f}{b_:>8.2f}' for a, b_ in (enc, dec, one, proj))
+        print(f'{n:>7}{elements:>9}{len(text) / 1024:>8.0f}{len(blob) / 1024:>7.0f}{cells}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Clash detection at 1k / 10k / 100k elements: x-axis sweep vs hash grid.
+
+"before" is the old mep_clash pipeline (sort by xmin, rebuild the active
+list at each step, test pairs one by one in Python); "after" is
+mep_clash.detect() on the uniform-grid index. "edit" moves one element in
+the built index and re-checks it, as /api/bim/element/update does.
+The old sweep compared raw x-extents, so it also missed clearance
+violations across a gap in x; its count is shown in brackets when it
+differs.
+
+The synthetic model is a federated tower: a column/beam grid with slabs,
+partition walls and long MEP runs along x on every storey -- the corridor
+layout that defeats a one-axis sweep.
+
+    python benchmarks/clash_broad_phase.py --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules import mep_clash  # noqa: E402
+from eims_modules.mep_clash import AABB, Element  # noqa: E402
+
+BAY = 6.0
+STOREY = 3.5
+MEP = [('HVAC', 'duct', 0.6, 0.4), ('PLUMBING', 'pipe', 0.1, 0.1),
+       ('ELECTRICAL', 'cable_tray', 0.3, 0.1)]
+
+
+def federated_model(n: int, seed: int = 0) -> list[Element]:
+    """About ``n`` elements on a 10 x 10 bay floor plate, stacked as needed."""
+    rng = random.Random(seed)
+    out: list[Element] = []
+    s = 0
+    while len(out) < n:
+        z0 = s * STOREY
+        top = z0 + STOREY
+        out.append(Element(f'S{s}', 'STRUCTURE', 'slab', AABB(0, 0, top - 0.25, 10 * BAY, 10 * BAY, top)))
+        for i in range(11):
+            for j in range(11):
+                x, y = i * BAY, j * BAY
+                out.append(Element(f'C{s}.{i}.{j}', 'STRUCTURE', 'column',
+                                   AABB(x - 0.2, y - 0.2, z0, x + 0.2, y + 0.2, top)))
+                if i < 10:
+                    out.append(Element(f'BX{s}.{i}.{j}', 'STRUCTURE', 'beam',
+                                       AABB(x, y - 0.15, top - 0.6, x + BAY, y + 0.15, top)))
+                if j < 10:
+                    out.append(Element(f'BY{s}.{i}.{j}', 'STRUCTURE', 'beam',
+                                       AABB(x - 0.15, y, top - 0.6, x + 0.15, y + BAY, top)))
+        for k in range(150):
+            x, y = rng.uniform(0, 10 * BAY - 4), rng.uniform(0, 10 * BAY)
+            out.append(Element(f'W{s}.{k}', 'ARCHITECTURE', 'wall',
+                               AABB(x, y - 0.05, z0, x + rng.uniform(1, 4), y + 0.05, top - 0.25)))
+        for k in range(300):
+            system, kind, w, h = MEP[k % 3]
+            x, y = rng.uniform(0, 10 * BAY - 12), rng.uniform(0, 10 * BAY)
+            z = top - rng.uniform(0.7, 1.0)
+            out.append(Element(f'M{s}.{k}', system, kind,
+                               AABB(x, y - w / 2, z - h / 2, x + rng.uniform(3, 12), y + w / 2, z + h / 2)))
+        s += 1
+    return out[:n]
+
+
+def before(elements: list[Element]) -> int:
+    """The old x-only sweep-and-prune with a per-pair Python narrow phase."""
+    found = 0
+    active: list[Element] = []
+    for el in sorted(elements, key=lambda e: e.aabb.xmin):
+        active = [e for e in active if e.aabb.xmax >= el.aabb.xmin]
+        for other in active:
+            if el.system == other.system and el.kind == other.kind:
+                continue
+            if {el.system, other.system} == {'ARCHITECTURE', 'STRUCTURE'}:
+                continue
+            c = mep_clash.required_clearance(el.system, other.system)
+            if el.aabb.intersects(other.aabb, clearance_m=c) and (
+                    c > 0 or el.aabb.overlap_volume_m3(other.aabb) > 0):
+                found += 1
+        active.append(el)
+    return found
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--before-limit', type=int, default=10000,
+                        help='skip the old sweep above this many elements (it is quadratic here)')
+    args = parser.parse_args()
+
+    print(f"{'elements':>9}{'clashes':>9}{'before s':>17}{'after s':>9}{'speed-up':>10}{'edit ms':>9}")
+    for n in args.sizes:
+        elements = federated_model(n)
+        index, t_after = _timed(mep_clash.build_index, elements)
+        clashes = len(index.clashes())
+        if n <= args.before_limit:
+            found, t_before = _timed(before, elements)
+            b = f'{t_before:.2f}' + (f' ({found})' if found != clashes else '')
+            ratio = f'{t_before / t_after:.0f}x'
+        else:
+            b, ratio = 'skipped', '-'
+        duct = next(e for e in elements if e.kind == 'duct')
+        bb = duct.aabb
+        moved = (duct.id, duct.system, duct.kind,
+                 (bb.xmin + 1, bb.ymin + 1, bb.zmin, bb.xmax + 1, bb.ymax + 1, bb.zmax), duct)
+        _, t_edit = _timed(index.update, [moved])
+        print(f'{n:>9}{clashes:>9}{b:>17}{t_after:>9.2f}{ratio:>10}{t_edit * 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cold start of app_professional: eager vs lazy module registration.
+
+Each run is a fresh interpreter (see eims_modules/startup_profile.py). Per
+mode it reports the median of --runs for:
+
+  * import   — import app_professional
+  * ttfb     — import + first request to the first --path
+  * first / second request to each --path (the first one pays for loading
+    a lazily registered module)
+
+and the heavy dependencies already imported when the import returns.
+
+With --budget-ms it is a CI gate: exit status 1 when the lazy time to
+first byte is over budget, or when any heavy dependency is imported at
+startup.
+
+    python benchmarks/cold_start.py --runs 5 --path /api/health /api/qs/risk/distributions --budget-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules.startup_profile import cold_start  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--path', nargs='+', default=['/api/health', '/api/qs/risk/distributions'])
+    parser.add_argument('--budget-ms', type=float, default=None)
+    parser.add_argument('--lazy-only', action='store_true', help='skip the eager baseline')
+    args = parser.parse_args()
+
+    modes = [True] if args.lazy_only else [False, True]
+    results = {lazy: cold_start(args.path, args.runs, lazy=lazy) for lazy in modes}
+
+    print(f"{'mode':<7}{'import ms':>11}{'ttfb ms':>10}{'modules':>9}  heavy at import")
+    for lazy, r in results.items():
+        print(f"{'lazy' if lazy else 'eager':<7}{r['import_ms']:>11.1f}{r['ttfb_ms']:>10.1f}"
+              f"{r['modules_at_import']:>9}  {', '.join(r['heavy_at_import']) or '-'}")
+    print(f"\n{'path':<34}" + ''.join(f"{m + ' 1st':>12}{m + ' 2nd':>12}"
+                                       for m in ('eager', 'lazy')[2 - len(modes):]))
+    for i, path in enumerate(args.path):
+        cells = ''.join(f"{r['requests'][i]['first_ms']:>12.1f}{r['requests'][i]['second_ms']:>12.1f}"
+                        for r in results.values())
+        print(f'{path:<34}{cells}')
+
+    lazy = results[True]
+    if args.budget_ms is not None:
+        failures = []
+        if lazy['ttfb_ms'] > args.budget_ms:
+            failures.append(f"time to first byte {lazy['ttfb_ms']:.1f} ms > budget {args.budget_ms:.1f} ms")
+        if lazy['heavy_at_import']:
+            failures.append(f"heavy dependencies imported at startup: {lazy['heavy_at_import']}")
+        for f in failures:
+            print(f'FAIL: {f}', file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""CPU per request for response compression: per-request gzip vs precompressed.
+
+Through the Flask test client with Accept-Encoding: gzip, it reports
+per-thread CPU ms per request, and bytes on the wire, for:
+
+  * wizard JS / CSS / shell — the previous hook (gzip -6 of the whole body
+    on every request) vs the precompressed variants now served
+  * dynamic JSON of growing size — the previous hook vs compress_response
+    (budgeted level, chunked above EIMS_COMPRESS_STREAM_KB)
+  * a streamed NDJSON response — compressed incrementally (the previous
+    hook buffered the whole stream first)
+
+    python benchmarks/compression.py --requests 50 --json-kb 20 200 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER', tempfile.mkdtemp(prefix='eims_bench_'))
+
+from flask import Flask, Response  # noqa: E402
+
+from eims_modules import compression as comp  # noqa: E402
+
+
+def _legacy_gzip(response):
+    """The after-request hook as it was: buffer, gzip -6, set_data."""
+    data = response.get_data()
+    if len(data) < 500:
+        return response
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=6) as gz:
+        gz.write(data)
+    response.set_data(buf.getvalue())
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _cpu_per_request(client, path: str, n: int):
+    """(CPU ms per request, wire bytes)."""
+    client.get(path, headers={'Accept-Encoding': 'gzip'})               # warm caches
+    started = time.thread_time()
+    for _ in range(n):
+        r = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        body = r.get_data()
+    return (time.thread_time() - started) * 1e3 / n, len(body)
+
+
+def _row(label: str, old, new):
+    print(f'{label:<26}{old[0]:>10.2f}{new[0]:>10.2f}{old[1] / 1024:>11.1f}{new[1] / 1024:>11.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--json-kb', type=int, nargs='+', default=[20, 200, 2000])
+    args = parser.parse_args()
+
+    import app_professional
+    wizard = app_professional.app
+    wizard.config['TESTING'] = True
+    client = wizard.test_client()
+    link = client.get('/').headers.get('Link', '')
+    assets = ['/'] + ['/static/' + m for m in re.findall(r'</static/([^>]+)>', link)]
+
+    print(f"{'':<26}{'CPU ms / request':>20}{'KB on the wire':>22}")
+    print(f"{'response':<26}{'before':>10}{'after':>10}{'before':>11}{'after':>11}")
+    for path in assets:
+        a = app_professional._build_wizard_assets()
+        body = (a['shell'] if path == '/' else a['js'] if path.endswith('.js') else a['css'])
+        ctype = 'text/html' if path == '/' else 'text/plain'
+        legacy = Flask('legacy')
+        legacy.after_request(_legacy_gzip)
+        legacy.add_url_rule('/x', 'x', lambda: Response(body, content_type=ctype))
+        _row(path.rsplit('/', 1)[-1] or 'shell /',
+             _cpu_per_request(legacy.test_client(), '/x', args.requests),
+             _cpu_per_request(client, path, args.requests))
+
+    for kb in args.json_kb:
+        rows = max(1, kb * 1024 // 60)
+        payload = json.dumps([{'id': i, 'name': f'Beam {i}', 'span_m': i * 0.05, 'ok': True}
+                              for i in range(rows)])
+        legacy, current = Flask('legacy'), Flask('current')
+        legacy.after_request(_legacy_gzip)
+        current.after_request(lambda r: comp.compress_response(r, 'gzip'))
+        for app in (legacy, current):
+            app.add_url_rule('/j', 'j', lambda: Response(payload, content_type='application/json'))
+        n = max(3, args.requests * 20 // kb)
+        _row(f'json {len(payload) // 1024} KB', _cpu_per_request(legacy.test_client(), '/j', n),
+             _cpu_per_request(current.test_client(), '/j', n))
+
+    current = Flask('stream')
+    current.after_request(lambda r: comp.compress_response(r, 'gzip'))
+    current.add_url_rule('/s', 's', lambda: Response(
+        (json.dumps({'type': 'variant', 'id': i, 'cost_per_m2': 41000 + i}) + '\n' for i in range(500)),
+        content_type='application/x-ndjson'))
+    cpu, size = _cpu_per_request(current.test_client(), '/s', args.requests)
+    print(f"{'ndjson stream x500':<26}{'-':>10}{cpu:>10.2f}{'-':>11}{size / 1024:>11.1f}")
+    print('\n' + json.dumps(comp.stats()))
+
+
+if __name__ == '__main__':
+    main()
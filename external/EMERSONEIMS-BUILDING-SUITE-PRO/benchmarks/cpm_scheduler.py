@@ -0,0 +1,95 @@
+"""CPM on generated programmes: old O(V*E) pass vs adjacency lists + incremental edits.
+
+"before" is the original scheduler: a topological sort that scans every
+activity's predecessor set for each dequeued node (list.pop(0) queue) and a
+full forward/backward pass, repeated on every edit. "after" builds a
+Schedule (Kahn's algorithm with a deque, FS/SS/FF/SF links with lags).
+"edit" changes one duration and re-propagates only what moves, averaged
+over 50 random activities; "level" is the resource-levelling heuristic
+with a crew limit.
+
+    python benchmarks/cpm_scheduler.py --sizes 2000 5000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from eims_modules.scheduler import Schedule, cpm  # noqa: E402
+from test_scheduler_cpm import random_network  # noqa: E402
+
+
+def before(activities: list[dict]) -> float:
+    """Original topo sort + passes, finish-to-start links only."""
+    preds = {a['id']: [p if isinstance(p, str) else p['id'] for p in a['predecessors']]
+             for a in activities}
+    incoming = {n: set(ps) for n, ps in preds.items()}
+    order, ready, seen = [], [n for n, p in incoming.items() if not p], set()
+    while ready:
+        n = ready.pop(0)
+        if n in seen:
+            continue
+        order.append(n)
+        seen.add(n)
+        for m, ps in incoming.items():
+            if n in ps:
+                ps.discard(n)
+                if not ps and m not in seen:
+                    ready.append(m)
+    dur = {a['id']: a['duration_days'] for a in activities}
+    succ = {n: [] for n in preds}
+    for n, ps in preds.items():
+        for p in ps:
+            succ[p].append(n)
+    EF = {}
+    for n in order:
+        EF[n] = max((EF[p] for p in preds[n]), default=0.0) + dur[n]
+    end = max(EF.values())
+    LS = {}
+    for n in reversed(order):
+        LS[n] = min((LS[c] for c in succ[n]), default=end) - dur[n]
+    return end
+
+
+def _timed(fn, *args, **kw):
+    started = time.perf_counter()
+    out = fn(*args, **kw)
+    return out, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 5000, 20000])
+    parser.add_argument('--before-limit', type=int, default=5000,
+                        help='skip the old scheduler above this many activities (it is quadratic)')
+    parser.add_argument('--crew', type=float, default=12)
+    args = parser.parse_args()
+
+    print(f"{'activities':>11}{'before s':>10}{'after s':>9}{'speed-up':>10}{'edit ms':>9}{'level s':>9}")
+    for n in args.sizes:
+        acts = random_network(n, seed=1)
+        sched, t_after = _timed(Schedule, acts)
+        if n <= args.before_limit:
+            _, t_before = _timed(before, acts)
+            b, ratio = f'{t_before:.2f}', f'{t_before / t_after:.0f}x'
+        else:
+            b, ratio = 'skipped', '-'
+        rng = random.Random(3)
+        started = time.perf_counter()
+        for _ in range(50):
+            sched.set_duration(f'A{rng.randrange(n)}', rng.randint(1, 20))
+        t_edit = (time.perf_counter() - started) / 50
+        _, t_level = _timed(cpm, activities=acts, resource_limits={'crew': args.crew})
+        print(f'{n:>11}{b:>10}{t_after:>9.2f}{ratio:>10}{t_edit * 1000:>9.1f}{t_level:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
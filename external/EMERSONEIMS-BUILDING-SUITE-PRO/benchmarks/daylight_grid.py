@@ -0,0 +1,58 @@
+"""Point-grid daylight factor for whole buildings: runtime vs size and workers.
+
+Per model size it reports grid points, and building_daylight time with
+storeys run serially vs on the EIMS_DAYLIGHT_WORKERS thread pool, with wall
+occlusion off and on.
+
+    python benchmarks/daylight_grid.py --storeys 5 20 60 --grid 0.5 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules.bim_model import Building  # noqa: E402
+from eims_modules.daylight_grid import building_daylight  # noqa: E402
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storeys', type=int, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--bedrooms', type=int, default=12)
+    parser.add_argument('--grid', type=float, default=0.5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'storeys':>7}{'rooms':>7}{'points':>8}{'ms, no occlusion':>20}{'ms, occlusion':>18}")
+    print(f"{'':>22}" + f"{'serial':>10}{'x' + str(args.workers):>8}" * 2)
+    for n in args.storeys:
+        b = Building.from_params(name=f'Bench {n}', area_m2=400 * n, stories=n,
+                                 units=2, bedrooms=args.bedrooms)
+        summary = building_daylight(b, spacing_m=args.grid)['summary']
+        cells = ''
+        for occlusion in (False, True):
+            serial, pooled = (_best(lambda: building_daylight(b, spacing_m=args.grid, occlusion=occlusion,
+                                                              workers=w), args.repeat)
+                              for w in (1, args.workers))
+            cells += f'{serial:>10.0f}{pooled:>8.0f}'
+        print(f"{n:>7}{summary['rooms']:>7}{summary['points']:>8}{cells}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Project load / save / list throughput: connection-per-call vs pooled layer.
+
+"before" reproduces the old access pattern (fresh sqlite3 connection and a
+full json.loads of data_json + phases_json on every load); "after" goes
+through app_professional.get_db() / _load_project() / _save_project().
+Both run against the same throwaway copy of a seeded database.
+
+    python benchmarks/db_throughput.py --projects 200 --ops 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER', tempfile.mkdtemp(prefix='eims_bench_'))
+
+
+def _seed(ap, n):
+    """Run the real pipeline once and clone the result into ``n`` rows."""
+    client = ap.app.test_client()
+    pid = client.post('/api/projects', json={
+        'name': 'Bench', 'location': 'Nairobi, Kenya', 'gps_lat': -1.29,
+        'gps_lng': 36.82, 'units': 4, 'stories': 3, 'area': 600}).get_json()['project_id']
+    client.post('/api/execute-all-phases', json={'project_id': pid})
+    project = ap._load_project(pid)
+    ids = []
+    conn = ap.get_db()
+    now = datetime.now().isoformat()
+    for i in range(n):
+        project = {**project, 'id': f'BENCH-{i}', 'name': f'Bench {i}'}
+        conn.execute('''INSERT OR REPLACE INTO projects (id, user_id, name, location, building_type,
+                        area, data_json, phases_json, created_at, updated_at)
+                        VALUES (?, 'guest', ?, ?, 'residential', 600, ?, ?, ?, ?)''',
+                     (project['id'], project['name'], project['location'], json.dumps(project),
+                      json.dumps(project['phases']), now, now))
+        ids.append(project['id'])
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def _old_connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def before(path):
+    def load(pid):
+        conn = _old_connect(path)
+        row = conn.execute('SELECT * FROM projects WHERE id = ?', (pid,)).fetchone()
+        conn.close()
+        project = json.loads(row['data_json'])
+        project['phases'] = json.loads(row['phases_json']) if row['phases_json'] else {}
+        return project
+
+    def save(project):
+        conn = _old_connect(path)
+        conn.execute('UPDATE projects SET phases_json=?, data_json=?, updated_at=? WHERE id=?',
+                     (json.dumps(project['phases']), json.dumps(project),
+                      datetime.now().isoformat(), project['id']))
+        conn.commit()
+        conn.close()
+
+    def list_():
+        conn = _old_connect(path)
+        conn.execute('''SELECT id, name, location, building_type, area, stories, units, created_at
+                        FROM projects WHERE user_id = ? OR owner_id = ?
+                        ORDER BY created_at DESC''', ('guest', 'guest')).fetchall()
+        conn.close()
+
+    return load, save, list_
+
+
+def after(ap):
+    def list_():
+        conn = ap.get_db()
+        conn.execute('''SELECT id, name, location, building_type, area, stories, units, created_at
+                        FROM projects WHERE user_id = ? OR owner_id = ?
+                        ORDER BY created_at DESC''', ('guest', 'guest')).fetchall()
+        conn.close()
+
+    return ap._load_project, lambda p: ap._save_project(p, phases=True), list_
+
+
+def _rate(fn, args, ops):
+    started = time.perf_counter()
+    for i in range(ops):
+        fn(*args(i))
+    return ops / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--ops', type=int, default=2000)
+    args = parser.parse_args()
+
+    import app_professional as ap
+    workdir = tempfile.mkdtemp(prefix='eims_dbbench_')
+    ap.DB_PATH = os.path.join(workdir, 'eims.db')
+    ap._db_pool = ap._eims_db.get_pool(ap.DB_PATH)
+    ap.init_db()
+    ids = _seed(ap, args.projects)
+    project = ap._load_project(ids[0])
+    rng = random.Random(0)
+    # Skewed access: most loads hit a small working set, as in real sessions.
+    hot = [rng.choice(ids[:16]) if rng.random() < 0.8 else rng.choice(ids) for _ in range(args.ops)]
+
+    print(f'{args.projects} projects, {len(json.dumps(project)) // 1024} KiB data_json each\n')
+    print(f"{'op/s':<8}{'before':>12}{'after':>12}{'speed-up':>10}")
+    rows = {}
+    for label in ('before', 'after'):
+        if label == 'before':
+            conn = sqlite3.connect(ap.DB_PATH)  # the old schema had no indexes
+            conn.execute('DROP INDEX idx_projects_user')
+            conn.execute('DROP INDEX idx_projects_owner')
+            conn.close()
+            load, save, list_ = before(ap.DB_PATH)
+        else:
+            ap.init_db()
+            load, save, list_ = after(ap)
+        rows[label] = (
+            _rate(load, lambda i: (hot[i],), args.ops),
+            _rate(save, lambda i: ({**project, 'id': ids[i % len(ids)]},), args.ops // 4),
+            _rate(list_, lambda i: (), args.ops // 4),
+        )
+    for name, b, a in zip(('load', 'save', 'list'), rows['before'], rows['after']):
+        print(f'{name:<8}{b:>12.0f}{a:>12.0f}{a / b:>9.1f}x')
+    print(f'\ncache: {ap.PROJECT_CACHE.stats()}  pool: {ap._db_pool.stats()}')
+
+
+if __name__ == '__main__':
+    main()
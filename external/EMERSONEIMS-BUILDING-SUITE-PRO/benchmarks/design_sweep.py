@@ -0,0 +1,71 @@
+"""Design-variant sweep throughput: memoisation and the process pool.
+
+For grids of growing size (bedrooms x storeys x wall system x foundation)
+it reports variants/s for:
+
+  * cold     — every variant evaluated with the sub-result caches cleared
+               before each one (what one request per variant used to cost)
+  * memo     — one in-process sweep sharing the caches across variants
+  * pool     — the same sweep on an EIMS_SWEEP_PROCESSES-style spawn pool
+
+    python benchmarks/design_sweep.py --bedrooms 2 3 4 5 --stories 1 2 3 4 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules import design_sweep as ds  # noqa: E402
+
+
+def _clear():
+    ds._geometry.cache_clear()
+    ds._frame.cache_clear()
+    ds._foundation.cache_clear()
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def _cold(variants):
+    for v in variants:
+        _clear()
+        ds.evaluate(v)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bedrooms', type=int, nargs='+', default=[2, 3, 4, 5])
+    parser.add_argument('--stories', type=int, nargs='+', default=[1, 2, 3, 4])
+    parser.add_argument('--area', type=float, default=240.0)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'variants':>9}{'groups':>8}{'cold /s':>10}{'memo /s':>10}{'pool /s':>10}{'front':>7}")
+    walls = list(ds.WALL_SYSTEMS)
+    ds.evaluate({'area_m2': args.area})              # imports + first-call warm-up
+    for n_walls, foundations in ((1, ['strip']), (2, ['strip', 'pad']), (4, ['strip', 'pad', 'raft'])):
+        variants = ds.expand({'axes': {'bedrooms': args.bedrooms, 'stories': args.stories,
+                                       'wall_system': walls[:n_walls], 'foundation': foundations},
+                              'base': {'area_m2': args.area}})
+        n = len(variants)
+        cold = _timed(lambda: _cold(variants))
+        _clear()
+        rows = []
+        memo = _timed(lambda: rows.extend(ds.sweep(variants, processes=1)))
+        pool = _timed(lambda: list(ds.sweep(variants, processes=args.processes)))
+        print(f'{n:>9}{len(ds._groups(variants)):>8}{n / cold:>10.0f}{n / memo:>10.0f}'
+              f'{n / pool:>10.0f}{len(ds.pareto(rows)):>7}')
+
+
+if __name__ == '__main__':
+    main()
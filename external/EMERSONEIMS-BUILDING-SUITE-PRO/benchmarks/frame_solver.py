@@ -0,0 +1,58 @@
+"""2D frame analysis over growing frames: pure-Python reference vs sparse backend.
+
+Each frame is a fixed-base multi-bay building with G, Q and W load cases and
+three combinations, i.e. six load vectors. "python" is the original dense
+Gauss elimination (one solve per vector); "sparse" factorises once and
+solves all six against the same banded Cholesky factor. Results are checked
+against each other wherever the reference runs.
+
+    python benchmarks/frame_solver.py --sizes 5x3 10x4 20x6 40x8 100x10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from eims_modules.frame_analysis import analyze  # noqa: E402
+from test_frame_solver import _close, portal_frame  # noqa: E402
+
+
+def _timed(**kw):
+    started = time.perf_counter()
+    out = analyze(**kw)
+    assert out['success'], out.get('error')
+    return out, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['5x3', '10x4', '20x6', '40x8', '100x10'],
+                        help='storeys x bays')
+    parser.add_argument('--python-limit', type=int, default=500,
+                        help='skip the reference solver above this many DOF')
+    args = parser.parse_args()
+
+    print(f"{'frame':>8}{'DOF':>7}{'band':>6}{'python s':>10}{'sparse ms':>11}{'speed-up':>10}")
+    for size in args.sizes:
+        storeys, bays = map(int, size.split('x'))
+        model = portal_frame(storeys, bays)
+        fast, t_fast = _timed(**model)
+        if fast['dof_count'] <= args.python_limit:
+            ref, t_ref = _timed(**model, backend='python')
+            assert _close(fast['combinations'], ref['combinations'])
+            ref_s, ratio = f'{t_ref:.2f}', f'{t_ref / t_fast:.0f}x'
+        else:
+            ref_s, ratio = 'skipped', '-'
+        print(f"{size:>8}{fast['dof_count']:>7}{fast['solver']['bandwidth']:>6}"
+              f"{ref_s:>10}{t_fast * 1000:>11.1f}{ratio:>10}")
+
+
+if __name__ == '__main__':
+    main()
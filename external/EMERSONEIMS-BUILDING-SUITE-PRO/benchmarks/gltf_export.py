@@ -0,0 +1,91 @@
+"""3D model export: three.js object-list JSON vs instanced binary glTF.
+
+Per model size it reports payload bytes (raw and gzipped) and generation
+time for:
+
+  * bim    — building_to_three + json.dumps vs building_to_glb().to_bytes()
+             (what /api/bim/3d-model serves without / with format='glb')
+  * legacy — json.dumps of the /api/drawings/3d-model object list vs
+             objects_to_glb over the same list (object generation itself
+             is excluded from both columns)
+
+plus the number of draw calls a viewer makes: one per object for the JSON
+list, one per (primitive, material) node for the glb.
+
+    python benchmarks/gltf_export.py --storeys 5 20 60 --units 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER', tempfile.mkdtemp(prefix='eims_gltf_bench_'))
+
+from eims_modules.bim_model import Building  # noqa: E402
+from eims_modules.bim_three import building_to_glb, building_to_three  # noqa: E402
+from eims_modules.gltf_writer import objects_to_glb  # noqa: E402
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def _legacy_objects(client, storeys: int, units: int) -> list:
+    body = {'stories': storeys, 'units': units, 'area': 50.0 * storeys * units}
+    return client.post('/api/drawings/3d-model', json=body).get_json()['model']['objects']
+
+
+def _row(label: str, n: int, objects: int, text: bytes, blob: bytes, nodes: int,
+         t_json: float, t_glb: float) -> str:
+    return (f'{label:>7}{n:>8}{objects:>8}{len(text) / 1024:>9.0f}{len(blob) / 1024:>8.0f}'
+            f'{len(gzip.compress(text)) / 1024:>8.1f}{len(gzip.compress(blob)) / 1024:>8.1f}'
+            f'{t_json:>9.2f}{t_glb:>8.2f}{objects:>8}{nodes:>6}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storeys', type=int, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--units', type=int, default=6)
+    parser.add_argument('--bedrooms', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    import app_professional
+    client = app_professional.app.test_client()
+
+    print(f"{'model':>7}{'storeys':>8}{'objects':>8}{'kB':>17}{'gzip kB':>16}"
+          f"{'ms':>17}{'draw calls':>14}")
+    print(f"{'':>23}" + f"{'json':>9}{'glb':>8}{'json':>8}{'glb':>8}{'json':>9}{'glb':>8}"
+          f"{'json':>8}{'glb':>6}")
+    for n in args.storeys:
+        b = Building.from_params(name=f'Bench {n}', area_m2=400 * n, stories=n,
+                                 units=2, bedrooms=args.bedrooms)
+        text = json.dumps(building_to_three(b)).encode()
+        writer = building_to_glb(b)
+        print(_row('bim', n, writer.instance_count, text, writer.to_bytes(), writer.draw_calls,
+                   _best(lambda: json.dumps(building_to_three(b)).encode(), args.repeat),
+                   _best(lambda: building_to_glb(b).to_bytes(), args.repeat)))
+
+        objects = _legacy_objects(client, n, args.units)
+        text = json.dumps(objects).encode()
+        writer = objects_to_glb(objects)
+        print(_row('legacy', n, len(objects), text, writer.to_bytes(), writer.draw_calls,
+                   _best(lambda: json.dumps(objects).encode(), args.repeat),
+                   _best(lambda: objects_to_glb(objects).to_bytes(), args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Sheet-pack PDF build time at about 10 / 30 / 100 sheets: SVG round-trip vs drawing IR.
+
+"before" is the old pipeline: every floor plan (and the cover key plan) is
+serialised to SVG by bim_renderer, parsed back with svglib and drawn through
+renderPDF. "after" is default_sheet_pack() + build_sheet_pack_pdf() as they
+ship: each plan is built once as a drawing IR and drawn straight onto the
+canvas. Both columns include building the pack. Sheet count grows with
+storeys (one plan sheet each, plus the cover, schedules, BoQ and notes).
+
+    python benchmarks/sheet_pack_pdf.py --sheets 10 30 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules.bim_model import Building  # noqa: E402
+from eims_modules.bim_renderer import floor_plan_svg  # noqa: E402
+from eims_modules.bim_sheets import build_sheet_pack_pdf, default_sheet_pack  # noqa: E402
+
+
+def building_for(sheets: int) -> Building:
+    """A building whose default pack has about ``sheets`` sheets."""
+    probe = Building.from_params(name='probe', area_m2=300, stories=2, units=2)
+    fixed = len(default_sheet_pack(probe).sheets) - len(probe.storeys)
+    stories = max(1, sheets - fixed)
+    return Building.from_params(name=f'Bench {sheets}', area_m2=150 * stories,
+                                stories=stories, units=2)
+
+
+def before(b: Building) -> tuple[int, bytes]:
+    """The old pack: SVG strings in every plan view, rendered via svglib."""
+    pack = default_sheet_pack(b)
+    for sheet in pack.sheets:
+        for v in sheet.views:
+            if v.kind == 'plan':
+                i = pack.sheets.index(sheet) - 1
+                v.data = {**v.data, 'drawing': None,
+                          'svg': floor_plan_svg(b, storey_index=i, width_px=900)}
+            elif v.kind == 'cover':
+                v.data = {**v.data, 'key_plan': None,
+                          'key_plan_svg': floor_plan_svg(b, storey_index=0, width_px=600)}
+    return len(pack.sheets), build_sheet_pack_pdf(pack)
+
+
+def after(b: Building) -> tuple[int, bytes]:
+    pack = default_sheet_pack(b)
+    return len(pack.sheets), build_sheet_pack_pdf(pack)
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sheets', type=int, nargs='+', default=[10, 30, 100])
+    args = parser.parse_args()
+    # svglib logs a font-lookup warning for every text run it parses.
+    logging.disable(logging.WARNING)
+
+    print(f"{'sheets':>7}{'before s':>10}{'after s':>9}{'speed-up':>10}{'before kB':>11}{'after kB':>10}")
+    for n in args.sheets:
+        b = building_for(n)
+        (count, old_pdf), t_before = _timed(before, b)
+        (_, new_pdf), t_after = _timed(after, b)
+        print(f'{count:>7}{t_before:>10.2f}{t_after:>9.2f}{t_before / t_after:>9.1f}x'
+              f'{len(old_pdf) / 1024:>11.0f}{len(new_pdf) / 1024:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Annual shadow-hours raster: grid resolution vs runtime.
+
+For a parametric building plus one neighbour it reports, per cell size,
+the number of open ground cells and the time for:
+
+  * sun    — annual_sun_path (8,760 hourly sun vectors, one numpy pass)
+  * raster — shadow_raster over the site (azimuth-binned horizon cast)
+  * facade — facade_insolation over the building's walls at the same spacing
+
+and, for cell sizes up to --exact-max-cells, the cost of an exact cast
+against every sun-up hour instead of every azimuth bin, with the mean and
+worst difference in shadow hours between the two.
+
+    python benchmarks/solar_raster.py --cells 4 2 1 0.5 --storeys 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eims_modules import solar_raster as sr  # noqa: E402
+from eims_modules.bim_model import Building  # noqa: E402
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def _exact(prisms, sun, r):
+    cell = r['cell_m']
+    xs = r['origin'][0] + (np.arange(r['nx']) + 0.5) * cell
+    ys = r['origin'][1] + (np.arange(r['ny']) + 0.5) * cell
+    gx, gy = np.meshgrid(xs, ys)
+    points = np.stack([gx.ravel(), gy.ravel()], 1)
+    up = sun.up
+    horizon, inside = sr._horizon_tan(points, np.zeros(len(points)), prisms, sun.azimuth_deg[up])
+    shadow = (np.tan(np.radians(sun.altitude_deg[up]))[None] < horizon).sum(1) * sun.step_h
+    return np.where(inside, np.nan, shadow).reshape(r['ny'], r['nx'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cells', type=float, nargs='+', default=[4.0, 2.0, 1.0, 0.5])
+    parser.add_argument('--storeys', type=int, default=6)
+    parser.add_argument('--lat', type=float, default=51.5)
+    parser.add_argument('--lng', type=float, default=-0.1)
+    parser.add_argument('--exact-max-cells', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    b = Building.from_params(name='Bench', area_m2=400 * args.storeys, stories=args.storeys,
+                             units=2, bedrooms=6)
+    prisms = sr.building_prisms(b) + sr.neighbour_prisms([
+        {'footprint': [[30, 0], [40, 0], [40, 8], [35, 14], [30, 8]], 'height_m': 12.0}])
+    sun = sr.annual_sun_path(args.lat, args.lng)
+    t_sun = _best(lambda: sr.annual_sun_path(args.lat, args.lng), args.repeat)
+    print(f'sun path: {len(sun.hour)} samples, {sun.daylight_hours:.0f} daylight h, {t_sun:.1f} ms\n')
+
+    print(f"{'cell m':>7}{'cells':>8}{'raster ms':>11}{'facade ms':>11}"
+          f"{'exact ms':>10}{'mean |d| h':>12}{'max |d| h':>11}")
+    for cell in args.cells:
+        r = sr.shadow_raster(prisms, sun, cell_m=cell)
+        cells = int((~np.isnan(r['shadow_hours'])).sum())
+        t_raster = _best(lambda: sr.shadow_raster(prisms, sun, cell_m=cell), args.repeat)
+        t_facade = _best(lambda: sr.facade_insolation(prisms, sun, spacing_m=cell,
+                                                      which=[0]), args.repeat)
+        row = f'{cell:>7.2f}{cells:>8}{t_raster:>11.1f}{t_facade:>11.1f}'
+        if r['nx'] * r['ny'] <= args.exact_max_cells:
+            started = time.perf_counter()
+            exact = _exact(prisms, sun, r)
+            t_exact = (time.perf_counter() - started) * 1e3
+            diff = np.abs(exact - r['shadow_hours'])
+            row += f'{t_exact:>10.0f}{np.nanmean(diff):>12.1f}{np.nanmax(diff):>11.0f}'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
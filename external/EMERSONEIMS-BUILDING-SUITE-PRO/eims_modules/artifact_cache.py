@@ -0,0 +1,241 @@
+"""Content-addressed cache for generated export artifacts.
+
+Exports (plan SVGs, sheet-pack PDFs, IFC, DXF, FBX, NWD, GLB) are pure
+functions of the model plus a few export parameters, so they are keyed by
+``digest(kind, model, params)``: a SHA-256 over canonical JSON. A changed
+model hashes differently, which is all the invalidation there is — saving a
+BIM model (``bim_endpoints._save_bim``) stamps a new ``bim_revision`` and
+``bim_hash`` on the project, and later requests key off that hash.
+
+Storage layout under $EIMS_UPLOAD_FOLDER/artifacts/:
+
+  * <k[:2]>/<key>   one file per artifact, written atomically
+
+An in-memory index (key -> size, ETag) is rebuilt from the directory on
+first use, oldest mtime first, and evicts least-recently-used files once the
+store passes EIMS_ARTIFACT_CACHE_MB (default 256).
+
+ETags are strong: the first 32 hex digits of the SHA-256 of the bytes
+served. Routes call ``cached_response`` before doing any work (a hit is
+either a 304 for a matching If-None-Match or the stored bytes) and
+``store_response`` with freshly built bytes on a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('eims.artifacts')
+
+_UPLOADS = os.environ.get('EIMS_UPLOAD_FOLDER',
+                          os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads'))
+CACHE_DIR = os.path.join(_UPLOADS, 'artifacts')
+MAX_BYTES = int(float(os.environ.get('EIMS_ARTIFACT_CACHE_MB', '256')) * 1024 * 1024)
+
+# Part of every key: bump when an exporter's output changes so stale files
+# from an older release are never served.
+FORMAT_VERSION = 1
+
+
+def digest(*parts: Any) -> str:
+    """SHA-256 hex of ``parts`` as canonical JSON (sorted keys, no spaces)."""
+    blob = json.dumps([FORMAT_VERSION, *parts], sort_keys=True,
+                      separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def _etag(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class ArtifactCache:
+    """On-disk LRU of artifact bytes keyed by ``digest()``."""
+
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: 'OrderedDict[str, List[Any]]' = OrderedDict()   # key -> [size, etag]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _load(self) -> None:
+        """Adopt files left by an earlier process, oldest first."""
+        if self._loaded:
+            return
+        self._loaded = True
+        found = []
+        if os.path.isdir(self.root):
+            for sub in os.listdir(self.root):
+                d = os.path.join(self.root, sub)
+                if not os.path.isdir(d):
+                    continue
+                for name in os.listdir(d):
+                    if name.startswith('.'):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(d, name))
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(found):
+            self._index[name] = [size, None]
+            self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._index:
+            key, (size, _) = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _drop(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry:
+            self._bytes -= entry[0]
+
+    def etag(self, key: str) -> Optional[str]:
+        """ETag of a cached artifact without reading it, if known."""
+        with self._lock:
+            self._load()
+            entry = self._index.get(key)
+            return entry[1] if entry else None
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            self._load()
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._drop(key)
+                self.misses += 1
+            return None
+        tag = _etag(data)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry[1] = tag
+            self.hits += 1
+        return data, tag
+
+    def put(self, key: str, data: bytes) -> str:
+        tag = _etag(data)
+        if len(data) > self.max_bytes:
+            return tag
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning('artifact cache write failed for %s: %s', key[:12], e)
+            return tag
+        with self._lock:
+            self._load()
+            self._drop(key)
+            self._index[key] = [len(data), tag]
+            self._bytes += len(data)
+            self._evict()
+        return tag
+
+    def fetch(self, key: str, build: Callable[[], bytes]) -> Tuple[bytes, str, bool]:
+        """(data, etag, hit) — building and storing the artifact on a miss."""
+        got = self.get(key)
+        if got is not None:
+            return got[0], got[1], True
+        data = build()
+        return data, self.put(key, data), False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load()
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._index), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses}
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ArtifactCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache(CACHE_DIR)
+        return _cache
+
+
+# ---------------------------------------------------------------------------
+# Flask helpers
+# ---------------------------------------------------------------------------
+
+def _response(data: bytes, tag: str, hit: bool, *, mimetype: str,
+              download_name: Optional[str] = None, as_attachment: bool = True):
+    from flask import Response, request
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+    else:
+        resp = Response(data, mimetype=mimetype)
+        if download_name:
+            disposition = 'attachment' if as_attachment else 'inline'
+            resp.headers['Content-Disposition'] = f'{disposition}; filename="{download_name}"'
+    resp.set_etag(tag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    resp.headers['X-EIMS-Cache'] = 'hit' if hit else 'miss'
+    return resp
+
+
+def cached_response(key: Optional[str], **kw):
+    """Response for ``key`` if it is cached (304 when the client's
+    If-None-Match matches, else the stored bytes), or None on a miss."""
+    if not key:
+        return None
+    from flask import request
+    cache = get_cache()
+    tag = cache.etag(key)
+    if tag and request.if_none_match.contains(tag):
+        return _response(b'', tag, True, **kw)
+    got = cache.get(key)
+    if got is None:
+        return None
+    return _response(got[0], got[1], True, **kw)
+
+
+def store_response(key: Optional[str], data: bytes, **kw):
+    """Cache freshly built ``data`` under ``key`` and return it as a response."""
+    tag = get_cache().put(key, data) if key else _etag(data)
+    return _response(data, tag, False, **kw)
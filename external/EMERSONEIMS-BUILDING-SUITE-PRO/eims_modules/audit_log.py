@@ -1,37 +1,254 @@
 """Append-only audit log for privileged actions.
 
-Writes JSON-lines to uploads/.audit_log.jsonl. Each line:
+Records are JSON lines, one per event:
     {ts, user, action, target, ip, ok, detail}
 
 Provides a Flask hook to log every authenticated POST and a query API.
-The log is append-only; a separate retention process should rotate it.
+
+Storage layout under $EIMS_UPLOAD_FOLDER/audit/:
+
+  * audit-YYYYMMDD-NNN.jsonl  append-only segments. A new segment starts
+                              each UTC day and whenever the current one
+                              passes EIMS_AUDIT_SEGMENT_MB (default 16).
+  * index.db                  SQLite index (ts, user, action, ok) -> byte
+                              range in a segment, so queries touch only the
+                              matching lines, newest first.
+
+``log_event`` only enqueues; a background thread writes batches (one
+append per segment per batch, then one index transaction). ``query``
+flushes this process's queue first, so callers read their own writes.
+Segments are the source of truth: ``reindex()`` rebuilds the index from
+them, and a pre-segment .audit_log.jsonl is adopted as the first segment.
+Set EIMS_AUDIT_KEEP_SEGMENTS to drop the oldest segments beyond that count.
 """
 
 from __future__ import annotations
 
+import atexit
 import datetime as _dt
 import json
 import logging
 import os
+import queue
 import threading
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from eims_modules import db as _db
 
 logger = logging.getLogger('eims.audit')
 
-_LOG_PATH = os.path.join(
-    os.environ.get('EIMS_UPLOAD_FOLDER',
-                    os.path.join(os.path.dirname(os.path.dirname(__file__)),
-                                  'uploads')),
-    '.audit_log.jsonl',
-)
-_LOCK = threading.Lock()
+_UPLOADS = os.environ.get('EIMS_UPLOAD_FOLDER',
+                          os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads'))
+_LOG_PATH = os.path.join(_UPLOADS, '.audit_log.jsonl')   # legacy single file
+_LOG_DIR = os.path.join(_UPLOADS, 'audit')
+_INDEX_PATH = os.path.join(_LOG_DIR, 'index.db')
+
+SEGMENT_BYTES = int(float(os.environ.get('EIMS_AUDIT_SEGMENT_MB', '16')) * 1024 * 1024)
+KEEP_SEGMENTS = int(os.environ.get('EIMS_AUDIT_KEEP_SEGMENTS', '0'))   # 0 = keep all
+BATCH_SIZE = 512
+FLUSH_INTERVAL_S = 0.5
+QUEUE_SIZE = 10000
+
+_LOCK = threading.Lock()      # guards writer start-up and the legacy migration
+_writer: Optional['_Writer'] = None
+
+
+def _now() -> _dt.datetime:
+    return _dt.datetime.now(_dt.timezone.utc)
+
+
+def _index() -> _db.PooledConnection:
+    return _db.get_pool(_INDEX_PATH).connect()
+
+
+def _ensure_store() -> None:
+    os.makedirs(_LOG_DIR, exist_ok=True)
+    conn = _index()
+    try:
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS events (
+                id       INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts       TEXT NOT NULL,
+                user     TEXT,
+                action   TEXT,
+                ok       INTEGER,
+                segment  TEXT NOT NULL,
+                offset   INTEGER NOT NULL,
+                length   INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_user   ON events(user, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_action ON events(action, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_ts     ON events(ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_seg    ON events(segment);
+        ''')
+        conn.commit()
+    finally:
+        conn.close()
+    if os.path.exists(_LOG_PATH):
+        # Adopt the old single-file log as the oldest segment.
+        target = os.path.join(_LOG_DIR, 'audit-00000000-000.jsonl')
+        if not os.path.exists(target):
+            os.replace(_LOG_PATH, target)
+            _index_segment(target)
+
+
+def _segments() -> List[str]:
+    if not os.path.isdir(_LOG_DIR):
+        return []
+    return sorted(f for f in os.listdir(_LOG_DIR) if f.startswith('audit-') and f.endswith('.jsonl'))
+
+
+def _current_segment(day: str) -> str:
+    """Newest segment for ``day`` with room left, creating the next if full."""
+    todays = [f for f in _segments() if f.startswith(f'audit-{day}-')]
+    if todays:
+        name = todays[-1]
+        if os.path.getsize(os.path.join(_LOG_DIR, name)) < SEGMENT_BYTES:
+            return name
+        seq = int(name[len('audit-YYYYMMDD-'):-len('.jsonl')]) + 1
+    else:
+        seq = 0
+    return f'audit-{day}-{seq:03d}.jsonl'
+
+
+def _index_rows(segment: str, recs: List[Tuple[Dict[str, Any], int, int]]) -> List[tuple]:
+    return [(r.get('ts', ''), r.get('user'), r.get('action'), int(bool(r.get('ok'))),
+             segment, off, length) for r, off, length in recs]
+
+
+def _insert_index(rows: List[tuple]) -> None:
+    conn = _index()
+    try:
+        conn.executemany('INSERT INTO events (ts, user, action, ok, segment, offset, length) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _index_segment(path: str) -> int:
+    """(Re)index one segment file from scratch."""
+    name = os.path.basename(path)
+    recs, off = [], 0
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                recs.append((json.loads(line), off, len(line)))
+            except ValueError:
+                pass
+            off += len(line)
+    conn = _index()
+    try:
+        conn.execute('DELETE FROM events WHERE segment = ?', (name,))
+        conn.commit()
+    finally:
+        conn.close()
+    _insert_index(_index_rows(name, recs))
+    return len(recs)
+
+
+def _enforce_retention() -> None:
+    if KEEP_SEGMENTS <= 0:
+        return
+    for name in _segments()[:-KEEP_SEGMENTS]:
+        conn = _index()
+        try:
+            conn.execute('DELETE FROM events WHERE segment = ?', (name,))
+            conn.commit()
+        finally:
+            conn.close()
+        try:
+            os.remove(os.path.join(_LOG_DIR, name))
+        except OSError as e:
+            logger.warning('audit retention could not remove %s: %s', name, e)
+
+
+class _Writer(threading.Thread):
+    """Drains the event queue in batches: one append per segment, one commit."""
+
+    def __init__(self):
+        super().__init__(name='eims-audit-writer', daemon=True)
+        self.queue: 'queue.Queue[Any]' = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + FLUSH_INTERVAL_S
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                # A flush() waiter cuts the batching delay short.
+                wait = 0 if waiters else deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=wait) if wait > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:  # pragma: no cover - keep the thread alive
+                logger.error('audit batch of %d lost: %s', len(batch), e)
+            for w in waiters:
+                w.set()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        for rec in batch:
+            by_segment.setdefault(_current_segment(rec['ts'][:10].replace('-', '')), []).append(rec)
+        rows: List[tuple] = []
+        for name, recs in by_segment.items():
+            lines = [(json.dumps(r, ensure_ascii=False) + '\n').encode('utf-8') for r in recs]
+            fd = os.open(os.path.join(_LOG_DIR, name), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, b''.join(lines))
+                # O_APPEND leaves the offset at the end of *our* write, even
+                # with other worker processes appending to the same segment.
+                off = os.lseek(fd, 0, os.SEEK_CUR) - sum(map(len, lines))
+            finally:
+                os.close(fd)
+            placed = []
+            for rec, line in zip(recs, lines):
+                placed.append((rec, off, len(line)))
+                off += len(line)
+            rows += _index_rows(name, placed)
+        _insert_index(rows)
+        _enforce_retention()
+
+
+def _get_writer() -> _Writer:
+    global _writer
+    if _writer is None or not _writer.is_alive():
+        with _LOCK:
+            if _writer is None or not _writer.is_alive():
+                _ensure_store()
+                _writer = _Writer()
+                _writer.start()
+    return _writer
+
+
+def flush(timeout: float = 10.0) -> bool:
+    """Block until everything logged so far by this process is on disk."""
+    if _writer is None:
+        return True
+    done = threading.Event()
+    _writer.queue.put(done)
+    return done.wait(timeout)
+
+
+atexit.register(flush)
 
 
 def log_event(*, user: str, action: str, target: str = '',
                 ip: str = '', ok: bool = True,
                 detail: Optional[Dict[str, Any]] = None) -> None:
     rec = {
-        'ts':     _dt.datetime.now(_dt.timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+        'ts':     _now().isoformat(timespec='seconds').replace('+00:00', 'Z'),
         'user':   user,
         'action': action,
         'target': target,
@@ -39,32 +256,67 @@ def log_event(*, user: str, action: str, target: str = '',
         'ok':     bool(ok),
         'detail': detail or {},
     }
-    with _LOCK:
-        os.makedirs(os.path.dirname(_LOG_PATH), exist_ok=True)
-        with open(_LOG_PATH, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + '\n')
+    _get_writer().queue.put(rec)
 
 
 def query(*, limit: int = 200, user: Optional[str] = None,
             action: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
-    if not os.path.exists(_LOG_PATH):
-        return []
+    """Last ``limit`` matching records, oldest first (newest last)."""
+    _get_writer()
+    flush()
+    where, args = [], []
+    if user:
+        where.append('user = ?')
+        args.append(user)
+    if action:
+        where.append('action = ?')
+        args.append(action)
+    if since:
+        where.append('ts >= ?')
+        args.append(since)
+    sql = ('SELECT segment, offset, length FROM events'
+           + (' WHERE ' + ' AND '.join(where) if where else '')
+           + ' ORDER BY id DESC LIMIT ?')
+    conn = _index()
+    try:
+        hits = conn.execute(sql, (*args, max(0, int(limit)))).fetchall()
+    finally:
+        conn.close()
+
     out: List[Dict[str, Any]] = []
-    with _LOCK:
-        with open(_LOG_PATH, 'r', encoding='utf-8') as f:
-            for line in f:
+    handles: Dict[str, Any] = {}
+    try:
+        for seg, off, length in hits:
+            f = handles.get(seg)
+            if f is None:
                 try:
-                    rec = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if user and rec.get('user') != user:
-                    continue
-                if action and rec.get('action') != action:
-                    continue
-                if since and rec.get('ts', '') < since:
-                    continue
-                out.append(rec)
-    return out[-limit:]
+                    f = handles[seg] = open(os.path.join(_LOG_DIR, seg), 'rb')
+                except OSError:
+                    continue      # segment removed by retention since the lookup
+            f.seek(off)
+            try:
+                out.append(json.loads(f.read(length)))
+            except ValueError:
+                continue
+    finally:
+        for f in handles.values():
+            f.close()
+    out.reverse()
+    return out
+
+
+def reindex() -> int:
+    """Rebuild the index from the segment files; returns records indexed."""
+    _get_writer()
+    flush()
+    names = _segments()
+    conn = _index()
+    try:
+        conn.execute(f'DELETE FROM events WHERE segment NOT IN ({",".join("?" * len(names))})', names)
+        conn.commit()
+    finally:
+        conn.close()
+    return sum(_index_segment(os.path.join(_LOG_DIR, name)) for name in names)
 
 
 # ============================================================================
@@ -97,7 +349,10 @@ def register(app, *, auth_required=None) -> None:
                     ip=request.headers.get('X-Forwarded-For', request.remote_addr or ''),
                     ok=(200 <= response.status_code < 400),
                     detail={'status': response.status_code,
-                             'len':    response.calculate_content_length()},
+                             # Streamed bodies have no length yet; asking
+                             # for one would buffer the whole stream.
+                             'len':    (None if response.is_streamed
+                                        else response.calculate_content_length())},
                 )
         except Exception as e:  # pragma: no cover - never let audit break a request
             logger.warning('audit logging failed: %s', e)
@@ -140,4 +395,4 @@ def register(app, *, auth_required=None) -> None:
     app.add_url_rule('/api/admin/audit', 'eims_audit_query',
                       _query_route, methods=['GET'])
 
-    logger.info('Audit log module registered (writes to %s)', _LOG_PATH)
+    logger.info('Audit log module registered (writes to %s)', _LOG_DIR)
@@ -0,0 +1,250 @@
+"""Versioned binary encoding of the Building model, with lazily decoded storeys.
+
+``Building.from_dict`` rebuilds every element of every storey from JSON-shaped
+dicts, which for a large model is most of the cost of a BIM request that
+only looks at one storey. This encoding is stored beside the JSON copy in
+``projects.data_json.bim`` (bim_endpoints keeps both in step), never
+instead of it.
+
+Layout, all little-endian::
+
+    header   4s H H I I     magic b'EIMB', FORMAT_VERSION, flags (0),
+                            head length, storey count
+    head     UTF-8 JSON     id, name, schema_version, site, types, metadata,
+                            and per storey [id, name, level_m, height_m,
+                            body offset, body length]
+    bodies   one per storey, offsets counted from the end of the head
+
+    body     I I I          rows length, coordinate count, vertex-count count
+             rows           UTF-8 JSON [walls, slabs, spaces, openings,
+                            columns, beams], each a list of rows holding the
+                            element's non-geometry fields in dataclass order
+             coords         float64 x, y pairs of every wall/slab/space
+                            polyline, column point and beam end, in row order
+             counts         uint32 vertex count of each wall, slab and space
+                            polyline, in row order
+
+Attribute rows stay JSON because ``properties`` and ``source_refs`` are
+free-form, and the C JSON parser reads flat rows faster than a pure-Python
+struct walk would. Geometry — the bulk of a model — is packed and becomes
+PointLists over slices of one array, with no Point2D per vertex.
+
+``loads`` returns a Building whose storeys carry id, name, level and height
+straight from the head and decode their body on first access to any element
+list. Bump FORMAT_VERSION on any layout change; ``loads`` refuses versions
+it does not know and callers fall back to the JSON copy.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any
+
+from .bim_model import (Beam, Building, Column, Opening, Point2D, PointList,
+                        Site, Slab, Space, Storey, TypeCatalog, Wall, _record)
+
+MAGIC = b'EIMB'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII')
+_BODY = struct.Struct('<III')
+_ELEMENTS = ('walls', 'slabs', 'spaces', 'openings', 'columns', 'beams')
+_SWAP = sys.byteorder == 'big'
+
+
+def is_binary(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == MAGIC
+
+
+def _json(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _extend(coords: array, points) -> None:
+    if isinstance(points, PointList):
+        coords.extend(points.xy)
+    else:
+        coords.extend([v for p in points for v in (p.x, p.y)])
+
+
+def _encode_storey(s: Storey) -> bytes:
+    coords = array('d')
+    counts = array('I')
+    walls = []
+    for w in s.walls:
+        walls.append([w.id, w.type_name, w.height_m, w.storey_id, w.structural_role,
+                      w.properties, w.source_refs])
+        _extend(coords, w.points)
+        counts.append(len(w.points))
+    slabs = []
+    for sl in s.slabs:
+        slabs.append([sl.id, sl.type_name, sl.storey_id, sl.role, sl.properties,
+                      sl.source_refs])
+        _extend(coords, sl.boundary)
+        counts.append(len(sl.boundary))
+    spaces = []
+    for sp in s.spaces:
+        spaces.append([sp.id, sp.name, sp.program, sp.storey_id, sp.properties,
+                       sp.source_refs])
+        _extend(coords, sp.boundary)
+        counts.append(len(sp.boundary))
+    openings = [[o.id, o.kind, o.type_name, o.wall_id, o.position_m, o.sill_m,
+                 o.properties, o.source_refs] for o in s.openings]
+    columns = []
+    for c in s.columns:
+        columns.append([c.id, c.storey_id, c.section, c.height_m, c.material,
+                        c.properties, c.source_refs])
+        coords.extend((c.point.x, c.point.y))
+    beams = []
+    for b in s.beams:
+        beams.append([b.id, b.storey_id, b.section, b.material, b.properties,
+                      b.source_refs])
+        coords.extend((b.p1.x, b.p1.y, b.p2.x, b.p2.y))
+    rows = _json([walls, slabs, spaces, openings, columns, beams])
+    if _SWAP:
+        coords.byteswap()
+        counts.byteswap()
+    return b''.join((_BODY.pack(len(rows), len(coords), len(counts)), rows,
+                     coords.tobytes(), counts.tobytes()))
+
+
+def dumps(b: Building) -> bytes:
+    """Encode ``b``. Floats are stored exactly; ``to_dict`` of the decoded
+    model equals ``b.to_dict()``."""
+    bodies = [_encode_storey(s) for s in b.storeys]
+    table, offset = [], 0
+    for s, body in zip(b.storeys, bodies):
+        table.append([s.id, s.name, s.level_m, s.height_m, offset, len(body)])
+        offset += len(body)
+    head = _json({
+        'id': b.id, 'name': b.name, 'schema_version': b.schema_version,
+        'site': _record(b.site), 'types': b.types.to_dict(),
+        'metadata': b.metadata, 'storeys': table,
+    })
+    return b''.join((_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(head), len(bodies)),
+                     head, *bodies))
+
+
+def _decode_body(s: Storey, body: memoryview) -> None:
+    """Fill the element lists of ``s`` from its encoded body."""
+    rows_len, n_coords, n_counts = _BODY.unpack_from(body, 0)
+    pos = _BODY.size
+    walls, slabs, spaces, openings, columns, beams = json.loads(bytes(body[pos:pos + rows_len]))
+    pos += rows_len
+    coords = array('d')
+    coords.frombytes(body[pos:pos + 8 * n_coords])
+    pos += 8 * n_coords
+    counts = array('I')
+    counts.frombytes(body[pos:pos + 4 * n_counts])
+    if _SWAP:
+        coords.byteswap()
+        counts.byteswap()
+
+    c = k = 0
+    out_walls = []
+    for id_, type_name, height_m, storey_id, role, props, refs in walls:
+        n = 2 * counts[k]
+        out_walls.append(Wall(id_, type_name, PointList.from_xy(coords[c:c + n]),
+                              height_m, storey_id, role, props, refs))
+        c += n
+        k += 1
+    out_slabs = []
+    for id_, type_name, storey_id, role, props, refs in slabs:
+        n = 2 * counts[k]
+        out_slabs.append(Slab(id_, type_name, storey_id, PointList.from_xy(coords[c:c + n]),
+                              role, props, refs))
+        c += n
+        k += 1
+    out_spaces = []
+    for id_, name, program, storey_id, props, refs in spaces:
+        n = 2 * counts[k]
+        out_spaces.append(Space(id_, name, program, storey_id,
+                                PointList.from_xy(coords[c:c + n]), props, refs))
+        c += n
+        k += 1
+    out_columns = []
+    for id_, storey_id, section, height_m, material, props, refs in columns:
+        out_columns.append(Column(id_, storey_id, Point2D(coords[c], coords[c + 1]),
+                                  section, height_m, material, props, refs))
+        c += 2
+    out_beams = []
+    for id_, storey_id, section, material, props, refs in beams:
+        out_beams.append(Beam(id_, storey_id, Point2D(coords[c], coords[c + 1]),
+                              Point2D(coords[c + 2], coords[c + 3]),
+                              section, material, props, refs))
+        c += 4
+
+    s.walls = out_walls
+    s.slabs = out_slabs
+    s.spaces = out_spaces
+    s.openings = [Opening(*row) for row in openings]
+    s.columns = out_columns
+    s.beams = out_beams
+
+
+class _LazyStorey(Storey):
+    """A Storey whose element lists stay encoded until first touched. Unset
+    slots raise AttributeError, which is what routes the first access of
+    ``walls`` (or any other list) through ``__getattr__``."""
+    __slots__ = ('_body',)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _ELEMENTS:
+            raise AttributeError(name)
+        _decode_body(self, self._body)
+        del self._body
+        return object.__getattribute__(self, name)
+
+    @property
+    def decoded(self) -> bool:
+        return not hasattr(self, '_body')
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Storey):
+            return all(getattr(self, f) == getattr(other, f)
+                       for f in Storey.__dataclass_fields__)
+        return NotImplemented
+
+    def __reduce__(self):
+        # Copies and pickles are plain, fully decoded storeys.
+        return (Storey, tuple(getattr(self, f) for f in Storey.__dataclass_fields__))
+
+
+def loads(data: bytes, *, lazy: bool = True) -> Building:
+    """Decode a ``dumps`` blob. Raises ValueError for anything that is not
+    a blob of a known FORMAT_VERSION."""
+    buf = memoryview(data)
+    if len(buf) < _HEADER.size:
+        raise ValueError('not a binary BIM model')
+    magic, version, _flags, head_len, n_storeys = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError('not a binary BIM model')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'unsupported binary BIM format version {version}')
+    start = _HEADER.size + head_len
+    if len(buf) < start:
+        raise ValueError('binary BIM model truncated')
+    head = json.loads(bytes(buf[_HEADER.size:start]))
+    if len(head['storeys']) != n_storeys:
+        raise ValueError('binary BIM model truncated')
+
+    storeys = []
+    for id_, name, level_m, height_m, offset, length in head['storeys']:
+        body = buf[start + offset:start + offset + length]
+        if len(body) != length:
+            raise ValueError('binary BIM model truncated')
+        s = _LazyStorey.__new__(_LazyStorey)
+        s.id, s.name, s.level_m, s.height_m = id_, name, level_m, height_m
+        s._body = body
+        if not lazy:
+            getattr(s, 'walls')
+        storeys.append(s)
+
+    return Building(id=head['id'], name=head['name'], storeys=storeys,
+                    site=Site.from_dict(head['site']),
+                    types=TypeCatalog.from_dict(head['types']),
+                    metadata=head['metadata'],
+                    schema_version=head['schema_version'])
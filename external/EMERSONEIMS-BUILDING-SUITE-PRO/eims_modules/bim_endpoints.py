@@ -23,11 +23,37 @@ Routes (all under /api/bim/*):
             OR {bim: ..., storey_index?, width_px?}
        Returns {svg, storey_id, storey_name, ...}.
 
+  POST /api/bim/3d-model
+       body: {project_id} OR {bim: ...} OR build params, format?: 'glb'
+       The model as the wizard's three.js object list, or with
+       format='glb' as an instanced binary glTF (see gltf_writer).
+
   POST /api/bim/element/update
        body: {project_id, element_id, patch: {...}}
        Update a property on a single element (wall thickness, door type,
        room name, etc.) and re-persist. The single mutation primitive every
-       editor UI will eventually call.
+       editor UI will eventually call. If the project has a clash index
+       (see /api/bim/clashes), only the edited element is re-checked and the
+       response carries the clash delta under `clashes`.
+
+  POST /api/bim/clashes
+       body: {project_id, mep_runs?: [...]} OR {bim: ..., mep_runs?}
+       Full clash run over structure, walls and MEP runs (mep_clash). With
+       a project_id the index is kept in memory for incremental re-checks.
+
+Export routes (floor-plan, the 3d-model glb, sheet-pack preview and PDF)
+are served through artifact_cache: keyed by the model's content hash plus
+the export parameters, with strong ETags so a repeat download is a 304 or a cached
+read. `_save_bim` stamps `bim_revision` / `bim_hash` on the project, so an
+edited model keys new artifacts automatically. The sheet-pack PDF also takes
+`?async=1` and then returns a background job id (see eims_modules/jobs).
+
+Storage: data_json.bim stays the canonical, JSON-compatible copy. Every
+save also writes the bim_binary encoding to the `bim_blobs` table under the
+same `bim_hash`. Routes that need a saved Building load the project with
+the model dropped inside SQLite (`_load_project(pid, with_bim=False)`) and
+decode the blob lazily, one storey at a time (`_project_building`); a
+missing or stale blob falls back to the JSON and is rewritten.
 
 This module intentionally has *no* dependency on the rest of app_professional
 beyond the project-loading helper that's passed in via register(). Keeps the
@@ -43,13 +69,15 @@ from datetime import datetime
 from typing import Any, Callable, Optional
 
 from .bim_model import Building
+from . import bim_binary
 from .bim_schedules import all_schedules, ALL_SCHEDULES
 from .bim_renderer import floor_plan_svg
-from .bim_three import building_to_three
+from .bim_three import building_to_glb, building_to_three
 from .bim_family_library import get_library, merge_library_into
 from .bim_sheets import (default_sheet_pack, sheet_pack_to_metadata,
                          build_sheet_pack_pdf, render_sheet_preview_svg)
 from .bim_copilot import run_turn as copilot_run_turn, is_configured as copilot_is_configured
+from . import artifact_cache, jobs, mep_clash
 
 logger = logging.getLogger('eims.bim')
 
@@ -74,6 +102,61 @@ def _params_from_project_data(proj: dict) -> dict:
     }
 
 
+_BUILD_PARAMS = ('name', 'area_m2', 'bedrooms', 'stories', 'units', 'building_type',
+                 'style', 'location', 'gps_lat', 'gps_lng')
+
+
+def _project_model_hash(proj: dict) -> str:
+    """Content hash of the model a saved project resolves to: the hash
+    stamped by the last save, else the saved bim itself, else the params it
+    would be rebuilt from."""
+    if 'bim_stub' in proj:
+        return proj['bim_hash']
+    saved = proj.get('bim')
+    if isinstance(saved, dict):
+        return proj.get('bim_hash') or artifact_cache.digest(saved)
+    return artifact_cache.digest(_params_from_project_data(proj))
+
+
+def _sheet_pack_pdf_job(params: dict, progress) -> bytes:
+    """Background-job body for ?async=1 sheet-pack downloads."""
+    progress(2, 'loading model')
+    b = (Building.from_dict(params['bim']) if params.get('bim')
+         else Building.from_params(**params['params']))
+    pack = default_sheet_pack(b)
+    return build_sheet_pack_pdf(pack, project_meta=params['meta'],
+                                progress=lambda pct, stage: progress(5 + 0.95 * pct, stage))
+
+
+def _sheet_pack_filename(name: str) -> str:
+    return f'{name.replace(" ", "_") or "project"}_SheetPack.pdf'
+
+
+def _has_model(proj: dict) -> bool:
+    """Whether the project has a saved model, loaded whole or not."""
+    return isinstance(proj.get('bim'), dict) or 'bim_stub' in proj
+
+
+# A project row with its (possibly large) model dropped by SQLite, so it is
+# never json.loads-ed. Only models stamped with a bim_hash are dropped: the
+# hash is what finds their binary blob.
+_PROJECT_WITHOUT_BIM_SQL = (
+    "SELECT IIF(stub, json_remove(data_json, '$.bim'), data_json) AS data_json, "
+    "phases_json, stub, bim_name FROM ("
+    "SELECT data_json, phases_json, "
+    "json_extract(data_json, '$.bim.name') AS bim_name, "
+    "json_type(data_json, '$.bim') = 'object' "
+    "AND json_extract(data_json, '$.bim_hash') IS NOT NULL AS stub "
+    "FROM projects WHERE id=?)")
+
+_BIM_BLOBS_SQL = '''CREATE TABLE IF NOT EXISTS bim_blobs (
+    project_id TEXT PRIMARY KEY,
+    bim_hash   TEXT NOT NULL,
+    format     INTEGER NOT NULL,
+    data       BLOB NOT NULL
+)'''
+
+
 def register(app, *, auth_required: Optional[Callable] = None,
              db_getter: Optional[Callable] = None) -> None:
     """Register BIM routes on `app`. `db_getter` should return a sqlite3
@@ -89,19 +172,37 @@ def register(app, *, auth_required: Optional[Callable] = None,
 
     # ---------- helpers shared by the routes ----------
 
-    def _load_project(pid: str) -> Optional[dict]:
+    def _load_project(pid: str, *, with_bim: bool = True) -> Optional[dict]:
+        """The project's data_json (plus phases). With ``with_bim=False`` a
+        saved model is left out and replaced by ``bim_stub`` ({name}); get
+        the Building from `_project_building`. Rows saved before bim_hash
+        existed always come back whole."""
         try:
             conn = db_getter()
         except Exception as e:
             logger.warning('db_getter failed: %s', e)
             return None
         try:
-            row = conn.execute(
-                'SELECT data_json, phases_json FROM projects WHERE id=?', (pid,)
-            ).fetchone()
-            if not row:
-                return None
+            row, stub = None, None
+            if not with_bim:
+                try:
+                    row = conn.execute(_PROJECT_WITHOUT_BIM_SQL, (pid,)).fetchone()
+                except sqlite3.OperationalError:
+                    pass    # malformed data_json: the plain read lets json.loads say so
+                else:
+                    if not row:
+                        return None
+                    if row['stub']:
+                        stub = {'name': row['bim_name'] or ''}
+            if row is None:
+                row = conn.execute(
+                    'SELECT data_json, phases_json FROM projects WHERE id=?', (pid,)
+                ).fetchone()
+                if not row:
+                    return None
             proj = json.loads(row['data_json']) if row['data_json'] else {}
+            if stub is not None:
+                proj['bim_stub'] = stub
             phases = json.loads(row['phases_json']) if row['phases_json'] else {}
             if phases:
                 proj['phases'] = phases
@@ -110,28 +211,91 @@ def register(app, *, auth_required: Optional[Callable] = None,
         finally:
             conn.close()
 
-    def _save_bim(pid: str, bim_dict: dict) -> bool:
+    blobs_ready = []
+
+    def _blob_conn():
+        conn = db_getter()
+        if not blobs_ready:
+            conn.execute(_BIM_BLOBS_SQL)
+            conn.commit()
+            blobs_ready.append(True)
+        return conn
+
+    def _put_blob(conn, pid: str, bim_hash: str, b: Building) -> None:
+        conn.execute(
+            'INSERT OR REPLACE INTO bim_blobs (project_id, bim_hash, format, data) '
+            'VALUES (?, ?, ?, ?)',
+            (pid, bim_hash, bim_binary.FORMAT_VERSION, b.to_bytes()))
+
+    def _save_bim(pid: str, bim_dict: dict, building: Building) -> bool:
+        """Persist a model: data_json.bim (edited in place by SQLite, so the
+        rest of the project is never re-parsed) plus its binary blob.
+        `building` is the model `bim_dict` came from."""
         try:
-            conn = db_getter()
+            conn = _blob_conn()
         except Exception as e:
             logger.warning('persist failed: %s', e)
             return False
         try:
-            row = conn.execute(
-                'SELECT data_json FROM projects WHERE id=?', (pid,)
-            ).fetchone()
-            if not row:
+            # New revision -> new hash -> exports cached under the old model
+            # are simply never looked up again (and age out of the LRU).
+            bim_hash = artifact_cache.digest(bim_dict)
+            cur = conn.execute(
+                "UPDATE projects SET data_json = json_set("
+                "COALESCE(NULLIF(data_json, ''), '{}'), '$.bim', json(?), "
+                "'$.bim_revision', COALESCE(json_extract(NULLIF(data_json, ''), "
+                "'$.bim_revision'), 0) + 1, '$.bim_hash', ?), updated_at=? WHERE id=?",
+                (json.dumps(bim_dict), bim_hash, datetime.now().isoformat(), pid))
+            if cur.rowcount == 0:
                 return False
-            proj = json.loads(row['data_json']) if row['data_json'] else {}
-            proj['bim'] = bim_dict
-            conn.execute(
-                'UPDATE projects SET data_json=?, updated_at=? WHERE id=?',
-                (json.dumps(proj), datetime.now().isoformat(), pid))
+            _put_blob(conn, pid, bim_hash, building)
             conn.commit()
             return True
         finally:
             conn.close()
 
+    def _saved_building(pid: str, bim_hash: str) -> Optional[Building]:
+        """The saved model from its blob when that is current, else from
+        data_json.bim (rewriting the blob). None if the model has gone."""
+        try:
+            conn = _blob_conn()
+        except Exception as e:
+            logger.warning('db_getter failed: %s', e)
+            return None
+        try:
+            row = conn.execute(
+                'SELECT data FROM bim_blobs WHERE project_id=? AND bim_hash=? AND format=?',
+                (pid, bim_hash, bim_binary.FORMAT_VERSION)).fetchone()
+            if row:
+                try:
+                    return bim_binary.loads(row['data'])
+                except ValueError as e:
+                    logger.warning('bim blob for %s unreadable: %s', pid, e)
+            row = conn.execute(
+                "SELECT json_extract(data_json, '$.bim') AS bim, "
+                "json_extract(data_json, '$.bim_hash') AS bim_hash "
+                "FROM projects WHERE id=?", (pid,)).fetchone()
+            if not row or not row['bim']:
+                return None
+            b = Building.from_dict(json.loads(row['bim']))
+            if row['bim_hash']:
+                _put_blob(conn, pid, row['bim_hash'], b)
+                conn.commit()
+            return b
+        finally:
+            conn.close()
+
+    def _project_building(pid: str, proj: dict) -> Building:
+        """The project's saved Building (whole or stubbed), else one rebuilt
+        from its params. Raises if the saved model is malformed."""
+        if isinstance(proj.get('bim'), dict):
+            return Building.from_dict(proj['bim'])
+        if 'bim_stub' in proj:
+            b = _saved_building(pid, proj['bim_hash'])
+            if b is not None:
+                return b
+        return Building.from_params(**_params_from_project_data(proj))
+
     def _building_from_request(data: dict) -> tuple[Optional[Building], Optional[tuple]]:
         """Resolve a Building from the request body. Order of precedence:
         1. Inline `bim` dict (lets callers pass an unsaved model).
@@ -149,14 +313,13 @@ def register(app, *, auth_required: Optional[Callable] = None,
 
         pid = data.get('project_id')
         if pid:
-            proj = _load_project(pid)
+            proj = _load_project(pid, with_bim=False)
             if not proj:
                 return None, (404, {'success': False,
                                      'error': 'project not found'})
-            saved = proj.get('bim')
-            if isinstance(saved, dict):
+            if _has_model(proj):
                 try:
-                    return Building.from_dict(saved), None
+                    return _project_building(pid, proj), None
                 except Exception as e:
                     logger.warning('saved bim malformed for %s: %s — rebuilding', pid, e)
             # No saved bim or malformed — rebuild from project params
@@ -183,6 +346,18 @@ def register(app, *, auth_required: Optional[Callable] = None,
             return None, (400, {'success': False,
                                  'error': f'param error: {e}'})
 
+    def _model_hash(data: dict) -> Optional[str]:
+        """Content hash of the model `_building_from_request` would resolve,
+        without building it. None when the request can't be resolved (the
+        route then takes the normal path and reports the error)."""
+        if isinstance(data.get('bim'), dict):
+            return artifact_cache.digest(data['bim'])
+        pid = data.get('project_id')
+        if pid:
+            proj = _load_project(pid, with_bim=False)
+            return _project_model_hash(proj) if proj else None
+        return artifact_cache.digest({k: data.get(k) for k in _BUILD_PARAMS + ('area',)})
+
     # ---------- routes ----------
 
     @app.route('/api/bim/build', methods=['POST'])
@@ -196,7 +371,7 @@ def register(app, *, auth_required: Optional[Callable] = None,
         bim_dict = b.to_dict()
         persisted = False
         if data.get('persist') and data.get('project_id'):
-            persisted = _save_bim(data['project_id'], bim_dict)
+            persisted = _save_bim(data['project_id'], bim_dict, b)
         return jsonify({
             'success': True,
             'building_id': b.id,
@@ -249,28 +424,34 @@ def register(app, *, auth_required: Optional[Callable] = None,
     @auth_required
     def _bim_floor_plan():
         data = request.get_json(silent=True) or {}
+        idx = int(data.get('storey_index', 0))
+        width = int(data.get('width_px', 900))
+        model = _model_hash(data)
+        key = model and artifact_cache.digest('floor-plan', model, idx, width)
+        hit = artifact_cache.cached_response(key, mimetype='application/json')
+        if hit is not None:
+            return hit
         b, err = _building_from_request(data)
         if err:
             return jsonify(err[1]), err[0]
-        idx = int(data.get('storey_index', 0))
         if idx >= len(b.storeys):
             return jsonify({'success': False,
                              'error': f'storey_index {idx} out of range '
                                       f'(building has {len(b.storeys)} storeys)'}), 400
-        width = int(data.get('width_px', 900))
         try:
             svg = floor_plan_svg(b, storey_index=idx, width_px=width)
         except Exception as e:
             logger.exception('floor_plan render failed')
             return jsonify({'success': False, 'error': str(e)}), 500
         s = b.storeys[idx]
-        return jsonify({
+        body = jsonify({
             'success': True, 'svg': svg, 'format': 'SVG',
             'storey_id': s.id, 'storey_name': s.name,
             'walls_drawn':    len(s.walls),
             'openings_drawn': len(s.openings),
             'spaces_drawn':   len(s.spaces),
-        })
+        }).get_data()
+        return artifact_cache.store_response(key, body, mimetype='application/json')
 
     @app.route('/api/bim/family-library', methods=['GET'])
     @auth_required
@@ -290,14 +471,14 @@ def register(app, *, auth_required: Optional[Callable] = None,
         pid = data.get('project_id')
         if not pid:
             return jsonify({'success': False, 'error': 'project_id required'}), 400
-        proj = _load_project(pid)
+        proj = _load_project(pid, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
-        if not isinstance(proj.get('bim'), dict):
+        if not _has_model(proj):
             return jsonify({'success': False, 'error': 'no BIM model on project'}), 400
-        b = Building.from_dict(proj['bim'])
+        b = _project_building(pid, proj)
         added = merge_library_into(b)
-        if not _save_bim(pid, b.to_dict()):
+        if not _save_bim(pid, b.to_dict(), b):
             return jsonify({'success': False, 'error': 'persistence failed'}), 500
         return jsonify({'success': True, 'added': added,
                          'totals': {
@@ -312,16 +493,30 @@ def register(app, *, auth_required: Optional[Callable] = None,
         """BIM-driven three.js mesh list. Same response shape as the legacy
         /api/drawings/3d-model so the wizard's existing addMesh() works
         unchanged. Each object carries `bim_element_id` so future click-in-3D
-        can call /api/bim/element/update."""
+        can call /api/bim/element/update. `format: 'glb'` returns the
+        same objects as a cached binary glTF instead."""
         data = request.get_json(silent=True) or {}
+        glb = data.get('format') == 'glb'
+        key = None
+        if glb:
+            model = _model_hash(data)
+            key = model and artifact_cache.digest('3d-model-glb', model)
+            hit = artifact_cache.cached_response(key, mimetype='model/gltf-binary')
+            if hit is not None:
+                return hit
         b, err = _building_from_request(data)
         if err:
             return jsonify(err[1]), err[0]
         try:
-            result = building_to_three(b)
+            if glb:
+                body = building_to_glb(b).to_bytes()
+            else:
+                result = building_to_three(b)
         except Exception as e:
             logger.exception('bim 3d failed')
             return jsonify({'success': False, 'error': str(e)}), 500
+        if glb:
+            return artifact_cache.store_response(key, body, mimetype='model/gltf-binary')
         return jsonify(result)
 
     @app.route('/api/bim/element/update', methods=['POST'])
@@ -334,13 +529,13 @@ def register(app, *, auth_required: Optional[Callable] = None,
         if not pid or not elem_id or not isinstance(patch, dict):
             return jsonify({'success': False,
                              'error': 'project_id, element_id, patch required'}), 400
-        proj = _load_project(pid)
+        proj = _load_project(pid, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
-        if not isinstance(proj.get('bim'), dict):
+        if not _has_model(proj):
             return jsonify({'success': False, 'error': 'no BIM model on project'}), 400
 
-        b = Building.from_dict(proj['bim'])
+        b = _project_building(pid, proj)
         target = None
         target_kind = None
         for s in b.storeys:
@@ -398,10 +593,36 @@ def register(app, *, auth_required: Optional[Callable] = None,
             return jsonify({'success': False,
                              'error': 'validation failed after update',
                              'details': errs}), 400
-        if not _save_bim(pid, b.to_dict()):
+        bim_dict = b.to_dict()
+        if not _save_bim(pid, bim_dict, b):
             return jsonify({'success': False, 'error': 'persistence failed'}), 500
-        return jsonify({'success': True, 'element_id': elem_id,
-                         'kind': target_kind, 'applied': applied})
+        result = {'success': True, 'element_id': elem_id,
+                  'kind': target_kind, 'applied': applied}
+        clashes = mep_clash.recheck_project(pid, bim_dict, [elem_id])
+        if clashes is not None:
+            result['clashes'] = clashes
+        return jsonify(result)
+
+    @app.route('/api/bim/clashes', methods=['POST'])
+    @auth_required
+    def _bim_clashes():
+        """Clash detection over the BIM model plus optional MEP runs."""
+        data = request.get_json(silent=True) or {}
+        b, err = _building_from_request(data)
+        if err:
+            return jsonify(err[1]), err[0]
+        bim_dict = b.to_dict()
+        if data.get('mep_runs'):
+            bim_dict['mep_runs'] = data['mep_runs']
+        try:
+            if data.get('project_id') and not isinstance(data.get('bim'), dict):
+                result = mep_clash.detect_project(data['project_id'], bim_dict)
+            else:
+                result = mep_clash.detect(mep_clash.elements_from_building(bim_dict))
+        except Exception as e:
+            logger.exception('bim clash detection failed')
+            return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify(result)
 
     # ----- sheet pack -----
 
@@ -410,14 +631,11 @@ def register(app, *, auth_required: Optional[Callable] = None,
     def _bim_sheet_pack_meta(project_id):
         """Return the default sheet pack metadata (sheet list, titles,
         view kinds) for a project. UI uses this to populate the Sheets tab."""
-        proj = _load_project(project_id)
+        proj = _load_project(project_id, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
         try:
-            if isinstance(proj.get('bim'), dict):
-                b = Building.from_dict(proj['bim'])
-            else:
-                b = Building.from_params(**_params_from_project_data(proj))
+            b = _project_building(project_id, proj)
         except Exception as e:
             return jsonify({'success': False,
                              'error': f'building load failed: {e}'}), 500
@@ -429,14 +647,15 @@ def register(app, *, auth_required: Optional[Callable] = None,
                methods=['GET'])
     @auth_required
     def _bim_sheet_preview(project_id, sheet_no):
-        proj = _load_project(project_id)
+        proj = _load_project(project_id, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
+        key = artifact_cache.digest('sheet-preview', _project_model_hash(proj), sheet_no)
+        hit = artifact_cache.cached_response(key, mimetype='application/json')
+        if hit is not None:
+            return hit
         try:
-            if isinstance(proj.get('bim'), dict):
-                b = Building.from_dict(proj['bim'])
-            else:
-                b = Building.from_params(**_params_from_project_data(proj))
+            b = _project_building(project_id, proj)
         except Exception as e:
             return jsonify({'success': False,
                              'error': f'building load failed: {e}'}), 500
@@ -444,41 +663,52 @@ def register(app, *, auth_required: Optional[Callable] = None,
         match = next((s for s in pack.sheets if s.number == sheet_no), None)
         if not match:
             return jsonify({'success': False, 'error': 'sheet not in pack'}), 404
-        return jsonify({'success': True, 'sheet_number': match.number,
+        body = jsonify({'success': True, 'sheet_number': match.number,
                          'title': match.title, 'paper': match.paper,
-                         'svg': render_sheet_preview_svg(match)})
+                         'svg': render_sheet_preview_svg(match)}).get_data()
+        return artifact_cache.store_response(key, body, mimetype='application/json')
 
     @app.route('/api/bim/sheet-pack/<project_id>/pdf', methods=['GET'])
     @auth_required
     def _bim_sheet_pack_pdf(project_id):
-        from flask import Response
-        proj = _load_project(project_id)
+        proj = _load_project(project_id, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
-        try:
-            if isinstance(proj.get('bim'), dict):
-                b = Building.from_dict(proj['bim'])
-            else:
-                b = Building.from_params(**_params_from_project_data(proj))
-        except Exception as e:
-            return jsonify({'success': False,
-                             'error': f'building load failed: {e}'}), 500
-        pack = default_sheet_pack(b)
         meta = {
             'client':     (proj.get('client') or '–'),
             'drawn_by':   'EIMS-AUTO',
             'checked_by': proj.get('checked_by') or '—',
         }
+        # The title blocks carry today's issue date, so it is part of the key.
+        key = artifact_cache.digest('sheet-pack-pdf', _project_model_hash(proj), meta,
+                                    datetime.now().date().isoformat())
+        saved = proj.get('bim') if isinstance(proj.get('bim'), dict) else proj.get('bim_stub')
+        name = saved['name'] if saved else _params_from_project_data(proj)['name']
+        if jobs.wants_async(request):
+            if 'bim_stub' in proj:
+                saved = (_load_project(project_id) or {}).get('bim')
+            return jobs.accepted(jobs.submit(
+                'sheet-pack-pdf', _sheet_pack_pdf_job,
+                {'bim': saved, 'params': None if saved else _params_from_project_data(proj),
+                 'meta': meta, 'day': datetime.now().date().isoformat()},
+                mimetype='application/pdf', download_name=_sheet_pack_filename(name)))
+        hit = artifact_cache.cached_response(key, mimetype='application/pdf',
+                                             download_name=_sheet_pack_filename(name))
+        if hit is not None:
+            return hit
+        try:
+            b = _project_building(project_id, proj)
+        except Exception as e:
+            return jsonify({'success': False,
+                             'error': f'building load failed: {e}'}), 500
+        pack = default_sheet_pack(b)
         try:
             pdf_bytes = build_sheet_pack_pdf(pack, project_meta=meta)
         except Exception as e:
             logger.exception('sheet pack pdf failed')
             return jsonify({'success': False, 'error': str(e)}), 500
-        fname = f'{b.name.replace(" ", "_") or "project"}_SheetPack.pdf'
-        return Response(pdf_bytes, mimetype='application/pdf', headers={
-            'Content-Disposition': f'attachment; filename="{fname}"',
-            'Content-Length': str(len(pdf_bytes)),
-        })
+        return artifact_cache.store_response(key, pdf_bytes, mimetype='application/pdf',
+                                             download_name=_sheet_pack_filename(b.name))
 
     # ----- EIMS Copilot (conversational interface) -----
 
@@ -511,7 +741,7 @@ def register(app, *, auth_required: Optional[Callable] = None,
     @app.route('/api/bim/copilot/history/<project_id>', methods=['GET'])
     @auth_required
     def _copilot_history(project_id):
-        proj = _load_project(project_id)
+        proj = _load_project(project_id, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
         history = proj.get('copilot_history') or []
@@ -520,7 +750,7 @@ def register(app, *, auth_required: Optional[Callable] = None,
     @app.route('/api/bim/copilot/reset/<project_id>', methods=['POST'])
     @auth_required
     def _copilot_reset(project_id):
-        proj = _load_project(project_id)
+        proj = _load_project(project_id, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
         if _save_copilot_history(project_id, []):
@@ -537,15 +767,12 @@ def register(app, *, auth_required: Optional[Callable] = None,
             return jsonify({'success': False, 'error': 'project_id required'}), 400
         if not msg:
             return jsonify({'success': False, 'error': 'message required'}), 400
-        proj = _load_project(pid)
+        proj = _load_project(pid, with_bim=False)
         if not proj:
             return jsonify({'success': False, 'error': 'project not found'}), 404
         # Resolve current building (saved bim, else rebuild from params)
         try:
-            if isinstance(proj.get('bim'), dict):
-                b = Building.from_dict(proj['bim'])
-            else:
-                b = Building.from_params(**_params_from_project_data(proj))
+            b = _project_building(pid, proj)
         except Exception as e:
             return jsonify({'success': False,
                              'error': f'building load failed: {e}'}), 500
@@ -557,7 +784,7 @@ def register(app, *, auth_required: Optional[Callable] = None,
         # Persist mutated building if any tool changed it
         persisted = False
         if result.building_changed and result.new_building is not None:
-            persisted = _save_bim(pid, result.new_building.to_dict())
+            persisted = _save_bim(pid, result.new_building.to_dict(), result.new_building)
 
         return jsonify({
             'success':           True,
@@ -571,4 +798,4 @@ def register(app, *, auth_required: Optional[Callable] = None,
 
     logger.info('BIM endpoints registered (build, project/<id>, schedules, '
                  'floor-plan, 3d-model, element/update, family-library, '
-                 'types/import, sheet-pack, sheet-pack/pdf, copilot)')
+                 'types/import, sheet-pack, sheet-pack/pdf, copilot, clashes)')
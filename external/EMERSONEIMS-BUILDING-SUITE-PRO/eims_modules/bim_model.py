@@ -36,6 +36,11 @@ Design principles
 5. **Round-trippable.** `building.to_dict()` and `Building.from_dict()`
    are inverses. The full model serialises to JSON and persists in
    `projects.data_json.bim` — additive, no schema migration required.
+   `to_bytes()` / `from_bytes()` are the compact binary equivalent (see
+   bim_binary), stored beside the JSON for fast, per-storey loading.
+
+6. **Compact in memory.** Every class is slotted, and decoded polylines
+   are `PointList`s — flat float arrays rather than a Point2D per vertex.
 
 This module is pure data + geometry. It has zero dependencies on Flask,
 ReportLab, or any external service. Renderers and Flask routes live
@@ -46,15 +51,17 @@ from __future__ import annotations
 
 import math
 import uuid
-from dataclasses import dataclass, field, asdict
-from typing import Any, Optional
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
 
 
 # ============================================================================
 # Primitives
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Point2D:
     """Plan-coordinate point in metres. Origin is the storey's south-west
     corner; +x east, +y north."""
@@ -69,13 +76,109 @@ class Point2D:
         return cls(x=float(d['x']), y=float(d['y']))
 
 
+class PointList(Sequence):
+    """Read-only sequence of Point2D backed by one flat ``array('d')`` of
+    x, y pairs. Indexing and iteration hand out fresh Point2D values, so edit
+    geometry by assigning a new list (as /api/bim/element/update does), not
+    by mutating a point in place."""
+    __slots__ = ('xy',)
+
+    def __init__(self, points: Iterable[Point2D] = ()):
+        self.xy = array('d', [v for p in points for v in (p.x, p.y)])
+
+    @classmethod
+    def from_xy(cls, xy: array) -> 'PointList':
+        pl = cls.__new__(cls)
+        pl.xy = xy
+        return pl
+
+    @classmethod
+    def from_dicts(cls, ds: Iterable[dict]) -> 'PointList':
+        return cls.from_xy(array('d', [float(v) for d in ds for v in (d['x'], d['y'])]))
+
+    def __len__(self) -> int:
+        return len(self.xy) >> 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return PointList.from_xy(self.xy[2 * start:2 * max(start, stop)])
+            return PointList(self[j] for j in range(start, stop, step))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('PointList index out of range')
+        return Point2D(self.xy[2 * i], self.xy[2 * i + 1])
+
+    def __iter__(self):
+        return map(Point2D, self.xy[0::2], self.xy[1::2])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PointList):
+            return self.xy == other.xy
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __reduce__(self):
+        return (PointList.from_xy, (self.xy,))
+
+    def __repr__(self) -> str:
+        return f'PointList({list(self)!r})'
+
+    def to_dicts(self) -> list[dict]:
+        xy = self.xy
+        return [{'x': round(x, 4), 'y': round(y, 4)} for x, y in zip(xy[0::2], xy[1::2])]
+
+
+# Element geometry: plain lists when authored in code, PointList once decoded.
+Points = Union[list[Point2D], PointList]
+
+
+def _points_to_dicts(points: Points) -> list[dict]:
+    if isinstance(points, PointList):
+        return points.to_dicts()
+    return [p.to_dict() for p in points]
+
+
+def _plain(v: Any) -> Any:
+    if isinstance(v, list):
+        return [_plain(x) for x in v]
+    if isinstance(v, dict):
+        return {k: _plain(x) for k, x in v.items()}
+    return v
+
+
+def _record(obj: Any) -> dict:
+    """``asdict`` for the flat records here (types, openings, site): the
+    same deep-copied output without deepcopy's per-value bookkeeping, which
+    dominated serialising a full type catalog."""
+    return {f: _plain(getattr(obj, f)) for f in obj.__dataclass_fields__}
+
+
+def _polygon_area_m2(points: Points) -> float:
+    if len(points) < 3:
+        return 0.0
+    if isinstance(points, PointList):
+        xs, ys = points.xy[0::2], points.xy[1::2]
+    else:
+        xs, ys = [p.x for p in points], [p.y for p in points]
+    # Shoelace
+    s = 0.0
+    for x1, y1, x2, y2 in zip(xs, ys, xs[1:] + xs[:1], ys[1:] + ys[:1]):
+        s += x1 * y2 - x2 * y1
+    return abs(s) / 2.0
+
+
 def _new_id(prefix: str) -> str:
     """Stable element id. Prefix lets logs/inspectors tell a Wall from a Door
     at a glance without dereferencing the type."""
     return f"{prefix}_{uuid.uuid4().hex[:10]}"
 
 
-def _polyline_length_m(points: list[Point2D]) -> float:
+def _polyline_length_m(points: Points) -> float:
     if len(points) < 2:
         return 0.0
     return sum(math.hypot(points[i+1].x - points[i].x,
@@ -87,7 +190,7 @@ def _polyline_length_m(points: list[Point2D]) -> float:
 # Type catalog (shared properties — Revit "family types")
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class WallType:
     """Shared properties for many Wall instances. Layers list runs from
     exterior to interior; thicknesses sum to overall wall thickness."""
@@ -102,10 +205,10 @@ class WallType:
     source_refs: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return _record(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class DoorType:
     name: str
     width_m: float
@@ -116,7 +219,7 @@ class DoorType:
     source_refs: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class WindowType:
     name: str
     width_m: float
@@ -128,7 +231,7 @@ class WindowType:
     source_refs: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class SlabType:
     name: str
     thickness_m: float
@@ -142,11 +245,11 @@ class SlabType:
 # Element instances
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Wall:
     id: str
     type_name: str                          # → WallType in catalog
-    points: list[Point2D]                   # polyline at storey datum
+    points: Points                          # polyline at storey datum
     height_m: float
     storey_id: str
     structural_role: str = 'partition'      # partition | external | shear | retaining
@@ -160,7 +263,7 @@ class Wall:
     def to_dict(self) -> dict:
         return {
             'id': self.id, 'type_name': self.type_name,
-            'points': [p.to_dict() for p in self.points],
+            'points': _points_to_dicts(self.points),
             'height_m': self.height_m, 'storey_id': self.storey_id,
             'structural_role': self.structural_role,
             'properties': self.properties,
@@ -168,7 +271,7 @@ class Wall:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Opening:
     """Door or window, hosted by a wall. `position_m` is distance along the
     wall's polyline from its first point. `sill_m` is height above storey
@@ -183,42 +286,33 @@ class Opening:
     source_refs: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return _record(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Slab:
     id: str
     type_name: str                         # → SlabType in catalog
     storey_id: str
-    boundary: list[Point2D]                # closed polygon (last point != first by convention)
+    boundary: Points                       # closed polygon (last point != first by convention)
     role: str = 'floor'                    # floor | ceiling | roof
     properties: dict = field(default_factory=dict)
     source_refs: list[str] = field(default_factory=list)
 
     @property
     def area_m2(self) -> float:
-        if len(self.boundary) < 3:
-            return 0.0
-        # Shoelace
-        s = 0.0
-        n = len(self.boundary)
-        for i in range(n):
-            x1, y1 = self.boundary[i].x, self.boundary[i].y
-            x2, y2 = self.boundary[(i+1) % n].x, self.boundary[(i+1) % n].y
-            s += x1 * y2 - x2 * y1
-        return abs(s) / 2.0
+        return _polygon_area_m2(self.boundary)
 
     def to_dict(self) -> dict:
         return {
             'id': self.id, 'type_name': self.type_name, 'storey_id': self.storey_id,
-            'boundary': [p.to_dict() for p in self.boundary],
+            'boundary': _points_to_dicts(self.boundary),
             'role': self.role, 'properties': self.properties,
             'source_refs': self.source_refs,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Space:
     """A room. Boundary is the inhabited polygon; `program` tags use it
     (bedroom, kitchen, etc.) so schedules and code-checks can group rooms."""
@@ -226,33 +320,25 @@ class Space:
     name: str
     program: str                           # bedroom | bathroom | kitchen | living | corridor | etc.
     storey_id: str
-    boundary: list[Point2D]
+    boundary: Points
     properties: dict = field(default_factory=dict)
     source_refs: list[str] = field(default_factory=list)
 
     @property
     def area_m2(self) -> float:
-        if len(self.boundary) < 3:
-            return 0.0
-        s = 0.0
-        n = len(self.boundary)
-        for i in range(n):
-            x1, y1 = self.boundary[i].x, self.boundary[i].y
-            x2, y2 = self.boundary[(i+1) % n].x, self.boundary[(i+1) % n].y
-            s += x1 * y2 - x2 * y1
-        return abs(s) / 2.0
+        return _polygon_area_m2(self.boundary)
 
     def to_dict(self) -> dict:
         return {
             'id': self.id, 'name': self.name, 'program': self.program,
             'storey_id': self.storey_id,
-            'boundary': [p.to_dict() for p in self.boundary],
+            'boundary': _points_to_dicts(self.boundary),
             'properties': self.properties,
             'source_refs': self.source_refs,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Column:
     id: str
     storey_id: str
@@ -273,7 +359,7 @@ class Column:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Beam:
     id: str
     storey_id: str
@@ -302,7 +388,7 @@ class Beam:
 # Aggregates
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Storey:
     id: str
     name: str
@@ -328,7 +414,7 @@ class Storey:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Site:
     location_name: str = ''
     gps_lat: Optional[float] = None
@@ -337,8 +423,18 @@ class Site:
     setback_m: float = 3.0
     properties: dict = field(default_factory=dict)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'Site':
+        return cls(
+            location_name=d.get('location_name', ''),
+            gps_lat=d.get('gps_lat'), gps_lng=d.get('gps_lng'),
+            plot_area_m2=d.get('plot_area_m2'),
+            setback_m=d.get('setback_m', 3.0),
+            properties=d.get('properties', {}),
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class TypeCatalog:
     walls:   dict[str, WallType]   = field(default_factory=dict)
     doors:   dict[str, DoorType]   = field(default_factory=dict)
@@ -347,14 +443,23 @@ class TypeCatalog:
 
     def to_dict(self) -> dict:
         return {
-            'walls':   {k: asdict(v) for k, v in self.walls.items()},
-            'doors':   {k: asdict(v) for k, v in self.doors.items()},
-            'windows': {k: asdict(v) for k, v in self.windows.items()},
-            'slabs':   {k: asdict(v) for k, v in self.slabs.items()},
+            'walls':   {k: _record(v) for k, v in self.walls.items()},
+            'doors':   {k: _record(v) for k, v in self.doors.items()},
+            'windows': {k: _record(v) for k, v in self.windows.items()},
+            'slabs':   {k: _record(v) for k, v in self.slabs.items()},
         }
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'TypeCatalog':
+        return cls(
+            walls   = {k: WallType(**v)   for k, v in d.get('walls', {}).items()},
+            doors   = {k: DoorType(**v)   for k, v in d.get('doors', {}).items()},
+            windows = {k: WindowType(**v) for k, v in d.get('windows', {}).items()},
+            slabs   = {k: SlabType(**v)   for k, v in d.get('slabs', {}).items()},
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class Building:
     """The whole building — single source of truth for one project."""
     id: str
@@ -390,19 +495,14 @@ class Building:
             'id': self.id, 'name': self.name,
             'schema_version': self.schema_version,
             'storeys':  [s.to_dict() for s in self.storeys],
-            'site':     asdict(self.site),
+            'site':     _record(self.site),
             'types':    self.types.to_dict(),
             'metadata': self.metadata,
         }
 
     @classmethod
     def from_dict(cls, d: dict) -> 'Building':
-        types = TypeCatalog(
-            walls   = {k: WallType(**v)   for k, v in d.get('types', {}).get('walls', {}).items()},
-            doors   = {k: DoorType(**v)   for k, v in d.get('types', {}).get('doors', {}).items()},
-            windows = {k: WindowType(**v) for k, v in d.get('types', {}).get('windows', {}).items()},
-            slabs   = {k: SlabType(**v)   for k, v in d.get('types', {}).get('slabs', {}).items()},
-        )
+        types = TypeCatalog.from_dict(d.get('types', {}))
         storeys: list[Storey] = []
         for sd in d.get('storeys', []):
             storeys.append(Storey(
@@ -410,7 +510,7 @@ class Building:
                 level_m=sd['level_m'], height_m=sd['height_m'],
                 walls=[Wall(
                     id=w['id'], type_name=w['type_name'],
-                    points=[Point2D.from_dict(p) for p in w['points']],
+                    points=PointList.from_dicts(w['points']),
                     height_m=w['height_m'], storey_id=w['storey_id'],
                     structural_role=w.get('structural_role', 'partition'),
                     properties=w.get('properties', {}),
@@ -418,7 +518,7 @@ class Building:
                 ) for w in sd.get('walls', [])],
                 slabs=[Slab(
                     id=sl['id'], type_name=sl['type_name'], storey_id=sl['storey_id'],
-                    boundary=[Point2D.from_dict(p) for p in sl['boundary']],
+                    boundary=PointList.from_dicts(sl['boundary']),
                     role=sl.get('role', 'floor'),
                     properties=sl.get('properties', {}),
                     source_refs=sl.get('source_refs', []),
@@ -426,7 +526,7 @@ class Building:
                 spaces=[Space(
                     id=sp['id'], name=sp['name'], program=sp['program'],
                     storey_id=sp['storey_id'],
-                    boundary=[Point2D.from_dict(p) for p in sp['boundary']],
+                    boundary=PointList.from_dicts(sp['boundary']),
                     properties=sp.get('properties', {}),
                     source_refs=sp.get('source_refs', []),
                 ) for sp in sd.get('spaces', [])],
@@ -449,18 +549,23 @@ class Building:
                     source_refs=b.get('source_refs', []),
                 ) for b in sd.get('beams', [])],
             ))
-        site_d = d.get('site', {})
-        site = Site(
-            location_name=site_d.get('location_name', ''),
-            gps_lat=site_d.get('gps_lat'), gps_lng=site_d.get('gps_lng'),
-            plot_area_m2=site_d.get('plot_area_m2'),
-            setback_m=site_d.get('setback_m', 3.0),
-            properties=site_d.get('properties', {}),
-        )
+        site = Site.from_dict(d.get('site', {}))
         return cls(id=d['id'], name=d['name'], storeys=storeys, site=site,
                    types=types, metadata=d.get('metadata', {}),
                    schema_version=d.get('schema_version', 1))
 
+    def to_bytes(self) -> bytes:
+        """Compact binary form — see bim_binary for the layout."""
+        from .bim_binary import dumps
+        return dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, lazy: bool = True) -> 'Building':
+        """Inverse of `to_bytes`. With `lazy`, each storey's elements are
+        decoded the first time they are touched."""
+        from .bim_binary import loads
+        return loads(data, lazy=lazy)
+
     # ------- integrity -------
     def validate(self) -> list[str]:
         """Return a list of error strings; empty list means model is valid.
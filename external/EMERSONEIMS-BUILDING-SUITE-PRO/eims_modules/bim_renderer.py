@@ -1,8 +1,9 @@
-"""BIM-native SVG renderers — projections of the Building model.
+"""BIM-native plan renderers — projections of the Building model.
 
 This is the FIRST renderer in the new world: it consumes a `Building` object
-and emits SVG. Replaces the ad-hoc, params-driven `SVGDrawingEngine` for
-floor plans (eventually). Every wall, door, window, room is drawn from
+and emits a drawing IR (`drawing_ir.Drawing`), serialised to SVG for the
+browser or drawn straight onto a PDF canvas for sheet packs. Replaces the
+ad-hoc, params-driven `SVGDrawingEngine` for floor plans (eventually). Every wall, door, window, room is drawn from
 the model's actual geometry, not a parametric guess at draw time.
 
 Output looks like a CAD floor plan:
@@ -23,6 +24,7 @@ import math
 from typing import Optional
 
 from .bim_model import Building, Storey, Wall, Opening, Space, Point2D
+from .drawing_ir import Arc, Circle, Drawing, Line, Polygon, Style, Text, to_svg
 
 
 # ============================================================================
@@ -67,6 +69,44 @@ def _bbox(b: Building, storey: Storey) -> tuple[float, float, float, float]:
 # Floor plan
 # ============================================================================
 
+PLAN_STYLES = {
+    'wall-ext':  Style(fill='#222', stroke='#000', width=6),
+    'wall-int':  Style(fill='#444', stroke='#000', width=3),
+    'slab':      Style(fill='#f5f5f0', stroke='#bbb', width=1),
+    'space':     Style(stroke='#888', width=1, opacity=0.55),
+    'door-line':   Style(stroke='#000', width=5),
+    'door-arc':    Style(fill='none', stroke='#666', width=2, dash=(4, 3)),
+    'window-line': Style(stroke='#1565c0', width=3),
+    'window-mid':  Style(stroke='#1565c0', width=1),
+    'label':     Style(font_size=90, font_weight=600, fill='#222', anchor='middle'),
+    'sublabel':  Style(font_size=68, font_weight=400, fill='#666', anchor='middle'),
+    # Dimension chains (architects use thinner lines + crossed ticks)
+    'dim-line':  Style(stroke='#666', width=1.2, fill='none'),
+    'dim-cross': Style(stroke='#666', width=1.2),
+    'dim-text':  Style(font_size=62, fill='#333', anchor='middle', font_weight=500),
+    'dim-text-overall': Style(font_size=76, fill='#0c2461', font_weight=700, anchor='middle'),
+    # Grid system (Revit-style coloured letter/number bubbles)
+    'grid-line':   Style(stroke='#c62828', width=1, dash=(18, 8, 3, 8), opacity=0.7),
+    'grid-bubble': Style(fill='#fff', stroke='#c62828', width=2.5),
+    'grid-text':   Style(font_size=80, fill='#c62828', font_weight=700, anchor='middle', central=True),
+    # Door / window mark callouts
+    'mark-leader':        Style(stroke='#1565c0', width=1.2, fill='none'),
+    'mark-bubble-door':   Style(fill='#fff3e0', stroke='#e65100', width=2),
+    'mark-bubble-window': Style(fill='#e3f2fd', stroke='#1565c0', width=2),
+    'mark-text':   Style(font_size=54, font_weight=700, anchor='middle', central=True),
+    'mark-door':   Style(fill='#e65100'),
+    'mark-window': Style(fill='#1565c0'),
+    # Section reference markers
+    'sec-line':   Style(stroke='#000', width=2, dash=(30, 12, 4, 12)),
+    'sec-bubble': Style(fill='#000', stroke='#000'),
+    'sec-text':   Style(font_size=80, fill='#fff', font_weight=700, anchor='middle', central=True),
+    'title-bg':   Style(fill='#0c2461'),
+    'title-tx':   Style(font_size=78, fill='#fff', font_weight=700),
+    'title-sub':  Style(font_size=60, fill='#bbdefb'),
+    'title-sub-end': Style(font_size=60, fill='#bbdefb', anchor='end'),
+}
+
+
 def floor_plan_svg(b: Building, *, storey_index: int = 0,
                    width_px: int = 900, padding_mm: int = 5500) -> str:
     """Render one storey of `b` as an SVG CAD floor plan.
@@ -78,56 +118,43 @@ def floor_plan_svg(b: Building, *, storey_index: int = 0,
         return _empty_svg('No storeys in model')
     if storey_index >= len(b.storeys):
         return _empty_svg(f'Storey {storey_index} out of range')
+    return to_svg(floor_plan_ir(b, storey_index=storey_index, padding_mm=padding_mm),
+                  width_px=width_px)
 
+
+def floor_plan_ir(b: Building, *, storey_index: int = 0,
+                  padding_mm: int = 5500) -> Drawing:
+    """One storey of `b` as a drawing IR (mm, +y up), ready for any backend."""
     storey = b.storeys[storey_index]
     minx, miny, maxx, maxy = _bbox(b, storey)
     # Pad
     pad = padding_mm / 1000.0  # m
     minx -= pad; miny -= pad; maxx += pad; maxy += pad
-    bbox_w = maxx - minx
-    bbox_h = maxy - miny
-
-    # mm units in the viewBox
-    vw = bbox_w * 1000
-    vh = bbox_h * 1000
-    height_px = int(width_px * (vh / vw)) if vw > 0 else 600
-
-    parts: list[str] = []
-    parts.append(
-        f'<svg xmlns="http://www.w3.org/2000/svg" '
-        f'viewBox="{minx*1000:.1f} {miny*1000:.1f} {vw:.1f} {vh:.1f}" '
-        f'width="{width_px}" height="{height_px}" '
-        f'style="background:#fff;font-family:Arial,sans-serif" '
-        f'data-bim-storey="{storey.id}">'
-    )
-    parts.append(_styles())
-    # Flip Y so +y is up (architect convention)
-    parts.append(f'<g transform="translate(0,{(miny + maxy)*1000:.1f}) scale(1,-1)">')
+
+    d = Drawing(extent=(minx * 1000, miny * 1000, maxx * 1000, maxy * 1000),
+                styles=PLAN_STYLES, attrs={'data-bim-storey': storey.id})
 
     # 1. Slabs (light hatched fill so the room footprint reads instantly)
     for sl in storey.slabs:
         if sl.role != 'floor':
             continue
-        pts = ' '.join(f'{p.x*1000:.1f},{p.y*1000:.1f}' for p in sl.boundary)
-        parts.append(f'<polygon class="slab" points="{pts}" '
-                      f'data-element-id="{sl.id}"/>')
+        d.add(Polygon([(p.x * 1000, p.y * 1000) for p in sl.boundary], 'slab',
+                      attrs={'data-element-id': sl.id}))
 
-    # 2. Spaces (room fills + labels)
+    # 2. Spaces (room fills)
     for sp in storey.spaces:
-        pts = ' '.join(f'{p.x*1000:.1f},{p.y*1000:.1f}' for p in sp.boundary)
-        col = _space_colour(sp.program)
-        parts.append(f'<polygon class="space" fill="{col}" points="{pts}" '
-                      f'data-element-id="{sp.id}"/>')
+        d.add(Polygon([(p.x * 1000, p.y * 1000) for p in sp.boundary], 'space',
+                      fill=_space_colour(sp.program), attrs={'data-element-id': sp.id}))
 
     # 3. Walls — drawn as filled rectangles (2-line walls) at true thickness
     for w in storey.walls:
         thickness = (b.types.walls.get(w.type_name).thickness_m
                       if w.type_name in b.types.walls else 0.1)
-        rect_path = _wall_rect_path(w, thickness)
-        css = 'wall-ext' if w.structural_role == 'external' else 'wall-int'
-        parts.append(f'<path class="{css}" d="{rect_path}" '
-                      f'data-element-id="{w.id}" '
-                      f'data-type="{w.type_name}"/>')
+        outline = _wall_outline(w, thickness)
+        if outline:
+            css = 'wall-ext' if w.structural_role == 'external' else 'wall-int'
+            d.add(Polygon(outline, css, attrs={'data-element-id': w.id,
+                                               'data-type': w.type_name}))
 
     # 4. Openings — door swings + window symbols
     wall_by_id = {w.id: w for w in storey.walls}
@@ -137,113 +164,56 @@ def floor_plan_svg(b: Building, *, storey_index: int = 0,
             continue
         if o.kind == 'door':
             t = b.types.doors.get(o.type_name)
-            width = t.width_m if t else 0.9
-            parts.append(_door_symbol(host, o, width))
+            d.extend(_door_symbol(host, o, t.width_m if t else 0.9))
         elif o.kind == 'window':
             t = b.types.windows.get(o.type_name)
-            width = t.width_m if t else 1.5
-            parts.append(_window_symbol(host, o, width))
+            d.extend(_window_symbol(host, o, t.width_m if t else 1.5))
 
     # 5. Room labels (name + area)
     for sp in storey.spaces:
         cx = sum(p.x for p in sp.boundary) / max(len(sp.boundary), 1)
         cy = sum(p.y for p in sp.boundary) / max(len(sp.boundary), 1)
-        # Counter-flip the Y so text renders right-side-up after the parent flip
-        parts.append(
-            f'<g transform="translate({cx*1000:.1f},{cy*1000:.1f}) scale(1,-1)">'
-            f'<text class="label" text-anchor="middle">'
-            f'<tspan x="0" dy="-8">{_esc(sp.name)}</tspan>'
-            f'<tspan x="0" dy="14" class="sublabel">{sp.area_m2:.1f} m²</tspan>'
-            f'</text></g>'
-        )
+        d.add(Text(cx * 1000, cy * 1000, sp.name, 'label', dy=-8))
+        d.add(Text(cx * 1000, cy * 1000, f'{sp.area_m2:.1f} m²', 'sublabel', dy=64))
 
     # 6. Auto-derived grid system (named A/B/C × 1/2/3) — drawn under marks
     grid = _derive_grid(b, storey)
-    parts.append(_grid_strings(grid, minx, miny, maxx, maxy))
+    d.extend(_grid_items(grid, minx, miny, maxx, maxy))
 
     # 7. Dimension chains: overall + bay + opening offsets, on south & east
-    parts.append(_dimension_chains(b, storey, grid, minx, miny, maxx, maxy))
+    d.extend(_dimension_chains(b, storey, grid, minx, miny, maxx, maxy))
 
     # 8. Door / window mark callouts (D-001, W-001) keyed back to schedules
-    parts.append(_mark_callouts(b, storey))
+    d.extend(_mark_callouts(b, storey))
 
     # 9. Section reference markers (where named cut lines pass through this storey)
-    parts.append(_section_markers(b, storey, minx, miny, maxx, maxy))
+    d.extend(_section_markers(b, storey, minx, miny, maxx, maxy))
 
-    parts.append('</g>')
-
-    # Title block (drawn after the flipped group so it's right-side-up)
-    parts.append(_title_block(b, storey, minx, miny, maxx, maxy))
-
-    parts.append('</svg>')
-    return '\n'.join(parts)
+    # Title block band, in the margin under the plan
+    d.extend(_title_block(b, storey, minx, miny, maxx, maxy))
+    return d
 
 
 # ============================================================================
-# SVG building blocks
+# Drawing building blocks (all coordinates in mm)
 # ============================================================================
 
-def _styles() -> str:
-    return '''<style>
-      .wall-ext { fill:#222; stroke:#000; stroke-width:6; }
-      .wall-int { fill:#444; stroke:#000; stroke-width:3; }
-      .slab     { fill:#f5f5f0; stroke:#bbb; stroke-width:1; }
-      .space    { stroke:#888; stroke-width:1; opacity:0.55; }
-      .door-line   { stroke:#000; stroke-width:5; }
-      .door-arc    { fill:none; stroke:#666; stroke-width:2; stroke-dasharray:4,3; }
-      .window-line { stroke:#1565c0; stroke-width:3; }
-      .window-mid  { stroke:#1565c0; stroke-width:1; }
-      .label    { font-size:90px; font-weight:600; fill:#222; }
-      .sublabel { font-size:68px; font-weight:400; fill:#666; }
-      /* Dimension chain styling (architects use thinner lines + crossed ticks) */
-      .dim-line   { stroke:#666; stroke-width:1.2; fill:none; }
-      .dim-tick   { stroke:#666; stroke-width:1.2; }
-      .dim-cross  { stroke:#666; stroke-width:1.2; }
-      .dim-text   { font-size:62px; fill:#333; text-anchor:middle; font-weight:500; }
-      .dim-text-overall { font-size:76px; fill:#0c2461; font-weight:700; text-anchor:middle; }
-      /* Grid system (Revit-style coloured letter/number bubbles) */
-      .grid-line  { stroke:#c62828; stroke-width:1; stroke-dasharray:18,8,3,8; opacity:0.7; }
-      .grid-bubble{ fill:#fff; stroke:#c62828; stroke-width:2.5; }
-      .grid-text  { font-size:80px; fill:#c62828; font-weight:700; text-anchor:middle; dominant-baseline:central; }
-      /* Door / window mark callouts */
-      .mark-leader{ stroke:#1565c0; stroke-width:1.2; fill:none; }
-      .mark-bubble-door  { fill:#fff3e0; stroke:#e65100; stroke-width:2; }
-      .mark-bubble-window{ fill:#e3f2fd; stroke:#1565c0; stroke-width:2; }
-      .mark-text  { font-size:54px; font-weight:700; text-anchor:middle; dominant-baseline:central; }
-      .mark-door  { fill:#e65100; }
-      .mark-window{ fill:#1565c0; }
-      /* Section reference markers */
-      .sec-line   { stroke:#000; stroke-width:2; stroke-dasharray:30,12,4,12; }
-      .sec-bubble { fill:#000; stroke:#000; }
-      .sec-text   { font-size:80px; fill:#fff; font-weight:700; text-anchor:middle; dominant-baseline:central; }
-      .title-bg { fill:#0c2461; }
-      .title-tx { font-size:78px; fill:#fff; font-weight:700; }
-      .title-sub{ font-size:60px; fill:#bbdefb; }
-    </style>'''
-
-
-def _wall_rect_path(w: Wall, thickness: float) -> str:
+def _wall_outline(w: Wall, thickness: float) -> list[tuple[float, float]]:
     """Walls are drawn as filled polygons at true thickness — equivalent to
     Revit's 2-line wall display. The polygon is the wall centreline offset
     by ±thickness/2 along the wall normal."""
     if len(w.points) < 2:
-        return ''
+        return []
     nx, ny = _wall_normal(w)
     h = thickness / 2.0
     p0, p1 = w.points[0], w.points[-1]
-    a = (p0.x + nx * h, p0.y + ny * h)
-    b = (p1.x + nx * h, p1.y + ny * h)
-    c = (p1.x - nx * h, p1.y - ny * h)
-    d = (p0.x - nx * h, p0.y - ny * h)
-    pts = [a, b, c, d]
-    cmds = [f'M {pts[0][0]*1000:.1f} {pts[0][1]*1000:.1f}']
-    for px, py in pts[1:]:
-        cmds.append(f'L {px*1000:.1f} {py*1000:.1f}')
-    cmds.append('Z')
-    return ' '.join(cmds)
-
-
-def _door_symbol(host: Wall, o: Opening, width_m: float) -> str:
+    return [((p0.x + nx * h) * 1000, (p0.y + ny * h) * 1000),
+            ((p1.x + nx * h) * 1000, (p1.y + ny * h) * 1000),
+            ((p1.x - nx * h) * 1000, (p1.y - ny * h) * 1000),
+            ((p0.x - nx * h) * 1000, (p0.y - ny * h) * 1000)]
+
+
+def _door_symbol(host: Wall, o: Opening, width_m: float) -> list:
     """Standard architectural door: a thick line for the leaf + a quarter-circle
     arc for the swing. Centred on `position_m` along the host wall."""
     dx, dy = _wall_dir(host)
@@ -251,37 +221,23 @@ def _door_symbol(host: Wall, o: Opening, width_m: float) -> str:
     p0 = host.points[0]
     cx = p0.x + dx * o.position_m
     cy = p0.y + dy * o.position_m
-    # Door leaf — pivots around the start of the opening on the wall side
+    # Hinge at one end of the opening; leaf swings 90° into the +n side
     half = width_m / 2.0
-    # Open side is "interior" — choose the +n direction by convention
-    # Hinge at one end of the opening; leaf swings 90° into the room
     hinge_x = cx - dx * half
     hinge_y = cy - dy * half
-    # Leaf end (90° into the +n direction)
     leaf_end_x = hinge_x + nx * width_m
     leaf_end_y = hinge_y + ny * width_m
-    # Arc end (the closed-door tip)
-    closed_x = hinge_x + dx * width_m
-    closed_y = hinge_y + dy * width_m
-
-    # rx/ry = width_m * 1000 (in viewBox mm)
-    r = width_m * 1000
-    # Determine sweep flag: the cross product (dx,dy) × (nx,ny) determines
-    # CCW vs CW in our flipped Y system. Simpler: just always sweep large=0.
-    return (
-        # The leaf
-        f'<line class="door-line" '
-        f'x1="{hinge_x*1000:.1f}" y1="{hinge_y*1000:.1f}" '
-        f'x2="{leaf_end_x*1000:.1f}" y2="{leaf_end_y*1000:.1f}" '
-        f'data-element-id="{o.id}" data-kind="door"/>'
-        # The swing arc
-        f'<path class="door-arc" '
-        f'd="M {leaf_end_x*1000:.1f} {leaf_end_y*1000:.1f} '
-        f'A {r:.1f} {r:.1f} 0 0 1 {closed_x*1000:.1f} {closed_y*1000:.1f}"/>'
-    )
-
-
-def _window_symbol(host: Wall, o: Opening, width_m: float) -> str:
+    # The swing runs from the open leaf back to the closed position along
+    # the wall: the normal is the wall direction turned +90°, so -90°.
+    leaf_deg = math.degrees(math.atan2(ny, nx))
+    return [
+        Line(hinge_x * 1000, hinge_y * 1000, leaf_end_x * 1000, leaf_end_y * 1000,
+             'door-line', attrs={'data-element-id': o.id, 'data-kind': 'door'}),
+        Arc(hinge_x * 1000, hinge_y * 1000, width_m * 1000, leaf_deg, -90.0, 'door-arc'),
+    ]
+
+
+def _window_symbol(host: Wall, o: Opening, width_m: float) -> list:
     """Standard window: 3 parallel lines spanning the wall thickness."""
     dx, dy = _wall_dir(host)
     nx, ny = _wall_normal(host)
@@ -295,18 +251,13 @@ def _window_symbol(host: Wall, o: Opening, width_m: float) -> str:
     ey = cy + dy * half
     # Approximate the wall thickness for the window outer/inner offset
     t = 0.05
-    return (
-        f'<line class="window-line" '
-        f'x1="{(sx + nx*t)*1000:.1f}" y1="{(sy + ny*t)*1000:.1f}" '
-        f'x2="{(ex + nx*t)*1000:.1f}" y2="{(ey + ny*t)*1000:.1f}" '
-        f'data-element-id="{o.id}" data-kind="window"/>'
-        f'<line class="window-mid" '
-        f'x1="{sx*1000:.1f}" y1="{sy*1000:.1f}" '
-        f'x2="{ex*1000:.1f}" y2="{ey*1000:.1f}"/>'
-        f'<line class="window-line" '
-        f'x1="{(sx - nx*t)*1000:.1f}" y1="{(sy - ny*t)*1000:.1f}" '
-        f'x2="{(ex - nx*t)*1000:.1f}" y2="{(ey - ny*t)*1000:.1f}"/>'
-    )
+    return [
+        Line((sx + nx * t) * 1000, (sy + ny * t) * 1000, (ex + nx * t) * 1000, (ey + ny * t) * 1000,
+             'window-line', attrs={'data-element-id': o.id, 'data-kind': 'window'}),
+        Line(sx * 1000, sy * 1000, ex * 1000, ey * 1000, 'window-mid'),
+        Line((sx - nx * t) * 1000, (sy - ny * t) * 1000, (ex - nx * t) * 1000, (ey - ny * t) * 1000,
+             'window-line'),
+    ]
 
 
 def _derive_grid(b: Building, storey: Storey) -> dict:
@@ -371,59 +322,35 @@ def _derive_grid(b: Building, storey: Storey) -> dict:
     }
 
 
-def _grid_strings(grid: dict, minx, miny, maxx, maxy) -> str:
-    """Render grid lines + the round letter/number bubbles at their ends."""
-    parts: list[str] = []
+def _grid_items(grid: dict, minx, miny, maxx, maxy) -> list:
+    """Grid lines + the round letter/number bubbles at their ends."""
+    items: list = []
     # Extension beyond the bounding rectangle so grid lines stick out
     ext = 1.2  # metres
-    bubble_r = 360                          # mm in viewBox space
+    bubble_r = 360                          # mm
+
+    def bubble(x, y, name):
+        items.append(Circle(x, y, bubble_r, 'grid-bubble'))
+        items.append(Text(x, y, name, 'grid-text'))
 
-    # Vertical grid lines (named A, B, C — drawn top-to-bottom)
+    # Vertical grid lines (named A, B, C) with a bubble at each end
     for v in grid['verticals']:
         x = v['x'] * 1000
-        parts.append(
-            f'<line class="grid-line" x1="{x:.1f}" y1="{(miny - ext)*1000:.1f}" '
-            f'x2="{x:.1f}" y2="{(maxy + ext)*1000:.1f}"/>'
-        )
-        # Bubble at the top of the line
-        cy_top = (maxy + ext) * 1000 + bubble_r
-        parts.append(
-            f'<circle class="grid-bubble" cx="{x:.1f}" cy="{cy_top:.1f}" r="{bubble_r}"/>'
-            f'<g transform="translate({x:.1f},{cy_top:.1f}) scale(1,-1)">'
-            f'<text class="grid-text">{_esc(v["name"])}</text></g>'
-        )
-        # Bubble at the bottom
-        cy_bot = (miny - ext) * 1000 - bubble_r
-        parts.append(
-            f'<circle class="grid-bubble" cx="{x:.1f}" cy="{cy_bot:.1f}" r="{bubble_r}"/>'
-            f'<g transform="translate({x:.1f},{cy_bot:.1f}) scale(1,-1)">'
-            f'<text class="grid-text">{_esc(v["name"])}</text></g>'
-        )
-
-    # Horizontal grid lines (named 1, 2, 3 — left-to-right)
+        items.append(Line(x, (miny - ext) * 1000, x, (maxy + ext) * 1000, 'grid-line'))
+        bubble(x, (maxy + ext) * 1000 + bubble_r, v['name'])
+        bubble(x, (miny - ext) * 1000 - bubble_r, v['name'])
+
+    # Horizontal grid lines (named 1, 2, 3)
     for h in grid['horizontals']:
         y = h['y'] * 1000
-        parts.append(
-            f'<line class="grid-line" x1="{(minx - ext)*1000:.1f}" y1="{y:.1f}" '
-            f'x2="{(maxx + ext)*1000:.1f}" y2="{y:.1f}"/>'
-        )
-        cx_l = (minx - ext) * 1000 - bubble_r
-        parts.append(
-            f'<circle class="grid-bubble" cx="{cx_l:.1f}" cy="{y:.1f}" r="{bubble_r}"/>'
-            f'<g transform="translate({cx_l:.1f},{y:.1f}) scale(1,-1)">'
-            f'<text class="grid-text">{_esc(h["name"])}</text></g>'
-        )
-        cx_r = (maxx + ext) * 1000 + bubble_r
-        parts.append(
-            f'<circle class="grid-bubble" cx="{cx_r:.1f}" cy="{y:.1f}" r="{bubble_r}"/>'
-            f'<g transform="translate({cx_r:.1f},{y:.1f}) scale(1,-1)">'
-            f'<text class="grid-text">{_esc(h["name"])}</text></g>'
-        )
-    return '\n'.join(parts)
+        items.append(Line((minx - ext) * 1000, y, (maxx + ext) * 1000, y, 'grid-line'))
+        bubble((minx - ext) * 1000 - bubble_r, y, h['name'])
+        bubble((maxx + ext) * 1000 + bubble_r, y, h['name'])
+    return items
 
 
 def _dim_chain(values: list[float], y_or_x: float, axis: str,
-                offset_levels: list[float], chain_levels: int = 3) -> list[str]:
+                offset_levels: list[float], chain_levels: int = 3) -> list:
     """Generate one dimension string set along an axis. `values` are the
     cut points (sorted); we draw three rows of dim chains stacked outside:
 
@@ -434,41 +361,32 @@ def _dim_chain(values: list[float], y_or_x: float, axis: str,
     """
     if len(values) < 2:
         return []
-    parts: list[str] = []
+    items: list = []
 
     def _render(level_idx: int, segments: list[tuple[float, float, str]]):
         """Draw one dim chain row at `offset_levels[level_idx]`."""
         off = offset_levels[level_idx]
+        cls = 'dim-text-overall' if level_idx == len(offset_levels) - 1 else 'dim-text'
         if axis == 'horizontal':
             # Drawn below the building (y = y_or_x - off)
             y = (y_or_x - off) * 1000
             for v_start, v_end, label in segments:
                 x1 = v_start * 1000
                 x2 = v_end * 1000
-                parts.append(f'<line class="dim-line" x1="{x1:.1f}" y1="{y:.1f}" '
-                              f'x2="{x2:.1f}" y2="{y:.1f}"/>')
+                items.append(Line(x1, y, x2, y, 'dim-line'))
                 # Slash ticks at each end (architectural convention)
                 for xt in (x1, x2):
-                    parts.append(f'<line class="dim-cross" x1="{xt-90:.1f}" y1="{y-90:.1f}" '
-                                  f'x2="{xt+90:.1f}" y2="{y+90:.1f}"/>')
-                cx = (x1 + x2) / 2
-                cls = 'dim-text-overall' if level_idx == len(offset_levels) - 1 else 'dim-text'
-                parts.append(f'<g transform="translate({cx:.1f},{y - 110:.1f}) scale(1,-1)">'
-                              f'<text class="{cls}">{label}</text></g>')
+                    items.append(Line(xt - 90, y - 90, xt + 90, y + 90, 'dim-cross'))
+                items.append(Text((x1 + x2) / 2, y - 110, label, cls))
         else:                               # vertical (right of building)
             x = (y_or_x + off) * 1000
             for v_start, v_end, label in segments:
                 y1 = v_start * 1000
                 y2 = v_end * 1000
-                parts.append(f'<line class="dim-line" x1="{x:.1f}" y1="{y1:.1f}" '
-                              f'x2="{x:.1f}" y2="{y2:.1f}"/>')
+                items.append(Line(x, y1, x, y2, 'dim-line'))
                 for yt in (y1, y2):
-                    parts.append(f'<line class="dim-cross" x1="{x-90:.1f}" y1="{yt-90:.1f}" '
-                                  f'x2="{x+90:.1f}" y2="{yt+90:.1f}"/>')
-                cy = (y1 + y2) / 2
-                cls = 'dim-text-overall' if level_idx == len(offset_levels) - 1 else 'dim-text'
-                parts.append(f'<g transform="translate({x + 220:.1f},{cy:.1f}) scale(1,-1) rotate(90)">'
-                              f'<text class="{cls}">{label}</text></g>')
+                    items.append(Line(x - 90, yt - 90, x + 90, yt + 90, 'dim-cross'))
+                items.append(Text(x + 220, (y1 + y2) / 2, label, cls, rotate=90))
 
     # Row 0: every adjacent segment
     seg0 = []
@@ -498,15 +416,15 @@ def _dim_chain(values: list[float], y_or_x: float, axis: str,
     if overall > 0.001:
         _render(len(offset_levels) - 1, [(values[0], values[-1], f'{overall:.2f} m')])
 
-    return parts
+    return items
 
 
 def _dimension_chains(b: Building, storey: Storey, grid: dict,
-                       minx, miny, maxx, maxy) -> str:
+                       minx, miny, maxx, maxy) -> list:
     """Three-tier dimension chains on the south (running x) and east (running y)
     of the building. Tier 0 = segments between adjacent grid lines. Tier 1 =
     bay groupings. Tier 2 = overall dimension."""
-    parts: list[str] = []
+    items: list = []
     # Pull the grid x-values + opening positions on the south wall for tier 0
     xs = sorted({round(v['x'], 2) for v in grid['verticals']} |
                   {round(p.x, 2) for w in storey.walls for p in w.points})
@@ -543,16 +461,16 @@ def _dimension_chains(b: Building, storey: Storey, grid: dict,
     # Three offset levels stacked outside the building
     offset_levels = [1.6, 2.6, 3.8]         # metres (closest, middle, overall)
 
-    parts.extend(_dim_chain(xs, miny, 'horizontal', offset_levels))
-    parts.extend(_dim_chain(ys, maxx, 'vertical',   offset_levels))
-    return '\n'.join(parts)
+    items.extend(_dim_chain(xs, miny, 'horizontal', offset_levels))
+    items.extend(_dim_chain(ys, maxx, 'vertical',   offset_levels))
+    return items
 
 
-def _mark_callouts(b: Building, storey: Storey) -> str:
+def _mark_callouts(b: Building, storey: Storey) -> list:
     """Door / window mark callouts: a leader line from the opening centre to a
     coloured circle with the mark text (D-001, W-001) — keyed back to the door
     and window schedules so a reader can cross-reference."""
-    parts: list[str] = []
+    items: list = []
     wall_by_id = {w.id: w for w in storey.walls}
 
     door_idx = window_idx = 0
@@ -591,20 +509,14 @@ def _mark_callouts(b: Building, storey: Storey) -> str:
             text_cls = 'mark-window'
 
         # Leader line from opening centre to bubble
-        parts.append(
-            f'<line class="mark-leader" x1="{cx*1000:.1f}" y1="{cy*1000:.1f}" '
-            f'x2="{bcx*1000:.1f}" y2="{bcy*1000:.1f}"/>'
-        )
-        parts.append(
-            f'<circle class="{bubble_cls}" cx="{bcx*1000:.1f}" cy="{bcy*1000:.1f}" r="{bubble_r}"/>'
-            f'<g transform="translate({bcx*1000:.1f},{bcy*1000:.1f}) scale(1,-1)">'
-            f'<text class="mark-text {text_cls}">{_esc(mark)}</text></g>'
-        )
+        items.append(Line(cx * 1000, cy * 1000, bcx * 1000, bcy * 1000, 'mark-leader'))
+        items.append(Circle(bcx * 1000, bcy * 1000, bubble_r, bubble_cls))
+        items.append(Text(bcx * 1000, bcy * 1000, mark, f'mark-text {text_cls}'))
 
-    return '\n'.join(parts)
+    return items
 
 
-def _section_markers(b: Building, storey: Storey, minx, miny, maxx, maxy) -> str:
+def _section_markers(b: Building, storey: Storey, minx, miny, maxx, maxy) -> list:
     """Render any named section cut lines stored on Building.metadata.sections.
     Default: the building has none (the user adds them later via UI). For a
     sensible default, emit one A-A horizontal cut through the middle so the
@@ -617,7 +529,7 @@ def _section_markers(b: Building, storey: Storey, minx, miny, maxx, maxy) -> str
                       'p1': {'x': minx - 0.6, 'y': (miny + maxy) / 2.0},
                       'p2': {'x': maxx + 0.6, 'y': (miny + maxy) / 2.0}}]
 
-    parts: list[str] = []
+    items: list = []
     bubble_r = 380
     for sec in sections:
         try:
@@ -627,39 +539,30 @@ def _section_markers(b: Building, storey: Storey, minx, miny, maxx, maxy) -> str
         except Exception:
             continue
         # The cut line itself
-        parts.append(
-            f'<line class="sec-line" x1="{x1*1000:.1f}" y1="{y1*1000:.1f}" '
-            f'x2="{x2*1000:.1f}" y2="{y2*1000:.1f}"/>'
-        )
+        items.append(Line(x1 * 1000, y1 * 1000, x2 * 1000, y2 * 1000, 'sec-line'))
         # End bubbles labelled "A-A"
         for (bx, by) in ((x1, y1), (x2, y2)):
-            parts.append(
-                f'<circle class="sec-bubble" cx="{bx*1000:.1f}" cy="{by*1000:.1f}" r="{bubble_r}"/>'
-                f'<g transform="translate({bx*1000:.1f},{by*1000:.1f}) scale(1,-1)">'
-                f'<text class="sec-text">{_esc(name)}-{_esc(name)}</text></g>'
-            )
-    return '\n'.join(parts)
+            items.append(Circle(bx * 1000, by * 1000, bubble_r, 'sec-bubble'))
+            items.append(Text(bx * 1000, by * 1000, f'{name}-{name}', 'sec-text'))
+    return items
 
 
-def _title_block(b: Building, storey: Storey, minx, miny, maxx, maxy) -> str:
-    """Bottom-of-sheet title block with project, storey, scale, date."""
-    # Anchor in viewBox space: full-width strip below the floor plan.
+def _title_block(b: Building, storey: Storey, minx, miny, maxx, maxy) -> list:
+    """Title band with project, storey, GFA and schema version, hung just
+    below the padded extent (0.3 m under its lower edge)."""
+    x0 = minx * 1000
+    top = (miny - 0.3) * 1000
     vw = (maxx - minx) * 1000
-    vh = (maxy - miny) * 1000
     band_h = 240
-    return (
-        f'<g transform="translate({minx*1000:.1f},{(maxy + 0.3)*1000:.1f})">'
-        f'<rect class="title-bg" x="0" y="0" width="{vw}" height="{band_h}"/>'
-        f'<text class="title-tx" x="40" y="120">{_esc(b.name)}</text>'
-        f'<text class="title-sub" x="40" y="200">'
-        f'{_esc(storey.name)}  ·  GFA {b.gross_floor_area_m2:.1f} m²  ·  '
-        f'{_esc(b.metadata.get("style","").replace("_"," "))}'
-        f'</text>'
-        f'<text class="title-sub" x="{vw - 40}" y="120" text-anchor="end">EMERSON EIMS</text>'
-        f'<text class="title-sub" x="{vw - 40}" y="200" text-anchor="end">'
-        f'BIM model · schema v{b.schema_version}</text>'
-        f'</g>'
-    )
+    return [
+        Polygon([(x0, top), (x0 + vw, top), (x0 + vw, top - band_h), (x0, top - band_h)], 'title-bg'),
+        Text(x0 + 40, top - 120, b.name, 'title-tx'),
+        Text(x0 + 40, top - 200,
+             f'{storey.name}  ·  GFA {b.gross_floor_area_m2:.1f} m²  ·  '
+             f'{b.metadata.get("style", "").replace("_", " ")}', 'title-sub'),
+        Text(x0 + vw - 40, top - 120, 'EMERSON EIMS', 'title-sub-end'),
+        Text(x0 + vw - 40, top - 200, f'BIM model · schema v{b.schema_version}', 'title-sub-end'),
+    ]
 
 
 def _space_colour(program: str) -> str:
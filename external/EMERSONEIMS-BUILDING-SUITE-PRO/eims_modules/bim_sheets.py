@@ -11,8 +11,10 @@ Public surface:
     build_sheet_pack_pdf(pack, project_meta)  -> bytes (multi-page PDF)
     render_sheet_preview_svg(sheet, ...)      -> str  (single-sheet SVG for UI)
 
-The compositor uses reportlab + svglib (already in requirements.txt). Floor
-plan SVGs come straight from `bim_renderer.floor_plan_svg`; schedules come
+The compositor uses reportlab (already in requirements.txt). Floor plans
+come straight from `bim_renderer.floor_plan_ir` as a drawing IR and are drawn
+directly onto the PDF canvas — no SVG serialise/parse round-trip; svglib is
+only used for views that carry a ready-made SVG string. Schedules come
 straight from `bim_schedules`. The compositor never re-derives geometry —
 it just lays prepared views onto paper-sized pages with a title block.
 """
@@ -23,10 +25,11 @@ import datetime as _dt
 import io
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from .bim_model import Building
-from .bim_renderer import floor_plan_svg
+from .bim_renderer import floor_plan_ir
+from .drawing_ir import draw_on_canvas
 from .bim_schedules import all_schedules
 
 logger = logging.getLogger('eims.bim.sheets')
@@ -57,9 +60,10 @@ class View:
     """One drawing/table on a sheet.
 
     `kind` decides the renderer:
-      - 'plan'     : data['svg']   = SVG string (uses _draw_svg_view)
+      - 'plan'     : data['drawing'] = drawing_ir.Drawing, or data['svg'] =
+                     SVG string (uses _draw_plan_view)
       - 'schedule' : data['rows']  = list of dict rows + data['columns']
-      - 'cover'    : data has project info + key_plan_svg
+      - 'cover'    : data has project info + key_plan (Drawing) or key_plan_svg
       - 'boq'      : data['rows'] (NRM-style summary)
       - 'note'     : data['lines'] = list of strings (general notes / legend)
 
@@ -141,6 +145,10 @@ def default_sheet_pack(b: Building) -> SheetPack:
         },
     )
 
+    # Each storey's plan is built once; the cover's key plan reuses the
+    # ground floor rather than rendering it a second time.
+    plans = [floor_plan_ir(b, storey_index=i) for i in range(len(b.storeys))]
+
     # ----- Cover sheet (A-001) -----
     cover_view = View(name='Cover', kind='cover', bbox_mm=(0, 0, 0, 0), data={
         'project_name': b.name,
@@ -153,20 +161,18 @@ def default_sheet_pack(b: Building) -> SheetPack:
         'openings':      len(b.all_openings()),
         'spaces':        len(b.all_spaces()),
         # Mini key plan = ground-floor plan rendered small
-        'key_plan_svg':  floor_plan_svg(b, storey_index=0, width_px=600)
-                          if b.storeys else '',
+        'key_plan':      plans[0] if plans else None,
     })
     pack.sheets.append(Sheet(number='A-001', title='COVER & PROJECT INFO',
                               views=[cover_view]))
 
     # ----- One floor-plan sheet per storey (A-101, A-102, ...) -----
     for i, s in enumerate(b.storeys):
-        plan_svg = floor_plan_svg(b, storey_index=i, width_px=900)
         w_m, d_m = _building_bbox(b, i)
         pack.sheets.append(Sheet(
             number=f'A-{101 + i}',
             title=f'{s.name.upper()} FLOOR PLAN',
-            views=[View(name=s.name, kind='plan', data={'svg': plan_svg,
+            views=[View(name=s.name, kind='plan', data={'drawing': plans[i],
                                                           'building_w_m': w_m,
                                                           'building_d_m': d_m})],
         ))
@@ -241,11 +247,13 @@ def sheet_pack_to_metadata(pack: SheetPack) -> dict:
 # ---------------------------------------------------------------------------
 
 def build_sheet_pack_pdf(pack: SheetPack,
-                          project_meta: Optional[dict] = None) -> bytes:
+                          project_meta: Optional[dict] = None,
+                          progress: Optional[Callable[[float, str], None]] = None) -> bytes:
     """Render the entire pack as a multi-page PDF.
 
     One page per sheet, sized to the sheet's paper. Title block is drawn on
     the right margin of every page; the view area sits on the left.
+    `progress(pct, stage)` is called before each sheet (background jobs).
     """
     try:
         from reportlab.pdfgen import canvas
@@ -270,7 +278,9 @@ def build_sheet_pack_pdf(pack: SheetPack,
     c = canvas.Canvas(buf, pagesize=(PAPER_SIZES_MM[DEFAULT_PAPER][0] * mm,
                                        PAPER_SIZES_MM[DEFAULT_PAPER][1] * mm))
 
-    for sheet in pack.sheets:
+    for n, sheet in enumerate(pack.sheets):
+        if progress:
+            progress(100.0 * n / len(pack.sheets), f'sheet {sheet.number}')
         paper = PAPER_SIZES_MM.get(sheet.paper, PAPER_SIZES_MM[DEFAULT_PAPER])
         c.setPageSize((paper[0] * mm, paper[1] * mm))
 
@@ -305,7 +315,7 @@ def build_sheet_pack_pdf(pack: SheetPack,
         _draw_title_block(c, sheet_w_mm - tb_w_mm - margin_mm,
                            margin_mm, tb_w_mm, sheet_h_mm - 2 * margin_mm,
                            sheet=sheet, project_meta=project_meta,
-                           sheet_index=pack.sheets.index(sheet) + 1,
+                           sheet_index=n + 1,
                            sheet_total=len(pack.sheets))
         c.showPage()
 
@@ -319,7 +329,7 @@ def build_sheet_pack_pdf(pack: SheetPack,
 
 def _render_view(c, v: View, sheet_h_mm: float) -> None:
     if v.kind == 'plan':
-        _draw_svg_view(c, v, sheet_h_mm)
+        _draw_plan_view(c, v, sheet_h_mm)
     elif v.kind == 'schedule':
         _draw_table_view(c, v, sheet_h_mm,
                           totals=v.data.get('totals'),
@@ -360,14 +370,12 @@ def _draw_border(c, sheet_w_mm: float, sheet_h_mm: float, margin_mm: float) -> N
     c.restoreState()
 
 
-def _draw_svg_view(c, v: View, sheet_h_mm: float) -> None:
-    """Place an SVG inside the view's bbox, scaling to fit, anchored at top-left.
+def _draw_plan_view(c, v: View, sheet_h_mm: float) -> None:
+    """Place a plan inside the view's bbox, scaling to fit, anchored at top-left.
     Picks an architectural scale (1:50, 1:100, ...) and writes a 'SCALE 1:N' label.
     """
     from reportlab.lib.units import mm
     from reportlab.lib import colors
-    from reportlab.graphics import renderPDF
-    from svglib.svglib import svg2rlg
 
     x_mm, y_mm, w_mm, h_mm = v.bbox_mm
     # Reserve top 10mm for view title + scale label
@@ -375,19 +383,54 @@ def _draw_svg_view(c, v: View, sheet_h_mm: float) -> None:
     avail_w = w_mm - 2.0
     avail_h = h_mm - title_band - 2.0
 
-    # Decide scale based on the building's actual dims (the SVG is in mm units
-    # in its viewBox so scaling math reduces to a ratio).
+    # Decide scale based on the building's actual dims (plans are drawn in
+    # mm units so scaling math reduces to a ratio).
     bw = float(v.data.get('building_w_m') or 0) or 10.0
     bd = float(v.data.get('building_d_m') or 0) or 10.0
     scale = _choose_scale(bw, bd, avail_w, avail_h)
     v.scale_denom = scale
 
-    svg_str = v.data.get('svg', '')
-    if not svg_str:
+    drawing = v.data.get('drawing')
+    if drawing is not None:
+        minx, miny, maxx, maxy = drawing.extent
+        dw, dh = maxx - minx, maxy - miny
+        fit = min(avail_w / dw, avail_h / dh) if dw > 0 and dh > 0 else 1.0
+        drawn_w_mm, drawn_h_mm = dw * fit, dh * fit
+        draw_x_mm = x_mm + max(0, (avail_w - drawn_w_mm) / 2.0) + 1.0
+        draw_y_bot_mm = y_mm + title_band + 1.0 + drawn_h_mm
+        draw_on_canvas(c, drawing, x_pt=draw_x_mm * mm,
+                       y_pt=(sheet_h_mm - draw_y_bot_mm) * mm, scale=fit * mm)
+    elif v.data.get('svg'):
+        if not _draw_svg(c, v, sheet_h_mm, avail_w, avail_h, title_band):
+            return
+    else:
         return
 
+    # Title strip
+    c.saveState()
+    c.setFillColor(colors.black)
+    c.setFont('Helvetica-Bold', 9)
+    title_y_pdf = (sheet_h_mm - y_mm - 6) * mm
+    c.drawString((x_mm + 1) * mm, title_y_pdf, v.name.upper())
+    c.setFont('Helvetica', 8)
+    c.drawRightString((x_mm + w_mm - 1) * mm, title_y_pdf,
+                      f'SCALE 1:{scale}')
+    c.restoreState()
+
+
+def _draw_svg(c, v: View, sheet_h_mm: float, avail_w: float, avail_h: float,
+              title_band: float) -> bool:
+    """Legacy path for views that only carry an SVG string: parse it with
+    svglib and draw the result. Returns False if the SVG could not be parsed
+    (a placeholder is drawn instead)."""
+    from reportlab.lib.units import mm
+    from reportlab.lib import colors
+    from reportlab.graphics import renderPDF
+    from svglib.svglib import svg2rlg
+
+    x_mm, y_mm, w_mm, h_mm = v.bbox_mm
     try:
-        drawing = svg2rlg(io.StringIO(svg_str))
+        drawing = svg2rlg(io.StringIO(v.data['svg']))
     except Exception as e:
         logger.warning('svg2rlg failed for view %s: %s — drawing placeholder', v.name, e)
         c.saveState()
@@ -397,10 +440,10 @@ def _draw_svg_view(c, v: View, sheet_h_mm: float) -> None:
         c.setFont('Helvetica', 8); c.setFillColor(colors.grey)
         c.drawString((x_mm + 4) * mm, py + h_mm * mm / 2, '[SVG render failed]')
         c.restoreState()
-        return
+        return False
 
     # svg2rlg drawing is sized in pt (1pt = 0.3528mm). Compute a scale factor
-    # that fits the drawing into the available rect; also enforce architectural scale.
+    # that fits the drawing into the available rect.
     dw_pt = drawing.width or 1
     dh_pt = drawing.height or 1
     # Convert pt -> mm
@@ -423,17 +466,7 @@ def _draw_svg_view(c, v: View, sheet_h_mm: float) -> None:
     draw_y_pdf = (sheet_h_mm - draw_y_bot_mm) * mm
 
     renderPDF.draw(drawing, c, draw_x_mm * mm, draw_y_pdf)
-
-    # Title strip
-    c.saveState()
-    c.setFillColor(colors.black)
-    c.setFont('Helvetica-Bold', 9)
-    title_y_pdf = (sheet_h_mm - y_mm - 6) * mm
-    c.drawString((x_mm + 1) * mm, title_y_pdf, v.name.upper())
-    c.setFont('Helvetica', 8)
-    c.drawRightString((x_mm + w_mm - 1) * mm, title_y_pdf,
-                      f'SCALE 1:{scale}')
-    c.restoreState()
+    return True
 
 
 def _draw_table_view(c, v: View, sheet_h_mm: float,
@@ -565,14 +598,15 @@ def _draw_cover_view(c, v: View, sheet_h_mm: float) -> None:
     c.restoreState()
 
     # Key plan
+    key_plan = v.data.get('key_plan')
     key_svg = v.data.get('key_plan_svg', '')
-    if key_svg:
+    if key_plan is not None or key_svg:
         kp_view = View(name='KEY PLAN', kind='plan',
-                        data={'svg': key_svg,
+                        data={'drawing': key_plan, 'svg': key_svg,
                               'building_w_m': 20.0, 'building_d_m': 15.0},
                         bbox_mm=(x_mm, y_mm + 70, w_mm, h_mm - 90))
         try:
-            _draw_svg_view(c, kp_view, sheet_h_mm)
+            _draw_plan_view(c, kp_view, sheet_h_mm)
         except Exception as e:
             logger.warning('cover key plan failed: %s', e)
 
@@ -34,60 +34,57 @@ storey base elevation. three.js expects Y up. We map:
     BIM .points[i].x  →  three.js  x
     BIM .points[i].y  →  three.js  z          (negate is optional; we keep +z = +y for clarity)
     BIM level + h/2   →  three.js  y          (centre of geometry)
+
+Binary glTF
+-----------
+`building_to_glb` writes the same objects as a .glb through gltf_writer:
+one unit box shared by every element, with walls, openings, slabs and
+columns as EXT_mesh_gpu_instancing instances grouped by material. Both
+outputs come from the same `_*_row` tuples, so they can't drift apart.
+Instance ids (`extras.ids` on each node) carry the bim_element_id.
 """
 
 from __future__ import annotations
 
 import math
-from typing import Any
+from typing import Any, Optional
+
+import numpy as np
 
 from .bim_model import Building, Wall, Slab, Opening
+from .gltf_writer import GlbWriter, euler_to_quat
+
+# (type, size, position, yaw_deg, color, material, transparent, name, element_id)
+Row = tuple
+
+_WALL_STYLE = {'external': (0xeae0d0, 'masonry'), 'shear': (0xc7b89c, 'concrete')}
+_PARTITION_STYLE = (0xf2eee5, 'masonry')
 
 
-def _wall_object(b: Building, w: Wall, level_m: float) -> dict:
-    """One wall → one box mesh oriented along the wall's direction."""
+def _wall_row(b: Building, w: Wall, level_m: float) -> Optional[Row]:
+    """One wall → one box oriented along the wall's direction."""
     if len(w.points) < 2:
-        return {}
+        return None
     p0 = w.points[0]
     p1 = w.points[-1]
     length = math.hypot(p1.x - p0.x, p1.y - p0.y)
     type_def = b.types.walls.get(w.type_name)
     thickness = type_def.thickness_m if type_def else 0.1
     height = w.height_m
-
-    cx = (p0.x + p1.x) / 2.0
-    cy_plan = (p0.y + p1.y) / 2.0
     angle_deg = math.degrees(math.atan2(p1.y - p0.y, p1.x - p0.x))
+    color, material = _WALL_STYLE.get(w.structural_role, _PARTITION_STYLE)
+    return ('box', [length, height, thickness],
+            [(p0.x + p1.x) / 2.0, level_m + height / 2.0, (p0.y + p1.y) / 2.0],
+            -angle_deg,                                   # rotate around Y (up)
+            color, material, False, f'wall_{w.id}', w.id)
 
-    if w.structural_role == 'external':
-        color = 0xeae0d0
-        material = 'masonry'
-    elif w.structural_role == 'shear':
-        color = 0xc7b89c
-        material = 'concrete'
-    else:
-        color = 0xf2eee5
-        material = 'masonry'
 
-    return {
-        'type': 'box',
-        'size': [length, height, thickness],
-        'position': [cx, level_m + height / 2.0, cy_plan],
-        'rotation': {'x': 0, 'y': -angle_deg, 'z': 0},   # rotate around Y (up)
-        'color': color,
-        'material': material,
-        'transparent': False,
-        'name': f'wall_{w.id}',
-        'bim_element_id': w.id,
-    }
-
-
-def _slab_object(b: Building, sl: Slab, level_m: float) -> dict:
+def _slab_row(b: Building, sl: Slab, level_m: float) -> Optional[Row]:
     """Slab → flat box at the boundary's bbox (parametric layout uses rectangles
     so this is exact; once non-rectangular slabs land, switch to ExtrudeGeometry
     on the client)."""
     if len(sl.boundary) < 3:
-        return {}
+        return None
     xs = [p.x for p in sl.boundary]
     ys = [p.y for p in sl.boundary]
     minx, maxx = min(xs), max(xs)
@@ -102,19 +99,13 @@ def _slab_object(b: Building, sl: Slab, level_m: float) -> dict:
         color = 0xb8b8b8
         y_centre = level_m - thickness / 2.0   # floor slab top sits at storey datum
 
-    return {
-        'type': 'box',
-        'size': [maxx - minx, thickness, maxy - miny],
-        'position': [(minx + maxx) / 2.0, y_centre, (miny + maxy) / 2.0],
-        'color': color,
-        'material': 'concrete' if sl.role != 'roof' else 'roof',
-        'transparent': False,
-        'name': f'{sl.role}_{sl.id}',
-        'bim_element_id': sl.id,
-    }
+    return ('box', [maxx - minx, thickness, maxy - miny],
+            [(minx + maxx) / 2.0, y_centre, (miny + maxy) / 2.0], None,
+            color, 'concrete' if sl.role != 'roof' else 'roof', False,
+            f'{sl.role}_{sl.id}', sl.id)
 
 
-def _opening_object(b: Building, host: Wall, o: Opening, level_m: float) -> dict | None:
+def _opening_row(b: Building, host: Wall, o: Opening, level_m: float) -> Optional[Row]:
     """Door/window → translucent inset on the host wall. Real openings would
     boolean-subtract the wall mesh; for v1 we add a thin glass-coloured panel
     in the wall plane that reads as an opening at a glance."""
@@ -150,20 +141,11 @@ def _opening_object(b: Building, host: Wall, o: Opening, level_m: float) -> dict
 
     type_def = b.types.walls.get(host.type_name)
     thickness = (type_def.thickness_m if type_def else 0.1) * 1.05  # poke through
-    return {
-        'type': 'box',
-        'size': [width, height, thickness],
-        'position': [cx, y_centre, cy],
-        'rotation': {'x': 0, 'y': -angle_deg, 'z': 0},
-        'color': color,
-        'material': material,
-        'transparent': transparent,
-        'name': f'{o.kind}_{o.id}',
-        'bim_element_id': o.id,
-    }
+    return ('box', [width, height, thickness], [cx, y_centre, cy], -angle_deg,
+            color, material, transparent, f'{o.kind}_{o.id}', o.id)
 
 
-def _column_object(c, level_m: float) -> dict:
+def _column_row(c, level_m: float) -> Row:
     # Column section like 'C300x300' → 0.3 × 0.3 m
     section = (c.section or '').upper()
     w = h = 0.3
@@ -174,35 +156,27 @@ def _column_object(c, level_m: float) -> dict:
             h = float(n[1]) / 1000.0
     except Exception:
         pass
-    return {
-        'type': 'box',
-        'size': [w, c.height_m, h],
-        'position': [c.point.x, level_m + c.height_m / 2.0, c.point.y],
-        'color': 0x9e9e9e,
-        'material': 'concrete',
-        'transparent': False,
-        'name': f'column_{c.id}',
-        'bim_element_id': c.id,
-    }
+    return ('box', [w, c.height_m, h], [c.point.x, level_m + c.height_m / 2.0, c.point.y],
+            None, 0x9e9e9e, 'concrete', False, f'column_{c.id}', c.id)
 
 
-def building_to_three(b: Building) -> dict:
-    objects: list[dict] = []
+def _rows(b: Building) -> tuple[list[Row], int, int]:
+    rows: list[Row] = []
     walls_n = openings_n = 0
 
     for storey in b.storeys:
         # 1. Slabs (floor + roof)
         for sl in storey.slabs:
-            obj = _slab_object(b, sl, storey.level_m + storey.height_m
-                                if sl.role == 'roof' else storey.level_m)
-            if obj:
-                objects.append(obj)
+            row = _slab_row(b, sl, storey.level_m + storey.height_m
+                            if sl.role == 'roof' else storey.level_m)
+            if row:
+                rows.append(row)
 
         # 2. Walls
         for w in storey.walls:
-            obj = _wall_object(b, w, storey.level_m)
-            if obj:
-                objects.append(obj)
+            row = _wall_row(b, w, storey.level_m)
+            if row:
+                rows.append(row)
                 walls_n += 1
 
         # 3. Openings (doors + windows) — drawn last so they paint over walls
@@ -211,25 +185,71 @@ def building_to_three(b: Building) -> dict:
             host = wall_by_id.get(o.wall_id)
             if not host:
                 continue
-            obj = _opening_object(b, host, o, storey.level_m)
-            if obj:
-                objects.append(obj)
+            row = _opening_row(b, host, o, storey.level_m)
+            if row:
+                rows.append(row)
                 openings_n += 1
 
         # 4. Columns
         for c in storey.columns:
-            objects.append(_column_object(c, storey.level_m))
+            rows.append(_column_row(c, storey.level_m))
+
+    return rows, walls_n, openings_n
+
+
+def _as_object(row: Row) -> dict:
+    kind, size, position, yaw, color, material, transparent, name, element_id = row
+    obj: dict[str, Any] = {'type': kind, 'size': size, 'position': position}
+    if yaw is not None:
+        obj['rotation'] = {'x': 0, 'y': yaw, 'z': 0}
+    obj.update(color=color, material=material, transparent=transparent,
+               name=name, bim_element_id=element_id)
+    return obj
+
 
+def _stats(b: Building, objects: int, walls_n: int, openings_n: int) -> dict:
+    return {
+        'objects':  objects,
+        'storeys':  len(b.storeys),
+        'walls':    walls_n,
+        'openings': openings_n,
+        'style':    b.metadata.get('style', '?'),
+        'name':     b.name,
+        'gross_floor_area_m2': round(b.gross_floor_area_m2, 2),
+    }
+
+
+def building_to_three(b: Building) -> dict:
+    rows, walls_n, openings_n = _rows(b)
     return {
         'success': True,
-        'model': {'objects': objects},
-        'stats': {
-            'objects':  len(objects),
-            'storeys':  len(b.storeys),
-            'walls':    walls_n,
-            'openings': openings_n,
-            'style':    b.metadata.get('style', '?'),
-            'name':     b.name,
-            'gross_floor_area_m2': round(b.gross_floor_area_m2, 2),
-        },
+        'model': {'objects': [_as_object(r) for r in rows]},
+        'stats': _stats(b, len(rows), walls_n, openings_n),
     }
+
+
+def building_to_glb(b: Building, *, instancing: bool = True,
+                    quantize: bool = True) -> GlbWriter:
+    """The building_to_three objects as a GlbWriter (see gltf_writer).
+    Materials follow addMesh: glass smooth and metallic, transparent
+    objects at 0.35 opacity. The stats dict rides in the asset extras."""
+    rows, walls_n, openings_n = _rows(b)
+    w = GlbWriter(instancing=instancing, quantize=quantize)
+    if rows:
+        position = np.array([r[2] for r in rows], float)
+        size = np.array([r[1] for r in rows], float)
+        yaw = np.array([r[3] or 0.0 for r in rows], float)
+        quat = euler_to_quat(0.0, yaw, 0.0)
+    groups: dict[tuple, list[int]] = {}
+    for i, row in enumerate(rows):
+        groups.setdefault(row[4:7], []).append(i)
+    for (color, material, transparent), ix in groups.items():
+        glass = material == 'glass'
+        mat = w.material(color, roughness=0.1 if glass else 0.75,
+                         metalness=0.8 if glass else 0.05,
+                         opacity=0.35 if transparent else 1.0, name=material)
+        w.add_many('box', mat, position[ix], size[ix],
+                   quat[ix] if yaw[ix].any() else None,
+                   ids=[rows[i][8] for i in ix])
+    w.extras = _stats(b, len(rows), walls_n, openings_n)
+    return w
@@ -0,0 +1,383 @@
+"""Spatial index for clash detection: uniform hash grid + numpy narrow phase.
+
+Broad phase
+-----------
+Every box is inflated by half the largest clearance that can apply to it,
+so two inflated boxes touch exactly when the originals are within that
+clearance. Boxes are dropped into a uniform 3D grid whose cell size follows
+the median element size (mean side length); any two boxes that share a
+cell become a candidate pair. The grid is built with array operations only (no per-element Python
+loop): cell keys are packed into one int64, sorted, and equal-key runs are
+paired by comparing the sorted array with itself shifted by 1, 2, ... until
+no run is that long. Boxes that would cover more than MAX_CELLS_PER_BOX
+cells (whole-floor slabs in a model of small fittings) are kept out of the
+grid and tested against everything in one vectorised pass each.
+
+Narrow phase
+------------
+Candidate pairs are tested together: per-axis gaps, the clearance required
+for each pair's system combination, overlap volumes and severities are all
+computed on arrays.
+
+Incremental mode
+----------------
+ClashIndex keeps the current clash set. ``update()`` re-inserts only the
+elements whose boxes (or systems) actually changed and re-tests just those
+against the rest of the model, returning the clashes that appeared and the
+ones that were resolved. A small change set costs O(k * n) array work with
+no Python loop over n; a large one falls back to a full grid rebuild.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('eims.clash_index')
+
+MAX_CELLS_PER_BOX = 4096
+# Re-test changed elements one by one below this share of the model;
+# above it a full rebuild through the grid is cheaper.
+INCREMENTAL_FRACTION = 1 / 32
+
+_KEY_BITS = 21
+_KEY_LIMIT = 1 << (_KEY_BITS - 1)
+
+
+# ============================================================================
+# Broad phase
+# ============================================================================
+
+def _cell_size(lo: np.ndarray, hi: np.ndarray) -> float:
+    # Mean side length, not the longest: beams and runs are long but thin,
+    # and a cell as long as a beam puts every neighbour in the same bucket.
+    extent = np.mean(hi - lo, axis=1)
+    cell = float(np.median(extent)) if len(extent) else 1.0
+    span = float(np.max(np.max(hi, axis=0) - np.min(lo, axis=0))) if len(lo) else 0.0
+    # Keep packed cell coordinates inside _KEY_BITS per axis.
+    return max(cell, span / _KEY_LIMIT, 1e-3)
+
+
+def _pair_codes(a: np.ndarray, b: np.ndarray, n: int) -> np.ndarray:
+    first = np.minimum(a, b)
+    second = np.maximum(a, b)
+    keep = first != second
+    return first[keep] * n + second[keep]
+
+
+def grid_pairs(lo: np.ndarray, hi: np.ndarray,
+               cell_size: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Candidate pairs ``(i, j)`` with ``i < j`` for boxes sharing a grid cell.
+
+    ``lo`` and ``hi`` are (n, 3) arrays of already-inflated boxes. The
+    result is a superset of the overlapping pairs, sorted and de-duplicated.
+    """
+    lo = np.asarray(lo, dtype=np.float64)
+    hi = np.asarray(hi, dtype=np.float64)
+    n = len(lo)
+    empty = np.empty(0, dtype=np.int64)
+    if n < 2:
+        return empty, empty
+    cell = cell_size or _cell_size(lo, hi)
+    origin = lo.min(axis=0)
+    imin = np.floor((lo - origin) / cell).astype(np.int64)
+    imax = np.floor((hi - origin) / cell).astype(np.int64)
+    dims = imax - imin + 1
+    counts = dims.prod(axis=1)
+
+    codes = []
+    big = np.flatnonzero(counts > MAX_CELLS_PER_BOX)
+    if len(big):
+        # Oversized boxes: one vectorised sweep over every other box each.
+        for b in big:
+            hit = np.flatnonzero(np.all((lo <= hi[b]) & (hi >= lo[b]), axis=1))
+            codes.append(_pair_codes(np.full(len(hit), b), hit, n))
+        counts[big] = 0
+
+    owners = np.repeat(np.arange(n, dtype=np.int64), counts)
+    if len(owners):
+        starts = np.cumsum(counts) - counts
+        t = np.arange(len(owners), dtype=np.int64) - np.repeat(starts, counts)
+        d = dims[owners]
+        iz = t % d[:, 2]
+        iy = (t // d[:, 2]) % d[:, 1]
+        ix = t // (d[:, 2] * d[:, 1])
+        base = imin[owners]
+        keys = (((base[:, 0] + ix) << (2 * _KEY_BITS))
+                | ((base[:, 1] + iy) << _KEY_BITS)
+                | (base[:, 2] + iz))
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        owners = owners[order]
+        shift = 1
+        while shift < len(keys):
+            same = np.flatnonzero(keys[:-shift] == keys[shift:])
+            if not len(same):
+                break
+            codes.append(_pair_codes(owners[same], owners[same + shift], n))
+            shift += 1
+
+    if not codes:
+        return empty, empty
+    pairs = np.concatenate(codes)
+    pairs.sort()
+    if len(pairs):
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return pairs // n, pairs % n
+
+
+# ============================================================================
+# Narrow phase helpers
+# ============================================================================
+
+def axis_gaps(lo: np.ndarray, hi: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Signed per-axis gaps (k, 3) between boxes i and j; negative = overlap."""
+    return np.maximum(lo[j] - hi[i], lo[i] - hi[j])
+
+
+def overlap_volumes(lo: np.ndarray, hi: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    d = np.minimum(hi[i], hi[j]) - np.maximum(lo[i], lo[j])
+    return np.clip(d, 0.0, None).prod(axis=1)
+
+
+def contacts(lo: Sequence, hi: Sequence, margin: float = 0.0,
+             groups: Optional[Sequence] = None) -> Tuple[np.ndarray, ...]:
+    """All box pairs within ``margin`` of each other on every axis.
+
+    If ``groups`` is given, pairs from the same group are skipped. Returns
+    ``(i, j, overlap_m3, gaps)`` sorted by ``(i, j)``; ``gaps`` holds the
+    signed per-axis gaps for callers with their own clearance rules.
+    """
+    lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+    hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+    pad = margin / 2 + 1e-9
+    i, j = grid_pairs(lo - pad, hi + pad)
+    if groups is not None and len(i):
+        g = np.asarray(groups)
+        keep = g[i] != g[j]
+        i, j = i[keep], j[keep]
+    gaps = axis_gaps(lo, hi, i, j)
+    keep = np.all(gaps <= margin, axis=1)
+    i, j, gaps = i[keep], j[keep], gaps[keep]
+    return i, j, overlap_volumes(lo, hi, i, j), gaps
+
+
+# ============================================================================
+# Rule-driven, incrementally updated index
+# ============================================================================
+
+class ClashIndex:
+    """Element boxes plus their current clash set, keyed by element id.
+
+    ``clearance_rules`` maps a (system, system) pair to the minimum clear
+    distance in metres (either order). Pairs in ``ignore_systems`` and pairs
+    of the same system *and* kind are expected adjacencies and never clash.
+    A clash is HARD when the boxes overlap and SOFT when they only violate
+    the clearance.
+    """
+
+    def __init__(self, clearance_rules: Mapping[Tuple[str, str], float],
+                 ignore_systems: Iterable[Tuple[str, str]] = ()):
+        self._rules = dict(clearance_rules)
+        self._ignore = {frozenset(p) for p in ignore_systems}
+        self._systems: Dict[str, int] = {}
+        self._kinds: Dict[str, int] = {}
+        self._clearance = np.zeros((0, 0))
+        self._ignored = np.zeros((0, 0), dtype=bool)
+        self._lo = np.zeros((0, 3))
+        self._hi = np.zeros((0, 3))
+        self._sys = np.zeros(0, dtype=np.int32)
+        self._kind = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._n = 0
+        self._ids: List[Optional[str]] = []
+        self._items: List[Any] = []
+        self._slot: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._clashes: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self._partners: Dict[int, Set[int]] = {}
+        self.pairs_tested = 0
+
+    # ---- bookkeeping ----
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, element_id: str) -> bool:
+        return element_id in self._slot
+
+    def _code(self, table: Dict[str, int], name: str) -> int:
+        code = table.get(name)
+        if code is None:
+            code = table[name] = len(table)
+            if table is self._systems:
+                self._rebuild_rules()
+        return code
+
+    def _rebuild_rules(self) -> None:
+        names = sorted(self._systems, key=self._systems.get)
+        m = len(names)
+        self._clearance = np.zeros((m, m))
+        self._ignored = np.zeros((m, m), dtype=bool)
+        for a, sa in enumerate(names):
+            for b, sb in enumerate(names):
+                self._clearance[a, b] = (self._rules.get((sa, sb))
+                                         or self._rules.get((sb, sa)) or 0.0)
+                self._ignored[a, b] = frozenset((sa, sb)) in self._ignore
+
+    def _grow(self, need: int) -> None:
+        cap = len(self._alive)
+        if need <= cap:
+            return
+        cap = max(need, cap * 2, 64)
+        extra = cap - len(self._alive)
+        self._lo = np.vstack([self._lo, np.zeros((extra, 3))])
+        self._hi = np.vstack([self._hi, np.zeros((extra, 3))])
+        self._sys = np.concatenate([self._sys, np.zeros(extra, dtype=np.int32)])
+        self._kind = np.concatenate([self._kind, np.zeros(extra, dtype=np.int32)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+
+    def _put(self, element_id: str, system: str, kind: str,
+             box: Sequence[float], item: Any) -> Optional[int]:
+        """Store one element; return its slot if geometry or type changed."""
+        lo, hi = box[:3], box[3:]
+        s, k = self._code(self._systems, system), self._code(self._kinds, kind)
+        slot = self._slot.get(element_id)
+        if slot is not None:
+            self._items[slot] = item
+            if (self._sys[slot] == s and self._kind[slot] == k
+                    and np.array_equal(self._lo[slot], lo) and np.array_equal(self._hi[slot], hi)):
+                return None
+        else:
+            if self._free:
+                slot = self._free.pop()
+                self._ids[slot], self._items[slot] = element_id, item
+            else:
+                slot = self._n
+                self._n += 1
+                self._grow(self._n)
+                self._ids.append(element_id)
+                self._items.append(item)
+            self._slot[element_id] = slot
+            self._alive[slot] = True
+        self._lo[slot], self._hi[slot] = lo, hi
+        self._sys[slot], self._kind[slot] = s, k
+        return slot
+
+    def _forget(self, slots: Iterable[int]) -> List[Tuple[int, int]]:
+        dropped = []
+        for s in slots:
+            for other in self._partners.pop(s, ()):
+                key = (s, other) if s < other else (other, s)
+                if self._clashes.pop(key, None) is not None:
+                    dropped.append(key)
+                partners = self._partners.get(other)
+                if partners is not None:
+                    partners.discard(s)
+        return dropped
+
+    def _record(self, i: np.ndarray, j: np.ndarray,
+                overlap: np.ndarray, clearance: np.ndarray) -> List[Tuple[int, int]]:
+        added = []
+        for a, b, v, c in zip(i.tolist(), j.tolist(), overlap.tolist(), clearance.tolist()):
+            key = (a, b) if a < b else (b, a)
+            if key in self._clashes:
+                continue
+            self._clashes[key] = (v, c)
+            self._partners.setdefault(a, set()).add(b)
+            self._partners.setdefault(b, set()).add(a)
+            added.append(key)
+        return added
+
+    # ---- clash testing ----
+
+    def _narrow(self, i: np.ndarray, j: np.ndarray) -> List[Tuple[int, int]]:
+        si, sj = self._sys[i], self._sys[j]
+        keep = ~self._ignored[si, sj] & ~((si == sj) & (self._kind[i] == self._kind[j]))
+        i, j = i[keep], j[keep]
+        self.pairs_tested += len(i)
+        clearance = self._clearance[self._sys[i], self._sys[j]]
+        gaps = axis_gaps(self._lo, self._hi, i, j)
+        hit = np.all(gaps <= clearance[:, None], axis=1)
+        i, j, clearance = i[hit], j[hit], clearance[hit]
+        overlap = overlap_volumes(self._lo, self._hi, i, j)
+        real = (overlap > 0.0) | (clearance > 0.0)
+        return self._record(i[real], j[real], overlap[real], clearance[real])
+
+    def _pad(self) -> np.ndarray:
+        reach = self._clearance.max(axis=1) if len(self._clearance) else np.zeros(0)
+        return reach[self._sys[:self._n]] / 2 + 1e-9
+
+    def rebuild(self) -> None:
+        """Recompute every clash through the grid broad phase."""
+        self._clashes.clear()
+        self._partners.clear()
+        self.pairs_tested = 0
+        live = np.flatnonzero(self._alive[:self._n])
+        pad = self._pad()[live][:, None]
+        i, j = grid_pairs(self._lo[live] - pad, self._hi[live] + pad)
+        self._narrow(live[i], live[j])
+
+    def _recheck(self, slots: List[int]) -> List[Tuple[int, int]]:
+        live = np.flatnonzero(self._alive[:self._n])
+        pad = self._pad()
+        lo, hi = self._lo[live] - pad[live, None], self._hi[live] + pad[live, None]
+        added = []
+        done: Set[int] = set()
+        for s in slots:
+            near = live[np.all((lo <= self._hi[s] + pad[s]) & (hi >= self._lo[s] - pad[s]), axis=1)]
+            # A pair of two changed elements is tested once, from the first.
+            near = near[(near != s) & ~np.isin(near, list(done))] if done else near[near != s]
+            added += self._narrow(np.full(len(near), s), near)
+            done.add(s)
+        return added
+
+    # ---- public API ----
+
+    def load(self, elements: Iterable[Tuple[str, str, str, Sequence[float], Any]]) -> 'ClashIndex':
+        """Insert ``(id, system, kind, (xmin, ymin, zmin, xmax, ymax, zmax), item)``
+        tuples and run a full clash pass. A repeated id replaces the earlier one."""
+        for element_id, system, kind, box, item in elements:
+            self._put(element_id, system, kind, box, item)
+        self.rebuild()
+        return self
+
+    def update(self, elements: Iterable[Tuple[str, str, str, Sequence[float], Any]] = (),
+               removed: Iterable[str] = ()) -> Dict[str, List[Tuple[str, str]]]:
+        """Upsert/remove elements and re-check only the ones that changed.
+
+        Returns ``{'added': [...], 'resolved': [...]}`` as (id_a, id_b) pairs.
+        """
+        changed = []
+        for element_id, system, kind, box, item in elements:
+            slot = self._put(element_id, system, kind, box, item)
+            if slot is not None:
+                changed.append(slot)
+        gone = [self._slot[e] for e in removed if e in self._slot]
+        resolved = {self._pair_ids(k) for k in self._forget(changed + gone)}
+        for slot in gone:
+            del self._slot[self._ids[slot]]
+            self._alive[slot] = False
+            self._ids[slot], self._items[slot] = None, None
+        self._free.extend(gone)
+        if len(changed) > max(1.0, len(self) * INCREMENTAL_FRACTION):
+            kept = set(map(self._pair_ids, self._clashes))
+            self.rebuild()
+            added = set(map(self._pair_ids, self._clashes)) - kept
+        else:
+            self.pairs_tested = 0
+            added = set(map(self._pair_ids, self._recheck(changed)))
+        return {'added': sorted(added - resolved), 'resolved': sorted(resolved - added)}
+
+    def _pair_ids(self, key: Tuple[int, int]) -> Tuple[str, str]:
+        return self._ids[key[0]], self._ids[key[1]]
+
+    def items(self) -> List[Any]:
+        return [self._items[s] for s in range(self._n) if self._alive[s]]
+
+    def clashes(self) -> List[Tuple[Any, Any, float, float]]:
+        """``(item_a, item_b, overlap_m3, clearance_m)`` in insertion order."""
+        return [(self._items[a], self._items[b], v, c)
+                for (a, b), (v, c) in sorted(self._clashes.items())]
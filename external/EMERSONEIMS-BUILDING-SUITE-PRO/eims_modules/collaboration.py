@@ -9,20 +9,33 @@ needs no central server licence.
   Heart-beat extends the lease.
 * **Presence** — who is currently looking at the project, what view, last
   seen. Stale entries (>2× heartbeat) auto-purged.
-* **Change feed** — every write op appends a row; long-poll endpoint
-  returns rows after `since_id`, blocking up to ~25 s for new events.
+* **Change feed** — every write op appends a row and is published on an
+  in-process ChangeBus. Clients follow it over Server-Sent Events
+  (``/api/collab/changes/stream``) or the long-poll endpoint; both resume
+  from ``last_id`` and wait on the bus, not on SQLite. A stream occupies a
+  server thread, so streams are as short as a long-poll and at most
+  ``EIMS_SSE_MAX_STREAMS`` are open at once; past that the stream endpoint
+  answers 503 and clients fall back to long-polling.
 
 All three primitives are persistent (survive restart) and require no extra
 dependencies.
+
+The bus is per process: subscribers see changes recorded by the same
+worker live, and anything else on their next resume (one DB read per
+(re)connect). Route a project's collaborators to one worker when running
+several.
 """
 
 from __future__ import annotations
 
+import collections
 import json
+import os
 import sqlite3
+import threading
 import time
 import uuid
-from typing import Any
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from eims_modules import logger
 
@@ -30,7 +43,11 @@ from eims_modules import logger
 DEFAULT_LOCK_TTL_S = 300        # 5 minutes
 PRESENCE_STALE_S = 60           # mark offline after 1 minute silence
 LONG_POLL_TIMEOUT_S = 25
-LONG_POLL_INTERVAL_S = 0.5
+REPLAY_BUFFER_SIZE = 256        # recent changes kept per project for resume
+STREAM_HEARTBEAT_S = 15         # SSE keep-alive comment interval
+STREAM_MAX_S = LONG_POLL_TIMEOUT_S   # streams end after this; clients resume by last_id
+STREAM_MAX_OPEN = int(os.environ.get('EIMS_SSE_MAX_STREAMS', '4'))   # per process
+TOPIC_IDLE_S = 600              # drop a topic's buffer after this long with no traffic or subscribers
 
 
 # ============================================================================
@@ -203,26 +220,252 @@ def presence(get_db, *, project_id: str) -> dict[str, Any]:
         conn.close()
 
 
+# ============================================================================
+# Change bus
+# ============================================================================
+
+class _Topic:
+    __slots__ = ('cond', 'writer', 'buffer', 'floor', 'subscribers', 'touched')
+
+    def __init__(self, size: int):
+        self.cond = threading.Condition()
+        # Held by a publisher from allocating an event id until it is
+        # published (ChangeBus.writer).
+        self.writer = threading.Lock()
+        self.buffer: collections.deque = collections.deque(maxlen=size)
+        # Every event with id > floor is in ``buffer``; None until the first
+        # publish tells us where this process's view of the topic starts.
+        self.floor: Optional[int] = None
+        self.subscribers = 0
+        self.touched = time.monotonic()
+
+
+class Subscription:
+    """A cursor into one topic. ``wait()`` blocks on the topic's condition."""
+
+    def __init__(self, bus: 'ChangeBus', key: str, topic: _Topic, last_id: int):
+        self.bus = bus
+        self.key = key
+        self.topic = topic
+        self.last_id = last_id
+        self.closed = False
+
+    def _pending(self) -> List[dict]:
+        return [e for e in self.topic.buffer if e['id'] > self.last_id]
+
+    def wait(self, timeout: Optional[float] = None) -> List[dict]:
+        """Events after the cursor, waiting up to ``timeout`` for the first one."""
+        topic = self.topic
+        with topic.cond:
+            if not self.closed and not (topic.buffer and topic.buffer[-1]['id'] > self.last_id):
+                topic.cond.wait_for(
+                    lambda: self.closed or (topic.buffer and topic.buffer[-1]['id'] > self.last_id),
+                    timeout)
+            events = [] if self.closed else self._pending()
+        if events:
+            self.last_id = events[-1]['id']
+        return events
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ChangeBus:
+    """In-process fan-out of change events with a bounded replay buffer.
+
+    Events are dicts with an increasing integer ``id`` per topic, and must
+    be published in that order: a subscriber whose cursor is past an id
+    never sees it. Publishers that allocate ids concurrently hold
+    ``writer(key)`` from allocation to ``publish``. Publishing appends to
+    the topic's ring buffer and wakes its waiters; there are no
+    per-subscriber queues or threads. ``subscribe(last_id=...)`` resumes
+    from the buffer when it still covers ``last_id`` and otherwise calls
+    ``backfill(after_id, limit)`` once for the missing events.
+
+    Topics without subscribers, publishes or subscribes for ``idle_s`` are
+    dropped; a later subscriber resumes from ``backfill`` instead.
+    """
+
+    def __init__(self, buffer_size: int = REPLAY_BUFFER_SIZE, idle_s: float = TOPIC_IDLE_S):
+        self.buffer_size = buffer_size
+        self.idle_s = idle_s
+        self._topics: Dict[str, _Topic] = {}
+        self._lock = threading.Lock()
+        self._swept = time.monotonic()
+        self.published = 0
+        self.evicted = 0
+
+    def _topic(self, key: str) -> _Topic:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._swept >= self.idle_s:
+                self._evict_idle(now)
+            topic = self._topics.get(key)
+            if topic is None:
+                topic = self._topics[key] = _Topic(self.buffer_size)
+            topic.touched = now
+            return topic
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop idle topics. Hold ``_lock``."""
+        self._swept = now
+        idle = [key for key, t in self._topics.items()
+                if t.subscribers == 0 and not t.writer.locked() and now - t.touched >= self.idle_s]
+        for key in idle:
+            del self._topics[key]
+        self.evicted += len(idle)
+
+    def writer(self, key: str) -> threading.Lock:
+        """The lock serialising publishers of ``key``. Hold it from the
+        point an event id is allocated until the event is published."""
+        return self._topic(key).writer
+
+    def publish(self, key: str, event: dict) -> dict:
+        topic = self._topic(key)
+        with topic.cond:
+            buf = topic.buffer
+            if topic.floor is None:
+                topic.floor = event['id'] - 1
+            elif len(buf) == buf.maxlen:
+                topic.floor = buf[0]['id']
+            buf.append(event)
+            topic.cond.notify_all()
+            self.published += 1
+        return event
+
+    def subscribe(self, key: str, last_id: Optional[int] = None,
+                  backfill: Optional[Callable[[int, int], List[dict]]] = None
+                  ) -> 'tuple[Subscription, List[dict]]':
+        """Register a subscriber on ``key``.
+
+        Returns the subscription plus the events after ``last_id`` it must
+        be sent first. Without ``last_id`` it starts at the live head.
+        """
+        topic = self._topic(key)
+        with topic.cond:
+            topic.subscribers += 1
+            head = topic.buffer[-1]['id'] if topic.buffer else 0
+            if last_id is None:
+                return Subscription(self, key, topic, head), []
+            covered = topic.floor is not None and last_id >= topic.floor
+            replay = [e for e in topic.buffer if e['id'] > last_id] if covered else []
+        if not covered and backfill is not None:
+            replay = list(backfill(last_id, self.buffer_size))
+            with topic.cond:
+                seen = replay[-1]['id'] if replay else last_id
+                replay += [e for e in topic.buffer if e['id'] > seen]
+        cursor = replay[-1]['id'] if replay else last_id
+        return Subscription(self, key, topic, cursor), replay
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        topic = sub.topic
+        with topic.cond:
+            if sub.closed:
+                return
+            sub.closed = True
+            topic.subscribers -= 1
+            topic.cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            topics = list(self._topics.items())
+        return {'published': self.published, 'topics': len(topics), 'evicted': self.evicted,
+                'subscribers': sum(t.subscribers for _, t in topics)}
+
+
+def sse_stream(sub: Subscription, replay: List[dict], *,
+               heartbeat_s: float = STREAM_HEARTBEAT_S,
+               max_s: float = STREAM_MAX_S, event: str = 'change') -> Iterator[str]:
+    """Server-Sent Events body for ``sub``. Always unsubscribes on exit."""
+    def frame(e: dict) -> str:
+        return f'id: {e["id"]}\nevent: {event}\ndata: {json.dumps(e, default=str)}\n\n'
+
+    deadline = time.monotonic() + max_s
+    try:
+        yield 'retry: 3000\n\n'
+        for e in replay:
+            yield frame(e)
+        while not sub.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            events = sub.wait(min(heartbeat_s, remaining))
+            if not events:
+                yield ': keep-alive\n\n'
+            for e in events:
+                yield frame(e)
+    finally:
+        sub.close()
+
+
+# Request threads that open streams may hold; the rest of the pool stays free.
+STREAM_SLOTS = threading.BoundedSemaphore(STREAM_MAX_OPEN)
+
+
+def sse_response(subscribe: Callable[[], 'tuple[Subscription, List[dict]]'], *,
+                 event: str = 'change', slots: Optional[threading.Semaphore] = None):
+    """Flask response streaming ``subscribe()``'s feed, if a stream slot is free.
+
+    Without a slot this answers 503 at once (no subscription, no DB read)
+    so the client falls back to the long-poll endpoint. The slot is
+    released when the server closes the response.
+    """
+    from flask import Response, jsonify
+
+    slots = slots or STREAM_SLOTS
+    if not slots.acquire(blocking=False):
+        resp = jsonify({'success': False, 'fallback': 'long-poll',
+                        'error': 'too many open streams; use /api/collab/changes/poll'})
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '5'
+        return resp
+    try:
+        sub, replay = subscribe()
+    except BaseException:
+        slots.release()
+        raise
+    resp = Response(sse_stream(sub, replay, event=event), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    resp.call_on_close(sub.close)       # also when the body was never started
+    resp.call_on_close(slots.release)
+    return resp
+
+
 # ============================================================================
 # Change feed
 # ============================================================================
 
 def record_change(get_db, *, project_id: str, user_id: str,
                   op: str, payload: Any = None,
-                  user_name: str = '') -> dict[str, Any]:
+                  user_name: str = '', bus: Optional[ChangeBus] = None) -> dict[str, Any]:
     if not project_id or not user_id or not op:
         return {'success': False, 'error': 'project_id, user_id, op required'}
-    conn = get_db()
-    try:
-        c = conn.cursor()
-        payload_json = json.dumps(payload) if payload is not None else None
-        c.execute('INSERT INTO project_changes(project_id, user_id, user_name, op, payload_json, ts) '
-                  'VALUES (?,?,?,?,?,?)',
-                  (project_id, user_id, user_name, op, payload_json, _now()))
-        conn.commit()
-        return {'success': True, 'change_id': c.lastrowid}
-    finally:
-        conn.close()
+    bus = bus or CHANGE_BUS
+    ts = _now()
+    payload_json = json.dumps(payload) if payload is not None else None
+    # INSERT through publish under the project's writer lock, so the bus
+    # sees this project's ids in the order SQLite allocated them.
+    with bus.writer(project_id):
+        conn = get_db()
+        try:
+            c = conn.cursor()
+            c.execute('INSERT INTO project_changes(project_id, user_id, user_name, op, payload_json, ts) '
+                      'VALUES (?,?,?,?,?,?)',
+                      (project_id, user_id, user_name, op, payload_json, ts))
+            conn.commit()
+            change_id = c.lastrowid
+        finally:
+            conn.close()
+        bus.publish(project_id, {
+            'id': change_id, 'user_id': user_id, 'user_name': user_name,
+            'op': op, 'payload': payload, 'ts': ts})
+    return {'success': True, 'change_id': change_id}
 
 
 def _fetch_changes(get_db, *, project_id: str, since_id: int, limit: int = 200) -> list[dict]:
@@ -246,17 +489,32 @@ def _fetch_changes(get_db, *, project_id: str, since_id: int, limit: int = 200)
     return out
 
 
+CHANGE_BUS = ChangeBus()
+
+
+def subscribe_changes(get_db, *, project_id: str, last_id: Optional[int] = None,
+                      bus: Optional[ChangeBus] = None) -> 'tuple[Subscription, List[dict]]':
+    """Subscribe to a project's feed, resuming after ``last_id`` if given."""
+    return (bus or CHANGE_BUS).subscribe(
+        project_id, last_id,
+        backfill=lambda after_id, limit: _fetch_changes(
+            get_db, project_id=project_id, since_id=after_id, limit=limit))
+
+
 def poll_changes(get_db, *, project_id: str, since_id: int,
-                 timeout_s: float = LONG_POLL_TIMEOUT_S) -> dict[str, Any]:
-    deadline = _now() + max(0.0, min(float(timeout_s), 60.0))
-    while True:
-        changes = _fetch_changes(get_db, project_id=project_id, since_id=since_id)
-        if changes:
-            return {'success': True, 'changes': changes,
-                    'last_id': changes[-1]['id']}
-        if _now() >= deadline:
-            return {'success': True, 'changes': [], 'last_id': since_id, 'timed_out': True}
-        time.sleep(LONG_POLL_INTERVAL_S)
+                 timeout_s: float = LONG_POLL_TIMEOUT_S,
+                 bus: Optional[ChangeBus] = None) -> dict[str, Any]:
+    """Long-poll fallback for clients without EventSource. Waits on the bus."""
+    timeout = max(0.0, min(float(timeout_s), 60.0))
+    sub, changes = subscribe_changes(get_db, project_id=project_id,
+                                     last_id=since_id, bus=bus)
+    with sub:
+        if not changes:
+            changes = sub.wait(timeout)
+    if changes:
+        return {'success': True, 'changes': changes,
+                'last_id': changes[-1]['id']}
+    return {'success': True, 'changes': [], 'last_id': since_id, 'timed_out': True}
 
 
 # ============================================================================
@@ -343,4 +601,17 @@ def register(app, *, auth_required=None) -> None:
         return jsonify(poll_changes(_ap.get_db, project_id=pid,
                                     since_id=since, timeout_s=timeout)), 200
 
-    logger.info('collaboration module registered: /api/collab/{lock,presence,changes}/*')
+    @app.route('/api/collab/changes/stream', methods=['GET'])
+    def _changes_stream():
+        """SSE feed. Resumes after ``last_id`` (or the Last-Event-ID header)."""
+        pid = request.args.get('project_id', '')
+        if not pid:
+            return jsonify({'success': False, 'error': 'project_id required'}), 400
+        raw = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+        try:
+            last_id = int(raw) if raw not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'bad last_id'}), 400
+        return sse_response(lambda: subscribe_changes(_ap.get_db, project_id=pid, last_id=last_id))
+
+    logger.info('collaboration module registered: /api/collab/{lock,presence,changes}/*, /api/collab/changes/stream (SSE)')
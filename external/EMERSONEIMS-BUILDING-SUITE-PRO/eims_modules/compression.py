@@ -0,0 +1,358 @@
+"""Response compression: precompressed static variants, streamed dynamic bodies.
+
+Two paths, chosen by what the bytes are:
+
+  * static   fingerprinted or ETag-versioned content (the wizard shell, its
+             extracted CSS/JS) is compressed once per content key at the
+             highest settings, gzip -9 and brotli q11, and the variants are
+             kept in a small LRU (EIMS_PRECOMPRESS_CACHE_MB, default 32).
+             ``static_response`` picks the variant that matches
+             Accept-Encoding, so a request costs a dict lookup.
+  * dynamic  ``compress_response`` is the after-request hook. Streamed
+             responses (NDJSON progress, generators) are wrapped in an
+             incremental compressor that flushes every chunk, so nothing is
+             buffered. Buffered bodies of EIMS_COMPRESS_STREAM_KB (default
+             256) or more go out as compressed chunks in chunked transfer
+             instead of one set_data.
+
+Compression is skipped when it does not pay:
+
+  * bodies under EIMS_COMPRESS_MIN_BYTES (default 1024)
+  * bodies whose first 8 KB shrink by less than 10% at level 1 (already
+    compressed or random)
+  * bodies whose expected CPU time exceeds EIMS_COMPRESS_BUDGET_MS
+    (default 100 ms). The estimate comes from measured per-thread throughput
+    of each encoder/level. Over budget, the level drops to 1 first.
+
+brotli (the ``Brotli`` package) is optional. Without it only gzip is
+offered. ``stats()`` returns counters for each decision.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+logger = logging.getLogger('eims.compression')
+
+MIN_BYTES = int(os.environ.get('EIMS_COMPRESS_MIN_BYTES', '1024'))
+STREAM_BYTES = int(float(os.environ.get('EIMS_COMPRESS_STREAM_KB', '256')) * 1024)
+BUDGET_MS = float(os.environ.get('EIMS_COMPRESS_BUDGET_MS', '100'))
+GZIP_LEVEL = int(os.environ.get('EIMS_COMPRESS_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('EIMS_BROTLI_QUALITY', '4'))
+PRECOMPRESS_MAX_BYTES = int(float(os.environ.get('EIMS_PRECOMPRESS_CACHE_MB', '32')) * 1024 * 1024)
+
+_PROBE_BYTES = 8192
+_PROBE_MIN_SAVING = 0.10
+_CHUNK = 64 * 1024
+
+_COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                 'application/x-ndjson', '+xml', '+json')
+# Server-sent events stay identity: heartbeats are a few bytes and some
+# proxies hold back compressed event streams.
+_NEVER = ('text/event-stream',)
+
+
+def available() -> Tuple[str, ...]:
+    return ('br', 'gzip') if HAS_BROTLI else ('gzip',)
+
+
+def negotiate(accept_encoding: str, offered: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Best of ``offered`` (default: ``available()``) for an Accept-Encoding
+    header, honouring q-values and ``*``; brotli wins ties. None means
+    identity."""
+    offered = tuple(offered if offered is not None else available())
+    q: Dict[str, float] = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        weight = 1.0
+        for p in params.split(';'):
+            key, _, value = p.strip().partition('=')
+            if key == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        q[name.strip()] = weight
+    best, best_q = None, 0.0
+    for enc in offered:
+        weight = q.get(enc, q.get('*', 0.0))
+        if weight > best_q:
+            best, best_q = enc, weight
+    return best
+
+
+def compressible(content_type: str) -> bool:
+    ctype = (content_type or '').lower()
+    return any(x in ctype for x in _COMPRESSIBLE) and not any(x in ctype for x in _NEVER)
+
+
+# ---------------------------------------------------------------------------
+#  Encoders
+# ---------------------------------------------------------------------------
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def _encoder(encoding: str, level: int):
+    """(compress(chunk), flush(), finish()) for an incremental encoder."""
+    if encoding == 'br':
+        c = brotli.Compressor(quality=level)
+        return c.process, c.flush, c.finish
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)              # 31: gzip container
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+
+def compress_stream(chunks: Iterable, encoding: str, level: Optional[int] = None, *,
+                    flush: bool = True) -> Iterator[bytes]:
+    """Compress an iterable of str/bytes chunks incrementally. With ``flush``
+    every input chunk is flushed through, so a client reading progress lines
+    sees each one as it is produced. The source's ``close`` is always called
+    (stream_with_context relies on it to pop the request context)."""
+    if level is None:
+        level = BROTLI_QUALITY if encoding == 'br' else GZIP_LEVEL
+    put, sync, finish = _encoder(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = put(chunk)
+            if flush:
+                out += sync()
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def _slices(data: bytes) -> Iterator[bytes]:
+    view = memoryview(data)
+    for i in range(0, len(data), _CHUNK):
+        yield view[i:i + _CHUNK]
+
+
+# ---------------------------------------------------------------------------
+#  Budget
+# ---------------------------------------------------------------------------
+
+class _Throughput:
+    """Measured encoder speed (input bytes per CPU ms) per (encoding, level),
+    an exponential moving average seeded with conservative figures."""
+
+    _SEED = {('gzip', 1): 60_000.0, ('br', 1): 60_000.0}
+
+    def __init__(self):
+        self._rate: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+
+    def estimate_ms(self, encoding: str, level: int, size: int) -> float:
+        rate = self._rate.get((encoding, level)) or self._SEED.get((encoding, level), 15_000.0)
+        return size / rate
+
+    def record(self, encoding: str, level: int, size: int, cpu_ms: float) -> None:
+        if size < 16 * 1024 or cpu_ms <= 0:
+            return                                           # too small to time
+        rate = size / cpu_ms
+        with self._lock:
+            old = self._rate.get((encoding, level))
+            self._rate[(encoding, level)] = rate if old is None else 0.8 * old + 0.2 * rate
+
+
+throughput = _Throughput()
+
+_stats_lock = threading.Lock()
+_stats = {'compressed': 0, 'streamed': 0, 'chunked': 0, 'static_hits': 0, 'static_builds': 0,
+          'skipped_small': 0, 'skipped_incompressible': 0, 'skipped_budget': 0,
+          'skipped_no_gain': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_ms': 0.0}
+
+
+def _count(**kw) -> None:
+    with _stats_lock:
+        for k, v in kw.items():
+            _stats[k] += v
+
+
+def stats() -> Dict[str, float]:
+    with _stats_lock:
+        out = dict(_stats)
+    out['ratio'] = round(out['bytes_out'] / out['bytes_in'], 3) if out['bytes_in'] else None
+    out['cpu_ms'] = round(out['cpu_ms'], 2)
+    return out
+
+
+def plan(data: bytes, encoding: str) -> Tuple[Optional[int], str]:
+    """(level, reason) for a buffered body; level None means send identity."""
+    if len(data) < MIN_BYTES:
+        return None, 'skipped_small'
+    probe = bytes(data[:_PROBE_BYTES])
+    if len(probe) >= 512 and len(zlib.compress(probe, 1)) > len(probe) * (1 - _PROBE_MIN_SAVING):
+        return None, 'skipped_incompressible'
+    level = BROTLI_QUALITY if encoding == 'br' else GZIP_LEVEL
+    for candidate in (level, 1):
+        if throughput.estimate_ms(encoding, candidate, len(data)) <= BUDGET_MS:
+            return candidate, 'compressed'
+    return None, 'skipped_budget'
+
+
+# ---------------------------------------------------------------------------
+#  Static variants
+# ---------------------------------------------------------------------------
+
+class Precompressed:
+    """LRU of {encoding: bytes} per content key. Each key is compressed once
+    at maximum effort; variants that do not come out smaller are dropped."""
+
+    def __init__(self, max_bytes: int = PRECOMPRESS_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Dict[str, bytes]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def variants(self, key: str, data: bytes) -> Dict[str, bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                _count(static_hits=1)
+                return entry
+        entry = {'identity': data}
+        started = time.thread_time()
+        gz = compress(data, 'gzip', 9)
+        if len(gz) < len(data):
+            entry['gzip'] = gz
+        if HAS_BROTLI:
+            br = compress(data, 'br', 11)
+            if len(br) < len(data):
+                entry['br'] = br
+        _count(static_builds=1, cpu_ms=(time.thread_time() - started) * 1e3)
+        size = sum(len(v) for v in entry.values())
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._size += size
+                while self._size > self.max_bytes and len(self._entries) > 1:
+                    _, old = self._entries.popitem(last=False)
+                    self._size -= sum(len(v) for v in old.values())
+            return self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+precompressed = Precompressed()
+
+
+def static_response(key: str, body, content_type: str, headers: Optional[dict] = None):
+    """Flask response for versioned content, served from its precompressed
+    variants. ``key`` must change whenever ``body`` does (a content hash or
+    ETag)."""
+    from flask import Response, request
+
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    entry = precompressed.variants(key, data)
+    enc = negotiate(request.headers.get('Accept-Encoding', ''), [e for e in entry if e != 'identity'])
+    payload = entry[enc] if enc else data
+    response = Response(payload, status=200, content_type=content_type, headers=headers or {})
+    if enc:
+        response.headers['Content-Encoding'] = enc
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+# ---------------------------------------------------------------------------
+#  After-request hook
+# ---------------------------------------------------------------------------
+
+def compress_response(response, accept_encoding: str):
+    """Compress a finished Flask response in place where it pays; see the
+    module docstring for the rules. Never raises: on any failure the original
+    response goes out uncompressed."""
+    try:
+        if (response.status_code != 200 or response.direct_passthrough
+                or response.headers.get('Content-Encoding')
+                or not compressible(response.headers.get('Content-Type'))):
+            return response
+        enc = negotiate(accept_encoding)
+        if enc is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, enc, flush=True)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = enc
+            response.vary.add('Accept-Encoding')
+            _count(streamed=1)
+            return response
+
+        data = response.get_data()
+        level, reason = plan(data, enc)
+        if level is None:
+            _count(**{reason: 1})
+            return response
+
+        if len(data) >= STREAM_BYTES:
+            # The body is already in memory; sending it as compressed chunks
+            # avoids holding a second full-size copy and starts the transfer
+            # after the first 64 KB instead of after the whole body.
+            response.response = _timed_stream(data, enc, level)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = enc
+            response.vary.add('Accept-Encoding')
+            _count(chunked=1)
+            return response
+
+        started = time.thread_time()
+        out = compress(data, enc, level)
+        cpu_ms = (time.thread_time() - started) * 1e3
+        throughput.record(enc, level, len(data), cpu_ms)
+        if len(out) >= len(data):
+            _count(skipped_no_gain=1, cpu_ms=cpu_ms)
+            return response
+        response.set_data(out)
+        response.headers['Content-Encoding'] = enc
+        response.headers['Content-Length'] = str(len(out))
+        response.vary.add('Accept-Encoding')
+        _count(compressed=1, bytes_in=len(data), bytes_out=len(out), cpu_ms=cpu_ms)
+    except Exception as e:  # pragma: no cover
+        logger.debug('compression skipped: %s', e)
+    return response
+
+
+def _timed_stream(data: bytes, encoding: str, level: int) -> Iterator[bytes]:
+    """compress_stream over slices of ``data``, timing the encoder's CPU so
+    large bodies feed the same budget estimate as small ones."""
+    inner = compress_stream(_slices(data), encoding, level, flush=False)
+    cpu, sent = 0.0, 0
+    while True:
+        started = time.thread_time()
+        piece = next(inner, None)
+        cpu += time.thread_time() - started
+        if piece is None:
+            break
+        sent += len(piece)
+        yield piece
+    throughput.record(encoding, level, len(data), cpu * 1e3)
+    _count(bytes_in=len(data), bytes_out=sent, cpu_ms=cpu * 1e3)
@@ -23,6 +23,10 @@ Implements:
        * Medium:     ADF >= 2.4 % (target 300 lx)
        * High:       ADF >= 3.2 % (target 500 lx)
 
+  3. A point-grid daylight factor per room of a BIM model
+     (/api/arch/daylight/grid, see daylight_grid): share of each room's
+     work plane above its target, as EN 17037 assesses it.
+
 All numerical assumptions are user-supplied; defaults carry a published
 source citation.
 """
@@ -125,4 +129,44 @@ def register(app, *, auth_required=None) -> None:
             return jsonify({'success': False, 'error': str(e)}), 400
         return jsonify(r), (200 if r.get('success') else 400)
 
+    @app.route('/api/arch/daylight/grid', methods=['POST'])
+    def _grid():
+        from .bim_model import Building
+        from .daylight_grid import building_daylight
+        data = request.get_json(silent=True) or {}
+        try:
+            if isinstance(data.get('bim'), dict):
+                b = Building.from_dict(data['bim'])
+            else:
+                b = Building.from_params(
+                    name=data.get('name', 'Daylight study'),
+                    area_m2=float(data.get('area_m2', 100.0)),
+                    bedrooms=int(data.get('bedrooms', 3)),
+                    stories=int(data.get('stories', 1)),
+                    units=int(data.get('units', 1)))
+            spacing = float(data.get('grid_m', 0.5))
+            if not 0.1 <= spacing <= 5:
+                raise ValueError('grid_m must be in [0.1, 5]')
+            threshold = data.get('threshold_pct')
+            threshold = float(threshold) if threshold is not None else None
+            if threshold is not None and not 0 < threshold <= 100:
+                raise ValueError('threshold_pct must be in (0, 100]')
+            factors = {k: float(data.get(k, default)) for k, default in
+                       (('T_glass', 0.68), ('frame_factor', 0.7), ('maintenance_factor', 0.9))}
+            for k, v in factors.items():
+                if not 0 < v <= 1:
+                    raise ValueError(f'{k} must be in (0, 1]')
+            reflectance = float(data.get('avg_reflectance', 0.5))
+            if not 0 <= reflectance < 1:
+                raise ValueError('avg_reflectance must be in [0, 1)')
+            r = building_daylight(
+                b, spacing_m=spacing,
+                occlusion=bool(data.get('occlusion', False)),
+                threshold_pct=threshold, reflectance=reflectance, **factors,
+                include_points=bool(data.get('include_points', False)),
+            )
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify(r)
+
     logger.info('Daylight (EN 17037) module registered')
@@ -0,0 +1,330 @@
+"""
+Point-grid daylight factor for every room of a Building model.
+
+daylight.average_daylight_factor gives one number per room from glazing
+figures the caller types in. This module works from the BIM geometry
+instead: each Space is sampled on a work-plane grid and the daylight factor
+is evaluated at every point, so the result says *which part* of a room
+falls short, as EN 17037 asks (target daylight factor over a share of the
+grid points, not on average).
+
+Per point
+---------
+    DF = (SC + IRC) * T * frame_factor * maintenance_factor      [%]
+
+  SC   sky component under the CIE standard overcast sky (luminance
+       L(θ) = Lz (1 + 2 sin θ) / 3), integrated over each window by
+       splitting it into ~``patch_m`` patches:
+
+           SC = 100 * Σ L(θ)/Lz * sin θ * dω / (7π/9)
+
+       where dω = A_patch cos(incidence) / r² and θ is the altitude of the
+       ray from the point to the patch. The sky outside is taken as
+       unobstructed, so there is no externally reflected component.
+  IRC  internally reflected component by the BRE split-flux formula
+       (BRE Digest 309; Hopkinson, Longmore & Petherbridge 1966), uniform
+       over the room:
+
+           IRC = 0.85 W / (A (1 - R)) * (C Rfw + 5 Rcw)
+
+The view factor from the (upward-facing) point to each window,
+F = Σ sin θ dω / π, is reported alongside the daylight factor.
+
+With ``occlusion`` on, every point-to-patch ray is also tested against the
+storey's other walls. A wall blocks the ray if the ray crosses it below the
+wall's height. Without occlusion, a room only sees the windows hosted on its
+own boundary, which is exact for convex rooms.
+
+A window belongs to the room found just inside its host wall at the
+opening's centre; ``Opening.position_m`` is that centre's distance along the
+host wall, as in bim_renderer and bim_three. Storeys are independent and run on
+a thread pool (EIMS_DAYLIGHT_WORKERS, default min(4, CPUs)). The inner loops
+are numpy, which releases the GIL.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .bim_model import Building, Space, Storey
+
+logger = logging.getLogger('eims.daylight_grid')
+
+WORK_PLANE_M = 0.85                 # EN 17037 cl. A.3 reference plane height
+EDGE_MARGIN_M = 0.5                 # EN 17037 excludes a 0.5 m band at the walls
+TARGET_AREA_PCT = 50.0              # EN 17037: target met over 50 % of the grid
+DAYLIGHT_WORKERS = int(os.environ.get('EIMS_DAYLIGHT_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Minimum daylight factor by room program, BS 8206-2:2008 cl. 5.6 (kitchen
+# 2 %, living 1.5 %, bedroom 1 %); other rooms fall back to 2 %.
+THRESHOLD_PCT = {'kitchen': 2.0, 'living': 1.5, 'dining': 1.5, 'study': 1.5,
+                 'office': 2.0, 'bedroom': 1.0}
+DEFAULT_THRESHOLD_PCT = 2.0
+HABITABLE = frozenset(THRESHOLD_PCT)
+
+_SKY_NORM = 100.0 * 9.0 / (7.0 * math.pi)        # 100 / horizontal illuminance, Lz = 1
+
+
+@dataclass(frozen=True)
+class Aperture:
+    """A window in storey coordinates: ``centre`` on the host wall's line,
+    ``along`` the wall's unit direction, sill and head above the storey
+    datum."""
+    id: str
+    wall_id: str
+    type_name: str
+    centre: np.ndarray
+    along: np.ndarray
+    width_m: float
+    sill_m: float
+    head_m: float
+
+    @property
+    def area_m2(self) -> float:
+        return self.width_m * (self.head_m - self.sill_m)
+
+    def patches(self, patch_m: float, inward: np.ndarray):
+        """(centres (k, 3), outward normals (k, 3), patch area) for a grid of
+        roughly ``patch_m`` squares over the glazed rectangle."""
+        height = self.head_m - self.sill_m
+        nu = max(1, int(math.ceil(self.width_m / patch_m)))
+        nv = max(1, int(math.ceil(height / patch_m)))
+        u = (np.arange(nu) + 0.5) / nu * self.width_m - self.width_m / 2
+        v = self.sill_m + (np.arange(nv) + 0.5) / nv * height
+        uu, vv = np.meshgrid(u, v)
+        xy = self.centre + uu.ravel()[:, None] * self.along
+        centres = np.column_stack([xy, vv.ravel()])
+        normal = np.array([-inward[0], -inward[1], 0.0])
+        return centres, np.broadcast_to(normal, centres.shape), self.area_m2 / (nu * nv)
+
+
+def storey_apertures(b: Building, storey: Storey) -> List[Aperture]:
+    walls = {w.id: w for w in storey.walls}
+    out = []
+    for o in storey.openings:
+        host = walls.get(o.wall_id)
+        if o.kind != 'window' or host is None or len(host.points) < 2:
+            continue
+        p0, p1 = host.points[0], host.points[-1]
+        length = math.hypot(p1.x - p0.x, p1.y - p0.y)
+        if length < 0.05:
+            continue
+        along = np.array([(p1.x - p0.x) / length, (p1.y - p0.y) / length])
+        t = b.types.windows.get(o.type_name)
+        width = t.width_m if t else 1.5
+        height = t.height_m if t else 1.2
+        sill = o.sill_m if o.sill_m else 0.9
+        out.append(Aperture(
+            id=o.id, wall_id=host.id, type_name=o.type_name,
+            centre=np.array([p0.x, p0.y]) + along * o.position_m, along=along,
+            width_m=width, sill_m=sill, head_m=min(sill + height, host.height_m)))
+    return out
+
+
+def _polygon(space: Space) -> np.ndarray:
+    poly = np.array([[p.x, p.y] for p in space.boundary], float)
+    if len(poly) > 1 and np.allclose(poly[0], poly[-1]):
+        poly = poly[:-1]
+    return poly
+
+
+def _inside(points: np.ndarray, poly: np.ndarray) -> np.ndarray:
+    a, e = poly, np.roll(poly, -1, axis=0) - poly
+    py = points[:, 1:2]
+    straddle = (a[None, :, 1] > py) != (a[None, :, 1] + e[None, :, 1] > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = a[None, :, 0] + (py - a[None, :, 1]) * e[None, :, 0] / e[None, :, 1]
+    return (straddle & (x > points[:, :1])).sum(1) % 2 == 1
+
+
+def _edge_distance(points: np.ndarray, poly: np.ndarray) -> np.ndarray:
+    """Distance from each point to the nearest polygon edge."""
+    a, e = poly, np.roll(poly, -1, axis=0) - poly
+    w = points[:, None, :] - a[None]
+    t = np.clip((w * e[None]).sum(2) / np.maximum((e * e).sum(1), 1e-12)[None], 0.0, 1.0)
+    return np.linalg.norm(w - t[..., None] * e[None], axis=2).min(1)
+
+
+def room_points(poly: np.ndarray, spacing_m: float, margin_m: float = EDGE_MARGIN_M) -> np.ndarray:
+    """Grid-cell centres inside ``poly`` and at least ``margin_m`` from its
+    edges. Rooms too small for the margin keep every inside point, and a
+    room too small for any point gets its centroid."""
+    lo, hi = poly.min(0), poly.max(0)
+    nx = max(1, int(math.ceil((hi[0] - lo[0]) / spacing_m)))
+    ny = max(1, int(math.ceil((hi[1] - lo[1]) / spacing_m)))
+    xs = lo[0] + (np.arange(nx) + 0.5) * (hi[0] - lo[0]) / nx
+    ys = lo[1] + (np.arange(ny) + 0.5) * (hi[1] - lo[1]) / ny
+    gx, gy = np.meshgrid(xs, ys)
+    pts = np.column_stack([gx.ravel(), gy.ravel()])
+    pts = pts[_inside(pts, poly)]
+    clear = pts[_edge_distance(pts, poly) >= margin_m] if len(pts) else pts
+    if len(clear):
+        return clear
+    return pts if len(pts) else poly.mean(0, keepdims=True)
+
+
+def _room_apertures(poly: np.ndarray, apertures: Sequence[Aperture], tol_m: float):
+    """[(aperture, inward normal)] for windows whose centre, stepped ``tol_m``
+    off the host wall, lands inside the room."""
+    out = []
+    for ap in apertures:
+        normal = np.array([-ap.along[1], ap.along[0]])
+        probe = np.array([ap.centre + tol_m * normal, ap.centre - tol_m * normal])
+        hit = _inside(probe, poly)
+        if hit[0] != hit[1]:
+            out.append((ap, normal if hit[0] else -normal))
+    return out
+
+
+def _blocked(points: np.ndarray, targets: np.ndarray, walls, skip: Sequence[str]) -> np.ndarray:
+    """(n, k) mask of point→target rays that cross a wall below its height."""
+    n, k = len(points), len(targets)
+    blocked = np.zeros((n, k), bool)
+    d = targets[None, :, :2] - points[:, None, :2]                              # (n, k, 2)
+    for w in walls:
+        if w.id in skip:
+            continue
+        for p, q in zip(w.points[:-1], w.points[1:]):
+            e = np.array([q.x - p.x, q.y - p.y])
+            a = np.array([p.x, p.y]) - points[:, :2]                            # (n, 2)
+            denom = d[..., 0] * e[1] - d[..., 1] * e[0]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = (a[:, None, 0] * e[1] - a[:, None, 1] * e[0]) / denom       # along the ray
+                s = (a[:, None, 0] * d[..., 1] - a[:, None, 1] * d[..., 0]) / denom
+            z = points[:, None, 2] + t * (targets[None, :, 2] - points[:, None, 2])
+            blocked |= ((np.abs(denom) > 1e-12) & (t > 1e-6) & (t < 1 - 1e-6)
+                        & (s >= 0) & (s <= 1) & (z < w.height_m))
+    return blocked
+
+
+def _irc_pct(space: Space, storey: Storey, glazed_m2: float, *, reflectance: float,
+             floor_reflectance: float, ceiling_reflectance: float,
+             obstruction_c: float = 39.0) -> float:
+    """BRE split-flux internally reflected component, % (before glazing losses)."""
+    if glazed_m2 <= 0:
+        return 0.0
+    area = space.area_m2
+    perimeter = sum(math.hypot(q.x - p.x, q.y - p.y) for p, q in
+                    zip(space.boundary, list(space.boundary[1:]) + [space.boundary[0]]))
+    surfaces = 2 * area + perimeter * storey.height_m
+    return (0.85 * glazed_m2 / (surfaces * (1 - reflectance))
+            * (obstruction_c * floor_reflectance + 5 * ceiling_reflectance))
+
+
+def room_daylight(b: Building, storey: Storey, space: Space, apertures: Sequence[Aperture], *,
+                  spacing_m: float = 0.5, patch_m: float = 0.25, occlusion: bool = False,
+                  threshold_pct: Optional[float] = None, T_glass: float = 0.68,
+                  frame_factor: float = 0.7, maintenance_factor: float = 0.9,
+                  reflectance: float = 0.5, floor_reflectance: float = 0.3,
+                  ceiling_reflectance: float = 0.7, wall_tol_m: float = 0.3,
+                  include_points: bool = False) -> Dict[str, Any]:
+    """Daylight factor on the work-plane grid of one room."""
+    if spacing_m <= 0 or patch_m <= 0:
+        raise ValueError('spacing_m and patch_m must be > 0')
+    if not all(0 < f <= 1 for f in (T_glass, frame_factor, maintenance_factor)):
+        raise ValueError('glazing factors must be in (0, 1]')
+    if threshold_pct is not None and not 0 < threshold_pct <= 100:
+        raise ValueError('threshold_pct must be in (0, 100]')
+    if not 0 <= reflectance < 1:
+        raise ValueError('reflectance must be in [0, 1)')
+    poly = _polygon(space)
+    threshold = threshold_pct if threshold_pct is not None else \
+        THRESHOLD_PCT.get(space.program, DEFAULT_THRESHOLD_PCT)
+    pts2 = room_points(poly, spacing_m)
+    points = np.column_stack([pts2, np.full(len(pts2), WORK_PLANE_M)])
+    windows = _room_apertures(poly, apertures, wall_tol_m)
+
+    sc = np.zeros(len(points))
+    per_window_vf = []
+    for ap, inward in windows:
+        centres, normals, dA = ap.patches(patch_m, inward)
+        d = centres[None] - points[:, None]                                      # (n, k, 3)
+        r2 = (d * d).sum(2)
+        r = np.sqrt(r2)
+        sin_alt = d[..., 2] / r
+        cos_inc = (d * normals[None]).sum(2) / r
+        seen = (sin_alt > 0) & (cos_inc > 0)
+        if occlusion:
+            seen &= ~_blocked(points, centres, storey.walls, (ap.wall_id,))
+        d_omega = np.where(seen, dA * cos_inc / r2, 0.0)
+        sc += _SKY_NORM * ((1 + 2 * sin_alt) / 3 * sin_alt * d_omega).sum(1)
+        per_window_vf.append((ap, (sin_alt * d_omega).sum(1) / math.pi))
+
+    glazed = sum(ap.area_m2 for ap, _ in windows)
+    irc = _irc_pct(space, storey, glazed, reflectance=reflectance,
+                   floor_reflectance=floor_reflectance, ceiling_reflectance=ceiling_reflectance)
+    losses = T_glass * frame_factor * maintenance_factor
+    df = (sc + irc) * losses
+    above = float((df >= threshold).mean() * 100.0)
+    result = {
+        'space_id': space.id, 'name': space.name, 'program': space.program,
+        'storey_id': storey.id, 'storey': storey.name,
+        'area_m2': round(space.area_m2, 2), 'habitable': space.program in HABITABLE,
+        'points': len(points),
+        'windows': [ap.id for ap, _ in windows],
+        'glazed_area_m2': round(glazed, 3),
+        'threshold_pct': threshold,
+        'pct_area_above_threshold': round(above, 1),
+        'pct_area_with_sky_view': round(float((sc > 0).mean() * 100.0), 1),
+        'passes': above >= TARGET_AREA_PCT,
+        'mean_df_pct': round(float(df.mean()), 3),
+        'median_df_pct': round(float(np.median(df)), 3),
+        'min_df_pct': round(float(df.min()), 3),
+        'uniformity': round(float(df.min() / df.mean()), 3) if df.mean() > 0 else 0.0,
+        'irc_pct': round(irc * losses, 3),
+        'view_factors': {ap.id: round(float(vf.mean()), 4) for ap, vf in per_window_vf},
+    }
+    if include_points:
+        result['grid'] = [[round(float(x), 2), round(float(y), 2), round(float(v), 3)]
+                          for (x, y), v in zip(pts2, df)]
+    return result
+
+
+def _storey_rooms(b: Building, storey: Storey, kw: Dict[str, Any]) -> List[Dict[str, Any]]:
+    apertures = storey_apertures(b, storey)
+    return [room_daylight(b, storey, s, apertures, **kw)
+            for s in storey.spaces if len(s.boundary) >= 3]
+
+
+def building_daylight(b: Building, *, workers: Optional[int] = None,
+                      **kw: Any) -> Dict[str, Any]:
+    """Point-grid daylight for every room of ``b``; keyword arguments go to
+    ``room_daylight``. Storeys run in parallel."""
+    started = time.perf_counter()
+    workers = max(1, workers or DAYLIGHT_WORKERS)
+    if workers == 1 or len(b.storeys) < 2:
+        per_storey = [_storey_rooms(b, s, kw) for s in b.storeys]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='eims-daylight') as pool:
+            per_storey = list(pool.map(lambda s: _storey_rooms(b, s, kw), b.storeys))
+    rooms = [r for rs in per_storey for r in rs]
+    habitable = [r for r in rooms if r['habitable']]
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.debug('daylight grid: %d rooms, %d points in %.0f ms', len(rooms),
+                 sum(r['points'] for r in rooms), elapsed)
+    return {
+        'success': True,
+        'standard': 'BS EN 17037:2018+A1:2021 (grid method); BS 8206-2:2008; BRE Digest 309',
+        'method': ('CIE overcast sky component integrated over window patches, '
+                   'BRE split-flux internally reflected component'),
+        'settings': {'work_plane_m': WORK_PLANE_M, 'edge_margin_m': EDGE_MARGIN_M,
+                     'target_area_pct': TARGET_AREA_PCT,
+                     **{k: v for k, v in kw.items() if k != 'include_points'}},
+        'rooms': rooms,
+        'summary': {
+            'rooms': len(rooms),
+            'habitable_rooms': len(habitable),
+            'habitable_failing': [r['space_id'] for r in habitable if not r['passes']],
+            'points': sum(r['points'] for r in rooms),
+        },
+        'elapsed_ms': round(elapsed, 1),
+        'workers': workers,
+    }
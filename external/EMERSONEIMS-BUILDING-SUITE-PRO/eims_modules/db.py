@@ -0,0 +1,227 @@
+"""Pooled, tuned SQLite connections shared by the app and its modules.
+
+Opening a sqlite3 connection per operation re-runs every PRAGMA and starts
+with an empty prepared-statement cache. A ConnectionPool instead keeps idle
+connections per thread and hands them out again on the next ``connect()``.
+Callers keep the usual ``conn = get_db(); ...; conn.close()`` shape:
+``close()`` on a pooled handle rolls back anything left uncommitted (which
+is what a real close would do) and returns the connection to its thread's
+idle list. A nested ``connect()`` on the same thread gets its own
+connection, so transactions never leak between callers.
+
+Tuning applied once per connection:
+
+  journal_mode=WAL, synchronous=NORMAL  readers never block the writer;
+                                        fsync at checkpoints only
+  cache_size, mmap_size, temp_store     keep hot pages in memory
+
+ProjectCache is a small LRU of decoded project rows (data_json /
+phases_json). Entries are validated against a cheap version tuple read from
+the row, so writes from other processes are picked up; in-process writers
+also call ``invalidate()``. Values are stored marshalled, so every hit
+returns a fresh dict the caller may mutate.
+"""
+
+from __future__ import annotations
+
+import logging
+import marshal
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger('eims.db')
+
+DEFAULT_PRAGMAS: Tuple[Tuple[str, Any], ...] = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16000),          # negative = KiB, so 16 MB per connection
+    ('mmap_size', 256 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+)
+
+STATEMENT_CACHE_SIZE = 256
+MAX_IDLE_PER_THREAD = 4
+
+
+class PooledConnection:
+    """A sqlite3.Connection handle whose ``close()`` returns it to the pool."""
+
+    __slots__ = ('_conn', '_pool', '_owner')
+
+    def __init__(self, conn: sqlite3.Connection, pool: 'ConnectionPool'):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_owner', threading.get_ident())
+
+    def _live(self) -> sqlite3.Connection:
+        conn = self._conn
+        if conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return conn
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PooledConnection.__slots__:
+            raise AttributeError(name)
+        return getattr(self._live(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._live(), name, value)
+
+    def __enter__(self) -> 'PooledConnection':
+        self._live().__enter__()
+        return self
+
+    def __exit__(self, *exc) -> Any:
+        return self._live().__exit__(*exc)
+
+    def close(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        object.__setattr__(self, '_conn', None)
+        self._pool._release(conn)
+
+    def __del__(self) -> None:
+        # Handles dropped without close() (e.g. ``with connect() as conn``)
+        # go back to the pool, but only from the thread that owns them.
+        if getattr(self, '_conn', None) is not None and threading.get_ident() == self._owner:
+            self.close()
+
+
+class ConnectionPool:
+    """Per-thread pool of tuned connections to one database file."""
+
+    def __init__(self, path: str, *, timeout: float = 10.0,
+                 isolation_level: Optional[str] = '',
+                 row_factory: Any = sqlite3.Row,
+                 pragmas: Tuple[Tuple[str, Any], ...] = DEFAULT_PRAGMAS,
+                 foreign_keys: bool = False):
+        self.path = path
+        self.timeout = timeout
+        self.isolation_level = isolation_level
+        self.row_factory = row_factory
+        self.pragmas = tuple(pragmas) + ((('foreign_keys', 'ON'),) if foreign_keys else ())
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def _idle(self) -> List[sqlite3.Connection]:
+        local = self._local
+        # A forked worker must not touch connections inherited from its parent.
+        if getattr(local, 'pid', None) != os.getpid():
+            local.pid = os.getpid()
+            local.idle = []
+        return local.idle
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout,
+                               isolation_level=self.isolation_level,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for name, value in self.pragmas:
+            conn.execute(f'PRAGMA {name} = {value}')
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def connect(self) -> PooledConnection:
+        idle = self._idle()
+        if idle:
+            conn = idle.pop()
+            with self._lock:
+                self.reused += 1
+        else:
+            conn = self._open()
+        # Callers sometimes tweak these; never let that leak to the next one.
+        conn.row_factory = self.row_factory
+        conn.isolation_level = self.isolation_level
+        return PooledConnection(conn, self)
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        idle = self._idle()
+        if len(idle) < MAX_IDLE_PER_THREAD:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    def close_idle(self) -> None:
+        """Close this thread's idle connections (tests, shutdown, DB swaps)."""
+        idle = self._idle()
+        while idle:
+            idle.pop().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': self.path, 'opened': self.opened, 'reused': self.reused}
+
+
+_pools: Dict[Tuple[str, Optional[str], bool], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str, *, isolation_level: Optional[str] = '',
+             foreign_keys: bool = False) -> ConnectionPool:
+    """Shared pool for ``path`` (one per path and connection mode)."""
+    key = (os.path.abspath(path), isolation_level, foreign_keys)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(path, isolation_level=isolation_level,
+                                                foreign_keys=foreign_keys)
+        return pool
+
+
+class ProjectCache:
+    """LRU of decoded project dicts keyed by id and validated by version."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._items: 'OrderedDict[Hashable, Tuple[Any, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != version:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            blob = item[1]
+        return marshal.loads(blob)
+
+    def put(self, key: Hashable, version: Any, value: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        try:
+            blob = marshal.dumps(value)
+        except ValueError:
+            # Not plain JSON data (shouldn't happen for decoded rows); skip.
+            return
+        with self._lock:
+            self._items[key] = (version, blob)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': len(self._items), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
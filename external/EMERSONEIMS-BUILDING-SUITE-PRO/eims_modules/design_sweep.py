@@ -0,0 +1,637 @@
+"""Parametric design-variant sweep: geometry, structure, cost and carbon per option.
+
+Comparing options (bedrooms x storeys x wall system x foundation type) used
+to mean one request per design to each of /api/bim, the structural calcs,
+/api/qs/nrm1/cost-plan and /api/qs/carbon/assess. Here a sweep spec expands
+into variants, either the full grid or a Latin-hypercube sample, and every
+variant is run through the same chain in one go:
+
+  geometry   Building.from_params -> GIFA, footprint, wall / window / door
+             quantities measured off the model
+  structure  pdf_engineering: _calc_loads, derive_grid, calc_slab,
+             calc_beam, calc_column, calc_foundation, build_bbs, calc_mep
+  cost       quantities x KQS-2025 rates (pdf_engineering._KQS_RATES_KES),
+             rolled up as NRM1 elements through nrm1_costplan.build_cost_plan
+  carbon     the same take-off with per-unit factors -> carbon.assess
+  VE         value_engineering.suggest over the priced take-off
+
+Sub-results that variants share are memoised (functools.lru_cache): one
+Building per (area, bedrooms, storeys, units), and one loads / grid / slab /
+beam / column / foundation design per structural key. Variants are grouped
+by geometry before being handed to the process pool, so a group's members
+hit the same worker's caches. EIMS_SWEEP_PROCESSES (default min(4, CPUs))
+sets the pool size; 0 or 1 evaluates in-process. The pool is started on the
+first sweep and reused; if it breaks, the remaining groups are evaluated
+in-process and the next sweep starts a new pool.
+
+``sweep`` yields results as groups complete. ``pareto`` returns the
+non-dominated variants for the chosen objectives, and ``table`` the rows
+sorted by any metric. POST /api/design/sweep streams them as NDJSON.
+
+Wall-system rates and carbon factors are indicative defaults with their
+basis stated. Pass ``wall_systems`` / ``carbon_factors`` to override them per
+project.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('eims.design_sweep')
+
+SWEEP_PROCESSES = int(os.environ.get('EIMS_SWEEP_PROCESSES', str(min(4, os.cpu_count() or 1))))
+MAX_VARIANTS = int(os.environ.get('EIMS_SWEEP_MAX_VARIANTS', '2000'))
+
+AXES = ('area_m2', 'bedrooms', 'stories', 'units', 'wall_system', 'foundation',
+        'safe_bearing_kPa')
+BASE = {'area_m2': 200.0, 'bedrooms': 3, 'stories': 1, 'units': 1,
+        'wall_system': 'masonry_200', 'foundation': 'strip', 'safe_bearing_kPa': 150.0}
+_INT_AXES = {'bedrooms', 'stories', 'units'}
+
+# External wall systems: supply + fix rate (KES/m2, KQS-2025 basis) and
+# cradle-to-gate carbon per m2 of wall built up from ICE v3.0 material factors.
+WALL_SYSTEMS: Dict[str, Dict[str, Any]] = {
+    'masonry_200': {
+        'description': '200 mm machine-cut block walling', 'rate_kes_m2': 1800,
+        'kgco2e_m2': 42.0, 'plastered': True,
+        'source': 'KQS-2025 block walling; ICE v3.0 concrete block 0.093 kgCO2e/kg + mortar'},
+    'brick_230': {
+        'description': '230 mm fired clay brick walling', 'rate_kes_m2': 2600,
+        'kgco2e_m2': 93.0, 'plastered': True,
+        'source': 'Indicative; ICE v3.0 clay brick 0.213 kgCO2e/kg at 1,900 kg/m3'},
+    'eps_panel': {
+        'description': 'EPS-core sprayed-concrete wall panel 150 mm', 'rate_kes_m2': 1500,
+        'kgco2e_m2': 30.0, 'plastered': False,
+        'source': 'Indicative; ICE v3.0 EPS 3.29, concrete 0.10, steel mesh 1.99 kgCO2e/kg'},
+    'timber_frame': {
+        'description': 'Timber stud frame, OSB sheathing, plasterboard lining', 'rate_kes_m2': 2100,
+        'kgco2e_m2': 16.0, 'plastered': False,
+        'source': 'Indicative; ICE v3.0 sawn softwood 0.31, OSB 0.45, plasterboard 0.39 kgCO2e/kg'},
+}
+
+# Per-unit cradle-to-gate (A1-A3) factors for the rest of the take-off.
+CARBON_FACTORS: Dict[str, Tuple[float, str]] = {
+    'concrete_m3':   (324.0, 'ICE v3.0 RC concrete 0.135 kgCO2e/kg at 2,400 kg/m3'),
+    'rebar_kg':      (1.99,  'ICE v3.0 steel rebar, world average'),
+    'roof_m2':       (18.0,  'ICE v3.0 galvanised sheet 2.76 kgCO2e/kg + softwood trusses'),
+    'window_m2':     (60.0,  'ICE v3.0 float glass 1.44 + aluminium frame 13.0 kgCO2e/kg'),
+    'ceiling_m2':    (2.7,   'ICE v3.0 plasterboard 0.39 kgCO2e/kg, 9 mm'),
+    'floor_tile_m2': (15.6,  'ICE v3.0 ceramic tile 0.78 kgCO2e/kg, 20 kg/m2'),
+    'plaster_m2':    (3.4,   'ICE v3.0 cement render 0.19 kgCO2e/kg, 2 x 9 kg/m2'),
+}
+
+DEFAULT_OBJECTIVES = ('cost_per_m2', 'carbon_kg_per_m2')
+_FX_TO_KES = {'USD': 130, 'EUR': 140, 'GBP': 165, 'KES': 1}
+
+# Columns of a result row. Objectives must be METRICS; sort_by any column.
+METRICS = ('area_m2', 'bedrooms', 'stories', 'units', 'safe_bearing_kPa', 'gifa_m2', 'spaces',
+           'window_to_wall', 'grid_m', 'slab_mm', 'column_mm', 'column_load_kN', 'concrete_m3',
+           'rebar_kg', 'works_cost', 'cost_limit', 'cost_per_m2', 'carbon_t', 'carbon_kg_per_m2',
+           've_saving')
+COLUMNS = ('id', 'wall_system', 'foundation', 'beam_mm', 'foundation_type', 'currency') + METRICS
+
+
+# ---------------------------------------------------------------------------
+#  Expansion
+# ---------------------------------------------------------------------------
+
+def _levels(name: str, spec: Any, default_levels: int) -> List[Any]:
+    """Discrete values of one axis for a full grid."""
+    if isinstance(spec, dict):
+        lo, hi = float(spec['min']), float(spec['max'])
+        if 'step' in spec:
+            step = float(spec['step'])
+            if step <= 0:
+                raise ValueError(f'{name}: step must be > 0')
+            values = list(np.arange(lo, hi + step / 2, step))
+        else:
+            values = list(np.linspace(lo, hi, int(spec.get('levels', default_levels))))
+        return sorted({_cast(name, v) for v in values})
+    if isinstance(spec, (list, tuple)):
+        return [_cast(name, v) for v in spec]
+    return [_cast(name, spec)]
+
+
+def _cast(name: str, value: Any) -> Any:
+    if name in ('wall_system', 'foundation'):
+        return str(value)
+    x = float(value)
+    if not math.isfinite(x):
+        raise ValueError(f'{name}: {value!r} is not a finite number')
+    if name in _INT_AXES:
+        return int(round(x))
+    return round(x, 2)
+
+
+def _lhs(axes: Dict[str, Any], samples: int, seed: int) -> List[Dict[str, Any]]:
+    """Latin hypercube: each axis split into ``samples`` equal strata, one
+    draw per stratum, strata shuffled independently per axis. List axes are
+    stratified over their index."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in axes.items():
+        u = (rng.permutation(samples) + rng.random(samples)) / samples
+        if isinstance(spec, dict):
+            lo, hi = float(spec['min']), float(spec['max'])
+            columns[name] = [_cast(name, lo + x * (hi - lo)) for x in u]
+        else:
+            values = list(spec) if isinstance(spec, (list, tuple)) else [spec]
+            columns[name] = [_cast(name, values[min(int(x * len(values)), len(values) - 1)])
+                             for x in u]
+    return [{name: columns[name][i] for name in axes} for i in range(samples)]
+
+
+def expand(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Variants for a sweep spec::
+
+        {'axes': {'bedrooms': [2, 3, 4], 'stories': {'min': 1, 'max': 4, 'step': 1},
+                  'wall_system': ['masonry_200', 'timber_frame'], ...},
+         'base': {'area_m2': 240, ...},          # fixed values for other axes
+         'method': 'grid' | 'lhs', 'samples': 200, 'seed': 0, 'levels': 5}
+
+    Duplicate variants (after integer rounding) are dropped. Raises
+    ValueError on unknown axes or when the sweep exceeds MAX_VARIANTS.
+    """
+    axes = dict(spec.get('axes') or {})
+    unknown = sorted(set(axes) | set(spec.get('base') or {}))
+    unknown = [a for a in unknown if a not in AXES]
+    if unknown:
+        raise ValueError(f'unknown axes {unknown}; expected any of {list(AXES)}')
+    base = {**BASE, **{k: _cast(k, v) for k, v in (spec.get('base') or {}).items()}}
+    method = spec.get('method', 'grid')
+    if method == 'grid':
+        levels = {k: _levels(k, v, int(spec.get('levels', 5))) for k, v in axes.items()}
+        size = math.prod(len(v) for v in levels.values()) if levels else 1
+        if size > MAX_VARIANTS:
+            raise ValueError(f'grid has {size} variants; the limit is {MAX_VARIANTS} '
+                             f'(use method "lhs" with fewer samples)')
+        rows = [dict(zip(levels, combo)) for combo in itertools.product(*levels.values())]
+    elif method == 'lhs':
+        samples = int(spec.get('samples', 100))
+        if not 1 <= samples <= MAX_VARIANTS:
+            raise ValueError(f'samples must be in [1, {MAX_VARIANTS}]')
+        rows = _lhs(axes, samples, int(spec.get('seed', 0)))
+    else:
+        raise ValueError(f'unknown method {method!r}; expected grid or lhs')
+
+    out, seen = [], set()
+    for row in rows:
+        v = {**base, **row}
+        key = tuple(v[a] for a in AXES)
+        if key in seen:
+            continue
+        seen.add(key)
+        v['id'] = f'v{len(out) + 1:04d}'
+        out.append(v)
+    return out
+
+
+# ---------------------------------------------------------------------------
+#  Memoised sub-results
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def _geometry(area_m2: float, bedrooms: int, stories: int, units: int) -> Dict[str, float]:
+    """Quantities measured off the parametric BIM model."""
+    from .bim_model import Building
+    b = Building.from_params(name='Sweep', area_m2=area_m2, bedrooms=bedrooms,
+                             stories=stories, units=units)
+    floors = [sl for s in b.storeys for sl in s.slabs if sl.role == 'floor']
+    roofs = [sl for s in b.storeys for sl in s.slabs if sl.role == 'roof']
+    ext_m2 = int_m2 = window_m2 = door_ext_m2 = 0.0
+    doors_int = doors_ext = windows = 0
+    for s in b.storeys:
+        walls = {w.id: w for w in s.walls}
+        for w in s.walls:
+            if w.structural_role == 'external':
+                ext_m2 += w.length_m * w.height_m
+            else:
+                int_m2 += w.length_m * w.height_m
+        for o in s.openings:
+            host = walls.get(o.wall_id)
+            if o.kind == 'window':
+                t = b.types.windows.get(o.type_name)
+                window_m2 += (t.width_m * t.height_m) if t else 1.8
+                windows += 1
+            elif host is not None and host.structural_role == 'external':
+                t = b.types.doors.get(o.type_name)
+                door_ext_m2 += (t.width_m * t.height_m) if t else 2.1
+                doors_ext += 1
+            else:
+                doors_int += 1
+    # One internal door per room is the model's rule; rooms on external walls
+    # get theirs on the facade, so count the rest from the spaces.
+    doors_int = max(doors_int, sum(len(s.spaces) for s in b.storeys) - doors_ext)
+    return {
+        'gifa_m2': sum(sl.area_m2 for sl in floors),
+        'footprint_m2': floors[0].area_m2 if floors else area_m2 / max(1, stories),
+        'roof_m2': sum(sl.area_m2 for sl in roofs),
+        'ext_wall_m2': max(0.0, ext_m2 - window_m2 - door_ext_m2),
+        'int_wall_m2': int_m2,
+        'window_m2': window_m2, 'windows': windows,
+        'doors_ext': doors_ext, 'doors_int': doors_int,
+        'spaces': sum(len(s.spaces) for s in b.storeys),
+    }
+
+
+@lru_cache(maxsize=256)
+def _frame(area_m2: float, stories: int, units: int) -> Tuple[dict, dict, dict, dict, dict]:
+    """(loads, grid, slab, beam, column) exactly as the engineering report
+    derives them."""
+    from . import pdf_engineering as pe
+    loads = pe._calc_loads(area_m2, stories)
+    grid = pe.derive_grid(area_m2, stories, units)
+    g = grid['grid_m']
+    return (loads, grid, pe.calc_slab(g, g, loads), pe.calc_beam(g, g, loads),
+            pe.calc_column(stories, g * g, loads))
+
+
+@lru_cache(maxsize=512)
+def _foundation(foundation: str, column_load_kN: float, safe_bearing_kPa: float) -> dict:
+    from . import pdf_engineering as pe
+    return pe.calc_foundation(foundation, column_load_kN, safe_bearing_kPa)
+
+
+def cache_info() -> Dict[str, Dict[str, int]]:
+    return {f.__name__.lstrip('_'): f.cache_info()._asdict()
+            for f in (_geometry, _frame, _foundation)}
+
+
+def _foundation_m3(found: dict, grid: dict) -> float:
+    """Concrete in the foundation, from the sizes calc_foundation chose."""
+    sizes = [float(x) for x in re.findall(r'\d+(?:\.\d+)?', found.get('plan_size_m', ''))]
+    thk = found['thickness_mm'] / 1000
+    if found['type'] == 'PAD' and sizes:
+        return sizes[0] * sizes[-1] * thk * grid['n_cols']
+    if found['type'] == 'RAFT':
+        return grid['footprint_x_m'] * grid['footprint_y_m'] * thk
+    width = sizes[0] / 1000 if sizes else 0.45
+    run = ((grid['bays_y'] + 1) * grid['footprint_x_m']
+           + (grid['bays_x'] + 1) * grid['footprint_y_m'])
+    return width * thk * run
+
+
+# ---------------------------------------------------------------------------
+#  One variant
+# ---------------------------------------------------------------------------
+
+def evaluate(variant: Dict[str, Any], *, wall_systems: Optional[Dict[str, Dict[str, Any]]] = None,
+             carbon_factors: Optional[Dict[str, Tuple[float, str]]] = None,
+             currency: str = 'KES') -> Dict[str, Any]:
+    """Geometry, structure, NRM1 cost plan, embodied carbon and VE headroom
+    for one variant, flattened into one row."""
+    from . import carbon, nrm1_costplan, value_engineering
+    from . import pdf_engineering as pe
+
+    if currency not in _FX_TO_KES:
+        raise ValueError(f'unknown currency {currency!r}; expected one of {sorted(_FX_TO_KES)}')
+    v = {**BASE, **variant}
+    systems = {**WALL_SYSTEMS, **(wall_systems or {})}
+    if v['wall_system'] not in systems:
+        raise ValueError(f"unknown wall_system {v['wall_system']!r}; expected one of {sorted(systems)}")
+    wall = systems[v['wall_system']]
+    factors = {**CARBON_FACTORS, **(carbon_factors or {})}
+    area, stories, units = float(v['area_m2']), int(v['stories']), int(v['units'])
+    if area <= 0 or stories < 1 or units < 1 or v['bedrooms'] < 1:
+        raise ValueError('area_m2, bedrooms, stories and units must be positive')
+
+    geo = _geometry(area, int(v['bedrooms']), stories, units)
+    loads, grid, slab, beam, col = _frame(area, stories, units)
+    found = _foundation(v['foundation'], col['N_kN'], float(v['safe_bearing_kPa']))
+    bbs = pe.build_bbs(slab, beam, col, found, grid['n_cols'], grid['n_beams'], area)
+    mep = pe.calc_mep(area, int(v['bedrooms']), units)
+
+    rebar = {'slab': 0.0, 'frame': 0.0, 'foundation': 0.0}
+    for row in bbs:
+        rebar['slab' if row['mark'].startswith('S') else
+              'foundation' if row['mark'].startswith('F') else 'frame'] += row['weight_kg']
+    col_m3 = (col['side_mm'] / 1000) ** 2 * 3.5 * grid['n_cols'] * stories
+    beam_m3 = beam['b_mm'] / 1000 * beam['h_mm'] / 1000 * beam['L_m'] * grid['n_beams']
+    slab_m3 = geo['gifa_m2'] * slab['h_slab_mm'] / 1000
+    fnd_m3 = _foundation_m3(found, grid)
+    fp = geo['footprint_m2']
+    walls_m2 = geo['ext_wall_m2'] + geo['int_wall_m2']
+    fixture_units = sum(int(n or 0) for n in mep['fixture_units'].values())
+
+    R = pe._KQS_RATES_KES
+    # (NRM1 code, element, [(description, quantity, unit, KES rate)])
+    measured = [
+        ('1', 'Substructure', [
+            ('Site clearance & strip topsoil', fp * 1.3, 'm2', R['site_clearance_m2']),
+            ('Excavation to foundations', fnd_m3 * 1.5, 'm3', R['excavation_m3']),
+            ('Hardcore filling 200 mm', fp, 'm2', R['hardcore_filling_m2']),
+            ('Lean concrete blinding 50 mm', fp * 0.05, 'm3', R['lean_concrete_m3']),
+            (f"RC {found['type'].lower()} foundation C25/30", fnd_m3, 'm3', R['rc_footing_m3']),
+            ('Foundation grade 500 rebar', rebar['foundation'], 'kg', R['reinforcement_kg'])]),
+        ('2.1', 'Frame', [
+            ('RC columns C25/30', col_m3, 'm3', R['rc_column_m3']),
+            ('RC beams C25/30', beam_m3, 'm3', R['rc_beam_m3']),
+            ('Frame grade 500 rebar', rebar['frame'], 'kg', R['reinforcement_kg']),
+            ('Formwork to columns & beams', (col_m3 + beam_m3) * 6, 'm2', R['formwork_m2'])]),
+        ('2.2', 'Upper floors', [
+            ('RC slabs C25/30', slab_m3, 'm3', R['rc_slab_m3']),
+            ('Slab grade 500 rebar', rebar['slab'], 'kg', R['reinforcement_kg']),
+            ('Formwork to slab soffits', geo['gifa_m2'], 'm2', R['formwork_m2'])]),
+        ('2.3', 'Roof', [
+            ('Timber roof trusses & purlins', geo['roof_m2'], 'm2', R['roof_truss_m2']),
+            ('Box-profile iron sheet', geo['roof_m2'] * 1.05, 'm2', R['roof_cover_iron_m2'])]),
+        ('2.5', 'External walls', [
+            (wall['description'], geo['ext_wall_m2'], 'm2', wall['rate_kes_m2'])]),
+        ('2.6', 'Windows and external doors', [
+            ('Aluminium-framed windows', geo['window_m2'], 'm2', R['window_aluminium_m2']),
+            ('External doors', geo['doors_ext'], 'each', R['door_external_each'])]),
+        ('2.7', 'Internal walls and partitions', [
+            ('Block partition walling', geo['int_wall_m2'], 'm2', R['block_walling_m2'])]),
+        ('2.8', 'Internal doors', [
+            ('Internal flush doors', geo['doors_int'], 'each', R['door_internal_each'])]),
+        ('3.1', 'Wall finishes', [
+            ('Plaster both sides', walls_m2 if wall['plastered'] else geo['int_wall_m2'], 'm2',
+             R['plaster_2sides_m2']),
+            ('Internal emulsion', walls_m2 * 1.6, 'm2', R['paint_internal_m2']),
+            ('External weather-shield paint', geo['ext_wall_m2'], 'm2', R['paint_external_m2']),
+            ('Wall tiling (wet areas)', geo['gifa_m2'] * 0.18, 'm2', R['wall_tiling_m2'])]),
+        ('3.2', 'Floor finishes', [
+            ('Floor ceramic tiling', geo['gifa_m2'] * 0.85, 'm2', R['floor_tiling_m2'])]),
+        ('3.3', 'Ceiling finishes', [
+            ('Gypsum ceiling', geo['gifa_m2'], 'm2', R['ceiling_gypsum_m2'])]),
+        ('5.1', 'Sanitary installations', [
+            ('Sanitary fixtures', max(fixture_units, 8), 'fixture-unit', 18500)]),
+        ('5.4', 'Water installations', [
+            ('Hot + cold water reticulation', max(fixture_units, 8), 'fixture-unit', 24000)]),
+        ('5.8', 'Electrical installations', [
+            ('Switchgear & sub-mains', mep['design_kVA'], 'kVA', 9500),
+            ('Conduit, wiring & accessories', geo['gifa_m2'], 'm2', 280)]),
+    ]
+    fx = _FX_TO_KES[currency]
+    gifa = geo['gifa_m2']
+    elements = [{'code': code, 'description': name,
+                 'rate_per_m2': sum(q * r for _, q, _, r in lines) / fx / gifa,
+                 'rate_source': 'KQS-2025 indicative rates x BIM/structural take-off'}
+                for code, name, lines in measured]
+    plan = nrm1_costplan.build_cost_plan(gifa_m2=gifa, elements=elements, currency=currency)
+
+    concrete_m3 = col_m3 + beam_m3 + slab_m3 + fnd_m3 + fp * 0.05
+    take_off = [
+        ('Concrete C25/30', concrete_m3, 'm3', 'concrete_m3', '1 Substructure / 2 Superstructure'),
+        ('Reinforcement', sum(rebar.values()), 'kg', 'rebar_kg', '2.1 Frame'),
+        ('Roof', geo['roof_m2'], 'm2', 'roof_m2', '2.3 Roof'),
+        ('Windows', geo['window_m2'], 'm2', 'window_m2', '2.6 Windows and external doors'),
+        ('Ceilings', gifa, 'm2', 'ceiling_m2', '3.3 Ceiling finishes'),
+        ('Floor tiling', gifa * 0.85, 'm2', 'floor_tile_m2', '3.2 Floor finishes'),
+        ('Plaster', walls_m2 if wall['plastered'] else geo['int_wall_m2'], 'm2', 'plaster_m2',
+         '3.1 Wall finishes'),
+    ]
+    materials = [{'name': name, 'quantity': q, 'unit': unit,
+                  'factor_kgCO2e_per_unit': factors[key][0], 'factor_source': factors[key][1],
+                  'element': element} for name, q, unit, key, element in take_off]
+    materials.append({'name': wall['description'], 'quantity': geo['ext_wall_m2'], 'unit': 'm2',
+                      'factor_kgCO2e_per_unit': wall['kgco2e_m2'], 'factor_source': wall['source'],
+                      'element': '2.5 External walls'})
+    co2 = carbon.assess(materials=materials, gifa_m2=gifa)
+
+    ve = value_engineering.suggest([{'description': d, 'quantity': q, 'unit': u, 'rate': r / fx}
+                                    for _, _, lines in measured for d, q, u, r in lines])
+    summary = plan['summary']
+    return {
+        'id': v.get('id'),
+        **{a: v[a] for a in AXES},
+        'gifa_m2': round(gifa, 1),
+        'spaces': geo['spaces'],
+        'window_to_wall': round(geo['window_m2'] / max(geo['ext_wall_m2'] + geo['window_m2'], 1e-9), 3),
+        'grid_m': grid['grid_m'],
+        'slab_mm': slab['h_slab_mm'],
+        'beam_mm': f"{beam['b_mm']}x{beam['h_mm']}",
+        'column_mm': col['side_mm'],
+        'column_load_kN': col['N_kN'],
+        'foundation_type': found['type'],
+        'concrete_m3': round(concrete_m3, 1),
+        'rebar_kg': round(sum(rebar.values()), 0),
+        'currency': currency,
+        'works_cost': summary['works_cost_estimate'],
+        'cost_limit': summary['cost_limit'],
+        'cost_per_m2': summary['cost_per_m2_gifa'],
+        'carbon_t': co2['totals']['embodied_co2e_tonnes'],
+        'carbon_kg_per_m2': co2['intensity']['kgCO2e_per_m2'],
+        've_saving': ve.get('total_estimated_saving', 0.0),
+    }
+
+
+def _evaluate_group(variants: List[Dict[str, Any]], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Runs inside a pool worker: one geometry group, sharing its caches."""
+    out = []
+    for v in variants:
+        try:
+            out.append(evaluate(v, **options))
+        except (ValueError, KeyError, ZeroDivisionError) as e:
+            out.append({'id': v.get('id'), **{a: v.get(a) for a in AXES}, 'error': str(e)})
+    return out
+
+
+# ---------------------------------------------------------------------------
+#  Sweep, Pareto front, table
+# ---------------------------------------------------------------------------
+
+def _groups(variants: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for v in variants:
+        key = (v['area_m2'], v['bedrooms'], v['stories'], v['units'])
+        groups.setdefault(key, []).append(v)
+    return list(groups.values())
+
+
+_POOL_LOCK = threading.Lock()
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """The long-lived pool of ``workers`` processes, started on first use."""
+    with _POOL_LOCK:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn, not fork: the web process has live threads and sockets.
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return pool
+
+
+def _discard(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _POOL_LOCK:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def sweep(variants: Sequence[Dict[str, Any]], *, processes: Optional[int] = None,
+          **options: Any) -> Iterator[Dict[str, Any]]:
+    """Yield one result row per variant as evaluation completes (grouped by
+    geometry, so rows arrive a group at a time). ``options`` go to
+    ``evaluate``. Rows that failed carry ``error`` instead of metrics."""
+    groups = _groups(variants)
+    workers = SWEEP_PROCESSES if processes is None else processes
+    if workers <= 1 or len(groups) < 2:
+        for g in groups:
+            yield from _evaluate_group(g, options)
+        return
+    pool = _pool(workers)
+    pending: Dict[Any, int] = {}
+    finished = set()
+    try:
+        try:
+            for i, g in enumerate(groups):
+                pending[pool.submit(_evaluate_group, g, options)] = i
+        except RuntimeError as e:        # another request shut this pool down
+            raise BrokenProcessPool(str(e)) from e
+        for f in as_completed(list(pending)):
+            rows = f.result()
+            finished.add(pending.pop(f))
+            yield from rows
+    except BrokenProcessPool as e:
+        left = [i for i in range(len(groups)) if i not in finished]
+        logger.warning('sweep process pool broke (%s); evaluating %d of %d groups in-process',
+                       e, len(left), len(groups))
+        _discard(workers, pool)
+        for i in left:
+            yield from _evaluate_group(groups[i], options)
+    finally:
+        for f in pending:
+            f.cancel()
+
+
+def pareto(rows: Sequence[Dict[str, Any]], objectives: Sequence[str] = DEFAULT_OBJECTIVES) -> List[str]:
+    """Ids of the non-dominated rows. Objectives are minimised; prefix a
+    name with '-' to maximise it."""
+    ok = [r for r in rows if 'error' not in r]
+    if not ok:
+        return []
+    cols = []
+    for name in objectives:
+        sign = -1.0 if name.startswith('-') else 1.0
+        key = name.lstrip('-')
+        if key not in ok[0]:
+            raise ValueError(f'unknown objective {key!r}')
+        cols.append([sign * float(r[key]) for r in ok])
+    x = np.array(cols).T                                                     # (n, k)
+    le = (x[:, None, :] <= x[None, :, :]).all(2)
+    lt = (x[:, None, :] < x[None, :, :]).any(2)
+    dominated = (le & lt).any(0)                                             # some j dominates i
+    return [r['id'] for r, d in zip(ok, dominated) if not d]
+
+
+def table(rows: Sequence[Dict[str, Any]], sort_by: str = 'cost_per_m2',
+          descending: bool = False) -> List[Dict[str, Any]]:
+    ok = [r for r in rows if 'error' not in r]
+    if ok and sort_by not in ok[0]:
+        raise ValueError(f'unknown sort key {sort_by!r}')
+    return sorted(ok, key=lambda r: (r[sort_by] is None, r[sort_by]), reverse=descending) + \
+        [r for r in rows if 'error' in r]
+
+
+def _outputs(spec: Dict[str, Any]) -> Tuple[List[str], str]:
+    """(objectives, sort_by) of a spec, checked against the row columns so a
+    typo fails before any variant is evaluated."""
+    objectives = spec.get('objectives') or list(DEFAULT_OBJECTIVES)
+    if isinstance(objectives, str) or not all(isinstance(o, str) for o in objectives):
+        raise ValueError('objectives must be a list of metric names')
+    unknown = [o for o in objectives if o.lstrip('-') not in METRICS]
+    if unknown:
+        raise ValueError(f'unknown objectives {unknown}; expected any of {list(METRICS)}')
+    sort_by = spec.get('sort_by', objectives[0].lstrip('-'))
+    if sort_by not in COLUMNS:
+        raise ValueError(f'unknown sort_by {sort_by!r}; expected any of {list(COLUMNS)}')
+    currency = spec.get('currency', 'KES')
+    if currency not in _FX_TO_KES:
+        raise ValueError(f'unknown currency {currency!r}; expected one of {sorted(_FX_TO_KES)}')
+    return list(objectives), sort_by
+
+
+def run(spec: Dict[str, Any], *, processes: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """The whole sweep as a stream of records: {'type': 'start', ...}, one
+    {'type': 'variant', ...} per result, then {'type': 'summary', ...} with
+    the Pareto front and the sorted table. The spec is validated before the
+    start record is yielded."""
+    started = time.perf_counter()
+    variants = expand(spec)
+    objectives, sort_by = _outputs(spec)
+    options = {k: spec[k] for k in ('wall_systems', 'carbon_factors', 'currency') if k in spec}
+    yield {'type': 'start', 'variants': len(variants), 'method': spec.get('method', 'grid'),
+           'objectives': objectives}
+    rows = []
+    for row in sweep(variants, processes=processes, **options):
+        rows.append(row)
+        yield {'type': 'variant', 'done': len(rows), **row}
+    front = pareto(rows, objectives)
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info('sweep: %d variants, %d on the Pareto front, %.0f ms',
+                len(rows), len(front), elapsed)
+    yield {'type': 'summary', 'variants': len(rows),
+           'failed': sum(1 for r in rows if 'error' in r),
+           'objectives': objectives, 'pareto': front,
+           'table': table(rows, sort_by, bool(spec.get('descending', False))),
+           'elapsed_ms': round(elapsed, 1)}
+
+
+# ============================================================================
+# Flask integration
+# ============================================================================
+
+def register(app, *, auth_required=None) -> None:
+    from flask import Response, jsonify, request, stream_with_context
+
+    if auth_required is None:
+        def auth_required(fn): return fn
+
+    @app.route('/api/design/sweep', methods=['POST'])
+    @auth_required
+    def _design_sweep():
+        spec = request.get_json(silent=True) or {}
+        try:
+            records = run(spec)
+            first = next(records)                     # expands + validates the spec
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if spec.get('stream', True) is False:
+            try:
+                rest = list(records)
+            except (TypeError, ValueError, KeyError) as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            summary = rest[-1]
+            return jsonify({'success': True, **summary, 'method': first['method'],
+                            'rows': [{k: v for k, v in r.items() if k not in ('type', 'done')}
+                                     for r in rest[:-1]]})
+
+        def lines():
+            yield json.dumps(first) + '\n'
+            try:
+                for record in records:
+                    yield json.dumps(record, default=str) + '\n'
+            except Exception as e:
+                # Headers are gone: end the stream with an error record instead.
+                logger.exception('sweep failed mid-stream')
+                yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-store'})
+
+    @app.route('/api/design/sweep/options', methods=['GET'])
+    def _design_sweep_options():
+        return jsonify({'success': True, 'axes': list(AXES), 'base': BASE,
+                        'wall_systems': WALL_SYSTEMS,
+                        'foundations': ['strip', 'strip_beam', 'pad', 'raft'],
+                        'objectives': list(DEFAULT_OBJECTIVES), 'metrics': list(METRICS),
+                        'currencies': sorted(_FX_TO_KES), 'max_variants': MAX_VARIANTS})
+
+    logger.info('Design-sweep module registered (processes=%d)', SWEEP_PROCESSES)
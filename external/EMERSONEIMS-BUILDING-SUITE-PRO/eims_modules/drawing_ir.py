@@ -0,0 +1,316 @@
+"""Drawing intermediate representation (IR) with SVG and ReportLab backends.
+
+A renderer describes a drawing once, as a flat list of styled primitives in
+model millimetres with +y up (the architect's convention). Backends then
+turn that list into output:
+
+    to_svg(drawing, width_px=900)            -> str  (browser / API)
+    draw_on_canvas(canvas, drawing, ...)     -> None (straight onto a PDF page)
+
+Sheet packs used to serialise each plan to SVG and parse it back with
+svglib before drawing it; the canvas backend skips both steps.
+
+Styles are named like CSS classes. The SVG backend writes them out as a
+<style> block and tags elements with `class`; the canvas backend resolves
+the same table, so both outputs come from one definition.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, fields
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Style:
+    """Presentation for one class name. None = not set by this class."""
+    fill: Optional[str] = None          # colour, or 'none'
+    stroke: Optional[str] = None
+    width: Optional[float] = None       # stroke width, drawing units (mm)
+    dash: Optional[tuple] = None
+    opacity: Optional[float] = None
+    font_size: Optional[float] = None
+    font_weight: Optional[int] = None
+    anchor: Optional[str] = None        # 'start' | 'middle' | 'end'
+    central: Optional[bool] = None      # vertically centred on (x, y)
+
+
+# ---------------------------------------------------------------------------
+# Primitives (drawing units = mm, +y up)
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Polygon:
+    points: list
+    cls: str
+    fill: Optional[str] = None          # overrides the class fill
+    attrs: Optional[dict] = None        # extra SVG attributes (data-element-id, ...)
+
+
+@dataclass(slots=True)
+class Line:
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    cls: str
+    attrs: Optional[dict] = None
+
+
+@dataclass(slots=True)
+class Arc:
+    """Circular arc about (cx, cy); positive sweep is anticlockwise."""
+    cx: float
+    cy: float
+    r: float
+    start_deg: float
+    sweep_deg: float
+    cls: str
+
+
+@dataclass(slots=True)
+class Circle:
+    cx: float
+    cy: float
+    r: float
+    cls: str
+
+
+@dataclass(slots=True)
+class Text:
+    """Upright text anchored at (x, y). `dy` shifts it down the page and
+    `rotate` turns it clockwise on the page, both in drawing units/degrees."""
+    x: float
+    y: float
+    text: str
+    cls: str
+    dy: float = 0.0
+    rotate: float = 0.0
+
+
+@dataclass
+class Drawing:
+    extent: tuple                        # (minx, miny, maxx, maxy), drawing units
+    styles: dict
+    items: list = field(default_factory=list)
+    attrs: dict = field(default_factory=dict)   # root <svg> data-* attributes
+    font_family: str = 'Arial,sans-serif'
+
+    def add(self, item) -> None:
+        self.items.append(item)
+
+    def extend(self, items) -> None:
+        self.items.extend(items)
+
+
+def resolve(styles: dict, cls: str) -> Style:
+    """Merge space-separated classes left to right, like CSS."""
+    names = cls.split()
+    if len(names) == 1:
+        return styles.get(cls, Style())
+    merged = {}
+    for name in names:
+        st = styles.get(name)
+        if st is None:
+            continue
+        for f in fields(Style):
+            v = getattr(st, f.name)
+            if v is not None:
+                merged[f.name] = v
+    return Style(**merged)
+
+
+# ---------------------------------------------------------------------------
+# SVG backend
+# ---------------------------------------------------------------------------
+
+def _esc(s) -> str:
+    return (str(s).replace('&', '&amp;').replace('<', '&lt;')
+                  .replace('>', '&gt;').replace('"', '&quot;'))
+
+
+def _attrs(attrs: Optional[dict]) -> str:
+    if not attrs:
+        return ''
+    return ''.join(f' {k}="{_esc(v)}"' for k, v in attrs.items())
+
+
+def css(styles: dict) -> str:
+    rules = []
+    for name, st in styles.items():
+        decl = []
+        if st.fill is not None:
+            decl.append(f'fill:{st.fill}')
+        if st.stroke is not None:
+            decl.append(f'stroke:{st.stroke}')
+        if st.width is not None:
+            decl.append(f'stroke-width:{st.width:g}')
+        if st.dash:
+            decl.append('stroke-dasharray:' + ','.join(f'{d:g}' for d in st.dash))
+        if st.opacity is not None:
+            decl.append(f'opacity:{st.opacity:g}')
+        if st.font_size is not None:
+            decl.append(f'font-size:{st.font_size:g}px')
+        if st.font_weight is not None:
+            decl.append(f'font-weight:{st.font_weight}')
+        if st.anchor is not None:
+            decl.append(f'text-anchor:{st.anchor}')
+        if st.central:
+            decl.append('dominant-baseline:central')
+        rules.append(f'      .{name} {{ {"; ".join(decl)}; }}')
+    return '<style>\n' + '\n'.join(rules) + '\n    </style>'
+
+
+def _svg_item(it) -> str:
+    if isinstance(it, Line):
+        return (f'<line class="{it.cls}" x1="{it.x1:.1f}" y1="{it.y1:.1f}" '
+                f'x2="{it.x2:.1f}" y2="{it.y2:.1f}"{_attrs(it.attrs)}/>')
+    if isinstance(it, Polygon):
+        pts = ' '.join(f'{x:.1f},{y:.1f}' for x, y in it.points)
+        fill = f' fill="{it.fill}"' if it.fill else ''
+        return f'<polygon class="{it.cls}"{fill} points="{pts}"{_attrs(it.attrs)}/>'
+    if isinstance(it, Circle):
+        return f'<circle class="{it.cls}" cx="{it.cx:.1f}" cy="{it.cy:.1f}" r="{it.r:g}"/>'
+    if isinstance(it, Text):
+        rot = f' rotate({it.rotate:g})' if it.rotate else ''
+        y = f' y="{it.dy:g}"' if it.dy else ''
+        return (f'<g transform="translate({it.x:.1f},{it.y:.1f}) scale(1,-1){rot}">'
+                f'<text class="{it.cls}"{y}>{_esc(it.text)}</text></g>')
+    if isinstance(it, Arc):
+        a0 = math.radians(it.start_deg)
+        a1 = math.radians(it.start_deg + it.sweep_deg)
+        x0, y0 = it.cx + it.r * math.cos(a0), it.cy + it.r * math.sin(a0)
+        x1, y1 = it.cx + it.r * math.cos(a1), it.cy + it.r * math.sin(a1)
+        large = 1 if abs(it.sweep_deg) > 180 else 0
+        sweep = 1 if it.sweep_deg > 0 else 0
+        return (f'<path class="{it.cls}" d="M {x0:.1f} {y0:.1f} '
+                f'A {it.r:.1f} {it.r:.1f} 0 {large} {sweep} {x1:.1f} {y1:.1f}"/>')
+    raise TypeError(f'unknown drawing item {type(it).__name__}')
+
+
+def to_svg(d: Drawing, *, width_px: int = 900) -> str:
+    """Serialise to SVG. Content sits in a y-flipped group so the model's
+    +y-up coordinates come out the right way up; text is counter-flipped."""
+    minx, miny, maxx, maxy = d.extent
+    vw, vh = maxx - minx, maxy - miny
+    height_px = int(width_px * (vh / vw)) if vw > 0 else 600
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'viewBox="{minx:.1f} {miny:.1f} {vw:.1f} {vh:.1f}" '
+        f'width="{width_px}" height="{height_px}" '
+        f'style="background:#fff;font-family:{d.font_family}"{_attrs(d.attrs)}>',
+        css(d.styles),
+        f'<g transform="translate(0,{miny + maxy:.1f}) scale(1,-1)">',
+    ]
+    parts.extend(_svg_item(it) for it in d.items)
+    parts.append('</g>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+# ---------------------------------------------------------------------------
+# ReportLab canvas backend
+# ---------------------------------------------------------------------------
+
+class _CanvasPen:
+    """Applies styles to a canvas, skipping state changes that are no-ops."""
+
+    def __init__(self, c, styles: dict):
+        from reportlab.lib import colors
+        self.c = c
+        self.styles = styles
+        self._colour = {}
+        self._hex = colors.HexColor
+        self._state = {}
+
+    def colour(self, value):
+        if value not in self._colour:
+            self._colour[value] = self._hex(value)
+        return self._colour[value]
+
+    def _set(self, key, value, fn):
+        if self._state.get(key, object()) != value:
+            self._state[key] = value
+            fn(value)
+
+    def shape(self, cls: str, fill_override: Optional[str] = None) -> tuple[bool, bool]:
+        st = resolve(self.styles, cls)
+        fill = fill_override or st.fill
+        do_fill = bool(fill) and fill != 'none'
+        do_stroke = bool(st.stroke) and st.stroke != 'none'
+        c = self.c
+        if do_fill:
+            self._set('fill', fill, lambda v: c.setFillColor(self.colour(v)))
+        if do_stroke:
+            self._set('stroke', st.stroke, lambda v: c.setStrokeColor(self.colour(v)))
+            self._set('width', st.width if st.width is not None else 1.0, c.setLineWidth)
+            self._set('dash', tuple(st.dash or ()), lambda v: c.setDash(list(v)) if v else c.setDash())
+        alpha = st.opacity if st.opacity is not None else 1.0
+        self._set('alpha', alpha, lambda v: (c.setFillAlpha(v), c.setStrokeAlpha(v)))
+        return do_stroke, do_fill
+
+    def text(self, cls: str) -> Style:
+        st = resolve(self.styles, cls)
+        c = self.c
+        self._set('fill', st.fill or '#000000', lambda v: c.setFillColor(self.colour(v)))
+        self._set('alpha', st.opacity if st.opacity is not None else 1.0,
+                  lambda v: (c.setFillAlpha(v), c.setStrokeAlpha(v)))
+        font = 'Helvetica-Bold' if (st.font_weight or 400) >= 600 else 'Helvetica'
+        self._set('font', (font, st.font_size or 16.0), lambda v: c.setFont(*v))
+        return st
+
+
+def draw_on_canvas(c, d: Drawing, *, x_pt: float, y_pt: float, scale: float) -> None:
+    """Draw `d` onto a ReportLab canvas with its lower-left extent corner at
+    (x_pt, y_pt) and `scale` points per drawing unit, clipped to the extent.
+    PDF space is already +y up, so coordinates pass through untransformed."""
+    minx, miny, maxx, maxy = d.extent
+    c.saveState()
+    clip = c.beginPath()
+    clip.rect(x_pt, y_pt, (maxx - minx) * scale, (maxy - miny) * scale)
+    c.clipPath(clip, stroke=0, fill=0)
+    c.translate(x_pt - minx * scale, y_pt - miny * scale)
+    c.scale(scale, scale)
+    c.setLineCap(0)
+    pen = _CanvasPen(c, d.styles)
+    for it in d.items:
+        if isinstance(it, Line):
+            stroke, _ = pen.shape(it.cls)
+            if stroke:
+                c.line(it.x1, it.y1, it.x2, it.y2)
+        elif isinstance(it, Polygon):
+            stroke, fill = pen.shape(it.cls, it.fill)
+            if (stroke or fill) and it.points:
+                p = c.beginPath()
+                p.moveTo(*it.points[0])
+                for x, y in it.points[1:]:
+                    p.lineTo(x, y)
+                p.close()
+                c.drawPath(p, stroke=int(stroke), fill=int(fill))
+        elif isinstance(it, Circle):
+            stroke, fill = pen.shape(it.cls)
+            c.circle(it.cx, it.cy, it.r, stroke=int(stroke), fill=int(fill))
+        elif isinstance(it, Arc):
+            stroke, _ = pen.shape(it.cls)
+            if stroke:
+                p = c.beginPath()
+                p.arc(it.cx - it.r, it.cy - it.r, it.cx + it.r, it.cy + it.r,
+                      startAng=it.start_deg, extent=it.sweep_deg)
+                c.drawPath(p, stroke=1, fill=0)
+        elif isinstance(it, Text):
+            st = pen.text(it.cls)
+            base = -it.dy - (0.35 * (st.font_size or 16.0) if st.central else 0.0)
+            draw = {'middle': c.drawCentredString,
+                    'end': c.drawRightString}.get(st.anchor, c.drawString)
+            if it.rotate:
+                c.saveState()
+                c.translate(it.x, it.y)
+                c.rotate(-it.rotate)
+                draw(0, base, it.text)
+                c.restoreState()
+            else:
+                draw(it.x, it.y + base, it.text)
+        else:
+            raise TypeError(f'unknown drawing item {type(it).__name__}')
+    c.restoreState()
@@ -5,6 +5,16 @@ shear and bending stiffness; nodes have 3 DOF (u, v, theta). Supports
 nodal point loads, member point loads (single, anywhere along span),
 and uniformly distributed loads (UDL).
 
+Solver backends:
+  * 'sparse' (default) -- element stiffness and transformations built as
+    (m, 6, 6) numpy stacks, assembled into a scipy sparse matrix, nodes
+    renumbered by reverse Cuthill-McKee to shrink the bandwidth, and the
+    free-free block factorised once as a banded Cholesky. Every load case
+    and combination is a column of one right-hand side against that factor.
+  * 'python' -- the original dense list-of-lists assembly and Gauss
+    elimination, kept as the reference the sparse backend is checked
+    against (and for tiny models, where it is just as fast).
+
 Validation references:
   * MacGuire, Gallagher, Ziemian -- Matrix Structural Analysis (2nd ed.)
   * BS EN 1993-1-1 §5 (general method); EN 1992-1-1 §5
@@ -18,12 +28,17 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import linalg as sla
+from scipy import sparse
+from scipy.sparse.csgraph import reverse_cuthill_mckee
 
 logger = logging.getLogger('eims.frame')
 
 # ----------------------------------------------------------------------
-# Tiny numpy-free linear algebra (Gauss elimination with partial pivot)
+# Reference dense solver (Gauss elimination with partial pivot)
 # ----------------------------------------------------------------------
 
 def _solve(A: List[List[float]], b: List[float]) -> List[float]:
@@ -89,175 +104,311 @@ def _matmul(A: List[List[float]], B: List[List[float]]) -> List[List[float]]:
     return R
 
 
-def _matvec(A: List[List[float]], x: List[float]) -> List[float]:
-    return [sum(A[i][j] * x[j] for j in range(len(x))) for i in range(len(A))]
-
-
 def _transpose(A: List[List[float]]) -> List[List[float]]:
     return [list(r) for r in zip(*A)]
 
 
 # ----------------------------------------------------------------------
-# Fixed-end forces for member loads (UDL only -- the common case)
+# Model parsing (shared by both backends)
 # ----------------------------------------------------------------------
 
-def _fef_udl(w: float, L: float) -> List[float]:
-    """Fixed-end forces (acting ON the member from the supports) for a
-    transverse UDL of intensity w (force/length, +y local) on a
-    fixed-fixed beam, in LOCAL coordinates [Fxi, Fyi, Mi, Fxj, Fyj, Mj].
-
-    For downward UDL (w < 0 in our +y-up convention), the fixed ends push
-    the member UPWARD with magnitude |w|L/2, hence the leading minus sign.
-    See McGuire, Gallagher & Ziemian (2nd ed.) Table 7.1.
-    """
-    return [0.0, -w*L/2.0, -w*L*L/12.0,
-              0.0, -w*L/2.0,  w*L*L/12.0]
+SINGULAR_MSG = 'singular stiffness matrix (structure under-restrained or mechanism)'
+
+
+class _InputError(ValueError):
+    pass
+
+
+class _Model:
+    """Validated frame geometry plus vectorised element matrices."""
+
+    def __init__(self, nodes, members, supports):
+        if not nodes or not members:
+            raise _InputError('nodes and members required')
+        self.node_ids = [str(n['id']) for n in nodes]
+        self.nid = {n: k for k, n in enumerate(self.node_ids)}
+        self.xy = np.array([(float(n['x']), float(n['y'])) for n in nodes])
+        self.n_dof = 3 * len(nodes)
+
+        self.member_ids, ends, props = [], [], []
+        for m in members:
+            i, j = str(m['i']), str(m['j'])
+            if i not in self.nid or j not in self.nid:
+                raise _InputError(f'member {m.get("id")} references unknown node')
+            self.member_ids.append(str(m['id']))
+            ends.append((self.nid[i], self.nid[j]))
+            props.append((float(m['E']), float(m['A']), float(m['I'])))
+        self.ends = np.array(ends, dtype=np.int64)
+        self.E, self.A, self.I = np.array(props).T
+        d = self.xy[self.ends[:, 1]] - self.xy[self.ends[:, 0]]
+        self.L = np.hypot(d[:, 0], d[:, 1])
+        short = np.flatnonzero(self.L < 1e-9)
+        if len(short):
+            raise _InputError(f'member {members[short[0]].get("id")} has zero length')
+        self.angle = np.arctan2(d[:, 1], d[:, 0])
+        self.member_index = {mid: k for k, mid in enumerate(self.member_ids)}
+        self.dofs = (3 * self.ends[:, [0, 0, 0, 1, 1, 1]]
+                     + np.array([0, 1, 2, 0, 1, 2]))
+
+        self.fixed = np.zeros(self.n_dof, dtype=bool)
+        for sp in supports or []:
+            n = str(sp['node'])
+            if n not in self.nid:
+                raise _InputError(f'support on unknown node {n!r}')
+            b = 3 * self.nid[n]
+            self.fixed[b] |= bool(sp.get('ux'))
+            self.fixed[b + 1] |= bool(sp.get('uy'))
+            self.fixed[b + 2] |= bool(sp.get('rz'))
+        if not self.fixed.any():
+            raise _InputError('no supports defined -- structure is a mechanism')
+
+        self.kL = _local_k_stack(self.E, self.A, self.I, self.L)
+        self.T = _transform_stack(self.angle)
+
+    def load_vector(self, loads, member_loads) -> Tuple[np.ndarray, np.ndarray]:
+        """Global load vector F and local fixed-end forces (m, 6) for one case."""
+        w = np.zeros(len(self.member_ids))
+        for ml in member_loads or []:
+            if ml.get('type', 'UDL').upper() != 'UDL':
+                raise _InputError(f'unsupported member load type: {ml.get("type")}')
+            k = self.member_index.get(str(ml['member']))
+            if k is not None:
+                w[k] = float(ml['w'])
+        # Fixed-end forces of a transverse UDL on a fixed-fixed member, acting
+        # ON the member from the supports, local [Fxi, Fyi, Mi, Fxj, Fyj, Mj].
+        # For downward w (< 0, +y up) the ends push the member UPWARD with
+        # |w|L/2, hence the leading minus. McGuire et al. (2nd ed.) Table 7.1.
+        L = self.L
+        fef = np.zeros((len(L), 6))
+        fef[:, 1] = fef[:, 4] = -w * L / 2.0
+        fef[:, 2] = -w * L * L / 12.0
+        fef[:, 5] = w * L * L / 12.0
+        F = np.zeros(self.n_dof)
+        # Note: convention: applied loads = -fef on the structure
+        np.add.at(F, self.dofs, -np.einsum('mba,mb->ma', self.T, fef))
+        for ld in loads or []:
+            n = str(ld['node'])
+            if n not in self.nid:
+                raise _InputError(f'load on unknown node {n!r}')
+            b = 3 * self.nid[n]
+            F[b] += float(ld.get('Fx', 0.0))
+            F[b + 1] += float(ld.get('Fy', 0.0))
+            F[b + 2] += float(ld.get('Mz', 0.0))
+        return F, fef
+
+
+def _local_k_stack(E, A, I, L) -> np.ndarray:
+    """(m, 6, 6) local stiffness matrices; same terms as _local_k."""
+    EA_L = E * A / L
+    EI_L = E * I / L
+    EI_L2 = EI_L / L
+    EI_L3 = EI_L2 / L
+    k = np.zeros((len(L), 6, 6))
+    k[:, 0, 0] = k[:, 3, 3] = EA_L
+    k[:, 0, 3] = k[:, 3, 0] = -EA_L
+    k[:, 1, 1] = k[:, 4, 4] = 12 * EI_L3
+    k[:, 1, 4] = k[:, 4, 1] = -12 * EI_L3
+    k[:, 1, 2] = k[:, 2, 1] = k[:, 1, 5] = k[:, 5, 1] = 6 * EI_L2
+    k[:, 2, 4] = k[:, 4, 2] = k[:, 4, 5] = k[:, 5, 4] = -6 * EI_L2
+    k[:, 2, 2] = k[:, 5, 5] = 4 * EI_L
+    k[:, 2, 5] = k[:, 5, 2] = 2 * EI_L
+    return k
+
+
+def _transform_stack(angle) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    T = np.zeros((len(angle), 6, 6))
+    for o in (0, 3):
+        T[:, o, o] = T[:, o + 1, o + 1] = c
+        T[:, o, o + 1] = s
+        T[:, o + 1, o] = -s
+        T[:, o + 2, o + 2] = 1.0
+    return T
 
 
-def analyze(*, nodes: List[Dict[str, Any]],
-              members: List[Dict[str, Any]],
-              supports: List[Dict[str, Any]],
-              loads: List[Dict[str, Any]] = (),
-              member_loads: List[Dict[str, Any]] = ()) -> Dict[str, Any]:
-    """Solve a 2D frame by direct stiffness.
-
-    nodes        : [{id, x, y}]                                (m)
-    members      : [{id, i, j, E, A, I}]                       (Pa, m^2, m^4)
-    supports     : [{node, ux, uy, rz}]   bools True=fixed
-    loads        : [{node, Fx, Fy, Mz}]                        (N, N, N.m)
-    member_loads : [{member, type:'UDL', w}]                   w in N/m (transverse, +y local)
-    """
-    # ---- index -----------------------------------------------------
-    if not nodes or not members:
-        return {'success': False, 'error': 'nodes and members required'}
-    nid = {str(n['id']): k for k, n in enumerate(nodes)}
-    nN, nDOF = len(nodes), 3 * len(nodes)
-    coords = {str(n['id']): (float(n['x']), float(n['y'])) for n in nodes}
+# ----------------------------------------------------------------------
+# Backends: both return (K with a @ operator, U of shape (n_dof, k), info)
+# ----------------------------------------------------------------------
 
+def _bandwidth(rows: np.ndarray, cols: np.ndarray) -> int:
+    return int(np.abs(rows - cols).max()) if len(rows) else 0
+
+
+def _solve_sparse(model: _Model, F: np.ndarray):
+    kG = np.einsum('mba,mbc,mcd->mad', model.T, model.kL, model.T)
+    rows = np.repeat(model.dofs, 6, axis=1).ravel()
+    cols = np.tile(model.dofs, (1, 6)).ravel()
+    K = sparse.csr_matrix((kG.ravel(), (rows, cols)), shape=(model.n_dof,) * 2)
+
+    # Reverse Cuthill-McKee on the node graph, expanded to 3 DOF per node.
+    # Regular frames numbered floor by floor are often banded already, so
+    # keep the input order when RCM does not narrow the node bandwidth.
+    n_nodes = len(model.node_ids)
+    adj = sparse.coo_matrix((np.ones(len(model.ends)), (model.ends[:, 0], model.ends[:, 1])),
+                            shape=(n_nodes, n_nodes)).tocsr()
+    rcm = reverse_cuthill_mckee((adj + adj.T).tocsr(), symmetric_mode=True)
+    position = np.empty(n_nodes, dtype=np.int64)
+    position[rcm] = np.arange(n_nodes)
+    i, j = model.ends.T
+    if _bandwidth(position[i], position[j]) < _bandwidth(i, j):
+        node_order, ordering = rcm, 'reverse Cuthill-McKee'
+    else:
+        node_order, ordering = np.arange(n_nodes), 'input'
+    dof_order = (3 * node_order[:, None] + np.arange(3)).ravel()
+    free = dof_order[~model.fixed[dof_order]]
+
+    Kff = K[free][:, free].tocoo()
+    n = len(free)
+    upper = Kff.row <= Kff.col
+    r, c, v = Kff.row[upper], Kff.col[upper], Kff.data[upper]
+    u = _bandwidth(r, c)
+    ab = np.zeros((u + 1, n))
+    np.add.at(ab, (u + r - c, c), v)
+    diag = ab[u].copy()
+    try:
+        cb = sla.cholesky_banded(ab, lower=False, check_finite=False)
+    except np.linalg.LinAlgError:
+        raise ValueError(SINGULAR_MSG)
+    if n and (cb[u] ** 2 <= 1e-12 * diag.max()).any():
+        raise ValueError(SINGULAR_MSG)
+
+    U = np.zeros_like(F)
+    U[free] = sla.cho_solve_banded((cb, False), F[free], check_finite=False)
+    info = {'backend': 'sparse', 'ordering': ordering,
+            'factorization': 'banded Cholesky', 'free_dof_count': n,
+            'bandwidth': u}
+    return K, U, info
+
+
+def _solve_python(model: _Model, F: np.ndarray):
+    """Original dense assembly + Gauss elimination, one solve per column."""
+    nDOF = model.n_dof
     K = [[0.0] * nDOF for _ in range(nDOF)]
-    F = [0.0] * nDOF
-    member_data = []
-
-    # ---- assemble K and equivalent nodal loads ---------------------
-    udls_by_member = {}
-    for ml in (member_loads or []):
-        if ml.get('type', 'UDL').upper() != 'UDL':
-            return {'success': False,
-                     'error': f'unsupported member load type: {ml.get("type")}'}
-        udls_by_member[str(ml['member'])] = float(ml['w'])
-
-    for m in members:
-        i, j = str(m['i']), str(m['j'])
-        if i not in nid or j not in nid:
-            return {'success': False, 'error': f'member {m.get("id")} references unknown node'}
-        xi, yi = coords[i]; xj, yj = coords[j]
-        L = math.hypot(xj - xi, yj - yi)
-        if L < 1e-9:
-            return {'success': False, 'error': f'member {m.get("id")} has zero length'}
-        ang = math.atan2(yj - yi, xj - xi)
-        E, A, I = float(m['E']), float(m['A']), float(m['I'])
-        kL = _local_k(E, A, I, L)
-        T  = _transform(ang)
-        Tt = _transpose(T)
-        kG = _matmul(_matmul(Tt, kL), T)
-
-        # DOF map
-        dofs = [3*nid[i], 3*nid[i]+1, 3*nid[i]+2,
-                 3*nid[j], 3*nid[j]+1, 3*nid[j]+2]
+    for k in range(len(model.member_ids)):
+        kL = _local_k(model.E[k], model.A[k], model.I[k], model.L[k])
+        T = _transform(model.angle[k])
+        kG = _matmul(_matmul(_transpose(T), kL), T)
+        dofs = model.dofs[k].tolist()
         for a in range(6):
             for b in range(6):
                 K[dofs[a]][dofs[b]] += kG[a][b]
-
-        # Member loads -> equivalent nodal forces
-        w = udls_by_member.get(str(m['id']), 0.0)
-        feL = _fef_udl(w, L) if w != 0.0 else [0.0]*6
-        # Note: convention: applied loads = -fef on the structure
-        feG = _matvec(Tt, feL)
-        for a in range(6):
-            F[dofs[a]] -= feG[a]
-
-        member_data.append({'id': str(m['id']), 'i': i, 'j': j,
-                              'L_m': L, 'angle_rad': ang,
-                              'E': E, 'A': A, 'I': I,
-                              'kL': kL, 'T': T, 'fef_local': feL,
-                              'dofs': dofs})
-
-    # ---- nodal loads ----------------------------------------------
-    for ld in (loads or []):
-        n = str(ld['node'])
-        if n not in nid:
-            return {'success': False, 'error': f'load on unknown node {n!r}'}
-        b = 3 * nid[n]
-        F[b]   += float(ld.get('Fx', 0.0))
-        F[b+1] += float(ld.get('Fy', 0.0))
-        F[b+2] += float(ld.get('Mz', 0.0))
-
-    # ---- supports: penalty-free reduction ---------------------------
-    fixed_dofs = set()
-    for s in (supports or []):
-        n = str(s['node'])
-        if n not in nid:
-            return {'success': False, 'error': f'support on unknown node {n!r}'}
-        b = 3 * nid[n]
-        if s.get('ux'): fixed_dofs.add(b)
-        if s.get('uy'): fixed_dofs.add(b+1)
-        if s.get('rz'): fixed_dofs.add(b+2)
-    if not fixed_dofs:
-        return {'success': False, 'error': 'no supports defined -- structure is a mechanism'}
-
-    free = [d for d in range(nDOF) if d not in fixed_dofs]
+    free = [d for d in range(nDOF) if not model.fixed[d]]
     Kff = [[K[i][j] for j in free] for i in free]
-    Ff  = [F[i] for i in free]
+    U = np.zeros_like(F)
+    for col in range(F.shape[1]):
+        U[free, col] = _solve(Kff, [F[i, col] for i in free])
+    return np.array(K), U, {'backend': 'python', 'factorization': 'Gauss elimination',
+                            'free_dof_count': len(free)}
 
-    try:
-        Uf = _solve(Kff, Ff)
-    except ValueError as e:
-        return {'success': False, 'error': str(e)}
 
-    U = [0.0] * nDOF
-    for k, d in enumerate(free):
-        U[d] = Uf[k]
+BACKENDS = {'sparse': _solve_sparse, 'python': _solve_python}
 
-    # ---- reactions = K @ U - F (for fixed DOFs) -------------------
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+
+def _case_results(model: _Model, KU: np.ndarray, U: np.ndarray,
+                  F: np.ndarray, fef: np.ndarray) -> Dict[str, Any]:
     R: Dict[str, Dict[str, float]] = {}
-    KU = _matvec(K, U)
-    for n_id, idx in nid.items():
+    fixed = model.fixed
+    # reactions = K @ U - F (for fixed DOFs)
+    react = ((KU - F) / 1e3).tolist()
+    for n_id, idx in model.nid.items():
         b = 3 * idx
-        if (b in fixed_dofs) or (b+1 in fixed_dofs) or (b+2 in fixed_dofs):
+        if fixed[b] or fixed[b+1] or fixed[b+2]:
             R[n_id] = {
-                'Rx_kN': round((KU[b]   - F[b])   / 1e3, 4) if b   in fixed_dofs else None,
-                'Ry_kN': round((KU[b+1] - F[b+1]) / 1e3, 4) if b+1 in fixed_dofs else None,
-                'Mz_kNm': round((KU[b+2] - F[b+2]) / 1e3, 4) if b+2 in fixed_dofs else None,
+                'Rx_kN':  round(react[b],   4) if fixed[b]   else None,
+                'Ry_kN':  round(react[b+1], 4) if fixed[b+1] else None,
+                'Mz_kNm': round(react[b+2], 4) if fixed[b+2] else None,
             }
 
-    # ---- nodal displacements --------------------------------------
+    Ul = U.tolist()
     disp_out = {}
-    for n_id, idx in nid.items():
+    for n_id, idx in model.nid.items():
         b = 3 * idx
-        disp_out[n_id] = {'ux_mm':  round(U[b]   * 1e3, 4),
-                            'uy_mm':  round(U[b+1] * 1e3, 4),
-                            'rz_rad': round(U[b+2],          6)}
-
-    # ---- member end forces: fL = kL * T * uG - fefL ---------------
+        disp_out[n_id] = {'ux_mm':  round(Ul[b]   * 1e3, 4),
+                            'uy_mm':  round(Ul[b+1] * 1e3, 4),
+                            'rz_rad': round(Ul[b+2],          6)}
+
+    # member end forces: fL = kL * T * uG - fefL
+    uL = np.einsum('mab,mb->ma', model.T, U[model.dofs])
+    fL = ((np.einsum('mab,mb->ma', model.kL, uL) - fef) / 1e3).tolist()
+    L, ang = model.L.tolist(), np.degrees(model.angle).tolist()
     member_out = []
-    for md in member_data:
-        uG = [U[d] for d in md['dofs']]
-        uL = _matvec(md['T'], uG)
-        fL = _matvec(md['kL'], uL)
-        # subtract fixed-end forces -> residual member end forces from loads
-        fL = [fL[k] - md['fef_local'][k] for k in range(6)]
+    for k, mid in enumerate(model.member_ids):
+        f = fL[k]
         member_out.append({
-            'id': md['id'], 'L_m': round(md['L_m'], 4),
-            'angle_deg': round(math.degrees(md['angle_rad']), 3),
-            'end_i': {'N_kN': round( fL[0]/1e3, 4),
-                       'V_kN': round( fL[1]/1e3, 4),
-                       'M_kNm': round( fL[2]/1e3, 4)},
-            'end_j': {'N_kN': round( fL[3]/1e3, 4),
-                       'V_kN': round( fL[4]/1e3, 4),
-                       'M_kNm': round( fL[5]/1e3, 4)},
+            'id': mid, 'L_m': round(L[k], 4),
+            'angle_deg': round(ang[k], 3),
+            'end_i': {'N_kN': round(f[0], 4), 'V_kN': round(f[1], 4), 'M_kNm': round(f[2], 4)},
+            'end_j': {'N_kN': round(f[3], 4), 'V_kN': round(f[4], 4), 'M_kNm': round(f[5], 4)},
         })
+    return {'displacements': disp_out, 'reactions': R, 'members': member_out}
+
+
+def analyze(*, nodes: List[Dict[str, Any]],
+              members: List[Dict[str, Any]],
+              supports: List[Dict[str, Any]],
+              loads: List[Dict[str, Any]] = (),
+              member_loads: List[Dict[str, Any]] = (),
+              load_cases: Optional[Dict[str, Dict[str, Any]]] = None,
+              combinations: Optional[Dict[str, Dict[str, float]]] = None,
+              backend: str = 'sparse') -> Dict[str, Any]:
+    """Solve a 2D frame by direct stiffness.
+
+    nodes        : [{id, x, y}]                                (m)
+    members      : [{id, i, j, E, A, I}]                       (Pa, m^2, m^4)
+    supports     : [{node, ux, uy, rz}]   bools True=fixed
+    loads        : [{node, Fx, Fy, Mz}]                        (N, N, N.m)
+    member_loads : [{member, type:'UDL', w}]                   w in N/m (transverse, +y local)
+    load_cases   : {name: {loads: [...], member_loads: [...]}} optional extra cases
+    combinations : {name: {case_name: factor}}                 e.g. {'ULS': {'G': 1.35, 'Q': 1.5}}
+    backend      : 'sparse' | 'python'
+
+    The top-level loads/member_loads form the default case reported at the
+    top level. Cases and combinations share one factorisation of K.
+    """
+    solve = BACKENDS.get(backend)
+    if solve is None:
+        return {'success': False, 'error': f'unknown backend {backend!r}'}
+    try:
+        model = _Model(nodes, members, supports)
+        cases = {'': model.load_vector(loads, member_loads)}
+        for name, case in (load_cases or {}).items():
+            if not str(name):
+                raise _InputError('load case names must not be empty')
+            if not isinstance(case, dict):
+                raise _InputError(f'load case {name!r} must be an object')
+            cases[str(name)] = model.load_vector(case.get('loads'), case.get('member_loads'))
+        for name, factors in (combinations or {}).items():
+            if not isinstance(factors, dict) or not factors:
+                raise _InputError(f'combination {name!r} needs at least one load case factor')
+            unknown = [c for c in factors if not str(c) or str(c) not in cases]
+            if unknown:
+                raise _InputError(f'combination {name!r} references unknown load case {unknown[0]!r}')
+            try:
+                factors = {str(c): float(f) for c, f in factors.items()}
+            except (TypeError, ValueError):
+                raise _InputError(f'combination {name!r} has a non-numeric factor') from None
+            cases[('combo', str(name))] = (
+                sum(f * cases[c][0] for c, f in factors.items()),
+                sum(f * cases[c][1] for c, f in factors.items()))
+    except _InputError as e:
+        return {'success': False, 'error': str(e)}
+
+    names = list(cases)
+    F = np.column_stack([cases[k][0] for k in names])
+    try:
+        K, U, info = solve(model, F)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+    KU = K @ U
+    info['load_vectors'] = len(names)
+    results = {k: _case_results(model, KU[:, c], U[:, c], F[:, c], cases[k][1])
+               for c, k in enumerate(names)}
 
-    return {
+    out = {
         'success': True,
         'standard': '2D plane frame, direct stiffness (matrix) method',
         'reference': 'McGuire, Gallagher, Ziemian (2000); Cook et al. (2002)',
@@ -265,16 +416,21 @@ def analyze(*, nodes: List[Dict[str, Any]],
             'global':   '+x right, +y up, +Mz CCW, +ve rotation CCW',
             'member':   '+N tension, +V follows local +y, +M sags local +y up',
         },
-        'dof_count': nDOF,
-        'fixed_dof_count': len(fixed_dofs),
-        'displacements': disp_out,
-        'reactions':     R,
-        'members':       member_out,
+        'dof_count': model.n_dof,
+        'fixed_dof_count': int(model.fixed.sum()),
+        **results.pop(''),
+        'solver': info,
         'disclaimer':    'Linear elastic small-displacement analysis. '
                           'No P-delta, plastic hinge, dynamic or buckling '
                           'effects. Verify against an independent FEA package '
                           'for production design. Inputs in SI (Pa, m, N).',
     }
+    if load_cases:
+        out['load_cases'] = {k: v for k, v in results.items() if isinstance(k, str)}
+    if combinations:
+        out['combinations'] = {k[1]: {'factors': combinations[k[1]], **v}
+                               for k, v in results.items() if isinstance(k, tuple)}
+    return out
 
 
 # ============================================================================
@@ -294,6 +450,9 @@ def register(app, *, auth_required=None) -> None:
                 supports=d.get('supports') or [],
                 loads=d.get('loads') or [],
                 member_loads=d.get('member_loads') or [],
+                load_cases=d.get('load_cases') or None,
+                combinations=d.get('combinations') or None,
+                backend=d.get('backend') or 'sparse',
             )
         except (TypeError, ValueError, KeyError) as e:
             return jsonify({'success': False, 'error': str(e)}), 400
@@ -0,0 +1,523 @@
+"""Binary glTF 2.0 (.glb) writer with geometry instancing.
+
+Every 3D export in the suite is a list of simple solids (box, cylinder,
+pyramid, sphere, hemisphere) with a position, size and rotation; that is the
+`objects` schema the wizard's addMesh() consumes. Writing each as its own
+mesh repeats the same 24-vertex box hundreds of times. Here each primitive
+kind exists once per file as a unit mesh, and every object is an instance
+of it with its own transform:
+
+  * instancing=True  — one node per (primitive, material) group carrying
+    EXT_mesh_gpu_instancing TRANSLATION / ROTATION / SCALE accessors
+    (three.js r139+, Babylon, Blender 3.x). ROTATION is omitted for groups
+    that are all axis-aligned.
+  * instancing=False — one node per object, all sharing the group's mesh.
+    Plain core glTF, for viewers without the extension.
+
+With quantize=True (instancing only), instance translation and scale are
+normalised uint16 inside a per-group uniform dequantisation transform
+stored on the node, and rotations are normalised int16 (KHR_mesh_quantization).
+The step is extent / 65535: about 1 mm on a 60 m model. Unit meshes are
+float32 positions and normals with uint16 indices. Instance attributes of
+all groups share one strided buffer view per attribute, so encoding costs
+a fixed number of numpy passes however many materials there are. Object
+ids go in each node's ``extras.ids``, in instance order.
+
+Unit primitives match the three.js geometries addMesh builds (BoxGeometry,
+CylinderGeometry with 16 segments, 4-sided ConeGeometry, 12x12
+SphereGeometry, and its top half). `object_scale` maps an object's `size`
+to the instance scale in the same way addMesh maps it to a radius and height.
+
+The file is built as a JSON chunk plus a list of numpy buffers. `chunks()`
+yields it piece by piece, so a large model can be streamed to the client
+without being concatenated first. `to_bytes()` and `write(fp)` are built
+on top of it.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GLB_MAGIC = 0x46546C67          # 'glTF'
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+_FLOAT, _SHORT, _USHORT = 5126, 5122, 5123
+_ARRAY_BUFFER, _ELEMENT_ARRAY_BUFFER = 34962, 34963
+
+_IDENTITY = np.array([0.0, 0.0, 0.0, 1.0])
+
+PRIMITIVES = ('box', 'cylinder', 'pyramid', 'sphere', 'hemisphere')
+
+Color = Any     # 0xRRGGBB, '#rrggbb', '#rgb' (sRGB) or [r, g, b(, a)] linear factors
+
+
+# ---------------------------------------------------------------------------
+#  Unit primitives (three.js conventions, centred on the origin)
+# ---------------------------------------------------------------------------
+
+def _box() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    pos, nrm, idx = [], [], []
+    # (normal, u, v) with u x v = normal, so (0, 1, 2), (0, 2, 3) face outward.
+    faces = (((1, 0, 0), (0, 1, 0), (0, 0, 1)), ((-1, 0, 0), (0, 0, 1), (0, 1, 0)),
+             ((0, 1, 0), (0, 0, 1), (1, 0, 0)), ((0, -1, 0), (1, 0, 0), (0, 0, 1)),
+             ((0, 0, 1), (1, 0, 0), (0, 1, 0)), ((0, 0, -1), (0, 1, 0), (1, 0, 0)))
+    for n, u, v in faces:
+        n, u, v = np.array(n, float), np.array(u, float), np.array(v, float)
+        base = len(pos)
+        for a, b in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+            pos.append(0.5 * (n + a * u + b * v))
+            nrm.append(n)
+        idx += [base, base + 1, base + 2, base, base + 2, base + 3]
+    return np.array(pos), np.array(nrm), np.array(idx)
+
+
+def _cylinder(radius_top: float, radius_bottom: float, segments: int,
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """three.js CylinderGeometry(radius_top, radius_bottom, 1, segments)."""
+    theta = np.linspace(0.0, 2 * np.pi, segments + 1)
+    s, c = np.sin(theta), np.cos(theta)
+    slope = radius_bottom - radius_top
+    side_n = np.stack([s, np.full_like(s, slope), c], axis=1)
+    side_n /= np.linalg.norm(side_n, axis=1, keepdims=True)
+    top = np.stack([radius_top * s, np.full_like(s, 0.5), radius_top * c], axis=1)
+    bottom = np.stack([radius_bottom * s, np.full_like(s, -0.5), radius_bottom * c], axis=1)
+    pos, nrm = [top, bottom], [side_n, side_n]
+    k = np.arange(segments)
+    a, b, c_, d = k, k + segments + 1, k + segments + 2, k + 1
+    idx = [np.stack([b, c_, d], 1).ravel()]
+    if radius_top > 0:                              # a cone's apex triangles are degenerate
+        idx.append(np.stack([a, b, d], 1).ravel())
+    n = 2 * (segments + 1)
+    for y, r, sign in ((0.5, radius_top, 1.0), (-0.5, radius_bottom, -1.0)):
+        if r <= 0:
+            continue
+        ring = np.stack([r * s, np.full_like(s, y), r * c], axis=1)
+        pos += [np.array([[0.0, y, 0.0]]), ring]
+        nrm += [np.tile([0.0, sign, 0.0], (segments + 2, 1))]
+        centre, first = n, n + 1
+        tri = (np.stack([np.full(segments, centre), first + k, first + k + 1], 1) if sign > 0
+               else np.stack([np.full(segments, centre), first + k + 1, first + k], 1))
+        idx.append(tri.ravel())
+        n += segments + 2
+    return np.concatenate(pos), np.concatenate(nrm), np.concatenate(idx)
+
+
+def _sphere(theta_length: float, segments: int = 12) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """three.js SphereGeometry(0.5, 12, 12, 0, 2π, 0, theta_length)."""
+    u = np.linspace(0.0, 1.0, segments + 1)
+    phi = u * 2 * np.pi
+    theta = u * theta_length
+    th, ph = np.meshgrid(theta, phi, indexing='ij')
+    nrm = np.stack([-np.cos(ph) * np.sin(th), np.cos(th), np.sin(ph) * np.sin(th)], axis=-1)
+    nrm = nrm.reshape(-1, 3)
+    grid = np.arange((segments + 1) ** 2).reshape(segments + 1, segments + 1)
+    idx = []
+    for iy in range(segments):
+        a, b = grid[iy, 1:], grid[iy, :-1]
+        c, d = grid[iy + 1, :-1], grid[iy + 1, 1:]
+        if iy != 0:
+            idx.append(np.stack([a, b, d], 1).ravel())
+        if iy != segments - 1 or theta_length < np.pi:
+            idx.append(np.stack([b, c, d], 1).ravel())
+    return 0.5 * nrm, nrm, np.concatenate(idx)
+
+
+@lru_cache(maxsize=None)
+def unit_mesh(kind: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(positions float32 (n, 3), normals float32 (n, 3), indices uint16)."""
+    if kind == 'box':
+        p, n, i = _box()
+    elif kind == 'cylinder':
+        p, n, i = _cylinder(0.5, 0.5, 16)
+    elif kind == 'pyramid':
+        p, n, i = _cylinder(0.0, 0.5, 4)
+    elif kind == 'sphere':
+        p, n, i = _sphere(np.pi)
+    elif kind == 'hemisphere':
+        p, n, i = _sphere(np.pi / 2)
+    else:
+        raise ValueError(f'unknown primitive {kind!r}')
+    return (np.ascontiguousarray(p, np.float32), np.ascontiguousarray(n, np.float32),
+            np.ascontiguousarray(i, np.uint16))
+
+
+def object_scale(kind: str, size: np.ndarray) -> np.ndarray:
+    """Instance scale for ``size`` rows (n, 3), as addMesh sizes each kind."""
+    size = np.asarray(size, float).reshape(-1, 3)
+    if kind == 'box':
+        return size
+    m = np.maximum(size[:, 0], size[:, 2])
+    if kind in ('cylinder', 'pyramid'):
+        return np.stack([m, size[:, 1], m], axis=1)
+    if kind == 'sphere':
+        m = np.maximum(m, size[:, 1])
+    return np.stack([m, m, m], axis=1)
+
+
+def euler_to_quat(rx, ry, rz) -> np.ndarray:
+    """Quaternions (n, 4) xyzw for three.js 'XYZ' Euler angles in degrees."""
+    x, y, z = np.broadcast_arrays(*(np.radians(np.asarray(a, float)) / 2 for a in (rx, ry, rz)))
+    c1, c2, c3 = np.cos(x), np.cos(y), np.cos(z)
+    s1, s2, s3 = np.sin(x), np.sin(y), np.sin(z)
+    return np.stack([s1 * c2 * c3 + c1 * s2 * s3,
+                     c1 * s2 * c3 - s1 * c2 * s3,
+                     c1 * c2 * s3 + s1 * s2 * c3,
+                     c1 * c2 * c3 - s1 * s2 * s3], axis=-1).reshape(-1, 4)
+
+
+def _linear(c: float) -> float:
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def color_factor(color: Color, opacity: float = 1.0) -> Tuple[float, ...]:
+    """glTF baseColorFactor (linear RGBA) for an sRGB int / hex colour, or
+    pass-through for an explicit [r, g, b(, a)] factor."""
+    if isinstance(color, (list, tuple)):
+        rgba = [float(v) for v in color] + [opacity] * (4 - len(color))
+        return tuple(round(v, 4) for v in rgba[:4])
+    if isinstance(color, str):
+        h = color.lstrip('#')
+        if len(h) == 3:
+            h = ''.join(ch * 2 for ch in h)
+        try:
+            color = int(h[:6], 16)
+        except ValueError:
+            color = 0xcccccc
+    rgb = ((int(color) >> 16) & 255, (int(color) >> 8) & 255, int(color) & 255)
+    return tuple(round(_linear(v / 255.0), 4) for v in rgb) + (round(float(opacity), 4),)
+
+
+# ---------------------------------------------------------------------------
+#  Writer
+# ---------------------------------------------------------------------------
+
+class _Group:
+    __slots__ = ('kind', 'material', 't', 's', 'q', 'ids')
+
+    def __init__(self, kind: str, material: int):
+        self.kind, self.material = kind, material
+        self.t: List[np.ndarray] = []
+        self.s: List[np.ndarray] = []
+        self.q: List[Optional[np.ndarray]] = []
+        self.ids: List[Optional[str]] = []
+
+
+class GlbWriter:
+    """Collects instances of unit primitives and writes them as one .glb."""
+
+    def __init__(self, *, generator: str = 'EmersonEIMS glTF writer',
+                 instancing: bool = True, quantize: bool = True,
+                 double_sided: bool = False):
+        self.generator = generator
+        self.instancing = instancing
+        self.quantize = quantize and instancing
+        self.double_sided = double_sided
+        self.extras: Optional[Dict[str, Any]] = None     # asset.extras
+        self._materials: List[Dict[str, Any]] = []
+        self._material_ix: Dict[tuple, int] = {}
+        self._groups: Dict[Tuple[str, int], _Group] = {}
+        self._built: Optional[Tuple[bytes, List[bytes]]] = None
+
+    # ---- scene content ----
+    def material(self, color: Color, *, roughness: float = 0.75, metalness: float = 0.05,
+                 opacity: float = 1.0, name: Optional[str] = None) -> int:
+        raw = (color if not isinstance(color, list) else tuple(color),
+               roughness, metalness, opacity)
+        ix = self._material_ix.get(raw)
+        if ix is not None:
+            return ix
+        factor = color_factor(color, opacity)
+        key = (factor, round(roughness, 3), round(metalness, 3))
+        ix = self._material_ix.get(key)
+        if ix is None:
+            ix = self._material_ix[key] = len(self._materials)
+            mat: Dict[str, Any] = {
+                'name': name or f'mat_{ix}',
+                'pbrMetallicRoughness': {'baseColorFactor': list(factor),
+                                         'metallicFactor': key[2],
+                                         'roughnessFactor': key[1]},
+            }
+            if factor[3] < 1.0:
+                mat['alphaMode'] = 'BLEND'
+            if self.double_sided:
+                mat['doubleSided'] = True
+            self._materials.append(mat)
+        self._material_ix[raw] = ix
+        return ix
+
+    def add_many(self, kind: str, material: int, translations, scales,
+                 rotations=None, ids: Optional[Sequence[Optional[str]]] = None) -> None:
+        """Add n instances: translations / scales (n, 3), rotations (n, 4)
+        xyzw quaternions or None for identity, optional per-instance ids."""
+        if kind not in PRIMITIVES:
+            raise ValueError(f'unknown primitive {kind!r}')
+        t = np.asarray(translations, float).reshape(-1, 3)
+        if not len(t):
+            return
+        g = self._groups.get((kind, material))
+        if g is None:
+            g = self._groups[(kind, material)] = _Group(kind, material)
+        g.t.append(t)
+        g.s.append(np.broadcast_to(np.asarray(scales, float).reshape(-1, 3), t.shape))
+        g.q.append(None if rotations is None else np.asarray(rotations, float).reshape(-1, 4))
+        g.ids.extend(ids if ids is not None else [None] * len(t))
+        self._built = None
+
+    def add(self, kind: str, material: int, translation, scale, rotation=None,
+            id: Optional[str] = None) -> None:
+        self.add_many(kind, material, [translation], [scale],
+                      None if rotation is None else [rotation], [id])
+
+    @property
+    def instance_count(self) -> int:
+        return sum(len(g.ids) for g in self._groups.values())
+
+    @property
+    def draw_calls(self) -> int:
+        """Meshes a viewer draws: one per node when instancing, else one per object."""
+        return len(self._groups) if self.instancing else self.instance_count
+
+    # ---- encoding ----
+    def _build(self) -> Tuple[bytes, List[bytes]]:
+        if self._built is not None:
+            return self._built
+        pieces: List[bytes] = []
+        offset = 0
+        views: List[Dict[str, Any]] = []
+        accessors: List[Dict[str, Any]] = []
+
+        def view(arr: np.ndarray, target: Optional[int] = None,
+                 stride: Optional[int] = None) -> int:
+            nonlocal offset
+            data = np.ascontiguousarray(arr).tobytes()
+            v: Dict[str, Any] = {'buffer': 0, 'byteOffset': offset, 'byteLength': len(data)}
+            if target:
+                v['target'] = target
+            if stride:
+                v['byteStride'] = stride
+            pad = (-len(data)) % 4
+            pieces.append(data + b'\0' * pad if pad else data)
+            offset += len(data) + pad
+            views.append(v)
+            return len(views) - 1
+
+        def accessor(view_ix: int, ctype: int, count: int, type_: str, **kw) -> int:
+            accessors.append({'bufferView': view_ix, 'componentType': ctype,
+                              'count': count, 'type': type_, **kw})
+            return len(accessors) - 1
+
+        unit_prims: Dict[str, Dict[str, Any]] = {}
+        for kind in sorted({g.kind for g in self._groups.values()}):
+            p, n, i = unit_mesh(kind)
+            unit_prims[kind] = {
+                'attributes': {
+                    'POSITION': accessor(view(p, _ARRAY_BUFFER), _FLOAT, len(p), 'VEC3',
+                                         min=p.min(0).tolist(), max=p.max(0).tolist()),
+                    'NORMAL': accessor(view(n, _ARRAY_BUFFER), _FLOAT, len(n), 'VEC3'),
+                },
+                'indices': accessor(view(i, _ELEMENT_ARRAY_BUFFER), _USHORT, len(i), 'SCALAR'),
+                'mode': 4,
+            }
+
+        groups = list(self._groups.values())
+        meshes = [{'name': f'{g.kind}_{g.material}',
+                   'primitives': [{**unit_prims[g.kind], 'material': g.material}]}
+                  for g in groups]
+        nodes: List[Dict[str, Any]] = []
+        if groups:
+            # All groups are encoded together, one buffer view per instance
+            # attribute, so the numpy work doesn't grow with the group count.
+            counts = np.array([len(g.ids) for g in groups])
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            t = np.concatenate([a for g in groups for a in g.t])
+            sc = np.concatenate([a for g in groups for a in g.s])
+            q = np.concatenate([r if r is not None else np.broadcast_to(_IDENTITY, (len(tt), 4))
+                                for g in groups for r, tt in zip(g.q, g.t)])
+            rotated = np.logical_or.reduceat(np.abs(q - _IDENTITY).max(1) > 1e-9, starts)
+            if self.instancing:
+                nodes = self._instanced_nodes(groups, counts, starts, t, sc, q, rotated,
+                                              view, accessor)
+            else:
+                for k, g in enumerate(groups):
+                    rows = slice(starts[k], starts[k] + counts[k])
+                    nodes.extend(self._plain_nodes(g, k, t[rows], sc[rows],
+                                                   q[rows] if rotated[k] else None))
+
+        used = ['EXT_mesh_gpu_instancing'] if self.instancing and nodes else []
+        if self.quantize and nodes:
+            used.append('KHR_mesh_quantization')
+        gltf: Dict[str, Any] = {
+            'asset': {'version': '2.0', 'generator': self.generator,
+                      **({'extras': self.extras} if self.extras else {})},
+            'scene': 0,
+            'scenes': [{'nodes': list(range(len(nodes)))}],
+            'nodes': nodes, 'meshes': meshes, 'materials': self._materials,
+            'accessors': accessors, 'bufferViews': views,
+            'buffers': [{'byteLength': offset}],
+        }
+        if used:
+            gltf['extensionsUsed'] = used
+            gltf['extensionsRequired'] = list(used)
+        head = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+        head += b' ' * ((-len(head)) % 4)
+        self._built = (head, pieces)
+        return self._built
+
+    def _instanced_nodes(self, groups: List[_Group], counts, starts, t, s, q, rotated,
+                         view, accessor) -> List[Dict[str, Any]]:
+        nodes: List[Dict[str, Any]] = [
+            {'name': f'{g.kind}_{g.material}', 'mesh': k} for k, g in enumerate(groups)]
+        # Rotations are written for rotated groups only.
+        q_rows = np.repeat(rotated, counts)
+        q_starts = np.concatenate([[0], np.cumsum(np.where(rotated, counts, 0))[:-1]])
+        q = q[q_rows]
+        if self.quantize:
+            # Uniform dequantisation per node: world = origin + extent * value.
+            origin = np.minimum.reduceat(t, starts, axis=0)
+            extent = np.maximum.reduceat(np.maximum(t - np.repeat(origin, counts, axis=0),
+                                                    s).max(1), starts)
+            extent = np.maximum(extent, 1e-6)
+            scale = np.repeat(extent, counts)[:, None]
+            offset = np.repeat(origin, counts, axis=0)
+            packed = []
+            for vals in ((t - offset) / scale, s / scale):
+                rows = np.zeros((len(t), 4), np.uint16)      # 8-byte stride keeps rows aligned
+                rows[:, :3] = np.rint(np.clip(vals, 0.0, 1.0) * 65535)
+                packed.append(view(rows, stride=8))
+            views = dict(zip(('TRANSLATION', 'SCALE'), packed))
+            comp, stride, norm = _USHORT, 8, {'normalized': True}
+            q_view = (view(np.rint(np.clip(q, -1.0, 1.0) * 32767).astype(np.int16), stride=8)
+                      if len(q) else None)
+            q_comp, q_stride = _SHORT, 8
+            origin, extent = origin.tolist(), extent.tolist()
+        else:
+            views = {'TRANSLATION': view(t.astype(np.float32), stride=12),
+                     'SCALE': view(s.astype(np.float32), stride=12)}
+            comp, stride, norm = _FLOAT, 12, {}
+            q_view = view(q.astype(np.float32), stride=16) if len(q) else None
+            q_comp, q_stride = _FLOAT, 16
+        for k, (g, node) in enumerate(zip(groups, nodes)):
+            n, first = int(counts[k]), int(starts[k])
+            attrs = {name: accessor(v, comp, n, 'VEC3', byteOffset=first * stride, **norm)
+                     for name, v in views.items()}
+            if rotated[k]:
+                attrs['ROTATION'] = accessor(q_view, q_comp, n, 'VEC4',
+                                             byteOffset=int(q_starts[k]) * q_stride, **norm)
+            if self.quantize:
+                node['translation'] = origin[k]
+                node['scale'] = [extent[k]] * 3
+            node['extensions'] = {'EXT_mesh_gpu_instancing': {'attributes': attrs}}
+            if any(i is not None for i in g.ids):
+                node['extras'] = {'ids': g.ids}
+        return nodes
+
+    @staticmethod
+    def _plain_nodes(g: _Group, mesh_ix: int, t, s, q) -> List[Dict[str, Any]]:
+        nodes = []
+        t32, s32 = t.astype(np.float32).tolist(), s.astype(np.float32).tolist()
+        q32 = q.astype(np.float32).tolist() if q is not None else None
+        for k in range(len(t32)):
+            node: Dict[str, Any] = {'mesh': mesh_ix, 'translation': t32[k], 'scale': s32[k]}
+            if q32 is not None:
+                node['rotation'] = q32[k]
+            if g.ids[k] is not None:
+                node['name'] = g.ids[k]
+            nodes.append(node)
+        return nodes
+
+    # ---- output ----
+    @property
+    def content_length(self) -> int:
+        head, pieces = self._build()
+        return 12 + 8 + len(head) + 8 + sum(len(p) for p in pieces)
+
+    def chunks(self) -> Iterator[bytes]:
+        """The .glb as a sequence of byte strings (header, JSON, buffers)."""
+        head, pieces = self._build()
+        bin_len = sum(len(p) for p in pieces)
+        yield struct.pack('<III', GLB_MAGIC, 2, self.content_length)
+        yield struct.pack('<II', len(head), _CHUNK_JSON) + head
+        yield struct.pack('<II', bin_len, _CHUNK_BIN)
+        yield from pieces
+
+    def write(self, fp) -> int:
+        n = 0
+        for chunk in self.chunks():
+            fp.write(chunk)
+            n += len(chunk)
+        return n
+
+    def to_bytes(self) -> bytes:
+        return b''.join(self.chunks())
+
+
+def _object_size(o: Dict[str, Any]) -> Optional[List[float]]:
+    """[sx, sy, sz] of an object. Older generators also emit a
+    single-value ``size`` (a uniform diameter) or ``radius`` + ``height``."""
+    size = o.get('size')
+    if isinstance(size, (list, tuple)) and size:
+        return [float(v) for v in size[:3]] if len(size) >= 3 else [float(size[0])] * 3
+    if 'radius' in o:
+        d = 2.0 * float(o['radius'])
+        return [d, float(o.get('height', d)), d]
+    return None
+
+
+def objects_to_glb(objects: Sequence[Dict[str, Any]], **kw) -> GlbWriter:
+    """A GlbWriter for an addMesh-style ``objects`` list (bim_three,
+    /api/drawings/3d-model). Materials follow addMesh: glass is smooth and
+    metallic, transparent objects get 0.35 opacity, everything else matte.
+    Like addMesh, only a {x, y, z} rotation dict is honoured. The instance
+    id is ``bim_element_id``, else ``name``."""
+    w = GlbWriter(**kw)
+    positions, sizes, eulers, ids = [], [], [], []
+    groups: Dict[tuple, List[int]] = {}
+    for o in objects:
+        if not o or not o.get('position'):
+            continue
+        size = o.get('size')
+        if not (type(size) is list and len(size) == 3):
+            size = _object_size(o)
+            if size is None:
+                continue
+        rot = o.get('rotation')
+        kind = o.get('type', 'box')
+        key = (kind if kind in PRIMITIVES else 'box', o.get('color', 0xcccccc),
+               o.get('material') == 'glass', bool(o.get('transparent')))
+        groups.setdefault(key, []).append(len(ids))
+        positions.append(o['position'][:3])
+        sizes.append(size)
+        eulers.append((rot.get('x') or 0, rot.get('y') or 0, rot.get('z') or 0)
+                      if isinstance(rot, dict) else (0, 0, 0))
+        ids.append(o.get('bim_element_id') or o.get('name'))
+    if not ids:
+        return w
+    position = np.array(positions, float)
+    size = np.array(sizes, float)
+    euler = np.array(eulers, float)
+    quat = euler_to_quat(euler[:, 0], euler[:, 1], euler[:, 2])
+    rotated = euler.any(1)
+    for (kind, color, glass, transparent), ix in groups.items():
+        mat = w.material(color, roughness=0.1 if glass else 0.75,
+                         metalness=0.8 if glass else 0.05,
+                         opacity=0.35 if transparent else 1.0)
+        w.add_many(kind, mat, position[ix], object_scale(kind, size[ix]),
+                   quat[ix] if rotated[ix].any() else None,
+                   ids=[ids[i] for i in ix])
+    return w
+
+
+def glb_response(writer: GlbWriter, *, download_name: Optional[str] = None):
+    """Stream ``writer`` as a model/gltf-binary Flask response."""
+    from flask import Response
+    resp = Response(writer.chunks(), mimetype='model/gltf-binary')
+    resp.headers['Content-Length'] = str(writer.content_length)
+    if download_name:
+        resp.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    return resp
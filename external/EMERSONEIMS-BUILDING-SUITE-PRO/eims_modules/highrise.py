@@ -5,7 +5,9 @@ low-rise residential work:
 
 1. **P-Delta amplification** (ASCE 7-22 §12.8.7).
 2. **Modal Response Spectrum analysis** of a lumped-mass shear building
-   — generalised Jacobi eigensolver, no SciPy dependency.
+   — generalised symmetric eigensolver (dense LAPACK, or shift-invert
+   Lanczos for the first k modes of tall models), SRSS/CQC combination
+   evaluated for many spectra and directions in one batch.
 3. **Along-wind dynamic response** — gust effect factor G_f
    (ASCE 7-22 §26.11) for flexible structures (n1 < 1 Hz).
 4. **Across-wind / vortex-shedding** — Strouhal-based critical wind
@@ -21,7 +23,7 @@ References
   vibrations
 - Smith & Coull (1991), Tall Building Structures: Analysis & Design
 
-This module is pure Python: standard library only.
+Modal analysis uses numpy/scipy; everything else is standard library only.
 """
 
 from __future__ import annotations
@@ -29,6 +31,11 @@ from __future__ import annotations
 import math
 from typing import Any
 
+import numpy as np
+from scipy import linalg as sla
+from scipy import sparse
+from scipy.sparse import linalg as spla
+
 from eims_modules import logger
 
 
@@ -73,61 +80,83 @@ def p_delta_amplifier(*, P_x_kN: float, delta_x_m: float, V_x_kN: float,
 # 2. Modal eigensolution for lumped-mass shear building
 # ============================================================================
 
-def _eigh_jacobi(K: list[list[float]], M: list[list[float]],
-                 max_iter: int = 200, tol: float = 1e-9) -> tuple[list[float], list[list[float]]]:
-    """Generalised eigenproblem K·φ = ω² M·φ for symmetric K and diagonal M.
+# Above this many DOF, asking for at most a quarter of the modes switches the
+# 'auto' solver from a dense LAPACK solve to shift-invert Lanczos.
+LANCZOS_MIN_DOF = 64
+G = 9.81
+
+
+def modal_eigen(K, M, num_modes: int | None = None,
+                solver: str = 'auto') -> tuple[np.ndarray, np.ndarray, str]:
+    """Lowest modes of the generalised problem K·φ = ω² M·φ.
 
-    Solves M⁻¹·K via the cyclic Jacobi method; returns (eigenvalues_sorted,
-    eigenvectors_columns). For the shear-building model M is diagonal so
-    M⁻¹·K is straightforward.
+    K is symmetric (dense array or scipy sparse), M is a mass vector (lumped)
+    or a symmetric matrix. Returns (ω², Φ, solver_used) with ω² ascending
+    and the columns of Φ mass-normalised (Φᵀ M Φ = I), signed so the top
+    DOF of each mode is positive.
+
+    solver: 'dense'   — LAPACK eigh restricted to the first k eigenpairs
+            'lanczos' — ARPACK eigsh in shift-invert mode about σ = 0, which
+                        converges on the lowest modes first; needs k < n
+            'auto'    — lanczos for large models when k ≤ n/4, else dense
     """
-    n = len(K)
-    # A = M^{-1/2} K M^{-1/2}  to keep it symmetric
-    inv_sqrt_m = [1.0 / math.sqrt(M[i][i]) for i in range(n)]
-    A = [[K[i][j] * inv_sqrt_m[i] * inv_sqrt_m[j] for j in range(n)] for i in range(n)]
-    V = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
-    for _ in range(max_iter):
-        # find largest off-diagonal
-        p = q = 0; maxv = 0.0
-        for i in range(n):
-            for j in range(i + 1, n):
-                if abs(A[i][j]) > maxv:
-                    maxv = abs(A[i][j]); p, q = i, j
-        if maxv < tol:
-            break
-        if abs(A[p][p] - A[q][q]) < 1e-30:
-            theta = math.pi / 4
-        else:
-            theta = 0.5 * math.atan2(2 * A[p][q], A[p][p] - A[q][q])
-        c = math.cos(theta); s = math.sin(theta)
-        # Rotate
-        for i in range(n):
-            aip, aiq = A[i][p], A[i][q]
-            A[i][p] = c * aip + s * aiq
-            A[i][q] = -s * aip + c * aiq
-        for j in range(n):
-            apj, aqj = A[p][j], A[q][j]
-            A[p][j] = c * apj + s * aqj
-            A[q][j] = -s * apj + c * aqj
-        for i in range(n):
-            vip, viq = V[i][p], V[i][q]
-            V[i][p] = c * vip + s * viq
-            V[i][q] = -s * vip + c * viq
-    eigvals = [A[i][i] for i in range(n)]
-    # Convert eigenvectors back: φ = M^{-1/2} y
-    eigvecs = [[V[i][j] * inv_sqrt_m[i] for j in range(n)] for i in range(n)]
-    # Sort ascending
-    order = sorted(range(n), key=lambda i: eigvals[i])
-    eigvals = [eigvals[i] for i in order]
-    eigvecs = [[eigvecs[r][order[c]] for c in range(n)] for r in range(n)]
-    return eigvals, eigvecs
+    n = K.shape[0]
+    k = n if num_modes is None else max(1, min(int(num_modes), n))
+    M = np.asarray(M, dtype=float) if not sparse.issparse(M) else M
+    Mmat = sparse.diags(M) if getattr(M, 'ndim', 2) == 1 else M
+    if solver == 'auto':
+        solver = 'lanczos' if n > LANCZOS_MIN_DOF and k <= n // 4 else 'dense'
+    if solver == 'lanczos' and k < n:
+        w2, phi = spla.eigsh(sparse.csc_matrix(K), k=k, M=sparse.csc_matrix(Mmat),
+                             sigma=0.0, which='LM')
+    elif solver in ('dense', 'lanczos'):
+        solver = 'dense'
+        Kd = K.toarray() if sparse.issparse(K) else np.asarray(K, dtype=float)
+        Md = Mmat.toarray() if sparse.issparse(Mmat) else np.asarray(Mmat, dtype=float)
+        w2, phi = sla.eigh(Kd, Md, subset_by_index=[0, k - 1])
+    else:
+        raise ValueError(f'unknown solver {solver!r}')
+    order = np.argsort(w2)
+    w2, phi = w2[order], phi[:, order]
+    phi = phi / np.sqrt(np.einsum('im,im->m', phi, Mmat @ phi))
+    phi *= np.where(phi[-1] < 0, -1.0, 1.0)
+    return w2, phi, solver
+
+
+def cqc_correlation(omegas: np.ndarray, damping: float) -> np.ndarray:
+    """Der Kiureghian (1981) CQC cross-modal coefficients, equal damping ζ."""
+    r = omegas[None, :] / omegas[:, None]
+    z2 = damping ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = (8 * z2 * (1 + r) * r ** 1.5) / ((1 - r ** 2) ** 2 + 4 * z2 * r * (1 + r) ** 2)
+    np.fill_diagonal(rho, 1.0)              # a mode is fully correlated with itself, even at ζ = 0
+    return np.nan_to_num(rho, nan=0.0)
+
+
+def _shear_building(masses_t, stiffness_kNpm) -> tuple[Any, np.ndarray]:
+    """Tridiagonal K (kN/m) and lumped masses (t) of a fixed-base shear building."""
+    k = np.asarray(stiffness_kNpm, dtype=float)
+    main = k + np.append(k[1:], 0.0)
+    K = sparse.diags([-k[1:], main, -k[1:]], [-1, 0, 1], format='csc')
+    return K, np.asarray(masses_t, dtype=float)
+
+
+def _spectral_accel_g(periods: np.ndarray, spectrum) -> np.ndarray:
+    spec = sorted(spectrum, key=lambda t: t[0])
+    if not spec:
+        return np.zeros_like(periods)
+    T, Sa = np.array(spec, dtype=float).T
+    return np.interp(periods, T, Sa)   # clamped at both ends
 
 
 def modal_response_spectrum(*, story_masses_t: list[float],
-                            story_stiffness_kNpm: list[float],
-                            spectrum: list[tuple[float, float]],
+                            story_stiffness_kNpm: list[float] | dict[str, list[float]],
+                            spectrum: list[tuple[float, float]] | None = None,
                             damping_pct: float = 5.0,
-                            num_modes: int | None = None) -> dict[str, Any]:
+                            num_modes: int | None = None,
+                            spectra: dict[str, list[tuple[float, float]]] | None = None,
+                            combination: str = 'SRSS',
+                            solver: str = 'auto') -> dict[str, Any]:
     """Modal Response Spectrum Analysis of a lumped-mass shear building.
 
     Each story has mass m_i (tonnes) and lateral stiffness k_i (kN/m) connecting
@@ -136,106 +165,98 @@ def modal_response_spectrum(*, story_masses_t: list[float],
     `spectrum` is a list of (period_s, Sa_g) pairs from ASCE 7 / EN 1998
     design response spectrum. Sa is interpolated linearly (clamped at ends).
 
-    Combines modal responses with SRSS — appropriate when modal periods
-    differ by ≥10 %.
+    Modal responses are combined with SRSS (appropriate when modal periods
+    differ by ≥10 %) or CQC (closely spaced modes); both base shears are
+    always reported and `combination` picks the storey-shear envelope.
+
+    Batch mode: `story_stiffness_kNpm` may be {direction: [k_i]} and
+    `spectra` {name: [(T, Sa_g)]}. One eigen-solve per direction serves every
+    spectrum; results land under `batch[direction][spectrum]`. The top-level
+    fields describe the first direction under `spectrum` (or the first of
+    `spectra`).
     """
+    directions = (story_stiffness_kNpm if isinstance(story_stiffness_kNpm, dict)
+                  else {'X': story_stiffness_kNpm})
+    all_spectra = dict(spectra or {})
+    if spectrum is not None or not all_spectra:
+        all_spectra = {'design': list(spectrum or []), **all_spectra}
+    combination = str(combination).upper()
+    if combination not in ('SRSS', 'CQC'):
+        return {'success': False, 'error': 'combination must be SRSS or CQC'}
+
     n = len(story_masses_t)
-    if n < 1 or len(story_stiffness_kNpm) != n:
+    if n < 1 or not directions or any(len(k) != n for k in directions.values()):
         return {'success': False,
                 'error': 'story_masses_t and story_stiffness_kNpm must be same non-zero length'}
-    if any(m <= 0 for m in story_masses_t) or any(k <= 0 for k in story_stiffness_kNpm):
+    if any(m <= 0 for m in story_masses_t) or any(k <= 0 for ks in directions.values() for k in ks):
         return {'success': False, 'error': 'all masses and stiffnesses must be positive'}
 
-    g = 9.81
-    # Mass matrix (diagonal, tonnes -> kg by *1000 not needed if k in kN/m and Sa in g — keep tonnes & kN consistent)
-    M = [[(story_masses_t[i] if i == j else 0.0) for j in range(n)] for i in range(n)]
-    # Tridiagonal stiffness: K[i,i]=k_i+k_{i+1}, K[i,i+1]=K[i+1,i]=-k_{i+1}
-    k = list(story_stiffness_kNpm)
-    K = [[0.0] * n for _ in range(n)]
-    for i in range(n):
-        K[i][i] = k[i] + (k[i + 1] if i + 1 < n else 0.0)
-        if i + 1 < n:
-            K[i][i + 1] = -k[i + 1]
-            K[i + 1][i] = -k[i + 1]
-
-    eigvals, eigvecs = _eigh_jacobi(K, M)
-    # ω² = eigval (rad²/s²); k in kN/m, M in tonnes → k/M units = kN/(m·t) = (kN·s²)/(t·m) = m/s²·... → check
-    # 1 kN / 1 t = 1000 N / 1000 kg = 1 m/s². So k(kN/m)/M(t) has units 1/s². ✓
-    omegas = [math.sqrt(max(ev, 0.0)) for ev in eigvals]
-    periods = [(2 * math.pi / w) if w > 0 else float('inf') for w in omegas]
-
-    # Modal participation factors and masses
-    one = [1.0] * n
-    modes = []
-    nmodes = num_modes or n
-    nmodes = max(1, min(nmodes, n))
-
-    # Pre-compute Sa interpolator
-    spec = sorted(spectrum, key=lambda t: t[0])
-
-    def Sa_g(T):
-        if not spec: return 0.0
-        if T <= spec[0][0]: return spec[0][1]
-        if T >= spec[-1][0]: return spec[-1][1]
-        for i in range(len(spec) - 1):
-            t0, s0 = spec[i]; t1, s1 = spec[i + 1]
-            if t0 <= T <= t1:
-                frac = (T - t0) / (t1 - t0) if t1 > t0 else 0
-                return s0 + frac * (s1 - s0)
-        return spec[-1][1]
-
-    cumulative_mass_pct = 0.0
-    total_mass = sum(story_masses_t)
-
-    story_shears = [0.0] * n  # SRSS shear envelope per story
-    story_forces_modes: list[list[float]] = []
-
-    for mi in range(nmodes):
-        phi = [eigvecs[i][mi] for i in range(n)]
-        # Normalise so phi^T M phi = 1
-        norm = math.sqrt(sum(M[i][i] * phi[i] ** 2 for i in range(n)))
-        if norm == 0: continue
-        phi = [p / norm for p in phi]
-        Gamma = sum(M[i][i] * phi[i] * 1.0 for i in range(n))   # phi^T M one (since normalised)
-        M_eff = Gamma ** 2     # effective modal mass (tonnes)
-        cumulative_mass_pct += 100 * M_eff / total_mass
-
-        Sa = Sa_g(periods[mi]) * g  # m/s²
-        # Modal response: storey displacement uᵢ = Γ φᵢ (Sa/ω²) ... here we want forces
-        # Modal storey force: f_i = Γ · M_i · φᵢ · Sa
-        f_modal = [Gamma * M[i][i] * phi[i] * Sa for i in range(n)]
-        story_forces_modes.append(f_modal)
-        # Storey shear at level i = sum of forces above i (including i)
-        v_modal = [sum(f_modal[j] for j in range(i, n)) for i in range(n)]
-        for i in range(n):
-            story_shears[i] = math.hypot(story_shears[i], v_modal[i])  # SRSS
-
-        modes.append({
-            'mode': mi + 1,
-            'period_s': round(periods[mi], 4),
-            'frequency_hz': round(1 / periods[mi] if periods[mi] > 0 else 0, 4),
-            'participation_factor': round(Gamma, 4),
-            'effective_modal_mass_t': round(M_eff, 4),
-            'effective_mass_pct': round(100 * M_eff / total_mass, 2),
-            'cumulative_mass_pct': round(cumulative_mass_pct, 2),
-            'Sa_g': round(Sa / g, 4),
-            'shape': [round(p, 4) for p in phi],
-        })
-
-    base_shear_kN = story_shears[0]  # total at ground level
-    return {
+    if not (math.isfinite(damping_pct) and 0 < damping_pct < 100):
+        return {'success': False, 'error': 'damping_pct must be between 0 and 100 (exclusive)'}
+
+    spec_names = list(all_spectra)
+    zeta = damping_pct / 100.0
+    total_mass = float(sum(story_masses_t))
+    batch: dict[str, dict[str, Any]] = {}
+    first = None
+    for direction, k in directions.items():
+        K, m = _shear_building(story_masses_t, k)
+        # 1 kN / 1 t = 1 m/s², so k(kN/m)/M(t) has units 1/s² ✓
+        w2, phi, used = modal_eigen(K, m, num_modes, solver)
+        omegas = np.sqrt(np.maximum(w2, 0.0))
+        periods = np.where(omegas > 0, 2 * np.pi / np.where(omegas > 0, omegas, 1.0), np.inf)
+
+        gamma = phi.T @ m                       # Γ = φᵀ M 1 (φ mass-normalised)
+        m_eff = gamma ** 2                      # effective modal mass (t)
+        sa = np.stack([_spectral_accel_g(periods, all_spectra[s]) for s in spec_names]) * G
+        # Modal storey force f = Γ·M·φ·Sa, shear = sum of forces at and above each storey
+        forces = gamma[None, :, None] * (phi.T * m)[None] * sa[:, :, None]
+        shears = np.flip(np.cumsum(np.flip(forces, -1), -1), -1)      # (spectra, modes, storeys)
+        srss = np.sqrt(np.einsum('smi,smi->si', shears, shears))
+        rho = cqc_correlation(omegas, zeta)
+        cqc = np.sqrt(np.maximum(np.einsum('smi,mn,sni->si', shears, rho, shears), 0.0))
+        envelope = cqc if combination == 'CQC' else srss
+
+        batch[direction] = {s: {'base_shear_kN_srss': round(float(srss[c, 0]), 2),
+                                'base_shear_kN_cqc': round(float(cqc[c, 0]), 2),
+                                'story_shear_envelope_kN': np.round(envelope[c], 2).tolist()}
+                            for c, s in enumerate(spec_names)}
+        if first is None:
+            first = (direction, used, periods, gamma, m_eff, sa[0], phi)
+
+    direction, used, periods, gamma, m_eff, sa, phi = first
+    cumulative = np.cumsum(100 * m_eff / total_mass)
+    modes = [{
+        'mode': i + 1,
+        'period_s': round(float(periods[i]), 4),
+        'frequency_hz': round(float(1 / periods[i]) if periods[i] > 0 else 0, 4),
+        'participation_factor': round(float(gamma[i]), 4),
+        'effective_modal_mass_t': round(float(m_eff[i]), 4),
+        'effective_mass_pct': round(float(100 * m_eff[i] / total_mass), 2),
+        'cumulative_mass_pct': round(float(cumulative[i]), 2),
+        'Sa_g': round(float(sa[i] / G), 4),
+        'shape': np.round(phi[:, i], 4).tolist(),
+    } for i in range(len(periods))]
+    cumulative_mass_pct = float(cumulative[-1])
+    top = batch[direction][spec_names[0]]
+    result = {
         'success': True,
-        'method': 'Modal Response Spectrum (SRSS)',
+        'method': f'Modal Response Spectrum ({combination})',
         'standards': ['ASCE 7-22 §12.9', 'EN 1998-1 §4.3.3.3'],
         'damping_pct': damping_pct,
+        'solver': used,
         'modes_returned': len(modes),
         'cumulative_mass_pct': round(cumulative_mass_pct, 2),
         'modes': modes,
-        'base_shear_kN_srss': round(base_shear_kN, 2),
-        'story_shear_envelope_kN': [round(s, 2) for s in story_shears],
+        'base_shear_kN_srss': top['base_shear_kN_srss'],
+        'base_shear_kN_cqc': top['base_shear_kN_cqc'],
+        'story_shear_envelope_kN': top['story_shear_envelope_kN'],
         'note': ('Cumulative modal mass < 90 % — include more modes' if cumulative_mass_pct < 90
                  else 'Modal mass ≥ 90 % — adequate per ASCE 7 §12.9.1.1'),
     }
+    if len(directions) > 1 or len(spec_names) > 1:
+        result['batch'] = batch
+    return result
 
 
 # ============================================================================
@@ -395,6 +416,12 @@ def occupant_comfort(*, peak_accel_mps2: float, occupancy: str = 'office',
 # Flask integration
 # ============================================================================
 
+def _floats_by_key(v):
+    if isinstance(v, dict):
+        return {str(k): [float(x) for x in xs] for k, xs in v.items()}
+    return [float(x) for x in v]
+
+
 def register(app, *, auth_required=None) -> None:
     from flask import jsonify, request
 
@@ -421,10 +448,15 @@ def register(app, *, auth_required=None) -> None:
         try:
             r = modal_response_spectrum(
                 story_masses_t=[float(x) for x in (d.get('story_masses_t') or [])],
-                story_stiffness_kNpm=[float(x) for x in (d.get('story_stiffness_kNpm') or [])],
-                spectrum=[(float(t), float(s)) for t, s in (d.get('spectrum') or [])],
+                story_stiffness_kNpm=_floats_by_key(d.get('story_stiffness_kNpm') or []),
+                spectrum=([(float(t), float(s)) for t, s in (d.get('spectrum') or [])]
+                          if d.get('spectrum') or not d.get('spectra') else None),
                 damping_pct=float(d.get('damping_pct', 5.0)),
                 num_modes=(int(d['num_modes']) if d.get('num_modes') else None),
+                spectra={str(name): [(float(t), float(s)) for t, s in pts]
+                         for name, pts in (d.get('spectra') or {}).items()} or None,
+                combination=str(d.get('combination', 'SRSS')),
+                solver=str(d.get('solver', 'auto')),
             )
         except (TypeError, ValueError) as ve:
             return jsonify({'success': False, 'error': str(ve)}), 400
@@ -41,6 +41,9 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from flask import Flask, jsonify, request, send_file
 
+from . import artifact_cache
+from .gltf_writer import GlbWriter
+
 
 # ---------------------------------------------------------------------------
 #  Reference data  (every figure has a source)
@@ -870,33 +873,6 @@ def siteplan_dxf(design: VillaDesign) -> bytes:
 #  glTF 2.0 binary (.glb) export — the modern web/AR 3D standard
 # ---------------------------------------------------------------------------
 
-def _box_geom(x: float, y: float, z: float,
-                 w: float, d: float, h: float) -> Tuple[bytes, bytes,
-                                                            int, int,
-                                                            List[float],
-                                                            List[float]]:
-    """Return (positions_bin, indices_bin, vcount, icount, min_xyz, max_xyz)
-    for a triangulated box with 8 vertices and 12 triangles (CCW outward)."""
-    import struct as _s
-    v = [(x,     y,     z),     (x + w, y,     z),
-          (x + w, y + d, z),     (x,     y + d, z),
-          (x,     y,     z + h), (x + w, y,     z + h),
-          (x + w, y + d, z + h), (x,     y + d, z + h)]
-    pos = b''.join(_s.pack('<fff', a, b, c) for (a, b, c) in v)
-    # CCW outward triangles (right-hand rule)
-    idx = [
-        0, 2, 1,  0, 3, 2,    # bottom (looking up: CW = outward down)
-        4, 5, 6,  4, 6, 7,    # top
-        0, 1, 5,  0, 5, 4,    # -y face (south)
-        1, 2, 6,  1, 6, 5,    # +x face (east)
-        2, 3, 7,  2, 7, 6,    # +y face (north)
-        3, 0, 4,  3, 4, 7,    # -x face (west)
-    ]
-    ind = b''.join(_s.pack('<H', i) for i in idx)
-    return (pos, ind, 8, 36,
-              [x, y, z], [x + w, y + d, z + h])
-
-
 def model_glb(design: VillaDesign) -> bytes:
     """Wavefront-grade massing as a single binary glTF (.glb) file.
 
@@ -904,8 +880,6 @@ def model_glb(design: VillaDesign) -> bytes:
     Sketchfab, Mozilla Hubs, Apple Quick-Look (via USDZ converter), AR.js,
     model-viewer (Google), Verge3D, Unity, Unreal.
     """
-    import base64, json as _json, struct as _s
-
     h = FLOOR_TO_FLOOR_M
     fw, fd = design.footprint_w, design.footprint_d
 
@@ -946,91 +920,17 @@ def model_glb(design: VillaDesign) -> bytes:
                     design.plot_w, design.plot_d, 0.10,
                     [0.55, 0.66, 0.42, 1.0], 'site'))
 
-    # Build single binary buffer + parallel glTF metadata
-    buffer = bytearray()
-    bv: List[Dict[str, Any]] = []
-    accs: List[Dict[str, Any]] = []
-    mats: List[Dict[str, Any]] = []
-    meshes: List[Dict[str, Any]] = []
-    nodes: List[Dict[str, Any]] = []
-
+    # One shared unit box per material, placed by each node's translation
+    # and scale. Plain core glTF (no instancing extension), so every viewer
+    # in the list above still opens it.
+    writer = GlbWriter(generator='EmersonEIMS villa designer v1.2',
+                       instancing=False, quantize=False, double_sided=True)
     for (x, y, z, w, d, hh, color, name) in boxes:
-        pos_b, ind_b, vcount, icount, mn, mx = _box_geom(x, y, z, w, d, hh)
-
-        # positions bufferView (vec3 float)
-        pos_off = len(buffer); buffer += pos_b
-        # 4-byte align before indices
-        while len(buffer) % 4: buffer += b'\x00'
-        ind_off = len(buffer); buffer += ind_b
-        while len(buffer) % 4: buffer += b'\x00'
-
-        bv_pos_idx = len(bv)
-        bv.append({'buffer': 0, 'byteOffset': pos_off,
-                    'byteLength': len(pos_b), 'target': 34962})  # ARRAY_BUFFER
-        bv_ind_idx = len(bv)
-        bv.append({'buffer': 0, 'byteOffset': ind_off,
-                    'byteLength': len(ind_b), 'target': 34963})  # ELEMENT_ARRAY_BUFFER
-
-        acc_pos = len(accs)
-        accs.append({'bufferView': bv_pos_idx, 'componentType': 5126,  # FLOAT
-                      'count': vcount, 'type': 'VEC3',
-                      'min': mn, 'max': mx})
-        acc_ind = len(accs)
-        accs.append({'bufferView': bv_ind_idx, 'componentType': 5123,  # UNSIGNED_SHORT
-                      'count': icount, 'type': 'SCALAR'})
-
-        mat_idx = len(mats)
-        is_alpha = color[3] < 1.0
-        mat_def: Dict[str, Any] = {
-            'name': name + '_mat',
-            'pbrMetallicRoughness': {
-                'baseColorFactor': color,
-                'metallicFactor': 0.0 if 'glazing' not in name and 'pool' not in name else 0.1,
-                'roughnessFactor': 0.15 if ('glazing' in name or 'pool' in name) else 0.75,
-            },
-            'doubleSided': True,
-        }
-        if is_alpha:
-            mat_def['alphaMode'] = 'BLEND'
-        mats.append(mat_def)
-
-        mesh_idx = len(meshes)
-        meshes.append({'name': name, 'primitives': [{
-            'attributes': {'POSITION': acc_pos},
-            'indices': acc_ind,
-            'material': mat_idx,
-            'mode': 4,    # TRIANGLES
-        }]})
-        nodes.append({'name': name, 'mesh': mesh_idx})
-
-    gltf = {
-        'asset': {'version': '2.0',
-                   'generator': 'EmersonEIMS villa designer v1.1'},
-        'scene': 0,
-        'scenes': [{'nodes': list(range(len(nodes)))}],
-        'nodes': nodes,
-        'meshes': meshes,
-        'materials': mats,
-        'accessors': accs,
-        'bufferViews': bv,
-        'buffers': [{'byteLength': len(buffer)}],
-    }
-
-    json_bytes = _json.dumps(gltf, separators=(',', ':')).encode('utf-8')
-    while len(json_bytes) % 4:
-        json_bytes += b' '
-    bin_padded = bytes(buffer)
-    while len(bin_padded) % 4:
-        bin_padded += b'\x00'
-
-    total = 12 + 8 + len(json_bytes) + 8 + len(bin_padded)
-    out = bytearray()
-    out += _s.pack('<III', 0x46546C67, 2, total)               # 'glTF', v2
-    out += _s.pack('<II', len(json_bytes), 0x4E4F534A)        # JSON chunk
-    out += json_bytes
-    out += _s.pack('<II', len(bin_padded), 0x004E4942)        # BIN chunk
-    out += bin_padded
-    return bytes(out)
+        shiny = 'glazing' in name or 'pool' in name
+        mat = writer.material(color, roughness=0.15 if shiny else 0.75,
+                              metalness=0.1 if shiny else 0.0, name=name + '_mat')
+        writer.add('box', mat, (x + w / 2, y + d / 2, z + hh / 2), (w, d, hh), id=name)
+    return writer.to_bytes()
 
 
 # ---------------------------------------------------------------------------
@@ -1287,6 +1187,13 @@ def register(app: Flask, *, auth_required=None) -> None:
     def _floorplan():
         b = request.get_json(force=True, silent=True) or {}
         level = int(b.get('level', 0))
+        # The design is a pure function of the request body, so the body
+        # keys the cached DXF.
+        key = artifact_cache.digest('villa-floorplan-dxf', b, level)
+        name = f'villa_floorplan_L{level}.dxf'
+        hit = artifact_cache.cached_response(key, mimetype='application/dxf', download_name=name)
+        if hit is not None:
+            return hit
         brief = b.get('brief') or design_brief(
             plot_w_m=float(b.get('plot_w_m', 25)),
             plot_d_m=float(b.get('plot_d_m', 35)),
@@ -1298,10 +1205,8 @@ def register(app: Flask, *, auth_required=None) -> None:
         if not brief.get('success'):
             return jsonify(brief), 400
         d = design_villa(brief)
-        blob = floorplan_dxf(d, level=level)
-        return send_file(io.BytesIO(blob), mimetype='application/dxf',
-                          as_attachment=True,
-                          download_name=f'villa_floorplan_L{level}.dxf')
+        return artifact_cache.store_response(key, floorplan_dxf(d, level=level),
+                                             mimetype='application/dxf', download_name=name)
 
     def _model():
         b = request.get_json(force=True, silent=True) or {}
@@ -1355,12 +1260,16 @@ def register(app: Flask, *, auth_required=None) -> None:
 
     def _model_glb():
         b = request.get_json(force=True, silent=True) or {}
+        key = artifact_cache.digest('villa-glb', b)
+        hit = artifact_cache.cached_response(key, mimetype='model/gltf-binary',
+                                             download_name='villa.glb')
+        if hit is not None:
+            return hit
         d = _build_design(b)
         if d is None:
             return jsonify({'success': False, 'error': 'invalid brief'}), 400
-        blob = model_glb(d)
-        return send_file(io.BytesIO(blob), mimetype='model/gltf-binary',
-                          as_attachment=True, download_name='villa.glb')
+        return artifact_cache.store_response(key, model_glb(d), mimetype='model/gltf-binary',
+                                             download_name='villa.glb')
 
     def _siteplan():
         b = request.get_json(force=True, silent=True) or {}
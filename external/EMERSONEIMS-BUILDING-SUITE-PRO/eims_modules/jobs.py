@@ -0,0 +1,421 @@
+"""Background jobs for heavy exports, with progress, deduplication and expiry.
+
+Report PDFs, Excel workbooks, drawing sets and sheet packs can take tens of
+seconds on a large project. Run inline they pin a waitress worker thread for
+the whole render. With ``async=1`` those endpoints instead call ``submit``
+and answer 202 with a job id; the client then polls
+
+    GET /api/jobs/<id>           status, percentage progress and stage
+    GET /api/jobs/<id>/result    the artifact once done (202 while running)
+
+Storage layout under $EIMS_UPLOAD_FOLDER/jobs/:
+
+  * jobs.db        SQLite table of jobs (status, progress, stage, expiry)
+  * <id>.out       result bytes of a finished job
+
+A job function is ``fn(params, progress) -> bytes | dict`` and must be a
+module-level function so it can be pickled. CPU-bound kinds run in a bounded
+process pool (EIMS_JOB_PROCESSES, default min(2, CPUs); 0 runs them on the
+coordinator threads instead). ``progress(pct, stage)`` writes straight to
+jobs.db, so it works the same from a worker process.
+
+Jobs belong to the user who submitted them (``current_user``); status and
+result are only served to that user. Submitting the same kind and params
+while that user's earlier job is queued, running or finished and unexpired
+returns that job rather than starting another. Results expire
+EIMS_JOB_TTL_S (default 3600) seconds after they finish; the sweep runs on
+every submit.
+
+Several server processes can share jobs.db. Each one registers an instance
+id and refreshes its heartbeat every EIMS_JOB_HEARTBEAT_S (default 10)
+seconds; queued or running jobs are only marked failed once their
+instance's heartbeat is more than three intervals old, i.e. its process
+has gone.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from eims_modules import db as _db
+from eims_modules.artifact_cache import digest
+
+logger = logging.getLogger('eims.jobs')
+
+_UPLOADS = os.environ.get('EIMS_UPLOAD_FOLDER',
+                          os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads'))
+JOBS_DIR = os.path.join(_UPLOADS, 'jobs')
+_DB_PATH = os.path.join(JOBS_DIR, 'jobs.db')
+
+JOB_TTL_S = float(os.environ.get('EIMS_JOB_TTL_S', '3600'))
+JOB_THREADS = int(os.environ.get('EIMS_JOB_THREADS', '4'))
+JOB_PROCESSES = int(os.environ.get('EIMS_JOB_PROCESSES', str(min(2, os.cpu_count() or 1))))
+HEARTBEAT_S = float(os.environ.get('EIMS_JOB_HEARTBEAT_S', '10'))
+STALE_AFTER = 3                   # heartbeats missed before an instance counts as gone
+
+# This process's row in the instances table; owner of the jobs it runs.
+INSTANCE_ID = f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+
+_LOCK = threading.Lock()          # guards store start-up and the pools
+_SUBMIT_LOCK = threading.Lock()   # makes dedupe check + insert atomic
+_ready = False
+_heartbeat: Optional[threading.Thread] = None
+_threads: Optional[ThreadPoolExecutor] = None
+_processes: Optional[ProcessPoolExecutor] = None
+
+
+def _conn() -> _db.PooledConnection:
+    return _db.get_pool(_DB_PATH).connect()
+
+
+def _ensure_store() -> None:
+    global _ready, _heartbeat
+    if _ready:
+        return
+    with _LOCK:
+        if _ready:
+            return
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        conn = _conn()
+        try:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id            TEXT PRIMARY KEY,
+                    kind          TEXT NOT NULL,
+                    dedupe_key    TEXT NOT NULL,
+                    status        TEXT NOT NULL,
+                    progress      REAL NOT NULL DEFAULT 0,
+                    stage         TEXT NOT NULL DEFAULT '',
+                    error         TEXT,
+                    mimetype      TEXT NOT NULL,
+                    download_name TEXT,
+                    owner         INTEGER NOT NULL,
+                    created_at    REAL NOT NULL,
+                    finished_at   REAL,
+                    expires_at    REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status);
+                CREATE INDEX IF NOT EXISTS idx_jobs_expiry ON jobs(expires_at);
+                CREATE TABLE IF NOT EXISTS instances (
+                    id        TEXT PRIMARY KEY,
+                    pid       INTEGER NOT NULL,
+                    heartbeat REAL NOT NULL
+                );
+            ''')
+            # owner is the submitting pid; stores created before instances
+            # and users were tracked lack these two columns.
+            cols = {r['name'] for r in conn.execute('PRAGMA table_info(jobs)')}
+            for col in ('instance', 'user_id'):
+                if col not in cols:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+            conn.commit()
+        finally:
+            conn.close()
+        _beat()
+        _fail_orphans()
+        _heartbeat = threading.Thread(target=_heartbeat_loop, name='eims-job-heartbeat', daemon=True)
+        _heartbeat.start()
+        _ready = True
+
+
+def _beat() -> None:
+    conn = _conn()
+    try:
+        conn.execute('INSERT OR REPLACE INTO instances (id, pid, heartbeat) VALUES (?, ?, ?)',
+                     (INSTANCE_ID, os.getpid(), time.time()))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _heartbeat_loop() -> None:
+    while True:
+        time.sleep(HEARTBEAT_S)
+        try:
+            _beat()
+        except Exception as e:  # a missed beat is retried; STALE_AFTER tolerates a few
+            logger.warning('job heartbeat failed: %s', e)
+
+
+def _fail_orphans() -> int:
+    """Mark failed the queued or running jobs of instances whose heartbeat
+    has gone stale, and forget those instances. Returns how many jobs."""
+    now = time.time()
+    cutoff = now - STALE_AFTER * HEARTBEAT_S
+    conn = _conn()
+    try:
+        n = conn.execute(
+            "UPDATE jobs SET status='failed', error='interrupted by restart', "
+            "finished_at=?, expires_at=? "
+            "WHERE status IN ('queued', 'running') AND instance != ? "
+            "AND instance NOT IN (SELECT id FROM instances WHERE heartbeat >= ?)",
+            (now, now + JOB_TTL_S, INSTANCE_ID, cutoff)).rowcount
+        conn.execute('DELETE FROM instances WHERE heartbeat < ? AND id != ?', (cutoff, INSTANCE_ID))
+        conn.commit()
+    finally:
+        conn.close()
+    if n:
+        logger.warning('marked %d job(s) of stopped instances as failed', n)
+    return n
+
+
+def _result_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f'{job_id}.out')
+
+
+def _update(job_id: str, **cols) -> None:
+    conn = _conn()
+    try:
+        sets = ', '.join(f'{k}=?' for k in cols)
+        conn.execute(f'UPDATE jobs SET {sets} WHERE id=?', (*cols.values(), job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class Progress:
+    """``progress(pct, stage)`` callback handed to job functions. Picklable,
+    and skips writes that would not change what a poller sees."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._last: Tuple[int, str] = (-1, '')
+
+    def __call__(self, pct: float, stage: str = '') -> None:
+        pct = max(0.0, min(100.0, float(pct)))
+        state = (int(pct), stage)
+        if state == self._last:
+            return
+        self._last = state
+        try:
+            _update(self.job_id, progress=round(pct, 1), stage=stage)
+        except Exception as e:  # never let progress reporting fail a render
+            logger.warning('job %s progress update failed: %s', self.job_id, e)
+
+
+def _call(fn: Callable, params: Any, job_id: str) -> Any:
+    """Runs inside the worker (process or thread)."""
+    out = fn(params, Progress(job_id))
+    if isinstance(out, (dict, list)):
+        out = json.dumps(out, default=str).encode('utf-8')
+    return out
+
+
+def _pools() -> Tuple[ThreadPoolExecutor, Optional[ProcessPoolExecutor]]:
+    global _threads, _processes
+    with _LOCK:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(max_workers=max(1, JOB_THREADS),
+                                          thread_name_prefix='eims-job')
+        if _processes is None and JOB_PROCESSES > 0:
+            # spawn, not fork: the web process has live threads and sockets.
+            _processes = ProcessPoolExecutor(max_workers=JOB_PROCESSES,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return _threads, _processes
+
+
+def _run(job_id: str, fn: Callable, params: Any, cpu: bool) -> None:
+    """Coordinator: hands the work to the process pool (or runs it here) and
+    records the outcome."""
+    global _processes
+    _update(job_id, status='running', stage='starting')
+    try:
+        procs = _pools()[1] if cpu else None
+        if procs is not None:
+            try:
+                data = procs.submit(_call, fn, params, job_id).result()
+            except BrokenProcessPool:
+                logger.warning('job process pool broke; running %s in-thread', job_id)
+                with _LOCK:
+                    if _processes is procs:
+                        _processes = None
+                data = _call(fn, params, job_id)
+        else:
+            data = _call(fn, params, job_id)
+        tmp = _result_path(job_id) + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, _result_path(job_id))
+        now = time.time()
+        _update(job_id, status='done', progress=100.0, stage='done',
+                finished_at=now, expires_at=now + JOB_TTL_S)
+    except Exception as e:
+        logger.exception('job %s failed', job_id)
+        now = time.time()
+        _update(job_id, status='failed', error=str(e)[:500],
+                finished_at=now, expires_at=now + JOB_TTL_S)
+
+
+def expire() -> int:
+    """Drop expired jobs and their result files, and fail the jobs of
+    stopped instances. Returns how many expired."""
+    _ensure_store()
+    _fail_orphans()
+    conn = _conn()
+    try:
+        ids = [r['id'] for r in conn.execute(
+            'SELECT id FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?',
+            (time.time(),))]
+        if ids:
+            conn.executemany('DELETE FROM jobs WHERE id=?', [(i,) for i in ids])
+            conn.commit()
+    finally:
+        conn.close()
+    for job_id in ids:
+        try:
+            os.remove(_result_path(job_id))
+        except OSError:
+            pass
+    return len(ids)
+
+
+def current_user() -> str:
+    """The user a job is recorded against, resolved as audit_log does: the
+    authenticated user, else the X-EIMS-User header, else 'anon'. Not
+    request._eims_user, which only routes behind auth_required carry.
+    '' outside a request."""
+    from flask import g, has_request_context, request
+    if not has_request_context():
+        return ''
+    return str(getattr(g, 'auth_user', None) or request.headers.get('X-EIMS-User') or 'anon')
+
+
+def submit(kind: str, fn: Callable, params: Any, *, cpu: bool = True,
+           mimetype: str = 'application/octet-stream',
+           download_name: Optional[str] = None,
+           user: Optional[str] = None) -> Dict[str, Any]:
+    """Queue ``fn(params, progress)`` for ``user`` (default: current_user())
+    unless that user already has an identical job queued, running or done
+    and unexpired. Returns the job's status dict with ``deduplicated`` set
+    accordingly."""
+    expire()
+    user = current_user() if user is None else user
+    key = digest('job', kind, params)
+    conn = _conn()
+    try:
+        with _SUBMIT_LOCK:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key=? AND user_id=? AND status != 'failed' "
+                "ORDER BY created_at DESC LIMIT 1", (key, user)).fetchone()
+            if row is not None:
+                job = status(row['id'])
+                if job is not None:
+                    return {**job, 'deduplicated': True}
+            job_id = secrets.token_urlsafe(12)
+            conn.execute(
+                'INSERT INTO jobs (id, kind, dedupe_key, status, mimetype, download_name, '
+                'owner, instance, user_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, key, 'queued', mimetype, download_name, os.getpid(),
+                 INSTANCE_ID, user, time.time()))
+            conn.commit()
+    finally:
+        conn.close()
+    _pools()[0].submit(_run, job_id, fn, params, cpu)
+    return {**status(job_id), 'deduplicated': False}
+
+
+def status(job_id: str, user: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The job's status dict, or None if it does not exist, has expired or
+    (when ``user`` is given) belongs to someone else."""
+    _ensure_store()
+    conn = _conn()
+    try:
+        row = conn.execute('SELECT * FROM jobs WHERE id=?', (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None or (user is not None and row['user_id'] != user):
+        return None
+    return {
+        'job_id': row['id'], 'kind': row['kind'], 'status': row['status'],
+        'progress': row['progress'], 'stage': row['stage'], 'error': row['error'],
+        'created_at': row['created_at'], 'finished_at': row['finished_at'],
+        'expires_at': row['expires_at'],
+        'status_url': f'/api/jobs/{row["id"]}',
+        'result_url': f'/api/jobs/{row["id"]}/result',
+    }
+
+
+def result(job_id: str, user: Optional[str] = None) -> Optional[Tuple[bytes, str, Optional[str]]]:
+    """(bytes, mimetype, download_name) of a finished job, else None.
+    ``user`` as for ``status``."""
+    _ensure_store()
+    conn = _conn()
+    try:
+        row = conn.execute("SELECT mimetype, download_name, user_id FROM jobs "
+                           "WHERE id=? AND status='done'", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None or (user is not None and row['user_id'] != user):
+        return None
+    try:
+        with open(_result_path(job_id), 'rb') as f:
+            return f.read(), row['mimetype'], row['download_name']
+    except OSError:
+        return None
+
+
+def wait(job_id: str, timeout: float = 60.0, poll: float = 0.05) -> Optional[Dict[str, Any]]:
+    """Block until the job finishes or ``timeout`` passes (tests, CLI)."""
+    deadline = time.time() + timeout
+    while True:
+        job = status(job_id)
+        if job is None or job['status'] in ('done', 'failed') or time.time() >= deadline:
+            return job
+        time.sleep(poll)
+
+
+def wants_async(request) -> bool:
+    """True for ``?async=1`` or a JSON body with ``"async": true``."""
+    if (request.args.get('async') or '').lower() in ('1', 'true', 'yes'):
+        return True
+    body = request.get_json(silent=True)
+    return isinstance(body, dict) and body.get('async') is True
+
+
+def accepted(job: Dict[str, Any]):
+    """202 response for a submitted job."""
+    from flask import jsonify
+    return jsonify({'success': True, **job}), 202, {'Location': job['status_url']}
+
+
+def register(app, *, auth_required=None) -> None:
+    from flask import Response, jsonify
+
+    if auth_required is None:
+        def auth_required(fn): return fn
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    @auth_required
+    def _job_status(job_id):
+        job = status(job_id, current_user())
+        if job is None:
+            return jsonify({'success': False, 'error': 'job not found or expired'}), 404
+        return jsonify({'success': True, **job})
+
+    @app.route('/api/jobs/<job_id>/result', methods=['GET'])
+    @auth_required
+    def _job_result(job_id):
+        user = current_user()
+        job = status(job_id, user)
+        if job is None:
+            return jsonify({'success': False, 'error': 'job not found or expired'}), 404
+        if job['status'] == 'failed':
+            return jsonify({'success': False, **job}), 500
+        got = result(job_id, user) if job['status'] == 'done' else None
+        if got is None:
+            return jsonify({'success': True, **job}), 202
+        data, mimetype, name = got
+        resp = Response(data, mimetype=mimetype)
+        if name:
+            resp.headers['Content-Disposition'] = f'attachment; filename="{name}"'
+        return resp
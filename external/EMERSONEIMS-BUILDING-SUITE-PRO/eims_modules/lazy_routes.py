@@ -0,0 +1,239 @@
+"""Lazy module registration: route stubs now, module import on first hit.
+
+``app_professional`` registers every eims_modules.* blueprint at import.
+Done eagerly, that imports each module and its dependencies (scipy.stats
+for the Monte-Carlo, the BIM stack, ...) before the first request can be
+served, and container cold start and test collection pay for it every
+time. ``register`` does the same job lazily:
+
+  * The module's URL rules are read from route_manifest.json (rule,
+    endpoint, methods, options). Each rule is added to the app with a
+    small stub view, without importing the module.
+  * On the first request to any of its rules, the module is imported and
+    its real ``register`` runs against a ``_Recorder``. The recorder
+    captures the view functions and forwards every other attribute to the
+    app. The stubs' ``app.view_functions`` entries are then replaced by
+    the real views, so later requests dispatch directly.
+
+Modules whose ``register`` installs request hooks (before_request,
+after_request, error handlers, ...) cannot be deferred. The manifest
+builder notices and leaves them out, and so does any module missing from
+the manifest; both are registered eagerly as before. EIMS_LAZY_MODULES=0
+turns laziness off entirely.
+
+The manifest is generated, not hand-written:
+
+    python -m eims_modules.lazy_routes --write
+
+This boots the app eagerly and records what every module registers.
+tests/test_lazy_routes.py fails when the checked-in manifest no longer
+matches the eager URL map.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger('eims.lazy')
+
+LAZY = os.environ.get('EIMS_LAZY_MODULES', '1').lower() not in ('0', 'false', 'no')
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'route_manifest.json')
+
+# Flask setup methods beyond plain routes: a module that calls any of these
+# during register() changes app-wide behaviour and must be loaded eagerly.
+_HOOKS = frozenset({
+    'before_request', 'after_request', 'teardown_request', 'teardown_appcontext',
+    'before_first_request', 'errorhandler', 'register_error_handler',
+    'register_blueprint', 'context_processor', 'url_value_preprocessor',
+    'url_defaults', 'template_filter', 'template_global', 'shell_context_processor',
+})
+_SHORTCUTS = {'get': 'GET', 'post': 'POST', 'put': 'PUT', 'delete': 'DELETE', 'patch': 'PATCH'}
+
+
+class NotLazy(Exception):
+    """register() did something other than add routes."""
+
+
+class _Recorder:
+    """Stands in for the Flask app during a module's register(): URL rules
+    are captured, request hooks raise NotLazy, and everything else (config,
+    url_map, logger, ...) is read from the real app."""
+
+    def __init__(self, app):
+        self._app = app
+        self.routes: List[Dict[str, Any]] = []
+
+    def add_url_rule(self, rule: str, endpoint: Optional[str] = None,
+                     view_func: Optional[Callable] = None, **options) -> None:
+        if endpoint is None:
+            endpoint = view_func.__name__
+        methods = options.pop('methods', None)
+        if methods is not None:
+            methods = sorted({m.upper() for m in ([methods] if isinstance(methods, str) else methods)})
+        self.routes.append({'rule': rule, 'endpoint': endpoint, 'methods': methods,
+                            'options': options, 'view': view_func})
+
+    def route(self, rule: str, **options):
+        def decorator(f):
+            self.add_url_rule(rule, options.pop('endpoint', None), f, **options)
+            return f
+        return decorator
+
+    def __getattr__(self, name: str):
+        if name in _HOOKS:
+            raise NotLazy(name)
+        if name in _SHORTCUTS:
+            return lambda rule, **options: self.route(rule, methods=[_SHORTCUTS[name]], **options)
+        return getattr(self._app, name)
+
+
+def record(module_name: str, app, **kwargs) -> List[Dict[str, Any]]:
+    """Import eims_modules.<module_name> and run its register() against a
+    recorder; returns the captured routes (with their view functions)."""
+    module = importlib.import_module(f'eims_modules.{module_name}')
+    recorder = _Recorder(app)
+    module.register(recorder, **kwargs)
+    return recorder.routes
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('modules', {})
+    except (OSError, ValueError):
+        return {}
+
+
+class Registry:
+    """Lazy and eager registrations for one app. ``modules`` lists every
+    registration in order, with how it was registered and, for lazy ones,
+    when (and how long) the first hit took to load it."""
+
+    def __init__(self, app, manifest: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 lazy: Optional[bool] = None):
+        self.app = app
+        self.lazy = LAZY if lazy is None else lazy
+        self.manifest = load_manifest() if manifest is None and self.lazy else (manifest or {})
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self._kwargs: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, label: str, **kwargs) -> None:
+        """Register eims_modules.<name>: stubs if it is in the manifest,
+        otherwise import + register() now. Failures are logged, never
+        raised, like the try/except blocks this replaces."""
+        self._kwargs[name] = kwargs
+        routes = self.manifest.get(name) if self.lazy else None
+        if routes is None:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(f'eims_modules.{name}').register(self.app, **kwargs)
+                self.modules[name] = {'label': label, 'mode': 'eager',
+                                      'load_ms': round((time.perf_counter() - started) * 1e3, 1)}
+            except Exception as e:  # pragma: no cover
+                logger.warning('%s module registration failed: %s', label, e)
+            return
+        self._locks[name] = threading.Lock()
+        self.modules[name] = {'label': label, 'mode': 'lazy', 'loaded': False, 'routes': len(routes)}
+        for r in routes:
+            try:
+                self.app.add_url_rule(r['rule'], r['endpoint'], self._stub(name, r['endpoint']),
+                                      methods=r['methods'], **r.get('options', {}))
+            except (AssertionError, ValueError) as e:
+                logger.warning('Could not register %s %s: %s', r['methods'], r['rule'], e)
+
+    def _stub(self, name: str, endpoint: str) -> Callable:
+        def stub(**view_args):
+            try:
+                views = self.load(name)
+            except Exception as e:
+                logger.warning('%s module failed to load: %s', self.modules[name]['label'], e)
+                from flask import jsonify
+                return jsonify({'success': False, 'error': f'{name} module unavailable'}), 503
+            return views[endpoint](**view_args)
+        stub.__name__ = endpoint
+        stub.eims_lazy_stub = name
+        return stub
+
+    def load(self, name: str) -> Dict[str, Callable]:
+        """Import a lazily registered module and swap its real views in for
+        the stubs; returns endpoint -> view. Safe to call more than once."""
+        with self._locks[name]:
+            info = self.modules[name]
+            if info.get('views') is not None:
+                return info['views']
+            started = time.perf_counter()
+            routes = record(name, self.app, **self._kwargs[name])
+            views = {r['endpoint']: r['view'] for r in routes}
+            expected = {r['endpoint'] for r in self.manifest[name]}
+            for endpoint in expected & views.keys():
+                self.app.view_functions[endpoint] = views[endpoint]
+            if views.keys() != expected:
+                logger.warning('route_manifest.json is stale for %s: %s missing, %s extra '
+                               '(run python -m eims_modules.lazy_routes --write)', name,
+                               sorted(expected - views.keys()), sorted(views.keys() - expected))
+            info.update(views=views, loaded=True,
+                        load_ms=round((time.perf_counter() - started) * 1e3, 1))
+            logger.info('%s module loaded on first request (%.0f ms)', info['label'], info['load_ms'])
+            return views
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: {k: v for k, v in info.items() if k != 'views'}
+                for name, info in self.modules.items()}
+
+
+# ---------------------------------------------------------------------------
+#  Manifest builder
+# ---------------------------------------------------------------------------
+
+def build_manifest() -> Dict[str, Any]:
+    """Boot app_professional eagerly and record each registered module's
+    routes. Modules whose register() touches request hooks are left out."""
+    os.environ['EIMS_LAZY_MODULES'] = '0'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, root)
+    import app_professional
+    from flask import Flask
+
+    registry = app_professional._eims_modules
+    scratch = Flask('eims-manifest')
+    modules, eager = {}, []
+    for name in registry.modules:
+        try:
+            routes = record(name, scratch, **registry._kwargs[name])
+        except NotLazy as e:
+            eager.append(f'{name} ({e})')
+            continue
+        modules[name] = [{'rule': r['rule'], 'endpoint': r['endpoint'], 'methods': r['methods'],
+                          **({'options': r['options']} if r['options'] else {})} for r in routes]
+    return {'generated_by': 'python -m eims_modules.lazy_routes --write',
+            'eager': eager, 'modules': modules}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Build the lazy-route manifest.')
+    parser.add_argument('--write', action='store_true', help=f'write {os.path.basename(MANIFEST_PATH)}')
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+    manifest = build_manifest()
+    text = json.dumps(manifest, indent=1, sort_keys=True) + '\n'
+    if args.write:
+        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"wrote {MANIFEST_PATH}: {len(manifest['modules'])} lazy modules, "
+              f"{sum(len(v) for v in manifest['modules'].values())} routes; eager: {manifest['eager']}")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
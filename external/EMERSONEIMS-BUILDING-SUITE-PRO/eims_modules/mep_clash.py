@@ -5,17 +5,21 @@ This module gives every EIMS project clash-detection out of the box.
 
 Algorithm
 ---------
-1. Build axis-aligned bounding boxes (AABB) for every structural and MEP
-   element from the unified BIM model.
-2. Sweep-and-prune candidate pairs by overlapping x-extents (O(n log n)
-   instead of O(n²)).
-3. For each candidate pair, test full 3D AABB intersection.
+1. Build axis-aligned bounding boxes (AABB) for every structural, wall and
+   MEP element from the unified BIM model. Walls get one box per straight
+   segment (diagonal ones in short pieces), so a box never spans a room.
+2. Broad phase: drop clearance-inflated boxes into a uniform 3D hash grid
+   and take pairs sharing a cell as candidates (see clash_index).
+3. Narrow phase: test all candidate pairs at once on numpy arrays.
 4. Classify each clash by severity:
    - HARD: solid-vs-solid (e.g. duct through column) → must reroute
    - SOFT: clearance violation (e.g. cable tray <50 mm from beam) → review
    - INFO: same-system or expected (e.g. cable in conduit) → ignored
 5. Suggest a re-route direction (above/below/around).
 
+Per-project indexes are kept in memory after a full run so that a BIM edit
+re-checks only the elements it touched (``recheck_project``).
+
 References
 ----------
 - BS 1192-1:2007 — clash classification levels
@@ -26,10 +30,14 @@ References
 from __future__ import annotations
 
 import math
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Iterable
+from typing import Any, Iterable, Optional
 
 from eims_modules import logger
+from eims_modules.clash_index import ClashIndex
 
 
 # ============================================================================
@@ -125,6 +133,42 @@ def aabb_for_slab(polygon_xy: list[tuple[float, float]],
                 max(xs), max(ys), z_top)
 
 
+def aabb_for_wall(points_xy: list[tuple[float, float]], thickness_m: float,
+                  z_base: float, height_m: float) -> AABB:
+    """Bounding box for a wall polyline, widened by half its thickness."""
+    half = thickness_m / 2
+    if not points_xy:
+        return AABB(0, 0, z_base, 0, 0, z_base + height_m)
+    xs = [p[0] for p in points_xy]
+    ys = [p[1] for p in points_xy]
+    return AABB(min(xs) - half, min(ys) - half, z_base,
+                max(xs) + half, max(ys) + half, z_base + height_m)
+
+
+WALL_PIECE_M = 0.5      # max off-axis extent of one box along a diagonal wall
+
+
+def aabbs_for_wall(points_xy: list[tuple[float, float]], thickness_m: float,
+                   z_base: float, height_m: float,
+                   piece_m: float = WALL_PIECE_M) -> list[AABB]:
+    """Boxes for a wall polyline: one per straight segment, and a diagonal
+    segment cut into pieces no more than ``piece_m`` across its off-axis
+    direction. A single box round an L-shaped or diagonal wall would cover
+    the room it encloses and clash with every service inside."""
+    if len(points_xy) < 2:
+        return [aabb_for_wall(points_xy, thickness_m, z_base, height_m)]
+    boxes = []
+    for (x1, y1), (x2, y2) in zip(points_xy, points_xy[1:]):
+        dx, dy = x2 - x1, y2 - y1
+        n = max(1, math.ceil(min(abs(dx), abs(dy)) / piece_m))
+        for k in range(n):
+            boxes.append(aabb_for_wall(
+                [(x1 + dx * k / n, y1 + dy * k / n),
+                 (x1 + dx * (k + 1) / n, y1 + dy * (k + 1) / n)],
+                thickness_m, z_base, height_m))
+    return boxes
+
+
 def aabb_for_run(p1: tuple[float, float, float], p2: tuple[float, float, float],
                  cross_section_w_m: float, cross_section_h_m: float) -> AABB:
     """Bounding box for a duct/pipe/tray run between two 3D points."""
@@ -153,35 +197,17 @@ CLEARANCE_RULES: dict[tuple[str, str], float] = {
 }
 
 
+# System pairs that touch by design: walls are built onto slabs and wrap
+# around columns, so only their clashes with services are reported.
+IGNORED_SYSTEM_PAIRS: set[tuple[str, str]] = {('ARCHITECTURE', 'STRUCTURE')}
+
+
 def required_clearance(s1: str, s2: str) -> float:
     return (CLEARANCE_RULES.get((s1, s2))
             or CLEARANCE_RULES.get((s2, s1))
             or 0.0)
 
 
-# ============================================================================
-# Sweep-and-prune broad-phase
-# ============================================================================
-
-def _broad_phase(elements: list[Element]) -> Iterable[tuple[Element, Element]]:
-    """O(n log n + k) candidate-pair generator using sweep-and-prune on x.
-
-    Sorts by xmin, then for each element advances a window of currently-active
-    elements whose xmax >= current xmin. Yields all (i, j) candidate pairs.
-    """
-    n = len(elements)
-    if n < 2:
-        return
-    sorted_els = sorted(enumerate(elements), key=lambda kv: kv[1].aabb.xmin)
-    active: list[tuple[int, Element]] = []
-    for idx, el in sorted_els:
-        # Drop active elements that finished before this one started
-        active = [(i, e) for (i, e) in active if e.aabb.xmax >= el.aabb.xmin]
-        for j, other in active:
-            yield (el, other)
-        active.append((idx, el))
-
-
 # ============================================================================
 # Clash classification
 # ============================================================================
@@ -221,6 +247,10 @@ def _suggest_route(a: Element, b: Element) -> str:
     if a.system == 'STRUCTURE' and b.system == 'STRUCTURE':
         return 'Structural conflict — review framing layout'
 
+    if 'ARCHITECTURE' in (a.system, b.system):
+        mep, wall = (a, b) if b.system == 'ARCHITECTURE' else (b, a)
+        return f'Sleeve {mep.kind} through {wall.kind} and fire-stop the penetration'
+
     mep, struct = (a, b) if b.system == 'STRUCTURE' else (b, a)
     if struct.system != 'STRUCTURE':
         return f'Reroute {mep.kind} ({mep.id[:8]}) to maintain clearance'
@@ -240,102 +270,143 @@ def _suggest_route(a: Element, b: Element) -> str:
     return f'Reroute {mep.kind} away from {struct.kind}'
 
 
-def _classify(a: Element, b: Element, overlap: float, clearance: float) -> str:
-    if overlap > 0.0:
-        return 'HARD'
-    if clearance > 0.0:
-        return 'SOFT'
-    return 'INFO'
+def build_index(elements: Iterable[Element]) -> ClashIndex:
+    """Index ``elements`` under the BSRIA clearance rules and run a full pass."""
+    return ClashIndex(CLEARANCE_RULES, IGNORED_SYSTEM_PAIRS).load(_index_rows(elements))
 
 
-def detect(elements: list[Element]) -> dict[str, Any]:
-    """Run the full clash detection sweep on a list of elements.
+def _index_rows(elements: Iterable[Element]):
+    for el in elements:
+        bb = el.aabb
+        yield (el.id, el.system, el.kind,
+               (bb.xmin, bb.ymin, bb.zmin, bb.xmax, bb.ymax, bb.zmax), el)
 
-    Returns a dict with a clash list, severity counts, and a quality score.
-    """
-    pairs_seen: set[tuple[str, str]] = set()
-    clashes: list[Clash] = []
 
-    for a, b in _broad_phase(elements):
-        # Same-element pair sanity
-        if a.id == b.id:
-            continue
-        # Same system + same kind = expected adjacency (e.g. two beams meeting)
-        if a.system == b.system and a.kind == b.kind:
-            continue
-        # Skip duplicates (a,b) vs (b,a)
-        key = tuple(sorted((a.id, b.id)))
-        if key in pairs_seen:
-            continue
-        pairs_seen.add(key)
-
-        clearance = required_clearance(a.system, b.system)
-        if not a.aabb.intersects(b.aabb, clearance_m=clearance):
-            continue
-
-        overlap = a.aabb.overlap_volume_m3(b.aabb)
-        sev = _classify(a, b, overlap, clearance)
-        if sev == 'INFO':
-            continue
+def _clash(a: Element, b: Element, overlap: float, clearance: float) -> Clash:
+    # Mid-point of the two element centres = approximate clash location
+    ax, ay, az = a.aabb.centre()
+    bx, by, bz = b.aabb.centre()
+    return Clash(
+        a_id=a.id, a_system=a.system, a_kind=a.kind, a_label=a.label,
+        b_id=b.id, b_system=b.system, b_kind=b.kind, b_label=b.label,
+        severity='HARD' if overlap > 0.0 else 'SOFT',
+        overlap_m3=overlap,
+        clearance_required_m=clearance,
+        location_xyz=((ax + bx) / 2, (ay + by) / 2, (az + bz) / 2),
+        suggestion=_suggest_route(a, b),
+    )
 
-        # Mid-point of the two element centres = approximate clash location
-        ax, ay, az = a.aabb.centre()
-        bx, by, bz = b.aabb.centre()
-        loc = ((ax + bx) / 2, (ay + by) / 2, (az + bz) / 2)
-
-        clashes.append(Clash(
-            a_id=a.id, a_system=a.system, a_kind=a.kind, a_label=a.label,
-            b_id=b.id, b_system=b.system, b_kind=b.kind, b_label=b.label,
-            severity=sev,
-            overlap_m3=overlap,
-            clearance_required_m=clearance,
-            location_xyz=loc,
-            suggestion=_suggest_route(a, b),
-        ))
 
+def _scores(clashes: list[Clash]) -> dict[str, Any]:
     counts = {'HARD': 0, 'SOFT': 0}
     for c in clashes:
         counts[c.severity] = counts.get(c.severity, 0) + 1
-
     # Quality score: 100 - 5*HARD - 1*SOFT, floored at 0.
     score = max(0.0, 100.0 - 5.0 * counts['HARD'] - 1.0 * counts['SOFT'])
+    return {'clash_count': len(clashes), 'severity_counts': counts,
+            'coordination_score': round(score, 1)}
 
+
+def summarise(index: ClashIndex) -> dict[str, Any]:
+    """Full result payload for the clashes currently held by ``index``."""
+    clashes = [_clash(*c) for c in index.clashes()]
     return {
         'success': True,
-        'method': 'sweep-and-prune AABB',
+        'method': 'uniform-grid AABB',
         'standards': ['BS 1192-1:2007', 'BSRIA BG 6/2018', 'AIA E202-2008 LOD 350'],
-        'element_count': len(elements),
-        'pairs_tested': len(pairs_seen),
-        'clash_count': len(clashes),
-        'severity_counts': counts,
-        'coordination_score': round(score, 1),
+        'element_count': len(index),
+        'pairs_tested': index.pairs_tested,
+        **_scores(clashes),
         'clashes': [c.to_dict() for c in clashes],
     }
 
 
+def detect(elements: list[Element]) -> dict[str, Any]:
+    """Run the full clash detection sweep on a list of elements.
+
+    Returns a dict with a clash list, severity counts, and a quality score.
+    """
+    return summarise(build_index(elements))
+
+
+# ============================================================================
+# Per-project indexes for incremental re-checking
+# ============================================================================
+
+PROJECT_INDEX_CACHE_SIZE = int(os.environ.get('EIMS_CLASH_INDEX_CACHE', '16'))
+
+_project_indexes: 'OrderedDict[str, ClashIndex]' = OrderedDict()
+_project_lock = threading.Lock()
+
+
+def detect_project(project_id: str, building_dict: dict) -> dict[str, Any]:
+    """Full run for a project; keeps the index for later ``recheck_project``."""
+    index = build_index(elements_from_building(building_dict))
+    with _project_lock:
+        _project_indexes[project_id] = index
+        _project_indexes.move_to_end(project_id)
+        while len(_project_indexes) > PROJECT_INDEX_CACHE_SIZE:
+            _project_indexes.popitem(last=False)
+    return summarise(index)
+
+
+def recheck_project(project_id: str, building_dict: dict,
+                    element_ids: Iterable[str]) -> Optional[dict[str, Any]]:
+    """Re-check only ``element_ids`` after an edit to a project's model.
+
+    Returns ``None`` if the project has no index yet (no full run since the
+    process started). Ids that are no longer in the model are removed.
+    """
+    with _project_lock:
+        index = _project_indexes.get(project_id)
+    if index is None:
+        return None
+    wanted = set(element_ids)
+    found = elements_from_building(building_dict, only=wanted)
+    with _project_lock:
+        # A re-shaped wall may now have fewer parts than the index holds.
+        parts = {el.id for el in index.items() if el.properties.get('wall_id') in wanted}
+        delta = index.update(_index_rows(found),
+                             removed=(wanted | parts) - {e.id for e in found})
+        clashes = [_clash(*c) for c in index.clashes()]
+    return {
+        'element_count': len(index),
+        'pairs_tested': index.pairs_tested,
+        **_scores(clashes),
+        'added': [list(p) for p in delta['added']],
+        'resolved': [list(p) for p in delta['resolved']],
+    }
+
+
 # ============================================================================
 # Building -> elements adapter
 # ============================================================================
 
-def elements_from_building(building_dict: dict) -> list[Element]:
+def elements_from_building(building_dict: dict,
+                           only: Optional[set[str]] = None) -> list[Element]:
     """Convert a `Building.to_dict()` payload + any MEP overlay into Elements.
 
     Accepts `building_dict` with optional keys:
-      - storeys[].columns / .beams / .slabs (from BIM model)
+      - storeys[].columns / .beams / .slabs / .walls (from BIM model)
+      - types.walls[type_name].thickness_m (wall thickness, default 0.2 m)
       - mep_runs: list of {system, kind, p1:[x,y,z], p2:[x,y,z], width_m, height_m}
     Missing data is skipped silently — clash detection always returns an
-    answer even on partial models.
+    answer even on partial models. With `only`, just the elements with those
+    ids are built (incremental re-checks). A wall that needs several boxes
+    becomes elements ``<id>#0``, ``<id>#1``, ... with ``properties['wall_id']``.
     """
     elements: list[Element] = []
     storeys = building_dict.get('storeys') or []
+    wall_types = (building_dict.get('types') or {}).get('walls') or {}
+    seq = 0
 
-    # Build a level lookup so columns/beams/slabs get the right z
-    level_by_id: dict[str, dict] = {}
-    for s in storeys:
-        level_by_id[s.get('id', '')] = {
-            'level_m': float(s.get('level_m', 0.0)),
-            'height_m': float(s.get('height_m', 3.0)),
-        }
+    def wanted(item: dict, prefix: str) -> Optional[str]:
+        # Default ids count every element seen, so they match between a full
+        # build and a filtered one.
+        nonlocal seq
+        eid = item.get('id', f'{prefix}-{seq}')
+        seq += 1
+        return eid if only is None or eid in only else None
 
     for s in storeys:
         z_base = float(s.get('level_m', 0.0))
@@ -343,22 +414,26 @@ def elements_from_building(building_dict: dict) -> list[Element]:
         z_top = z_base + h
 
         for col in s.get('columns', []) or []:
+            eid = wanted(col, 'col')
+            if eid is None:
+                continue
             pt = col.get('point') or {}
             section = col.get('section', 'C300x300')
             elements.append(Element(
-                id=col.get('id', f'col-{len(elements)}'),
-                system='STRUCTURE', kind='column',
+                id=eid, system='STRUCTURE', kind='column',
                 aabb=aabb_for_column((float(pt.get('x', 0)), float(pt.get('y', 0))),
                                      section, z_base, h),
                 label=f"Column {section}",
             ))
 
         for bm in s.get('beams', []) or []:
+            eid = wanted(bm, 'beam')
+            if eid is None:
+                continue
             p1 = bm.get('p1') or {}; p2 = bm.get('p2') or {}
             section = bm.get('section', 'B300x500')
             elements.append(Element(
-                id=bm.get('id', f'beam-{len(elements)}'),
-                system='STRUCTURE', kind='beam',
+                id=eid, system='STRUCTURE', kind='beam',
                 aabb=aabb_for_beam(
                     (float(p1.get('x', 0)), float(p1.get('y', 0))),
                     (float(p2.get('x', 0)), float(p2.get('y', 0))),
@@ -367,23 +442,45 @@ def elements_from_building(building_dict: dict) -> list[Element]:
             ))
 
         for sl in s.get('slabs', []) or []:
+            eid = wanted(sl, 'slab')
+            if eid is None:
+                continue
             poly = [(float(p.get('x', 0)), float(p.get('y', 0)))
                     for p in (sl.get('boundary') or [])]
             thk = float((sl.get('properties') or {}).get('thickness_m', 0.2))
             elements.append(Element(
-                id=sl.get('id', f'slab-{len(elements)}'),
-                system='STRUCTURE', kind='slab',
+                id=eid, system='STRUCTURE', kind='slab',
                 aabb=aabb_for_slab(poly, z_top, thk),
                 label=f"Slab t={int(thk*1000)}mm",
             ))
 
+        for w in s.get('walls', []) or []:
+            eid = wanted(w, 'wall')
+            if eid is None:
+                continue
+            pts = [(float(p.get('x', 0)), float(p.get('y', 0)))
+                   for p in (w.get('points') or [])]
+            thk = float((wall_types.get(w.get('type_name')) or {}).get('thickness_m', 0.2))
+            boxes = aabbs_for_wall(pts, thk, z_base, float(w.get('height_m', h)))
+            label = f"Wall {w.get('type_name', '')}".strip()
+            for k, box in enumerate(boxes):
+                elements.append(Element(
+                    id=eid if len(boxes) == 1 else f'{eid}#{k}',
+                    system='ARCHITECTURE', kind='wall', aabb=box,
+                    label=label if len(boxes) == 1 else f'{label} part {k + 1}/{len(boxes)}',
+                    properties={'wall_id': eid},
+                ))
+
     for run in building_dict.get('mep_runs') or []:
+        eid = wanted(run, 'mep')
+        if eid is None:
+            continue
         try:
             p1 = run['p1']; p2 = run['p2']
             p1t = (float(p1[0]), float(p1[1]), float(p1[2]))
             p2t = (float(p2[0]), float(p2[1]), float(p2[2]))
             elements.append(Element(
-                id=run.get('id', f"mep-{len(elements)}"),
+                id=eid,
                 system=str(run.get('system', 'HVAC')).upper(),
                 kind=str(run.get('kind', 'duct')),
                 aabb=aabb_for_run(p1t, p2t,
@@ -0,0 +1,180 @@
+"""Dependency-aware, incremental executor for the 13-phase project pipeline.
+
+Each phase declares the project fields it reads (``inputs``) and the phases
+whose output it consumes (``deps``). Its cache key is a SHA-256 over its
+version, those input values and the keys of its deps -- so keys can be
+computed for the whole graph before anything runs, and a changed input
+invalidates exactly the phases downstream of it.
+
+Phase results are stored in ``phases_json`` as before, with two extra
+fields per entry:
+
+  * input_hash  : cache key the stored ``data`` was computed under
+  * duration_ms : wall time of the last real computation
+
+Stale phases run on a thread pool as soon as their deps are available;
+fresh ones are reused from the stored entry untouched.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger('eims.phase_graph')
+
+# Bump to invalidate every stored phase (e.g. after a units change in a designer).
+GRAPH_VERSION = '1'
+
+
+@dataclass(frozen=True)
+class Phase:
+    """One node of the pipeline.
+
+    ``fn(inputs, deps)`` receives a dict of the declared input values and a
+    dict of dep-key -> dep ``data`` and returns this phase's ``data``.
+    ``name`` may be a callable of the result for labels like "BOQ (42 items)".
+    """
+    key: str
+    name: Union[str, Callable[[Any], str]]
+    fn: Callable[[Dict[str, Any], Dict[str, Any]], Any]
+    inputs: Tuple[str, ...] = ()
+    deps: Tuple[str, ...] = ()
+    version: str = '1'
+
+    def label(self, data: Any) -> str:
+        return self.name(data) if callable(self.name) else self.name
+
+
+@dataclass
+class PhaseRun:
+    phases: Dict[str, Dict[str, Any]]
+    recomputed: List[str]
+    reused: List[str]
+    timings_ms: Dict[str, float]
+    total_ms: float
+
+
+class PhaseGraph:
+    """A validated, topologically ordered set of phases."""
+
+    def __init__(self, phases: Sequence[Phase]):
+        self.phases: Dict[str, Phase] = {}
+        for phase in phases:
+            if phase.key in self.phases:
+                raise ValueError(f'duplicate phase {phase.key!r}')
+            self.phases[phase.key] = phase
+        for phase in phases:
+            missing = [d for d in phase.deps if d not in self.phases]
+            if missing:
+                raise ValueError(f'{phase.key} depends on unknown phase(s) {missing}')
+        self.order = self._toposort()
+
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(key: str) -> None:
+            if state.get(key) == 2:
+                return
+            if state.get(key) == 1:
+                raise ValueError(f'phase dependency cycle through {key!r}')
+            state[key] = 1
+            for dep in self.phases[key].deps:
+                visit(dep)
+            state[key] = 2
+            order.append(key)
+
+        for key in self.phases:
+            visit(key)
+        return order
+
+    # ---------- cache keys ----------
+
+    def input_hashes(self, inputs: Dict[str, Any]) -> Dict[str, str]:
+        """Cache key for every phase, in topological order."""
+        hashes: Dict[str, str] = {}
+        for key in self.order:
+            phase = self.phases[key]
+            payload = {
+                'graph': GRAPH_VERSION,
+                'phase': key,
+                'version': phase.version,
+                'inputs': {name: inputs.get(name) for name in phase.inputs},
+                'deps': [hashes[d] for d in phase.deps],
+            }
+            blob = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+            hashes[key] = hashlib.sha256(blob.encode('utf-8')).hexdigest()[:32]
+        return hashes
+
+    def stale(self, inputs: Dict[str, Any], cached: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Phases whose stored result does not match the current inputs."""
+        cached = cached or {}
+        hashes = self.input_hashes(inputs)
+        return [k for k in self.order
+                if not isinstance(cached.get(k), dict)
+                or cached[k].get('input_hash') != hashes[k]
+                or 'data' not in cached[k]]
+
+    # ---------- execution ----------
+
+    def run(self, inputs: Dict[str, Any], cached: Optional[Dict[str, Any]] = None,
+            max_workers: Optional[int] = None, force: bool = False) -> PhaseRun:
+        """Recompute stale phases (all of them when ``force``) and reuse the rest."""
+        started = time.perf_counter()
+        cached = cached or {}
+        hashes = self.input_hashes(inputs)
+        todo = set(self.order if force else self.stale(inputs, cached))
+
+        results: Dict[str, Dict[str, Any]] = {k: cached[k] for k in self.order if k not in todo}
+        timings: Dict[str, float] = {}
+        workers = max_workers or int(os.environ.get('EIMS_PHASE_WORKERS', '4'))
+
+        def execute(key: str) -> Tuple[Any, float]:
+            phase = self.phases[key]
+            dep_data = {d: results[d]['data'] for d in phase.deps}
+            t0 = time.perf_counter()
+            data = phase.fn({name: inputs.get(name) for name in phase.inputs}, dep_data)
+            return data, (time.perf_counter() - t0) * 1000
+
+        pending = {}
+        remaining = set(todo)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='eims-phase') as pool:
+            while remaining or pending:
+                # Everything whose deps are all resolved can start now.
+                for key in [k for k in self.order if k in remaining
+                            and all(d in results for d in self.phases[k].deps)]:
+                    remaining.discard(key)
+                    pending[pool.submit(execute, key)] = key
+                if not pending:
+                    raise RuntimeError(f'phases {sorted(remaining)} can never become ready')
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    data, ms = future.result()
+                    timings[key] = round(ms, 2)
+                    results[key] = {
+                        'name': self.phases[key].label(data),
+                        'data': data,
+                        'timestamp': datetime.now().isoformat(),
+                        'input_hash': hashes[key],
+                        'duration_ms': timings[key],
+                    }
+
+        recomputed = [k for k in self.order if k in todo]
+        if recomputed:
+            logger.info('phases recomputed: %s (reused %d)', ','.join(recomputed), len(self.order) - len(recomputed))
+        return PhaseRun(
+            phases={k: results[k] for k in self.order},
+            recomputed=recomputed,
+            reused=[k for k in self.order if k not in todo],
+            timings_ms=timings,
+            total_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
@@ -21,13 +21,15 @@ same persistence root as the audit log and variations register.
 
 from __future__ import annotations
 
+import contextlib
 import datetime as _dt
 import json
 import logging
 import os
-import sqlite3
 import threading
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from eims_modules import db as _db
 
 logger = logging.getLogger('eims.projects')
 
@@ -44,16 +46,27 @@ def _now() -> str:
     return _dt.datetime.now(_dt.timezone.utc).isoformat(timespec='seconds')
 
 
-def _connect() -> sqlite3.Connection:
+@contextlib.contextmanager
+def _connect() -> Iterator[_db.PooledConnection]:
+    """Pooled autocommit connection, returned to the pool on exit."""
     os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(_DB_PATH, timeout=10, isolation_level=None)
-    conn.row_factory = sqlite3.Row
-    conn.execute('PRAGMA foreign_keys = ON')
-    conn.execute('PRAGMA journal_mode = WAL')
-    return conn
+    conn = _db.get_pool(_DB_PATH, isolation_level=None, foreign_keys=True).connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+_schema_ready: set = set()
 
 
 def init_db() -> None:
+    """Create the schema once per process (and again if the file vanished)."""
+    if _DB_PATH in _schema_ready:
+        if os.path.exists(_DB_PATH):
+            return
+        # Pooled handles would still point at the deleted file.
+        _db.get_pool(_DB_PATH, isolation_level=None, foreign_keys=True).close_idle()
     with _DB_LOCK, _connect() as conn:
         conn.executescript('''
             CREATE TABLE IF NOT EXISTS projects (
@@ -75,6 +88,7 @@ def init_db() -> None:
             );
             CREATE INDEX IF NOT EXISTS idx_snap_project ON snapshots(project_id);
         ''')
+    _schema_ready.add(_DB_PATH)
 
 
 def _count_sources(payload: Any) -> int:
@@ -15,6 +15,10 @@ Distributions supported per risk:
   * normal(mean, sd)                   -- for symmetric, well-characterised risks
   * lognormal(mean, sd)                -- for highly skewed cost overruns
 
+Draws are vectorised (iterations x risks) with optional Latin hypercube
+sampling, Iman-Conover rank correlation between risks and convergence-based
+early stopping.
+
 EVERY simulated value carries explicit labels ("Monte Carlo, n=10,000,
 distribution=triangular") so users cannot mistake them for measured data --
 this satisfies the strict data-provenance policy.
@@ -24,81 +28,178 @@ from __future__ import annotations
 
 import logging
 import math
-import random
-import statistics
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import special
+from scipy.stats import rankdata
 
 logger = logging.getLogger('eims.risk')
 
+SAMPLING_METHODS = ('random', 'lhs')
+CONVERGENCE_BATCH = 5000
+HISTOGRAM_BINS = 30
+_U_EPS = 1e-12
+
 
-# ---------- distribution samplers (pure stdlib, no numpy dependency) ----------
+# ---------- inverse CDFs, vectorised over (iterations x risks) ----------
+# Each takes uniforms u of shape (n, c) and parameter arrays of shape (c,),
+# so every risk sharing a distribution type is drawn in one call.
 
-def _sample_triangular(p: Dict[str, float]) -> float:
-    return random.triangular(p['min'], p['max'], p['mode'])
+def _ppf_triangular(u, p):
+    a, m, b = p['min'], p['mode'], p['max']
+    span = np.where(b > a, b - a, 1.0)
+    fc = (m - a) / span
+    left = a + np.sqrt(u * span * (m - a))
+    right = b - np.sqrt((1 - u) * span * (b - m))
+    return np.where(b > a, np.where(u < fc, left, right), a)
 
 
-def _sample_pert(p: Dict[str, float]) -> float:
+def _ppf_pert(u, p):
     """Modified PERT (lambda=4): Beta-PERT distribution."""
     a, m, b = p['min'], p['mode'], p['max']
-    if b <= a:
-        return a
+    span = np.where(b > a, b - a, 1.0)
     lam = 4.0
-    alpha = 1 + lam * (m - a) / (b - a)
-    beta_p = 1 + lam * (b - m) / (b - a)
-    return a + random.betavariate(alpha, beta_p) * (b - a)
+    alpha = 1 + lam * (m - a) / span
+    beta_p = 1 + lam * (b - m) / span
+    return np.where(b > a, a + _beta_ppf(u, alpha, beta_p) * span, a)
+
+
+_BETA_GRID = np.sin(np.linspace(0.0, np.pi / 2, 4097)) ** 2   # dense near 0 and 1
 
 
-def _sample_uniform(p: Dict[str, float]) -> float:
-    return random.uniform(p['min'], p['max'])
+def _beta_ppf(u, alpha, beta_p):
+    """Beta inverse CDF by interpolating the CDF on a fixed grid.
 
+    special.betaincinv costs ~3 us per element (an iterative root find);
+    the forward betainc on 4097 end-clustered points per risk plus np.interp
+    is ~50x cheaper and agrees to ~1e-7 of the range.
+    """
+    cdf = special.betainc(alpha[None, :], beta_p[None, :], _BETA_GRID[:, None])
+    return np.stack([np.interp(u[:, j], cdf[:, j], _BETA_GRID) for j in range(u.shape[1])], axis=1)
+
+
+def _ppf_uniform(u, p):
+    return p['min'] + u * (p['max'] - p['min'])
 
-def _sample_normal(p: Dict[str, float]) -> float:
-    return random.gauss(p['mean'], p['sd'])
 
+def _ppf_normal(u, p):
+    return p['mean'] + p['sd'] * special.ndtri(u)
 
-def _sample_lognormal(p: Dict[str, float]) -> float:
-    # Convert mean/sd of underlying normal to lognormal-friendly form
-    return random.lognormvariate(p['mean'], p['sd'])
+
+def _ppf_lognormal(u, p):
+    # mean/sd are those of the underlying normal (as random.lognormvariate)
+    return np.exp(p['mean'] + p['sd'] * special.ndtri(u))
 
 
 _DISTRIBUTIONS = {
-    'triangular': _sample_triangular,
-    'pert':       _sample_pert,
-    'uniform':    _sample_uniform,
-    'normal':     _sample_normal,
-    'lognormal':  _sample_lognormal,
+    'triangular': (_ppf_triangular, ('min', 'mode', 'max')),
+    'pert':       (_ppf_pert,       ('min', 'mode', 'max')),
+    'uniform':    (_ppf_uniform,    ('min', 'max')),
+    'normal':     (_ppf_normal,     ('mean', 'sd')),
+    'lognormal':  (_ppf_lognormal,  ('mean', 'sd')),
 }
 
 
-def _percentile(sorted_xs: List[float], p: float) -> float:
-    if not sorted_xs:
-        return 0.0
-    k = (len(sorted_xs) - 1) * p
-    lo = int(math.floor(k))
-    hi = int(math.ceil(k))
-    if lo == hi:
-        return sorted_xs[lo]
-    return sorted_xs[lo] + (sorted_xs[hi] - sorted_xs[lo]) * (k - lo)
+def _uniforms(rng: np.random.Generator, n: int, k: int, sampling: str) -> np.ndarray:
+    """(n, k) uniforms; 'lhs' puts exactly one draw in each of n strata per column."""
+    if sampling == 'lhs':
+        strata = rng.permuted(np.tile(np.arange(n), (k, 1)), axis=1).T
+        u = (strata + rng.random((n, k))) / n
+    else:
+        u = rng.random((n, k))
+    return np.clip(u, _U_EPS, 1 - _U_EPS)
+
+
+def _iman_conover(rng: np.random.Generator, u: np.ndarray, target_chol: np.ndarray) -> np.ndarray:
+    """Reorder each column of u so its rank correlation matches the target.
+
+    Iman & Conover (1982): van der Waerden scores, decorrelated by the
+    Cholesky factor of their own sample correlation and re-correlated by
+    the target's; the marginals are untouched, only the pairing changes.
+    """
+    n, k = u.shape
+    scores = special.ndtri(np.arange(1, n + 1) / (n + 1))
+    S = rng.permuted(np.tile(scores, (k, 1)), axis=1).T
+    Q = np.linalg.cholesky(np.corrcoef(S, rowvar=False))
+    T = S @ (target_chol @ np.linalg.inv(Q)).T
+    out = np.empty_like(u)
+    np.put_along_axis(out, np.argsort(T, axis=0), np.sort(u, axis=0), axis=0)
+    return out
+
+
+def _impacts(u: np.ndarray, groups) -> np.ndarray:
+    out = np.zeros_like(u)
+    for ppf, cols, params in groups:
+        out[:, cols] = ppf(u[:, cols], params)
+    return out
 
 
-def _spearman(xs: List[float], ys: List[float]) -> float:
-    if len(xs) < 2 or len(xs) != len(ys):
-        return 0.0
+def _distribution_groups(risks, key):
+    """[(ppf, column indices, {param: array})] for one impact dimension."""
+    by_type: Dict[str, List[int]] = {}
+    for i, r in enumerate(risks):
+        d = r.get(key)
+        if d:
+            by_type.setdefault(d['type'], []).append(i)
+    groups = []
+    for kind, cols in by_type.items():
+        ppf, names = _DISTRIBUTIONS[kind]
+        params = {n: np.array([float(risks[i][key][n]) for i in cols]) for n in names}
+        groups.append((ppf, np.array(cols), params))
+    return groups
+
+
+def _correlation_cholesky(names: List[str], correlations) -> np.ndarray:
+    idx = {n: i for i, n in enumerate(names)}
+    C = np.eye(len(names))
+    if not isinstance(correlations, list):
+        raise ValueError('correlations must be a list of {a, b, rho}')
+    for c in correlations:
+        if not isinstance(c, dict) or not {'a', 'b', 'rho'} <= c.keys():
+            raise ValueError(f'correlation {c!r} must be an object with a, b and rho')
+        a, b, rho = c['a'], c['b'], float(c['rho'])
+        if not math.isfinite(rho):
+            raise ValueError(f'correlation between {a!r} and {b!r} must be a finite number')
+        if a not in idx or b not in idx or a == b:
+            raise ValueError(f'correlation refers to unknown risk pair {a!r}, {b!r}')
+        if not -1.0 < rho < 1.0:
+            raise ValueError(f'correlation between {a!r} and {b!r} must be in (-1, 1)')
+        C[idx[a], idx[b]] = C[idx[b], idx[a]] = rho
+    try:
+        return np.linalg.cholesky(C)
+    except np.linalg.LinAlgError:
+        raise ValueError('risk correlation matrix is not positive definite') from None
+
+
+def _summary(xs: np.ndarray, bins: int) -> Dict[str, Any]:
+    pct = (10, 50, 80, 90, 95)
+    counts, edges = np.histogram(xs, bins=bins)
+    return {
+        'mean':  round(float(xs.mean()), 2),
+        'stdev': round(float(xs.std()), 2),
+        'min':   round(float(xs.min()), 2),
+        'max':   round(float(xs.max()), 2),
+        'percentiles': {f'P{p}': round(float(v), 2)
+                        for p, v in zip(pct, np.percentile(xs, pct))},
+        'histogram': {'edges': np.round(edges, 2).tolist(), 'counts': counts.tolist()},
+    }
+
+
+def _spearman_to_total(impacts: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Spearman rho of every impact column against the total, average ranks for ties."""
+    if len(total) < 2:
+        return np.zeros(impacts.shape[1])
+    ri = rankdata(impacts, axis=0) - (len(total) + 1) / 2.0
+    rt = rankdata(total) - (len(total) + 1) / 2.0
+    den = np.sqrt((ri ** 2).sum(axis=0) * (rt ** 2).sum())
+    return np.divide(rt @ ri, den, out=np.zeros(impacts.shape[1]), where=den > 0)
 
-    def _ranks(arr):
-        idx = sorted(range(len(arr)), key=lambda i: arr[i])
-        ranks = [0.0] * len(arr)
-        for r, i in enumerate(idx, 1):
-            ranks[i] = r
-        return ranks
 
-    rx, ry = _ranks(xs), _ranks(ys)
-    n = len(xs)
-    mx = (n + 1) / 2.0
-    num = sum((rx[i] - mx) * (ry[i] - mx) for i in range(n))
-    dx = math.sqrt(sum((rx[i] - mx) ** 2 for i in range(n)))
-    dy = math.sqrt(sum((ry[i] - mx) ** 2 for i in range(n)))
-    return num / (dx * dy) if dx and dy else 0.0
+def _settled(prev: Optional[np.ndarray], cur: np.ndarray, tol: float) -> bool:
+    if prev is None:
+        return False
+    return bool(np.all(np.abs(cur - prev) <= tol * np.maximum(np.abs(prev), 1e-9)))
 
 
 def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
@@ -106,7 +207,11 @@ def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
                   iterations: int = 10000,
                   budget_target: Optional[float] = None,
                   schedule_target_days: Optional[float] = None,
-                  seed: Optional[int] = None) -> Dict[str, Any]:
+                  seed: Optional[int] = None,
+                  sampling: str = 'random',
+                  correlations: Optional[List[Dict[str, Any]]] = None,
+                  convergence_tol: Optional[float] = None,
+                  histogram_bins: int = HISTOGRAM_BINS) -> Dict[str, Any]:
     """Run cost & schedule Monte Carlo.
 
     Each risk dict:
@@ -117,12 +222,25 @@ def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
           schedule_distribution:{'type':'pert','min':2,'mode':5,'max':20}
         }
     Either distribution may be omitted (means zero impact for that dimension).
+
+    All draws are (iterations x risks) arrays from a private
+    numpy Generator, so concurrent requests never share RNG state.
+
+    sampling:         'random' or 'lhs' (Latin hypercube, per column).
+    correlations:     [{'a': name, 'b': name, 'rho': 0.6}, ...] rank
+                      correlations between risks, imposed with Iman-Conover on
+                      occurrence, cost and schedule draws alike.
+    convergence_tol:  when set, `iterations` is a cap: batches of
+                      CONVERGENCE_BATCH run until the cost and duration mean,
+                      P50, P80 and P90 each move by less than this fraction.
     """
     if iterations <= 0 or iterations > 200000:
         return {'success': False,
                  'error': 'iterations must be between 1 and 200000'}
+    if sampling not in SAMPLING_METHODS:
+        return {'success': False,
+                 'error': f'sampling must be one of {", ".join(SAMPLING_METHODS)}'}
 
-    rnd = random.Random(seed) if seed is not None else random
     risks = risks or []
 
     # Validate distributions
@@ -133,53 +251,56 @@ def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
                 return {'success': False,
                          'error': f"unknown distribution {d.get('type')!r} on risk {r.get('name')!r}"}
 
-    cost_samples: List[float] = []
-    duration_samples: List[float] = []
-    per_risk_cost_impacts: Dict[str, List[float]] = {r.get('name', f'risk_{i}'): []
-                                                       for i, r in enumerate(risks)}
-
-    # Use module-level random; for deterministic seeded runs, swap to local RNG
-    if seed is not None:
-        random.seed(seed)
-
-    for _ in range(iterations):
-        total_cost_impact = 0.0
-        total_dur_impact = 0.0
-        for i, r in enumerate(risks):
-            name = r.get('name', f'risk_{i}')
-            occurs = random.random() < float(r.get('probability', 1.0))
-            cost_imp = 0.0
-            dur_imp = 0.0
-            if occurs:
-                d = r.get('cost_distribution')
-                if d:
-                    cost_imp = _DISTRIBUTIONS[d['type']](d)
-                d = r.get('schedule_distribution')
-                if d:
-                    dur_imp = _DISTRIBUTIONS[d['type']](d)
-            per_risk_cost_impacts[name].append(cost_imp)
-            total_cost_impact += cost_imp
-            total_dur_impact += dur_imp
-        cost_samples.append(base_cost + total_cost_impact)
-        duration_samples.append(base_duration_days + total_dur_impact)
-
-    cs = sorted(cost_samples)
-    ds = sorted(duration_samples)
-
-    def _percentiles(s):
-        return {f'P{int(p*100)}': round(_percentile(s, p), 2)
-                for p in (0.10, 0.50, 0.80, 0.90, 0.95)}
+    names = [r.get('name', f'risk_{i}') for i, r in enumerate(risks)]
+    try:
+        chol = _correlation_cholesky(names, correlations) if correlations else None
+        cost_groups = _distribution_groups(risks, 'cost_distribution')
+        sched_groups = _distribution_groups(risks, 'schedule_distribution')
+    except (KeyError, TypeError, ValueError) as e:
+        return {'success': False, 'error': f'invalid risk input: {e}'}
+    probability = np.array([float(r.get('probability', 1.0)) for r in risks])
+
+    rng = np.random.default_rng(seed)
+    k = len(risks)
+    batch = min(iterations, CONVERGENCE_BATCH) if convergence_tol else iterations
+    cost_parts: List[np.ndarray] = []
+    dur_parts: List[np.ndarray] = []
+    impact_parts: List[np.ndarray] = []
+    done, converged, prev = 0, False, None
+    while done < iterations:
+        n = min(batch, iterations - done)
+        blocks = [_uniforms(rng, n, k, sampling) for _ in range(3)]
+        if chol is not None and n > k:
+            blocks = [_iman_conover(rng, b, chol) for b in blocks]
+        occurs = blocks[0] < probability
+        cost_imp = np.where(occurs, _impacts(blocks[1], cost_groups), 0.0)
+        dur_imp = np.where(occurs, _impacts(blocks[2], sched_groups), 0.0)
+        impact_parts.append(cost_imp)
+        cost_parts.append(base_cost + cost_imp.sum(axis=1))
+        dur_parts.append(base_duration_days + dur_imp.sum(axis=1))
+        done += n
+        if convergence_tol:
+            cs, ds = np.concatenate(cost_parts), np.concatenate(dur_parts)
+            cur = np.concatenate([[cs.mean(), ds.mean()],
+                                  np.percentile(cs, (50, 80, 90)), np.percentile(ds, (50, 80, 90))])
+            converged = _settled(prev, cur, convergence_tol)
+            prev = cur
+            if converged:
+                break
+
+    cs = np.concatenate(cost_parts)
+    ds = np.concatenate(dur_parts)
+    impacts = np.concatenate(impact_parts) if k else np.zeros((done, 0))
 
     # Tornado: rank risks by Spearman corr of their cost-impact vs total cost
-    tornado = []
-    for name, impacts in per_risk_cost_impacts.items():
-        rho = _spearman(impacts, cost_samples)
-        tornado.append({
-            'risk': name,
-            'spearman_correlation_to_total_cost': round(rho, 4),
-            'mean_cost_impact': round(statistics.mean(impacts), 2),
-            'p80_cost_impact':  round(_percentile(sorted(impacts), 0.80), 2),
-        })
+    rho = _spearman_to_total(impacts, cs)
+    p80 = np.percentile(impacts, 80, axis=0) if k else []
+    tornado = [{
+        'risk': name,
+        'spearman_correlation_to_total_cost': round(float(rho[i]), 4),
+        'mean_cost_impact': round(float(impacts[:, i].mean()), 2),
+        'p80_cost_impact':  round(float(p80[i]), 2),
+    } for i, name in enumerate(names)]
     tornado.sort(key=lambda x: abs(x['spearman_correlation_to_total_cost']),
                   reverse=True)
 
@@ -187,27 +308,18 @@ def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
         'success': True,
         'method': 'Monte Carlo simulation',
         'reference': 'AACE International RP 57R-09; ISO 31000:2018',
-        'iterations': iterations,
+        'iterations': done,
+        'sampling': sampling,
         'inputs': {'base_cost': base_cost,
                     'base_duration_days': base_duration_days,
                     'risk_count': len(risks),
                     'budget_target': budget_target,
                     'schedule_target_days': schedule_target_days,
-                    'seed': seed},
-        'cost': {
-            'mean':       round(statistics.mean(cs), 2),
-            'stdev':      round(statistics.pstdev(cs), 2),
-            'min':        round(cs[0], 2),
-            'max':        round(cs[-1], 2),
-            'percentiles': _percentiles(cs),
-        },
-        'duration_days': {
-            'mean':       round(statistics.mean(ds), 2),
-            'stdev':      round(statistics.pstdev(ds), 2),
-            'min':        round(ds[0], 2),
-            'max':        round(ds[-1], 2),
-            'percentiles': _percentiles(ds),
-        },
+                    'seed': seed,
+                    'iterations_requested': iterations,
+                    'correlations': len(correlations or [])},
+        'cost': _summary(cs, histogram_bins),
+        'duration_days': _summary(ds, histogram_bins),
         'tornado_top10': tornado[:10],
         'data_label': '[MODEL OUTPUT -- Monte Carlo, not measured]',
         'disclaimer': 'Probabilistic model output. Inputs are user-supplied '
@@ -215,12 +327,13 @@ def monte_carlo(*, base_cost: float = 0.0, base_duration_days: float = 0.0,
                       'predictions. Always disclose distribution choice and '
                       'iteration count in any report.',
     }
+    if convergence_tol:
+        out['convergence'] = {'tolerance': convergence_tol, 'converged': converged,
+                              'batch_size': batch}
     if budget_target is not None:
-        out['probability_exceeding_budget'] = round(
-            sum(1 for c in cs if c > budget_target) / len(cs), 4)
+        out['probability_exceeding_budget'] = round(float(np.mean(cs > budget_target)), 4)
     if schedule_target_days is not None:
-        out['probability_exceeding_schedule'] = round(
-            sum(1 for d in ds if d > schedule_target_days) / len(ds), 4)
+        out['probability_exceeding_schedule'] = round(float(np.mean(ds > schedule_target_days)), 4)
     return out
 
 
@@ -245,6 +358,10 @@ def register(app, *, auth_required=None) -> None:
                 schedule_target_days=(float(data['schedule_target_days'])
                                        if data.get('schedule_target_days') is not None else None),
                 seed=(int(data['seed']) if data.get('seed') is not None else None),
+                sampling=str(data.get('sampling', 'random')),
+                correlations=data.get('correlations') or None,
+                convergence_tol=(float(data['convergence_tol'])
+                                 if data.get('convergence_tol') is not None else None),
             )
         except (TypeError, ValueError) as e:
             return jsonify({'success': False, 'error': str(e)}), 400
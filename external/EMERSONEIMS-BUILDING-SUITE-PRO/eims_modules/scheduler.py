@@ -3,6 +3,9 @@
 Implements the standard forward / backward pass on an Activity-on-Node
 (AON) network and returns the critical path, total float, free float,
 and a Gantt-ready timeline. Day-precision; supports project start date.
+Links may be FS/SS/FF/SF with lags; kept schedules re-propagate only the
+activities an edit moves, and an optional resource-levelling pass delays
+activities to respect resource limits.
 
 Reference:
   * PMBOK 7th ed. -- Schedule Management Knowledge Area
@@ -10,129 +13,475 @@ Reference:
   * AACE RP 29R-03 -- Forensic Schedule Analysis (terminology)
 
 Endpoints:
-  POST /api/sched/cpm        -> compute CPM
+  POST /api/sched/cpm        -> compute CPM (returns schedule_id)
+  POST /api/sched/cpm/update -> incremental edit of a kept schedule
   POST /api/sched/gantt      -> CPM + ISO-date Gantt rows
 """
 
 from __future__ import annotations
 
 import datetime as _dt
+import heapq
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import math
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger('eims.scheduler')
 
+LINK_TYPES = ('FS', 'SS', 'FF', 'SF')
+SCHEDULE_CACHE_SIZE = int(os.environ.get('EIMS_SCHEDULE_CACHE', '16'))
+_EPS = 1e-9
+
+
+def _parse_link(link: Any) -> Tuple[str, str, float]:
+    """'A' or {'id': 'A', 'type': 'SS', 'lag_days': 2} -> (pred_id, type, lag)."""
+    if isinstance(link, dict):
+        pred = link.get('id')
+        kind = str(link.get('type', 'FS')).upper()
+        lag = link.get('lag_days', 0)
+    else:
+        pred, kind, lag = link, 'FS', 0
+    if kind not in LINK_TYPES:
+        raise ValueError(f'link type must be one of {", ".join(LINK_TYPES)}, got {kind!r}')
+    if not isinstance(lag, (int, float)):
+        raise ValueError(f'lag_days on link from {pred!r} must be a number')
+    return pred, kind, float(lag)
+
 
-def _topo_sort(activities: List[Dict[str, Any]]) -> List[str]:
-    nodes = {a['id'] for a in activities}
-    incoming = {a['id']: set(a.get('predecessors') or []) for a in activities}
-    for n, preds in incoming.items():
-        for p in preds:
-            if p not in nodes:
-                raise ValueError(f"activity {n!r} references unknown predecessor {p!r}")
-    order: List[str] = []
-    ready = [n for n, p in incoming.items() if not p]
-    seen = set()
+def _topo_sort(preds: List[List[Tuple[int, str, float]]],
+               succs: List[List[Tuple[int, str, float]]]) -> List[int]:
+    """Kahn's algorithm over adjacency lists: O(V + E)."""
+    indeg = [len({p for p, _, _ in ps}) for ps in preds]
+    ready = deque(i for i, d in enumerate(indeg) if d == 0)
+    order: List[int] = []
     while ready:
-        n = ready.pop(0)
-        if n in seen:
-            continue
-        order.append(n); seen.add(n)
-        for m, preds in incoming.items():
-            if n in preds:
-                preds.discard(n)
-                if not preds and m not in seen:
-                    ready.append(m)
-    if len(order) != len(nodes):
+        n = ready.popleft()
+        order.append(n)
+        for m in {s for s, _, _ in succs[n]}:
+            indeg[m] -= 1
+            if indeg[m] == 0:
+                ready.append(m)
+    if len(order) != len(preds):
         raise ValueError('cycle detected in activity network')
     return order
 
 
-def cpm(*, activities: List[Dict[str, Any]],
-          project_start: Optional[str] = None) -> Dict[str, Any]:
-    """Compute CPM. activities = [{id, name, duration_days, predecessors}].
-    project_start -- ISO date 'YYYY-MM-DD' (optional)."""
+class Schedule:
+    """AON network with FS/SS/FF/SF links and lags, kept up to date in place.
+
+    Early dates come from the forward pass; late dates are stored as the
+    distance from the project finish ("tail"), which does not depend on the
+    project duration, so an edit only re-propagates through the activities
+    whose dates actually move. Dates are then ES/EF as usual and
+    LF = project duration - tail.
+    """
+
+    def __init__(self, activities: List[Dict[str, Any]]):
+        self.ids = [a['id'] for a in activities]
+        self.index = {n: i for i, n in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            raise ValueError('activity ids must be unique')
+        self.activities = [dict(a) for a in activities]
+        self.duration = [float(a['duration_days']) for a in activities]
+        self.preds: List[List[Tuple[int, str, float]]] = [[] for _ in activities]
+        self.succs: List[List[Tuple[int, str, float]]] = [[] for _ in activities]
+        for i, a in enumerate(activities):
+            for link in a.get('predecessors') or []:
+                pred, kind, lag = _parse_link(link)
+                if pred not in self.index:
+                    raise ValueError(f"activity {a['id']!r} references unknown predecessor {pred!r}")
+                self._link(self.index[pred], i, kind, lag)
+        self._reorder()
+        self.recalculate()
+
+    # ---- structure ----
+    def _link(self, p: int, s: int, kind: str, lag: float) -> None:
+        self.preds[s].append((p, kind, lag))
+        self.succs[p].append((s, kind, lag))
+
+    def _unlink(self, p: int, s: int) -> bool:
+        before = len(self.preds[s])
+        self.preds[s] = [e for e in self.preds[s] if e[0] != p]
+        self.succs[p] = [e for e in self.succs[p] if e[0] != s]
+        return len(self.preds[s]) != before
+
+    def _reorder(self) -> None:
+        self.order = _topo_sort(self.preds, self.succs)
+        self.pos = [0] * len(self.order)
+        for k, n in enumerate(self.order):
+            self.pos[n] = k
+
+    # ---- passes ----
+    def _early_start(self, i: int) -> float:
+        d, es, ef = self.duration[i], self.ES, self.EF
+        t = 0.0
+        for p, kind, lag in self.preds[i]:
+            if kind == 'FS':
+                t = max(t, ef[p] + lag)
+            elif kind == 'SS':
+                t = max(t, es[p] + lag)
+            elif kind == 'FF':
+                t = max(t, ef[p] + lag - d)
+            else:
+                t = max(t, es[p] + lag - d)
+        return t
+
+    def _tail(self, i: int) -> float:
+        """Latest finish of i measured back from the project finish."""
+        d, tf = self.duration[i], self.tail
+        t = 0.0
+        for s, kind, lag in self.succs[i]:
+            if kind == 'FS':
+                t = max(t, tf[s] + self.duration[s] + lag)
+            elif kind == 'SS':
+                t = max(t, tf[s] + self.duration[s] + lag - d)
+            elif kind == 'FF':
+                t = max(t, tf[s] + lag)
+            else:
+                t = max(t, tf[s] + lag - d)
+        return t
+
+    def recalculate(self) -> None:
+        n = len(self.ids)
+        self.ES, self.EF, self.tail = [0.0] * n, [0.0] * n, [0.0] * n
+        for i in self.order:
+            self.ES[i] = self._early_start(i)
+            self.EF[i] = self.ES[i] + self.duration[i]
+        for i in reversed(self.order):
+            self.tail[i] = self._tail(i)
+        self.touched = n
+
+    def _propagate(self, seeds: Iterable[int]) -> int:
+        """Re-run both passes from ``seeds`` only; returns activities revisited."""
+        seeds = set(seeds)
+        touched = set()
+        heap = [(self.pos[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            touched.add(i)
+            es = self._early_start(i)
+            ef = es + self.duration[i]
+            if i in seeds or abs(es - self.ES[i]) > _EPS or abs(ef - self.EF[i]) > _EPS:
+                self.ES[i], self.EF[i] = es, ef
+                for s, _, _ in self.succs[i]:
+                    if s not in queued:
+                        queued.add(s)
+                        heapq.heappush(heap, (self.pos[s], s))
+        heap = [(-self.pos[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            touched.add(i)
+            tail = self._tail(i)
+            if i in seeds or abs(tail - self.tail[i]) > _EPS:
+                self.tail[i] = tail
+                for p, _, _ in self.preds[i]:
+                    if p not in queued:
+                        queued.add(p)
+                        heapq.heappush(heap, (-self.pos[p], p))
+        self.touched = len(touched)
+        return self.touched
+
+    # ---- edits ----
+    def set_duration(self, activity_id: str, duration_days: float) -> int:
+        if not isinstance(duration_days, (int, float)) or duration_days < 0:
+            raise ValueError(f'activity {activity_id!r} duration must be >= 0')
+        i = self._idx(activity_id)
+        self.duration[i] = float(duration_days)
+        self.activities[i]['duration_days'] = duration_days
+        return self._propagate([i])
+
+    def set_link(self, pred_id: str, succ_id: str, kind: str = 'FS',
+                 lag_days: float = 0.0) -> int:
+        """Add or replace the link pred -> succ."""
+        p, s = self._idx(pred_id), self._idx(succ_id)
+        _, kind, lag = _parse_link({'id': pred_id, 'type': kind, 'lag_days': lag_days})
+        old = [e for e in self.preds[s] if e[0] == p]
+        self._unlink(p, s)
+        self._link(p, s, kind, lag)
+        if self.pos[p] > self.pos[s]:
+            try:
+                self._reorder()
+            except ValueError:
+                self._unlink(p, s)
+                for e in old:
+                    self._link(p, s, e[1], e[2])
+                raise
+        self._sync_predecessors(s)
+        return self._propagate([p, s])
+
+    def remove_link(self, pred_id: str, succ_id: str) -> int:
+        p, s = self._idx(pred_id), self._idx(succ_id)
+        if not self._unlink(p, s):
+            raise ValueError(f'no link {pred_id!r} -> {succ_id!r}')
+        self._sync_predecessors(s)
+        return self._propagate([p, s])
+
+    def _sync_predecessors(self, s: int) -> None:
+        self.activities[s]['predecessors'] = [
+            self.ids[p] if kind == 'FS' and not lag else {'id': self.ids[p], 'type': kind, 'lag_days': lag}
+            for p, kind, lag in self.preds[s]]
+
+    def _idx(self, activity_id: str) -> int:
+        try:
+            return self.index[activity_id]
+        except KeyError:
+            raise ValueError(f'unknown activity {activity_id!r}') from None
+
+    # ---- results ----
+    @property
+    def project_duration(self) -> float:
+        return max(self.EF, default=0.0)
+
+    def free_float(self, i: int) -> Optional[float]:
+        if not self.succs[i]:
+            return None
+        es, ef = self.ES, self.EF
+        slack = []
+        for s, kind, lag in self.succs[i]:
+            if kind == 'FS':
+                slack.append(es[s] - lag - ef[i])
+            elif kind == 'SS':
+                slack.append(es[s] - lag - es[i])
+            elif kind == 'FF':
+                slack.append(ef[s] - lag - ef[i])
+            else:
+                slack.append(ef[s] - lag - es[i])
+        return min(slack)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        pd = self.project_duration
+        out = []
+        for n in self.order:
+            a = self.activities[n]
+            LF = pd - self.tail[n]
+            LS = LF - self.duration[n]
+            TF = LS - self.ES[n]
+            FF = self.free_float(n)
+            out.append({
+                'id':            self.ids[n],
+                'name':          a.get('name', self.ids[n]),
+                'duration_days': a['duration_days'],
+                'predecessors':  a.get('predecessors') or [],
+                'ES': round(self.ES[n], 3), 'EF': round(self.EF[n], 3),
+                'LS': round(LS, 3), 'LF': round(LF, 3),
+                'total_float':   round(TF, 3),
+                'free_float':    round(TF if FF is None else FF, 3),
+                'is_critical':   abs(TF) < 1e-6,
+            })
+        return out
+
+    # ---- resource levelling ----
+    def level(self, limits: Dict[str, float]) -> Dict[str, Any]:
+        """Serial schedule-generation heuristic under fixed resource limits.
+
+        Activities are placed one at a time, always choosing the eligible one
+        (all predecessors placed) with the least total float, then earliest
+        ES. Each goes at the first whole day at or after its precedence-
+        feasible start where every resource it uses stays within its limit
+        for its whole duration. Day-granular: an activity occupies
+        ceil(duration) days.
+        """
+        n = len(self.ids)
+        req = []
+        for i, a in enumerate(self.activities):
+            r = {k: float(v) for k, v in (a.get('resources') or {}).items() if k in limits and v}
+            for k, v in r.items():
+                if v > limits[k] + _EPS:
+                    raise ValueError(f'activity {self.ids[i]!r} needs {v:g} {k} but only {limits[k]:g} available')
+            req.append(r)
+        pd = self.project_duration
+        total_float = [pd - self.tail[i] - self.duration[i] - self.ES[i] for i in range(n)]
+        horizon = max(64, int(math.ceil(pd)) * 2)
+        usage = {k: np.zeros(horizon) for k in limits}
+        start = [0.0] * n
+        finish = [0.0] * n
+        waiting = [len({p for p, _, _ in self.preds[i]}) for i in range(n)]
+        heap = [(total_float[i], self.ES[i], i) for i in range(n) if waiting[i] == 0]
+        heapq.heapify(heap)
+        while heap:
+            _, _, i = heapq.heappop(heap)
+            d = self.duration[i]
+            t = 0.0
+            for p, kind, lag in self.preds[i]:
+                t = max(t, {'FS': finish[p] + lag, 'SS': start[p] + lag,
+                            'FF': finish[p] + lag - d, 'SF': start[p] + lag - d}[kind])
+            days = int(math.ceil(d - _EPS))
+            if req[i] and days:
+                t0 = int(math.ceil(t - _EPS))
+                span = max(4 * days, 256)
+                while True:
+                    # Scan a window at a time, doubling it while nothing fits.
+                    hi = t0 + span
+                    while hi > horizon:
+                        usage = {k: np.concatenate([u, np.zeros(horizon)]) for k, u in usage.items()}
+                        horizon *= 2
+                    bad = np.zeros(hi - t0, dtype=bool)
+                    for k, v in req[i].items():
+                        bad |= usage[k][t0:hi] + v > limits[k] + _EPS
+                    run = np.concatenate([[0], np.cumsum(bad)])
+                    ok = np.flatnonzero(run[days:] - run[:-days] == 0)
+                    if len(ok):
+                        t = float(t0 + ok[0])
+                        break
+                    t0, span = hi - days + 1, span * 2
+                for k, v in req[i].items():
+                    usage[k][int(t):int(t) + days] += v
+            start[i], finish[i] = t, t + d
+            for s in {s for s, _, _ in self.succs[i]}:
+                waiting[s] -= 1
+                if waiting[s] == 0:
+                    heapq.heappush(heap, (total_float[s], self.ES[s], s))
+        end = max(finish, default=0.0)
+        return {
+            'method': 'serial schedule generation, least total float first',
+            'resource_limits': limits,
+            'project_duration_days': round(end, 3),
+            'extension_days': round(end - pd, 3),
+            'peak_usage': {k: round(float(u.max()), 3) for k, u in usage.items()},
+            'activities': {self.ids[i]: {'start': round(start[i], 3), 'finish': round(finish[i], 3),
+                                         'delay_days': round(start[i] - self.ES[i], 3)}
+                           for i in self.order},
+        }
+
+    def summary(self, project_start: Optional[str] = None) -> Dict[str, Any]:
+        activities_out = self.rows()
+        project_duration = self.project_duration
+        out: Dict[str, Any] = {
+            'success': True,
+            'standard': 'CPM (Kelley & Walker 1959); PMBOK 7th ed.',
+            'reference': 'AACE RP 29R-03',
+            'project_duration_days': round(project_duration, 3),
+            'critical_path': [a['id'] for a in activities_out if a['is_critical']],
+            'activities': activities_out,
+            'disclaimer': 'Day-precision deterministic CPM. For probabilistic '
+                           'duration analysis use PERT or Monte-Carlo schedule '
+                           'risk analysis (AACE RP 57R-09 / PMBOK).',
+        }
+        if project_start:
+            try:
+                start = _dt.date.fromisoformat(project_start)
+            except ValueError:
+                return {'success': False,
+                         'error': f'project_start must be YYYY-MM-DD, got {project_start!r}'}
+            out['project_start'] = project_start
+            out['project_finish'] = (start + _dt.timedelta(days=int(round(project_duration)))).isoformat()
+            for a in activities_out:
+                a['start_date']  = (start + _dt.timedelta(days=int(round(a['ES'])))).isoformat()
+                a['finish_date'] = (start + _dt.timedelta(days=int(round(a['EF'])))).isoformat()
+        return out
+
+
+def _validate(activities: List[Dict[str, Any]]) -> Optional[str]:
     if not activities:
-        return {'success': False, 'error': 'activities list is empty'}
+        return 'activities list is empty'
     for a in activities:
         if 'id' not in a or 'duration_days' not in a:
-            return {'success': False,
-                     'error': 'each activity needs id and duration_days'}
+            return 'each activity needs id and duration_days'
         if not isinstance(a['duration_days'], (int, float)) or a['duration_days'] < 0:
-            return {'success': False,
-                     'error': f"activity {a['id']!r} duration must be >= 0"}
+            return f"activity {a['id']!r} duration must be >= 0"
+    return None
+
+
+def cpm(*, activities: List[Dict[str, Any]],
+          project_start: Optional[str] = None,
+          resource_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Compute CPM. activities = [{id, name, duration_days, predecessors}].
+    project_start -- ISO date 'YYYY-MM-DD' (optional).
+
+    A predecessor is an activity id (finish-to-start, no lag) or
+    {'id', 'type': FS|SS|FF|SF, 'lag_days'}; lags may be negative (leads).
+    With resource_limits ({'crane': 1, ...}) and per-activity
+    'resources' ({'crane': 1}), a levelled schedule is added under 'levelled'.
+    """
+    return _run(activities, project_start, resource_limits)[0]
 
+
+def _run(activities, project_start=None, resource_limits=None):
+    error = _validate(activities)
+    if error:
+        return {'success': False, 'error': error}, None
     try:
-        order = _topo_sort(activities)
+        sched = Schedule(activities)
     except ValueError as e:
-        return {'success': False, 'error': str(e)}
-
-    by_id = {a['id']: dict(a) for a in activities}
-    succ: Dict[str, List[str]] = {n: [] for n in by_id}
-    for a in activities:
-        for p in a.get('predecessors') or []:
-            succ[p].append(a['id'])
-
-    # Forward pass
-    ES: Dict[str, float] = {}; EF: Dict[str, float] = {}
-    for n in order:
-        preds = by_id[n].get('predecessors') or []
-        ES[n] = max((EF[p] for p in preds), default=0.0)
-        EF[n] = ES[n] + by_id[n]['duration_days']
-
-    project_duration = max(EF.values())
-
-    # Backward pass
-    LF: Dict[str, float] = {}; LS: Dict[str, float] = {}
-    for n in reversed(order):
-        children = succ[n]
-        LF[n] = min((LS[c] for c in children), default=project_duration)
-        LS[n] = LF[n] - by_id[n]['duration_days']
-
-    # Floats
-    activities_out = []
-    for n in order:
-        TF = LS[n] - ES[n]
-        # Free float = min(ES of successors) - EF
-        FF = (min((ES[c] for c in succ[n]), default=EF[n]) - EF[n]) if succ[n] else TF
-        activities_out.append({
-            'id':            n,
-            'name':          by_id[n].get('name', n),
-            'duration_days': by_id[n]['duration_days'],
-            'predecessors':  by_id[n].get('predecessors') or [],
-            'ES': round(ES[n], 3), 'EF': round(EF[n], 3),
-            'LS': round(LS[n], 3), 'LF': round(LF[n], 3),
-            'total_float':   round(TF, 3),
-            'free_float':    round(FF, 3),
-            'is_critical':   abs(TF) < 1e-6,
-        })
-
-    critical_path = [a['id'] for a in activities_out if a['is_critical']]
-
-    out: Dict[str, Any] = {
-        'success': True,
-        'standard': 'CPM (Kelley & Walker 1959); PMBOK 7th ed.',
-        'reference': 'AACE RP 29R-03',
-        'project_duration_days': round(project_duration, 3),
-        'critical_path': critical_path,
-        'activities': activities_out,
-        'disclaimer': 'Day-precision deterministic CPM. For probabilistic '
-                       'duration analysis use PERT or Monte-Carlo schedule '
-                       'risk analysis (AACE RP 57R-09 / PMBOK).',
-    }
-
-    if project_start:
+        return {'success': False, 'error': str(e)}, None
+    out = sched.summary(project_start)
+    if out['success'] and resource_limits:
         try:
-            start = _dt.date.fromisoformat(project_start)
-        except ValueError:
-            return {'success': False,
-                     'error': f'project_start must be YYYY-MM-DD, got {project_start!r}'}
-        out['project_start'] = project_start
-        out['project_finish'] = (start + _dt.timedelta(days=int(round(project_duration)))).isoformat()
-        for a in activities_out:
-            a['start_date']  = (start + _dt.timedelta(days=int(round(a['ES'])))).isoformat()
-            a['finish_date'] = (start + _dt.timedelta(days=int(round(a['EF'])))).isoformat()
+            out['levelled'] = sched.level({k: float(v) for k, v in resource_limits.items()})
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}, None
+    return out, sched
+
+
+# ---- schedules kept for incremental edits ----
+
+_schedules: 'OrderedDict[str, Schedule]' = OrderedDict()
+_schedule_lock = threading.Lock()
 
+
+def open_schedule(activities: List[Dict[str, Any]], project_start: Optional[str] = None,
+                  resource_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """cpm() that also keeps the network so ``update_schedule`` can edit it."""
+    out, sched = _run(activities, project_start, resource_limits)
+    if sched is not None and out['success']:
+        out['schedule_id'] = uuid.uuid4().hex
+        with _schedule_lock:
+            _schedules[out['schedule_id']] = sched
+            while len(_schedules) > SCHEDULE_CACHE_SIZE:
+                _schedules.popitem(last=False)
+    return out
+
+
+def update_schedule(schedule_id: str, changes: List[Dict[str, Any]],
+                    project_start: Optional[str] = None,
+                    resource_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Apply edits to a kept schedule and re-propagate only what moved.
+
+    changes: [{'activity': id, 'duration_days': d}
+              | {'link': {'from': id, 'to': id, 'type': 'FS', 'lag_days': 0}}
+              | {'link': {...}, 'remove': True}]
+    """
+    with _schedule_lock:
+        sched = _schedules.get(schedule_id)
+        if sched is None:
+            return {'success': False, 'error': f'unknown schedule_id {schedule_id!r}'}
+        _schedules.move_to_end(schedule_id)
+        revisited = 0
+        try:
+            for c in changes:
+                if 'link' in c:
+                    link = c['link']
+                    if c.get('remove'):
+                        revisited += sched.remove_link(link.get('from'), link.get('to'))
+                    else:
+                        revisited += sched.set_link(link.get('from'), link.get('to'),
+                                                    link.get('type', 'FS'), link.get('lag_days', 0))
+                elif 'activity' in c:
+                    revisited += sched.set_duration(c['activity'], c.get('duration_days'))
+                else:
+                    raise ValueError('each change needs activity or link')
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
+        out = sched.summary(project_start)
+        if out['success'] and resource_limits:
+            try:
+                out['levelled'] = sched.level({k: float(v) for k, v in resource_limits.items()})
+            except ValueError as e:
+                return {'success': False, 'error': str(e)}
+    out['schedule_id'] = schedule_id
+    out['activities_revisited'] = revisited
     return out
 
 
@@ -147,8 +496,20 @@ def register(app, *, auth_required=None) -> None:
     def _cpm():
         d = request.get_json(silent=True) or {}
         try:
-            r = cpm(activities=d.get('activities') or [],
-                     project_start=d.get('project_start'))
+            r = open_schedule(d.get('activities') or [],
+                              project_start=d.get('project_start'),
+                              resource_limits=d.get('resource_limits'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify(r), (200 if r.get('success') else 400)
+
+    @app.route('/api/sched/cpm/update', methods=['POST'])
+    def _cpm_update():
+        d = request.get_json(silent=True) or {}
+        try:
+            r = update_schedule(str(d.get('schedule_id') or ''), d.get('changes') or [],
+                                project_start=d.get('project_start'),
+                                resource_limits=d.get('resource_limits'))
         except (TypeError, ValueError) as e:
             return jsonify({'success': False, 'error': str(e)}), 400
         return jsonify(r), (200 if r.get('success') else 400)
@@ -160,7 +521,8 @@ def register(app, *, auth_required=None) -> None:
             d['project_start'] = _dt.date.today().isoformat()
         try:
             r = cpm(activities=d.get('activities') or [],
-                     project_start=d.get('project_start'))
+                     project_start=d.get('project_start'),
+                     resource_limits=d.get('resource_limits'))
         except (TypeError, ValueError) as e:
             return jsonify({'success': False, 'error': str(e)}), 400
         if not r.get('success'):
@@ -170,7 +532,7 @@ def register(app, *, auth_required=None) -> None:
             'start': a['start_date'], 'finish': a['finish_date'],
             'duration_days': a['duration_days'],
             'critical': a['is_critical'],
-            'depends_on': a['predecessors'],
+            'depends_on': [_parse_link(p)[0] for p in a['predecessors']],
         } for a in r['activities']]
         r['gantt'] = gantt_rows
         return jsonify(r)
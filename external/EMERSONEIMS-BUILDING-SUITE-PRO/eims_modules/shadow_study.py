@@ -5,8 +5,11 @@ Given a site GPS + date, returns:
   - sun altitude/azimuth hour-by-hour (sunrise to sunset)
   - shadow length + direction for a vertical pole / wall of given height
   - equinox + solstice comparison
+  - annual shadow-hours / sun-hours raster over the site plus facade
+    insolation (/api/arch/shadow/annual, see solar_raster)
 
-Uses the pysolar library (MIT-licensed). No external APIs.
+The single-date endpoints use the pysolar library (MIT-licensed); the annual
+study is numpy-only. No external APIs.
 """
 from __future__ import annotations
 from typing import Any
@@ -171,5 +174,52 @@ def register(app, *, auth_required=None) -> None:
         except RuntimeError as e:
             return jsonify({'success': False, 'error': str(e)}), 503
 
-    logger.info('Shadow-study module registered (pysolar=%s, 3 endpoints)',
+    @app.route('/api/arch/shadow/annual', methods=['POST'])
+    def _annual():
+        from . import artifact_cache
+        from .bim_model import Building
+        from .solar_raster import annual_solar_study
+        data = request.get_json(silent=True) or {}
+        try:
+            lat = float(data.get('lat'))
+            lng = float(data.get('lng'))
+            y = int(data.get('year', date.today().year))
+            tz = float(data.get('utc_offset_hours', 0))
+            cell = float(data.get('cell_m', 1.0))
+            north = float(data.get('north_deg', 0.0))
+            neighbours = list(data.get('neighbours') or [])
+            if not (-90 <= lat <= 90) or not (0.25 <= cell <= 10):
+                raise ValueError('lat must be in [-90, 90] and cell_m in [0.25, 10]')
+            if not (-14 <= tz <= 14):
+                raise ValueError('utc_offset_hours must be in [-14, 14]')
+            if not (math.isfinite(lng) and math.isfinite(north)):
+                raise ValueError('lng and north_deg must be finite')
+            if len(neighbours) > 200:
+                raise ValueError('at most 200 neighbours')
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'success': False, 'error': f'bad input: {e}'}), 400
+        key = artifact_cache.digest('shadow-annual', data)
+        hit = artifact_cache.cached_response(key, mimetype='application/json')
+        if hit is not None:
+            return hit
+        try:
+            if isinstance(data.get('bim'), dict):
+                b = Building.from_dict(data['bim'])
+            else:
+                b = Building.from_params(
+                    name=data.get('name', 'Shadow study'),
+                    area_m2=float(data.get('area_m2', 100.0)),
+                    bedrooms=int(data.get('bedrooms', 3)),
+                    stories=int(data.get('stories', 1)),
+                    units=int(data.get('units', 1)))
+            result = annual_solar_study(b, lat=lat, lon=lng, year=y, tz_offset=tz,
+                                        cell_m=cell, neighbours=neighbours,
+                                        north_deg=north,
+                                        facades=bool(data.get('facades', True)))
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'success': False, 'error': f'bad input: {e}'}), 400
+        return artifact_cache.store_response(key, jsonify(result).get_data(),
+                                             mimetype='application/json')
+
+    logger.info('Shadow-study module registered (pysolar=%s, 4 endpoints)',
                  HAS_PYSOLAR)
@@ -0,0 +1,454 @@
+"""
+Annual sun path and shadow-hours raster (site + facades), vectorised.
+
+shadow_study and experience_design compute one sun position at a time for a
+handful of key dates. This module computes every hour of a year in one numpy
+pass and uses it to answer the planning questions that need the whole year:
+how many hours of direct sun does each patch of the site get, how many hours
+is it in the shadow of the building (and its neighbours), and how much direct
+sun reaches each part of each facade.
+
+Sun path
+--------
+Same astronomy as experience_design._sun_position (Spencer 1971 declination
+and equation of time, Iqbal 1983 altitude / azimuth; azimuth clockwise from
+north), evaluated at the middle of each interval of local standard time.
+Direct-normal irradiance is a clear-sky estimate (Meinel & Meinel 1976 with
+the Kasten & Young 1989 air mass), so irradiation figures are clear-sky upper
+bounds and sun hours are hours of *potential* direct sun.
+
+Shading
+-------
+Obstructions are prisms: a footprint polygon (x east, y north, metres) and a
+top height, standing on grade. A receiver at height z is shaded when the ray
+toward the sun reaches a prism's footprint at horizontal distance t while
+still below its top, i.e. tan(altitude) < (top - z) / t. So, per receiver and
+sun azimuth, the obstructions reduce to one "horizon" tangent.
+
+Hours are binned by azimuth (``az_step_deg``, 1 degree by default). The
+horizon is ray-cast once per receiver and bin against every prism edge, and
+shaded hours are then counted per bin with a binary search over the hours'
+sorted tangents. The cost is receivers x bins x edges, however many hours
+are sampled. Footprints may be any simple polygon. A prism always extends
+down to grade, so a raised volume shades as though it stood on the ground.
+The parametric building has no raised volumes.
+
+Coordinates follow the Building model: x to the east and y to the north, with
+``north_deg`` rotating project north clockwise from true north.
+
+Grids are bounded: a site raster may span at most EIMS_SOLAR_MAX_EXTENT_M
+(default 2000 m) on a side, and a raster or a facade set at most
+EIMS_SOLAR_MAX_CELLS receivers (default 250 000). Larger requests raise
+ValueError before anything is allocated.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bim_model import Building
+
+logger = logging.getLogger('eims.solar_raster')
+
+SOLAR_CONSTANT_W_M2 = 1353.0
+_MAX_CHUNK = 1_000_000          # receivers x bins per ray-cast batch
+MAX_CELLS = int(os.environ.get('EIMS_SOLAR_MAX_CELLS', '250000'))
+MAX_EXTENT_M = float(os.environ.get('EIMS_SOLAR_MAX_EXTENT_M', '2000'))
+
+
+# ---------------------------------------------------------------------------
+#  Sun path
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class SunPath:
+    """Sun positions for every sample of a year; arrays share one length."""
+    lat: float
+    lon: float
+    year: int
+    tz_offset: float
+    step_h: float                   # sample spacing = hours each sample stands for
+    hour: np.ndarray                # local standard time, hours since 1 Jan 00:00
+    azimuth_deg: np.ndarray         # clockwise from true north
+    altitude_deg: np.ndarray
+    dni_w_m2: np.ndarray            # clear-sky direct normal irradiance, 0 at night
+
+    @property
+    def up(self) -> np.ndarray:
+        return self.altitude_deg > 0.0
+
+    @property
+    def daylight_hours(self) -> float:
+        return float(self.up.sum() * self.step_h)
+
+    def vectors(self) -> np.ndarray:
+        """(n, 3) unit vectors toward the sun: east, north, up."""
+        az, alt = np.radians(self.azimuth_deg), np.radians(self.altitude_deg)
+        return np.stack([np.sin(az) * np.cos(alt), np.cos(az) * np.cos(alt), np.sin(alt)], 1)
+
+
+def annual_sun_path(lat: float, lon: float, *, year: int = 2026,
+                    tz_offset: float = 0.0, step_minutes: int = 60) -> SunPath:
+    """Sun position for every ``step_minutes`` of ``year`` (8,760 hourly
+    samples for a common year) at the middle of each interval."""
+    if not -90.0 <= lat <= 90.0 or not -180.0 <= lon <= 180.0:
+        raise ValueError('lat must be within ±90 and lon within ±180')
+    if step_minutes <= 0 or 1440 % step_minutes:
+        raise ValueError('step_minutes must divide a day')
+    step_h = step_minutes / 60.0
+    days = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+    hour = np.arange(0.0, days * 24.0, step_h) + step_h / 2.0
+
+    day_of_year = np.floor(hour / 24.0) + 1.0
+    gamma = 2 * np.pi * (day_of_year - 1) / 365.0
+    decl = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+            - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+            - 0.002697 * np.cos(3 * gamma) + 0.001480 * np.sin(3 * gamma))
+    eot = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                    - 0.014615 * np.cos(2 * gamma) - 0.040890 * np.sin(2 * gamma))
+    hour_utc = np.mod(hour, 24.0) - tz_offset
+    omega_deg = (hour_utc + lon / 15.0 + eot / 60.0 - 12.0) * 15.0
+    omega = np.radians(omega_deg)
+    phi = math.radians(lat)
+
+    sin_alt = np.clip(np.sin(decl) * math.sin(phi)
+                      + np.cos(decl) * math.cos(phi) * np.cos(omega), -1.0, 1.0)
+    alt = np.degrees(np.arcsin(sin_alt))
+    cos_alt = np.maximum(np.cos(np.radians(alt)), 1e-12)
+    cos_az = np.clip((np.sin(decl) * math.cos(phi)
+                      - np.cos(decl) * math.sin(phi) * np.cos(omega)) / cos_alt, -1.0, 1.0)
+    az = np.degrees(np.arccos(cos_az))
+    # Afternoon (hour angle past noon, wrapped to ±180°): sun is west of the meridian.
+    az = np.where(np.mod(omega_deg + 180.0, 360.0) - 180.0 > 0, 360.0 - az, az)
+
+    up = alt > 0.0
+    air_mass = 1.0 / (np.maximum(sin_alt, 1e-6)
+                      + 0.50572 * np.maximum(alt + 6.07995, 1e-6) ** -1.6364)
+    dni = np.where(up, SOLAR_CONSTANT_W_M2 * 0.7 ** (air_mass ** 0.678), 0.0)
+    return SunPath(lat=lat, lon=lon, year=year, tz_offset=tz_offset, step_h=step_h,
+                   hour=hour, azimuth_deg=az, altitude_deg=alt, dni_w_m2=dni)
+
+
+# ---------------------------------------------------------------------------
+#  Obstructions
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Prism:
+    footprint: np.ndarray           # (k, 2) polygon vertices, x east / y north
+    top_m: float
+    name: str = ''
+
+    def __post_init__(self):
+        fp = np.asarray(self.footprint, float).reshape(-1, 2)
+        if len(fp) > 1 and np.allclose(fp[0], fp[-1]):
+            fp = fp[:-1]
+        if len(fp) < 3:
+            raise ValueError('a prism footprint needs at least 3 vertices')
+        if not (np.isfinite(fp).all() and math.isfinite(self.top_m)):
+            raise ValueError('prism footprint and height must be finite')
+        object.__setattr__(self, 'footprint', fp)
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        a = self.footprint
+        return a, np.roll(a, -1, axis=0) - a
+
+    @property
+    def ccw(self) -> bool:
+        x, y = self.footprint[:, 0], self.footprint[:, 1]
+        return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) > 0
+
+
+def building_prisms(b: Building) -> List[Prism]:
+    """One prism per run of storeys sharing a footprint (the floor slab
+    outline), topped at the highest of them."""
+    prisms: List[Prism] = []
+    current: Optional[Tuple[tuple, float, str]] = None
+    for s in b.storeys:
+        floor = next((sl for sl in s.slabs if sl.role != 'roof' and len(sl.boundary) >= 3), None)
+        if floor is None:
+            continue
+        key = tuple((round(p.x, 3), round(p.y, 3)) for p in floor.boundary)
+        top = s.level_m + s.height_m
+        if current and current[0] == key:
+            current = (key, max(current[1], top), current[2])
+        else:
+            if current:
+                prisms.append(Prism(np.array(current[0]), current[1], current[2]))
+            current = (key, top, s.id)
+    if current:
+        prisms.append(Prism(np.array(current[0]), current[1], current[2]))
+    return prisms
+
+
+def neighbour_prisms(neighbours: Sequence[Dict[str, Any]]) -> List[Prism]:
+    """Prisms from [{footprint: [[x, y], ...], height_m, name?}, ...]."""
+    out = []
+    for i, n in enumerate(neighbours or []):
+        out.append(Prism(np.asarray(n['footprint'], float), float(n['height_m']),
+                         str(n.get('name') or f'neighbour_{i + 1}')))
+    return out
+
+
+def _rotate(prisms: List[Prism], north_deg: float) -> List[Prism]:
+    """Project coordinates → true-north coordinates."""
+    if not north_deg:
+        return prisms
+    r = math.radians(north_deg)
+    rot = np.array([[math.cos(r), math.sin(r)], [-math.sin(r), math.cos(r)]])
+    return [Prism(p.footprint @ rot.T, p.top_m, p.name) for p in prisms]
+
+
+# ---------------------------------------------------------------------------
+#  Horizon kernel
+# ---------------------------------------------------------------------------
+
+def _horizon_tan(points: np.ndarray, z: np.ndarray, prisms: List[Prism],
+                 az_deg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(horizon, inside): horizon[i, j] is the largest (top - z) / t over the
+    prisms first reached at distance t along azimuth j from point i (0 when
+    nothing is in the way); inside[i] marks points within a footprint."""
+    n, m = len(points), len(az_deg)
+    ux = np.sin(np.radians(az_deg)).astype(np.float32)
+    uy = np.cos(np.radians(az_deg)).astype(np.float32)
+    horizon = np.zeros((n, m), np.float32)
+    inside = np.zeros(n, bool)
+    rows = max(1, _MAX_CHUNK // max(1, m))
+    for p in prisms:
+        a, e = p.edges()
+        # Ray q + t·u meets edge a + s·e at t = (w × e) / (u × e) and
+        # s = (w × u) / (u × e), with w = a - q.
+        denom = ux[:, None] * e[None, :, 1] - uy[:, None] * e[None, :, 0]        # (m, k)
+        with np.errstate(divide='ignore'):
+            inv = np.where(np.abs(denom) < 1e-12, 0.0, 1.0 / denom).astype(np.float32)
+        ay, by = a[:, 1], a[:, 1] + e[:, 1]
+        for lo in range(0, n, rows):
+            q = points[lo:lo + rows]
+            wx = (a[None, :, 0] - q[:, None, 0]).astype(np.float32)              # (r, k)
+            wy = (a[None, :, 1] - q[:, None, 1]).astype(np.float32)
+            # Even-odd inside test against a ray along +x.
+            straddle = (ay[None] > q[:, None, 1]) != (by[None] > q[:, None, 1])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = a[None, :, 0] + (q[:, None, 1] - ay[None]) * e[None, :, 0] / e[None, :, 1]
+            inside[lo:lo + rows] |= (straddle & (x_cross > q[:, None, 0])).sum(1) % 2 == 1
+
+            first = np.full((len(q), m), np.inf, np.float32)
+            for j in range(len(a)):
+                t = (wx[:, j] * np.float32(e[j, 1]) - wy[:, j] * np.float32(e[j, 0]))[:, None] * inv[None, :, j]
+                s = (wx[:, j, None] * uy[None] - wy[:, j, None] * ux[None]) * inv[None, :, j]
+                miss = (t <= 1e-6) | (s < 0.0) | (s > 1.0)
+                t[miss] = np.inf
+                np.minimum(first, t, out=first)
+            rise = (p.top_m - z[lo:lo + rows]).astype(np.float32)[:, None]
+            np.maximum(horizon[lo:lo + rows], np.where(rise > 0, rise / first, 0.0),
+                       out=horizon[lo:lo + rows])
+    return horizon, inside
+
+
+class _Bins:
+    """Sun-up samples grouped by azimuth bin, sorted by tan(altitude) so that
+    'samples below a horizon' is a binary search."""
+
+    def __init__(self, sun: SunPath, az_step_deg: float):
+        up = sun.up
+        self.az = sun.azimuth_deg[up]
+        self.tan = np.tan(np.radians(sun.altitude_deg[up]))
+        self.sun_index = np.flatnonzero(up)
+        nbins = max(1, int(round(360.0 / az_step_deg)))
+        self.width = 360.0 / nbins
+        which = np.floor(np.mod(self.az + self.width / 2, 360.0) / self.width).astype(int) % nbins
+        order = np.lexsort((self.tan, which))
+        self.order = order
+        self.bins, starts = np.unique(which[order], return_index=True)
+        self.bounds = np.append(starts, len(order))
+        self.centres = self.bins * self.width
+
+    def count_below(self, horizon: np.ndarray, weight: np.ndarray) -> np.ndarray:
+        """Σ weight of samples with tan(altitude) < horizon, per receiver.
+        ``weight`` is per sun-up sample (unsorted)."""
+        total = np.zeros(horizon.shape[0])
+        w = weight[self.order]
+        for j in range(len(self.bins)):
+            lo, hi = self.bounds[j], self.bounds[j + 1]
+            cum = np.concatenate([[0.0], np.cumsum(w[lo:hi])])
+            idx = np.searchsorted(self.tan[self.order[lo:hi]], horizon[:, j], side='left')
+            total += cum[idx]
+        return total
+
+
+# ---------------------------------------------------------------------------
+#  Rasters
+# ---------------------------------------------------------------------------
+
+def shadow_raster(prisms: List[Prism], sun: SunPath, *, cell_m: float = 1.0,
+                  bounds: Optional[Tuple[float, float, float, float]] = None,
+                  margin_m: Optional[float] = None, receiver_z_m: float = 0.0,
+                  az_step_deg: float = 1.0) -> Dict[str, Any]:
+    """Annual shadow hours, direct-sun hours and direct horizontal
+    irradiation on a ground grid. ``bounds`` = (xmin, ymin, xmax, ymax), or
+    the prisms' extent plus ``margin_m`` (default: the tallest prism's
+    height, at least 5 m). Cells inside a footprint are NaN.
+    Arrays are (ny, nx) with row 0 at ymin."""
+    if cell_m <= 0:
+        raise ValueError('cell_m must be > 0')
+    if bounds is None:
+        if not prisms:
+            raise ValueError('bounds are required when there are no prisms')
+        pts = np.concatenate([p.footprint for p in prisms])
+        margin = margin_m if margin_m is not None else max(5.0, max(p.top_m for p in prisms))
+        bounds = (*(pts.min(0) - margin), *(pts.max(0) + margin))
+    xmin, ymin, xmax, ymax = map(float, bounds)
+    extent = max(xmax - xmin, ymax - ymin)
+    if not extent <= MAX_EXTENT_M:
+        raise ValueError(f'site extent {extent:.0f} m exceeds {MAX_EXTENT_M:.0f} m; '
+                         f'leave out distant neighbours or pass smaller bounds')
+    nx = max(1, int(math.ceil((xmax - xmin) / cell_m)))
+    ny = max(1, int(math.ceil((ymax - ymin) / cell_m)))
+    if nx * ny > MAX_CELLS:
+        raise ValueError(f'{nx} x {ny} grid exceeds {MAX_CELLS} cells; use a larger cell_m')
+    xs = xmin + (np.arange(nx) + 0.5) * cell_m
+    ys = ymin + (np.arange(ny) + 0.5) * cell_m
+    gx, gy = np.meshgrid(xs, ys)
+    points = np.stack([gx.ravel(), gy.ravel()], 1)
+
+    bins = _Bins(sun, az_step_deg)
+    horizon, inside = _horizon_tan(points, np.full(len(points), receiver_z_m), prisms,
+                                   bins.centres)
+    hours = np.full(len(bins.tan), sun.step_h)
+    energy = (sun.dni_w_m2 * np.sin(np.radians(sun.altitude_deg)))[bins.sun_index] * sun.step_h / 1000.0
+    shadow = bins.count_below(horizon, hours)
+    shaded_kwh = bins.count_below(horizon, energy)
+    sun_hours = sun.daylight_hours - shadow
+    irradiation = energy.sum() - shaded_kwh
+    for arr in (shadow, sun_hours, irradiation):
+        arr[inside] = np.nan
+    shape = (ny, nx)
+    return {
+        'origin': (xmin, ymin), 'cell_m': cell_m, 'nx': nx, 'ny': ny,
+        'daylight_hours': sun.daylight_hours,
+        'shadow_hours': shadow.reshape(shape),
+        'sun_hours': sun_hours.reshape(shape),
+        'irradiation_kwh_m2': irradiation.reshape(shape),
+    }
+
+
+def facade_insolation(prisms: List[Prism], sun: SunPath, *, spacing_m: float = 1.0,
+                      which: Optional[Sequence[int]] = None,
+                      az_step_deg: float = 1.0) -> List[Dict[str, Any]]:
+    """Direct-sun hours and irradiation on a grid of points over each wall
+    face of the ``which`` prisms (default all), shaded by every prism.
+    Each face's arrays are (rows, cols), row 0 at grade, col 0 at the
+    edge's first vertex."""
+    if spacing_m <= 0:
+        raise ValueError('spacing_m must be > 0')
+    which = range(len(prisms)) if which is None else list(which)
+    receivers = sum(max(1, round(float(np.hypot(*edge)) / spacing_m))
+                    * max(1, round(prisms[pi].top_m / spacing_m))
+                    for pi in which for edge in prisms[pi].edges()[1])
+    if receivers > MAX_CELLS:
+        raise ValueError(f'{receivers} facade points exceed {MAX_CELLS}; use a larger spacing_m')
+    bins = _Bins(sun, az_step_deg)
+    vec = sun.vectors()[bins.sun_index]
+    dni = sun.dni_w_m2[bins.sun_index]
+    faces = []
+    for pi in which:
+        p = prisms[pi]
+        a, e = p.edges()
+        for k in range(len(a)):
+            length = float(np.hypot(*e[k]))
+            if length < 1e-6:
+                continue
+            d = e[k] / length
+            normal = np.array([d[1], -d[0]]) if p.ccw else np.array([-d[1], d[0]])
+            cols = max(1, int(round(length / spacing_m)))
+            rows = max(1, int(round(p.top_m / spacing_m)))
+            s = (np.arange(cols) + 0.5) * length / cols
+            h = (np.arange(rows) + 0.5) * p.top_m / rows
+            # Receivers sit a hair outside the wall so it doesn't shade itself.
+            xy = a[k] + s[:, None] * d + 0.01 * normal
+            points = np.repeat(xy[None], rows, 0).reshape(-1, 2)
+            z = np.repeat(h, cols)
+            horizon, _ = _horizon_tan(points, z, prisms, bins.centres)
+            cos_inc = vec[:, 0] * normal[0] + vec[:, 1] * normal[1]
+            facing = cos_inc > 0
+            # Samples with the sun behind the face carry no weight.
+            hours = np.where(facing, sun.step_h, 0.0)
+            energy = np.where(facing, dni * cos_inc * sun.step_h / 1000.0, 0.0)
+            sun_hours = hours.sum() - bins.count_below(horizon, hours)
+            irradiation = energy.sum() - bins.count_below(horizon, energy)
+            bearing = math.degrees(math.atan2(normal[0], normal[1])) % 360.0
+            faces.append({
+                'prism': p.name or str(pi), 'edge': k,
+                'start': a[k].tolist(), 'end': (a[k] + e[k]).tolist(),
+                'azimuth_deg': round(bearing, 1),
+                'length_m': round(length, 2), 'height_m': round(p.top_m, 2),
+                'sun_hours': sun_hours.reshape(rows, cols),
+                'irradiation_kwh_m2': irradiation.reshape(rows, cols),
+            })
+    return faces
+
+
+# ---------------------------------------------------------------------------
+#  Study (JSON-ready)
+# ---------------------------------------------------------------------------
+
+def _grid(arr: np.ndarray, digits: int = 1) -> List[List[Optional[float]]]:
+    return [[None if v != v else round(float(v), digits) for v in row] for row in arr]
+
+
+def annual_solar_study(b: Building, *, lat: float, lon: float, year: int = 2026,
+                       tz_offset: float = 0.0, cell_m: float = 1.0,
+                       neighbours: Sequence[Dict[str, Any]] = (),
+                       north_deg: float = 0.0, facades: bool = True,
+                       facade_spacing_m: float = 1.0,
+                       margin_m: Optional[float] = None) -> Dict[str, Any]:
+    """Site shadow-hours raster plus facade insolation for ``b`` and its
+    neighbours, as plain JSON."""
+    sun = annual_sun_path(lat, lon, year=year, tz_offset=tz_offset)
+    own = _rotate(building_prisms(b), north_deg)
+    others = _rotate(neighbour_prisms(neighbours), north_deg)
+    prisms = own + others
+    raster = shadow_raster(prisms, sun, cell_m=cell_m, margin_m=margin_m)
+    open_cells = ~np.isnan(raster['shadow_hours'])
+    shadow = raster['shadow_hours'][open_cells]
+    result: Dict[str, Any] = {
+        'success': True,
+        'site': {'lat': lat, 'lng': lon, 'utc_offset_hours': tz_offset,
+                 'north_deg': north_deg},
+        'year': year,
+        'method': ('Spencer (1971) / Iqbal (1983) sun path, all hours of the year; '
+                   'clear-sky DNI (Meinel, Kasten-Young air mass); prisms on grade'),
+        'daylight_hours': round(sun.daylight_hours, 1),
+        'grid': {'origin': list(raster['origin']), 'cell_m': cell_m,
+                 'nx': raster['nx'], 'ny': raster['ny'], 'row0': 'south'},
+        'shadow_hours': _grid(raster['shadow_hours']),
+        'sun_hours': _grid(raster['sun_hours']),
+        'irradiation_kwh_m2': _grid(raster['irradiation_kwh_m2']),
+        'summary': {
+            'cells': int(open_cells.sum()),
+            'mean_shadow_hours': round(float(shadow.mean()), 1) if shadow.size else None,
+            'max_shadow_hours': round(float(shadow.max()), 1) if shadow.size else None,
+            'share_over_half_daylight_shaded': (
+                round(float((shadow > sun.daylight_hours / 2).mean()), 3) if shadow.size else None),
+        },
+        'prisms': [{'name': p.name, 'top_m': p.top_m, 'footprint': p.footprint.tolist()}
+                   for p in prisms],
+    }
+    if facades:
+        faces = facade_insolation(prisms, sun, spacing_m=facade_spacing_m,
+                                  which=range(len(own)))
+        result['facades'] = [{
+            **{k: v for k, v in f.items() if k not in ('sun_hours', 'irradiation_kwh_m2')},
+            'sun_hours': _grid(f['sun_hours']),
+            'irradiation_kwh_m2': _grid(f['irradiation_kwh_m2']),
+            'mean_sun_hours': round(float(f['sun_hours'].mean()), 1),
+            'mean_irradiation_kwh_m2': round(float(f['irradiation_kwh_m2'].mean()), 1),
+        } for f in faces]
+    return result
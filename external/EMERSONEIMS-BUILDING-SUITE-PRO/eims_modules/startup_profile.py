@@ -0,0 +1,159 @@
+"""Startup profiling: import-time tree and time to first byte of a fresh process.
+
+Every measurement runs in a new interpreter, so nothing is warm except the
+OS page cache and __pycache__:
+
+  * import tree  ``python -X importtime -c "import app_professional"``,
+                 folded into a tree of the modules whose cumulative import
+                 time is at least --min-ms
+  * first byte   import app_professional, then the first and a second
+                 request per --path through the test client. The first
+                 request includes loading a lazily registered module
+                 (eims_modules/lazy_routes.py). Reported as the median of
+                 --runs processes, with the heavy dependencies that were
+                 imported by then.
+
+    python -m eims_modules.startup_profile --tree --min-ms 10 --path /api/health /api/qs/risk/distributions
+    python -m eims_modules.startup_profile --runs 5 --budget-ms 1500   # exit 1 over budget
+
+``cold_start`` is what tests/test_lazy_routes.py and
+benchmarks/cold_start.py call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports that must not happen before the first request that needs them.
+HEAVY = ('scipy', 'reportlab', 'openpyxl', 'ezdxf', 'svglib', 'requests', 'PIL', 'anthropic',
+         'eims_modules.risk_montecarlo', 'eims_modules.bim_endpoints', 'eims_modules.house_designer')
+
+_PROBE = r'''
+import json, sys, time
+cfg = json.loads(sys.argv[1])
+t0 = time.perf_counter()
+import app_professional
+t1 = time.perf_counter()
+modules = len(sys.modules)
+heavy = sorted(m for m in cfg['heavy'] if m in sys.modules)
+client = app_professional.app.test_client()
+requests = []
+for path in cfg['paths']:
+    out = {'path': path}
+    for attempt in ('first', 'second'):
+        s = time.perf_counter()
+        r = client.open(path, method=cfg['method'])
+        r.get_data()
+        out[attempt + '_ms'] = round((time.perf_counter() - s) * 1e3, 2)
+    out['status'] = r.status_code
+    requests.append(out)
+import_ms = round((t1 - t0) * 1e3, 2)
+print(json.dumps({'import_ms': import_ms,
+                  'ttfb_ms': import_ms + requests[0]['first_ms'] if requests else None,
+                  'heavy_at_import': heavy, 'modules_at_import': modules, 'requests': requests}))
+'''
+
+
+def _env(lazy: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault('EIMS_UPLOAD_FOLDER', tempfile.mkdtemp(prefix='eims_startup_'))
+    env['EIMS_LAZY_MODULES'] = '1' if lazy else '0'
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def _probe_once(paths: Sequence[str], method: str, lazy: bool) -> Dict[str, Any]:
+    cfg = json.dumps({'paths': list(paths), 'method': method, 'heavy': HEAVY})
+    out = subprocess.run([sys.executable, '-c', _PROBE, cfg], cwd=ROOT, env=_env(lazy),
+                         capture_output=True, text=True, timeout=300)
+    if out.returncode != 0:
+        raise RuntimeError(f'startup probe failed:\n{out.stderr[-2000:]}')
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def cold_start(paths: Sequence[str] = ('/api/health',), runs: int = 3, *,
+               method: str = 'GET', lazy: bool = True) -> Dict[str, Any]:
+    """Median import / first-request / time-to-first-byte over ``runs``
+    fresh processes; ``samples`` holds every run."""
+    samples = [_probe_once(paths, method, lazy) for _ in range(runs)]
+    med = lambda key: round(statistics.median(s[key] for s in samples), 1)  # noqa: E731
+    return {
+        'lazy': lazy, 'runs': runs,
+        'import_ms': med('import_ms'),
+        'ttfb_ms': med('ttfb_ms') if paths else None,
+        'heavy_at_import': samples[-1]['heavy_at_import'],
+        'modules_at_import': samples[-1]['modules_at_import'],
+        'requests': [{'path': r['path'], 'status': r['status'],
+                      'first_ms': round(statistics.median(s['requests'][i]['first_ms'] for s in samples), 1),
+                      'second_ms': round(statistics.median(s['requests'][i]['second_ms'] for s in samples), 1)}
+                     for i, r in enumerate(samples[-1]['requests'])],
+        'samples': samples,
+    }
+
+
+def import_tree(min_ms: float = 10.0, lazy: bool = True) -> List[Dict[str, Any]]:
+    """Modules imported by ``import app_professional`` with cumulative time
+    >= ``min_ms``, in import order, each with its depth in the import tree."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app_professional'],
+                         cwd=ROOT, env=_env(lazy), capture_output=True, text=True, timeout=300)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cum_us, name = line.split(':', 1)[1].split('|', 2)
+        rows.append({'name': name.strip(), 'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                     'self_ms': int(self_us) / 1e3, 'cum_ms': int(cum_us) / 1e3})
+    # -X importtime prints a module after its children; reversed, every
+    # module comes right before its subtree.
+    return [row for row in reversed(rows) if row['cum_ms'] >= min_ms]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tree', action='store_true', help='print the import-time tree')
+    parser.add_argument('--min-ms', type=float, default=10.0)
+    parser.add_argument('--path', nargs='*', default=['/api/health'])
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--eager', action='store_true', help='EIMS_LAZY_MODULES=0')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='exit 1 when the median time to first byte exceeds this')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.tree:
+        print(f"{'cum ms':>8}{'self ms':>9}  module")
+        for row in import_tree(args.min_ms, lazy=not args.eager):
+            print(f"{row['cum_ms']:>8.1f}{row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['name']}")
+        print()
+
+    result = cold_start(args.path, args.runs, method=args.method, lazy=not args.eager)
+    if args.json:
+        print(json.dumps({k: v for k, v in result.items() if k != 'samples'}, indent=1))
+    else:
+        print(f"import app_professional   {result['import_ms']:>8.1f} ms  "
+              f"({result['modules_at_import']} modules, median of {args.runs}, "
+              f"{'lazy' if result['lazy'] else 'eager'})")
+        print(f"heavy deps at import      {', '.join(result['heavy_at_import']) or 'none'}")
+        for r in result['requests']:
+            print(f"{args.method} {r['path']:<30}first {r['first_ms']:>8.1f} ms   "
+                  f"second {r['second_ms']:>6.1f} ms   [{r['status']}]")
+        if result['ttfb_ms'] is not None:
+            print(f"time to first byte        {result['ttfb_ms']:>8.1f} ms")
+    if args.budget_ms is not None and result['ttfb_ms'] is not None and result['ttfb_ms'] > args.budget_ms:
+        print(f"over budget: {result['ttfb_ms']:.1f} ms > {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,17 +12,35 @@ Environment variables:
                 intend the app to be reachable from other machines, and
                 only behind a reverse proxy + TLS.
     EIMS_PORT   (default 5000)
-    EIMS_THREADS (default 8) — worker thread count.
+    EIMS_THREADS (default 8) — worker thread count. Project state is
+                request-scoped (loaded from SQLite per request), so any
+                thread count is safe. An open collaboration SSE stream
+                holds one thread (no DB work) for at most STREAM_MAX_S;
+                beyond EIMS_SSE_MAX_STREAMS open streams clients are sent
+                to the long-poll endpoint, so keep that below this.
+    EIMS_SSE_MAX_STREAMS (default 4) — concurrent SSE streams per process.
+    EIMS_SECRET_KEY — required when running several processes (or
+                behind a load balancer) so they all accept the same
+                session cookie, which carries the active project id.
 """
 import os
-from waitress import serve
 
-os.environ['EIMS_DEBUG'] = '0'
-from app_professional import app
 
-host = os.environ.get('EIMS_HOST', '127.0.0.1')
-port = int(os.environ.get('EIMS_PORT', '5000'))
-threads = int(os.environ.get('EIMS_THREADS', '8'))
+def main():
+    from waitress import serve
 
-print(f'EIMS production server (waitress) on http://{host}:{port} threads={threads}')
-serve(app, host=host, port=port, threads=threads, ident='EIMS')
+    os.environ['EIMS_DEBUG'] = '0'
+    from app_professional import app
+
+    host = os.environ.get('EIMS_HOST', '127.0.0.1')
+    port = int(os.environ.get('EIMS_PORT', '5000'))
+    threads = int(os.environ.get('EIMS_THREADS', '8'))
+
+    print(f'EIMS production server (waitress) on http://{host}:{port} threads={threads}')
+    serve(app, host=host, port=port, threads=threads, ident='EIMS')
+
+
+# The job and design-sweep process pools use spawn: each worker re-imports
+# this file as __mp_main__, and must not import the app or bind the port.
+if __name__ == '__main__':
+    main()
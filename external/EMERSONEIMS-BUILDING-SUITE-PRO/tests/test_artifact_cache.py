@@ -0,0 +1,97 @@
+"""Content-addressed export cache: LRU store, ETags and revision-keyed BIM exports."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_artifact_test_'))
+
+from eims_modules.artifact_cache import ArtifactCache, digest  # noqa: E402
+
+
+def test_digest_is_canonical():
+    assert digest('k', {'a': 1, 'b': [1, 2]}) == digest('k', {'b': [1, 2], 'a': 1})
+    assert digest('k', {'a': 1}) != digest('k', {'a': 2})
+    assert digest('svg', {'a': 1}) != digest('pdf', {'a': 1})
+
+
+def test_store_evicts_least_recently_used_and_survives_restart(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=250)
+    for name in 'abc':
+        cache.put(digest(name), name.encode() * 100)
+    # 300 bytes > 250: 'a' (oldest) went first.
+    assert cache.get(digest('a')) is None
+    assert cache.get(digest('b'))[0] == b'b' * 100
+    cache.put(digest('d'), b'd' * 100)          # 'c' is now least recently used
+    assert cache.get(digest('c')) is None and cache.get(digest('b')) is not None
+
+    again = ArtifactCache(str(tmp_path), max_bytes=250)
+    data, tag = again.get(digest('d'))
+    assert data == b'd' * 100 and again.etag(digest('d')) == tag
+    assert again.stats()['entries'] == 2
+
+    built = []
+    out = again.fetch(digest('e'), lambda: built.append(1) or b'e')
+    assert out[2] is False and again.fetch(digest('e'), lambda: b'x')[:2] == (b'e', out[1])
+    assert built == [1]
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_floor_plan_repeat_is_cached_and_conditional(client):
+    body = {'area_m2': 140, 'stories': 1, 'name': 'Cache probe', 'width_px': 640}
+    first = client.post('/api/bim/floor-plan', json=body)
+    assert first.status_code == 200 and first.headers['X-EIMS-Cache'] == 'miss'
+    again = client.post('/api/bim/floor-plan', json=body)
+    assert again.headers['X-EIMS-Cache'] == 'hit'
+    assert again.get_data() == first.get_data() and again.headers['ETag'] == first.headers['ETag']
+    assert again.get_json()['svg'].startswith('<svg')
+    not_modified = client.post('/api/bim/floor-plan', json=body,
+                               headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304 and not not_modified.get_data()
+    assert client.post('/api/bim/floor-plan', json={**body, 'storey_index': 3}).status_code == 400
+
+
+def test_bim_edit_bumps_revision_and_invalidates_exports(client):
+    pid = client.post('/api/projects', json={'name': 'Cache', 'area': 150,
+                                             'stories': 1}).get_json()['project_id']
+    assert client.post('/api/bim/build', json={'project_id': pid, 'persist': True}).status_code == 200
+    url = f'/api/bim/sheet-pack/{pid}/pdf'
+    pdf = client.get(url)
+    assert pdf.status_code == 200 and pdf.mimetype == 'application/pdf'
+    assert client.get(url, headers={'If-None-Match': pdf.headers['ETag']}).status_code == 304
+
+    bim = client.get(f'/api/bim/project/{pid}').get_json()['bim']
+    space = bim['storeys'][0]['spaces'][0]
+    assert client.post('/api/bim/element/update', json={
+        'project_id': pid, 'element_id': space['id'],
+        'patch': {'name': 'Renamed room'}}).get_json()['success']
+
+    import app_professional
+    proj = app_professional._load_project(pid)
+    assert proj['bim_revision'] == 2 and proj['bim_hash'] == digest(proj['bim'])
+    fresh = client.get(url, headers={'If-None-Match': pdf.headers['ETag']})
+    assert fresh.status_code == 200 and fresh.headers['X-EIMS-Cache'] == 'miss'
+    assert fresh.headers['ETag'] != pdf.headers['ETag']
+
+
+def test_legacy_exporters_serve_cached_bytes(client):
+    body = {'name': 'Exp', 'area': 300, 'stories': 2, 'units': 2}
+    first = client.post('/api/bim/download-ifc', json=body)
+    second = client.post('/api/bim/download-ifc', json=body)
+    assert second.headers['X-EIMS-Cache'] == 'hit' and second.get_data() == first.get_data()
+    assert client.post('/api/bim/generate-ifc', json=body).get_json()['ifc_content'] == first.get_data(as_text=True)
+    dxf = client.post('/api/export/dxf/floor-plan', json=body)
+    assert dxf.status_code == 200 and dxf.headers['Content-Disposition'].endswith('EIMS_FloorPlan.dxf"')
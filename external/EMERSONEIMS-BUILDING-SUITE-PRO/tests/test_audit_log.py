@@ -0,0 +1,74 @@
+"""Segmented, indexed audit log (eims_modules/audit_log.py)."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_audit_test_'))
+
+from eims_modules import audit_log  # noqa: E402
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch):
+    """Point the audit log at a fresh directory with a fresh writer."""
+    audit_log.flush()
+    monkeypatch.setattr(audit_log, '_LOG_PATH', str(tmp_path / '.audit_log.jsonl'))
+    monkeypatch.setattr(audit_log, '_LOG_DIR', str(tmp_path / 'audit'))
+    monkeypatch.setattr(audit_log, '_INDEX_PATH', str(tmp_path / 'audit' / 'index.db'))
+    monkeypatch.setattr(audit_log, '_writer', None)
+    yield tmp_path
+    audit_log.flush()
+
+
+def test_filters_order_and_limit(store):
+    for i in range(30):
+        audit_log.log_event(user=f'u{i % 3}', action='POST /a' if i % 2 else 'DELETE /b',
+                            detail={'i': i})
+    recs = audit_log.query(limit=4, user='u1')
+    assert [r['detail']['i'] for r in recs] == [19, 22, 25, 28]
+    recs = audit_log.query(limit=100, user='u0', action='DELETE /b')
+    assert [r['detail']['i'] for r in recs] == [0, 6, 12, 18, 24]
+    assert audit_log.query(limit=5, since='2999-01-01') == []
+    assert len(audit_log.query(limit=1000)) == 30
+
+
+def test_segments_rotate_by_size(store, monkeypatch):
+    monkeypatch.setattr(audit_log, 'SEGMENT_BYTES', 2000)
+    for i in range(60):
+        audit_log.log_event(user='u', action='POST /x', detail={'i': i, 'pad': 'x' * 40})
+        if i % 10 == 9:
+            audit_log.flush()   # rotation is checked per batch
+    segments = audit_log._segments()
+    assert len(segments) >= 3
+    assert all(os.path.getsize(os.path.join(audit_log._LOG_DIR, s)) < 2000 + 10 * 200 for s in segments)
+    assert [r['detail']['i'] for r in audit_log.query(limit=60)] == list(range(60))
+
+    monkeypatch.setattr(audit_log, 'KEEP_SEGMENTS', 2)
+    audit_log.log_event(user='u', action='POST /x', detail={'i': 60})
+    audit_log.flush()
+    kept = audit_log.query(limit=100)
+    assert len(audit_log._segments()) == 2 and kept[-1]['detail']['i'] == 60 and len(kept) < 61
+
+
+def test_legacy_file_is_adopted_and_reindex_matches(store):
+    with open(audit_log._LOG_PATH, 'w', encoding='utf-8') as f:
+        for i in range(3):
+            f.write(json.dumps({'ts': f'2020-01-0{i + 1}T00:00:00Z', 'user': 'old',
+                                'action': 'POST /legacy', 'ok': True, 'detail': {'i': i}}) + '\n')
+    audit_log.log_event(user='new', action='POST /x')
+
+    recs = audit_log.query(limit=10)
+    assert [r['user'] for r in recs] == ['old', 'old', 'old', 'new']
+    assert not os.path.exists(audit_log._LOG_PATH)
+    assert audit_log.reindex() == 4
+    assert audit_log.query(limit=10) == recs
+    assert [r['detail']['i'] for r in audit_log.query(limit=10, since='2020-01-02')[:2]] == [1, 2]
@@ -0,0 +1,111 @@
+"""Binary Building encoding: exact round trip, lazy storeys, blob storage."""
+
+from __future__ import annotations
+
+import copy
+import os
+import pickle
+import struct
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_bim_binary_test_'))
+
+from eims_modules import bim_binary  # noqa: E402
+from eims_modules.bim_model import Building, Point2D, PointList  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def building():
+    return Building.from_params(name='Binary', area_m2=1200, stories=4, units=2, bedrooms=5)
+
+
+def test_round_trip_is_exact_and_storeys_decode_lazily(building):
+    blob = building.to_bytes()
+    assert bim_binary.is_binary(blob)
+    lazy = Building.from_bytes(blob)
+    assert [s.decoded for s in lazy.storeys] == [False] * 4
+    assert lazy.storeys[2].name == building.storeys[2].name      # head only
+    assert lazy.storeys[1].walls == building.storeys[1].walls
+    assert [s.decoded for s in lazy.storeys] == [False, True, False, False]
+    assert lazy.to_dict() == building.to_dict()
+    assert lazy.storeys == building.storeys and building.storeys == lazy.storeys
+    assert Building.from_bytes(blob, lazy=False).storeys[3].decoded
+
+    # Copies and pickles of an undecoded model come out as plain storeys.
+    for clone in (copy.deepcopy(Building.from_bytes(blob)),
+                  pickle.loads(pickle.dumps(Building.from_bytes(blob)))):
+        assert clone.to_dict() == building.to_dict()
+
+
+def test_rejects_foreign_and_future_blobs(building):
+    blob = building.to_bytes()
+    with pytest.raises(ValueError):
+        bim_binary.loads(b'{"id": 1}')
+    newer = blob[:4] + struct.pack('<H', bim_binary.FORMAT_VERSION + 1) + blob[6:]
+    with pytest.raises(ValueError, match='version'):
+        bim_binary.loads(newer)
+    with pytest.raises(ValueError, match='truncated'):
+        bim_binary.loads(blob[:len(blob) // 2])
+
+
+def test_point_list_behaves_like_a_point_sequence():
+    pts = [Point2D(0, 0), Point2D(4, 0), Point2D(4, 3), Point2D(0, 3)]
+    pl = PointList(pts)
+    assert len(pl) == 4 and pl[-1] == Point2D(0, 3) and pl == pts and pts == pl
+    assert pl[1:3] == pts[1:3] and isinstance(pl[1:3], PointList)
+    assert pl[::2] == pts[::2]
+    with pytest.raises(IndexError):
+        pl[4]
+    assert PointList.from_dicts(pl.to_dicts()) == pl
+    assert pickle.loads(pickle.dumps(pl)) == pl
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def _blob_row(pid):
+    import app_professional
+    conn = app_professional.get_db()
+    try:
+        return conn.execute('SELECT bim_hash, data FROM bim_blobs WHERE project_id=?',
+                            (pid,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_saved_model_is_served_from_its_blob(client):
+    pid = client.post('/api/projects', json={'name': 'Blob', 'area': 240,
+                                             'stories': 2}).get_json()['project_id']
+    assert client.post('/api/bim/build', json={'project_id': pid, 'persist': True}).status_code == 200
+    bim = client.get(f'/api/bim/project/{pid}').get_json()['bim']     # JSON copy intact
+    row = _blob_row(pid)
+    assert row is not None and bim_binary.loads(row['data']).to_dict() == bim
+
+    space = bim['storeys'][1]['spaces'][0]
+    r = client.post('/api/bim/element/update', json={
+        'project_id': pid, 'element_id': space['id'], 'patch': {'name': 'Study'}})
+    assert r.get_json()['success']
+    row = _blob_row(pid)
+    decoded = bim_binary.loads(row['data'])
+    assert decoded.storeys[1].spaces[0].name == 'Study'
+    assert client.get(f'/api/bim/project/{pid}').get_json()['bim'] == decoded.to_dict()
+
+    # A missing (or stale) blob falls back to data_json.bim and is rewritten.
+    import app_professional
+    conn = app_professional.get_db()
+    conn.execute('DELETE FROM bim_blobs WHERE project_id=?', (pid,))
+    conn.commit()
+    conn.close()
+    plan = client.post('/api/bim/floor-plan', json={'project_id': pid, 'storey_index': 1})
+    assert plan.status_code == 200 and plan.get_json()['storey_name'] == 'Storey 2'
+    assert _blob_row(pid)['bim_hash'] == row['bim_hash']
@@ -0,0 +1,265 @@
+"""Push-based collaboration change feed (ChangeBus + SSE endpoints)."""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_bus_test_'))
+
+from eims_modules import collaboration  # noqa: E402
+from eims_modules.collaboration import ChangeBus  # noqa: E402
+
+SUBSCRIBERS = 100
+EVENTS = 20
+
+
+@pytest.fixture()
+def counting_db(tmp_path):
+    """get_db over a fresh file that counts how often it is called."""
+    path = str(tmp_path / 'bus.db')
+    calls = {'n': 0}
+
+    def get_db():
+        calls['n'] += 1
+        c = sqlite3.connect(path)
+        c.row_factory = sqlite3.Row
+        return c
+
+    collaboration._ensure_schema(get_db)
+    get_db.calls = calls
+    return get_db
+
+
+def test_fan_out_to_100_subscribers(counting_db):
+    bus = ChangeBus()
+    received = [[] for _ in range(SUBSCRIBERS)]
+    ready = threading.Barrier(SUBSCRIBERS + 1)
+
+    def subscriber(i):
+        sub, _ = collaboration.subscribe_changes(counting_db, project_id='P', bus=bus)
+        ready.wait()
+        with sub:
+            while len(received[i]) < EVENTS:
+                for e in sub.wait(5):
+                    received[i].append((e['id'], time.perf_counter() - e['payload']['sent']))
+
+    threads_before = threading.active_count()
+    workers = [threading.Thread(target=subscriber, args=(i,)) for i in range(SUBSCRIBERS)]
+    for t in workers:
+        t.start()
+    ready.wait()
+    db_calls = counting_db.calls['n']
+    for _ in range(EVENTS):
+        collaboration.record_change(counting_db, project_id='P', user_id='u', op='edit',
+                                    payload={'sent': time.perf_counter()}, bus=bus)
+        time.sleep(0.005)
+    for t in workers:
+        t.join(10)
+
+    ids = [[i for i, _ in r] for r in received]
+    assert all(r == ids[0] for r in ids) and len(ids[0]) == EVENTS
+    assert ids[0] == sorted(ids[0])
+    # Only the writes touched SQLite; delivery did not poll it.
+    assert counting_db.calls['n'] - db_calls == EVENTS
+    assert bus.stats()['subscribers'] == 0
+
+    latencies = sorted(lat for r in received for _, lat in r)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f'\n{SUBSCRIBERS} subscribers x {EVENTS} events: '
+          f'p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, '
+          f'threads {threading.active_count()} (was {threads_before})')
+    assert p99 < 1.0
+
+
+def test_resume_from_buffer_and_backfill(counting_db):
+    bus = ChangeBus(buffer_size=4)
+    ids = [collaboration.record_change(counting_db, project_id='R', user_id='u', op=f'op{i}', bus=bus)['change_id']
+           for i in range(6)]
+
+    # Within the replay buffer: no DB read.
+    calls = counting_db.calls['n']
+    sub, replay = collaboration.subscribe_changes(counting_db, project_id='R', last_id=ids[3], bus=bus)
+    assert [e['id'] for e in replay] == ids[4:] and counting_db.calls['n'] == calls
+    sub.close()
+
+    # Older than the buffer: one backfill query covers the gap.
+    sub, replay = collaboration.subscribe_changes(counting_db, project_id='R', last_id=0, bus=bus)
+    assert [e['op'] for e in replay] == [f'op{i}' for i in range(6)]
+    assert counting_db.calls['n'] == calls + 1
+    late = collaboration.record_change(counting_db, project_id='R', user_id='u', op='late', bus=bus)
+    assert [e['id'] for e in sub.wait(1)] == [late['change_id']]
+    sub.close()
+    assert sub.wait(0.01) == []
+
+
+class _SlowClose:
+    """Connection proxy that stalls between commit and publish, where
+    record_change closes the connection, so writers overtake each other."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        self._conn.close()
+        time.sleep(random.random() * 0.003)
+
+
+def test_concurrent_writers_publish_in_id_order(counting_db):
+    bus = ChangeBus()
+    slow_db = lambda: _SlowClose(counting_db())  # noqa: E731
+    writers, per_writer = 8, 15
+    subs = [collaboration.subscribe_changes(counting_db, project_id='W', bus=bus)[0] for _ in range(4)]
+    received = [[] for _ in subs]
+
+    def follow(i):
+        with subs[i]:
+            while len(received[i]) < writers * per_writer:
+                events = subs[i].wait(5)
+                if not events:
+                    break
+                received[i] += [e['id'] for e in events]
+
+    def write(w):
+        for n in range(per_writer):
+            collaboration.record_change(slow_db, project_id='W', user_id=f'u{w}', op=f'op{n}', bus=bus)
+
+    followers = [threading.Thread(target=follow, args=(i,)) for i in range(len(subs))]
+    producers = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    for t in followers + producers:
+        t.start()
+    for t in producers + followers:
+        t.join(20)
+
+    stored = [e['id'] for e in collaboration._fetch_changes(counting_db, project_id='W', since_id=0, limit=1000)]
+    assert len(stored) == writers * per_writer
+    assert all(r == stored for r in received)
+
+
+def test_idle_topics_are_evicted(counting_db):
+    bus = ChangeBus(idle_s=0.05)
+    collaboration.record_change(counting_db, project_id='old', user_id='u', op='edit', bus=bus)
+    live, _ = collaboration.subscribe_changes(counting_db, project_id='live', bus=bus)
+    time.sleep(0.1)
+    bus.publish('new', {'id': 1})
+    assert bus.stats()['topics'] == 2 and bus.stats()['evicted'] == 1
+    live.close()
+
+    # A subscriber after eviction resumes from the database.
+    sub, replay = collaboration.subscribe_changes(counting_db, project_id='old', last_id=0, bus=bus)
+    assert [e['op'] for e in replay] == ['edit']
+    sub.close()
+
+
+def test_long_poll_wakes_on_publish(counting_db):
+    bus = ChangeBus()
+    timer = threading.Timer(0.1, lambda: collaboration.record_change(
+        counting_db, project_id='L', user_id='u', op='edit', bus=bus))
+    timer.start()
+    t0 = time.time()
+    poll = collaboration.poll_changes(counting_db, project_id='L', since_id=0, timeout_s=5, bus=bus)
+    assert [c['op'] for c in poll['changes']] == ['edit']
+    assert time.time() - t0 < 2
+
+
+def _read_sse(resp, frames):
+    """First ``frames`` SSE events of a streaming response."""
+    buf, events = '', []
+    for chunk in resp.response:
+        buf += chunk.decode() if isinstance(chunk, bytes) else chunk
+        while '\n\n' in buf:
+            block, buf = buf.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line)
+            if 'data' in fields:
+                events.append((int(fields['id']), json.loads(fields['data'])))
+        if len(events) >= frames:
+            break
+    resp.close()
+    return events
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_sse_project_feed_resumes_by_last_event_id(client):
+    first = client.post('/api/collab/changes/record', json={
+        'project_id': 'SSE-1', 'user_id': 'a', 'op': 'wall.create'}).get_json()['change_id']
+    second = client.post('/api/collab/changes/record', json={
+        'project_id': 'SSE-1', 'user_id': 'b', 'op': 'wall.move'}).get_json()['change_id']
+
+    resp = client.get('/api/collab/changes/stream?project_id=SSE-1',
+                      headers={'Last-Event-ID': str(first)}, buffered=False)
+    assert resp.mimetype == 'text/event-stream'
+    events = _read_sse(resp, 1)
+    assert events[0][0] == second and events[0][1]['op'] == 'wall.move'
+
+
+def test_sse_session_events(client):
+    sid = client.post('/api/collab/create', json={'project_id': 'P', 'user_id': 'alice'}).get_json()['id']
+    client.post('/api/collab/join', json={'session_id': sid, 'user_id': 'bob'})
+    client.post('/api/collab/chat', json={'session_id': sid, 'user_id': 'bob', 'message': 'hi'})
+
+    events = _read_sse(client.get(f'/api/collab/events/stream?session_id={sid}&last_id=1', buffered=False), 2)
+    assert [(i, e['type']) for i, e in events] == [(2, 'user_joined'), (3, 'chat')]
+    assert client.get('/api/collab/events/stream?session_id=nope').status_code == 404
+
+
+def test_open_streams_are_capped_and_excess_clients_fall_back(client, monkeypatch):
+    """Streams can hold at most STREAM_MAX_OPEN request threads; the other
+    requests return 503 at once instead of parking a thread."""
+    monkeypatch.setattr(collaboration, 'STREAM_SLOTS', threading.BoundedSemaphore(2))
+    clients, held = 6, []
+    status, ready = [None] * clients, threading.Barrier(clients + 1)
+    occupied = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def request_thread(i):
+        resp = client.get('/api/collab/changes/stream?project_id=CAP', buffered=False)
+        status[i] = resp.status_code
+        if resp.status_code == 200:
+            next(iter(resp.response))                   # inside the stream: holds this thread
+            with lock:
+                occupied['now'] += 1
+                occupied['max'] = max(occupied['max'], occupied['now'])
+            held.append(resp)
+        ready.wait(10)
+
+    threads = [threading.Thread(target=request_thread, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    ready.wait(10)
+    for t in threads:
+        t.join(10)
+    assert occupied['max'] == 2 and sorted(status) == [200, 200] + [503] * (clients - 2)
+
+    busy = client.get('/api/collab/changes/stream?project_id=CAP')
+    assert busy.status_code == 503 and busy.headers['Retry-After']
+    assert busy.get_json()['fallback'] == 'long-poll'
+    held.pop().close()                                  # a closed stream frees its slot
+    resp = client.get('/api/collab/changes/stream?project_id=CAP', buffered=False)
+    assert resp.status_code == 200
+    resp.close()
+    for resp in held:
+        resp.close()
+    assert collaboration.CHANGE_BUS.stats()['subscribers'] == 0
+
@@ -0,0 +1,179 @@
+"""Grid broad phase, vectorised narrow phase and incremental clash re-checks."""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_clash_test_'))
+
+from eims_modules import clash_index, mep_clash  # noqa: E402
+from eims_modules.mep_clash import AABB, Element  # noqa: E402
+
+KINDS = [('STRUCTURE', 'beam'), ('STRUCTURE', 'slab'), ('HVAC', 'duct'),
+         ('PLUMBING', 'pipe'), ('ELECTRICAL', 'cable_tray'), ('ARCHITECTURE', 'wall')]
+
+
+def _random_model(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for k in range(n):
+        system, kind = rng.choice(KINDS)
+        x, y, z = rng.uniform(0, 40), rng.uniform(0, 40), rng.uniform(0, 9)
+        if kind == 'slab':
+            dx, dy, dz = rng.uniform(10, 30), rng.uniform(10, 30), 0.2
+        else:
+            dx, dy, dz = rng.uniform(0.05, 6), rng.uniform(0.05, 0.6), rng.uniform(0.05, 0.6)
+        out.append(Element(id=f'E{k}', system=system, kind=kind,
+                           aabb=AABB(x, y, z, x + dx, y + dy, z + dz)))
+    return out
+
+
+def _brute_force(elements):
+    """Reference all-pairs result under the same rules as ClashIndex."""
+    found = {}
+    for i, a in enumerate(elements):
+        for b in elements[i + 1:]:
+            if a.system == b.system and a.kind == b.kind:
+                continue
+            if {a.system, b.system} == {'ARCHITECTURE', 'STRUCTURE'}:
+                continue
+            c = mep_clash.required_clearance(a.system, b.system)
+            if not a.aabb.intersects(b.aabb, clearance_m=c):
+                continue
+            v = a.aabb.overlap_volume_m3(b.aabb)
+            if v > 0 or c > 0:
+                found[frozenset((a.id, b.id))] = 'HARD' if v > 0 else 'SOFT'
+    return found
+
+
+def _found(result):
+    return {frozenset((c['a']['id'], c['b']['id'])): c['severity'] for c in result['clashes']}
+
+
+def test_grid_matches_all_pairs_reference():
+    elements = _random_model(1500)
+    result = mep_clash.detect(elements)
+    assert _found(result) == _brute_force(elements)
+    # The broad phase pruned most of what an all-pairs loop would test.
+    assert result['pairs_tested'] < len(elements) ** 2 / 20
+
+
+def test_grid_pairs_handles_oversized_and_degenerate_boxes(monkeypatch):
+    monkeypatch.setattr(clash_index, 'MAX_CELLS_PER_BOX', 8)
+    lo = [[0, 0, 0], [5, 5, 0], [99, 99, 0], [50, 50, 0], [50, 50, 0]]
+    hi = [[100, 100, 0.2], [5.1, 5.1, 3], [99.5, 99.5, 3], [50, 50, 0], [50, 50, 0]]
+    i, j = clash_index.grid_pairs(lo, hi)
+    assert {(0, 1), (0, 2), (0, 3), (0, 4), (3, 4)} <= set(zip(i.tolist(), j.tolist()))
+    assert (1, 2) not in set(zip(i.tolist(), j.tolist()))
+
+
+def test_incremental_update_matches_full_rebuild():
+    rng = random.Random(7)
+    elements = _random_model(800, seed=3)
+    index = mep_clash.build_index(elements)
+    before = {frozenset((a.id, b.id)) for a, b, _, _ in index.clashes()}
+
+    moved = []
+    for k in rng.sample(range(len(elements)), 10):
+        e = elements[k]
+        x, y, z = rng.uniform(0, 40), rng.uniform(0, 40), rng.uniform(0, 9)
+        elements[k] = Element(id=e.id, system=e.system, kind=e.kind,
+                              aabb=AABB(x, y, z, x + 3, y + 0.4, z + 0.4))
+        moved.append(elements[k])
+    removed = elements.pop(0).id
+    delta = index.update(mep_clash._index_rows(moved), removed=[removed])
+
+    after = {frozenset((a.id, b.id)) for a, b, _, _ in index.clashes()}
+    assert after == set(_brute_force(elements))
+    assert {frozenset(p) for p in delta['added']} == after - before
+    assert {frozenset(p) for p in delta['resolved']} == before - after
+    # Only the touched elements were re-tested, not the whole model.
+    assert index.pairs_tested < 100
+
+    # Re-sending unchanged elements is a no-op.
+    assert index.update(mep_clash._index_rows(elements)) == {'added': [], 'resolved': []}
+
+
+def test_walls_clash_with_services_but_not_structure():
+    building = {
+        'storeys': [{'id': 'L0', 'level_m': 0.0, 'height_m': 3.0,
+                     'columns': [{'id': 'C1', 'point': {'x': 0, 'y': 0}, 'section': 'C300x300'}],
+                     'walls': [{'id': 'W1', 'type_name': 'ext', 'height_m': 3.0,
+                                'points': [{'x': -2, 'y': 0}, {'x': 4, 'y': 0}]}]}],
+        'types': {'walls': {'ext': {'thickness_m': 0.3}}},
+        'mep_runs': [{'id': 'D1', 'system': 'HVAC', 'kind': 'duct',
+                      'p1': [2, -3, 2.5], 'p2': [2, 3, 2.5], 'width_m': 0.4, 'height_m': 0.3}],
+    }
+    result = mep_clash.detect(mep_clash.elements_from_building(building))
+    assert {(c['a']['id'], c['b']['id']) for c in result['clashes']} == {('W1', 'D1')}
+    assert 'fire-stop' in result['clashes'][0]['suggestion']
+    only = mep_clash.elements_from_building(building, only={'W1'})
+    assert [e.id for e in only] == ['W1']
+
+
+def test_bent_and_diagonal_walls_do_not_box_in_the_room():
+    duct_in_room = {'id': 'D-room', 'system': 'HVAC', 'kind': 'duct',
+                    'p1': [2, 2, 2.5], 'p2': [3, 2, 2.5], 'width_m': 0.3, 'height_m': 0.3}
+    duct_through = {'id': 'D-wall', 'system': 'HVAC', 'kind': 'duct',
+                    'p1': [6, 3, 2.5], 'p2': [7, 3, 2.5], 'width_m': 0.3, 'height_m': 0.3}
+    walls = [{'id': 'L', 'points': [{'x': 0, 'y': 0}, {'x': 6.5, 'y': 0}, {'x': 6.5, 'y': 6}]},
+             {'id': 'DIAG', 'points': [{'x': 0, 'y': 6}, {'x': 5, 'y': 11}]}]
+    building = {'storeys': [{'level_m': 0.0, 'height_m': 3.0, 'walls': walls}],
+                'mep_runs': [duct_in_room, duct_through]}
+    elements = mep_clash.elements_from_building(building)
+    assert {e.id for e in elements if e.kind == 'wall'} >= {'L#0', 'L#1', 'DIAG#0', 'DIAG#9'}
+    result = mep_clash.detect(elements)
+    assert {(c['a']['id'], c['b']['id']) for c in result['clashes']} == {('L#1', 'D-wall')}
+
+    # Straightening the wall drops its extra parts from a project index.
+    mep_clash.detect_project('bent-wall', building)
+    walls[0]['points'] = [{'x': 0, 'y': 0}, {'x': 6.5, 'y': 0}]
+    r = mep_clash.recheck_project('bent-wall', building, ['L'])
+    assert r['resolved'] == [['L#1', 'D-wall']] and r['clash_count'] == 0
+    assert r['element_count'] == len(mep_clash.elements_from_building(building))
+
+
+def test_legacy_clash_detector_reports_hard_clashes():
+    import app_professional as ap
+    result = ap.ClashDetector.detect_clashes({'stories': 3, 'units': 4, 'area': 1200})
+    assert result['hard_clashes'] > 0
+    assert all(c['discipline_a'] != c['discipline_b'] for c in result['clashes'])
+    ids = [c['id'] for c in result['clashes']]
+    assert ids == [f'CLASH-{k + 1:04d}' for k in range(len(ids))]
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_bim_edit_rechecks_only_the_edited_wall(client):
+    pid = client.post('/api/projects', json={'name': 'Clash', 'area': 160,
+                                             'stories': 1}).get_json()['project_id']
+    assert client.post('/api/bim/build', json={'project_id': pid, 'persist': True}).status_code == 200
+    bim = client.get(f'/api/bim/project/{pid}').get_json()['bim']
+    wall = bim['storeys'][0]['walls'][0]
+    far = [{'id': 'D-far', 'system': 'HVAC', 'kind': 'duct',
+            'p1': [500, 500, 2.5], 'p2': [510, 500, 2.5], 'width_m': 0.4, 'height_m': 0.3}]
+
+    full = client.post('/api/bim/clashes', json={'project_id': pid, 'mep_runs': far}).get_json()
+    assert full['success'] and full['element_count'] > 1
+    assert not any('D-far' in (c['a']['id'], c['b']['id']) for c in full['clashes'])
+
+    # Drag the wall across the duct: only that wall is re-checked.
+    r = client.post('/api/bim/element/update', json={
+        'project_id': pid, 'element_id': wall['id'],
+        'patch': {'points': [{'x': 505, 'y': 498}, {'x': 505, 'y': 502}]}}).get_json()
+    assert r['success']
+    assert [sorted(p) for p in r['clashes']['added']] == [sorted([wall['id'], 'D-far'])]
+    assert r['clashes']['severity_counts']['HARD'] >= 1
@@ -0,0 +1,128 @@
+"""Response compression: negotiation, precompressed assets, streaming, budget."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+import zlib
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_compression_test_'))
+
+from flask import Flask, Response  # noqa: E402
+
+from eims_modules import compression as comp  # noqa: E402
+
+_JSON = json.dumps([{'id': i, 'name': f'Wall {i}', 'length_m': i * 0.25} for i in range(4000)])
+
+
+def test_negotiate():
+    assert comp.negotiate('gzip, deflate', ['br', 'gzip']) == 'gzip'
+    assert comp.negotiate('gzip, br', ['br', 'gzip']) == 'br'
+    assert comp.negotiate('br;q=0.5, gzip;q=0.8', ['br', 'gzip']) == 'gzip'
+    assert comp.negotiate('*', ['br', 'gzip']) == 'br'
+    assert comp.negotiate('gzip;q=0, identity', ['gzip']) is None
+    assert comp.negotiate('', ['gzip']) is None
+
+
+@pytest.fixture()
+def app():
+    app = Flask(__name__)
+    app.after_request(lambda r: comp.compress_response(r, 'gzip'))
+
+    @app.route('/json/<int:n>')
+    def _json(n):
+        return Response(_JSON[:n], content_type='application/json')
+
+    @app.route('/random')
+    def _random():
+        return Response(os.urandom(20_000), content_type='text/plain')
+
+    @app.route('/stream')
+    def _stream():
+        return Response((json.dumps({'row': i}) + '\n' for i in range(50)),
+                        content_type='application/x-ndjson')
+
+    return app.test_client()
+
+
+def test_size_and_incompressible_skips(app):
+    before = comp.stats()
+    assert 'Content-Encoding' not in app.get('/json/500').headers
+    assert 'Content-Encoding' not in app.get('/random').headers
+    r = app.get('/json/20000')
+    assert r.headers['Content-Encoding'] == 'gzip' and gzip.decompress(r.data) == _JSON[:20000].encode()
+    after = comp.stats()
+    for key in ('skipped_small', 'skipped_incompressible', 'compressed'):
+        assert after[key] == before[key] + 1
+
+
+def test_budget_drops_level_then_skips(app, monkeypatch):
+    size = 100_000
+    rates = comp._Throughput()
+    rates.record('gzip', 6, 100_000, 10.0)                    # 10 ms per 100 KB
+    rates.record('gzip', 1, 100_000, 2.0)
+    monkeypatch.setattr(comp, 'throughput', rates)
+    monkeypatch.setattr(comp, 'BUDGET_MS', 5.0)
+    assert comp.plan(_JSON[:size].encode(), 'gzip')[0] == 1
+    monkeypatch.setattr(comp, 'BUDGET_MS', 0.0)
+    before = comp.stats()['skipped_budget']
+    assert 'Content-Encoding' not in app.get(f'/json/{size}').headers
+    assert comp.stats()['skipped_budget'] == before + 1
+
+
+def test_streamed_and_large_bodies_are_not_buffered(app, monkeypatch):
+    r = app.get('/stream', buffered=False)
+    assert r.is_streamed and r.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in r.headers
+    # Every source chunk is sync-flushed: the first line decodes on its own.
+    d = zlib.decompressobj(31)
+    first = d.decompress(next(iter(r.response)))
+    assert first == b'{"row": 0}\n'
+    r.close()
+
+    monkeypatch.setattr(comp, 'STREAM_BYTES', 50_000)
+    r = app.get(f'/json/{len(_JSON)}')
+    assert 'Content-Length' not in r.headers and gzip.decompress(r.data) == _JSON.encode()
+
+
+def test_precompressed_variants_built_once():
+    cache = comp.Precompressed(max_bytes=10 ** 6)
+    v1 = cache.variants('a', _JSON.encode())
+    v2 = cache.variants('a', b'ignored: same key')
+    assert v1 is v2 and gzip.decompress(v1['gzip']) == _JSON.encode()
+    assert ('br' in v1) == comp.HAS_BROTLI
+    assert 'gzip' not in cache.variants('rand', os.urandom(5000))
+    cache.variants('b', os.urandom(10 ** 6))                   # evicts 'a'
+    assert cache.variants('a', b'rebuilt') == {'identity': b'rebuilt'}
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_wizard_assets_served_precompressed(client):
+    shell = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    if 'Link' not in shell.headers:
+        pytest.skip('no wizard HTML on disk')
+    js = re.search(r'</static/(wizard-\w+\.js)>', shell.headers['Link']).group(1)
+    plain = client.get(f'/static/{js}')
+    assert 'Content-Encoding' not in plain.headers
+    builds = comp.stats()['static_builds']
+    for _ in range(3):
+        r = client.get(f'/static/{js}', headers={'Accept-Encoding': 'gzip'})
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert 'immutable' in r.headers['Cache-Control']
+        assert gzip.decompress(r.data) == plain.data
+    assert comp.stats()['static_builds'] == builds
@@ -0,0 +1,127 @@
+"""Point-grid daylight factor: sky component, window attribution, occlusion."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_daylight_test_'))
+
+from eims_modules import daylight_grid as dg  # noqa: E402
+from eims_modules.bim_model import (Building, Opening, Point2D, Space, Storey,  # noqa: E402
+                                    Wall, WindowType)
+
+
+def _room(window_w: float = 1.5, fin: bool = False) -> Building:
+    """Two 4 x 6 m rooms side by side; only the west one has a window, on
+    its south wall. ``fin`` adds a short partition in front of the window."""
+    b = Building(id='b', name='Daylight')
+    b.types.windows['W'] = WindowType(name='W', width_m=window_w, height_m=1.5)
+    s = Storey(id='s1', name='Ground', level_m=0.0, height_m=3.0)
+    corners = [Point2D(0, 0), Point2D(8, 0), Point2D(8, 6), Point2D(0, 6)]
+    for i in range(4):
+        s.walls.append(Wall(id=f'ext{i}', type_name='EXT', points=[corners[i], corners[(i + 1) % 4]],
+                            height_m=3.0, storey_id='s1', structural_role='external'))
+    s.walls.append(Wall(id='part', type_name='INT', points=[Point2D(4, 0), Point2D(4, 6)],
+                        height_m=3.0, storey_id='s1'))
+    if fin:
+        s.walls.append(Wall(id='fin', type_name='INT', points=[Point2D(0.5, 2.0), Point2D(3.5, 2.0)],
+                            height_m=3.0, storey_id='s1'))
+    s.openings.append(Opening(id='win', kind='window', type_name='W', wall_id='ext0',
+                              position_m=2.0, sill_m=0.9))
+    for sid, x0 in (('west', 0.0), ('east', 4.0)):
+        s.spaces.append(Space(id=sid, name=sid, program='living', storey_id='s1', boundary=[
+            Point2D(x0, 0), Point2D(x0 + 4, 0), Point2D(x0 + 4, 6), Point2D(x0, 6)]))
+    b.storeys.append(s)
+    return b
+
+
+def test_unobstructed_half_sky_is_half_the_horizontal_illuminance():
+    wall = dg.Aperture('w', 'h', 'W', np.array([0.0, 0.0]), np.array([1.0, 0.0]),
+                       width_m=400.0, sill_m=dg.WORK_PLANE_M, head_m=300.0)
+    centres, normals, dA = wall.patches(1.0, np.array([0.0, 1.0]))
+    d = centres - np.array([0.0, 1.0, dg.WORK_PLANE_M])
+    r = np.linalg.norm(d, axis=1)
+    sin_alt, cos_inc = d[:, 2] / r, (d * normals).sum(1) / r
+    sc = dg._SKY_NORM * ((1 + 2 * sin_alt) / 3 * sin_alt * dA * cos_inc / r ** 2).sum()
+    assert sc == pytest.approx(50.0, abs=2.0)
+
+
+def test_irc_is_the_bre_split_flux_formula():
+    b = _room()
+    storey = b.storeys[0]
+    west = storey.spaces[0]
+    # 4 x 6 x 3 m room: A = 2 * 24 + 20 * 3 = 108 m2; W = 2.25 m2, R = 0.5.
+    # IRC = 0.85 W / (A (1 - R)) * (C Rfw + 5 Rcw) = 1.9125 / 54 * (39 * 0.3 + 5 * 0.7)
+    irc = dg._irc_pct(west, storey, 2.25, reflectance=0.5, floor_reflectance=0.3,
+                      ceiling_reflectance=0.7)
+    assert irc == pytest.approx(1.9125 / 54 * 15.2)
+    assert irc == pytest.approx(0.5383, abs=1e-4)
+
+
+def test_window_lights_only_its_own_room_and_falls_off_with_depth():
+    r = dg.building_daylight(_room(), workers=1)
+    west, east = r['rooms']
+    assert west['windows'] == ['win'] and east['windows'] == []
+    assert east['mean_df_pct'] == 0 and east['pct_area_above_threshold'] == 0
+    assert west['view_factors']['win'] > 0 and 0 < west['uniformity'] < 1
+    grid = np.array(dg.building_daylight(_room(), include_points=True)['rooms'][0]['grid'])
+    front, back = grid[grid[:, 1] < 1.5, 2], grid[grid[:, 1] > 4.5, 2]
+    assert front.mean() > 3 * back.mean()
+    assert (grid[:, 0] >= 0.5).all() and (grid[:, 0] <= 3.5).all()      # 0.5 m edge band
+
+    wider = dg.building_daylight(_room(window_w=3.5))['rooms'][0]
+    assert wider['pct_area_above_threshold'] > west['pct_area_above_threshold']
+    assert wider['mean_df_pct'] > west['mean_df_pct']
+
+
+def test_occlusion_against_walls():
+    b = _room(fin=True)
+    open_ = dg.building_daylight(b)['rooms'][0]
+    blocked = dg.building_daylight(b, occlusion=True, include_points=True)['rooms'][0]
+    assert blocked['mean_df_pct'] < open_['mean_df_pct']
+    grid = np.array(blocked['grid'])
+    behind = grid[grid[:, 1] > 2.0, 2]
+    # Behind the fin only the IRC is left.
+    assert np.allclose(behind, blocked['irc_pct'], atol=0.05)
+
+
+def test_storeys_in_parallel_match_serial():
+    b = Building.from_params(name='Tower', area_m2=1500, stories=5, units=1, bedrooms=8)
+    serial = dg.building_daylight(b, workers=1, occlusion=True)
+    parallel = dg.building_daylight(b, workers=4, occlusion=True)
+    assert serial['rooms'] == parallel['rooms']
+    assert serial['summary']['rooms'] == sum(len(s.spaces) for s in b.storeys)
+    with pytest.raises(ValueError):
+        dg.building_daylight(b, reflectance=1.0)
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_grid_route(client):
+    r = client.post('/api/arch/daylight/grid', json={'bim': _room().to_dict(), 'grid_m': 0.5})
+    assert r.status_code == 200
+    out = r.get_json()
+    assert [room['space_id'] for room in out['rooms']] == ['west', 'east']
+    assert out['summary']['habitable_failing'][-1] == 'east'
+    r = client.post('/api/arch/daylight/grid', json={'area_m2': 120, 'stories': 2,
+                                                      'occlusion': True})
+    assert r.status_code == 200 and r.get_json()['summary']['rooms'] > 0
+    assert client.post('/api/arch/daylight/grid', json={'area_m2': 120,
+                                                         'grid_m': 0}).status_code == 400
+    for bad in ({'T_glass': 'nan'}, {'frame_factor': 1.5}, {'maintenance_factor': 0},
+                {'threshold_pct': 'nan'}, {'threshold_pct': -1}, {'avg_reflectance': 'nan'}):
+        r = client.post('/api/arch/daylight/grid', json={'area_m2': 120, **bad})
+        assert r.status_code == 400, bad
@@ -0,0 +1,128 @@
+"""Pooled SQLite layer and decoded-project cache (eims_modules/db.py)."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_db_test_'))
+
+from eims_modules import db  # noqa: E402
+
+
+@pytest.fixture
+def pool(tmp_path):
+    p = db.ConnectionPool(str(tmp_path / 't.db'))
+    conn = p.connect()
+    conn.execute('CREATE TABLE t (k TEXT PRIMARY KEY, v INTEGER)')
+    conn.commit()
+    conn.close()
+    return p
+
+
+def test_connections_are_reused_and_tuned(pool):
+    for _ in range(5):
+        conn = pool.connect()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        conn.close()
+    assert pool.opened == 1 and pool.reused >= 5
+
+
+def test_nested_connections_do_not_share_transactions(pool):
+    outer = pool.connect()
+    outer.execute("INSERT INTO t VALUES ('a', 1)")
+    inner = pool.connect()
+    assert inner.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    inner.close()
+    outer.commit()
+    outer.close()
+    assert pool.opened == 2
+
+    conn = pool.connect()
+    assert conn.execute('SELECT v FROM t').fetchone()['v'] == 1
+    conn.close()
+
+
+def test_close_rolls_back_and_resets_handle(pool):
+    conn = pool.connect()
+    conn.row_factory = None
+    conn.execute("INSERT INTO t VALUES ('b', 2)")
+    conn.close()
+    conn.close()  # idempotent
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+
+    again = pool.connect()
+    assert again.execute('SELECT COUNT(*) AS n FROM t').fetchone()['n'] == 0
+    again.close()
+
+
+def test_each_thread_gets_its_own_connection(pool):
+    seen = []
+
+    def work():
+        conn = pool.connect()
+        seen.append(id(conn._conn))
+        conn.execute('SELECT 1').fetchone()
+        conn.close()
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.opened == 4 and len(set(seen)) == 3
+
+
+def test_project_cache_lru_and_versions():
+    cache = db.ProjectCache(maxsize=2)
+    cache.put('a', 1, {'phases': {'p': [1, 2]}})
+    hit = cache.get('a', 1)
+    hit['phases']['p'].append(3)
+    assert cache.get('a', 1) == {'phases': {'p': [1, 2]}}  # callers get copies
+    assert cache.get('a', 2) is None
+
+    cache.put('b', 1, {})
+    cache.get('a', 1)
+    cache.put('c', 1, {})  # evicts 'b', the least recently used
+    assert cache.get('b', 1) is None and cache.get('a', 1) is not None
+    cache.invalidate('a')
+    assert cache.get('a', 1) is None
+
+
+def test_app_project_loads_are_cached_and_see_writes():
+    import app_professional as ap
+    client = ap.app.test_client()
+    pid = client.post('/api/projects', json={'name': 'Cache', 'area': 120}).get_json()['project_id']
+
+    first = ap._load_project(pid)
+    hits = ap.PROJECT_CACHE.hits
+    first['name'] = 'mutated by caller'
+    assert ap._load_project(pid)['name'] == 'Cache'
+    assert ap.PROJECT_CACHE.hits == hits + 1
+
+    # A raw write (as from another process) changes updated_at and is seen.
+    conn = sqlite3.connect(ap.DB_PATH)
+    data = json.loads(conn.execute('SELECT data_json FROM projects WHERE id = ?', (pid,)).fetchone()[0])
+    data['name'] = 'Renamed'
+    conn.execute("UPDATE projects SET data_json = ?, updated_at = '2099-01-01' WHERE id = ?",
+                 (json.dumps(data), pid))
+    conn.commit()
+    conn.close()
+    project = ap._load_project(pid)
+    assert project['name'] == 'Renamed'
+
+    with ap.app.test_request_context():
+        project['area'] = 999
+        ap._save_project(project)
+    assert ap._load_project(pid)['area'] == 999
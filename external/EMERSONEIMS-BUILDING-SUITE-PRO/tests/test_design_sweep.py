@@ -0,0 +1,159 @@
+"""Design-variant sweep: expansion, per-variant chain, memoisation, Pareto front."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_sweep_test_'))
+
+from concurrent.futures.process import BrokenProcessPool  # noqa: E402
+
+from eims_modules import design_sweep as ds  # noqa: E402
+
+_SPEC = {'axes': {'bedrooms': [2, 3], 'stories': [1, 2]}}
+
+
+def test_grid_and_latin_hypercube_expansion():
+    grid = ds.expand({'axes': {'bedrooms': [2, 3], 'stories': {'min': 1, 'max': 3, 'step': 1},
+                               'wall_system': ['masonry_200', 'timber_frame']},
+                      'base': {'area_m2': 180}})
+    assert len(grid) == 12 and len({v['id'] for v in grid}) == 12
+    assert {v['stories'] for v in grid} == {1, 2, 3} and all(v['area_m2'] == 180 for v in grid)
+
+    lhs = ds.expand({'axes': {'area_m2': {'min': 100, 'max': 500}}, 'method': 'lhs',
+                     'samples': 10, 'seed': 3})
+    # One draw per stratum of width 40 m2.
+    assert sorted(int((v['area_m2'] - 100) // 40) for v in lhs) == list(range(10))
+    assert lhs == ds.expand({'axes': {'area_m2': {'min': 100, 'max': 500}}, 'method': 'lhs',
+                             'samples': 10, 'seed': 3})
+    with pytest.raises(ValueError):
+        ds.expand({'axes': {'colour': ['red']}})
+    with pytest.raises(ValueError):
+        ds.expand({'axes': {'area_m2': {'min': 100, 'max': 100000, 'step': 1}}})
+
+
+def test_variant_metrics_follow_the_options():
+    base = {'area_m2': 200, 'bedrooms': 3, 'stories': 2}
+    masonry = ds.evaluate({**base, 'wall_system': 'masonry_200'})
+    brick = ds.evaluate({**base, 'wall_system': 'brick_230'})
+    assert brick['cost_per_m2'] > masonry['cost_per_m2']
+    assert brick['carbon_kg_per_m2'] > masonry['carbon_kg_per_m2']
+    assert masonry['gifa_m2'] == pytest.approx(200, rel=0.05)
+    assert masonry['cost_limit'] > masonry['works_cost'] > 0
+
+    raft = ds.evaluate({**base, 'foundation': 'raft'})
+    assert raft['foundation_type'] == 'RAFT' and raft['concrete_m3'] > masonry['concrete_m3']
+    cheap = ds.evaluate({**base, 'wall_system': 'mud'},
+                        wall_systems={'mud': {**ds.WALL_SYSTEMS['masonry_200'], 'rate_kes_m2': 100}})
+    assert cheap['cost_per_m2'] < masonry['cost_per_m2']
+    with pytest.raises(ValueError):
+        ds.evaluate({**base, 'wall_system': 'mud'})
+    with pytest.raises(ValueError, match='currency'):
+        ds.evaluate(base, currency='XYZ')
+    assert set(masonry) == set(ds.COLUMNS)
+    assert all(isinstance(masonry[m], (int, float)) for m in ds.METRICS)
+
+
+def test_shared_sub_results_are_memoised():
+    ds._geometry.cache_clear(), ds._frame.cache_clear(), ds._foundation.cache_clear()
+    variants = ds.expand({'axes': {'wall_system': list(ds.WALL_SYSTEMS),
+                                   'foundation': ['strip', 'pad']}})
+    rows = list(ds.sweep(variants, processes=1))
+    assert len(rows) == 8 and not any('error' in r for r in rows)
+    info = ds.cache_info()
+    assert info['geometry']['misses'] == 1 and info['geometry']['hits'] == 7
+    assert info['frame']['misses'] == 1 and info['foundation']['misses'] == 2
+
+
+_POOL_SCRIPT = r'''
+import json, sys
+from eims_modules import design_sweep as ds
+
+if __name__ == '__main__':
+    spec = json.loads(sys.argv[1])
+    pooled = [list(ds.sweep(ds.expand(spec), processes=2)) for _ in range(2)]
+    print(json.dumps({'rows': pooled, 'pools': len(ds._pools),
+                      'parent_misses': ds.cache_info()['geometry']['misses']}))
+'''
+
+
+def test_sweep_runs_in_a_real_process_pool_from_a_main_script(tmp_path):
+    """Spawned workers re-import the __main__ script; behind its main guard
+    the groups are evaluated in the workers, and the pool is reused."""
+    script = tmp_path / 'sweep.py'
+    script.write_text(_POOL_SCRIPT)
+    env = {**os.environ, 'PYTHONPATH': ROOT, 'EIMS_UPLOAD_FOLDER': str(tmp_path)}
+    out = subprocess.run([sys.executable, str(script), json.dumps(_SPEC)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr[-2000:]
+    got = json.loads(out.stdout.strip().splitlines()[-1])
+    assert 'broke' not in out.stderr
+    assert got['pools'] == 1 and got['parent_misses'] == 0        # evaluated in the workers
+    local = sorted(json.dumps(r, sort_keys=True) for r in ds.sweep(ds.expand(_SPEC), processes=1))
+    for rows in got['rows']:
+        assert sorted(json.dumps(r, sort_keys=True) for r in rows) == local
+
+
+class _BrokenPool:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool('worker died')
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+def test_broken_pool_falls_back_in_process(monkeypatch):
+    broken = _BrokenPool()
+    monkeypatch.setitem(ds._pools, 2, broken)
+    rows = list(ds.sweep(ds.expand(_SPEC), processes=2))
+    assert len(rows) == 4 and not any('error' in r for r in rows)
+    assert ds._pools.get(2) is not broken
+
+
+def test_pareto_front():
+    rows = [{'id': 'a', 'cost': 1, 'co2': 5}, {'id': 'b', 'cost': 2, 'co2': 2},
+            {'id': 'c', 'cost': 3, 'co2': 3}, {'id': 'd', 'cost': 5, 'co2': 1},
+            {'id': 'e', 'cost': 2, 'co2': 2}, {'id': 'x', 'error': 'bad'}]
+    assert ds.pareto(rows, ['cost', 'co2']) == ['a', 'b', 'd', 'e']
+    assert ds.pareto(rows, ['cost', '-co2']) == ['a']
+    assert [r['id'] for r in ds.table(rows, 'co2')] == ['d', 'b', 'e', 'c', 'a', 'x']
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_sweep_route_streams_ndjson(client):
+    spec = {'axes': {'stories': [1, 2], 'wall_system': ['masonry_200', 'timber_frame']},
+            'base': {'area_m2': 150}}
+    r = client.post('/api/design/sweep', json=spec)
+    assert r.status_code == 200 and r.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert [x['type'] for x in records] == ['start'] + ['variant'] * 4 + ['summary']
+    summary = records[-1]
+    assert summary['pareto'] and set(summary['pareto']) <= {x['id'] for x in records[1:-1]}
+    costs = [row['cost_per_m2'] for row in summary['table']]
+    assert costs == sorted(costs)
+
+    r = client.post('/api/design/sweep', json={**spec, 'stream': False})
+    assert r.status_code == 200 and len(r.get_json()['rows']) == 4
+    assert client.post('/api/design/sweep', json={'axes': {'colour': [1]}}).status_code == 400
+    for bad in ({'sort_by': 'nope'}, {'objectives': ['cost_per_m2', '-colour']},
+                {'objectives': 'cost_per_m2'}, {'currency': 'XYZ'}):
+        for stream in (True, False):
+            r = client.post('/api/design/sweep', json={**spec, **bad, 'stream': stream})
+            assert r.status_code == 400, bad
+    nan = client.post('/api/design/sweep', json={'axes': {'area_m2': [float('nan')]}, 'stream': False})
+    assert nan.status_code == 400 and 'finite' in nan.get_json()['error']
@@ -0,0 +1,87 @@
+"""Drawing IR: one plan description, SVG and direct-to-PDF backends."""
+
+from __future__ import annotations
+
+import collections
+import io
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_drawing_ir_test_'))
+
+from eims_modules import drawing_ir  # noqa: E402
+from eims_modules.bim_model import Building  # noqa: E402
+from eims_modules.bim_renderer import floor_plan_ir, floor_plan_svg  # noqa: E402
+from eims_modules.bim_sheets import build_sheet_pack_pdf, default_sheet_pack  # noqa: E402
+
+
+def _building(stories=2):
+    return Building.from_params(name='IR Test', area_m2=150 * stories, stories=stories, units=2)
+
+
+def test_svg_keeps_element_ids_for_hit_testing():
+    b = _building()
+    storey = b.storeys[0]
+    svg = floor_plan_svg(b, storey_index=0)
+    ids = set(re.findall(r'data-element-id="([^"]+)"', svg))
+    assert {w.id for w in storey.walls} <= ids
+    assert {o.id for o in storey.openings} <= ids
+    assert f'data-bim-storey="{storey.id}"' in svg
+    assert 'Storey 9 out of range' in floor_plan_svg(b, storey_index=9)
+
+
+def test_svg_is_a_serialisation_of_the_ir():
+    b = _building()
+    d = floor_plan_ir(b, storey_index=0)
+    svg = drawing_ir.to_svg(d)
+    assert svg == floor_plan_svg(b, storey_index=0)
+    kinds = collections.Counter(type(it).__name__ for it in d.items)
+    assert kinds['Arc'] == sum(o.kind == 'door' for o in b.storeys[0].openings) > 0
+    assert svg.count('<line ') == kinds['Line']
+    assert svg.count('<polygon ') == kinds['Polygon']
+    assert svg.count('<circle ') == kinds['Circle']
+    assert svg.count('<text ') == kinds['Text']
+    assert svg.count('<path ') == kinds['Arc']
+
+
+def test_class_styles_merge_like_css():
+    st = drawing_ir.resolve({'a': drawing_ir.Style(fill='#111', font_size=10),
+                             'b': drawing_ir.Style(fill='#222')}, 'a b')
+    assert st.fill == '#222' and st.font_size == 10
+
+
+def test_sheet_pack_pdf_draws_plans_without_svglib(monkeypatch):
+    import svglib.svglib
+
+    def _fail(*a, **k):
+        raise AssertionError('plan views must not go through svg2rlg')
+    monkeypatch.setattr(svglib.svglib, 'svg2rlg', _fail)
+
+    pack = default_sheet_pack(_building(3))
+    plans = [v for s in pack.sheets for v in s.views if v.kind == 'plan']
+    assert len(plans) == 3 and all('drawing' in v.data for v in plans)
+    # The cover key plan is the ground-floor IR, not a second render.
+    assert pack.sheets[0].views[0].data['key_plan'] is plans[0].data['drawing']
+
+    pdf = build_sheet_pack_pdf(pack)
+    assert pdf.startswith(b'%PDF')
+    assert len(re.findall(rb'/Type /Page\b', pdf)) == len(pack.sheets)
+    assert all(v.scale_denom for v in plans)
+
+
+def test_legacy_svg_plan_views_still_render():
+    from reportlab.pdfgen import canvas
+
+    from eims_modules.bim_sheets import View, _draw_plan_view
+
+    b = _building(1)
+    v = View(name='Legacy', kind='plan', bbox_mm=(8, 8, 400, 300),
+             data={'svg': floor_plan_svg(b), 'building_w_m': 10, 'building_d_m': 10})
+    c = canvas.Canvas(io.BytesIO())
+    _draw_plan_view(c, v, 420)
+    assert v.scale_denom
@@ -0,0 +1,117 @@
+"""Sparse frame backend vs the reference dense solver, load cases and combinations."""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_frame_test_'))
+
+from eims_modules.frame_analysis import analyze  # noqa: E402
+
+
+def portal_frame(storeys, bays, shuffle=False):
+    """Fixed-base multi-bay frame with G, Q and W load cases."""
+    nodes = [{'id': f'N{s}.{b}', 'x': 6.0 * b, 'y': 3.5 * s}
+             for s in range(storeys + 1) for b in range(bays + 1)]
+    if shuffle:
+        random.Random(4).shuffle(nodes)
+    members = []
+    for s in range(1, storeys + 1):
+        members += [{'id': f'C{s}.{b}', 'i': f'N{s - 1}.{b}', 'j': f'N{s}.{b}',
+                     'E': 30e9, 'A': 0.16, 'I': 2.1e-3} for b in range(bays + 1)]
+        members += [{'id': f'B{s}.{b}', 'i': f'N{s}.{b}', 'j': f'N{s}.{b + 1}',
+                     'E': 30e9, 'A': 0.12, 'I': 1.6e-3} for b in range(bays)]
+    beams = [m['id'] for m in members if m['id'].startswith('B')]
+    return {
+        'nodes': nodes, 'members': members,
+        'supports': [{'node': f'N0.{b}', 'ux': True, 'uy': True, 'rz': True}
+                     for b in range(bays + 1)],
+        'load_cases': {
+            'G': {'member_loads': [{'member': b, 'w': -25e3} for b in beams]},
+            'Q': {'member_loads': [{'member': b, 'w': -10e3} for b in beams]},
+            'W': {'loads': [{'node': f'N{s}.0', 'Fx': 8e3 * s} for s in range(1, storeys + 1)]},
+        },
+        'combinations': {'ULS-1': {'G': 1.35, 'Q': 1.5},
+                         'ULS-2': {'G': 1.35, 'Q': 1.05, 'W': 1.5}},
+    }
+
+
+def _close(a, b, tol=1e-3):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k], tol) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_close(x, y, tol) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return abs(a - b) <= tol * max(1.0, abs(b))
+    return a == b
+
+
+def test_sparse_backend_matches_reference_solver():
+    model = portal_frame(5, 3)
+    fast = analyze(**model)
+    ref = analyze(**model, backend='python')
+    assert fast['success'] and ref['success']
+    assert fast['solver']['backend'] == 'sparse' and fast['solver']['load_vectors'] == 6
+    for key in ('load_cases', 'combinations'):
+        assert _close(fast[key], ref[key])
+    # Static check: total base shear balances the applied wind.
+    wind = fast['load_cases']['W']['reactions']
+    assert abs(sum(r['Rx_kN'] for r in wind.values()) + 8 * sum(range(1, 6))) < 1e-3
+
+
+def test_combinations_are_factored_sums_of_cases():
+    r = analyze(**portal_frame(4, 2))
+    cases, combo = r['load_cases'], r['combinations']['ULS-2']
+    assert combo['factors'] == {'G': 1.35, 'Q': 1.05, 'W': 1.5}
+    for node, d in combo['displacements'].items():
+        expect = sum(f * cases[c]['displacements'][node]['ux_mm'] for c, f in combo['factors'].items())
+        assert abs(d['ux_mm'] - expect) < 1e-3
+
+
+def test_node_numbering_does_not_change_results():
+    ordered = analyze(**portal_frame(12, 4))
+    shuffled = analyze(**portal_frame(12, 4, shuffle=True))
+    assert shuffled['solver']['ordering'] == 'reverse Cuthill-McKee'
+    assert shuffled['solver']['bandwidth'] <= 3 * ordered['solver']['bandwidth']
+    assert _close(shuffled['combinations'], ordered['combinations'])
+
+
+def test_mechanisms_and_bad_combinations_are_rejected():
+    model = portal_frame(1, 1)
+    bad = analyze(**{**model, 'combinations': {'X': {'G': 1.0, 'S': 1.5}}})
+    assert not bad['success'] and "'S'" in bad['error']
+    for combinations in ({'X': {}}, {'X': {'': 1.0}}, {'X': {'G': 'heavy'}}):
+        bad = analyze(**{**model, 'combinations': combinations})
+        assert not bad['success'] and 'X' in bad['error']
+    blank = analyze(**{**model, 'load_cases': {**model['load_cases'], '': {'loads': []}}})
+    assert not blank['success'] and 'empty' in blank['error']
+
+    chain = analyze(nodes=[{'id': 'A', 'x': 0, 'y': 0}, {'id': 'B', 'x': 1, 'y': 0},
+                           {'id': 'C', 'x': 2, 'y': 0}],
+                    members=[{'id': '1', 'i': 'A', 'j': 'B', 'E': 1e9, 'A': 1e-3, 'I': 1e-5},
+                             {'id': '2', 'i': 'B', 'j': 'C', 'E': 1e9, 'A': 1e-3, 'I': 1e-5}],
+                    supports=[{'node': 'A', 'ux': True}], loads=[{'node': 'C', 'Fy': -1}])
+    assert not chain['success'] and 'singular' in chain['error']
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_frame_endpoint_load_combinations(client):
+    body = client.post('/api/eng/frame/analyze', json=portal_frame(3, 2)).get_json()
+    assert body['success']
+    assert set(body['combinations']) == {'ULS-1', 'ULS-2'}
+    uls = body['combinations']['ULS-1']['reactions']
+    assert sum(r['Ry_kN'] for r in uls.values()) == pytest.approx((1.35 * 25 + 1.5 * 10) * 12 * 3, rel=1e-4)
@@ -0,0 +1,155 @@
+"""Binary glTF export: unit primitives, instancing, quantisation and routes."""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_gltf_test_'))
+
+from eims_modules import gltf_writer as gw  # noqa: E402
+from eims_modules.bim_model import Building  # noqa: E402
+from eims_modules.bim_three import building_to_glb, building_to_three  # noqa: E402
+
+_DTYPES = {5126: np.float32, 5122: np.int16, 5123: np.uint16}
+_WIDTH = {'SCALAR': 1, 'VEC3': 3, 'VEC4': 4}
+_NORM = {5122: 32767.0, 5123: 65535.0}
+
+
+def _parse(blob: bytes):
+    magic, version, length = struct.unpack_from('<III', blob, 0)
+    assert (magic, version, length) == (gw.GLB_MAGIC, 2, len(blob))
+    json_len, json_type = struct.unpack_from('<II', blob, 12)
+    gltf = json.loads(blob[20:20 + json_len])
+    bin_len, bin_type = struct.unpack_from('<II', blob, 20 + json_len)
+    assert json_type == 0x4E4F534A and bin_type == 0x004E4942
+    assert bin_len == gltf['buffers'][0]['byteLength'] and bin_len % 4 == 0
+    return gltf, blob[28 + json_len:]
+
+
+def _accessor(gltf, buf, i):
+    a = gltf['accessors'][i]
+    v = gltf['bufferViews'][a['bufferView']]
+    dtype = np.dtype(_DTYPES[a['componentType']])
+    width = _WIDTH[a['type']]
+    stride = v.get('byteStride', dtype.itemsize * width)
+    start = v['byteOffset'] + a.get('byteOffset', 0)
+    assert start + stride * (a['count'] - 1) + dtype.itemsize * width <= \
+        v['byteOffset'] + v['byteLength']
+    out = np.ndarray((a['count'], width), dtype, buffer=buf, offset=start,
+                     strides=(stride, dtype.itemsize)).astype(float)
+    return out / _NORM[a['componentType']] if a.get('normalized') else out
+
+
+def _instances(blob: bytes):
+    """{id: (mesh, translation, scale, rotation)} in world units."""
+    gltf, buf = _parse(blob)
+    out = {}
+    for node in gltf['nodes']:
+        ext = node.get('extensions', {}).get('EXT_mesh_gpu_instancing')
+        if not ext:
+            out[node['name']] = (node['mesh'], np.array(node['translation']),
+                                 np.array(node['scale']),
+                                 np.array(node.get('rotation', [0, 0, 0, 1])))
+            continue
+        attrs = ext['attributes']
+        t = _accessor(gltf, buf, attrs['TRANSLATION'])
+        s = _accessor(gltf, buf, attrs['SCALE'])
+        q = (_accessor(gltf, buf, attrs['ROTATION']) if 'ROTATION' in attrs
+             else np.tile([0.0, 0.0, 0.0, 1.0], (len(t), 1)))
+        origin = np.array(node.get('translation', [0, 0, 0]))
+        extent = np.array(node.get('scale', [1, 1, 1]))
+        for k, id_ in enumerate(node['extras']['ids']):
+            out[id_] = (node['mesh'], origin + extent * t[k], extent * s[k], q[k])
+    return gltf, out
+
+
+def test_unit_primitives_face_outwards_and_fill_the_unit_cube():
+    for kind in gw.PRIMITIVES:
+        pos, nrm, idx = gw.unit_mesh(kind)
+        a, b, c = (pos[idx.reshape(-1, 3)[:, k]] for k in range(3))
+        facing = np.einsum('ij,ij->i', np.cross(b - a, c - a), nrm[idx.reshape(-1, 3)].mean(1))
+        assert (facing > 0).all(), kind
+        assert np.allclose(pos.max(0), 0.5, atol=1e-6), kind
+
+
+@pytest.mark.parametrize('options', [{}, {'quantize': False},
+                                     {'instancing': False, 'quantize': False}])
+def test_building_round_trips_through_instanced_glb(options):
+    b = Building.from_params(name='Glb', area_m2=2400, stories=6, units=2, bedrooms=6)
+    objects = {o['bim_element_id']: o for o in building_to_three(b)['model']['objects']}
+    gltf, instances = _instances(building_to_glb(b, **options).to_bytes())
+
+    assert instances.keys() == objects.keys()
+    assert len(gltf['meshes']) < 10 and gltf['asset']['extras']['objects'] == len(objects)
+    tolerance = 1e-3 if options.get('quantize', True) else 1e-5
+    for id_, (_, t, s, q) in instances.items():
+        o = objects[id_]
+        assert np.allclose(t, o['position'], atol=tolerance)
+        assert np.allclose(s, o['size'], atol=tolerance)
+        yaw = gw.euler_to_quat(0, o.get('rotation', {}).get('y', 0), 0)[0]
+        assert np.allclose(abs(np.dot(q, yaw)), 1.0, atol=1e-4)
+    if options.get('instancing', True):
+        assert 'EXT_mesh_gpu_instancing' in gltf['extensionsRequired']
+        assert len(gltf['nodes']) == len(gltf['meshes'])
+    else:
+        assert 'extensionsUsed' not in gltf and len(gltf['nodes']) == len(objects)
+
+
+def test_legacy_object_schemas_and_colours():
+    objects = [
+        {'type': 'cylinder', 'name': 'col', 'position': [1, 2, 3], 'radius': 0.2,
+         'height': 3.0, 'color': '#ffffff'},
+        {'type': 'sphere', 'name': 'knob', 'position': [0, 1, 0], 'size': [0.03],
+         'color': 0x000000},
+        {'type': 'box', 'name': 'vault', 'position': [0, 5, 0], 'size': [4, 0.1, 1],
+         'rotation': [0.4, 0, 0], 'color': '#808080'},        # addMesh ignores lists
+        {'type': 'hemisphere', 'name': 'dome', 'position': [0, 9, 0], 'size': [4, 2, 6],
+         'rotation': {'x': 90}, 'color': '#808080', 'transparent': True},
+        {'name': 'no-geometry', 'position': [0, 0, 0]},
+    ]
+    gltf, instances = _instances(gw.objects_to_glb(objects).to_bytes())
+    assert sorted(instances) == ['col', 'dome', 'knob', 'vault']
+    assert np.allclose(instances['col'][2], [0.4, 3.0, 0.4], atol=1e-3)
+    assert np.allclose(instances['knob'][2], 0.03, atol=1e-3)
+    assert np.allclose(instances['vault'][3], [0, 0, 0, 1])
+    assert np.allclose(instances['dome'][2], 6.0, atol=1e-3)
+    assert np.allclose(instances['dome'][3], [np.sqrt(0.5), 0, 0, np.sqrt(0.5)], atol=1e-4)
+    factors = sorted(m['pbrMetallicRoughness']['baseColorFactor'] for m in gltf['materials'])
+    assert factors[0] == [0.0, 0.0, 0.0, 1.0] and factors[-1] == [1.0, 1.0, 1.0, 1.0]
+    assert [0.2159, 0.2159, 0.2159, 0.35] in factors         # sRGB #808080, linearised
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_glb_routes(client):
+    body = {'area_m2': 900, 'stories': 3, 'units': 2, 'format': 'glb'}
+    r = client.post('/api/bim/3d-model', json=body)
+    assert r.status_code == 200 and r.mimetype == 'model/gltf-binary'
+    _, instances = _instances(r.get_data())
+    assert len(instances) == client.post('/api/bim/3d-model', json={
+        **body, 'format': None}).get_json()['stats']['objects']
+    again = client.post('/api/bim/3d-model', json=body,
+                        headers={'If-None-Match': r.headers['ETag']})
+    assert again.status_code == 304
+
+    body = {'area': 600, 'stories': 3, 'units': 2}
+    objects = client.post('/api/drawings/3d-model', json=body).get_json()['model']['objects']
+    r = client.post('/api/drawings/3d-model', json={**body, 'format': 'glb'})
+    assert r.status_code == 200 and int(r.headers['Content-Length']) == len(r.get_data())
+    gltf, instances = _instances(r.get_data())
+    assert len(instances) == len(objects) and gltf['asset']['extras']['stats']['stories'] == 3
@@ -0,0 +1,188 @@
+"""Background export jobs: progress, deduplication, expiry and async endpoints."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_jobs_test_'))
+
+from eims_modules import jobs  # noqa: E402
+
+
+def staged_job(params, progress):
+    for i in range(params['stages']):
+        progress(100 * i / params['stages'], f'stage {i}')
+        time.sleep(params.get('sleep', 0))
+    return {'stages': params['stages']}
+
+
+def failing_job(params, progress):
+    progress(10, 'about to fail')
+    raise ValueError('boom')
+
+
+def test_job_runs_in_worker_process_and_reports_progress():
+    job = jobs.submit('test-staged', staged_job, {'stages': 4}, mimetype='application/json')
+    assert job['status'] in ('queued', 'running') and not job['deduplicated']
+    done = jobs.wait(job['job_id'])
+    assert done['status'] == 'done' and done['progress'] == 100.0
+    data, mimetype, _ = jobs.result(job['job_id'])
+    assert mimetype == 'application/json' and data == b'{"stages": 4}'
+
+
+def test_identical_submissions_share_one_job():
+    params = {'stages': 3, 'sleep': 0.2}
+    first = jobs.submit('test-staged', staged_job, params, cpu=False)
+    second = jobs.submit('test-staged', staged_job, params, cpu=False)
+    assert second['deduplicated'] and second['job_id'] == first['job_id']
+    seen = set()
+    while (job := jobs.status(first['job_id']))['status'] not in ('done', 'failed'):
+        seen.add(job['stage'])
+        time.sleep(0.02)
+    assert {'stage 1', 'stage 2'} & seen
+    # Once done (and unexpired) the result is reused too.
+    assert jobs.submit('test-staged', staged_job, params, cpu=False)['job_id'] == first['job_id']
+
+
+def test_failures_are_recorded_and_results_expire(monkeypatch):
+    job = jobs.wait(jobs.submit('test-fail', failing_job, {}, cpu=False)['job_id'])
+    assert job['status'] == 'failed' and job['error'] == 'boom'
+    assert jobs.result(job['job_id']) is None
+
+    monkeypatch.setattr(jobs, 'JOB_TTL_S', -1.0)
+    done = jobs.wait(jobs.submit('test-staged', staged_job, {'stages': 1, 'x': 'expire'},
+                                 cpu=False)['job_id'])
+    assert done['status'] == 'done'
+    assert jobs.expire() >= 1
+    assert jobs.status(done['job_id']) is None
+    assert not os.path.exists(jobs._result_path(done['job_id']))
+
+
+def _foreign_job(instance, heartbeat_age):
+    """A running job owned by another server instance last seen ``heartbeat_age`` s ago."""
+    jobs._ensure_store()
+    job_id = f'foreign-{instance}'
+    conn = jobs._conn()
+    try:
+        conn.execute('INSERT OR REPLACE INTO instances (id, pid, heartbeat) VALUES (?, ?, ?)',
+                     (instance, 1, time.time() - heartbeat_age))
+        conn.execute("INSERT INTO jobs (id, kind, dedupe_key, status, mimetype, owner, instance, "
+                     "user_id, created_at) VALUES (?, 'x', ?, 'running', 'text/plain', 1, ?, 'u', ?)",
+                     (job_id, job_id, instance, time.time()))
+        conn.commit()
+    finally:
+        conn.close()
+    return job_id
+
+
+def test_only_jobs_of_stopped_instances_are_failed():
+    live = _foreign_job('live-worker', 0)
+    gone = _foreign_job('gone-worker', jobs.STALE_AFTER * jobs.HEARTBEAT_S + 1)
+    jobs.expire()
+    assert jobs.status(live)['status'] == 'running'
+    assert jobs.status(gone)['status'] == 'failed'
+    assert jobs.status(gone)['error'] == 'interrupted by restart'
+
+
+def test_jobs_are_private_to_their_user():
+    job = jobs.submit('test-staged', staged_job, {'stages': 1, 'x': 'private'}, cpu=False, user='alice')
+    jobs.wait(job['job_id'])
+    assert jobs.status(job['job_id'], 'bob') is None and jobs.result(job['job_id'], 'bob') is None
+    assert jobs.result(job['job_id'], 'alice')[0] == b'{"stages": 1}'
+    again = jobs.submit('test-staged', staged_job, {'stages': 1, 'x': 'private'}, cpu=False, user='bob')
+    assert not again['deduplicated'] and again['job_id'] != job['job_id']
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def _poll(client, url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        r = client.get(url)
+        if r.status_code != 202:
+            return r
+        time.sleep(0.1)
+    raise AssertionError(f'{url} still pending')
+
+
+def test_async_sheet_pack_pdf(client):
+    pid = client.post('/api/projects', json={'name': 'Jobs', 'area': 150,
+                                             'stories': 1}).get_json()['project_id']
+    r = client.get(f'/api/bim/sheet-pack/{pid}/pdf?async=1')
+    assert r.status_code == 202 and r.headers['Location'] == r.get_json()['status_url']
+    result = _poll(client, r.get_json()['result_url'])
+    assert result.status_code == 200 and result.mimetype == 'application/pdf'
+    assert result.get_data().startswith(b'%PDF')
+    status = client.get(r.get_json()['status_url']).get_json()
+    assert status['status'] == 'done' and status['progress'] == 100.0
+    other = {'X-EIMS-User': 'someone-else'}
+    assert client.get(r.get_json()['status_url'], headers=other).status_code == 404
+    assert client.get(r.get_json()['result_url'], headers=other).status_code == 404
+    assert client.get('/api/jobs/nope').status_code == 404
+
+
+def test_async_drawing_set_matches_sync(client):
+    body = {'area': 220, 'stories': 2, 'units': 1}
+    sync = client.post('/api/drawings/all', json=body).get_json()
+    r = client.post('/api/drawings/all', json={**body, 'async': True})
+    assert r.status_code == 202
+    assert _poll(client, r.get_json()['result_url']).get_json() == sync
+
+
+_POOL_SCRIPT = r'''
+import json, os, sys
+from eims_modules import jobs
+
+
+def pid_job(params, progress):
+    progress(50, 'in worker')
+    return {'pid': os.getpid()}
+
+
+if __name__ == '__main__':
+    job = jobs.submit('test-pool', pid_job, {'n': 1}, mimetype='application/json')
+    done = jobs.wait(job['job_id'], timeout=120)
+    data = jobs.result(job['job_id'])
+    print(json.dumps({'status': done['status'], 'error': done['error'], 'parent': os.getpid(),
+                      'worker': json.loads(data[0])['pid'] if data else None}))
+'''
+
+
+def test_job_runs_in_a_real_process_pool_from_a_main_script(tmp_path):
+    """Spawned workers re-import the __main__ script; behind its main guard
+    the job runs in a worker process rather than falling back in-thread."""
+    script = tmp_path / 'submit_job.py'
+    script.write_text(_POOL_SCRIPT)
+    env = {**os.environ, 'EIMS_JOB_PROCESSES': '1', 'PYTHONPATH': ROOT,
+           'EIMS_UPLOAD_FOLDER': str(tmp_path)}
+    out = subprocess.run([sys.executable, str(script)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr[-2000:]
+    got = json.loads(out.stdout.strip().splitlines()[-1])
+    assert got['status'] == 'done', got
+    assert got['worker'] != got['parent']
+    assert 'pool broke' not in out.stderr
+
+
+def test_production_runner_is_import_safe():
+    """run_production.py is re-imported by every spawned pool worker."""
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+    out = subprocess.run([sys.executable, '-c', 'import run_production, sys; '
+                          'print(sorted(m for m in ("app_professional", "waitress") if m in sys.modules))'],
+                         cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0 and out.stdout.strip() == '[]', out.stderr[-2000:]
@@ -0,0 +1,94 @@
+"""Lazy module registration: manifest vs eager URL map, first-hit loading, cold-start budget."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_lazy_test_'))
+
+from flask import Flask  # noqa: E402
+
+from eims_modules import lazy_routes, startup_profile  # noqa: E402
+
+# CI machines vary; the default leaves 2-3x headroom over a lazy cold start
+# here and sits well under the ~1.2 s eager one.
+COLD_START_BUDGET_MS = float(os.environ.get('EIMS_COLD_START_BUDGET_MS', '1000'))
+
+_URL_MAP = r'''
+import json, app_professional
+print(json.dumps(sorted([r.rule, r.endpoint, sorted(r.methods)]
+                        for r in app_professional.app.url_map.iter_rules())))
+'''
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_manifest_matches_the_eager_url_map(client):
+    env = {**os.environ, 'EIMS_LAZY_MODULES': '0'}
+    out = subprocess.run([sys.executable, '-c', _URL_MAP], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=300)
+    eager = json.loads(out.stdout.strip().splitlines()[-1])
+    lazy = sorted([r.rule, r.endpoint, sorted(r.methods)] for r in client.application.url_map.iter_rules())
+    assert lazy == eager, 'route_manifest.json is stale: run python -m eims_modules.lazy_routes --write'
+
+
+def test_first_hit_imports_the_module_and_swaps_in_the_real_view(client):
+    import app_professional
+    registry = app_professional._eims_modules
+    if not registry.lazy:
+        pytest.skip('EIMS_LAZY_MODULES=0')
+    status = registry.status()
+    assert status['risk_montecarlo']['mode'] == 'lazy'
+    assert status['audit_log']['mode'] == 'eager'                  # installs request hooks
+
+    r = client.get('/api/qs/risk/distributions')
+    assert r.status_code == 200
+    assert registry.status()['risk_montecarlo']['loaded']
+    view = client.application.view_functions['_dists']
+    assert not hasattr(view, 'eims_lazy_stub')
+    assert client.get('/api/qs/risk/distributions').get_json() == r.get_json()
+
+
+def test_registry_on_a_bare_app():
+    manifest = {'acoustics': [{k: v for k, v in route.items() if k != 'view'}
+                              for route in lazy_routes.record('acoustics', Flask('probe'))],
+                'no_such_module': [{'rule': '/api/nope', 'endpoint': 'nope', 'methods': ['GET']}]}
+    app = Flask('lazy')
+    registry = lazy_routes.Registry(app, manifest=manifest, lazy=True)
+    registry.register('acoustics', 'Acoustics')
+    registry.register('no_such_module', 'Missing')
+    registry.register('rate_limit', 'Rate-limit')                   # not in manifest -> eager
+    assert registry.status()['rate_limit']['mode'] == 'eager'
+    assert {r.rule for r in app.url_map.iter_rules()} >= {r['rule'] for r in manifest['acoustics']}
+
+    client = app.test_client()
+    rule = next(r for r in manifest['acoustics'] if r['methods'] == ['GET'])
+    assert client.get(rule['rule']).status_code == 200
+    assert registry.status()['acoustics']['loaded']
+    assert client.get('/api/nope').status_code == 503
+
+    with pytest.raises(lazy_routes.NotLazy):
+        lazy_routes.record('audit_log', Flask('probe'))
+
+
+def test_cold_start_budget():
+    result = startup_profile.cold_start(['/api/health'], runs=1)
+    assert result['heavy_at_import'] == []
+    assert result['requests'][0]['status'] == 200
+    assert result['ttfb_ms'] <= COLD_START_BUDGET_MS, (
+        f"cold start {result['ttfb_ms']:.0f} ms over the {COLD_START_BUDGET_MS:.0f} ms budget; "
+        f"profile with python -m eims_modules.startup_profile --tree")
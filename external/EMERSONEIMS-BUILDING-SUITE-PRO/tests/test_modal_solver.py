@@ -0,0 +1,113 @@
+"""Modal RSA eigensolvers, CQC/SRSS combination and batch spectra."""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_modal_test_'))
+
+from eims_modules import highrise  # noqa: E402
+
+FLAT = [(0.0, 0.4), (10.0, 0.4)]
+
+
+def uniform_omegas(n, m, k, modes):
+    """Closed-form circular frequencies of a uniform fixed-base shear building."""
+    return [2 * math.sqrt(k / m) * math.sin((2 * r - 1) * math.pi / (2 * (2 * n + 1)))
+            for r in range(1, modes + 1)]
+
+
+@pytest.mark.parametrize('solver', ['dense', 'lanczos'])
+def test_tall_building_matches_closed_form(solver):
+    n, m, k = 150, 400.0, 9.0e5
+    r = highrise.modal_response_spectrum(story_masses_t=[m] * n, story_stiffness_kNpm=[k] * n,
+                                         spectrum=FLAT, num_modes=12, solver=solver)
+    assert r['success'] and r['solver'] == solver and r['modes_returned'] == 12
+    got = [2 * math.pi / mode['period_s'] for mode in r['modes']]
+    assert got == pytest.approx(uniform_omegas(n, m, k, 12), rel=1e-3)
+    # Mass-normalised shapes, roof positive.
+    assert all(mode['shape'][-1] > 0 for mode in r['modes'])
+
+
+def test_auto_solver_picks_lanczos_only_for_a_few_modes_of_a_large_model():
+    K, M = highrise._shear_building([1.0] * 300, [100.0] * 300)
+    w2, phi, used = highrise.modal_eigen(K, M, num_modes=10)
+    assert used == 'lanczos' and phi.shape == (300, 10)
+    assert np.allclose(phi.T @ (M[:, None] * phi), np.eye(10), atol=1e-8)
+    assert highrise.modal_eigen(K, M, num_modes=200)[2] == 'dense'
+
+
+def test_cqc_reduces_to_srss_for_well_separated_modes():
+    r = highrise.modal_response_spectrum(story_masses_t=[10.0] * 3, story_stiffness_kNpm=[5000.0] * 3,
+                                         spectrum=[(0.0, 0.2), (0.3, 0.6), (2.0, 0.1)],
+                                         combination='CQC')
+    assert r['method'] == 'Modal Response Spectrum (CQC)'
+    assert r['base_shear_kN_cqc'] == pytest.approx(r['base_shear_kN_srss'], rel=0.02)
+    assert r['story_shear_envelope_kN'][0] == r['base_shear_kN_cqc']
+
+    rho = highrise.cqc_correlation(np.array([10.0, 10.5, 40.0]), 0.05)
+    assert np.allclose(np.diag(rho), 1.0) and np.allclose(rho, rho.T)
+    assert rho[0, 1] > 0.5 > 0.01 > rho[0, 2]
+
+
+def test_undamped_cqc_stays_finite_and_damping_is_range_checked():
+    rho = highrise.cqc_correlation(np.array([10.0, 10.5, 40.0]), 0.0)
+    assert np.isfinite(rho).all() and np.allclose(np.diag(rho), 1.0)
+    for bad in (0.0, -5.0, 100.0, float('nan')):
+        r = highrise.modal_response_spectrum(story_masses_t=[10.0] * 3, story_stiffness_kNpm=[5000.0] * 3,
+                                             spectrum=FLAT, damping_pct=bad)
+        assert not r['success'] and 'damping_pct' in r['error']
+
+
+def test_batch_matches_individual_runs():
+    masses = [300.0] * 40
+    dirs = {'X': [6.0e5] * 40, 'Y': [4.0e5] * 40}
+    spectra = {'DBE': [(0.0, 0.3), (0.5, 0.75), (4.0, 0.1)], 'MCE': [(0.0, 0.45), (0.5, 1.1), (4.0, 0.15)]}
+    batch = highrise.modal_response_spectrum(story_masses_t=masses, story_stiffness_kNpm=dirs,
+                                             spectra=spectra, num_modes=8)['batch']
+    for d, ks in dirs.items():
+        for name, spec in spectra.items():
+            one = highrise.modal_response_spectrum(story_masses_t=masses, story_stiffness_kNpm=ks,
+                                                   spectrum=spec, num_modes=8)
+            assert batch[d][name]['base_shear_kN_srss'] == one['base_shear_kN_srss']
+            assert batch[d][name]['story_shear_envelope_kN'] == one['story_shear_envelope_kN']
+    assert batch['Y']['MCE']['base_shear_kN_srss'] != batch['X']['MCE']['base_shear_kN_srss']
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_modal_endpoint_batch(client):
+    body = client.post('/api/highrise/modal-rsa', json={
+        'story_masses_t': [500] * 120,
+        'story_stiffness_kNpm': {'X': [1.2e6] * 120, 'Y': [0.9e6] * 120},
+        'spectra': {'SLE': FLAT, 'DBE': [(0, 0.8), (10, 0.8)]},
+        'num_modes': 15, 'combination': 'CQC',
+    }).get_json()
+    assert body['success'] and body['solver'] == 'lanczos'
+    assert set(body['batch']) == {'X', 'Y'} and set(body['batch']['X']) == {'SLE', 'DBE'}
+    assert body['batch']['X']['DBE']['base_shear_kN_cqc'] == pytest.approx(
+        2 * body['batch']['X']['SLE']['base_shear_kN_cqc'], rel=1e-4)
+
+
+def test_modal_endpoint_without_spectrum_is_not_a_server_error(client):
+    r = client.post('/api/highrise/modal-rsa', json={'story_masses_t': [10] * 3,
+                                                      'story_stiffness_kNpm': [5000] * 3})
+    assert r.status_code == 200 and r.get_json()['base_shear_kN_srss'] == 0
+    r = client.post('/api/highrise/modal-rsa', json={'story_masses_t': [10] * 3,
+                                                      'story_stiffness_kNpm': [5000] * 3,
+                                                      'spectrum': FLAT, 'damping_pct': 0})
+    assert r.status_code == 400
@@ -0,0 +1,133 @@
+"""Incremental phase executor.
+
+Covers the generic PhaseGraph (ordering, cycle detection, incremental
+recomputation, concurrency) and its wiring into /api/execute-all-phases.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_phase_test_'))
+
+from eims_modules.phase_graph import Phase, PhaseGraph  # noqa: E402
+
+
+def _diamond(calls):
+    def step(key):
+        def fn(inputs, deps):
+            calls.append(key)
+            return {'key': key, 'inputs': inputs, 'deps': sorted(deps)}
+        return fn
+    return PhaseGraph([
+        Phase('d', 'D', step('d'), deps=('b', 'c')),
+        Phase('b', 'B', step('b'), inputs=('x',), deps=('a',)),
+        Phase('c', 'C', step('c'), inputs=('y',), deps=('a',)),
+        Phase('a', 'A', step('a'), inputs=('site',)),
+    ])
+
+
+def test_topological_order_and_validation():
+    graph = _diamond([])
+    order = graph.order
+    assert order.index('a') < order.index('b') < order.index('d')
+    assert order.index('c') < order.index('d')
+
+    with pytest.raises(ValueError, match='cycle'):
+        PhaseGraph([Phase('p', 'P', lambda i, d: 1, deps=('q',)),
+                    Phase('q', 'Q', lambda i, d: 1, deps=('p',))])
+    with pytest.raises(ValueError, match='unknown'):
+        PhaseGraph([Phase('p', 'P', lambda i, d: 1, deps=('missing',))])
+    with pytest.raises(ValueError, match='duplicate'):
+        PhaseGraph([Phase('p', 'P', lambda i, d: 1), Phase('p', 'P', lambda i, d: 2)])
+
+
+def test_only_downstream_phases_recompute():
+    calls = []
+    graph = _diamond(calls)
+    inputs = {'site': 1, 'x': 2, 'y': 3}
+
+    first = graph.run(inputs)
+    assert sorted(first.recomputed) == ['a', 'b', 'c', 'd']
+
+    calls.clear()
+    again = graph.run(inputs, cached=first.phases)
+    assert again.recomputed == [] and calls == []
+    assert again.phases['d'] is first.phases['d']
+
+    changed = graph.run({**inputs, 'y': 4}, cached=first.phases)
+    assert changed.recomputed == ['c', 'd']
+    assert changed.phases['c']['data']['inputs'] == {'y': 4}
+    assert graph.stale({**inputs, 'site': 9}, changed.phases) == graph.order
+
+    forced = graph.run(inputs, cached=first.phases, force=True)
+    assert len(forced.recomputed) == 4
+
+
+def test_independent_phases_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_siblings(inputs, deps):
+        barrier.wait()  # deadlocks (and times out) unless all three run at once
+        return threading.get_ident()
+
+    graph = PhaseGraph([Phase(k, k, wait_for_siblings) for k in ('p', 'q', 'r')]
+                       + [Phase('s', 's', lambda i, d: len(set(d.values())), deps=('p', 'q', 'r'))])
+    run = graph.run({}, max_workers=3)
+    assert run.phases['s']['data'] == 3
+
+
+def test_phase_errors_propagate():
+    graph = PhaseGraph([Phase('p', 'P', lambda i, d: 1 / 0)])
+    with pytest.raises(ZeroDivisionError):
+        graph.run({})
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_execute_all_phases_is_incremental(client):
+    import app_professional
+
+    r = client.post('/api/projects', json={
+        'name': 'Phase graph test', 'location': 'Nairobi, Kenya',
+        'gps_lat': -1.29, 'gps_lng': 36.82, 'units': 2, 'stories': 2,
+        'area': 300, 'bedrooms': 3})
+    project_id = r.get_json()['project_id']
+
+    first = client.post('/api/execute-all-phases', json={'project_id': project_id}).get_json()
+    assert first['success'] and first['phases_completed'] == 13
+    assert len(first['phases_recomputed']) == 13
+    assert first['phases']['phase_7']['name'].startswith('BOQ (')
+
+    second = client.post('/api/execute-all-phases', json={'project_id': project_id}).get_json()
+    assert second['phases_recomputed'] == []
+    assert second['total_cost'] == first['total_cost']
+    assert second['currency'] == first['currency']
+
+    conn = app_professional.get_db()
+    data = json.loads(conn.execute('SELECT data_json FROM projects WHERE id = ?', (project_id,)).fetchone()[0])
+    data['bedrooms'] = 4
+    conn.execute('UPDATE projects SET data_json = ? WHERE id = ?', (json.dumps(data), project_id))
+    conn.commit()
+    conn.close()
+
+    third = client.post('/api/execute-all-phases', json={'project_id': project_id}).get_json()
+    assert third['phases_recomputed'] == ['phase_4', 'phase_5', 'phase_6', 'phase_7', 'phase_12', 'phase_13']
+    assert third['phases']['phase_1'] == first['phases']['phase_1']
+
+    forced = client.post('/api/execute-all-phases', json={'project_id': project_id, 'force': True}).get_json()
+    assert len(forced['phases_recomputed']) == 13
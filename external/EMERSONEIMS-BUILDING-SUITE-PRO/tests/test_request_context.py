@@ -0,0 +1,96 @@
+"""Request-scoped project context under concurrency.
+
+Several browsers (separate test clients, so separate session cookies) run
+phase execution and PDF/XLSX export for different projects at the same
+time. Each must only ever see its own project -- the failure mode of the
+old module-level ``current_project`` global under multi-threaded waitress.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_context_test_'))
+
+WORKERS = 4
+ROUNDS = 2
+
+
+@pytest.fixture(scope='module')
+def app_module():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional
+
+
+def _new_project(client, i):
+    r = client.post('/api/projects', json={
+        'name': f'Concurrency {i}', 'location': 'Nairobi, Kenya',
+        'gps_lat': -1.29 + i, 'gps_lng': 36.82, 'units': 1 + i,
+        'stories': 1 + i % 3, 'area': 200 + 150 * i, 'bedrooms': 2 + i % 2})
+    assert r.status_code == 200
+    return r.get_json()['project_id']
+
+
+def test_no_module_level_project_state(app_module):
+    assert not hasattr(app_module, 'current_project')
+
+
+def test_active_project_follows_the_session(app_module):
+    a, b = app_module.app.test_client(), app_module.app.test_client()
+    pid_a, pid_b = _new_project(a, 0), _new_project(b, 1)
+
+    assert a.post('/api/execute-all-phases', json={}).get_json()['project_id'] == pid_a
+    assert b.post('/api/execute-all-phases', json={}).get_json()['project_id'] == pid_b
+    # A fresh browser has no active project and must name one explicitly.
+    fresh = app_module.app.test_client()
+    assert fresh.post('/api/execute-all-phases', json={}).status_code == 400
+    assert fresh.post('/api/execute-all-phases', json={'project_id': pid_a}).get_json()['project_id'] == pid_a
+
+
+def test_parallel_exports_do_not_cross_contaminate(app_module):
+    clients = [app_module.app.test_client() for _ in range(WORKERS)]
+    ids = [_new_project(c, i) for i, c in enumerate(clients)]
+    # Serial reference results, one per project.
+    expected = {pid: c.post('/api/execute-all-phases', json={'project_id': pid}).get_json()
+                for pid, c in zip(ids, clients)}
+    assert len({e['total_cost'] for e in expected.values()}) == WORKERS
+
+    barrier = threading.Barrier(WORKERS, timeout=30)
+    errors = []
+
+    def worker(client, pid):
+        try:
+            barrier.wait()
+            for _ in range(ROUNDS):
+                # No project_id: each client relies on its own session.
+                run = client.post('/api/execute-all-phases', json={'force': True}).get_json()
+                ref = expected[pid]
+                assert run['project_id'] == pid
+                assert (run['area'], run['units'], run['total_cost']) == (ref['area'], ref['units'], ref['total_cost'])
+                assert run['phases']['phase_13']['data']['project_id'] == pid
+
+                pdf = client.get('/api/export/pdf')
+                assert pdf.status_code == 200 and pdf.data.startswith(b'%PDF')
+                assert f'{pid}_full_report.pdf' in pdf.headers['Content-Disposition']
+
+                xlsx = client.get('/api/export/excel')
+                assert f'{pid}_data.xlsx' in xlsx.headers['Content-Disposition']
+        except Exception as e:  # surfaced in the main thread below
+            errors.append(f'{pid}: {e!r}')
+
+    threads = [threading.Thread(target=worker, args=(c, pid)) for c, pid in zip(clients, ids)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=300)
+
+    assert not errors, errors
@@ -0,0 +1,91 @@
+"""Vectorised Monte Carlo: samplers, LHS, rank correlation, early stopping."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_risk_test_'))
+
+from eims_modules import risk_montecarlo as rm  # noqa: E402
+
+TRI = {'type': 'triangular', 'min': 100, 'mode': 200, 'max': 600}
+
+
+def _risk(name, dist, probability=1.0):
+    return {'name': name, 'probability': probability, 'cost_distribution': dist}
+
+
+@pytest.mark.parametrize('dist, mean', [
+    (TRI, 300.0),
+    ({'type': 'pert', 'min': 0, 'mode': 10, 'max': 40}, 40 / 3),
+    ({'type': 'uniform', 'min': 5, 'max': 15}, 10.0),
+    ({'type': 'normal', 'mean': 50, 'sd': 4}, 50.0),
+    ({'type': 'lognormal', 'mean': 1.0, 'sd': 0.5}, float(np.exp(1.125))),
+])
+def test_sampler_means(dist, mean):
+    r = rm.monte_carlo(risks=[_risk('x', dist)], iterations=40000, seed=1, sampling='lhs')
+    assert r['cost']['mean'] == pytest.approx(mean, rel=0.01)
+
+
+def test_probability_and_exceedance():
+    r = rm.monte_carlo(base_cost=1000, risks=[_risk('r', TRI, probability=0.25)],
+                       iterations=50000, seed=3, budget_target=1000.5)
+    assert r['probability_exceeding_budget'] == pytest.approx(0.25, abs=0.01)
+    assert r['cost']['percentiles']['P50'] == 1000
+    assert sum(r['cost']['histogram']['counts']) == 50000
+
+
+def test_latin_hypercube_stratifies_each_column():
+    u = rm._uniforms(np.random.default_rng(0), 1000, 3, 'lhs')
+    for col in u.T:
+        assert sorted(np.floor(col * 1000).astype(int).tolist()) == list(range(1000))
+
+
+def test_iman_conover_imposes_rank_correlation_and_keeps_marginals():
+    risks = [_risk('a', TRI), _risk('b', TRI), _risk('c', {'type': 'uniform', 'min': 0, 'max': 1})]
+    corr = [{'a': 'a', 'b': 'b', 'rho': 0.8}, {'a': 'a', 'b': 'c', 'rho': -0.3}]
+    ind = rm.monte_carlo(risks=risks, iterations=20000, seed=5)
+    cor = rm.monte_carlo(risks=risks, iterations=20000, seed=5, correlations=corr)
+    # Positive correlation widens the spread of the total but not its mean.
+    assert cor['cost']['mean'] == pytest.approx(ind['cost']['mean'], rel=0.01)
+    assert cor['cost']['stdev'] > 1.15 * ind['cost']['stdev']
+
+    rng = np.random.default_rng(2)
+    u = rng.random((20000, 3))
+    out = rm._iman_conover(rng, u, rm._correlation_cholesky(['a', 'b', 'c'], corr))
+    assert np.allclose(np.sort(out, axis=0), np.sort(u, axis=0))
+    rho = np.corrcoef(np.argsort(np.argsort(out, axis=0), axis=0), rowvar=False)
+    assert rho[0, 1] == pytest.approx(0.8, abs=0.03) and rho[0, 2] == pytest.approx(-0.3, abs=0.03)
+
+
+def test_bad_correlations_are_rejected():
+    risks = [_risk('a', TRI), _risk('b', TRI), _risk('c', TRI)]
+    r = rm.monte_carlo(risks=risks, correlations=[{'a': 'a', 'b': 'z', 'rho': 0.5}])
+    assert not r['success'] and "'z'" in r['error']
+    r = rm.monte_carlo(risks=risks, correlations=[{'a': 'a', 'b': 'b', 'rho': 0.9},
+                                                  {'a': 'a', 'b': 'c', 'rho': 0.9},
+                                                  {'a': 'b', 'b': 'c', 'rho': -0.9}])
+    assert not r['success'] and 'positive definite' in r['error']
+    for bad in (['a'], [{'a': 'a', 'b': 'b'}], [{'a': 'a', 'b': 'b', 'rho': 'nan'}],
+                [{'a': 'a', 'b': 'b', 'rho': None}], {'a': 'a', 'b': 'b', 'rho': 0.5}):
+        r = rm.monte_carlo(risks=risks, correlations=bad)
+        assert not r['success'] and 'invalid risk input' in r['error'], bad
+
+
+def test_convergence_stops_early_and_tornado_ranks_dominant_risk():
+    risks = [_risk('big', {'type': 'pert', 'min': 1e5, 'mode': 2e5, 'max': 9e5}),
+             _risk('small', {'type': 'uniform', 'min': 0, 'max': 1e3}, 0.5)]
+    r = rm.monte_carlo(risks=risks, iterations=200000, seed=9, sampling='lhs',
+                       convergence_tol=0.005)
+    assert r['convergence']['converged'] and r['iterations'] < 200000
+    assert r['iterations'] % rm.CONVERGENCE_BATCH == 0
+    assert [t['risk'] for t in r['tornado_top10']] == ['big', 'small']
+    assert r['tornado_top10'][0]['spearman_correlation_to_total_cost'] > 0.99
@@ -0,0 +1,140 @@
+"""Adjacency-list CPM: link types, incremental edits and resource levelling."""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_sched_test_'))
+
+from eims_modules import scheduler  # noqa: E402
+from eims_modules.scheduler import Schedule, cpm  # noqa: E402
+
+
+def random_network(n, seed=0, span=60):
+    """Layered programme: each activity links to 1-3 earlier ones within ``span``."""
+    rng = random.Random(seed)
+    acts = []
+    for i in range(n):
+        preds = []
+        for p in rng.sample(range(max(0, i - span), i), min(i, rng.randint(1, 3))):
+            kind = rng.choice(['FS', 'FS', 'FS', 'SS', 'FF', 'SF'])
+            lag = rng.choice([0, 0, 1, 2, -1])
+            preds.append(f'A{p}' if kind == 'FS' and not lag
+                         else {'id': f'A{p}', 'type': kind, 'lag_days': lag})
+        acts.append({'id': f'A{i}', 'duration_days': rng.randint(1, 15), 'predecessors': preds,
+                     'resources': {'crew': rng.randint(1, 4)}})
+    return acts
+
+
+def _dates(rows):
+    return {r['id']: (r['ES'], r['EF'], r['LS'], r['LF'], r['free_float']) for r in rows}
+
+
+def test_link_types_and_lags():
+    r = cpm(activities=[
+        {'id': 'A', 'duration_days': 10},
+        {'id': 'B', 'duration_days': 4, 'predecessors': [{'id': 'A', 'type': 'SS', 'lag_days': 3}]},
+        {'id': 'C', 'duration_days': 2, 'predecessors': [{'id': 'A', 'type': 'FF', 'lag_days': 2}]},
+        {'id': 'D', 'duration_days': 5, 'predecessors': [{'id': 'B', 'type': 'SF', 'lag_days': 1}]},
+        {'id': 'E', 'duration_days': 1, 'predecessors': ['C', {'id': 'D', 'type': 'FS', 'lag_days': -1}]},
+    ])
+    acts = {a['id']: a for a in r['activities']}
+    assert (acts['B']['ES'], acts['C']['ES'], acts['D']['ES']) == (3, 10, 0)
+    assert acts['E']['ES'] == 12 and r['project_duration_days'] == 13
+    assert r['critical_path'] == ['A', 'C', 'E']
+    # D may slip until its lead into E bites: LF(D) = LS(E) + 1 = 13.
+    assert acts['D']['total_float'] == 8
+    # SF into D allows LS(B) = LF(D) - 1 = 12; B's own finish bounds it to 13 - 4.
+    assert acts['B']['LS'] == 9
+
+
+def test_incremental_edits_match_full_recalculation():
+    rng = random.Random(11)
+    sched = Schedule(random_network(2000, seed=2))
+    for step in range(60):
+        i = rng.randrange(2000)
+        if step % 3 == 0:
+            sched.set_duration(f'A{i}', rng.randint(0, 30))
+        elif step % 3 == 1 and i > 1:
+            sched.set_link(f'A{rng.randrange(i)}', f'A{i}', rng.choice(scheduler.LINK_TYPES),
+                           rng.choice([0, 2, -1]))
+        elif sched.preds[i]:
+            sched.remove_link(sched.ids[sched.preds[i][0][0]], f'A{i}')
+        fresh = Schedule(sched.activities)
+        assert _dates(sched.rows()) == _dates(fresh.rows())
+    # A late-in-the-programme edit only revisits its neighbourhood.
+    assert sched.set_duration('A1995', 3) < 100
+
+
+def test_backward_link_reorders_and_cycles_are_rejected():
+    sched = Schedule([{'id': 'A', 'duration_days': 2}, {'id': 'B', 'duration_days': 3, 'predecessors': ['A']},
+                      {'id': 'C', 'duration_days': 1}])
+    sched.set_link('C', 'A', 'FS', 4)
+    assert dict(zip(sched.ids, sched.ES)) == {'A': 5, 'B': 7, 'C': 0}
+    with pytest.raises(ValueError, match='cycle'):
+        sched.set_link('B', 'C')
+    assert sched.preds[sched.index['C']] == [] and sched.project_duration == 10
+
+
+def test_resource_levelling_serialises_shared_crane():
+    r = cpm(activities=[
+        {'id': 'Found', 'duration_days': 5, 'resources': {'crane': 1}},
+        {'id': 'Frame', 'duration_days': 10, 'predecessors': ['Found'], 'resources': {'crane': 1}},
+        {'id': 'Tanks', 'duration_days': 3, 'resources': {'crane': 1, 'crew': 2}},
+        {'id': 'Fitout', 'duration_days': 4, 'predecessors': ['Frame']},
+    ], resource_limits={'crane': 1})
+    lv = r['levelled']
+    assert r['project_duration_days'] == 19
+    # Critical work keeps the crane; the floating tank lift waits for a gap.
+    assert lv['activities']['Found']['start'] == 0 and lv['activities']['Frame']['start'] == 5
+    assert lv['activities']['Tanks']['start'] == 15
+    assert lv['peak_usage'] == {'crane': 1} and lv['extension_days'] == 0
+
+    bad = cpm(activities=[{'id': 'X', 'duration_days': 1, 'resources': {'crane': 2}}],
+              resource_limits={'crane': 1})
+    assert not bad['success'] and 'crane' in bad['error']
+
+
+def test_levelled_schedule_respects_limits_and_links():
+    acts = random_network(400, seed=5)
+    r = cpm(activities=acts, resource_limits={'crew': 6})
+    lv = r['levelled']
+    assert lv['peak_usage']['crew'] <= 6 and lv['extension_days'] >= 0
+    start = {k: v['start'] for k, v in lv['activities'].items()}
+    finish = {k: v['finish'] for k, v in lv['activities'].items()}
+    for a in acts:
+        for link in a['predecessors']:
+            p, kind, lag = scheduler._parse_link(link)
+            lhs = {'FS': start[a['id']] - finish[p], 'SS': start[a['id']] - start[p],
+                   'FF': finish[a['id']] - finish[p], 'SF': finish[a['id']] - start[p]}[kind]
+            assert lhs >= lag - 1e-9
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_cpm_update_endpoint(client):
+    acts = [{'id': 'A', 'duration_days': 5}, {'id': 'B', 'duration_days': 10, 'predecessors': ['A']},
+            {'id': 'C', 'duration_days': 4, 'predecessors': ['A']}]
+    first = client.post('/api/sched/cpm', json={'activities': acts}).get_json()
+    assert first['success'] and first['project_duration_days'] == 15
+    r = client.post('/api/sched/cpm/update', json={
+        'schedule_id': first['schedule_id'],
+        'changes': [{'activity': 'C', 'duration_days': 12},
+                    {'link': {'from': 'B', 'to': 'C', 'type': 'SS', 'lag_days': 2}}]}).get_json()
+    assert r['success'] and r['project_duration_days'] == 19
+    assert r['critical_path'] == ['A', 'B', 'C']
+    missing = client.post('/api/sched/cpm/update', json={'schedule_id': 'nope', 'changes': []})
+    assert missing.status_code == 400
@@ -0,0 +1,127 @@
+"""Annual sun path, shadow-hours raster and facade insolation."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('EIMS_UPLOAD_FOLDER',
+                        tempfile.mkdtemp(prefix='eims_solar_test_'))
+
+from eims_modules import solar_raster as sr  # noqa: E402
+from eims_modules.bim_model import Building  # noqa: E402
+
+LONDON = (51.5, -0.1)
+TOWER = [{'footprint': [[0, 0], [10, 0], [10, 10], [0, 10]], 'height_m': 20.0, 'name': 'tower'}]
+
+
+@pytest.fixture(scope='module')
+def sun():
+    return sr.annual_sun_path(*LONDON, year=2026)
+
+
+def test_sun_path_matches_known_positions(sun):
+    assert len(sun.hour) == 8760
+    # 21 June, 12:00-13:00 GMT: the sun is close to due south at ~62°.
+    noon = (31 + 28 + 31 + 30 + 31 + 20) * 24 + 12
+    assert sun.altitude_deg[noon] == pytest.approx(90 - 51.5 + 23.44, abs=1.0)
+    assert 170 < sun.azimuth_deg[noon] < 200
+    # Roughly half the year is daylight anywhere; London gets ~4,400 h.
+    assert 4300 < sun.daylight_hours < 4500
+    assert (sun.dni_w_m2[~sun.up] == 0).all() and sun.dni_w_m2.max() < sr.SOLAR_CONSTANT_W_M2
+    with pytest.raises(ValueError):
+        sr.annual_sun_path(95, 0)
+
+
+def test_binned_raster_tracks_an_exact_per_hour_cast(sun):
+    prisms = sr.neighbour_prisms(TOWER + [
+        {'footprint': [[25, 0], [35, 0], [35, 8], [30, 14], [25, 8]], 'height_m': 12.0}])
+    r = sr.shadow_raster(prisms, sun, cell_m=2.0)
+    xs = r['origin'][0] + (np.arange(r['nx']) + 0.5) * 2.0
+    ys = r['origin'][1] + (np.arange(r['ny']) + 0.5) * 2.0
+    gx, gy = np.meshgrid(xs, ys)
+    points = np.stack([gx.ravel(), gy.ravel()], 1)
+    up = sun.up
+    horizon, inside = sr._horizon_tan(points, np.zeros(len(points)), prisms,
+                                      sun.azimuth_deg[up])
+    exact = (np.tan(np.radians(sun.altitude_deg[up]))[None] < horizon).sum(1).astype(float)
+    exact[inside] = np.nan
+    got = r['shadow_hours'].ravel()
+    assert np.array_equal(np.isnan(got), np.isnan(exact)) and inside.any()
+    diff = np.abs(got - exact)[~inside]
+    assert np.nanmean(diff) < 0.01 * np.nanmean(exact[~inside])
+    total = (r['sun_hours'] + r['shadow_hours']).ravel()[~inside]
+    assert np.allclose(total, sun.daylight_hours)
+
+
+def test_north_side_is_shaded_and_south_facade_gets_the_sun(sun):
+    prisms = sr.neighbour_prisms(TOWER)
+    r = sr.shadow_raster(prisms, sun, cell_m=1.0, bounds=(-10, -10, 20, 20))
+    shadow = r['shadow_hours']
+    north, south = shadow[-5:, 10:20], shadow[:5, 10:20]     # rows run south → north
+    assert np.isnan(shadow[15, 15]) and np.nanmin(shadow) >= 0
+    assert north.mean() > 4 * south.mean()
+
+    faces = {f['azimuth_deg']: f for f in sr.facade_insolation(prisms, sun, spacing_m=2.0)}
+    assert sorted(faces) == [0.0, 90.0, 180.0, 270.0]
+    assert faces[180.0]['irradiation_kwh_m2'].mean() > 3 * faces[0.0]['irradiation_kwh_m2'].mean()
+    assert faces[180.0]['sun_hours'].shape == (10, 5)
+
+
+def test_building_prisms_merge_identical_storeys():
+    b = Building.from_params(name='Solar', area_m2=1800, stories=6, units=2, bedrooms=6)
+    prisms = sr.building_prisms(b)
+    assert len(prisms) == 1
+    assert prisms[0].top_m == pytest.approx(b.storeys[-1].level_m + b.storeys[-1].height_m)
+    rotated = sr._rotate(prisms, 90.0)[0].footprint
+    assert np.allclose(rotated[:, 0], prisms[0].footprint[:, 1])
+
+
+@pytest.fixture(scope='module')
+def client():
+    import app_professional
+    app_professional.app.config['TESTING'] = True
+    return app_professional.app.test_client()
+
+
+def test_annual_route(client):
+    body = {'lat': LONDON[0], 'lng': LONDON[1], 'year': 2026, 'cell_m': 2.0,
+            'area_m2': 600, 'stories': 3, 'units': 2,
+            'neighbours': [{'footprint': [[30, 0], [40, 0], [40, 10], [30, 10]], 'height_m': 9}]}
+    r = client.post('/api/arch/shadow/annual', json=body)
+    assert r.status_code == 200
+    out = r.get_json()
+    grid = out['grid']
+    assert len(out['shadow_hours']) == grid['ny'] and len(out['shadow_hours'][0]) == grid['nx']
+    assert any(v is None for row in out['shadow_hours'] for v in row)
+    assert [p['name'] for p in out['prisms']][-1] == 'neighbour_1'
+    assert out['facades'] and out['summary']['cells'] > 0
+    again = client.post('/api/arch/shadow/annual', json=body,
+                        headers={'If-None-Match': r.headers['ETag']})
+    assert again.status_code == 304
+
+    assert client.post('/api/arch/shadow/annual', json={'lat': 'x', 'lng': 0}).status_code == 400
+    for bad in ({'utc_offset_hours': 'nan'}, {'utc_offset_hours': 15}, {'lng': 'inf'}, {'north_deg': 'nan'}):
+        assert client.post('/api/arch/shadow/annual', json={**body, **bad}).status_code == 400, bad
+    assert client.post('/api/arch/shadow/annual', json={
+        **body, 'neighbours': [{'footprint': [[0, 0]], 'height_m': 3}]}).status_code == 400
+    far = {**body, 'neighbours': [{'footprint': [[5000, 0], [5010, 0], [5010, 10], [5000, 10]], 'height_m': 9}]}
+    assert 'extent' in client.post('/api/arch/shadow/annual', json=far).get_json()['error']
+    tall = {**body, 'neighbours': [{'footprint': [[30, 0], [40, 0], [40, 10], [30, 10]], 'height_m': 1e9}]}
+    assert client.post('/api/arch/shadow/annual', json=tall).status_code == 400
+
+
+def test_grid_size_is_capped(sun, monkeypatch):
+    prisms = sr.neighbour_prisms(TOWER)
+    monkeypatch.setattr(sr, 'MAX_CELLS', 1000)
+    with pytest.raises(ValueError, match='cells'):
+        sr.shadow_raster(prisms, sun, cell_m=0.25)
+    with pytest.raises(ValueError, match='facade points'):
+        sr.facade_insolation(prisms, sun, spacing_m=0.25)
+    assert sr.shadow_raster(prisms, sun, cell_m=2.0)['nx'] == (10 + 2 * 20) // 2